@@ -9,11 +9,18 @@ Features:
 - Autoencoder for complex pattern detection
 - Real-time monitoring of all metrics
 - Adaptive learning of normal behavior
+
+Detection is streaming and batched: every agent in a fleet is scored with a
+single model call, normal behavior is kept as per-agent Welford and EWMA
+statistics (O(1) memory per agent), and the model is refit in the
+background on a bounded reservoir sample, so memory stays flat over time.
 """
 
 import json
 import os
 import pickle
+import sys
+import threading
 import time
 from datetime import UTC, datetime
 from pathlib import Path
@@ -21,6 +28,12 @@ from typing import Any
 
 import numpy as np
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from utils.notification_dispatcher import get_dispatcher  # noqa: E402
+
 ROOT = Path("/opt/render/project/src") if os.getenv("RENDER_MODE") == "true" else Path(os.path.expanduser("~/neolight"))
 STATE = ROOT / "state"
 RUNTIME = ROOT / "runtime"
@@ -38,6 +51,29 @@ RENDER_MODE = os.getenv("RENDER_MODE", "false").lower() == "true"
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "")
 
+# Streaming detection settings
+EWMA_ALPHA = float(os.getenv("ANOMALY_EWMA_ALPHA", "0.05"))  # Baseline adaptation rate
+RESERVOIR_SIZE = int(os.getenv("ANOMALY_RESERVOIR_SIZE", "5000"))  # Refit sample bound
+REFIT_INTERVAL = float(os.getenv("ANOMALY_REFIT_INTERVAL", "3600"))  # Seconds between refits
+MIN_REFIT_SAMPLES = 256  # Reservoir size before the first background fit
+MIN_BASELINE_SAMPLES = 5  # Observations before z-scores are trusted
+BASELINE_SAVE_INTERVAL = 300  # Seconds between normal-behavior snapshots
+
+# Feature vector layout, shared by extract_metrics() and batched scoring
+METRIC_FIELDS = [
+    "cpu_usage",
+    "memory_usage",
+    "disk_usage",
+    "error_rate",
+    "response_time_ms",
+    "queue_length",
+    "throughput",
+    "active_connections",
+]
+# Metrics checked by the statistical (3 sigma) detector
+STATISTICAL_METRICS = ["cpu_usage", "memory_usage", "error_rate", "response_time_ms"]
+STATISTICAL_INDEX = [METRIC_FIELDS.index(m) for m in STATISTICAL_METRICS]
+
 # Try to import ML libraries
 try:
     from sklearn.ensemble import IsolationForest
@@ -49,26 +85,178 @@ except ImportError:
 
 
 def send_telegram(message: str) -> None:
-    """Send Telegram alert."""
+    """Queue a Telegram alert (sent in the background by the notification dispatcher)."""
     if not (TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID):
         return
-    try:
-        import requests
-
-        url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-        payload = {"chat_id": TELEGRAM_CHAT_ID, "text": message, "parse_mode": "Markdown"}
-        requests.post(url, json=payload, timeout=10)
-    except Exception:
-        pass
+    get_dispatcher().notify(message, chat_id=TELEGRAM_CHAT_ID, parse_mode="Markdown")
+
+
+def metrics_matrix(agent_datas: list[dict[str, Any]]) -> np.ndarray:
+    """Feature matrix (one row per agent, METRIC_FIELDS columns)."""
+    return np.array(
+        [[float(data.get(field, 0.0) or 0.0) for field in METRIC_FIELDS] for data in agent_datas],
+        dtype=float,
+    ).reshape(len(agent_datas), len(METRIC_FIELDS))
+
+
+class BaselineBank:
+    """
+    Per-agent normal behavior as running statistics, stored as arrays.
+
+    Each agent is one row: Welford count/mean/M2 for the long-run mean and
+    variance, and an EWMA mean/variance that tracks recent behavior. Updates
+    and z-scores are vectorized over any set of agents.
+    """
+
+    def __init__(self, n_metrics: int = len(METRIC_FIELDS), alpha: float = EWMA_ALPHA, capacity: int = 64):
+        self.alpha = alpha
+        self.index: dict[str, int] = {}
+        self.count = np.zeros(capacity)
+        self.mean = np.zeros((capacity, n_metrics))
+        self.m2 = np.zeros((capacity, n_metrics))
+        self.ewma = np.zeros((capacity, n_metrics))
+        self.ewvar = np.zeros((capacity, n_metrics))
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def rows(self, names: list[str]) -> np.ndarray:
+        """Row per agent, allocating rows for new agents."""
+        for name in names:
+            if name not in self.index:
+                if len(self.index) == len(self.count):
+                    self._grow()
+                self.index[name] = len(self.index)
+        return np.array([self.index[name] for name in names], dtype=int)
+
+    def _grow(self) -> None:
+        def pad(array: np.ndarray) -> np.ndarray:
+            return np.concatenate([array, np.zeros_like(array)])
+
+        self.count, self.mean, self.m2 = pad(self.count), pad(self.mean), pad(self.m2)
+        self.ewma, self.ewvar = pad(self.ewma), pad(self.ewvar)
+
+    def update(self, rows: np.ndarray, X: np.ndarray) -> None:
+        """Fold one observation per row into the statistics (rows must be unique)."""
+        if len(rows) == 0:
+            return
+        first = self.count[rows] == 0
+        self.count[rows] += 1
+        delta = X - self.mean[rows]
+        self.mean[rows] += delta / self.count[rows, None]
+        self.m2[rows] += delta * (X - self.mean[rows])
+
+        diff = X - self.ewma[rows]
+        ewma = self.ewma[rows] + self.alpha * diff
+        ewvar = (1 - self.alpha) * (self.ewvar[rows] + self.alpha * diff * diff)
+        # The first observation seeds the EWMA instead of decaying from zero
+        self.ewma[rows] = np.where(first[:, None], X, ewma)
+        self.ewvar[rows] = np.where(first[:, None], 0.0, ewvar)
+
+    def std(self, rows: np.ndarray) -> np.ndarray:
+        """Long-run (Welford) standard deviation."""
+        count = np.maximum(self.count[rows], 1)[:, None]
+        return np.sqrt(self.m2[rows] / count)
+
+    def ewstd(self, rows: np.ndarray) -> np.ndarray:
+        """Recent (EWMA) standard deviation, bias-corrected for short histories."""
+        seen = np.maximum(self.count[rows] - 1, 0)[:, None]
+        weight = 1 - (1 - self.alpha) ** seen
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.sqrt(np.where(weight > 0, self.ewvar[rows] / weight, 0.0))
+
+    def zscores(self, rows: np.ndarray, X: np.ndarray) -> np.ndarray:
+        """
+        |x - EWMA mean| / EWMA std, falling back to the long-run std.
+
+        Returns NaN where there is no spread to compare against.
+        """
+        std = self.ewstd(rows)
+        std = np.where(std > 0, std, self.std(rows))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = np.abs(X - self.ewma[rows]) / std
+        return np.where(std > 0, z, np.nan)
+
+    def to_dict(self) -> dict[str, Any]:
+        agents = {}
+        for name, row in self.index.items():
+            agents[name] = {
+                "count": int(self.count[row]),
+                "mean": self.mean[row].tolist(),
+                "m2": self.m2[row].tolist(),
+                "ewma": self.ewma[row].tolist(),
+                "ewvar": self.ewvar[row].tolist(),
+            }
+        return {"version": 2, "metrics": METRIC_FIELDS, "alpha": self.alpha, "agents": agents}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], alpha: float = EWMA_ALPHA) -> "BaselineBank":
+        """Restore from to_dict(), or migrate the legacy per-agent sample lists."""
+        bank = cls(alpha=alpha)
+        if data.get("version") == 2:
+            for name, stats in data.get("agents", {}).items():
+                row = bank.rows([name])[0]
+                bank.count[row] = stats["count"]
+                bank.mean[row], bank.m2[row] = stats["mean"], stats["m2"]
+                bank.ewma[row], bank.ewvar[row] = stats["ewma"], stats["ewvar"]
+            return bank
+
+        # Legacy format: {"agent": {"samples": [...], "<metric>_mean": ...}}
+        for name, normal in data.items():
+            if not isinstance(normal, dict):
+                continue
+            row = bank.rows([name])
+            for sample in normal.get("samples", [])[-1000:]:
+                bank.update(row, metrics_matrix([sample]))
+        return bank
+
+
+class Reservoir:
+    """Fixed-size uniform sample of a stream (Algorithm R), filled in batches."""
+
+    def __init__(self, capacity: int = RESERVOIR_SIZE, n_metrics: int = len(METRIC_FIELDS), seed: int | None = None):
+        self.capacity = capacity
+        self.data = np.empty((capacity, n_metrics))
+        self.size = 0
+        self.seen = 0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, X: np.ndarray) -> None:
+        if len(X) == 0:
+            return
+        fill = min(self.capacity - self.size, len(X))
+        if fill:
+            self.data[self.size:self.size + fill] = X[:fill]
+            self.size += fill
+        rest = X[fill:]
+        if len(rest):
+            # Row k of the stream replaces a random slot with probability capacity / k
+            seen = self.seen + fill + np.arange(1, len(rest) + 1)
+            slots = (self.rng.random(len(rest)) * seen).astype(int)
+            keep = slots < self.capacity
+            self.data[slots[keep]] = rest[keep]
+        self.seen += len(X)
+
+    def sample(self) -> np.ndarray:
+        return self.data[:self.size].copy()
 
 
 class AnomalyDetector:
     """Real-time anomaly detection system."""
 
-    def __init__(self):
+    def __init__(self, refit_interval: float = REFIT_INTERVAL, reservoir_size: int = RESERVOIR_SIZE):
         self.model = None
         self.scaler = StandardScaler() if HAS_SKLEARN else None
-        self.normal_behavior = {}
+        self.baselines = BaselineBank()
+        self.reservoir = Reservoir(reservoir_size)
+        self.refit_interval = refit_interval
+        self.last_fit = 0.0
+        self._lock = threading.Lock()
+        self._refit_thread: threading.Thread | None = None
+        self._last_save = time.monotonic()
         self.load_model()
         self.load_normal_behavior()
 
@@ -80,6 +268,7 @@ class AnomalyDetector:
                     data = pickle.load(f)
                     self.model = data.get("model")
                     self.scaler = data.get("scaler")
+                self.last_fit = time.time()
                 print("[anomaly_detector] Model loaded successfully", flush=True)
             except Exception as e:
                 print(f"[anomaly_detector] Failed to load model: {e}", flush=True)
@@ -89,8 +278,10 @@ class AnomalyDetector:
         """Save trained model."""
         if self.model and HAS_SKLEARN:
             try:
-                with open(ANOMALY_MODEL_FILE, "wb") as f:
+                tmp = ANOMALY_MODEL_FILE.with_suffix(".tmp")
+                with open(tmp, "wb") as f:
                     pickle.dump({"model": self.model, "scaler": self.scaler}, f)
+                tmp.replace(ANOMALY_MODEL_FILE)
                 print("[anomaly_detector] Model saved successfully", flush=True)
             except Exception as e:
                 print(f"[anomaly_detector] Failed to save model: {e}", flush=True)
@@ -99,164 +290,146 @@ class AnomalyDetector:
         """Load normal behavior patterns."""
         if NORMAL_BEHAVIOR_FILE.exists():
             try:
-                self.normal_behavior = json.loads(NORMAL_BEHAVIOR_FILE.read_text())
+                self.baselines = BaselineBank.from_dict(json.loads(NORMAL_BEHAVIOR_FILE.read_text()))
             except Exception:
-                self.normal_behavior = {}
+                self.baselines = BaselineBank()
 
     def save_normal_behavior(self) -> None:
         """Save normal behavior patterns."""
         try:
-            NORMAL_BEHAVIOR_FILE.write_text(json.dumps(self.normal_behavior, indent=2))
+            tmp = NORMAL_BEHAVIOR_FILE.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self.baselines.to_dict()))
+            tmp.replace(NORMAL_BEHAVIOR_FILE)
+            self._last_save = time.monotonic()
         except Exception:
             pass
 
     def extract_metrics(self, agent_data: dict[str, Any]) -> np.ndarray:
         """Extract metrics from agent data."""
-        try:
-            import numpy as np
-        except ImportError:
-            # Fallback: return simple list
-            return [[
-                agent_data.get("cpu_usage", 0.0),
-                agent_data.get("memory_usage", 0.0),
-                agent_data.get("error_rate", 0.0),
-            ]]
-
-        metrics = np.array([
-            agent_data.get("cpu_usage", 0.0),
-            agent_data.get("memory_usage", 0.0),
-            agent_data.get("disk_usage", 0.0),
-            agent_data.get("error_rate", 0.0),
-            agent_data.get("response_time_ms", 0.0),
-            agent_data.get("queue_length", 0),
-            agent_data.get("throughput", 0.0),
-            agent_data.get("active_connections", 0),
-        ])
-        return metrics.reshape(1, -1)
+        return metrics_matrix([agent_data])
 
     def detect_anomaly(self, agent_name: str, agent_data: dict[str, Any]) -> dict[str, Any]:
         """Detect if agent behavior is anomalous."""
-        metrics = self.extract_metrics(agent_data)
-
-        if not HAS_SKLEARN or not self.model:
+        return self.detect_batch({agent_name: agent_data})[agent_name]
+
+    def detect_batch(self, agents: dict[str, dict[str, Any]]) -> dict[str, dict[str, Any]]:
+        """
+        Score many agents at once.
+
+        Builds one feature matrix, makes one model call (or one vectorized
+        z-score pass without a model), then folds normal observations into
+        the per-agent baselines and the refit reservoir.
+
+        Args:
+            agents: {agent_name: metrics dict}
+
+        Returns:
+            {agent_name: detection result}
+        """
+        if not agents:
+            return {}
+        names = list(agents)
+        X = metrics_matrix([agents[name] for name in names])
+        rows = self.baselines.rows(names)
+        timestamp = datetime.now(UTC).isoformat()
+
+        with self._lock:
+            model, scaler = self.model, self.scaler
+
+        results: dict[str, dict[str, Any]] = {}
+        if HAS_SKLEARN and model is not None:
+            try:
+                X_scaled = scaler.transform(X) if scaler is not None else X
+                scores = model.score_samples(X_scaled)
+                anomalous = scores < model.offset_
+                for i, name in enumerate(names):
+                    results[name] = {
+                        "is_anomaly": bool(anomalous[i]),
+                        "anomaly_score": float(scores[i]),
+                        "confidence": abs(float(scores[i])),
+                        "metrics": X[i].tolist(),
+                        "timestamp": timestamp,
+                    }
+            except Exception as e:
+                print(f"[anomaly_detector] Detection error: {e}", flush=True)
+                return {name: {"is_anomaly": False, "error": str(e)} for name in names}
+        else:
             # Fallback: statistical anomaly detection
-            return self._statistical_anomaly_detection(agent_name, agent_data)
-
-        try:
-            # Scale metrics
-            if self.scaler:
-                metrics_scaled = self.scaler.transform(metrics)
-            else:
-                metrics_scaled = metrics
-
-            # Predict anomaly
-            prediction = self.model.predict(metrics_scaled)[0]
-            anomaly_score = float(self.model.score_samples(metrics_scaled)[0])
-
-            is_anomaly = prediction == -1
-            confidence = abs(anomaly_score)
-
-            result = {
-                "is_anomaly": bool(is_anomaly),
-                "anomaly_score": anomaly_score,
-                "confidence": confidence,
-                "metrics": metrics.flatten().tolist(),
-                "timestamp": datetime.now(UTC).isoformat(),
+            results = self._statistical_anomaly_detection(names, rows, X)
+            anomalous = np.array([results[name]["is_anomaly"] for name in names], dtype=bool)
+
+        # Update normal behavior if not anomaly
+        normal = ~anomalous
+        self.baselines.update(rows[normal], X[normal])
+        self.reservoir.add(X[normal])
+        self.maybe_refit()
+        if time.monotonic() - self._last_save >= BASELINE_SAVE_INTERVAL:
+            self.save_normal_behavior()
+        return results
+
+    def _statistical_anomaly_detection(self, names: list[str], rows: np.ndarray, X: np.ndarray) -> dict[str, dict[str, Any]]:
+        """Fallback statistical anomaly detection (3 sigma against each agent's baseline)."""
+        z = self.baselines.zscores(rows, X)[:, STATISTICAL_INDEX]
+        warm = self.baselines.count[rows] >= MIN_BASELINE_SAMPLES
+        flagged = (z > 3.0) & warm[:, None]  # 3 sigma rule
+
+        results = {}
+        for i, name in enumerate(names):
+            if self.baselines.count[rows[i]] == 0:
+                # First observation, assume normal
+                results[name] = {"is_anomaly": False, "method": "statistical", "reason": "first_observation"}
+                continue
+            anomalies = [f"{STATISTICAL_METRICS[j]}: z={z[i, j]:.2f}" for j in np.flatnonzero(flagged[i])]
+            results[name] = {
+                "is_anomaly": bool(anomalies),
+                "anomaly_score": len(anomalies) / len(STATISTICAL_METRICS),
+                "confidence": 0.7,
+                "anomalies": anomalies,
+                "method": "statistical",
             }
+        return results
+
+    def maybe_refit(self) -> bool:
+        """Start a background refit on the reservoir when one is due."""
+        if not HAS_SKLEARN or len(self.reservoir) < MIN_REFIT_SAMPLES:
+            return False
+        if self.model is not None and time.time() - self.last_fit < self.refit_interval:
+            return False
+        if self._refit_thread is not None and self._refit_thread.is_alive():
+            return False
+        self.last_fit = time.time()
+        self._refit_thread = threading.Thread(
+            target=self._fit, args=(self.reservoir.sample(),), name="anomaly-refit", daemon=True
+        )
+        self._refit_thread.start()
+        return True
+
+    def wait_for_refit(self, timeout: float | None = None) -> None:
+        """Block until a running background refit finishes."""
+        if self._refit_thread is not None:
+            self._refit_thread.join(timeout)
+
+    def _fit(self, X: np.ndarray) -> None:
+        """Fit scaler and Isolation Forest on X and swap them in."""
+        try:
+            scaler = StandardScaler()
+            X_scaled = scaler.fit_transform(X)
 
-            # Update normal behavior if not anomaly
-            if not is_anomaly:
-                self._update_normal_behavior(agent_name, agent_data)
+            # Train Isolation Forest
+            model = IsolationForest(
+                contamination=0.1,  # Expect 10% anomalies
+                random_state=42,
+                n_estimators=100,
+            )
+            model.fit(X_scaled)
+            with self._lock:
+                self.model, self.scaler = model, scaler
+            self.last_fit = time.time()
 
-            return result
+            # Save model
+            self.save_model()
         except Exception as e:
-            print(f"[anomaly_detector] Detection error: {e}", flush=True)
-            return {"is_anomaly": False, "error": str(e)}
-
-    def _statistical_anomaly_detection(self, agent_name: str, agent_data: dict[str, Any]) -> dict[str, Any]:
-        """Fallback statistical anomaly detection."""
-        if agent_name not in self.normal_behavior:
-            # First observation, assume normal
-            self._update_normal_behavior(agent_name, agent_data)
-            return {"is_anomaly": False, "method": "statistical", "reason": "first_observation"}
-
-        normal = self.normal_behavior[agent_name]
-        anomalies = []
-
-        # Check each metric
-        for metric in ["cpu_usage", "memory_usage", "error_rate", "response_time_ms"]:
-            value = agent_data.get(metric, 0.0)
-            mean = normal.get(f"{metric}_mean", value)
-            std = normal.get(f"{metric}_std", value * 0.1)
-
-            if std > 0:
-                z_score = abs((value - mean) / std)
-                if z_score > 3.0:  # 3 sigma rule
-                    anomalies.append(f"{metric}: z={z_score:.2f}")
-
-        is_anomaly = len(anomalies) > 0
-
-        return {
-            "is_anomaly": is_anomaly,
-            "anomaly_score": len(anomalies) / 4.0,
-            "confidence": 0.7,
-            "anomalies": anomalies,
-            "method": "statistical",
-        }
-
-    def _update_normal_behavior(self, agent_name: str, agent_data: dict[str, Any]) -> None:
-        """Update normal behavior patterns."""
-        if agent_name not in self.normal_behavior:
-            self.normal_behavior[agent_name] = {
-                "samples": [],
-                "cpu_usage_mean": 0.0,
-                "memory_usage_mean": 0.0,
-                "error_rate_mean": 0.0,
-                "response_time_ms_mean": 0.0,
-            }
-
-        normal = self.normal_behavior[agent_name]
-        samples = normal.get("samples", [])
-
-        # Add current sample
-        sample = {
-            "cpu_usage": agent_data.get("cpu_usage", 0.0),
-            "memory_usage": agent_data.get("memory_usage", 0.0),
-            "error_rate": agent_data.get("error_rate", 0.0),
-            "response_time_ms": agent_data.get("response_time_ms", 0.0),
-        }
-        samples.append(sample)
-
-        # Keep only last 1000 samples
-        if len(samples) > 1000:
-            samples = samples[-1000:]
-
-            # Update statistics
-            if samples:
-                try:
-                    import numpy as np
-                    normal["cpu_usage_mean"] = float(np.mean([s["cpu_usage"] for s in samples]))
-                    normal["memory_usage_mean"] = float(np.mean([s["memory_usage"] for s in samples]))
-                    normal["error_rate_mean"] = float(np.mean([s["error_rate"] for s in samples]))
-                    normal["response_time_ms_mean"] = float(np.mean([s["response_time_ms"] for s in samples]))
-
-                    normal["cpu_usage_std"] = float(np.std([s["cpu_usage"] for s in samples]))
-                    normal["memory_usage_std"] = float(np.std([s["memory_usage"] for s in samples]))
-                    normal["error_rate_std"] = float(np.std([s["error_rate"] for s in samples]))
-                    normal["response_time_ms_std"] = float(np.std([s["response_time_ms"] for s in samples]))
-                except ImportError:
-                    # Fallback: simple average
-                    normal["cpu_usage_mean"] = sum(s["cpu_usage"] for s in samples) / len(samples)
-                    normal["memory_usage_mean"] = sum(s["memory_usage"] for s in samples) / len(samples)
-                    normal["error_rate_mean"] = sum(s["error_rate"] for s in samples) / len(samples)
-                    normal["response_time_ms_mean"] = sum(s["response_time_ms"] for s in samples) / len(samples)
-
-        normal["samples"] = samples
-        self.normal_behavior[agent_name] = normal
-
-        # Save periodically
-        if len(samples) % 100 == 0:
-            self.save_normal_behavior()
+            print(f"[anomaly_detector] Refit error: {e}", flush=True)
 
     def train_model(self, training_data: list[dict[str, Any]]) -> dict[str, Any]:
         """Train anomaly detection model."""
@@ -265,21 +438,11 @@ class AnomalyDetector:
 
         try:
             # Convert to numpy array
-            X = np.array([self.extract_metrics(d).flatten() for d in training_data])
-
-            # Scale data
-            X_scaled = self.scaler.fit_transform(X)
-
-            # Train Isolation Forest
-            self.model = IsolationForest(
-                contamination=0.1,  # Expect 10% anomalies
-                random_state=42,
-                n_estimators=100,
-            )
-            self.model.fit(X_scaled)
-
-            # Save model
-            self.save_model()
+            X = metrics_matrix(training_data)
+            self.reservoir.add(X)
+            self._fit(self.reservoir.sample())
+            if self.model is None:
+                return {"status": "error", "error": "fit failed"}
 
             return {"status": "success", "samples": len(training_data)}
         except Exception as e:
@@ -287,27 +450,37 @@ class AnomalyDetector:
             return {"status": "error", "error": str(e)}
 
 
-def detect_anomalies_all_agents(agent_statuses: dict[str, dict[str, Any]]) -> dict[str, dict[str, Any]]:
-    """Detect anomalies for all agents."""
-    detector = AnomalyDetector()
-    detections = {}
-
-    for agent_name, status in agent_statuses.items():
-        # Convert status to metrics format
-        agent_data = {
-            "cpu_usage": status.get("cpu_usage", 0.0),
-            "memory_usage": status.get("memory_usage", 0.0),
-            "disk_usage": status.get("disk_usage", 0.0),
-            "error_rate": len(status.get("errors", [])) / max(1, status.get("error_window", 100)),
-            "response_time_ms": status.get("response_time_ms", 0.0),
-            "queue_length": status.get("queue_length", 0),
-            "throughput": status.get("throughput", 0.0),
-            "active_connections": status.get("active_connections", 0),
-        }
+_detector: AnomalyDetector | None = None
+
 
-        detection = detector.detect_anomaly(agent_name, agent_data)
-        detections[agent_name] = detection
+def get_detector() -> AnomalyDetector:
+    """Shared detector, so baselines and the model persist across fleet scans."""
+    global _detector
+    if _detector is None:
+        _detector = AnomalyDetector()
+    return _detector
 
+
+def _status_to_metrics(status: dict[str, Any]) -> dict[str, Any]:
+    """Convert an agent status to the metrics format."""
+    return {
+        "cpu_usage": status.get("cpu_usage", 0.0),
+        "memory_usage": status.get("memory_usage", 0.0),
+        "disk_usage": status.get("disk_usage", 0.0),
+        "error_rate": len(status.get("errors", [])) / max(1, status.get("error_window", 100)),
+        "response_time_ms": status.get("response_time_ms", 0.0),
+        "queue_length": status.get("queue_length", 0),
+        "throughput": status.get("throughput", 0.0),
+        "active_connections": status.get("active_connections", 0),
+    }
+
+
+def detect_anomalies_all_agents(agent_statuses: dict[str, dict[str, Any]], detector: AnomalyDetector | None = None) -> dict[str, dict[str, Any]]:
+    """Detect anomalies for all agents."""
+    detector = detector or get_detector()
+    detections = detector.detect_batch({name: _status_to_metrics(status) for name, status in agent_statuses.items()})
+
+    for agent_name, detection in detections.items():
         # Alert if anomaly detected
         if detection.get("is_anomaly") and detection.get("confidence", 0) > 0.7:
             message = (
@@ -338,7 +511,7 @@ def main() -> None:
         flush=True,
     )
 
-    detector = AnomalyDetector()
+    detector = get_detector()
 
     check_interval = int(os.getenv("ANOMALY_CHECK_INTERVAL", "60"))  # Every minute
 
@@ -347,6 +520,7 @@ def main() -> None:
             # This would be called by self-healing agent with agent statuses
             # For standalone mode, we'd need to collect agent statuses
             time.sleep(check_interval)
+            detector.save_normal_behavior()
         except Exception as e:
             print(f"[anomaly_detector] Error in main loop: {e}", flush=True)
             time.sleep(60)
@@ -354,4 +528,3 @@ def main() -> None:
 
 if __name__ == "__main__":
     main()
-
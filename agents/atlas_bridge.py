@@ -15,6 +15,13 @@ from typing import Any
 
 import requests
 
+try:
+    from utils.state_bus import get_state_bus
+
+    HAS_STATE_BUS = True
+except ImportError:
+    HAS_STATE_BUS = False
+
 ROOT = Path(os.path.expanduser("~/neolight"))
 RUNTIME = ROOT / "runtime"
 STATE = ROOT / "state"
@@ -35,6 +42,8 @@ UPDATE_INTERVAL = int(os.getenv("ATLAS_BRIDGE_INTERVAL", "30"))
 
 def fetch_orchestrator_state() -> dict[str, Any] | None:
     """Fetch current brain state from orchestrator outputs."""
+    if HAS_STATE_BUS:
+        return get_state_bus(ROOT).latest("brain")
     try:
         brain_file = RUNTIME / "atlas_brain.json"
         if brain_file.exists():
@@ -46,6 +55,8 @@ def fetch_orchestrator_state() -> dict[str, Any] | None:
 
 def fetch_allocations() -> dict[str, Any] | None:
     """Fetch current allocations from weights_bridge."""
+    if HAS_STATE_BUS:
+        return get_state_bus(ROOT).latest("allocations")
     try:
         alloc_file = RUNTIME / "allocations_override.json"
         if alloc_file.exists():
@@ -107,20 +118,39 @@ def create_telemetry_snapshot() -> None:
         traceback.print_exc()
 
 
+def wait_for_change(timeout: float) -> None:
+    """Sleep until the brain/allocations topics change, or `timeout` seconds."""
+    if HAS_STATE_BUS:
+        bus = get_state_bus(ROOT)
+        if bus.connected:
+            bus.wait_for_update(timeout)
+            return
+    time.sleep(timeout)
+
+
 def main() -> None:
-    """Main bridge loop: fetch orchestrator data, push to dashboard, create snapshots."""
+    """Main bridge loop: fetch orchestrator data, push to dashboard, create snapshots.
+
+    With the state bus the loop wakes on brain/allocation updates and pushes
+    only when they changed (or every UPDATE_INTERVAL as a heartbeat).
+    """
     print(
         f"[atlas_bridge] Starting bridge loop @ {datetime.now(UTC).isoformat()}Z; interval={UPDATE_INTERVAL}s",
         flush=True,
     )
 
-    snapshot_counter = 0
+    last_pushed = None
+    last_push_at = 0.0
+    last_snapshot_at = time.monotonic()
     while True:
         try:
             brain = fetch_orchestrator_state()
             allocs = fetch_allocations()
+            now = time.monotonic()
 
-            if brain or allocs:
+            if (brain or allocs) and (
+                (brain, allocs) != last_pushed or now - last_push_at >= UPDATE_INTERVAL
+            ):
                 bridge_data = {
                     "brain": brain,
                     "allocations": allocs,
@@ -129,14 +159,14 @@ def main() -> None:
 
                 # Push to dashboard
                 push_to_dashboard(bridge_data)
+                last_pushed, last_push_at = (brain, allocs), now
 
-                # Create snapshot every 10 cycles (~5 minutes at 30s interval)
-                snapshot_counter += 1
-                if snapshot_counter >= 10:
+                # Snapshot every 10 intervals (~5 minutes at 30s interval)
+                if now - last_snapshot_at >= 10 * UPDATE_INTERVAL:
                     create_telemetry_snapshot()
-                    snapshot_counter = 0
+                    last_snapshot_at = now
 
-            time.sleep(UPDATE_INTERVAL)
+            wait_for_change(UPDATE_INTERVAL)
 
         except KeyboardInterrupt:
             print("[atlas_bridge] Shutting down gracefully...", flush=True)
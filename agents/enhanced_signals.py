@@ -6,12 +6,14 @@ World-class multi-indicator signal generation:
 - RSI, MACD, EMA crossover, Bollinger Bands, Momentum
 - Ensemble prediction with confidence scoring
 - Multi-timeframe analysis
-- Pattern Recognition (candlestick patterns, chart patterns)
+- Pattern Recognition (candlestick patterns, chart patterns) via the
+  vectorized analytics.pattern_engine, also usable across a whole universe
 - ML Signal Integration (connects to ML pipeline for predictions)
 """
 
 import logging
 import os
+import sys
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
@@ -33,6 +35,22 @@ except ImportError:
     HAS_TALIB = False
     print("⚠️  Install TA-Lib: pip install TA-Lib (or use conda install -c conda-forge ta-lib)")
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+if HAS_NUMPY:
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    from analytics.pattern_engine import (
+        CHART_WINDOW,
+        PatternEngine,
+        candlestick_masks,
+        candlestick_summary,
+        chart_masks,
+        chart_summary,
+    )
+
 # Setup paths
 ROOT = Path(os.path.expanduser("~/neolight"))
 LOGS = ROOT / "logs"
@@ -142,21 +160,18 @@ class EnhancedSignalGenerator:
             return np.full(len(prices), 50.0)
 
         rsi = np.full(len(prices), 50.0)
-        deltas = np.diff(prices)
-
-        for i in range(period, len(prices)):
-            gains = deltas[i - period : i][deltas[i - period : i] > 0]
-            losses = -deltas[i - period : i][deltas[i - period : i] < 0]
+        # Row j holds the `period` price changes before bar j + period
+        windows = sliding_window_view(np.diff(prices), period)[: len(prices) - period]
+        up, down = windows > 0, windows < 0
 
-            avg_gain = np.mean(gains) if len(gains) > 0 else 0
-            avg_loss = np.mean(losses) if len(losses) > 0 else 0
-
-            if avg_loss == 0:
-                rsi[i] = 100.0
-            else:
-                rs = avg_gain / avg_loss
-                rsi[i] = 100.0 - (100.0 / (1.0 + rs))
+        # Mean of the gains (losses) among the changes that are gains (losses)
+        avg_gain = np.where(up, windows, 0).sum(axis=1) / np.maximum(up.sum(axis=1), 1)
+        avg_loss = -np.where(down, windows, 0).sum(axis=1) / np.maximum(down.sum(axis=1), 1)
 
+        with np.errstate(divide="ignore"):
+            rsi[period:] = np.where(
+                avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+            )
         return rsi
 
     def _calculate_macd_manual(
@@ -202,9 +217,7 @@ class EnhancedSignalGenerator:
             return None
 
         sma = np.zeros(len(prices))
-        for i in range(period - 1, len(prices)):
-            sma[i] = np.mean(prices[i - period + 1 : i + 1])
-
+        sma[period - 1 :] = sliding_window_view(prices, period).mean(axis=1)
         return sma
 
     def _calculate_bollinger_manual(
@@ -229,10 +242,9 @@ class EnhancedSignalGenerator:
         upper = np.zeros(len(prices))
         lower = np.zeros(len(prices))
 
-        for i in range(period - 1, len(prices)):
-            std = np.std(prices[i - period + 1 : i + 1])
-            upper[i] = sma[i] + (std_dev * std)
-            lower[i] = sma[i] - (std_dev * std)
+        std = sliding_window_view(prices, period).std(axis=1)
+        upper[period - 1 :] = sma[period - 1 :] + (std_dev * std)
+        lower[period - 1 :] = sma[period - 1 :] - (std_dev * std)
 
         return upper, sma, lower
 
@@ -242,24 +254,11 @@ class EnhancedSignalGenerator:
             return np.zeros(len(prices))
 
         momentum = np.zeros(len(prices))
-        for i in range(period, len(prices)):
-            momentum[i] = (prices[i] - prices[i - period]) / prices[i - period]
-
+        momentum[period:] = (prices[period:] - prices[:-period]) / prices[:-period]
         return momentum
 
-    def detect_candlestick_patterns(self) -> dict[str, Any]:
-        """
-        Detect common candlestick patterns - Enhanced World-Class Implementation.
-        Returns pattern name and signal strength.
-        Supports: Hammer, Doji, Engulfing, Morning Star, Evening Star, Three White Soldiers, Three Black Crows
-        """
-        if len(self.close) < 3:
-            return {"pattern": None, "signal": "HOLD", "confidence": 0.0}
-
-        patterns = []
-        confidence = 0.0
-
-        # Get OHLC data if available, otherwise estimate from Close
+    def _ohlc(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, bool]:
+        """OHLC arrays, estimated from Close when only closes are available."""
         has_ohlc = all(col in self.price_data.columns for col in ["Open", "High", "Low", "Close"])
 
         if has_ohlc:
@@ -274,253 +273,33 @@ class EnhancedSignalGenerator:
             highs = closes * 1.002  # Estimate: high slightly above close
             lows = closes * 0.998  # Estimate: low slightly below close
 
-        if len(closes) >= 3:
-            # Hammer pattern (reversal - bullish)
-            last_low = lows[-1] if len(lows) > 0 else closes[-1]
-            last_high = highs[-1] if len(highs) > 0 else closes[-1]
-            last_open = opens[-1] if len(opens) > 0 else closes[-1]
-            last_close = closes[-1]
-
-            body = abs(last_close - last_open)
-            lower_shadow = min(last_open, last_close) - last_low
-            upper_shadow = last_high - max(last_open, last_close)
-
-            if lower_shadow > body * 2 and upper_shadow < body * 0.5:
-                patterns.append("Hammer")
-                confidence += 0.4
-
-            # Doji pattern (indecision)
-            if body < (last_high - last_low) * 0.1:
-                patterns.append("Doji")
-                confidence += 0.2
-
-            # Engulfing patterns
-            if len(closes) >= 2:
-                prev_open = opens[-2] if len(opens) >= 2 else closes[-2]
-                prev_close = closes[-2]
-
-                # Bullish Engulfing
-                if (
-                    prev_close < prev_open  # Previous bearish
-                    and last_close > last_open  # Current bullish
-                    and last_open < prev_close  # Gaps down
-                    and last_close > prev_open
-                ):  # Engulfs previous
-                    patterns.append("Bullish Engulfing")
-                    confidence += 0.5
-
-                # Bearish Engulfing
-                elif (
-                    prev_close > prev_open  # Previous bullish
-                    and last_close < last_open  # Current bearish
-                    and last_open > prev_close  # Gaps up
-                    and last_close < prev_open
-                ):  # Engulfs previous
-                    patterns.append("Bearish Engulfing")
-                    confidence += 0.5
-
-        # Three White Soldiers (strong bullish)
-        if len(closes) >= 3:
-            if (
-                closes[-3] < closes[-2] < closes[-1]
-                and opens[-2] > closes[-3]
-                and opens[-1] > closes[-2]
-            ):
-                patterns.append("Three White Soldiers")
-                confidence += 0.6
-
-        # Three Black Crows (strong bearish)
-        if len(closes) >= 3:
-            if (
-                closes[-3] > closes[-2] > closes[-1]
-                and opens[-2] < closes[-3]
-                and opens[-1] < closes[-2]
-            ):
-                patterns.append("Three Black Crows")
-                confidence += 0.6
-
-        # Morning Star (bullish reversal)
-        if len(closes) >= 3 and has_ohlc:
-            if (
-                closes[-3] < opens[-3]  # First candle bearish
-                and closes[-2] < closes[-3]  # Second candle gaps down
-                and closes[-1] > (opens[-3] + closes[-3]) / 2
-            ):  # Third candle strong bullish
-                patterns.append("Morning Star")
-                confidence += 0.7
-
-        # Evening Star (bearish reversal)
-        if len(closes) >= 3 and has_ohlc:
-            if (
-                closes[-3] > opens[-3]  # First candle bullish
-                and closes[-2] > closes[-3]  # Second candle gaps up
-                and closes[-1] < (opens[-3] + closes[-3]) / 2
-            ):  # Third candle strong bearish
-                patterns.append("Evening Star")
-                confidence += 0.7
-
-        # Determine signal from patterns
-        signal = "HOLD"
-        bullish_patterns = ["Hammer", "Bullish Engulfing", "Three White Soldiers", "Morning Star"]
-        bearish_patterns = ["Bearish Engulfing", "Three Black Crows", "Evening Star"]
-
-        if any(p in patterns for p in bullish_patterns):
-            signal = "BUY"
-        elif any(p in patterns for p in bearish_patterns):
-            signal = "SELL"
+        return opens, highs, lows, closes, has_ohlc
 
-        return {
-            "pattern": patterns[0] if patterns else None,
-            "patterns": patterns,
-            "signal": signal,
-            "confidence": min(confidence, 1.0),
-            "pattern_count": len(patterns),
-        }
+    def detect_candlestick_patterns(self) -> dict[str, Any]:
+        """
+        Detect common candlestick patterns on the latest bar.
+        Returns pattern name and signal strength.
+        Supports: Hammer, Doji, Engulfing, Harami, Morning Star, Evening Star,
+        Three White Soldiers, Three Black Crows (see analytics.pattern_engine)
+        """
+        if len(self.close) < 3:
+            return {"pattern": None, "signal": "HOLD", "confidence": 0.0}
+
+        opens, highs, lows, closes, has_ohlc = self._ohlc()
+        masks = candlestick_masks(opens[-3:], highs[-3:], lows[-3:], closes[-3:], has_ohlc)
+        return candlestick_summary(masks)
 
     def detect_chart_patterns(self) -> dict[str, Any]:
         """
-        Detect chart patterns - Enhanced World-Class Implementation.
-        Supports: Head and Shoulders, Triangles, Double Tops/Bottoms, Flags, Pennants
+        Detect chart patterns over the last 50 bars (fewer if that is all there is).
+        Supports: Head and Shoulders (and inverse), Triangles, Double Tops/Bottoms, Flags
         """
         if len(self.close) < 20:
             return {"pattern": None, "signal": "HOLD", "confidence": 0.0}
 
-        recent_prices = self.close[-50:] if len(self.close) >= 50 else self.close
-        patterns_detected = []
-        confidence = 0.0
-
-        # Trend detection
-        trend = "SIDEWAYS"
-        if len(recent_prices) >= 10:
-            first_half = np.mean(recent_prices[: len(recent_prices) // 2])
-            second_half = np.mean(recent_prices[len(recent_prices) // 2 :])
-
-            if second_half > first_half * 1.02:
-                trend = "UPTREND"
-            elif second_half < first_half * 0.98:
-                trend = "DOWNTREND"
-
-        # Detect support/resistance levels
-        support = float(np.min(recent_prices))
-        resistance = float(np.max(recent_prices))
-        current = float(self.close[-1])
-
-        # Head and Shoulders detection (bearish reversal)
-        if len(recent_prices) >= 20:
-            # Look for three peaks: left shoulder, head, right shoulder
-            peaks = []
-            for i in range(1, len(recent_prices) - 1):
-                if (
-                    recent_prices[i] > recent_prices[i - 1]
-                    and recent_prices[i] > recent_prices[i + 1]
-                ):
-                    peaks.append((i, recent_prices[i]))
-
-            if len(peaks) >= 3:
-                # Check if middle peak is highest (head)
-                peaks_sorted = sorted(peaks, key=lambda x: x[1], reverse=True)
-                if len(peaks_sorted) >= 3:
-                    head_idx = peaks_sorted[0][0]
-                    left_shoulder = peaks_sorted[1] if peaks_sorted[1][0] < head_idx else None
-                    right_shoulder = peaks_sorted[2] if peaks_sorted[2][0] > head_idx else None
-
-                    if left_shoulder and right_shoulder:
-                        # Check if shoulders are similar height
-                        shoulder_diff = abs(left_shoulder[1] - right_shoulder[1]) / left_shoulder[1]
-                        if shoulder_diff < 0.05:  # Within 5%
-                            patterns_detected.append("Head and Shoulders")
-                            confidence += 0.6
-
-        # Double Top detection (bearish)
-        if len(peaks) >= 2:
-            top1, top2 = peaks[-2], peaks[-1]
-            price_diff = abs(top1[1] - top2[1]) / top1[1]
-            if price_diff < 0.02:  # Within 2%
-                patterns_detected.append("Double Top")
-                confidence += 0.5
-
-        # Double Bottom detection (bullish)
-        if len(recent_prices) >= 10:
-            troughs = []
-            for i in range(1, len(recent_prices) - 1):
-                if (
-                    recent_prices[i] < recent_prices[i - 1]
-                    and recent_prices[i] < recent_prices[i + 1]
-                ):
-                    troughs.append((i, recent_prices[i]))
-
-            if len(troughs) >= 2:
-                bottom1, bottom2 = troughs[-2], troughs[-1]
-                price_diff = abs(bottom1[1] - bottom2[1]) / bottom1[1]
-                if price_diff < 0.02:  # Within 2%
-                    patterns_detected.append("Double Bottom")
-                    confidence += 0.5
-
-        # Triangle pattern detection (ascending, descending, symmetrical)
-        if len(recent_prices) >= 15:
-            # Calculate volatility compression
-            early_vol = np.std(recent_prices[: len(recent_prices) // 3])
-            late_vol = np.std(recent_prices[-len(recent_prices) // 3 :])
-
-            if late_vol < early_vol * 0.7:  # Volatility compression
-                # Check for converging trendlines
-                early_high = np.max(recent_prices[: len(recent_prices) // 3])
-                late_high = np.max(recent_prices[-len(recent_prices) // 3 :])
-                early_low = np.min(recent_prices[: len(recent_prices) // 3])
-                late_low = np.min(recent_prices[-len(recent_prices) // 3 :])
-
-                high_slope = (late_high - early_high) / len(recent_prices)
-                low_slope = (late_low - early_low) / len(recent_prices)
-
-                if abs(high_slope) < 0.001 and abs(low_slope) < 0.001:
-                    patterns_detected.append("Symmetrical Triangle")
-                    confidence += 0.4
-                elif high_slope < 0 and low_slope > 0:
-                    patterns_detected.append("Ascending Triangle")
-                    confidence += 0.5
-                elif high_slope < 0 and low_slope < 0:
-                    patterns_detected.append("Descending Triangle")
-                    confidence += 0.5
-
-        # Flag/Pennant detection (continuation patterns)
-        if len(recent_prices) >= 10:
-            # Look for sharp move followed by consolidation
-            early_range = np.max(recent_prices[:5]) - np.min(recent_prices[:5])
-            late_range = np.max(recent_prices[-5:]) - np.min(recent_prices[-5:])
-
-            if early_range > late_range * 2:  # Consolidation after move
-                if trend == "UPTREND":
-                    patterns_detected.append("Bull Flag")
-                    confidence += 0.4
-                elif trend == "DOWNTREND":
-                    patterns_detected.append("Bear Flag")
-                    confidence += 0.4
-
-        # Determine signal from patterns
-        signal = "HOLD"
-        bullish_patterns = ["Double Bottom", "Ascending Triangle", "Bull Flag"]
-        bearish_patterns = ["Head and Shoulders", "Double Top", "Descending Triangle", "Bear Flag"]
-
-        if any(p in patterns_detected for p in bullish_patterns):
-            signal = "BUY"
-        elif any(p in patterns_detected for p in bearish_patterns):
-            signal = "SELL"
-        elif trend == "UPTREND" and current < support * 1.05:
-            signal = "BUY"  # Near support in uptrend
-            confidence += 0.3
-        elif trend == "DOWNTREND" and current > resistance * 0.95:
-            signal = "SELL"  # Near resistance in downtrend
-            confidence += 0.3
-
-        return {
-            "pattern": patterns_detected[0] if patterns_detected else trend,
-            "patterns": patterns_detected + [trend] if trend != "SIDEWAYS" else patterns_detected,
-            "signal": signal,
-            "confidence": min(confidence, 1.0),
-            "support": support,
-            "resistance": resistance,
-            "trend": trend,
-        }
+        window = min(CHART_WINDOW, len(self.close))
+        recent_prices = self.close[-window:]
+        return chart_summary(chart_masks(recent_prices, window), recent_prices)
 
     def get_ml_signal(self, symbol: str | None = None) -> dict[str, Any]:
         """
@@ -741,6 +520,29 @@ class EnhancedSignalGenerator:
         return result
 
 
+_pattern_engine: PatternEngine | None = None
+
+
+def scan_universe_patterns(frames: dict[str, pd.DataFrame]) -> dict[str, dict[str, Any]]:
+    """
+    Candlestick and chart patterns on the latest bar of every symbol at once.
+
+    Uses one shared PatternEngine, so repeated scans of the same universe
+    only evaluate bars added since the previous scan.
+
+    Args:
+        frames: Symbol -> DataFrame with Open/High/Low/Close columns
+
+    Returns:
+        Symbol -> {"candlestick": ..., "chart": ...} in the format of
+        detect_candlestick_patterns() / detect_chart_patterns()
+    """
+    global _pattern_engine
+    if _pattern_engine is None:
+        _pattern_engine = PatternEngine()
+    return _pattern_engine.scan_frames(frames)
+
+
 # Example usage
 if __name__ == "__main__":
     logger.info("🧪 Testing Enhanced Signal Generator...")
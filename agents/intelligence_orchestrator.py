@@ -25,6 +25,13 @@ LOGS.mkdir(parents=True, exist_ok=True)
 
 INTERVAL_SECONDS = int(os.getenv("NEOLIGHT_ORCH_INTERVAL", "300"))
 
+try:
+    from utils.state_bus import get_state_bus
+
+    HAS_STATE_BUS = True
+except ImportError:
+    HAS_STATE_BUS = False
+
 
 def update_brain_once() -> dict:
     brain = {
@@ -32,7 +39,11 @@ def update_brain_once() -> dict:
         "confidence": round(random.uniform(0.05, 0.9), 3),
         "updated": dt.datetime.utcnow().isoformat() + "Z",
     }
-    (RUNTIME / "atlas_brain.json").write_text(json.dumps(brain, indent=2))
+    if HAS_STATE_BUS:
+        # Subscribers get it immediately; the bus also exports runtime/atlas_brain.json
+        get_state_bus(ROOT_PATH).publish("brain", brain)
+    else:
+        (RUNTIME / "atlas_brain.json").write_text(json.dumps(brain, indent=2))
     # lightweight summary for dashboard/diagnostics
     summary = {
         "ts": brain["updated"],
@@ -3,10 +3,19 @@
 Market Intelligence Agent - World-Class Multi-Source Research
 Aggregates data from Reddit, Twitter, Financial News, Fed, Telegram, and more
 Feeds signals to trading agent for informed decisions
+
+Sources are collected by the sentiment engine (analytics/sentiment_engine.py):
+concurrently within per-source rate limits, cached per source and symbol,
+with Twitter and news queried for batches of symbols and the Fed/Telegram
+feeds fetched once per refresh.
 """
 
+import functools
 import json
 import os
+import re
+import sys
+import threading
 import time
 import traceback
 from datetime import UTC, datetime
@@ -15,10 +24,17 @@ from typing import Any
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
 except ImportError:
     requests = None
     print("[market_intelligence] Install requests: pip install requests")
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from analytics.sentiment_engine import GLOBAL, SentimentEngine, SentimentSource  # noqa: E402
+
 # Detect Render environment - use Render paths if in cloud
 RENDER_MODE = os.getenv("RENDER_MODE", "false").lower() == "true"
 
@@ -33,6 +49,7 @@ DATA = ROOT / "data"
 LOGS = ROOT / "logs"
 
 INTELLIGENCE_FILE = STATE / "market_intelligence.json"
+SENTIMENT_CACHE_FILE = RUNTIME / "sentiment_cache.json"
 
 # API Keys (env-driven)
 TWITTER_BEARER = os.getenv("TWITTER_BEARER_TOKEN", "")
@@ -42,6 +59,113 @@ NEWS_API_KEY = os.getenv("NEWS_API_KEY", "")
 ALPHA_VANTAGE_KEY = os.getenv("ALPHA_VANTAGE_API_KEY", "")
 FRED_API_KEY = os.getenv("FRED_API_KEY", "")  # Federal Reserve Economic Data
 
+REDDIT_AUTH_URL = "https://www.reddit.com/api/v1/access_token"
+REDDIT_API_URL = "https://oauth.reddit.com"
+TWITTER_API_URL = "https://api.twitter.com/2"
+NEWS_API_URL = "https://newsapi.org/v2"
+FRED_API_URL = "https://api.stlouisfed.org/fred"
+
+TWITTER_POSITIVE = ["buy", "bull", "moon", "pump", "gains", "profit"]
+TWITTER_NEGATIVE = ["sell", "bear", "crash", "dump", "loss", "drop"]
+NEWS_POSITIVE = ["up", "surge", "gain", "rise", "bull", "growth"]
+NEWS_NEGATIVE = ["down", "fall", "drop", "bear", "decline", "loss"]
+
+_session = None
+_session_lock = threading.Lock()
+_reddit_lock = threading.Lock()
+_reddit_token: tuple[str, float] | None = None  # (token, expiry)
+_engine: SentimentEngine | None = None
+
+
+def _http():
+    """Shared pooled session so concurrent source calls reuse connections."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def _reddit_auth() -> str | None:
+    """OAuth app token, reused until shortly before it expires."""
+    global _reddit_token
+    # Held across the request so concurrent searches share one token fetch
+    with _reddit_lock:
+        if _reddit_token and _reddit_token[1] > time.time():
+            return _reddit_token[0]
+        res = _http().post(
+            REDDIT_AUTH_URL,
+            auth=requests.auth.HTTPBasicAuth(REDDIT_CLIENT_ID, REDDIT_SECRET),
+            data={"grant_type": "client_credentials"},
+            headers={"User-Agent": "NeoLight/1.0"},
+            timeout=10,
+        )
+        payload = res.json()
+        token = payload.get("access_token")
+        if token:
+            _reddit_token = (token, time.time() + float(payload.get("expires_in", 3600)) - 60)
+        return token
+
+
+@functools.lru_cache(maxsize=512)
+def _mention_pattern(symbol: str) -> re.Pattern[str]:
+    """
+    Ways a symbol is written in posts: BTC-USD as "BTC-USD", "BTC/USD",
+    "$btc" or "BTC"; AAPL as "AAPL" or "$aapl". Bare tickers must be upper
+    case and at least three letters, so "ON" or "A" only match as cashtags.
+    """
+    base, _, quote = symbol.upper().replace("/", "-").partition("-")
+    ticker = re.escape(base)
+    aliases = [rf"(?i:\${ticker})"]
+    if quote:
+        aliases.insert(0, rf"(?i:{ticker}[-/]?{re.escape(quote)})")
+    if len(base) >= 3:
+        aliases.append(ticker)
+    return re.compile(rf"(?<![\w$])(?:{'|'.join(aliases)})(?!\w)")
+
+
+def _mentions(text: str | None, symbol: str) -> bool:
+    return bool(text) and _mention_pattern(symbol).search(text) is not None
+
+
+def _score_tweets(tweets: list[dict[str, Any]]) -> dict[str, Any] | None:
+    """Keyword sentiment over tweets."""
+    if not tweets:
+        return None
+    texts = [t.get("text", "").lower() for t in tweets]
+    positive = sum(1 for text in texts if any(kw in text for kw in TWITTER_POSITIVE))
+    negative = sum(1 for text in texts if any(kw in text for kw in TWITTER_NEGATIVE))
+    return {
+        "tweets": len(tweets),
+        "sentiment_score": (positive - negative) / len(tweets),
+        "positive": positive,
+        "negative": negative,
+    }
+
+
+def _score_articles(articles: list[dict[str, Any]]) -> dict[str, Any] | None:
+    """Keyword sentiment over the five latest headlines."""
+    sentiments = []
+    for article in articles[:5]:
+        title = (article.get("title") or "").lower()
+        pos = sum(1 for kw in NEWS_POSITIVE if kw in title)
+        neg = sum(1 for kw in NEWS_NEGATIVE if kw in title)
+        sentiments.append(1.0 if pos > neg else (-1.0 if neg > pos else 0.0))
+    if not sentiments:
+        return None
+    return {
+        "articles": len(articles),
+        "sentiment_score": sum(sentiments) / len(sentiments),
+        "latest_headlines": [a.get("title") for a in articles[:3]],
+    }
+
+
+def _or_query(symbols: list[str]) -> str:
+    return " OR ".join(f'"{symbol}"' for symbol in symbols)
+
 
 def fetch_reddit_sentiment(symbol: str) -> dict[str, Any] | None:
     """Fetch Reddit sentiment for symbol (r/wallstreetbets, r/investing, r/stocks)."""
@@ -52,39 +176,23 @@ def fetch_reddit_sentiment(symbol: str) -> dict[str, Any] | None:
         return None
 
     try:
-        # Reddit API OAuth
-        auth = requests.auth.HTTPBasicAuth(REDDIT_CLIENT_ID, REDDIT_SECRET)
-        data = {"grant_type": "client_credentials"}
-        headers = {"User-Agent": "NeoLight/1.0"}
-        res = requests.post(
-            "https://www.reddit.com/api/v1/access_token",
-            auth=auth,
-            data=data,
-            headers=headers,
-            timeout=10,
-        )
-        token = res.json().get("access_token")
-
+        token = _reddit_auth()
         if not token:
             return None
 
-        # Search Reddit for symbol mentions
+        # One search across the subreddits, at most 10 posts as before (5 from each of 2)
         headers = {"Authorization": f"bearer {token}", "User-Agent": "NeoLight/1.0"}
         subreddits = ["wallstreetbets", "investing", "stocks", "StockMarket", "cryptocurrency"]
         mentions = 0
         upvotes = 0
 
-        for sub in subreddits[:2]:  # Limit to avoid rate limits
-            try:
-                url = f"https://oauth.reddit.com/r/{sub}/search.json?q={symbol}&limit=5"
-                res = requests.get(url, headers=headers, timeout=10)
-                if res.status_code == 200:
-                    data = res.json()
-                    for post in data.get("data", {}).get("children", [])[:5]:
-                        mentions += 1
-                        upvotes += post.get("data", {}).get("ups", 0)
-            except:
-                continue
+        url = f"{REDDIT_API_URL}/r/{'+'.join(subreddits[:2])}/search.json"
+        params = {"q": symbol, "restrict_sr": "on", "limit": 10}
+        res = _http().get(url, params=params, headers=headers, timeout=10)
+        if res.status_code == 200:
+            for post in res.json().get("data", {}).get("children", [])[:10]:
+                mentions += 1
+                upvotes += post.get("data", {}).get("ups", 0)
 
         if mentions > 0:
             return {
@@ -109,40 +217,47 @@ def fetch_twitter_sentiment(symbol: str) -> dict[str, Any] | None:
     try:
         # Twitter API v2 search
         headers = {"Authorization": f"Bearer {TWITTER_BEARER}"}
-        url = f"https://api.twitter.com/2/tweets/search/recent?query={symbol}&max_results=10"
-        res = requests.get(url, headers=headers, timeout=10)
+        url = f"{TWITTER_API_URL}/tweets/search/recent"
+        res = _http().get(
+            url, params={"query": symbol, "max_results": 10}, headers=headers, timeout=10
+        )
 
         if res.status_code == 200:
-            data = res.json()
-            tweets = data.get("data", [])
+            return _score_tweets(res.json().get("data", []))
+    except Exception:
+        pass
 
-            # Simple sentiment: count positive keywords
-            positive_keywords = ["buy", "bull", "moon", "pump", "gains", "profit"]
-            negative_keywords = ["sell", "bear", "crash", "dump", "loss", "drop"]
+    return None
 
-            positive = sum(
-                1
-                for t in tweets
-                if any(kw in t.get("text", "").lower() for kw in positive_keywords)
-            )
-            negative = sum(
-                1
-                for t in tweets
-                if any(kw in t.get("text", "").lower() for kw in negative_keywords)
-            )
 
-            if len(tweets) > 0:
-                sentiment = (positive - negative) / len(tweets)
-                return {
-                    "tweets": len(tweets),
-                    "sentiment_score": sentiment,
-                    "positive": positive,
-                    "negative": negative,
-                }
+def fetch_twitter_sentiment_batch(symbols: list[str]) -> dict[str, dict[str, Any] | None]:
+    """
+    Twitter/X sentiment for several symbols from one OR query, split by
+    mention; symbols without a matching tweet are queried on their own.
+    """
+    if not TWITTER_BEARER or not requests or not symbols:
+        return {}
+
+    try:
+        headers = {"Authorization": f"Bearer {TWITTER_BEARER}"}
+        params = {"query": _or_query(symbols), "max_results": min(100, 10 * len(symbols))}
+        url = f"{TWITTER_API_URL}/tweets/search/recent"
+        res = _http().get(url, params=params, headers=headers, timeout=10)
+
+        if res.status_code == 200:
+            tweets = res.json().get("data", [])
+            results = {
+                symbol: _score_tweets([t for t in tweets if _mentions(t.get("text"), symbol)])
+                for symbol in symbols
+            }
+            # Crowded out of the capped result set, or written in a form not matched
+            for symbol in [s for s, result in results.items() if result is None]:
+                results[symbol] = fetch_twitter_sentiment(symbol)
+            return results
     except Exception:
         pass
 
-    return None
+    return {}
 
 
 def fetch_news_sentiment(symbol: str) -> dict[str, Any] | None:
@@ -154,35 +269,56 @@ def fetch_news_sentiment(symbol: str) -> dict[str, Any] | None:
         return None
 
     try:
-        url = f"https://newsapi.org/v2/everything?q={symbol}&apiKey={NEWS_API_KEY}&sortBy=publishedAt&pageSize=10"
-        res = requests.get(url, timeout=10)
+        url = f"{NEWS_API_URL}/everything"
+        params = {"q": symbol, "apiKey": NEWS_API_KEY, "sortBy": "publishedAt", "pageSize": 10}
+        res = _http().get(url, params=params, timeout=10)
 
         if res.status_code == 200:
-            data = res.json()
-            articles = data.get("articles", [])
+            return _score_articles(res.json().get("articles", []))
+    except Exception:
+        pass
 
-            # Simple sentiment analysis
-            positive_keywords = ["up", "surge", "gain", "rise", "bull", "growth"]
-            negative_keywords = ["down", "fall", "drop", "bear", "decline", "loss"]
+    return None
 
-            sentiments = []
-            for article in articles[:5]:
-                title = article.get("title", "").lower()
-                pos = sum(1 for kw in positive_keywords if kw in title)
-                neg = sum(1 for kw in negative_keywords if kw in title)
-                sentiments.append(1.0 if pos > neg else (-1.0 if neg > pos else 0.0))
 
-            if sentiments:
-                avg_sentiment = sum(sentiments) / len(sentiments)
-                return {
-                    "articles": len(articles),
-                    "sentiment_score": avg_sentiment,
-                    "latest_headlines": [a.get("title") for a in articles[:3]],
-                }
+def fetch_news_sentiment_batch(symbols: list[str]) -> dict[str, dict[str, Any] | None]:
+    """
+    News sentiment for several symbols from one OR query, split by mention;
+    symbols without a matching article are queried on their own.
+    """
+    if not NEWS_API_KEY or not requests or not symbols:
+        return {}
+
+    try:
+        url = f"{NEWS_API_URL}/everything"
+        params = {
+            "q": _or_query(symbols),
+            "apiKey": NEWS_API_KEY,
+            "sortBy": "publishedAt",
+            "pageSize": min(100, 10 * len(symbols)),
+        }
+        res = _http().get(url, params=params, timeout=10)
+
+        if res.status_code == 200:
+            articles = res.json().get("articles", [])
+            results = {
+                symbol: _score_articles(
+                    [
+                        a
+                        for a in articles
+                        if _mentions(a.get("title"), symbol)
+                        or _mentions(a.get("description"), symbol)
+                    ]
+                )
+                for symbol in symbols
+            }
+            for symbol in [s for s, result in results.items() if result is None]:
+                results[symbol] = fetch_news_sentiment(symbol)
+            return results
     except Exception:
         pass
 
-    return None
+    return {}
 
 
 def fetch_fed_data() -> dict[str, Any] | None:
@@ -195,8 +331,15 @@ def fetch_fed_data() -> dict[str, Any] | None:
 
     try:
         # Get latest Fed Funds Rate
-        url = f"https://api.stlouisfed.org/fred/series/observations?series_id=FEDFUNDS&api_key={FRED_API_KEY}&file_type=json&limit=1&sort_order=desc"
-        res = requests.get(url, timeout=10)
+        url = f"{FRED_API_URL}/series/observations"
+        params = {
+            "series_id": "FEDFUNDS",
+            "api_key": FRED_API_KEY,
+            "file_type": "json",
+            "limit": 1,
+            "sort_order": "desc",
+        }
+        res = _http().get(url, params=params, timeout=10)
 
         if res.status_code == 200:
             data = res.json()
@@ -222,25 +365,59 @@ def fetch_telegram_signals() -> dict[str, Any] | None:
     return None
 
 
-def aggregate_intelligence(symbols: list[str]) -> dict[str, Any]:
+def default_sources() -> list[SentimentSource]:
+    """Sources with their documented rate limits and how long their data stays current."""
+    return [
+        # OAuth apps: 60 requests/minute
+        SentimentSource("reddit", fetch_reddit_sentiment, rate=1.0, burst=10, concurrency=4),
+        # App-auth recent search: 450 requests/15 minutes
+        SentimentSource(
+            "twitter",
+            fetch_twitter_sentiment_batch,
+            scope="batch",
+            rate=0.5,
+            burst=5,
+            concurrency=2,
+        ),
+        SentimentSource(
+            "news", fetch_news_sentiment_batch, scope="batch", ttl=3600, rate=1.0, concurrency=2
+        ),
+        # Monthly series; the channel feed is not per symbol
+        SentimentSource("fed", fetch_fed_data, scope="global", ttl=6 * 3600),
+        SentimentSource("telegram", fetch_telegram_signals, scope="global", ttl=300),
+    ]
+
+
+def get_sentiment_engine() -> SentimentEngine:
+    """Process-wide engine, so its cache carries over between refreshes."""
+    global _engine
+    if _engine is None:
+        _engine = SentimentEngine(default_sources(), cache_path=SENTIMENT_CACHE_FILE)
+    return _engine
+
+
+def aggregate_intelligence(
+    symbols: list[str], engine: SentimentEngine | None = None
+) -> dict[str, Any]:
     """Aggregate all intelligence sources for given symbols."""
+    engine = engine or get_sentiment_engine()
+    collected = engine.collect(symbols)
+
     intelligence = {
         "timestamp": datetime.now(UTC).isoformat(),
-        "sources": {},
+        "sources": engine.last_run,
         "signals": {},
-        "fed_data": None,
+        # Fed data and Telegram signals are fetched once and apply to all symbols
+        "fed_data": collected["fed"][GLOBAL],
     }
+    telegram = collected["telegram"][GLOBAL]
 
-    # Fetch Fed data (once, applies to all symbols)
-    intelligence["fed_data"] = fetch_fed_data()
-
-    # For each symbol, aggregate sources
     for symbol in symbols:
         signals = {
-            "reddit": fetch_reddit_sentiment(symbol),
-            "twitter": fetch_twitter_sentiment(symbol),
-            "news": fetch_news_sentiment(symbol),
-            "telegram": fetch_telegram_signals(),
+            "reddit": collected["reddit"][symbol],
+            "twitter": collected["twitter"][symbol],
+            "news": collected["news"][symbol],
+            "telegram": telegram,
         }
 
         # Calculate composite sentiment
@@ -6,9 +6,11 @@ Automated feature engineering, model selection, hyperparameter tuning, ensemble
 
 import json
 import os
+import sys
 import time
 import traceback
 from datetime import UTC, datetime
+from functools import partial
 from pathlib import Path
 from typing import Any
 
@@ -20,6 +22,11 @@ except ImportError:
     np = None
     pd = None
 
+# Repo root, so analytics/ imports when this file runs as a script
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
 try:
     from sklearn.ensemble import (
         BaggingRegressor,
@@ -29,9 +36,18 @@ try:
     )
     from sklearn.linear_model import Lasso, LinearRegression, Ridge
     from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-    from sklearn.model_selection import GridSearchCV, RandomizedSearchCV, train_test_split
+    from sklearn.model_selection import GridSearchCV, train_test_split
     from sklearn.svm import SVR
 
+    from analytics.model_tuning import (
+        Evaluator,
+        FeatureCache,
+        dataset_fingerprint,
+        expand_grid,
+        fit_candidates,
+        successive_halving,
+    )
+
     sklearn_available = True
 except ImportError:
     print("[ml_pipeline] Install scikit-learn: pip install scikit-learn")
@@ -61,6 +77,37 @@ LOGS = ROOT / "logs"
 for d in [STATE, DATA, MODELS_DIR, LOGS]:
     d.mkdir(parents=True, exist_ok=True)
 
+# Processes for candidate fits and ensemble members
+ML_WORKERS = int(os.getenv("NEOLIGHT_ML_WORKERS", str(os.cpu_count() or 1)))
+
+# Hyperparameter search spaces
+PARAM_GRIDS = {
+    "random_forest": {
+        "n_estimators": [50, 100, 200],
+        "max_depth": [5, 10, 20, None],
+        "min_samples_split": [2, 5, 10],
+    },
+    "gradient_boosting": {
+        "n_estimators": [50, 100, 200],
+        "learning_rate": [0.01, 0.1, 0.2],
+        "max_depth": [3, 5, 7],
+    },
+    "xgboost": {
+        "n_estimators": [50, 100, 200],
+        "learning_rate": [0.01, 0.1, 0.2],
+        "max_depth": [3, 5, 7],
+    },
+    "ridge": {"alpha": [0.1, 1.0, 10.0, 100.0]},
+    "lasso": {"alpha": [0.1, 1.0, 10.0, 100.0]},
+}
+
+# Tuned on boosting rounds with warm starts instead of data subsets
+BOOSTED_MODELS = {"gradient_boosting", "xgboost"}
+
+NON_FEATURE_COLUMNS = ["timestamp", "equity", "pnl_pct", "date"]
+
+_dataset_cache = FeatureCache() if sklearn_available else None
+
 
 def load_historical_data() -> pd.DataFrame | None:
     """Load historical performance data."""
@@ -120,99 +167,137 @@ def engineer_features(df: pd.DataFrame) -> pd.DataFrame:
     return df.dropna()
 
 
-def train_model(
-    model_type: str = "random_forest",
-    df: pd.DataFrame | None = None,
-    hyperparams: dict[str, Any] | None = None,
-) -> dict[str, Any] | None:
-    """Train a machine learning model with optional hyperparameter tuning."""
-    if df is None or pd is None or not sklearn_available:
-        return None
+def prepare_dataset(df: pd.DataFrame) -> dict[str, Any] | None:
+    """
+    Engineered features and the 80/20 train/test split for a DataFrame.
 
-    df_eng = engineer_features(df.copy())
+    Cached per data fingerprint, so model selection, tuning and ensembles
+    on the same data engineer features and split once. Callers must not
+    modify the returned frames.
 
-    # Prepare features and target
-    feature_cols = [
-        c for c in df_eng.columns if c not in ["timestamp", "equity", "pnl_pct", "date"]
-    ]
-    if "equity" in df_eng.columns:
-        target_col = "equity"
-    else:
-        return None
+    Returns:
+        Dictionary with X, y, X_train, X_test, y_train, y_test and features,
+        or None without an equity column or with fewer than 10 rows
+    """
 
-    X = df_eng[feature_cols].select_dtypes(include=[np.number]).fillna(0)
-    y = df_eng[target_col]
+    def build() -> dict[str, Any] | None:
+        df_eng = engineer_features(df.copy())
+        if "equity" not in df_eng.columns:
+            return None
 
-    if len(X) < 10:
-        return None
+        # Prepare features and target
+        feature_cols = [c for c in df_eng.columns if c not in NON_FEATURE_COLUMNS]
+        X = df_eng[feature_cols].select_dtypes(include=[np.number]).fillna(0)
+        y = df_eng["equity"]
+        if len(X) < 10:
+            return None
+
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        return {
+            "X": X,
+            "y": y,
+            "X_train": X_train,
+            "X_test": X_test,
+            "y_train": y_train,
+            "y_test": y_test,
+            "features": list(X.columns),
+        }
 
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    return _dataset_cache.get_or_compute(dataset_fingerprint(df), build)
 
-    # Train model based on type
-    model = None
+
+def build_model(model_type: str, hyperparams: dict[str, Any] | None = None):
+    """Create an unfitted model of the given type (None if unavailable)."""
     if model_type == "random_forest":
         if hyperparams:
-            model = RandomForestRegressor(**hyperparams, random_state=42)
-        else:
-            model = RandomForestRegressor(n_estimators=100, random_state=42)
-    elif model_type == "gradient_boosting":
+            return RandomForestRegressor(**hyperparams, random_state=42)
+        return RandomForestRegressor(n_estimators=100, random_state=42)
+    if model_type == "gradient_boosting":
         if hyperparams:
-            model = GradientBoostingRegressor(**hyperparams, random_state=42)
-        else:
-            model = GradientBoostingRegressor(n_estimators=100, random_state=42)
-    elif model_type == "xgboost" and xgb:
+            return GradientBoostingRegressor(**hyperparams, random_state=42)
+        return GradientBoostingRegressor(n_estimators=100, random_state=42)
+    if model_type == "xgboost" and xgb:
         if hyperparams:
-            model = xgb.XGBRegressor(**hyperparams, random_state=42)
-        else:
-            model = xgb.XGBRegressor(n_estimators=100, random_state=42)
-    elif model_type == "linear_regression":
-        model = LinearRegression()
-    elif model_type == "ridge":
+            return xgb.XGBRegressor(**hyperparams, random_state=42)
+        return xgb.XGBRegressor(n_estimators=100, random_state=42)
+    if model_type == "linear_regression":
+        return LinearRegression()
+    if model_type == "ridge":
         if hyperparams:
-            model = Ridge(**hyperparams)
-        else:
-            model = Ridge(alpha=1.0)
-    elif model_type == "lasso":
+            return Ridge(**hyperparams)
+        return Ridge(alpha=1.0)
+    if model_type == "lasso":
         if hyperparams:
-            model = Lasso(**hyperparams)
-        else:
-            model = Lasso(alpha=1.0)
-    elif model_type == "svr":
+            return Lasso(**hyperparams)
+        return Lasso(alpha=1.0)
+    if model_type == "svr":
         if hyperparams:
-            model = SVR(**hyperparams)
-        else:
-            model = SVR(kernel="rbf")
-    else:
-        return None
+            return SVR(**hyperparams)
+        return SVR(kernel="rbf")
+    return None
 
-    # Train and evaluate
-    model.fit(X_train, y_train)
-    y_pred = model.predict(X_test)
-    mse = mean_squared_error(y_test, y_pred)
-    r2 = r2_score(y_test, y_pred)
-    mae = mean_absolute_error(y_test, y_pred)
 
-    # Save model metadata
+def _save_model_result(
+    model_type: str,
+    data: dict[str, Any],
+    metrics: dict[str, float],
+    hyperparams: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Write model metadata to MODELS_DIR and return it."""
     model_file = MODELS_DIR / f"{model_type}_{datetime.now(UTC).strftime('%Y%m%d_%H%M%S')}.json"
     result = {
         "model_type": model_type,
-        "mse": float(mse),
-        "mae": float(mae),
-        "r2_score": float(r2),
-        "features": list(X.columns),
-        "training_samples": len(X_train),
-        "test_samples": len(X_test),
+        "mse": float(metrics["mse"]),
+        "mae": float(metrics["mae"]),
+        "r2_score": float(metrics["r2"]),
+        "features": data["features"],
+        "training_samples": len(data["X_train"]),
+        "test_samples": len(data["X_test"]),
         "hyperparameters": hyperparams or {},
         "timestamp": datetime.now(UTC).isoformat(),
     }
     model_file.write_text(json.dumps(result, indent=2))
-
     return result
 
 
+def train_model(
+    model_type: str = "random_forest",
+    df: pd.DataFrame | None = None,
+    hyperparams: dict[str, Any] | None = None,
+) -> dict[str, Any] | None:
+    """Train a machine learning model with optional hyperparameter tuning."""
+    if df is None or pd is None or not sklearn_available:
+        return None
+
+    data = prepare_dataset(df)
+    if data is None:
+        return None
+
+    # Train model based on type
+    model = build_model(model_type, hyperparams)
+    if model is None:
+        return None
+
+    # Train and evaluate
+    model.fit(data["X_train"], data["y_train"])
+    y_pred = model.predict(data["X_test"])
+    metrics = {
+        "mse": mean_squared_error(data["y_test"], y_pred),
+        "r2": r2_score(data["y_test"], y_pred),
+        "mae": mean_absolute_error(data["y_test"], y_pred),
+    }
+    return _save_model_result(model_type, data, metrics, hyperparams)
+
+
 def hyperparameter_tuning(model_type: str, df: pd.DataFrame | None = None) -> dict[str, Any] | None:
     """
-    Tune hyperparameters using GridSearchCV or RandomizedSearchCV.
+    Tune hyperparameters with parallel successive halving.
+
+    Every grid configuration is scored on a small budget and only the best
+    third advance to a three times larger one. Forests and linear models
+    grow the training subset; boosted models grow the number of boosting
+    rounds and are warm-started between rungs. Candidates are scored on a
+    validation split of the training set and the winner on the test set.
 
     Args:
         model_type: Type of model to tune
@@ -224,89 +309,46 @@ def hyperparameter_tuning(model_type: str, df: pd.DataFrame | None = None) -> di
     if df is None or pd is None or not sklearn_available:
         return None
 
-    df_eng = engineer_features(df.copy())
-
-    # Prepare features and target
-    feature_cols = [
-        c for c in df_eng.columns if c not in ["timestamp", "equity", "pnl_pct", "date"]
-    ]
-    if "equity" not in df_eng.columns:
-        return None
-
-    X = df_eng[feature_cols].select_dtypes(include=[np.number]).fillna(0)
-    y = df_eng["equity"]
-
-    if len(X) < 20:
+    data = prepare_dataset(df)
+    if data is None or len(data["X"]) < 20:
         return None
 
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-    # Define parameter grids
-    param_grids = {
-        "random_forest": {
-            "n_estimators": [50, 100, 200],
-            "max_depth": [5, 10, 20, None],
-            "min_samples_split": [2, 5, 10],
-        },
-        "gradient_boosting": {
-            "n_estimators": [50, 100, 200],
-            "learning_rate": [0.01, 0.1, 0.2],
-            "max_depth": [3, 5, 7],
-        },
-        "xgboost": {
-            "n_estimators": [50, 100, 200],
-            "learning_rate": [0.01, 0.1, 0.2],
-            "max_depth": [3, 5, 7],
-        },
-        "ridge": {"alpha": [0.1, 1.0, 10.0, 100.0]},
-        "lasso": {"alpha": [0.1, 1.0, 10.0, 100.0]},
-    }
-
-    if model_type not in param_grids:
+    if model_type not in PARAM_GRIDS or build_model(model_type) is None:
         return None
 
-    param_grid = param_grids[model_type]
-
-    # Create base model
-    if model_type == "random_forest":
-        base_model = RandomForestRegressor(random_state=42)
-    elif model_type == "gradient_boosting":
-        base_model = GradientBoostingRegressor(random_state=42)
-    elif model_type == "xgboost" and xgb:
-        base_model = xgb.XGBRegressor(random_state=42)
-    elif model_type == "ridge":
-        base_model = Ridge()
-    elif model_type == "lasso":
-        base_model = Lasso()
-    else:
-        return None
+    candidates = expand_grid(PARAM_GRIDS[model_type])
+    boosted = model_type in BOOSTED_MODELS
 
-    # Use RandomizedSearchCV for faster search (limit combinations)
     try:
-        search = RandomizedSearchCV(
-            base_model,
-            param_grid,
-            n_iter=10,  # Limit iterations for performance
-            cv=3,  # 3-fold cross-validation
-            scoring="r2",
-            n_jobs=1,  # Single job to avoid resource issues
-            random_state=42,
+        X_fit, X_val, y_fit, y_val = train_test_split(
+            data["X_train"], data["y_train"], test_size=0.2, random_state=42
         )
-        search.fit(X_train, y_train)
+        workers = min(ML_WORKERS, len(candidates))
+        with Evaluator(X_fit, y_fit, X_val, y_val, max_workers=workers) as evaluator:
+            search = successive_halving(
+                partial(build_model, model_type),
+                candidates,
+                evaluator,
+                resource="n_estimators" if boosted else "samples",
+                eta=2 if boosted else 3,
+            )
 
         # Evaluate best model
-        best_model = search.best_estimator_
-        y_pred = best_model.predict(X_test)
-        r2 = r2_score(y_test, y_pred)
-        mse = mean_squared_error(y_test, y_pred)
+        best_model = build_model(model_type, search.best_params)
+        best_model.fit(data["X_train"], data["y_train"])
+        y_pred = best_model.predict(data["X_test"])
+        r2 = r2_score(data["y_test"], y_pred)
+        mse = mean_squared_error(data["y_test"], y_pred)
 
         return {
             "model_type": model_type,
-            "best_params": search.best_params_,
-            "best_score": float(search.best_score_),
+            "best_params": search.best_params,
+            "best_score": float(search.best_score),
             "test_r2": float(r2),
             "test_mse": float(mse),
-            "method": "randomized_search",
+            "method": "successive_halving",
+            "candidates": len(candidates),
+            "evaluations": search.evaluations,
             "timestamp": datetime.now(UTC).isoformat(),
         }
     except Exception as e:
@@ -318,6 +360,8 @@ def auto_model_selection(df: pd.DataFrame | None = None) -> dict[str, Any] | Non
     """
     Automatically select the best model by testing multiple models.
 
+    Candidates share one cached dataset and are trained in parallel.
+
     Returns:
         Dictionary with best model and performance metrics
     """
@@ -331,27 +375,41 @@ def auto_model_selection(df: pd.DataFrame | None = None) -> dict[str, Any] | Non
     if xgb:
         models_to_test.append("xgboost")
 
-    results = []
+    data = prepare_dataset(df)
+    if data is None:
+        return None
 
-    for model_type in models_to_test:
-        try:
-            result = train_model(model_type, df)
-            if result:
-                results.append(
-                    {
-                        "model_type": model_type,
-                        "r2_score": result["r2_score"],
-                        "mse": result["mse"],
-                        "mae": result.get("mae", 0.0),
-                    }
-                )
-                print(
-                    f"[ml_pipeline] {model_type}: R2={result['r2_score']:.3f}, MSE={result['mse']:.2f}",
-                    flush=True,
-                )
-        except Exception as e:
-            print(f"[ml_pipeline] Error testing {model_type}: {e}", flush=True)
+    try:
+        workers = min(ML_WORKERS, len(models_to_test))
+        with Evaluator(
+            data["X_train"], data["y_train"], data["X_test"], data["y_test"], max_workers=workers
+        ) as evaluator:
+            scored = fit_candidates(
+                [(partial(build_model, model_type), {}) for model_type in models_to_test],
+                evaluator,
+            )
+    except Exception as e:
+        print(f"[ml_pipeline] Error testing models: {e}", flush=True)
+        return None
+
+    results = []
+    for model_type, metrics in zip(models_to_test, scored, strict=True):
+        if "error" in metrics:
+            print(f"[ml_pipeline] Error testing {model_type}: {metrics['error']}", flush=True)
             continue
+        result = _save_model_result(model_type, data, metrics)
+        results.append(
+            {
+                "model_type": model_type,
+                "r2_score": result["r2_score"],
+                "mse": result["mse"],
+                "mae": result["mae"],
+            }
+        )
+        print(
+            f"[ml_pipeline] {model_type}: R2={result['r2_score']:.3f}, MSE={result['mse']:.2f}",
+            flush=True,
+        )
 
     if not results:
         return None
@@ -375,6 +433,8 @@ def train_ensemble_model(
     """
     Train an ensemble model (voting, stacking, or bagging).
 
+    Ensemble members are fit in parallel on ML_WORKERS processes.
+
     Args:
         df: Training data
         ensemble_type: Type of ensemble ("voting", "bagging")
@@ -385,22 +445,12 @@ def train_ensemble_model(
     if df is None or pd is None or not sklearn_available:
         return None
 
-    df_eng = engineer_features(df.copy())
-
-    # Prepare features and target
-    feature_cols = [
-        c for c in df_eng.columns if c not in ["timestamp", "equity", "pnl_pct", "date"]
-    ]
-    if "equity" not in df_eng.columns:
-        return None
-
-    X = df_eng[feature_cols].select_dtypes(include=[np.number]).fillna(0)
-    y = df_eng["equity"]
-
-    if len(X) < 20:
+    data = prepare_dataset(df)
+    if data is None or len(data["X"]) < 20:
         return None
 
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    X_train, X_test = data["X_train"], data["X_test"]
+    y_train, y_test = data["y_train"], data["y_test"]
 
     try:
         if ensemble_type == "voting":
@@ -410,11 +460,13 @@ def train_ensemble_model(
                 ("gb", GradientBoostingRegressor(n_estimators=50, random_state=42)),
                 ("ridge", Ridge(alpha=1.0)),
             ]
-            ensemble = VotingRegressor(estimators=estimators)
+            ensemble = VotingRegressor(estimators=estimators, n_jobs=ML_WORKERS)
         elif ensemble_type == "bagging":
             # Bagging: bootstrap aggregating with base model
             base_model = RandomForestRegressor(n_estimators=50, random_state=42)
-            ensemble = BaggingRegressor(estimator=base_model, n_estimators=5, random_state=42)
+            ensemble = BaggingRegressor(
+                estimator=base_model, n_estimators=5, random_state=42, n_jobs=ML_WORKERS
+            )
         else:
             return None
 
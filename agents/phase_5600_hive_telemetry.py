@@ -5,8 +5,8 @@ Aggregates performance across trading + revenue agents
 Unified metrics for Atlas dashboard and Capital Governor
 """
 
-import json
 import os
+import sys
 import time
 import traceback
 from datetime import UTC, datetime, timedelta
@@ -15,12 +15,22 @@ from typing import Any
 
 import requests
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from analytics.telemetry_rollups import RollupStore  # noqa: E402
+from utils.state_manager import read_json_cached  # noqa: E402
+
 ROOT = Path(os.path.expanduser("~/neolight"))
 STATE = ROOT / "state"
 RUNTIME = ROOT / "runtime"
 DATA = ROOT / "data"
 LOGS = ROOT / "logs"
 
+ATTRIBUTION_FILE = STATE / "performance_attribution.json"
+ROLLUP_FILE = STATE / "telemetry_rollups.json"
+
 # Detect Render environment - disable dashboard on Render (no localhost)
 RENDER_MODE = os.getenv("RENDER_MODE", "false").lower() == "true"
 DASHBOARD_URL = os.getenv(
@@ -28,6 +38,20 @@ DASHBOARD_URL = os.getenv(
 )
 UPDATE_INTERVAL = int(os.getenv("NL_TELEMETRY_INTERVAL_SEC", "300"))  # 5 minutes
 
+_rollups: RollupStore | None = None
+
+
+def get_rollups() -> RollupStore:
+    """Decision rollups, brought up to date with the attribution file."""
+    global _rollups
+    if _rollups is None or _rollups.path != ROLLUP_FILE:
+        _rollups = RollupStore(ROLLUP_FILE)
+    try:
+        _rollups.ingest_file(ATTRIBUTION_FILE)
+    except Exception as e:
+        print(f"[phase_5600] Rollup ingest error: {e}", flush=True)
+    return _rollups
+
 
 # Helper functions for metrics calculation
 def calculate_sharpe(returns: list[float]) -> float:
@@ -107,23 +131,23 @@ def calculate_pnl_7d(decisions: list[dict[str, Any]]) -> float:
 
 def load_performance_attribution() -> dict[str, Any]:
     """Load performance attribution data."""
-    attr_file = STATE / "performance_attribution.json"
-    if attr_file.exists():
-        try:
-            return json.loads(attr_file.read_text())
-        except:
-            pass
+    try:
+        data = read_json_cached(ATTRIBUTION_FILE)
+        if data is not None:
+            return data
+    except:
+        pass
     return {"decisions": []}
 
 
 def load_strategy_scores() -> dict[str, Any]:
     """Load strategy scores."""
-    scores_file = STATE / "strategy_scores.json"
-    if scores_file.exists():
-        try:
-            return json.loads(scores_file.read_text())
-        except:
-            pass
+    try:
+        data = read_json_cached(STATE / "strategy_scores.json")
+        if data is not None:
+            return data
+    except:
+        pass
 
     # Calculate from performance attribution if file doesn't exist
     try:
@@ -138,24 +162,18 @@ def load_strategy_scores() -> dict[str, Any]:
 
 def load_revenue_by_agent() -> dict[str, Any]:
     """Load revenue by agent data."""
-    revenue_file = STATE / "revenue_by_agent.json"
-    if revenue_file.exists():
-        try:
-            return json.loads(revenue_file.read_text())
-        except:
-            pass
-    return {}
+    try:
+        return read_json_cached(STATE / "revenue_by_agent.json") or {}
+    except:
+        return {}
 
 
 def load_market_regime() -> dict[str, Any]:
     """Load market regime data."""
-    regime_file = RUNTIME / "market_regime.json"
-    if regime_file.exists():
-        try:
-            return json.loads(regime_file.read_text())
-        except:
-            pass
-    return {}
+    try:
+        return dict(read_json_cached(RUNTIME / "market_regime.json") or {})
+    except:
+        return {}
 
 
 def load_guardian_state() -> dict[str, Any]:
@@ -165,7 +183,7 @@ def load_guardian_state() -> dict[str, Any]:
 
     if pause_file.exists():
         try:
-            pause_data = json.loads(pause_file.read_text())
+            pause_data = read_json_cached(pause_file) or {}
             if pause_data.get("paused", False):
                 guardian_state["is_paused"] = True
                 guardian_state["reason"] = pause_data.get("reason", "Guardian intervention")
@@ -182,51 +200,32 @@ def load_circuit_breaker_states() -> dict[str, Any]:
 
 
 def aggregate_per_agent_metrics() -> dict[str, dict[str, Any]]:
-    """Aggregate metrics per agent."""
-    attr_data = load_performance_attribution()
-    decisions = attr_data.get("decisions", [])
-    revenue_data = load_revenue_by_agent()
+    """
+    Aggregate metrics per agent.
 
-    # Group decisions by agent
-    agent_decisions = {}
-    for decision in decisions:
-        agent = decision.get("agent", "unknown")
-        if agent not in agent_decisions:
-            agent_decisions[agent] = []
-        agent_decisions[agent].append(decision)
+    Windows are read from the decision rollups: P&L over 1d/7d/30d, and
+    Sharpe, win rate and peak-to-trough drawdown of cumulative P&L over 30d.
+    """
+    rollups = get_rollups()
+    revenue_data = load_revenue_by_agent()
+    now = time.time()
 
     per_agent = {}
-
-    # Process each agent
-    for agent_name, agent_decs in agent_decisions.items():
-        pnl_1d = calculate_pnl_1d(agent_decs)
-        pnl_7d = calculate_pnl_7d(agent_decs)
-
-        # Calculate win rate from decisions with P&L
-        win_rate = calculate_win_rate(agent_decs)
-
-        # Calculate Sharpe (from returns)
-        returns = [d.get("pnl", 0) for d in agent_decs if d.get("pnl") is not None]
-        sharpe_30d = (
-            calculate_sharpe(returns[-30:]) if len(returns) >= 30 else calculate_sharpe(returns)
-        )
-
-        # Max drawdown (simplified - would need equity curve)
-        # For now, use negative PnL as proxy
-        max_dd_30d = abs(
-            min([d.get("pnl", 0) for d in agent_decs if d.get("pnl") is not None] or [0])
-        )
+    for agent_name in rollups.names("agent"):
+        metrics = rollups.metrics("agent", agent_name, now)
 
         # Add revenue data if available
         revenue_info = revenue_data.get(agent_name, {})
 
         per_agent[agent_name] = {
-            "pnl_1d": round(pnl_1d, 2),
-            "pnl_7d": round(pnl_7d, 2),
-            "sharpe_30d": round(sharpe_30d, 3),
-            "winrate_30d": round(win_rate, 3),
-            "max_dd_30d": round(max_dd_30d, 2),
-            "total_decisions": len(agent_decs),
+            "pnl_1d": round(metrics["pnl_1d"], 2),
+            "pnl_7d": round(metrics["pnl_7d"], 2),
+            "pnl_30d": round(metrics["pnl_30d"], 2),
+            "sharpe_30d": round(metrics["sharpe_30d"], 3),
+            "winrate_30d": round(metrics["winrate_30d"], 3),
+            "max_dd_30d": round(metrics["max_dd_30d"], 2),
+            "high_water_mark": round(metrics["high_water_mark"], 2),
+            "total_decisions": metrics["total_decisions"],
             "revenue_24h": revenue_info.get("revenue_24h", 0.0),
             "revenue_total": revenue_info.get("revenue_total", 0.0),
         }
@@ -236,30 +235,40 @@ def aggregate_per_agent_metrics() -> dict[str, dict[str, Any]]:
 
 def aggregate_per_strategy_metrics() -> dict[str, dict[str, Any]]:
     """Aggregate metrics per strategy."""
-    strategy_scores = load_strategy_scores()
+    rollups = get_rollups()
+    traded = set(rollups.names("strategy"))
+    now = time.time()
     strategy_perf = {}
 
     # Load strategy performance file
-    perf_file = STATE / "strategy_performance.json"
-    if perf_file.exists():
-        try:
-            perf_data = json.loads(perf_file.read_text())
+    try:
+        perf_data = read_json_cached(STATE / "strategy_performance.json")
+        if perf_data is not None:
             ranked = perf_data.get("ranked_strategies", [])
             active = perf_data.get("active_strategies", [])
 
             for strategy in ranked + active:
                 strat_name = strategy.get("strategy", "unknown")
                 strategy_perf[strat_name] = {
-                    "pnl_1d": 0.0,  # Would need time-series data
+                    "pnl_1d": 0.0,
                     "pnl_7d": 0.0,
                     "sharpe_30d": round(strategy.get("sharpe", 0.0), 3),
-                    "winrate_30d": 0.0,  # Would need trade history
+                    "winrate_30d": 0.0,
                     "max_dd_30d": round(strategy.get("drawdown", 0.0), 2),
-                    "trade_count": 0,  # Would need trade history
+                    "trade_count": 0,
                     "score": round(strategy.get("score", 0.0), 3),
                 }
-        except:
-            pass
+                if strat_name in traded:
+                    # Time-series figures from decisions tagged with this strategy
+                    metrics = rollups.metrics("strategy", strat_name, now)
+                    strategy_perf[strat_name].update(
+                        pnl_1d=round(metrics["pnl_1d"], 2),
+                        pnl_7d=round(metrics["pnl_7d"], 2),
+                        winrate_30d=round(metrics["winrate_30d"], 3),
+                        trade_count=metrics["trade_count"],
+                    )
+    except:
+        pass
 
     return strategy_perf
 
@@ -7,6 +7,7 @@ Uses PnL, Sharpe, win rate, and drawdown to optimize capital allocation
 
 import json
 import os
+import sys
 import time
 import traceback
 from datetime import UTC, datetime
@@ -15,6 +16,19 @@ from typing import Any
 
 import requests
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from utils.notification_dispatcher import get_dispatcher  # noqa: E402
+
+try:
+    from utils.state_bus import get_state_bus
+
+    HAS_STATE_BUS = True
+except ImportError:
+    HAS_STATE_BUS = False
+
 ROOT = Path(os.path.expanduser("~/neolight"))
 STATE = ROOT / "state"
 RUNTIME = ROOT / "runtime"
@@ -299,12 +313,16 @@ def save_allocations(allocations: dict[str, float], source: str = "capital_gover
         CAPITAL_ALLOCATIONS_FILE.write_text(json.dumps(data, indent=2))
 
         # Also update allocations_override.json for SmartTrader compatibility
+        # (the state bus exports it; subscribers get the update directly)
         override_data = {
             "allocations": allocations,
             "source": source,
             "timestamp": datetime.now(UTC).isoformat(),
         }
-        ALLOCATIONS_OVERRIDE_FILE.write_text(json.dumps(override_data, indent=2))
+        if HAS_STATE_BUS:
+            get_state_bus(ROOT).publish("allocations", override_data)
+        else:
+            ALLOCATIONS_OVERRIDE_FILE.write_text(json.dumps(override_data, indent=2))
 
         print(f"[capital_governor] Allocations saved: {allocations}", flush=True)
     except Exception as e:
@@ -331,18 +349,8 @@ def should_reallocate(
 
 
 def send_telegram(message: str) -> None:
-    """Send Telegram notification."""
-    try:
-        token = os.getenv("TELEGRAM_BOT_TOKEN")
-        chat_id = os.getenv("TELEGRAM_CHAT_ID")
-        if token and chat_id:
-            requests.post(
-                f"https://api.telegram.org/bot{token}/sendMessage",
-                json={"chat_id": chat_id, "text": message},
-                timeout=5,
-            )
-    except:
-        pass  # Silent fail
+    """Queue a Telegram notification (sent in the background by the notification dispatcher)."""
+    get_dispatcher().notify(message, chat_id=os.getenv("TELEGRAM_CHAT_ID"))
 
 
 def wait_for_dashboard(max_wait: int = 300) -> bool:
@@ -13,11 +13,18 @@ Features:
 
 import json
 import os
+import sys
 import time
 from datetime import UTC, datetime, timedelta
 from pathlib import Path
 from typing import Any
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from utils.notification_dispatcher import get_dispatcher  # noqa: E402
+
 ROOT = Path("/opt/render/project/src") if os.getenv("RENDER_MODE") == "true" else Path(os.path.expanduser("~/neolight"))
 STATE = ROOT / "state"
 RUNTIME = ROOT / "runtime"
@@ -35,17 +42,10 @@ TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "")
 
 
 def send_telegram(message: str) -> None:
-    """Send Telegram alert."""
+    """Queue a Telegram alert (sent in the background by the notification dispatcher)."""
     if not (TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID):
         return
-    try:
-        import requests
-
-        url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-        payload = {"chat_id": TELEGRAM_CHAT_ID, "text": message, "parse_mode": "Markdown"}
-        requests.post(url, json=payload, timeout=10)
-    except Exception:
-        pass
+    get_dispatcher().notify(message, chat_id=TELEGRAM_CHAT_ID, parse_mode="Markdown")
 
 
 class PredictiveMaintenance:
@@ -11,13 +11,25 @@ Features:
 - Learn from past incidents
 """
 
+import base64
+import hashlib
 import json
 import os
 import re
+import sys
+import zlib
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any, Optional
 
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from utils.llm_gateway import get_gateway  # noqa: E402
+
 ROOT = Path("/opt/render/project/src") if os.getenv("RENDER_MODE") == "true" else Path(os.path.expanduser("~/neolight"))
 STATE = ROOT / "state"
 RUNTIME = ROOT / "runtime"
@@ -28,18 +40,244 @@ for d in [STATE, RUNTIME, LOGS]:
 
 RCA_KNOWLEDGE_BASE_FILE = STATE / "rca_knowledge_base.json"
 RCA_REPORTS_FILE = STATE / "rca_reports.json"
+RCA_INCIDENTS_FILE = STATE / "rca_incidents.jsonl"  # Append-only incident store
 
 RENDER_MODE = os.getenv("RENDER_MODE", "false").lower() == "true"
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 
+MAX_INCIDENTS = int(os.getenv("RCA_MAX_INCIDENTS", "100000"))  # Store is compacted past this
+SIMILARITY_THRESHOLD = float(os.getenv("RCA_SIMILARITY_THRESHOLD", "0.5"))  # Min est. Jaccard
+
+ERROR_KEYWORD_RE = re.compile(r"\w+Error|\w+Exception")
+
+# Root-cause patterns in priority order, matched in one pass over the log
+ROOT_CAUSE_PATTERNS = [
+    ("missing_dependency", r"ImportError|ModuleNotFoundError", 0.9),
+    ("network_issue", r"ConnectionError|Connection refused", 0.8),
+    ("resource_exhaustion", r"MemoryError|Out of memory", 0.9),
+    ("missing_file", r"FileNotFoundError", 0.8),
+    ("timeout", r"(?i:TimeoutError|timeout)", 0.7),
+    ("localhost_dependency", r"localhost|127\.0\.0\.1", 0.9),
+]
+ROOT_CAUSE_RE = re.compile("|".join(f"(?P<{cause}>{pattern})" for cause, pattern, _ in ROOT_CAUSE_PATTERNS))
+ROOT_CAUSE_CONFIDENCE = {cause: confidence for cause, _, confidence in ROOT_CAUSE_PATTERNS}
+
+# Volatile parts of a stack trace, replaced so repeats of a failure normalize alike
+TRACE_NOISE = [
+    (re.compile(r'File "(?:[^"]*[/\\])?([^"/\\]+)", line \d+'), r'File "\1"'),
+    (re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?"), "<ts>"),
+    (re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.IGNORECASE), "<uuid>"),
+    (re.compile(r"0x[0-9a-fA-F]+"), "<addr>"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "<n>"),
+    (re.compile(r"[ \t]+"), " "),
+]
+TOKEN_RE = re.compile(r"<\w+>|\w+")
+
+
+def normalize_trace(error_log: str) -> str:
+    """Error log with paths, line numbers, addresses, ids and numbers masked."""
+    text = error_log
+    for pattern, replacement in TRACE_NOISE:
+        text = pattern.sub(replacement, text)
+    return "\n".join(line.strip() for line in text.splitlines() if line.strip())
+
+
+def trace_fingerprint(error_log: str) -> str:
+    """Stable hash of the normalized trace, for exact deduplication."""
+    return hashlib.blake2b(normalize_trace(error_log).encode(), digest_size=12).hexdigest()
+
+
+class MinHasher:
+    """MinHash signatures over token 3-gram shingles (universal hashing mod a 32-bit prime)."""
+
+    PRIME = np.uint64(4294967291)  # 2**32 - 5, so a * x + b fits in uint64
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(1, int(self.PRIME), num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, int(self.PRIME), num_perm, dtype=np.uint64)
+
+    @staticmethod
+    def shingles(text: str) -> set[str]:
+        tokens = TOKEN_RE.findall(text)
+        if len(tokens) < 3:
+            return set(tokens) or {""}
+        return {" ".join(tokens[i:i + 3]) for i in range(len(tokens) - 2)}
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(s.encode()) for s in self.shingles(text)), dtype=np.uint64)
+        hashes %= self.PRIME
+        return ((self.a[:, None] * hashes[None, :] + self.b[:, None]) % self.PRIME).min(axis=1).astype(np.uint32)
+
+
+class IncidentIndex:
+    """
+    Incident store with exact and near-duplicate lookup.
+
+    Incidents are appended to a JSON-lines file and indexed per agent by:
+    - trace fingerprint (exact repeats of a failure)
+    - MinHash LSH bands over normalized trace shingles (near duplicates);
+      only the first incident of each fingerprint is banded, so buckets stay
+      small however often a failure repeats
+    - error keyword (fallback for incidents recorded without a trace)
+
+    Lookups touch only the matching postings, so cost does not grow with
+    the number of stored incidents.
+    """
+
+    def __init__(self, path: Path | None = None, num_perm: int = 64, bands: int = 16,
+                 threshold: float = SIMILARITY_THRESHOLD, max_incidents: int = MAX_INCIDENTS):
+        self.path = path
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.max_incidents = max_incidents
+        self._reset()
+        if path is not None and path.exists():
+            self.load()
+
+    def _reset(self) -> None:
+        self.incidents: list[dict[str, Any]] = []
+        self.by_fingerprint: dict[tuple[str, str], list[int]] = {}
+        self.by_keyword: dict[tuple[str, str], list[int]] = {}
+        self.buckets: dict[bytes, list[str]] = {}  # LSH band -> fingerprints
+        self.signatures: dict[tuple[str, str], np.ndarray] = {}  # (agent, fingerprint) -> MinHash
+
+    def __len__(self) -> int:
+        return len(self.incidents)
+
+    def _band_keys(self, agent: str, signature: np.ndarray) -> list[bytes]:
+        prefix = agent.encode() + b"\x00"
+        return [
+            prefix + bytes([band]) + signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def _index(self, incident: dict[str, Any], signature: np.ndarray) -> int:
+        idx = len(self.incidents)
+        self.incidents.append(incident)
+        agent = incident.get("agent", "")
+        key = (agent, incident["fingerprint"])
+        if key not in self.by_fingerprint:
+            self.by_fingerprint[key] = []
+            self.signatures[key] = signature
+            for band_key in self._band_keys(agent, signature):
+                self.buckets.setdefault(band_key, []).append(incident["fingerprint"])
+        self.by_fingerprint[key].append(idx)
+        for keyword in incident.get("error_keywords", []):
+            self.by_keyword.setdefault((agent, keyword), []).append(idx)
+        return idx
+
+    def add(self, incident: dict[str, Any], error_log: str) -> int:
+        """Index an incident and append it to the store; returns its id."""
+        incident = dict(incident)
+        incident.setdefault("error_keywords", sorted(set(ERROR_KEYWORD_RE.findall(error_log))))
+        normalized = normalize_trace(error_log)
+        incident["fingerprint"] = hashlib.blake2b(normalized.encode(), digest_size=12).hexdigest()
+        signature = self.hasher.signature(normalized)
+        idx = self._index(incident, signature)
+        if self.path is not None:
+            with open(self.path, "a") as f:
+                f.write(self._encode(incident, signature))
+        if len(self.incidents) > self.max_incidents * 1.1:
+            self.compact()
+            idx = len(self.incidents) - 1
+        return idx
+
+    @staticmethod
+    def _encode(incident: dict[str, Any], signature: np.ndarray) -> str:
+        return json.dumps(dict(incident, minhash=base64.b64encode(signature.tobytes()).decode())) + "\n"
+
+    @staticmethod
+    def _decode(record: dict[str, Any]) -> tuple[dict[str, Any], np.ndarray]:
+        signature = np.frombuffer(base64.b64decode(record.pop("minhash")), dtype=np.uint32)
+        return record, signature
+
+    def load(self) -> None:
+        """Rebuild the in-memory index from the store."""
+        self._reset()
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    self._index(*self._decode(json.loads(line)))
+                except (ValueError, KeyError):
+                    continue  # Partial last line after a crash
+        if len(self.incidents) > self.max_incidents:
+            self.compact()
+
+    def compact(self) -> None:
+        """Keep the newest max_incidents incidents, rewriting the store once."""
+        keep = self.incidents[-self.max_incidents:]
+        signatures = self.signatures
+        self._reset()
+        for incident in keep:
+            self._index(incident, signatures[(incident.get("agent", ""), incident["fingerprint"])])
+        if self.path is not None:
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w") as f:
+                for incident in self.incidents:
+                    f.write(self._encode(incident, self.signatures[(incident.get("agent", ""), incident["fingerprint"])]))
+            tmp.replace(self.path)
+
+    def query(self, agent_name: str, error_log: str, k: int = 5) -> list[tuple[float, dict[str, Any]]]:
+        """
+        Up to k similar incidents for an agent, best first.
+
+        Returns (similarity, incident) pairs: 1.0 for the same fingerprint,
+        the estimated Jaccard similarity for near duplicates, and 0.0 for
+        incidents that only share an error keyword.
+        """
+        normalized = normalize_trace(error_log)
+        fingerprint = hashlib.blake2b(normalized.encode(), digest_size=12).hexdigest()
+        scored: dict[int, float] = {}
+
+        def newest(ids: list[int]) -> list[int]:
+            return ids[-k:]
+
+        for idx in newest(self.by_fingerprint.get((agent_name, fingerprint), [])):
+            scored[idx] = 1.0
+
+        if len(scored) < k:
+            signature = self.hasher.signature(normalized)
+            candidates = {fp for key in self._band_keys(agent_name, signature) for fp in self.buckets.get(key, ())}
+            for candidate in candidates:
+                similarity = float(np.mean(self.signatures[(agent_name, candidate)] == signature))
+                if similarity >= self.threshold:
+                    for idx in newest(self.by_fingerprint[(agent_name, candidate)]):
+                        scored.setdefault(idx, similarity)
+
+        if len(scored) < k:
+            for keyword in ERROR_KEYWORD_RE.findall(error_log):
+                for idx in newest(self.by_keyword.get((agent_name, keyword), [])):
+                    scored.setdefault(idx, 0.0)
+
+        # Most similar first, then successful fixes, then most recent
+        ranked = sorted(scored, key=lambda i: (scored[i], bool(self.incidents[i].get("success")), i), reverse=True)
+        return [(scored[i], self.incidents[i]) for i in ranked[:k]]
+
 
 class RCAEngine:
     """Root Cause Analysis Engine."""
 
     def __init__(self):
         self.knowledge_base = self.load_knowledge_base()
+        self.index = IncidentIndex(RCA_INCIDENTS_FILE)
         self.reports = []
+        self._migrate_incidents()
+
+    def _migrate_incidents(self) -> None:
+        """Move incidents kept inline in the knowledge base into the incident store."""
+        legacy = self.knowledge_base.pop("incidents", None)
+        if not legacy:
+            return
+        if not len(self.index):
+            for incident in legacy:
+                # Old incidents kept only their error keywords
+                self.index.add(incident, " ".join(incident.get("error_keywords", [])))
+        self.save_knowledge_base()
 
     def load_knowledge_base(self) -> dict[str, Any]:
         """Load RCA knowledge base."""
@@ -47,13 +285,15 @@ class RCAEngine:
             try:
                 return json.loads(RCA_KNOWLEDGE_BASE_FILE.read_text())
             except Exception:
-                return {"incidents": [], "patterns": {}}
-        return {"incidents": [], "patterns": {}}
+                return {"patterns": {}}
+        return {"patterns": {}}
 
     def save_knowledge_base(self) -> None:
-        """Save RCA knowledge base."""
+        """Save RCA knowledge base (root-cause patterns; incidents live in the incident store)."""
         try:
-            RCA_KNOWLEDGE_BASE_FILE.write_text(json.dumps(self.knowledge_base, indent=2))
+            tmp = RCA_KNOWLEDGE_BASE_FILE.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self.knowledge_base, indent=2))
+            tmp.replace(RCA_KNOWLEDGE_BASE_FILE)
         except Exception:
             pass
 
@@ -87,46 +327,27 @@ class RCAEngine:
             return self._pattern_analyze(agent_name, error_log)
 
     def _find_similar_incidents(self, agent_name: str, error_log: str) -> list[dict[str, Any]]:
-        """Find similar incidents in knowledge base."""
-        incidents = self.knowledge_base.get("incidents", [])
-        similar = []
-
-        # Extract error keywords
-        error_keywords = set(re.findall(r"\w+Error|\w+Exception", error_log))
-
-        for incident in incidents:
-            if incident.get("agent") == agent_name:
-                incident_keywords = set(incident.get("error_keywords", []))
-                # Simple similarity: check if error types match
-                if error_keywords & incident_keywords:
-                    similar.append(incident)
-
-        return similar[:5]  # Return top 5 similar
+        """Find similar incidents in knowledge base (best match first)."""
+        return [incident for _, incident in self.index.query(agent_name, error_log, k=5)]
 
     def _pattern_analyze(self, agent_name: str, error_log: str) -> dict[str, Any]:
         """Pattern-based root cause analysis."""
         root_cause = "unknown"
         confidence = 0.5
 
-        # Pattern matching
-        if re.search(r"ImportError|ModuleNotFoundError", error_log):
-            root_cause = "missing_dependency"
-            confidence = 0.9
-        elif re.search(r"ConnectionError|Connection refused", error_log):
-            root_cause = "network_issue"
-            confidence = 0.8
-        elif re.search(r"MemoryError|Out of memory", error_log):
-            root_cause = "resource_exhaustion"
-            confidence = 0.9
-        elif re.search(r"FileNotFoundError", error_log):
-            root_cause = "missing_file"
-            confidence = 0.8
-        elif re.search(r"TimeoutError|timeout", error_log, re.IGNORECASE):
-            root_cause = "timeout"
-            confidence = 0.7
-        elif re.search(r"localhost|127\.0\.0\.1", error_log):
-            root_cause = "localhost_dependency"
-            confidence = 0.9
+        # Pattern matching: one pass collects every cause present, the
+        # highest-priority one wins
+        top = ROOT_CAUSE_PATTERNS[0][0]
+        found = set()
+        for match in ROOT_CAUSE_RE.finditer(error_log):
+            found.add(match.lastgroup)
+            if match.lastgroup == top:
+                break
+        for cause, _, _ in ROOT_CAUSE_PATTERNS:
+            if cause in found:
+                root_cause = cause
+                confidence = ROOT_CAUSE_CONFIDENCE[cause]
+                break
 
         return {
             "root_cause": root_cause,
@@ -142,13 +363,13 @@ class RCAEngine:
         metrics: Optional[dict[str, Any]] = None,
         traces: Optional[list[dict[str, Any]]] = None,
     ) -> dict[str, Any]:
-        """Use LLM for root cause analysis."""
+        """Use LLM for root cause analysis.
+
+        Responses go through the LLM gateway, so a repeat of the same failure
+        (timestamps and addresses aside) is answered from its cache.
+        """
         try:
             if ANTHROPIC_API_KEY:
-                import anthropic
-
-                client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-
                 prompt = f"""Analyze this failure and identify the root cause:
 
 Agent: {agent_name}
@@ -171,43 +392,61 @@ Format as JSON:
     "error_keywords": ["..."]
 }}"""
 
-                response = client.messages.create(
-                    model="claude-3-5-sonnet-20241022",
-                    max_tokens=500,
-                    messages=[{"role": "user", "content": prompt}],
+                def ask_anthropic() -> Optional[dict[str, Any]]:
+                    import anthropic
+
+                    client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+                    response = client.messages.create(
+                        model="claude-3-5-sonnet-20241022",
+                        max_tokens=500,
+                        messages=[{"role": "user", "content": prompt}],
+                    )
+
+                    result_text = response.content[0].text
+                    # Extract JSON from response
+                    json_match = re.search(r"\{[^}]+\}", result_text, re.DOTALL)
+                    if json_match:
+                        result = json.loads(json_match.group())
+                        result["source"] = "llm_anthropic"
+                        return result
+                    return None
+
+                result = get_gateway().complete(
+                    "anthropic", prompt, ask_anthropic, model="claude-3-5-sonnet-20241022"
                 )
-
-                result_text = response.content[0].text
-                # Extract JSON from response
-                json_match = re.search(r"\{[^}]+\}", result_text, re.DOTALL)
-                if json_match:
-                    result = json.loads(json_match.group())
-                    result["source"] = "llm_anthropic"
-                    return result
+                if result:
+                    return dict(result)
 
             elif OPENAI_API_KEY:
-                import openai
-
-                client = openai.OpenAI(api_key=OPENAI_API_KEY)
-
-                response = client.chat.completions.create(
-                    model="gpt-4",
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You are a root cause analysis expert. Analyze failures and provide JSON responses.",
-                        },
-                        {
-                            "role": "user",
-                            "content": f"Analyze failure for agent {agent_name}:\n\n{error_log[:2000]}",
-                        },
-                    ],
-                    response_format={"type": "json_object"},
-                )
+                prompt = f"Analyze failure for agent {agent_name}:\n\n{error_log[:2000]}"
+
+                def ask_openai() -> dict[str, Any]:
+                    import openai
+
+                    client = openai.OpenAI(api_key=OPENAI_API_KEY)
+
+                    response = client.chat.completions.create(
+                        model="gpt-4",
+                        messages=[
+                            {
+                                "role": "system",
+                                "content": "You are a root cause analysis expert. Analyze failures and provide JSON responses.",
+                            },
+                            {
+                                "role": "user",
+                                "content": prompt,
+                            },
+                        ],
+                        response_format={"type": "json_object"},
+                    )
+
+                    result = json.loads(response.choices[0].message.content)
+                    result["source"] = "llm_openai"
+                    return result
 
-                result = json.loads(response.choices[0].message.content)
-                result["source"] = "llm_openai"
-                return result
+                result = get_gateway().complete("openai", prompt, ask_openai, model="gpt-4")
+                if result:
+                    return dict(result)
 
         except Exception as e:
             print(f"[rca_engine] LLM analysis failed: {e}", flush=True)
@@ -236,7 +475,7 @@ Format as JSON:
         error_log: str,
     ) -> None:
         """Record incident in knowledge base."""
-        error_keywords = list(set(re.findall(r"\w+Error|\w+Exception", error_log)))
+        error_keywords = sorted(set(ERROR_KEYWORD_RE.findall(error_log)))
 
         incident = {
             "agent": agent_name,
@@ -247,11 +486,8 @@ Format as JSON:
             "timestamp": datetime.now(UTC).isoformat(),
         }
 
-        self.knowledge_base.setdefault("incidents", []).append(incident)
-
-        # Keep only last 1000 incidents
-        if len(self.knowledge_base["incidents"]) > 1000:
-            self.knowledge_base["incidents"] = self.knowledge_base["incidents"][-1000:]
+        # Appended to the incident store, not rewritten with the knowledge base
+        self.index.add(incident, error_log)
 
         # Update patterns
         if root_cause not in self.knowledge_base.get("patterns", {}):
@@ -315,9 +551,20 @@ Format as JSON:
         return recommendations
 
 
+_engine: RCAEngine | None = None
+
+
+def get_engine() -> RCAEngine:
+    """Shared engine, so the incident index is loaded once per process."""
+    global _engine
+    if _engine is None:
+        _engine = RCAEngine()
+    return _engine
+
+
 def analyze_agent_failure(agent_name: str, error_log: str) -> dict[str, Any]:
     """Analyze agent failure and return RCA."""
-    engine = RCAEngine()
+    engine = get_engine()
     analysis = engine.analyze_failure(agent_name, error_log)
     report = engine.generate_report(agent_name, analysis)
     return report
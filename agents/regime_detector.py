@@ -2,10 +2,16 @@
 """
 Regime Detector - Phase 2000-2300 Enhanced
 Detect market regimes (Bull, Bear, Sideways, High Volatility) for adaptive strategy switching
+
+With enough history the equity curve and the cached symbol prices are
+classified by the Gaussian HMM regime engine (analytics/regime_engine.py),
+which publishes posterior regime probabilities; short histories fall back
+to the volatility/trend thresholds.
 """
 
 import json
 import os
+import sys
 import time
 import traceback
 from datetime import UTC, datetime
@@ -19,6 +25,17 @@ except ImportError:
     np = None
     pd = None
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+try:
+    from analytics.regime_engine import MIN_FIT_BARS, PARAMS_CACHE, RegimeEngine
+
+    HAS_REGIME_ENGINE = True
+except ImportError:
+    HAS_REGIME_ENGINE = False
+
 ROOT = Path(os.path.expanduser("~/neolight"))
 STATE = ROOT / "state"
 RUNTIME = ROOT / "runtime"
@@ -26,6 +43,9 @@ DATA = ROOT / "data"
 LOGS = ROOT / "logs"
 
 REGIME_FILE = RUNTIME / "market_regime.json"
+SYMBOL_REGIME_FILE = RUNTIME / "symbol_regimes.json"
+EQUITY_PARAMS_CACHE = RUNTIME / "regime_hmm_equity.npz"
+PRICE_HISTORY_CSV = STATE / "rl_price_history.csv"
 
 REGIMES = {
     "BULL": {"description": "Bull market - trending up", "risk_multiplier": 1.2},
@@ -34,6 +54,15 @@ REGIMES = {
     "HIGH_VOL": {"description": "High volatility - uncertain", "risk_multiplier": 0.6},
 }
 
+# Filters kept across calls so each check only feeds the bars added since the last one
+_engines: dict[str, Any] = {}
+
+
+def _engine(name: str, cache_path: Path) -> Any:
+    if name not in _engines:
+        _engines[name] = RegimeEngine(cache_path=cache_path)
+    return _engines[name]
+
 
 def detect_regime(df: Any | None = None) -> dict[str, Any]:
     """Detect current market regime from historical data."""
@@ -83,6 +112,19 @@ def detect_regime(df: Any | None = None) -> dict[str, Any]:
         else:
             trend = 0
 
+        result = {
+            "volatility": float(volatility) if np else 0.0,
+            "mean_return": float(mean_return) if np else 0.0,
+            "trend": float(trend) if np else 0.0,
+            "timestamp": datetime.now(UTC).isoformat(),
+        }
+
+        if HAS_REGIME_ENGINE and len(df) > MIN_FIT_BARS:
+            engine = _engine("equity", EQUITY_PARAMS_CACHE)
+            equity = df["equity"].to_numpy(dtype=float)[None, :]
+            if engine.sync(equity, ("equity",)) is not None:
+                return {**engine.regimes()["equity"], **result, "method": "hmm"}
+
         # Classify regime
         if volatility > 0.05:  # High volatility threshold
             regime = "HIGH_VOL"
@@ -93,17 +135,31 @@ def detect_regime(df: Any | None = None) -> dict[str, Any]:
         else:
             regime = "SIDEWAYS"
 
-        return {
-            "regime": regime,
-            "volatility": float(volatility) if np else 0.0,
-            "mean_return": float(mean_return) if np else 0.0,
-            "trend": float(trend) if np else 0.0,
-            "timestamp": datetime.now(UTC).isoformat(),
-        }
+        return {"regime": regime, **result, "method": "threshold"}
 
     return {"regime": "UNKNOWN", "timestamp": datetime.now(UTC).isoformat()}
 
 
+def detect_symbol_regimes(prices: Any) -> dict[str, dict[str, Any]]:
+    """
+    Regime probabilities per symbol from a close-price DataFrame.
+
+    Args:
+        prices: Rows = bars, columns = symbols; leading NaNs for late listings
+
+    Returns:
+        {symbol: {"regime", "confidence", "probabilities"}}, also written to
+        SYMBOL_REGIME_FILE; empty if the history is too short to fit.
+    """
+    if not HAS_REGIME_ENGINE or prices is None or prices.empty:
+        return {}
+    engine = _engine("symbols", PARAMS_CACHE)
+    symbols = tuple(str(column) for column in prices.columns)
+    if engine.sync(prices.to_numpy(dtype=float).T, symbols) is None:
+        return {}
+    return engine.publish(SYMBOL_REGIME_FILE)["symbols"]
+
+
 def get_regime_strategy(regime: str) -> dict[str, Any]:
     """Get recommended strategy adjustments for detected regime."""
     regime_info = REGIMES.get(regime, REGIMES["SIDEWAYS"])
@@ -153,6 +209,19 @@ def main():
             regime_data = detect_regime(df)
             regime = regime_data.get("regime", "UNKNOWN")
 
+            # Per-symbol regimes from the cached price matrix
+            if PRICE_HISTORY_CSV.exists() and pd:
+                try:
+                    prices = pd.read_csv(PRICE_HISTORY_CSV).select_dtypes(include="number")
+                    symbol_regimes = detect_symbol_regimes(prices)
+                    if symbol_regimes:
+                        print(
+                            f"[regime_detector] Published regimes for {len(symbol_regimes)} symbols",
+                            flush=True,
+                        )
+                except Exception as e:
+                    print(f"[regime_detector] Symbol regimes failed: {e}", flush=True)
+
             # Get strategy recommendations
             strategy = get_regime_strategy(regime)
 
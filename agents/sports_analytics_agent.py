@@ -10,6 +10,7 @@ from __future__ import annotations
 
 import json
 import os
+import sys
 import warnings
 
 # Force CPU execution for TensorFlow to avoid missing GPU kernels on macOS/LibreSSL builds.
@@ -30,75 +31,61 @@ except ImportError:
 from pathlib import Path
 from typing import Any
 
-try:
-    import numpy as np
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
 
-    HAS_NUMPY = True
-except ImportError:  # pragma: no cover - optional dependency warning at runtime
-    HAS_NUMPY = False
-    print("[sports_analytics] Install numpy: pip install numpy", flush=True)
+from utils.lazy_imports import lazy_import, module_available  # noqa: E402
 
-try:
-    from sklearn.calibration import CalibratedClassifierCV
-    from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
-    from sklearn.linear_model import LogisticRegression
-    from sklearn.metrics import accuracy_score, log_loss
-    from sklearn.model_selection import train_test_split
-    from sklearn.neural_network import MLPClassifier
+# Heavy ML dependencies are imported on first use: a restart that only serves
+# cached predictions or fallbacks never pays for sklearn/xgboost/tensorflow.
+np = lazy_import("numpy")
+HAS_NUMPY = module_available("numpy")
+if not HAS_NUMPY:  # pragma: no cover - optional dependency warning at runtime
+    print("[sports_analytics] Install numpy: pip install numpy", flush=True)
 
-    HAS_SKLEARN = True
-except ImportError:  # pragma: no cover - optional dependency warning at runtime
-    HAS_SKLEARN = False
+# sklearn estimators/metrics are imported inside train_ensemble
+HAS_SKLEARN = module_available("sklearn")
+if not HAS_SKLEARN:  # pragma: no cover - optional dependency warning at runtime
     print("[sports_analytics] Install scikit-learn: pip install scikit-learn", flush=True)
 
-try:
-    import xgboost as xgb
-
-    HAS_XGBOOST = True
-except ImportError:  # pragma: no cover - optional dependency warning at runtime
-    HAS_XGBOOST = False
+xgb = lazy_import("xgboost")
+HAS_XGBOOST = module_available("xgboost")
+if not HAS_XGBOOST:  # pragma: no cover - optional dependency warning at runtime
     print("[sports_analytics] Install xgboost: pip install xgboost", flush=True)
 
-try:
-    import lightgbm as lgb
-    from lightgbm.basic import LightGBMWarning
 
-    HAS_LIGHTGBM = True
-    warnings.filterwarnings("ignore", category=LightGBMWarning)
+def _quiet_lightgbm(module) -> None:
+    warnings.filterwarnings("ignore", category=module.basic.LightGBMWarning)
     warnings.filterwarnings("ignore", category=UserWarning, module="lightgbm")
-except ImportError:  # pragma: no cover - optional dependency warning at runtime
-    HAS_LIGHTGBM = False
 
-try:
-    import pandas as pd
 
-    HAS_PANDAS = True
-except ImportError:  # pragma: no cover
-    HAS_PANDAS = False
+lgb = lazy_import("lightgbm", on_import=_quiet_lightgbm)
+HAS_LIGHTGBM = module_available("lightgbm")
+
+pd = lazy_import("pandas")
+HAS_PANDAS = module_available("pandas")
+if not HAS_PANDAS:  # pragma: no cover
     print("[sports_analytics] Install pandas: pip install pandas", flush=True)
 
-try:
-    import tensorflow as tf
 
-    HAS_TENSORFLOW = True
+def _tensorflow_cpu_only(module) -> None:
     # Force CPU execution; Apple Silicon GPU lacks required kernels for attention/GRU masks.
     try:
-        tf.config.set_visible_devices([], "GPU")
+        module.config.set_visible_devices([], "GPU")
     except Exception:
         pass
     try:
-        tf.config.experimental.set_visible_devices([], "GPU")  # type: ignore[attr-defined]
+        module.config.experimental.set_visible_devices([], "GPU")  # type: ignore[attr-defined]
     except Exception:
         pass
-except ImportError:  # pragma: no cover - optional deep learning dependency
-    HAS_TENSORFLOW = False
 
-try:
-    import optuna
 
-    HAS_OPTUNA = True
-except ImportError:  # pragma: no cover - optional dependency
-    HAS_OPTUNA = False
+tf = lazy_import("tensorflow", on_import=_tensorflow_cpu_only)
+HAS_TENSORFLOW = module_available("tensorflow")
+
+optuna = lazy_import("optuna")
+HAS_OPTUNA = module_available("optuna")
 
 # Import analytics modules with error handling
 try:
@@ -894,6 +881,13 @@ def train_ensemble(
     if not (HAS_SKLEARN and HAS_NUMPY) or len(X) < 20:
         return {"type": "mock"}, [], {}
 
+    from sklearn.calibration import CalibratedClassifierCV
+    from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import accuracy_score, log_loss
+    from sklearn.model_selection import train_test_split
+    from sklearn.neural_network import MLPClassifier
+
     X_np = np.asarray(X, dtype=float)
     y_np = np.asarray(y, dtype=int)
 
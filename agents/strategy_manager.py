@@ -7,9 +7,12 @@ Allocates capital based on performance, tracks P&L per strategy,
 and automatically retires underperforming strategies.
 """
 
+from __future__ import annotations
+
 import json
 import logging
 import os
+import sys
 import time
 import traceback
 from datetime import UTC, datetime
@@ -18,12 +21,14 @@ from typing import Any
 
 import numpy as np
 
-try:
-    import pandas as pd
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
 
-    HAS_PANDAS = True
-except ImportError:
-    HAS_PANDAS = False
+from utils.lazy_imports import lazy_import, module_available  # noqa: E402
+
+pd = lazy_import("pandas")
+HAS_PANDAS = module_available("pandas")
 
 ROOT = Path(os.path.expanduser("~/neolight"))
 STATE = ROOT / "state"
@@ -80,6 +85,17 @@ STRATEGIES = {
 
 STRATEGY_PERFORMANCE_FILE = STATE / "strategy_performance.json"
 STRATEGY_ALLOCATIONS_FILE = RUNTIME / "strategy_allocations.json"
+MARKET_REGIME_FILE = RUNTIME / "market_regime.json"
+
+
+def load_market_regime() -> dict[str, Any]:
+    """Latest regime label and posterior probabilities published by regime_detector."""
+    try:
+        data = json.loads(MARKET_REGIME_FILE.read_text())
+    except (OSError, ValueError):
+        return {}
+    keys = ("regime", "confidence", "probabilities", "risk_multiplier", "method")
+    return {key: data[key] for key in keys if key in data}
 
 
 class StrategyManager:
@@ -628,6 +644,7 @@ def main():
             # Save allocations with method info
             try:
                 ranked = manager.rank_strategies()
+                market_regime = load_market_regime()
                 allocation_data = {
                     "timestamp": datetime.now(UTC).isoformat(),
                     "total_capital": equity,
@@ -636,10 +653,12 @@ def main():
                         {"strategy": name, "sharpe": sharpe} for name, sharpe in ranked
                     ],
                     "optimization_method": used_method,
+                    "market_regime": market_regime,
                 }
                 STRATEGY_ALLOCATIONS_FILE.write_text(json.dumps(allocation_data, indent=2))
                 logger.info(
-                    f"📊 Capital allocated across {len(allocations)} strategies ({used_method})"
+                    f"📊 Capital allocated across {len(allocations)} strategies ({used_method}, "
+                    f"regime {market_regime.get('regime', 'UNKNOWN')})"
                 )
             except Exception as e:
                 logger.error(f"❌ Error saving allocations: {e}")
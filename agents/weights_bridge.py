@@ -12,6 +12,15 @@ RUNTIME.mkdir(exist_ok=True, parents=True)
 SRC = RUNTIME / "strategy_weights.json"  # written by Strategy Lab
 OUT = RUNTIME / "allocations_override.json"  # what trader/intel can read
 
+try:
+    from utils.state_bus import get_state_bus
+
+    HAS_STATE_BUS = True
+except ImportError:
+    HAS_STATE_BUS = False
+
+_last_published: dict | None = None
+
 
 def normalize(weights: dict) -> dict:
     # keep only positives, sum1, cap per-asset 0.35, min 0.02
@@ -26,6 +35,18 @@ def normalize(weights: dict) -> dict:
     return {k: v / s2 for k, v in norm.items()}
 
 
+def write_allocations(payload: dict) -> None:
+    """Publish allocations on the state bus (which exports OUT), or write OUT directly."""
+    global _last_published
+    if payload == _last_published:
+        return  # unchanged; skip the rewrite/broadcast
+    if HAS_STATE_BUS:
+        get_state_bus(ROOT).publish("allocations", payload)
+    else:
+        OUT.write_text(json.dumps(payload, indent=2))
+    _last_published = payload
+
+
 def main():
     last = ""
     # Check for portfolio optimizer allocations (Phase 2500-2700)
@@ -44,16 +65,13 @@ def main():
                     # For now, use as-is (strategies will use these weights)
                     alloc = normalize(rl_weights)
                     if alloc:
-                        OUT.write_text(
-                            json.dumps(
-                                {
-                                    "allocations": alloc,
-                                    "source": "rl_inference",
-                                    "timestamp": rl_data.get("timestamp", ""),
-                                    "metadata": rl_data.get("metadata", {}),
-                                },
-                                indent=2,
-                            )
+                        write_allocations(
+                            {
+                                "allocations": alloc,
+                                "source": "rl_inference",
+                                "timestamp": rl_data.get("timestamp", ""),
+                                "metadata": rl_data.get("metadata", {}),
+                            }
                         )
                         print(
                             "✅ allocations_override.json updated from RL inference:",
@@ -73,16 +91,13 @@ def main():
                 if opt_weights:
                     alloc = normalize(opt_weights)
                     if alloc:
-                        OUT.write_text(
-                            json.dumps(
-                                {
-                                    "allocations": alloc,
-                                    "source": "portfolio_optimizer",
-                                    "method": opt_data.get("method", "sharpe"),
-                                    "timestamp": opt_data.get("timestamp", ""),
-                                },
-                                indent=2,
-                            )
+                        write_allocations(
+                            {
+                                "allocations": alloc,
+                                "source": "portfolio_optimizer",
+                                "method": opt_data.get("method", "sharpe"),
+                                "timestamp": opt_data.get("timestamp", ""),
+                            }
                         )
                         print(
                             "✅ allocations_override.json updated from optimizer:",
@@ -104,9 +119,7 @@ def main():
                     weights = data.get("weights") if "weights" in data else data
                     alloc = normalize(weights or {})
                     if alloc:
-                        OUT.write_text(
-                            json.dumps({"allocations": alloc, "source": "strategy_lab"}, indent=2)
-                        )
+                        write_allocations({"allocations": alloc, "source": "strategy_lab"})
                         print(
                             "✅ allocations_override.json updated from strategy_lab:",
                             alloc,
@@ -4,18 +4,29 @@ NeoLight Bayesian Optimizer - Advanced Math
 ==========================================
 Gaussian Process-based hyperparameter tuning.
 Finds optimal parameters faster than grid search.
+
+The surrogate is a Matérn-5/2 Gaussian process. Its Cholesky factor is
+extended in O(n²) per observation, and the kernel hyperparameters are
+refit by maximizing the marginal likelihood every few observations.
+Suggestions maximize analytic Expected Improvement (or UCB) with a
+multi-start L-BFGS-B search. suggest_batch() returns q points at once
+(Kriging believer or constant liar), so expensive objectives such as
+backtests can be evaluated by q workers in parallel.
 """
 
 import logging
+import math
 import os
 from collections.abc import Callable
+from concurrent.futures import Executor, ThreadPoolExecutor
 from pathlib import Path
 
 import numpy as np
 
 try:
+    from scipy.linalg import cho_solve, solve_triangular
     from scipy.optimize import minimize
-    from scipy.stats import norm
+    from scipy.special import ndtr
 
     HAS_SCIPY = True
 except ImportError:
@@ -45,27 +56,306 @@ if not logger.handlers:
     console_handler.setFormatter(logging.Formatter("%(levelname)s - %(message)s"))
     logger.addHandler(console_handler)
 
+SQRT5 = math.sqrt(5.0)
+INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+JITTER = 1e-8
+
+# Hyperparameter search box, in log space: lengthscales (unit cube), signal
+# variance and noise variance (standardized objective)
+LOG_LENGTHSCALE_BOUNDS = (math.log(0.01), math.log(10.0))
+LOG_SIGNAL_BOUNDS = (math.log(0.05), math.log(20.0))
+LOG_NOISE_BOUNDS = (math.log(1e-6), math.log(0.5))
+
+
+def matern52(
+    A: np.ndarray, B: np.ndarray, lengthscales: np.ndarray, signal_variance: float
+) -> np.ndarray:
+    """
+    Matérn-5/2 kernel with one lengthscale per dimension (ARD).
+
+    Args:
+        A: (n, d) points
+        B: (m, d) points
+        lengthscales: (d,) lengthscales
+        signal_variance: Kernel amplitude
+
+    Returns:
+        (n, m) covariance matrix
+    """
+    A = A / lengthscales
+    B = B / lengthscales
+    sq = (A * A).sum(1)[:, None] + (B * B).sum(1)[None, :] - 2.0 * A @ B.T
+    r = SQRT5 * np.sqrt(np.maximum(sq, 0.0))
+    return signal_variance * (1.0 + r + r * r / 3.0) * np.exp(-r)
+
+
+def expected_improvement(
+    mean: np.ndarray, std: np.ndarray, best: float, xi: float = 0.0
+) -> np.ndarray:
+    """
+    Analytic Expected Improvement for maximization.
+
+    Args:
+        mean: Posterior mean
+        std: Posterior standard deviation
+        best: Best observed value
+        xi: Exploration margin, in objective units
+
+    Returns:
+        EI per point (non-negative)
+    """
+    improvement = mean - best - xi
+    safe = np.maximum(std, 1e-12)
+    z = improvement / safe
+    ei = improvement * ndtr(z) + safe * INV_SQRT_2PI * np.exp(-0.5 * z * z)
+    return np.where(std > 1e-12, np.maximum(ei, 0.0), np.maximum(improvement, 0.0))
+
+
+def upper_confidence_bound(mean: np.ndarray, std: np.ndarray, kappa: float = 2.0) -> np.ndarray:
+    """Upper confidence bound mean + kappa * std for maximization."""
+    return mean + kappa * std
+
+
+class GaussianProcess:
+    """
+    Gaussian process regressor over the unit cube with a Matérn-5/2 kernel.
+
+    Targets are standardized internally. add_observation() extends the
+    Cholesky factor in O(n²) with the current hyperparameters; fit()
+    refactors from scratch and can refit the hyperparameters by maximizing
+    the log marginal likelihood.
+    """
+
+    def __init__(
+        self,
+        n_dims: int,
+        lengthscale: float = 0.3,
+        signal_variance: float = 1.0,
+        noise: float = 1e-4,
+        seed: int | None = None,
+    ):
+        """
+        Initialize the GP.
+
+        Args:
+            n_dims: Input dimensionality
+            lengthscale: Initial lengthscale for every dimension
+            signal_variance: Initial kernel amplitude
+            noise: Initial observation noise variance
+            seed: Seed for hyperparameter restarts
+        """
+        self.n_dims = n_dims
+        self.lengthscales = np.full(n_dims, float(lengthscale))
+        self.signal_variance = float(signal_variance)
+        self.noise = float(noise)
+        self.rng = np.random.default_rng(seed)
+
+        self.X = np.empty((0, n_dims))
+        self.y = np.empty(0)
+        self.L = np.empty((0, 0))
+        self.alpha = np.empty(0)
+        self.y_mean = 0.0
+        self.y_std = 1.0
+
+    @property
+    def n(self) -> int:
+        return len(self.y)
+
+    def _kernel(self, A: np.ndarray, B: np.ndarray) -> np.ndarray:
+        return matern52(A, B, self.lengthscales, self.signal_variance)
+
+    def _update_targets(self) -> None:
+        """Re-standardize targets and recompute alpha against the current factor."""
+        self.y_mean = float(self.y.mean())
+        std = float(self.y.std())
+        self.y_std = std if std > 1e-12 else 1.0
+        self.alpha = cho_solve((self.L, True), (self.y - self.y_mean) / self.y_std)
+
+    def _theta(self) -> np.ndarray:
+        return np.concatenate(
+            [np.log(self.lengthscales), [math.log(self.signal_variance), math.log(self.noise)]]
+        )
+
+    def _set_theta(self, theta: np.ndarray) -> None:
+        d = self.n_dims
+        self.lengthscales = np.exp(theta[:d])
+        self.signal_variance = float(np.exp(theta[d]))
+        self.noise = float(np.exp(theta[d + 1]))
+
+    def negative_log_marginal_likelihood(self, theta: np.ndarray) -> float:
+        """
+        Negative log marginal likelihood of the standardized targets.
+
+        Args:
+            theta: log lengthscales, log signal variance, log noise variance
+
+        Returns:
+            NLML (large when the kernel matrix is not positive definite)
+        """
+        d = self.n_dims
+        lengthscales, signal, noise = np.exp(theta[:d]), np.exp(theta[d]), np.exp(theta[d + 1])
+        y = (self.y - self.y_mean) / self.y_std
+        K = matern52(self.X, self.X, lengthscales, signal)
+        K[np.diag_indices_from(K)] += noise + JITTER
+        try:
+            L = np.linalg.cholesky(K)
+        except np.linalg.LinAlgError:
+            return 1e10
+        alpha = cho_solve((L, True), y)
+        return float(
+            0.5 * y @ alpha + np.log(np.diag(L)).sum() + 0.5 * len(y) * math.log(2 * math.pi)
+        )
+
+    def fit(self, X, y, optimize: bool = True, n_restarts: int = 2) -> "GaussianProcess":
+        """
+        Condition on (X, y) from scratch.
+
+        Args:
+            X: (n, d) inputs in the unit cube
+            y: (n,) targets
+            optimize: Refit hyperparameters by maximizing the marginal likelihood
+            n_restarts: Random restarts in addition to the current hyperparameters
+
+        Returns:
+            self
+        """
+        self.X = np.array(X, dtype=float).reshape(-1, self.n_dims)
+        self.y = np.array(y, dtype=float).ravel()
+        self.y_mean = float(self.y.mean())
+        std = float(self.y.std())
+        self.y_std = std if std > 1e-12 else 1.0
+
+        if optimize and self.n >= 3:
+            bounds = [LOG_LENGTHSCALE_BOUNDS] * self.n_dims + [LOG_SIGNAL_BOUNDS, LOG_NOISE_BOUNDS]
+            lows, highs = np.array(bounds).T
+            starts = [np.clip(self._theta(), lows, highs)]
+            starts += [self.rng.uniform(lows, highs) for _ in range(n_restarts)]
+            best = None
+            for start in starts:
+                result = minimize(
+                    self.negative_log_marginal_likelihood, start, method="L-BFGS-B", bounds=bounds
+                )
+                if best is None or result.fun < best.fun:
+                    best = result
+            self._set_theta(best.x)
+
+        K = self._kernel(self.X, self.X)
+        K[np.diag_indices_from(K)] += self.noise + JITTER
+        self.L = np.linalg.cholesky(K)
+        self._update_targets()
+        return self
+
+    def add_observation(self, x, y: float) -> None:
+        """
+        Condition on one more point with the current hyperparameters.
+
+        Extends the Cholesky factor by one row in O(n²) instead of
+        refactoring the kernel matrix.
+
+        Args:
+            x: (d,) input in the unit cube
+            y: Target
+        """
+        x = np.asarray(x, dtype=float).reshape(1, self.n_dims)
+        if self.n == 0:
+            self.fit(x, [y], optimize=False)
+            return
+        k = self._kernel(self.X, x)[:, 0]
+        row = solve_triangular(self.L, k, lower=True)
+        corner = self.signal_variance + self.noise + JITTER - row @ row
+        n = self.n
+        L = np.zeros((n + 1, n + 1))
+        L[:n, :n] = self.L
+        L[n, :n] = row
+        L[n, n] = math.sqrt(max(corner, JITTER))
+        self.L = L
+        self.X = np.vstack([self.X, x])
+        self.y = np.append(self.y, y)
+        self._update_targets()
+
+    def predict(self, Xq) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Posterior mean and standard deviation.
+
+        Args:
+            Xq: (m, d) query points in the unit cube
+
+        Returns:
+            (mean, std), each (m,), in objective units
+        """
+        Xq = np.asarray(Xq, dtype=float).reshape(-1, self.n_dims)
+        if self.n == 0:
+            return np.zeros(len(Xq)), np.full(len(Xq), math.sqrt(self.signal_variance))
+        Ks = self._kernel(Xq, self.X)
+        mean = Ks @ self.alpha
+        v = solve_triangular(self.L, Ks.T, lower=True)
+        var = np.maximum(self.signal_variance - (v * v).sum(0), 1e-12)
+        return self.y_mean + self.y_std * mean, self.y_std * np.sqrt(var)
+
+    def copy(self) -> "GaussianProcess":
+        """Independent copy for fantasized (batch) observations."""
+        clone = GaussianProcess.__new__(GaussianProcess)
+        clone.__dict__.update(self.__dict__)
+        clone.lengthscales = self.lengthscales.copy()
+        clone.rng = np.random.default_rng(self.rng.integers(2**32))
+        return clone
+
 
 class BayesianOptimizer:
     """
-    Bayesian Optimization using Gaussian Process (simplified).
-    Uses Expected Improvement (EI) acquisition function.
+    Bayesian Optimization using a Gaussian Process surrogate.
+    Uses Expected Improvement (EI) or UCB acquisition, maximizing the objective.
     """
 
-    def __init__(self, param_bounds: dict[str, tuple[float, float]], n_initial: int = 5):
+    def __init__(
+        self,
+        param_bounds: dict[str, tuple[float, float]],
+        n_initial: int = 5,
+        acquisition: str = "ei",
+        xi: float = 0.01,
+        kappa: float = 2.0,
+        refit_interval: int = 5,
+        n_candidates: int = 1000,
+        n_restarts: int = 5,
+        seed: int | None = None,
+    ):
         """
         Initialize Bayesian Optimizer.
 
         Args:
             param_bounds: Dict of {param_name: (min, max)}
             n_initial: Number of initial random samples
+            acquisition: "ei" (Expected Improvement) or "ucb"
+            xi: EI exploration margin, in standard deviations of the objective
+            kappa: UCB exploration weight
+            refit_interval: Observations between GP hyperparameter refits
+            n_candidates: Random candidates screened before local optimization
+            n_restarts: L-BFGS-B starts for the acquisition optimizer
+            seed: Random seed
         """
         if not HAS_SCIPY:
             raise ImportError("scipy required for Bayesian Optimization")
+        if acquisition not in ("ei", "ucb"):
+            raise ValueError(f"Unknown acquisition: {acquisition}")
 
         self.param_bounds = param_bounds
         self.param_names = list(param_bounds.keys())
         self.n_initial = n_initial
+        self.acquisition = acquisition
+        self.xi = xi
+        self.kappa = kappa
+        self.refit_interval = refit_interval
+        self.n_candidates = n_candidates
+        self.n_restarts = n_restarts
+        self.rng = np.random.default_rng(seed)
+
+        self._lows = np.array([param_bounds[name][0] for name in self.param_names], dtype=float)
+        self._spans = np.array(
+            [param_bounds[name][1] - param_bounds[name][0] for name in self.param_names],
+            dtype=float,
+        )
+        self.gp = GaussianProcess(len(self.param_names), seed=seed)
+        self._last_fit = 0
 
         # Storage for observations
         self.X = []  # Parameter values
@@ -73,31 +363,55 @@ class BayesianOptimizer:
 
         logger.info(f"✅ BayesianOptimizer initialized for {len(self.param_names)} parameters")
 
+    def _to_unit(self, params: dict[str, float]) -> np.ndarray:
+        values = np.array([params[name] for name in self.param_names], dtype=float)
+        return (values - self._lows) / np.where(self._spans > 0, self._spans, 1.0)
+
+    def _from_unit(self, x: np.ndarray) -> dict[str, float]:
+        values = self._lows + np.clip(x, 0.0, 1.0) * self._spans
+        return {name: float(v) for name, v in zip(self.param_names, values, strict=True)}
+
     def _random_sample(self) -> dict[str, float]:
         """Generate random parameter sample."""
-        sample = {}
-        for name, (min_val, max_val) in self.param_bounds.items():
-            sample[name] = np.random.uniform(min_val, max_val)
-        return sample
+        return self._from_unit(self.rng.random(len(self.param_names)))
 
-    def _expected_improvement(self, x: np.ndarray, best_y: float) -> float:
-        """
-        Calculate Expected Improvement acquisition function.
-        Simplified version (full GP would require more computation).
-        """
-        # Simplified: use distance from best point
-        if len(self.X) == 0:
-            return 1.0
+    def _acquisition(self, gp: GaussianProcess, x: np.ndarray, best_y: float) -> np.ndarray:
+        """Acquisition value for each row of x (unit cube)."""
+        mean, std = gp.predict(x)
+        if self.acquisition == "ucb":
+            return upper_confidence_bound(mean, std, self.kappa)
+        return expected_improvement(mean, std, best_y, self.xi * gp.y_std)
 
-        # Calculate distance to nearest observed point
-        distances = [
-            np.linalg.norm(x - np.array([self.X[i][name] for name in self.param_names]))
-            for i in range(len(self.X))
-        ]
-        min_distance = min(distances) if distances else 1.0
+    def _maximize_acquisition(self, gp: GaussianProcess, best_y: float) -> np.ndarray:
+        """
+        Multi-start acquisition maximization.
 
-        # Higher distance = higher expected improvement
-        return min_distance
+        Screens random candidates plus perturbations of the best observed
+        points in one vectorized call, then polishes the top candidates with
+        L-BFGS-B inside the unit cube.
+        """
+        d = len(self.param_names)
+        candidates = [self.rng.random((self.n_candidates, d))]
+        if gp.n:
+            top = gp.X[np.argsort(gp.y)[-5:]]
+            local = top[self.rng.integers(len(top), size=self.n_candidates // 4)]
+            candidates.append(np.clip(local + self.rng.normal(0, 0.05, local.shape), 0.0, 1.0))
+        candidates = np.vstack(candidates)
+        scores = self._acquisition(gp, candidates, best_y)
+
+        order = np.argsort(scores)[-self.n_restarts :]
+        best_x, best_score = candidates[order[-1]], scores[order[-1]]
+        bounds = [(0.0, 1.0)] * d
+        for start in candidates[order]:
+            result = minimize(
+                lambda z: -self._acquisition(gp, z, best_y)[0],
+                start,
+                method="L-BFGS-B",
+                bounds=bounds,
+            )
+            if -result.fun > best_score:
+                best_x, best_score = result.x, -result.fun
+        return np.clip(best_x, 0.0, 1.0)
 
     def suggest(self) -> dict[str, float]:
         """
@@ -106,81 +420,126 @@ class BayesianOptimizer:
         Returns:
             Dictionary of parameter values
         """
-        if len(self.X) < self.n_initial:
-            # Random sampling for initial exploration
-            return self._random_sample()
+        return self.suggest_batch(1)[0]
 
-        # Bayesian optimization: maximize Expected Improvement
-        best_y = max(self.y) if self.y else 0.0
-
-        # Grid search over parameter space (simplified - full GP would be better)
-        best_x = None
-        best_ei = -np.inf
+    def suggest_batch(self, q: int, strategy: str = "kriging_believer") -> list[dict[str, float]]:
+        """
+        Suggest q parameter sets to evaluate in parallel.
 
-        # Sample random points and pick best EI
-        for _ in range(50):
-            x_dict = self._random_sample()
-            x_array = np.array([x_dict[name] for name in self.param_names])
-            ei = self._expected_improvement(x_array, best_y)
+        After each pick the GP is conditioned on a fantasized outcome at that
+        point (its posterior mean for the Kriging believer, the worst observed
+        value for the constant liar), which lowers the acquisition nearby
+        so the next pick goes elsewhere.
 
-            if ei > best_ei:
-                best_ei = ei
-                best_x = x_dict
+        Args:
+            q: Number of suggestions
+            strategy: "kriging_believer" or "constant_liar"
 
-        return best_x if best_x else self._random_sample()
+        Returns:
+            List of q parameter dictionaries
+        """
+        if strategy not in ("kriging_believer", "constant_liar"):
+            raise ValueError(f"Unknown batch strategy: {strategy}")
+        if len(self.X) < self.n_initial or self.gp.n == 0:
+            return [self._random_sample() for _ in range(q)]
+
+        best_y = float(self.gp.y.max())
+        lie = float(self.gp.y.min())
+        gp = self.gp.copy() if q > 1 else self.gp
+        batch = []
+        for i in range(q):
+            x = self._maximize_acquisition(gp, best_y)
+            batch.append(self._from_unit(x))
+            if i < q - 1:
+                fantasy = gp.predict(x)[0][0] if strategy == "kriging_believer" else lie
+                gp.add_observation(x, fantasy)
+        return batch
 
     def update(self, params: dict[str, float], objective_value: float):
         """
         Update optimizer with new observation.
 
+        Failed evaluations (non-finite values) are shown to the GP as the
+        worst value observed so far.
+
         Args:
             params: Parameter values tested
             objective_value: Objective function value (higher is better)
         """
         self.X.append(params)
         self.y.append(objective_value)
-
         logger.debug(f"📊 Updated: {params} -> {objective_value:.4f}")
 
+        finite = [v for v in self.y if np.isfinite(v)]
+        if not finite:
+            return
+        floor = min(finite)
+        if self.gp.n == 0 or len(self.y) - self._last_fit >= self.refit_interval:
+            X = np.array([self._to_unit(p) for p in self.X])
+            y = [v if np.isfinite(v) else floor for v in self.y]
+            self.gp.fit(X, y, optimize=True)
+            self._last_fit = len(self.y)
+        else:
+            value = objective_value if np.isfinite(objective_value) else floor
+            self.gp.add_observation(self._to_unit(params), value)
+
     def optimize(
-        self, objective_func: Callable[[dict[str, float]], float], n_iterations: int = 20
+        self,
+        objective_func: Callable[[dict[str, float]], float],
+        n_iterations: int = 20,
+        batch_size: int = 1,
+        strategy: str = "kriging_believer",
+        executor: Executor | None = None,
     ) -> tuple[dict[str, float], float]:
         """
         Optimize objective function.
 
         Args:
             objective_func: Function that takes params dict and returns objective value
-            n_iterations: Number of optimization iterations
+            n_iterations: Number of objective evaluations
+            batch_size: Evaluations run concurrently per round
+            strategy: Batch strategy for suggest_batch()
+            executor: Executor for batch evaluations (default: a thread pool of batch_size)
 
         Returns:
             (best_params, best_value)
         """
-        logger.info(f"🚀 Starting Bayesian Optimization ({n_iterations} iterations)...")
-
-        best_params = None
-        best_value = -np.inf
+        logger.info(
+            f"🚀 Starting Bayesian Optimization ({n_iterations} evaluations, batch {batch_size})..."
+        )
 
-        for i in range(n_iterations):
-            # Suggest next parameters
-            params = self.suggest()
-
-            # Evaluate objective
+        def evaluate(params: dict[str, float]) -> float:
             try:
-                value = objective_func(params)
+                return objective_func(params)
             except Exception as e:
                 logger.warning(f"⚠️  Objective function error: {e}")
-                value = -np.inf
+                return -np.inf
 
-            # Update optimizer
-            self.update(params, value)
+        own_executor = executor is None and batch_size > 1
+        if own_executor:
+            executor = ThreadPoolExecutor(max_workers=batch_size)
 
-            # Track best
-            if value > best_value:
-                best_value = value
-                best_params = params.copy()
-                logger.info(
-                    f"✅ Iteration {i + 1}: New best value {best_value:.4f} with {best_params}"
-                )
+        best_params = None
+        best_value = -np.inf
+        done = 0
+        try:
+            while done < n_iterations:
+                q = min(batch_size, n_iterations - done)
+                batch = self.suggest_batch(q, strategy)
+                values = list(executor.map(evaluate, batch)) if q > 1 else [evaluate(batch[0])]
+
+                for params, value in zip(batch, values, strict=True):
+                    done += 1
+                    self.update(params, value)
+                    if value > best_value:
+                        best_value = value
+                        best_params = params.copy()
+                        logger.info(
+                            f"✅ Iteration {done}: New best value {best_value:.4f} with {best_params}"
+                        )
+        finally:
+            if own_executor:
+                executor.shutdown()
 
         logger.info(f"✅ Optimization complete. Best: {best_value:.4f} with {best_params}")
 
@@ -208,8 +567,8 @@ def main():
     # Initialize optimizer
     optimizer = BayesianOptimizer(bounds, n_initial=5)
 
-    # Optimize
-    best_params, best_value = optimizer.optimize(objective, n_iterations=20)
+    # Optimize, four evaluations at a time
+    best_params, best_value = optimizer.optimize(objective, n_iterations=20, batch_size=4)
 
     logger.info(f"✅ Best parameters: {best_params}")
     logger.info(f"✅ Best value: {best_value:.4f}")
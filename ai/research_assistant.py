@@ -11,15 +11,31 @@ Features:
 - Code analysis and optimization
 - Autonomous development suggestions
 - Performance optimization recommendations
+- Cached, deduplicated and latency-routed calls via the LLM gateway
 """
 
 import json
 import logging
 import os
+import sys
+from pathlib import Path
 from typing import Any
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from utils.llm_gateway import get_gateway  # noqa: E402
+
 logger = logging.getLogger("research_assistant")
 
+try:
+    import requests  # noqa: F401
+
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+
 # Try to import all AI SDKs
 AI_PROVIDERS = {}
 
@@ -58,6 +74,22 @@ try:
 except ImportError:
     pass
 
+SYSTEM_PROMPT = """You are NeoLight Research Assistant, an AI expert for the NeoLight autonomous trading system.
+
+NeoLight Architecture:
+- Python: AI/ML decision layer (SmartTrader, agents)
+- Go: High-speed API & telemetry (dashboard, real-time data)
+- Rust: Risk & execution core (risk engine, backtesting)
+- Hybrid multi-runtime orchestration
+
+Provide world-class insights on:
+1. Trading strategies (RSI, momentum, regime-aware)
+2. Code optimization and performance
+3. Risk management and capital allocation
+4. System architecture improvements
+
+Always provide actionable, production-ready recommendations."""
+
 
 class NeoLightResearchAssistant:
     """
@@ -194,15 +226,16 @@ class NeoLightResearchAssistant:
             return None
 
         providers_to_try = (
-            [provider] if provider and provider in self.providers else self.provider_order
+            [provider]
+            if provider and provider in self.providers
+            else get_gateway().route(self.provider_order)
         )
 
         for prov_name in providers_to_try:
             try:
                 result = self._query_provider(prov_name, query, context, max_tokens, temperature)
                 if result:
-                    result["provider"] = prov_name
-                    return result
+                    return {**result, "provider": prov_name}  # Cached dicts stay unmodified
             except Exception as e:
                 logger.warning(f"⚠️ {prov_name} failed: {e}, trying next provider...")
                 continue
@@ -213,28 +246,27 @@ class NeoLightResearchAssistant:
     def _query_provider(
         self, provider: str, query: str, context: str | None, max_tokens: int, temperature: float
     ) -> dict[str, Any] | None:
-        """Query a specific provider"""
-        prov = self.providers[provider]
-        system_prompt = """You are NeoLight Research Assistant, an AI expert for the NeoLight autonomous trading system.
-
-NeoLight Architecture:
-- Python: AI/ML decision layer (SmartTrader, agents)
-- Go: High-speed API & telemetry (dashboard, real-time data)
-- Rust: Risk & execution core (risk engine, backtesting)
-- Hybrid multi-runtime orchestration
-
-Provide world-class insights on:
-1. Trading strategies (RSI, momentum, regime-aware)
-2. Code optimization and performance
-3. Risk management and capital allocation
-4. System architecture improvements
-
-Always provide actionable, production-ready recommendations."""
-
+        """Query a specific provider through the LLM gateway (cached, deduplicated)"""
         user_content = query
         if context:
             user_content = f"Context: {context}\n\nQuery: {query}"
 
+        return get_gateway().complete(
+            provider,
+            f"{SYSTEM_PROMPT}\n\n{user_content}",
+            lambda: self._call_provider(provider, user_content, max_tokens, temperature),
+            model=self.providers[provider].get("model", ""),
+            params={"max_tokens": max_tokens, "temperature": temperature},
+        )
+
+    def _call_provider(
+        self, provider: str, user_content: str, max_tokens: int, temperature: float
+    ) -> dict[str, Any] | None:
+        """Send one request to a specific provider"""
+        prov = self.providers[provider]
+        system_prompt = SYSTEM_PROMPT
+        session = get_gateway().session
+
         if provider == "openai":
             client = prov["client"]
             client.api_key = prov["api_key"]
@@ -312,9 +344,8 @@ Always provide actionable, production-ready recommendations."""
             }
 
         elif provider == "ollama":
-            # Ollama local model (unlimited)
-            import requests
-            response = requests.post(
+            # Ollama local model (unlimited), over the gateway's pooled session
+            response = session.post(
                 f"{prov['base_url']}/api/generate",
                 json={
                     "model": prov["model"],
@@ -335,8 +366,7 @@ Always provide actionable, production-ready recommendations."""
 
         elif provider == "rapidapi":
             # RapidAPI (500/month limit) - use Llama 3.3 70B
-            import requests
-            response = requests.post(
+            response = session.post(
                 prov["llama_url"],
                 headers={
                     "x-rapidapi-host": "open-ai21.p.rapidapi.com",
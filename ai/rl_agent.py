@@ -112,6 +112,9 @@ class SimplePolicy:
         # Simple linear policy with random initialization
         self.weights = np.random.randn(state_size, action_size) * 0.1
         self.bias = np.random.randn(action_size) * 0.1
+        # Linear value baseline (trained by PPOAgent.train_on_buffer)
+        self.value_weights = np.zeros(state_size)
+        self.value_bias = 0.0
 
     def predict(self, state: np.ndarray) -> np.ndarray:
         """Predict action (strategy weights)."""
@@ -121,6 +124,111 @@ class SimplePolicy:
         probs = exp_logits / np.sum(exp_logits)
         return probs
 
+    def predict_batch(self, states: np.ndarray) -> np.ndarray:
+        """Predict action probabilities for a batch of states, shape (B, action_size)."""
+        logits = states @ self.weights + self.bias
+        logits -= logits.max(axis=1, keepdims=True)
+        exp_logits = np.exp(logits)
+        return exp_logits / exp_logits.sum(axis=1, keepdims=True)
+
+    def value(self, states: np.ndarray) -> np.ndarray:
+        """Estimate state values for a batch of states, shape (B,)."""
+        return states @ self.value_weights + self.value_bias
+
+
+class RolloutBuffer:
+    """
+    Preallocated rollout storage for vectorized PPO.
+
+    Arrays are laid out (num_steps, num_envs, ...) and filled one vectorized
+    step at a time; GAE runs backwards over steps with all envs at once.
+    """
+
+    def __init__(
+        self,
+        num_steps: int,
+        num_envs: int,
+        state_size: int = STATE_SIZE,
+        gamma: float = 0.99,
+        gae_lambda: float = 0.95,
+    ):
+        self.num_steps = num_steps
+        self.num_envs = num_envs
+        self.state_size = state_size
+        self.gamma = gamma
+        self.gae_lambda = gae_lambda
+
+        self.states = np.zeros((num_steps, num_envs, state_size), dtype=np.float32)
+        self.actions = np.zeros((num_steps, num_envs), dtype=np.int64)
+        self.log_probs = np.zeros((num_steps, num_envs), dtype=np.float32)
+        self.values = np.zeros((num_steps, num_envs), dtype=np.float32)
+        self.rewards = np.zeros((num_steps, num_envs), dtype=np.float32)
+        self.dones = np.zeros((num_steps, num_envs), dtype=np.float32)
+        self.advantages = np.zeros((num_steps, num_envs), dtype=np.float32)
+        self.returns = np.zeros((num_steps, num_envs), dtype=np.float32)
+        self.ptr = 0
+
+    @property
+    def full(self) -> bool:
+        return self.ptr >= self.num_steps
+
+    def add(
+        self,
+        states: np.ndarray,
+        actions: np.ndarray,
+        log_probs: np.ndarray,
+        values: np.ndarray,
+        rewards: np.ndarray,
+        dones: np.ndarray,
+    ):
+        """Store one vectorized step (every argument has leading dimension num_envs)."""
+        if self.full:
+            raise IndexError("RolloutBuffer is full; call reset() after training")
+        i = self.ptr
+        self.states[i] = states
+        self.actions[i] = actions
+        self.log_probs[i] = log_probs
+        self.values[i] = values
+        self.rewards[i] = rewards
+        self.dones[i] = dones
+        self.ptr += 1
+
+    def compute_gae(self, last_values: np.ndarray):
+        """
+        Compute generalized advantage estimates and returns in place.
+
+        dones[t] marks that the episode ended after step t, so no value is
+        bootstrapped across that boundary.
+
+        Args:
+            last_values: Value estimates for the observations after the final step
+        """
+        gae = np.zeros(self.num_envs, dtype=np.float32)
+        next_values = np.asarray(last_values, dtype=np.float32)
+        for t in reversed(range(self.ptr)):
+            not_done = 1.0 - self.dones[t]
+            delta = self.rewards[t] + self.gamma * next_values * not_done - self.values[t]
+            gae = delta + self.gamma * self.gae_lambda * not_done * gae
+            self.advantages[t] = gae
+            next_values = self.values[t]
+        self.returns[: self.ptr] = self.advantages[: self.ptr] + self.values[: self.ptr]
+
+    def flatten(self) -> dict[str, np.ndarray]:
+        """Return filled steps flattened to (ptr * num_envs, ...) views."""
+        n = self.ptr * self.num_envs
+        return {
+            "states": self.states[: self.ptr].reshape(n, self.state_size),
+            "actions": self.actions[: self.ptr].reshape(n),
+            "log_probs": self.log_probs[: self.ptr].reshape(n),
+            "values": self.values[: self.ptr].reshape(n),
+            "advantages": self.advantages[: self.ptr].reshape(n),
+            "returns": self.returns[: self.ptr].reshape(n),
+        }
+
+    def reset(self):
+        """Mark the buffer empty (arrays are reused)."""
+        self.ptr = 0
+
 
 class PPOAgent:
     """
@@ -138,6 +246,7 @@ class PPOAgent:
         value_coef: float = 0.5,
         entropy_coef: float = 0.01,
         use_torch: bool = True,
+        gae_lambda: float = 0.95,
     ):
         """
         Initialize PPO agent.
@@ -151,6 +260,7 @@ class PPOAgent:
             value_coef: Value loss coefficient
             entropy_coef: Entropy bonus coefficient
             use_torch: Whether to use PyTorch (if available)
+            gae_lambda: GAE smoothing parameter for vectorized training
         """
         self.state_size = state_size
         self.action_size = action_size
@@ -159,6 +269,7 @@ class PPOAgent:
         self.epsilon = epsilon
         self.value_coef = value_coef
         self.entropy_coef = entropy_coef
+        self.gae_lambda = gae_lambda
         self.use_torch = use_torch and HAS_TORCH
 
         # Initialize networks
@@ -282,6 +393,188 @@ class PPOAgent:
             advantages.append(adv)
         return advantages
 
+    def select_actions(
+        self, states: np.ndarray, deterministic: bool = False
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Select actions for a batch of states in one forward pass.
+
+        Args:
+            states: State matrix of shape (B, state_size)
+            deterministic: If True, take the argmax strategy
+
+        Returns:
+            (action_indices, log_probs, values), each of shape (B,)
+        """
+        states = np.asarray(states, dtype=np.float32)
+
+        if self.use_torch:
+            with torch.no_grad():
+                states_t = torch.as_tensor(states)
+                logits = self.policy_net(states_t)
+                values = self.value_net(states_t).squeeze(-1)
+                dist = torch.distributions.Categorical(logits=logits)
+                indices = torch.argmax(logits, dim=1) if deterministic else dist.sample()
+                log_probs = dist.log_prob(indices)
+            return indices.numpy(), log_probs.numpy(), values.numpy()
+
+        probs = self.policy.predict_batch(states)
+        if deterministic:
+            indices = probs.argmax(axis=1)
+        else:
+            # Inverse-CDF sampling for every row at once
+            draws = np.random.random((len(probs), 1))
+            indices = (probs.cumsum(axis=1) < draws).sum(axis=1)
+            indices = np.minimum(indices, self.action_size - 1)
+        log_probs = np.log(probs[np.arange(len(probs)), indices] + 1e-8)
+        return indices, log_probs.astype(np.float32), self.policy.value(states).astype(np.float32)
+
+    def estimate_values(self, states: np.ndarray) -> np.ndarray:
+        """Estimate state values for a batch of states, shape (B,)."""
+        states = np.asarray(states, dtype=np.float32)
+        if self.use_torch:
+            with torch.no_grad():
+                return self.value_net(torch.as_tensor(states)).squeeze(-1).numpy()
+        return self.policy.value(states).astype(np.float32)
+
+    def train_on_buffer(
+        self, buffer: RolloutBuffer, epochs: int = 4, minibatch_size: int = 256
+    ) -> dict[str, float]:
+        """
+        Minibatch PPO update from a filled RolloutBuffer (compute_gae already called).
+
+        Args:
+            buffer: Rollout buffer with advantages and returns
+            epochs: Passes over the rollout
+            minibatch_size: Samples per gradient step
+
+        Returns:
+            Training metrics averaged over minibatches
+        """
+        data = buffer.flatten()
+        n = len(data["actions"])
+        if n == 0:
+            logger.warning("No transitions to train on")
+            return {"policy_loss": 0.0, "value_loss": 0.0, "entropy": 0.0}
+
+        advantages = data["advantages"]
+        if n > 1:
+            advantages = (advantages - advantages.mean()) / (advantages.std() + 1e-8)
+
+        if self.use_torch:
+            metrics = self._torch_ppo_update(data, advantages, epochs, minibatch_size)
+        else:
+            metrics = self._numpy_ppo_update(data, advantages, epochs, minibatch_size)
+
+        logger.debug(f"Vectorized training step: {metrics}")
+        return metrics
+
+    def _torch_ppo_update(
+        self, data: dict[str, np.ndarray], advantages: np.ndarray, epochs: int, minibatch_size: int
+    ) -> dict[str, float]:
+        """Clipped-objective PPO epochs over shuffled minibatches (PyTorch)."""
+        states_t = torch.as_tensor(data["states"])
+        actions_t = torch.as_tensor(data["actions"])
+        old_log_probs_t = torch.as_tensor(data["log_probs"])
+        returns_t = torch.as_tensor(data["returns"])
+        advantages_t = torch.as_tensor(advantages, dtype=torch.float32)
+        n = len(actions_t)
+
+        totals = {"policy_loss": 0.0, "value_loss": 0.0, "entropy": 0.0, "approx_kl": 0.0}
+        num_batches = 0
+        for _ in range(epochs):
+            indices = torch.randperm(n)
+            for start in range(0, n, minibatch_size):
+                batch = indices[start : start + minibatch_size]
+                logits = self.policy_net(states_t[batch])
+                values = self.value_net(states_t[batch]).squeeze(-1)
+                dist = torch.distributions.Categorical(logits=logits)
+                new_log_probs = dist.log_prob(actions_t[batch])
+                entropy = dist.entropy().mean()
+
+                log_ratio = new_log_probs - old_log_probs_t[batch]
+                ratio = torch.exp(log_ratio)
+                surr1 = ratio * advantages_t[batch]
+                surr2 = torch.clamp(ratio, 1 - self.epsilon, 1 + self.epsilon) * advantages_t[batch]
+                policy_loss = -torch.min(surr1, surr2).mean() - self.entropy_coef * entropy
+                value_loss = self.value_coef * F.mse_loss(values, returns_t[batch])
+
+                self.policy_optimizer.zero_grad()
+                policy_loss.backward()
+                torch.nn.utils.clip_grad_norm_(self.policy_net.parameters(), 0.5)
+                self.policy_optimizer.step()
+
+                self.value_optimizer.zero_grad()
+                value_loss.backward()
+                torch.nn.utils.clip_grad_norm_(self.value_net.parameters(), 0.5)
+                self.value_optimizer.step()
+
+                totals["policy_loss"] += policy_loss.item()
+                totals["value_loss"] += value_loss.item()
+                totals["entropy"] += entropy.item()
+                totals["approx_kl"] += ((ratio - 1) - log_ratio).mean().item()
+                num_batches += 1
+
+        return {k: v / max(num_batches, 1) for k, v in totals.items()}
+
+    def _numpy_ppo_update(
+        self, data: dict[str, np.ndarray], advantages: np.ndarray, epochs: int, minibatch_size: int
+    ) -> dict[str, float]:
+        """Clipped-objective PPO with analytic gradients for the linear fallback policy."""
+        states = data["states"].astype(np.float64)
+        actions = data["actions"]
+        old_log_probs = data["log_probs"].astype(np.float64)
+        returns = data["returns"].astype(np.float64)
+        n = len(actions)
+        policy = self.policy
+
+        totals = {"policy_loss": 0.0, "value_loss": 0.0, "entropy": 0.0, "approx_kl": 0.0}
+        num_batches = 0
+        for _ in range(epochs):
+            indices = np.random.permutation(n)
+            for start in range(0, n, minibatch_size):
+                batch = indices[start : start + minibatch_size]
+                x = states[batch]
+                a = actions[batch]
+                adv = advantages[batch]
+                rows = np.arange(len(batch))
+
+                probs = policy.predict_batch(x)
+                log_probs_all = np.log(probs + 1e-8)
+                new_log_probs = log_probs_all[rows, a]
+                log_ratio = new_log_probs - old_log_probs[batch]
+                ratio = np.exp(log_ratio)
+                clipped = np.clip(ratio, 1 - self.epsilon, 1 + self.epsilon)
+                # Gradient flows only where the unclipped surrogate is the active minimum
+                active = (ratio * adv) <= (clipped * adv)
+                entropy_rows = -(probs * log_probs_all).sum(axis=1)
+
+                one_hot = np.zeros_like(probs)
+                one_hot[rows, a] = 1.0
+                grad_logp = np.where(active, -ratio * adv, 0.0)[:, None] * (one_hot - probs)
+                grad_entropy = -probs * (log_probs_all + entropy_rows[:, None])
+                grad_logits = (grad_logp - self.entropy_coef * grad_entropy) / len(batch)
+
+                policy.weights -= self.learning_rate * (x.T @ grad_logits)
+                policy.bias -= self.learning_rate * grad_logits.sum(axis=0)
+
+                values = policy.value(x)
+                value_err = values - returns[batch]
+                grad_values = 2.0 * self.value_coef * value_err / len(batch)
+                policy.value_weights -= self.learning_rate * (x.T @ grad_values)
+                policy.value_bias -= self.learning_rate * float(grad_values.sum())
+
+                surrogate = np.minimum(ratio * adv, clipped * adv)
+                totals["policy_loss"] += float(
+                    -surrogate.mean() - self.entropy_coef * entropy_rows.mean()
+                )
+                totals["value_loss"] += float(self.value_coef * (value_err**2).mean())
+                totals["entropy"] += float(entropy_rows.mean())
+                totals["approx_kl"] += float(((ratio - 1) - log_ratio).mean())
+                num_batches += 1
+
+        return {k: v / max(num_batches, 1) for k, v in totals.items()}
+
     def train(self, epochs: int = 10, batch_size: int = 64) -> dict[str, float]:
         """
         Train agent on stored transitions.
@@ -445,6 +738,8 @@ class PPOAgent:
                 checkpoint = {
                     "policy_weights": self.policy.weights,
                     "policy_bias": self.policy.bias,
+                    "value_weights": self.policy.value_weights,
+                    "value_bias": self.policy.value_bias,
                     "state_size": self.state_size,
                     "action_size": self.action_size,
                 }
@@ -487,6 +782,9 @@ class PPOAgent:
                     checkpoint = pickle.load(f)
                 self.policy.weights = checkpoint["policy_weights"]
                 self.policy.bias = checkpoint["policy_bias"]
+                if "value_weights" in checkpoint:
+                    self.policy.value_weights = checkpoint["value_weights"]
+                    self.policy.value_bias = checkpoint["value_bias"]
 
             logger.info(f"✅ Loaded checkpoint: {checkpoint_path}")
             return True
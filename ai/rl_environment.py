@@ -7,8 +7,10 @@ Computes states from market data and portfolio, rewards from trade outcomes.
 Non-intrusive: reads-only from SmartTrader, never modifies active trading.
 """
 
+import contextlib
 import json
 import logging
+import multiprocessing as mp
 import os
 from collections import deque
 from datetime import UTC, datetime, timedelta
@@ -58,6 +60,10 @@ STRATEGIES = [
     "vix_strategy",
 ]
 
+# Cached close prices (columns = symbols) used by the vectorized environment
+PRICE_HISTORY_CSV = STATE / "rl_price_history.csv"
+TRADING_DAYS = 252
+
 
 class State(NamedTuple):
     """RL state representation."""
@@ -494,6 +500,508 @@ class TradingEnvironment:
         return new_state, reward, done, info
 
 
+# ---------------------------------------------------------------------------
+# Vectorized environment
+# ---------------------------------------------------------------------------
+# TradingEnvironment re-reads CSV/JSON state on every step, which caps training
+# at a few steps per second. The vectorized environment below preloads close
+# prices once, precomputes every feature and per-strategy return as arrays and
+# runs N episodes in lock-step, so a step is a handful of fancy-index lookups.
+
+
+def generate_synthetic_prices(
+    num_series: int = 32, length: int = 2520, seed: int | None = None
+) -> np.ndarray:
+    """
+    Generate regime-switching geometric Brownian motion close prices.
+
+    Used for benchmarks and as a fallback when no cached price history exists.
+
+    Returns:
+        Array of shape (num_series, length)
+    """
+    rng = np.random.default_rng(seed)
+    switches = rng.random((num_series, length)) < 0.01
+    regime = np.cumsum(switches, axis=1) % 2
+    drift = np.where(regime == 0, 0.0006, -0.0004)
+    vol = np.where(regime == 0, 0.01, 0.02)
+    log_returns = drift + vol * rng.standard_normal((num_series, length))
+    log_returns[:, 0] = 0.0
+    return 100.0 * np.exp(np.cumsum(log_returns, axis=1))
+
+
+def load_price_matrix(path: Path = PRICE_HISTORY_CSV, min_length: int = 300) -> np.ndarray | None:
+    """
+    Load cached close prices (columns = symbols, rows = dates) as a price matrix.
+
+    Columns with gaps are forward-filled; columns shorter than min_length are dropped.
+
+    Returns:
+        Array of shape (num_series, length) or None if nothing usable is cached
+    """
+    if not HAS_PANDAS or not path.exists():
+        return None
+
+    try:
+        df = pd.read_csv(path)
+        df = df.select_dtypes(include=[np.number]).ffill().dropna(axis=1, thresh=min_length)
+        df = df.dropna()
+        if df.empty or len(df) < min_length:
+            return None
+        prices = df.to_numpy(dtype=np.float64).T
+        prices = prices[np.all(prices > 0, axis=1)]
+        return prices if len(prices) > 0 else None
+    except Exception as e:
+        logger.warning(f"Failed to load price matrix: {e}")
+        return None
+
+
+def _rolling_sum(x: np.ndarray, window: int) -> np.ndarray:
+    """Trailing-window sum along the last axis (partial windows at the start)."""
+    csum = np.cumsum(x, axis=-1)
+    out = csum.copy()
+    out[..., window:] = csum[..., window:] - csum[..., :-window]
+    return out
+
+
+def _rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """Trailing-window mean along the last axis."""
+    counts = np.minimum(np.arange(1, x.shape[-1] + 1), window)
+    return _rolling_sum(x, window) / counts
+
+
+def _rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+    """Trailing-window population standard deviation along the last axis."""
+    mean = _rolling_mean(x, window)
+    mean_sq = _rolling_mean(x * x, window)
+    return np.sqrt(np.maximum(mean_sq - mean * mean, 0.0))
+
+
+def _rolling_extreme(x: np.ndarray, window: int, reducer) -> np.ndarray:
+    """Trailing-window max/min along the last axis (reducer = np.max or np.min)."""
+    padded = np.concatenate([np.repeat(x[..., :1], window - 1, axis=-1), x], axis=-1)
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window, axis=-1)
+    return reducer(windows, axis=-1)
+
+
+def compute_strategy_returns(prices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Compute bar returns and per-strategy returns for every series at once.
+
+    Strategy positions at bar t only use data up to t and earn the return of
+    bar t + 1, so strategy_returns[:, t] is what was realized moving into t.
+
+    Args:
+        prices: Close prices of shape (num_series, length)
+
+    Returns:
+        (returns, strategy_returns) with shapes (S, T) and (S, T, len(STRATEGIES))
+    """
+    returns = np.zeros_like(prices)
+    returns[:, 1:] = prices[:, 1:] / prices[:, :-1] - 1.0
+
+    sma10 = _rolling_mean(prices, 10)
+    sma12 = _rolling_mean(prices, 12)
+    sma20 = _rolling_mean(prices, 20)
+    sma26 = _rolling_mean(prices, 26)
+    sma30 = _rolling_mean(prices, 30)
+    zscore = (prices - sma20) / np.maximum(_rolling_std(prices, 20), 1e-12)
+
+    high20 = _rolling_extreme(prices, 20, np.max)
+    low20 = _rolling_extreme(prices, 20, np.min)
+    high55 = _rolling_extreme(prices, 55, np.max)
+
+    avg_gain = _rolling_mean(np.maximum(returns, 0.0), 14)
+    avg_loss = _rolling_mean(np.maximum(-returns, 0.0), 14)
+    rsi = 100.0 - 100.0 / (1.0 + avg_gain / np.maximum(avg_loss, 1e-12))
+
+    macd = sma12 - sma26
+    macd_signal = _rolling_mean(macd, 9)
+    vol10 = _rolling_std(returns, 10)
+    vol30 = _rolling_std(returns, 30)
+
+    positions = np.stack(
+        [
+            np.where(prices >= high55, 1.0, np.where(prices <= low20, -1.0, 0.0)),
+            np.where(rsi < 30, 1.0, np.where(rsi > 70, -1.0, 0.0)),
+            np.sign(sma10 - sma30),
+            np.where(prices >= high20, 1.0, np.where(prices <= low20, -1.0, 0.0)),
+            -np.sign(zscore) * (np.abs(zscore) > 1.0),
+            np.sign(macd - macd_signal),
+            -np.sign(zscore) * (np.abs(zscore) > 2.0),
+            (vol10 < vol30).astype(np.float64),
+        ],
+        axis=-1,
+    )
+
+    strategy_returns = np.zeros_like(positions)
+    strategy_returns[:, 1:, :] = positions[:, :-1, :] * returns[:, 1:, None]
+    return returns, strategy_returns
+
+
+def build_state_features(
+    prices: np.ndarray,
+    returns: np.ndarray,
+    strategy_returns: np.ndarray,
+    lookback_window: int = 30,
+    state_size: int = 34,
+    tail: int | None = None,
+) -> np.ndarray:
+    """
+    Build state vectors for every (series, bar) in the TradingEnvironment layout.
+
+    Market (8), portfolio (6, left zero here), strategy Sharpe/win-rate (16)
+    and regime (4) features, clipped to [-10, 10].
+
+    Args:
+        tail: If set, only the last `tail` bars are assembled (inference path)
+
+    Returns:
+        Array of shape (num_series, length or tail, state_size)
+    """
+    w = lookback_window
+    num_series, length = prices.shape
+    keep = slice(-tail, None) if tail else slice(None)
+    out_length = min(tail, length) if tail else length
+    features = np.zeros((num_series, out_length, state_size), dtype=np.float32)
+
+    mean_ret = _rolling_mean(returns, w)
+    std_ret = _rolling_std(returns, w)
+    safe_std = np.maximum(std_ret, 1e-12)
+    sharpe = mean_ret / safe_std * np.sqrt(TRADING_DAYS)
+    trend = prices / _rolling_mean(prices, w) - 1.0
+
+    market = np.stack(
+        [
+            (std_ret * np.sqrt(TRADING_DAYS))[:, keep],
+            trend[:, keep],
+            (_rolling_mean(returns, 5) * TRADING_DAYS)[:, keep],
+            np.minimum(np.abs(returns) / safe_std, 5.0)[:, keep],
+            (1.0 - prices / _rolling_extreme(prices, w, np.max))[:, keep],
+            sharpe[:, keep],
+            _rolling_mean((returns > 0).astype(np.float64), w)[:, keep],
+            (mean_ret * 100.0)[:, keep],
+        ],
+        axis=-1,
+    )
+
+    by_strategy = np.moveaxis(strategy_returns, -1, 1)  # (S, A, T)
+    strat_mean = _rolling_mean(by_strategy, w)[..., keep]
+    strat_std = _rolling_std(by_strategy, w)[..., keep]
+    strat_sharpe = strat_mean / np.maximum(strat_std, 1e-12) * np.sqrt(TRADING_DAYS)
+    strat_win = _rolling_mean((by_strategy > 0).astype(np.float64), w)[..., keep]
+    strategy = np.stack([strat_sharpe / 3.0, strat_win], axis=-1)  # (S, A, T, 2)
+    strategy = np.moveaxis(strategy, 1, 2).reshape(num_series, out_length, -1)
+
+    regime = np.stack(
+        [
+            np.sign(_rolling_mean(prices, 10) - _rolling_mean(prices, w))[:, keep],
+            sharpe[:, keep] / 3.0,
+            (1.0 - np.minimum(std_ret * 10.0, 1.0))[:, keep],
+            np.abs(trend)[:, keep],
+        ],
+        axis=-1,
+    )
+
+    combined = np.concatenate(
+        [market, np.zeros((num_series, out_length, 6)), strategy, regime], axis=-1
+    )
+    width = min(combined.shape[-1], state_size)
+    features[..., :width] = np.clip(
+        np.nan_to_num(combined[..., :width], nan=0.0, posinf=0.0, neginf=0.0), -10.0, 10.0
+    )
+    return features
+
+
+class VectorizedTradingEnvironment:
+    """
+    Vectorized trading environment running N episodes in parallel.
+
+    Each episode walks a random window of a preloaded price series; the action
+    picks a strategy (index) or a strategy weight vector, and the reward mirrors
+    TradingEnvironment's Sharpe / P&L / drawdown blend. Episodes auto-reset.
+    """
+
+    # Slice of the state vector filled per step from episode (portfolio) state
+    PORTFOLIO_SLICE = slice(8, 14)
+
+    def __init__(
+        self,
+        prices: np.ndarray,
+        num_envs: int = 16,
+        episode_length: int = 252,
+        lookback_window: int = 30,
+        state_size: int = 34,
+        reward_sharpe_weight: float = 0.6,
+        reward_pnl_weight: float = 0.3,
+        reward_drawdown_penalty: float = 0.1,
+        max_drawdown: float = 0.25,
+        seed: int | None = None,
+    ):
+        """
+        Initialize vectorized environment.
+
+        Args:
+            prices: Close prices, shape (num_series, length) or (length,)
+            num_envs: Number of parallel episodes
+            episode_length: Steps per episode before auto-reset
+            lookback_window: Bars used for rolling features
+            state_size: Total state vector size (34 matches PPOAgent)
+            reward_sharpe_weight: Weight for risk-adjusted return in reward
+            reward_pnl_weight: Weight for raw return in reward
+            reward_drawdown_penalty: Penalty weight for episode drawdown
+            max_drawdown: Episode terminates once drawdown exceeds this
+            seed: Random seed for episode sampling
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        if prices.ndim == 1:
+            prices = prices[None, :]
+        if prices.shape[1] < lookback_window + episode_length + 2:
+            raise ValueError(
+                f"Price series too short ({prices.shape[1]}) for lookback={lookback_window} "
+                f"and episode_length={episode_length}"
+            )
+
+        self.num_envs = num_envs
+        self.episode_length = episode_length
+        self.lookback_window = lookback_window
+        self.state_size = state_size
+        self.action_size = len(STRATEGIES)
+        self.reward_sharpe_weight = reward_sharpe_weight
+        self.reward_pnl_weight = reward_pnl_weight
+        self.reward_drawdown_penalty = reward_drawdown_penalty
+        self.max_drawdown = max_drawdown
+        self.rng = np.random.default_rng(seed)
+
+        returns, strategy_returns = compute_strategy_returns(prices)
+        self.features = build_state_features(
+            prices, returns, strategy_returns, lookback_window, state_size
+        )
+        self.strategy_returns = strategy_returns.astype(np.float32)
+        self.return_std = np.maximum(_rolling_std(returns, lookback_window), 1e-4).astype(
+            np.float32
+        )
+        self.num_series, self.length = prices.shape
+
+        # Per-episode state
+        self.series_idx = np.zeros(num_envs, dtype=np.int64)
+        self.t = np.zeros(num_envs, dtype=np.int64)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self.equity = np.ones(num_envs, dtype=np.float64)
+        self.peak = np.ones(num_envs, dtype=np.float64)
+        self.last_reward = np.zeros(num_envs, dtype=np.float32)
+        self.reward_sum = np.zeros(num_envs, dtype=np.float64)
+        self.concentration = np.zeros(num_envs, dtype=np.float32)
+        self._env_index = np.arange(num_envs)
+        self._obs = np.zeros((num_envs, state_size), dtype=np.float32)
+
+        logger.info(
+            f"✅ VectorizedTradingEnvironment initialized (series={self.num_series}, "
+            f"length={self.length}, num_envs={num_envs})"
+        )
+
+    def _start_episodes(self, mask: np.ndarray):
+        """Sample a new series and start bar for the masked environments."""
+        count = int(mask.sum())
+        if count == 0:
+            return
+        self.series_idx[mask] = self.rng.integers(0, self.num_series, size=count)
+        self.t[mask] = self.rng.integers(
+            self.lookback_window, self.length - self.episode_length - 1, size=count
+        )
+        self.steps[mask] = 0
+        self.equity[mask] = 1.0
+        self.peak[mask] = 1.0
+        self.last_reward[mask] = 0.0
+        self.reward_sum[mask] = 0.0
+        self.concentration[mask] = 0.0
+
+    def _observe(self) -> np.ndarray:
+        """Write the current observations into the preallocated buffer."""
+        obs = self._obs
+        obs[:] = self.features[self.series_idx, self.t]
+        obs[:, self.PORTFOLIO_SLICE] = np.stack(
+            [
+                self.equity,
+                1.0 - self.equity / self.peak,
+                self.steps / self.episode_length,
+                self.last_reward,
+                self.concentration,
+                self.reward_sum / np.maximum(self.steps, 1),
+            ],
+            axis=-1,
+        )
+        return obs
+
+    def reset(self) -> np.ndarray:
+        """Start fresh episodes in every environment and return observations (N, state_size)."""
+        self._start_episodes(np.ones(self.num_envs, dtype=bool))
+        return self._observe().copy()
+
+    def step(self, actions: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, dict]:
+        """
+        Advance every environment by one bar.
+
+        Args:
+            actions: Strategy indices of shape (N,) or strategy weights of shape (N, A)
+
+        Returns:
+            (observations, rewards, dones, info); finished episodes are reset and
+            their final equity is reported in info["terminal_equity"].
+        """
+        actions = np.asarray(actions)
+        next_t = self.t + 1
+        bar_returns = self.strategy_returns[self.series_idx, next_t]  # (N, A)
+
+        if actions.ndim == 1:
+            step_return = bar_returns[self._env_index, actions.astype(np.int64)]
+            self.concentration[:] = 1.0
+        else:
+            weights = actions / np.maximum(np.abs(actions).sum(axis=1, keepdims=True), 1e-8)
+            step_return = np.einsum("na,na->n", weights, bar_returns)
+            self.concentration[:] = np.abs(weights).max(axis=1)
+
+        self.equity *= 1.0 + step_return
+        np.maximum(self.peak, self.equity, out=self.peak)
+        drawdown = 1.0 - self.equity / self.peak
+
+        risk_adjusted = np.clip(step_return / self.return_std[self.series_idx, next_t], -1.0, 1.0)
+        pnl = np.clip(step_return * 100.0, -1.0, 1.0)
+        dd_penalty = -np.clip(drawdown / 0.5, 0.0, 1.0)
+        rewards = np.clip(
+            self.reward_sharpe_weight * risk_adjusted
+            + self.reward_pnl_weight * pnl
+            + self.reward_drawdown_penalty * dd_penalty,
+            -2.0,
+            2.0,
+        ).astype(np.float32)
+
+        self.t = next_t
+        self.steps += 1
+        self.last_reward[:] = rewards
+        self.reward_sum += rewards
+
+        dones = (self.steps >= self.episode_length) | (drawdown >= self.max_drawdown)
+        info = {"terminal_equity": self.equity[dones].copy()}
+        self._start_episodes(dones)
+
+        return self._observe().copy(), rewards, dones, info
+
+
+def _env_pool_worker(remote, parent_remote, env_kwargs: dict[str, Any]):
+    """Subprocess loop hosting one shard of a vectorized environment."""
+    parent_remote.close()
+    env = VectorizedTradingEnvironment(**env_kwargs)
+    try:
+        while True:
+            command, data = remote.recv()
+            if command == "step":
+                remote.send(env.step(data))
+            elif command == "reset":
+                remote.send(env.reset())
+            elif command == "close":
+                break
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        remote.close()
+
+
+class SubprocessEnvPool:
+    """
+    Shards VectorizedTradingEnvironment across worker processes.
+
+    Same reset/step interface as the in-process environment. Worth it when
+    per-step environment work outweighs the pipe round-trip (large shards or
+    heavier reward models); for the default features the in-process version
+    is usually faster.
+    """
+
+    def __init__(
+        self,
+        prices: np.ndarray,
+        num_envs: int = 16,
+        num_workers: int | None = None,
+        start_method: str | None = None,
+        seed: int | None = None,
+        **env_kwargs,
+    ):
+        """
+        Start worker processes.
+
+        Args:
+            prices: Close prices shared by all workers
+            num_envs: Total number of parallel episodes
+            num_workers: Worker processes (default: CPU count, capped at num_envs)
+            start_method: multiprocessing start method (default: forkserver if available)
+            seed: Base random seed; worker i uses seed + i
+            **env_kwargs: Forwarded to VectorizedTradingEnvironment
+        """
+        num_workers = max(1, min(num_workers or os.cpu_count() or 1, num_envs))
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+        ctx = mp.get_context(start_method)
+
+        self.num_envs = num_envs
+        self.state_size = env_kwargs.get("state_size", 34)
+        self.action_size = len(STRATEGIES)
+        self._splits = np.array_split(np.arange(num_envs), num_workers)
+        self._remotes = []
+        self._processes = []
+        self._closed = False
+
+        for i, shard in enumerate(self._splits):
+            remote, worker_remote = ctx.Pipe()
+            kwargs = dict(env_kwargs)
+            kwargs.update(
+                prices=prices,
+                num_envs=len(shard),
+                seed=None if seed is None else seed + i,
+            )
+            process = ctx.Process(
+                target=_env_pool_worker, args=(worker_remote, remote, kwargs), daemon=True
+            )
+            process.start()
+            worker_remote.close()
+            self._remotes.append(remote)
+            self._processes.append(process)
+
+        logger.info(f"✅ SubprocessEnvPool started ({num_workers} workers, {num_envs} envs)")
+
+    def reset(self) -> np.ndarray:
+        """Reset every shard and return stacked observations."""
+        for remote in self._remotes:
+            remote.send(("reset", None))
+        return np.concatenate([remote.recv() for remote in self._remotes])
+
+    def step(self, actions: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, dict]:
+        """Step all shards concurrently and gather the results."""
+        actions = np.asarray(actions)
+        for remote, shard in zip(self._remotes, self._splits, strict=True):
+            remote.send(("step", actions[shard]))
+        results = [remote.recv() for remote in self._remotes]
+        obs, rewards, dones, infos = zip(*results, strict=True)
+        info = {"terminal_equity": np.concatenate([i["terminal_equity"] for i in infos])}
+        return np.concatenate(obs), np.concatenate(rewards), np.concatenate(dones), info
+
+    def close(self):
+        """Stop worker processes."""
+        if self._closed:
+            return
+        for remote in self._remotes:
+            with contextlib.suppress(BrokenPipeError, OSError):
+                remote.send(("close", None))
+        for process in self._processes:
+            process.join(timeout=5)
+        self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
 def main():
     """Test environment."""
     env = TradingEnvironment()
@@ -6,25 +6,34 @@ Live inference engine that generates strategy weights from current market state.
 Writes weights to runtime/rl_strategy_weights.json for integration with weights_bridge.
 """
 
+import itertools
+import json
+import logging
 import os
 import sys
+import threading
+import time
+from collections.abc import Mapping, Sequence
+from datetime import UTC, datetime
 from pathlib import Path
+from typing import Any
+
+import numpy as np
 
 # Ensure project root is in Python path
 _script_dir = Path(__file__).parent.parent.absolute()
 if str(_script_dir) not in sys.path:
     sys.path.insert(0, str(_script_dir))
 
-import json
-import logging
-import time
-from datetime import UTC, datetime
-from typing import Any
-
-import numpy as np
+from ai.rl_agent import HAS_TORCH, PPOAgent  # noqa: E402
+from ai.rl_environment import (  # noqa: E402
+    TradingEnvironment,
+    build_state_features,
+    compute_strategy_returns,
+)
 
-from ai.rl_agent import PPOAgent
-from ai.rl_environment import TradingEnvironment
+if HAS_TORCH:
+    import torch
 
 # Setup paths
 ROOT = Path(os.path.expanduser("~/neolight"))
@@ -53,6 +62,10 @@ if not logger.handlers:
 
 # Output file
 RL_WEIGHTS_FILE = RUNTIME / "rl_strategy_weights.json"
+CHECKPOINT_FILE = STATE / "rl_model" / "checkpoint_latest.pkl"
+
+# Bars of per-symbol history needed to build a state (55-bar channel + 30-bar windows)
+POLICY_HISTORY_BARS = 90
 
 # Strategy names (must match strategy_research.py and rl_environment.py)
 STRATEGIES = [
@@ -90,6 +103,7 @@ class RLInferenceEngine:
 
         # Load model
         self.model_loaded = False
+        self._checkpoint_signature: tuple[int, int] | None = None
         self.load_model()
 
         logger.info("✅ RL Inference Engine initialized")
@@ -103,9 +117,11 @@ class RLInferenceEngine:
             return False
 
         try:
+            signature = checkpoint_signature(checkpoint_path)
             success = self.agent.load("latest")
             if success:
                 self.model_loaded = True
+                self._checkpoint_signature = signature
                 logger.info("✅ Loaded RL model from checkpoint")
             else:
                 logger.warning("Failed to load RL model")
@@ -212,8 +228,8 @@ class RLInferenceEngine:
 
         while True:
             try:
-                # Reload model periodically (in case it was retrained)
-                if not self.model_loaded or time.time() % 3600 < update_interval_seconds:
+                # Reload model only when the checkpoint was rewritten by the trainer
+                if checkpoint_signature(CHECKPOINT_FILE) != self._checkpoint_signature:
                     self.load_model()
 
                 # Update weights
@@ -236,6 +252,189 @@ class RLInferenceEngine:
                 time.sleep(60)  # Wait before retry
 
 
+def checkpoint_signature(path: Path) -> tuple[int, int] | None:
+    """Return (mtime_ns, size) for a checkpoint file, or None if it does not exist."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class RLPolicyService:
+    """
+    Long-lived, batched policy inference for the whole trading universe.
+
+    Loads PPO weights once and hot-reloads them when the checkpoint file
+    changes. A batch of symbol states is scored in a single forward pass
+    (torch inference_mode, or NumPy matmuls in the fallback).
+    """
+
+    def __init__(
+        self,
+        checkpoint_name: str = "latest",
+        state_size: int = 34,
+        action_size: int = 8,
+        use_torch: bool = True,
+        reload_check_seconds: float = 5.0,
+        history_bars: int = POLICY_HISTORY_BARS,
+    ):
+        """
+        Initialize policy service.
+
+        Args:
+            checkpoint_name: Checkpoint to serve (checkpoint_<name>.pkl)
+            state_size: Size of state vector
+            action_size: Number of strategies
+            use_torch: Use PyTorch networks when available
+            reload_check_seconds: Minimum seconds between checkpoint stat() checks
+            history_bars: Trailing bars of price history used per symbol
+        """
+        self.state_size = state_size
+        self.action_size = action_size
+        self.checkpoint_name = checkpoint_name
+        self.reload_check_seconds = reload_check_seconds
+        self.history_bars = history_bars
+
+        self.agent = PPOAgent(state_size=state_size, action_size=action_size, use_torch=use_torch)
+        self.checkpoint_path = self.agent.model_dir / f"checkpoint_{checkpoint_name}.pkl"
+        self.model_loaded = False
+        self._signature: tuple[int, int] | None = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+        self.maybe_reload(force=True)
+        self._set_eval()
+        logger.info(
+            f"✅ RL Policy Service initialized (torch={self.agent.use_torch}, "
+            f"model_loaded={self.model_loaded})"
+        )
+
+    def _set_eval(self):
+        """Put torch networks in eval mode (disables dropout for serving)."""
+        if self.agent.use_torch:
+            self.agent.policy_net.eval()
+            self.agent.value_net.eval()
+
+    def maybe_reload(self, force: bool = False) -> bool:
+        """
+        Reload weights if the checkpoint file changed since the last load.
+
+        The file is stat()-ed at most once per reload_check_seconds.
+
+        Returns:
+            True if new weights were loaded
+        """
+        now = time.monotonic()
+        if not force and now - self._last_check < self.reload_check_seconds:
+            return False
+        self._last_check = now
+
+        signature = checkpoint_signature(self.checkpoint_path)
+        if signature is None or signature == self._signature:
+            return False
+
+        with self._lock:
+            if not self.agent.load(self.checkpoint_name):
+                # Possibly caught mid-write; retry on the next check
+                return False
+            self._signature = signature
+            self.model_loaded = True
+            self._set_eval()
+
+        logger.info(f"🔄 Hot-reloaded RL policy from {self.checkpoint_path}")
+        return True
+
+    def predict_batch(self, states: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Score a batch of states in one forward pass.
+
+        Args:
+            states: State matrix of shape (B, state_size)
+
+        Returns:
+            (actions, confidences, probabilities) with shapes (B,), (B,), (B, action_size)
+        """
+        self.maybe_reload()
+        states = np.ascontiguousarray(states, dtype=np.float32)
+
+        with self._lock:
+            if self.agent.use_torch:
+                with torch.inference_mode():
+                    logits = self.agent.policy_net(torch.from_numpy(states))
+                    probs = torch.softmax(logits, dim=-1).numpy()
+            else:
+                probs = self.agent.policy.predict_batch(states)
+
+        actions = probs.argmax(axis=1)
+        confidences = probs[np.arange(len(probs)), actions]
+        return actions, confidences, probs
+
+    def build_states(
+        self, price_histories: Mapping[str, Sequence[float]]
+    ) -> tuple[list[str], np.ndarray]:
+        """
+        Build state vectors for every symbol from its trailing price history.
+
+        Histories shorter than history_bars are front-padded with their first
+        price; empty or non-positive histories are skipped.
+
+        Returns:
+            (symbols, states) where states has shape (len(symbols), state_size)
+        """
+        bars = self.history_bars
+        symbols = []
+        matrix = np.empty((len(price_histories), bars), dtype=np.float64)
+        for sym, history in price_histories.items():
+            if isinstance(history, np.ndarray):
+                tail = history[-bars:].astype(np.float64, copy=False)
+            else:
+                tail = np.fromiter(
+                    itertools.islice(history, max(len(history) - bars, 0), None), np.float64
+                )
+            if len(tail) == 0:
+                continue
+            row = matrix[len(symbols)]
+            row[: bars - len(tail)] = tail[0]
+            row[bars - len(tail) :] = tail
+            symbols.append(sym)
+
+        valid = np.all(matrix[: len(symbols)] > 0, axis=1)
+        if not valid.all():
+            symbols = [sym for sym, ok in zip(symbols, valid, strict=True) if ok]
+            matrix = matrix[: len(valid)][valid]
+        if not symbols:
+            return [], np.zeros((0, self.state_size), dtype=np.float32)
+
+        prices = matrix[: len(symbols)]
+        returns, strategy_returns = compute_strategy_returns(prices)
+        features = build_state_features(
+            prices, returns, strategy_returns, state_size=self.state_size, tail=1
+        )
+        return symbols, features[:, 0, :]
+
+    def decide(self, price_histories: Mapping[str, Sequence[float]]) -> dict[str, dict[str, Any]]:
+        """
+        Pick a strategy and confidence for every symbol in one batched call.
+
+        Returns:
+            {symbol: {"strategy": name, "action": index, "confidence": prob}}
+        """
+        symbols, states = self.build_states(price_histories)
+        if not symbols:
+            return {}
+
+        actions, confidences, _ = self.predict_batch(states)
+        return {
+            sym: {
+                "strategy": STRATEGIES[int(action)],
+                "action": int(action),
+                "confidence": float(conf),
+            }
+            for sym, action, conf in zip(symbols, actions, confidences, strict=True)
+        }
+
+
 def main():
     """CLI entry point."""
     import argparse
@@ -24,8 +24,14 @@ from typing import Any
 
 import numpy as np
 
-from ai.rl_agent import PPOAgent
-from ai.rl_environment import TradingEnvironment
+from ai.rl_agent import PPOAgent, RolloutBuffer
+from ai.rl_environment import (
+    SubprocessEnvPool,
+    TradingEnvironment,
+    VectorizedTradingEnvironment,
+    generate_synthetic_prices,
+    load_price_matrix,
+)
 
 # Setup paths
 ROOT = Path(os.path.expanduser("~/neolight"))
@@ -509,6 +515,141 @@ class RLTrainer:
         logger.info(f"✅ Training complete: {training_summary}")
         return training_summary
 
+    def collect_rollout(
+        self, env, buffer: RolloutBuffer, obs: np.ndarray
+    ) -> tuple[np.ndarray, dict]:
+        """
+        Fill a rollout buffer from a vectorized environment.
+
+        Args:
+            env: VectorizedTradingEnvironment or SubprocessEnvPool
+            buffer: Empty rollout buffer sized (num_steps, env.num_envs)
+            obs: Current observations (num_envs, state_size)
+
+        Returns:
+            (next_obs, rollout_stats)
+        """
+        finished_equity = []
+        reward_total = 0.0
+        buffer.reset()
+        while not buffer.full:
+            actions, log_probs, values = self.agent.select_actions(obs)
+            next_obs, rewards, dones, info = env.step(actions)
+            buffer.add(obs, actions, log_probs, values, rewards, dones)
+            reward_total += float(rewards.sum())
+            if len(info["terminal_equity"]) > 0:
+                finished_equity.append(info["terminal_equity"])
+            obs = next_obs
+
+        buffer.compute_gae(self.agent.estimate_values(obs))
+        equity = np.concatenate(finished_equity) if finished_equity else np.empty(0)
+        stats = {
+            "mean_step_reward": reward_total / (buffer.num_steps * buffer.num_envs),
+            "episodes_finished": int(len(equity)),
+            "mean_episode_return": float(equity.mean() - 1.0) if len(equity) else 0.0,
+        }
+        return obs, stats
+
+    def train_vectorized(
+        self,
+        total_steps: int = 200_000,
+        num_envs: int = 16,
+        rollout_steps: int = 128,
+        epochs: int = 4,
+        minibatch_size: int = 256,
+        num_workers: int = 0,
+        prices: np.ndarray | None = None,
+        seed: int | None = None,
+        save: bool = True,
+    ) -> dict[str, Any]:
+        """
+        Train with N parallel episodes over preloaded price arrays.
+
+        Args:
+            total_steps: Environment steps to collect (across all envs)
+            num_envs: Parallel episodes
+            rollout_steps: Steps per env between PPO updates
+            epochs: PPO epochs per update
+            minibatch_size: Minibatch size for PPO updates
+            num_workers: >0 runs the environments in a SubprocessEnvPool
+            prices: Price matrix (num_series, length); defaults to cached history
+            seed: Random seed for episode sampling
+            save: Save checkpoint and training log when done
+
+        Returns:
+            Training summary including steps_per_second
+        """
+        if prices is None:
+            prices = load_price_matrix()
+            if prices is None:
+                logger.warning("No cached price history - training on synthetic prices")
+                prices = generate_synthetic_prices(seed=seed)
+
+        env_kwargs = {"state_size": self.state_size}
+        if num_workers > 0:
+            env = SubprocessEnvPool(
+                prices, num_envs=num_envs, num_workers=num_workers, seed=seed, **env_kwargs
+            )
+        else:
+            env = VectorizedTradingEnvironment(prices, num_envs=num_envs, seed=seed, **env_kwargs)
+
+        buffer = RolloutBuffer(
+            rollout_steps,
+            num_envs,
+            self.state_size,
+            gamma=self.agent.gamma,
+            gae_lambda=self.agent.gae_lambda,
+        )
+        num_updates = max(1, total_steps // (rollout_steps * num_envs))
+        logger.info(
+            f"🚀 Starting vectorized RL training ({num_updates} updates x "
+            f"{rollout_steps} steps x {num_envs} envs)"
+        )
+
+        metrics: dict[str, float] = {}
+        stats: dict[str, Any] = {}
+        start = time.perf_counter()
+        try:
+            obs = env.reset()
+            for update in range(num_updates):
+                obs, stats = self.collect_rollout(env, buffer, obs)
+                metrics = self.agent.train_on_buffer(
+                    buffer, epochs=epochs, minibatch_size=minibatch_size
+                )
+                if (update + 1) % 10 == 0 or update == num_updates - 1:
+                    logger.info(
+                        f"Update {update + 1}/{num_updates}: "
+                        f"reward={stats['mean_step_reward']:.4f}, "
+                        f"episode_return={stats['mean_episode_return']:.4f}, "
+                        f"policy_loss={metrics.get('policy_loss', 0):.4f}"
+                    )
+        finally:
+            if num_workers > 0:
+                env.close()
+        elapsed = time.perf_counter() - start
+        steps = num_updates * rollout_steps * num_envs
+
+        summary = {
+            "timestamp": datetime.now(UTC).isoformat(),
+            "mode": "vectorized",
+            "steps": steps,
+            "num_envs": num_envs,
+            "updates": num_updates,
+            "elapsed_seconds": elapsed,
+            "steps_per_second": steps / elapsed if elapsed > 0 else 0.0,
+            "final_metrics": metrics,
+            "final_rollout": stats,
+        }
+
+        if save:
+            self.agent.save("latest")
+            self.training_history.append(summary)
+            self.last_training_time = datetime.now(UTC)
+            self.save_training_log()
+
+        logger.info(f"✅ Vectorized training complete: {steps / max(elapsed, 1e-9):.0f} steps/s")
+        return summary
+
     def save_training_log(self):
         """Save training history to disk."""
         try:
@@ -587,11 +728,21 @@ def main():
     parser.add_argument("--train", action="store_true", help="Run training")
     parser.add_argument("--episodes", type=int, default=100, help="Number of episodes")
     parser.add_argument("--loop", action="store_true", help="Run continuous training loop")
+    parser.add_argument(
+        "--vectorized", action="store_true", help="Train on parallel price-array episodes"
+    )
+    parser.add_argument("--steps", type=int, default=200_000, help="Vectorized env steps")
+    parser.add_argument("--num-envs", type=int, default=16, help="Parallel episodes")
+    parser.add_argument("--workers", type=int, default=0, help="Subprocess env workers (0 = off)")
     args = parser.parse_args()
 
     trainer = RLTrainer()
 
-    if args.loop:
+    if args.vectorized:
+        trainer.train_vectorized(
+            total_steps=args.steps, num_envs=args.num_envs, num_workers=args.workers
+        )
+    elif args.loop:
         trainer.run_training_loop()
     elif args.train:
         trainer.train(num_episodes=args.episodes)
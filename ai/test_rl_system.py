@@ -8,14 +8,21 @@ Verifies system works correctly without disrupting trading.
 
 import json
 import os
+import time
 import unittest
 from pathlib import Path
 
 import numpy as np
 
-from ai.rl_agent import PPOAgent
-from ai.rl_environment import State, TradingEnvironment
-from ai.rl_inference import RLInferenceEngine
+from ai.rl_agent import PPOAgent, RolloutBuffer
+from ai.rl_environment import (
+    STRATEGIES,
+    State,
+    TradingEnvironment,
+    VectorizedTradingEnvironment,
+    generate_synthetic_prices,
+)
+from ai.rl_inference import RLInferenceEngine, RLPolicyService
 
 # Setup paths
 ROOT = Path(os.path.expanduser("~/neolight"))
@@ -136,6 +143,71 @@ class TestRLAgent(unittest.TestCase):
         (STATE / "rl_model" / "checkpoint_test.pkl").unlink(missing_ok=True)
 
 
+class TestVectorizedTraining(unittest.TestCase):
+    """Test vectorized environment, rollout buffer and minibatch PPO."""
+
+    def setUp(self):
+        prices = generate_synthetic_prices(num_series=4, length=600, seed=0)
+        self.env = VectorizedTradingEnvironment(prices, num_envs=8, episode_length=50, seed=0)
+        self.agent = PPOAgent(state_size=34, action_size=8, use_torch=False)
+
+    def test_vectorized_step(self):
+        """Test batched reset/step shapes and auto-reset."""
+        obs = self.env.reset()
+        self.assertEqual(obs.shape, (8, 34))
+        total_done = 0
+        for _ in range(60):
+            obs, rewards, dones, info = self.env.step(np.random.randint(0, 8, size=8))
+            total_done += int(dones.sum())
+        self.assertEqual(rewards.shape, (8,))
+        self.assertTrue(np.all(np.abs(rewards) <= 2.0))
+        self.assertGreaterEqual(total_done, 8)
+        self.assertTrue(np.all(np.isfinite(obs)))
+
+    def test_gae_matches_reference(self):
+        """Test vectorized GAE against a per-env scalar loop."""
+        rng = np.random.default_rng(1)
+        buffer = RolloutBuffer(16, 3, state_size=34, gamma=0.9, gae_lambda=0.8)
+        for _ in range(16):
+            buffer.add(
+                np.zeros((3, 34)),
+                np.zeros(3, dtype=int),
+                np.zeros(3),
+                rng.normal(size=3),
+                rng.normal(size=3),
+                rng.random(3) < 0.2,
+            )
+        last_values = rng.normal(size=3).astype(np.float32)
+        buffer.compute_gae(last_values)
+
+        for env in range(3):
+            gae = 0.0
+            next_value = last_values[env]
+            for t in reversed(range(16)):
+                not_done = 1.0 - buffer.dones[t, env]
+                delta = buffer.rewards[t, env] + 0.9 * next_value * not_done - buffer.values[t, env]
+                gae = delta + 0.9 * 0.8 * not_done * gae
+                self.assertAlmostEqual(buffer.advantages[t, env], gae, places=4)
+                next_value = buffer.values[t, env]
+
+    def test_train_on_buffer(self):
+        """Test minibatch PPO update on a collected rollout (NumPy fallback)."""
+        buffer = RolloutBuffer(32, 8, state_size=34)
+        obs = self.env.reset()
+        while not buffer.full:
+            actions, log_probs, values = self.agent.select_actions(obs)
+            next_obs, rewards, dones, _ = self.env.step(actions)
+            buffer.add(obs, actions, log_probs, values, rewards, dones)
+            obs = next_obs
+        buffer.compute_gae(self.agent.estimate_values(obs))
+
+        weights_before = self.agent.policy.weights.copy()
+        metrics = self.agent.train_on_buffer(buffer, epochs=2, minibatch_size=64)
+        self.assertIn("policy_loss", metrics)
+        self.assertTrue(np.isfinite(metrics["value_loss"]))
+        self.assertFalse(np.allclose(weights_before, self.agent.policy.weights))
+
+
 class TestRLInference(unittest.TestCase):
     """Test RL inference engine."""
 
@@ -169,6 +241,48 @@ class TestRLInference(unittest.TestCase):
         self.assertIn("timestamp", data)
 
 
+class TestRLPolicyService(unittest.TestCase):
+    """Test batched, hot-reloading policy service."""
+
+    def setUp(self):
+        self.checkpoint = STATE / "rl_model" / "checkpoint_service_test.pkl"
+        PPOAgent(state_size=34, action_size=8, use_torch=False).save("service_test")
+        self.service = RLPolicyService(
+            checkpoint_name="service_test", use_torch=False, reload_check_seconds=0.0
+        )
+
+    def tearDown(self):
+        self.checkpoint.unlink(missing_ok=True)
+
+    def test_decide_batch(self):
+        """Test one batched call scores every symbol."""
+        prices = generate_synthetic_prices(num_series=5, length=120, seed=2)
+        histories = {f"SYM{i}": list(prices[i]) for i in range(5)}
+        histories["EMPTY"] = []
+        decisions = self.service.decide(histories)
+
+        self.assertEqual(set(decisions), {f"SYM{i}" for i in range(5)})
+        for decision in decisions.values():
+            self.assertIn(decision["strategy"], STRATEGIES)
+            self.assertGreater(decision["confidence"], 0.0)
+            self.assertLessEqual(decision["confidence"], 1.0)
+
+    def test_hot_reload(self):
+        """Test weights are reloaded only when the checkpoint changes."""
+        self.assertTrue(self.service.model_loaded)
+        self.assertFalse(self.service.maybe_reload())
+
+        agent = PPOAgent(state_size=34, action_size=8, use_torch=False)
+        agent.policy.bias[:] = [0, 0, 0, 0, 0, 0, 0, 50.0]
+        time.sleep(0.01)
+        agent.save("service_test")
+
+        self.assertTrue(self.service.maybe_reload())
+        actions, confidences, _ = self.service.predict_batch(np.zeros((3, 34)))
+        self.assertTrue(np.all(actions == 7))
+        self.assertTrue(np.all(confidences > 0.99))
+
+
 class TestIntegration(unittest.TestCase):
     """Integration tests."""
 
@@ -221,7 +335,9 @@ def run_tests():
 
     suite.addTests(loader.loadTestsFromTestCase(TestRLEnvironment))
     suite.addTests(loader.loadTestsFromTestCase(TestRLAgent))
+    suite.addTests(loader.loadTestsFromTestCase(TestVectorizedTraining))
     suite.addTests(loader.loadTestsFromTestCase(TestRLInference))
+    suite.addTests(loader.loadTestsFromTestCase(TestRLPolicyService))
     suite.addTests(loader.loadTestsFromTestCase(TestIntegration))
 
     runner = unittest.TextTestRunner(verbosity=2)
@@ -6,19 +6,24 @@ Bayesian portfolio optimization combining market equilibrium with investor views
 More stable than pure Markowitz optimization.
 """
 
+from __future__ import annotations
+
 import logging
 import os
+import sys
 import traceback
 from pathlib import Path
 
 import numpy as np
 
-try:
-    import pandas as pd
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from utils.lazy_imports import lazy_import, module_available  # noqa: E402
 
-    HAS_PANDAS = True
-except ImportError:
-    HAS_PANDAS = False
+pd = lazy_import("pandas")
+HAS_PANDAS = module_available("pandas")
 
 ROOT = Path(os.path.expanduser("~/neolight"))
 STATE = ROOT / "state"
@@ -4,10 +4,16 @@ NeoLight Cointegration Analyzer - Advanced Math
 ===============================================
 Find cointegrated pairs for statistical arbitrage (pairs trading).
 More robust than correlation - identifies true long-term relationships.
+
+Universe scans prefilter pairs on one correlation matrix, then run the
+Engle-Granger test (OLS hedge + ADF with AIC lag selection, as in
+statsmodels.coint) for whole batches of pairs with stacked least squares.
 """
 
+import hashlib
 import logging
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Any
 
@@ -15,6 +21,8 @@ import numpy as np
 
 try:
     import pandas as pd
+    from scipy.stats import norm
+    from statsmodels.tsa import adfvalues
     from statsmodels.tsa.stattools import adfuller, coint
 
     HAS_STATSMODELS = True
@@ -45,6 +53,161 @@ if not logger.handlers:
     console_handler.setFormatter(logging.Formatter("%(levelname)s - %(message)s"))
     logger.addHandler(console_handler)
 
+# Pair results keyed by (asset1, asset2, maxlag); reused while both columns' data is unchanged
+PAIR_CACHE_MAX = 500_000
+_PAIR_CACHE: dict[tuple[str, str, int | None], tuple[str, str, dict[str, float]]] = {}
+# statsmodels.coint treats R^2 above this as perfectly collinear (stat -inf, p 0)
+COLLINEAR_RSQUARED = 1 - 100 * np.sqrt(np.finfo(float).eps)
+
+
+def column_fingerprints(prices_df: pd.DataFrame) -> dict[str, str]:
+    """Hash of each column's values (NaNs included) for pair-cache invalidation."""
+    fingerprints = {}
+    for name in prices_df.columns:
+        values = np.ascontiguousarray(prices_df[name].to_numpy(dtype=float))
+        fingerprints[name] = hashlib.blake2b(values.tobytes(), digest_size=12).hexdigest()
+    return fingerprints
+
+
+def default_adf_maxlag(nobs: int) -> int:
+    """statsmodels adfuller default maxlag for a no-constant regression."""
+    return max(0, min(nobs // 2 - 1, int(np.ceil(12.0 * np.power(nobs / 100.0, 0.25)))))
+
+
+def mackinnon_pvalues(stats: np.ndarray, regression: str = "c", N: int = 1) -> np.ndarray:
+    """Vectorized statsmodels mackinnonp (MacKinnon 1994 approximate p-values)."""
+    stats = np.asarray(stats, dtype=float)
+    small = adfvalues._tau_smallps[regression][N - 1][::-1]
+    large = adfvalues._tau_largeps[regression][N - 1][::-1]
+    star = adfvalues._tau_stars[regression][N - 1]
+    with np.errstate(invalid="ignore", over="ignore"):
+        pvalues = norm.cdf(
+            np.where(stats <= star, np.polyval(small, stats), np.polyval(large, stats))
+        )
+    pvalues = np.where(stats > adfvalues._tau_maxs[regression][N - 1], 1.0, pvalues)
+    return np.where(stats < adfvalues._tau_mins[regression][N - 1], 0.0, pvalues)
+
+
+def _adf_design(residuals: np.ndarray, lags: int, maxlag: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Stacked ADF regressions for (B, T) residual series.
+
+    Returns (Z, dy) with Z[b] = [e_{t-1}, de_{t-1}, ..., de_{t-lags}] as rows
+    (shape (B, lags + 1, nobs)) and dy[b] = de_t over the rows usable with
+    maxlag lags (statsmodels layout).
+    """
+    diff = np.diff(residuals, axis=1)
+    nobs = diff.shape[1] - maxlag
+    Z = np.empty((len(residuals), lags + 1, nobs))
+    Z[:, 0] = residuals[:, maxlag : maxlag + nobs]
+    for lag in range(1, lags + 1):
+        Z[:, lag] = diff[:, maxlag - lag : maxlag - lag + nobs]
+    return Z, diff[:, maxlag:]
+
+
+def adf_statistics_batch(
+    residuals: np.ndarray, maxlag: int | None = None, autolag: str | None = "aic"
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    ADF t-statistics (no constant) for a batch of series, one regression per row.
+
+    Matches statsmodels adfuller(x, maxlag, autolag="aic"|None, regression="n"):
+    lag length is chosen by AIC on the common maxlag sample, then the chosen
+    regression is re-run on its full sample.
+
+    Args:
+        residuals: (B, T) series
+        maxlag: Max augmentation lag (default: statsmodels rule of thumb)
+        autolag: "aic" to select the lag, None to use maxlag
+
+    Returns:
+        (t-statistics (B,), used lags (B,))
+    """
+    batch, length = residuals.shape
+    maxlag = default_adf_maxlag(length) if maxlag is None else maxlag
+
+    if autolag is None:
+        used = np.full(batch, maxlag)
+    else:
+        Z, dy = _adf_design(residuals, maxlag, maxlag)
+        nobs = dy.shape[1]
+        gram = np.matmul(Z, Z.transpose(0, 2, 1))
+        moment = np.matmul(Z, dy[:, :, None])[..., 0]
+        total = np.einsum("bt,bt->b", dy, dy)
+        aic = np.empty((maxlag + 1, batch))
+        for lag in range(maxlag + 1):
+            k = lag + 1
+            coef = np.linalg.solve(gram[:, :k, :k], moment[:, :k, None])[..., 0]
+            ssr = np.maximum(total - np.einsum("bk,bk->b", coef, moment[:, :k]), 1e-300)
+            aic[lag] = nobs * np.log(ssr / nobs) + 2 * k
+        used = np.argmin(aic, axis=0)
+
+    stats = np.empty(batch)
+    for lag in np.unique(used):
+        rows = np.flatnonzero(used == lag)
+        Z, dy = _adf_design(residuals[rows], lag, lag)
+        nobs, k = dy.shape[1], lag + 1
+        gram = np.matmul(Z, Z.transpose(0, 2, 1))
+        moment = np.matmul(Z, dy[:, :, None])[..., 0]
+        inverse = np.linalg.inv(gram)
+        coef = np.einsum("bij,bj->bi", inverse, moment)
+        resid = dy - np.matmul(coef[:, None, :], Z)[:, 0]
+        sigma2 = np.einsum("bt,bt->b", resid, resid) / (nobs - k)
+        stats[rows] = coef[:, 0] / np.sqrt(sigma2 * inverse[:, 0, 0])
+    return stats, used
+
+
+def engle_granger_batch(
+    y0: np.ndarray, y1: np.ndarray, maxlag: int | None = None, autolag: str | None = "aic"
+) -> dict[str, np.ndarray]:
+    """
+    Engle-Granger cointegration tests for a batch of pairs (rows of y0, y1).
+
+    Equivalent to statsmodels coint(y0[b], y1[b], trend="c") for every row:
+    OLS of y0 on [y1, 1], then an ADF test on the residuals with MacKinnon
+    p-values for N=2.
+
+    Args:
+        y0: (B, T) dependent series
+        y1: (B, T) regressor series
+
+    Returns:
+        Dict of arrays: score, pvalue, hedge_ratio, used_lag
+    """
+    y0_c = y0 - y0.mean(axis=1, keepdims=True)
+    y1_c = y1 - y1.mean(axis=1, keepdims=True)
+    sxx = np.einsum("bt,bt->b", y1_c, y1_c)
+    sxy = np.einsum("bt,bt->b", y1_c, y0_c)
+    syy = np.einsum("bt,bt->b", y0_c, y0_c)
+    hedge = np.divide(sxy, sxx, out=np.zeros_like(sxy), where=sxx > 0)
+    residuals = y0_c - hedge[:, None] * y1_c
+    rsquared = np.divide(sxy * hedge, syy, out=np.ones_like(syy), where=syy > 0)
+
+    collinear = rsquared >= COLLINEAR_RSQUARED
+    scores = np.full(len(y0), -np.inf)
+    lags = np.zeros(len(y0), dtype=int)
+    if (~collinear).any():
+        scores[~collinear], lags[~collinear] = adf_statistics_batch(
+            residuals[~collinear], maxlag=maxlag, autolag=autolag
+        )
+    pvalues = mackinnon_pvalues(scores, regression="c", N=2)
+    return {"score": scores, "pvalue": pvalues, "hedge_ratio": hedge, "used_lag": lags}
+
+
+def _coint_pair_worker(task: tuple[str, str, np.ndarray, np.ndarray, int | None]) -> tuple:
+    """Process-pool worker: statsmodels coint on one NaN-cleaned pair."""
+    asset1, asset2, prices1, prices2, maxlag = task
+    valid = ~(np.isnan(prices1) | np.isnan(prices2))
+    prices1, prices2 = prices1[valid], prices2[valid]
+    if len(prices1) < 30:
+        return asset1, asset2, None
+    try:
+        score, pvalue, _ = coint(prices1, prices2, maxlag=maxlag)
+    except Exception:
+        return asset1, asset2, None
+    beta = np.polyfit(prices2, prices1, 1)[0]
+    return asset1, asset2, {"score": float(score), "pvalue": float(pvalue), "hedge_ratio": beta}
+
 
 class CointegrationAnalyzer:
     """
@@ -130,31 +293,167 @@ class CointegrationAnalyzer:
             logger.error(f"❌ Error testing cointegration: {e}")
             return {"cointegrated": False, "error": str(e)}
 
-    def find_cointegrated_pairs(self, significance_level: float = 0.05) -> list[dict[str, Any]]:
+    def scan_pairs(
+        self,
+        min_correlation: float = 0.0,
+        maxlag: int | None = None,
+        batch_size: int = 512,
+        workers: int = 0,
+    ) -> pd.DataFrame:
+        """
+        Engle-Granger test for every candidate pair in the universe.
+
+        Pairs are prefiltered on one level-correlation matrix. Pairs of
+        gap-free columns are tested in stacked batches; pairs touching a
+        column with NaNs are tested one by one (in a process pool when
+        workers > 1). Results are cached per pair and reused until either
+        column's data changes.
+
+        Args:
+            min_correlation: Minimum |correlation| of price levels to test a pair
+            maxlag: ADF max lag (default: statsmodels rule of thumb)
+            batch_size: Pairs per stacked regression batch
+            workers: Processes for the per-pair remainder (0/1 = in-process)
+
+        Returns:
+            DataFrame with asset1, asset2, correlation, score, pvalue,
+            hedge_ratio, used_lag (one row per tested pair)
+        """
+        values = self.prices_df.to_numpy(dtype=float)
+        names = self.asset_names
+        n = len(names)
+        if n < 2:
+            return pd.DataFrame(
+                columns=[
+                    "asset1",
+                    "asset2",
+                    "correlation",
+                    "score",
+                    "pvalue",
+                    "hedge_ratio",
+                    "used_lag",
+                ]
+            )
+
+        correlation = self.prices_df.corr().to_numpy()
+        rows, cols = np.triu_indices(n, k=1)
+        abs_corr = np.abs(np.nan_to_num(correlation[rows, cols]))
+        keep = abs_corr >= min_correlation
+        rows, cols = rows[keep], cols[keep]
+        logger.info(
+            f"🔎 Testing {len(rows)} of {n * (n - 1) // 2} pairs (|corr| >= {min_correlation})"
+        )
+
+        fingerprints = column_fingerprints(self.prices_df)
+        results: dict[tuple[int, int], dict[str, float]] = {}
+        pending_clean, pending_gappy = [], []
+        has_gaps = np.isnan(values).any(axis=0)
+        enough_data = len(values) >= 30
+
+        for i, j in zip(rows.tolist(), cols.tolist(), strict=True):
+            key = (names[i], names[j], maxlag)
+            cached = _PAIR_CACHE.get(key)
+            if cached and cached[0] == fingerprints[key[0]] and cached[1] == fingerprints[key[1]]:
+                results[(i, j)] = cached[2]
+            elif has_gaps[i] or has_gaps[j]:
+                pending_gappy.append((i, j))
+            elif enough_data:
+                pending_clean.append((i, j))
+
+        if pending_clean:
+            pairs = np.asarray(pending_clean)
+            columns = values.T
+            for start in range(0, len(pairs), batch_size):
+                chunk = pairs[start : start + batch_size]
+                batch = engle_granger_batch(
+                    columns[chunk[:, 0]], columns[chunk[:, 1]], maxlag=maxlag
+                )
+                for k, (i, j) in enumerate(chunk.tolist()):
+                    results[(i, j)] = {
+                        "score": float(batch["score"][k]),
+                        "pvalue": float(batch["pvalue"][k]),
+                        "hedge_ratio": float(batch["hedge_ratio"][k]),
+                        "used_lag": int(batch["used_lag"][k]),
+                    }
+
+        if pending_gappy:
+            tasks = [
+                (names[i], names[j], values[:, i], values[:, j], maxlag) for i, j in pending_gappy
+            ]
+            if workers > 1:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    outcomes = list(pool.map(_coint_pair_worker, tasks, chunksize=64))
+            else:
+                outcomes = [_coint_pair_worker(task) for task in tasks]
+            index = {name: i for i, name in enumerate(names)}
+            for asset1, asset2, outcome in outcomes:
+                if outcome is not None:
+                    results[(index[asset1], index[asset2])] = outcome
+
+        for i, j in pending_clean + pending_gappy:
+            if (i, j) in results:
+                key = (names[i], names[j], maxlag)
+                _PAIR_CACHE[key] = (fingerprints[key[0]], fingerprints[key[1]], results[(i, j)])
+        while len(_PAIR_CACHE) > PAIR_CACHE_MAX:
+            _PAIR_CACHE.pop(next(iter(_PAIR_CACHE)))
+
+        tested = len(pending_clean) + len(pending_gappy)
+        logger.info(f"♻️  {len(results) - tested} pairs from cache, {tested} re-tested")
+
+        records = [
+            {
+                "asset1": names[i],
+                "asset2": names[j],
+                "correlation": float(correlation[i, j]),
+                **result,
+            }
+            for (i, j), result in results.items()
+        ]
+        return pd.DataFrame.from_records(records)
+
+    def find_cointegrated_pairs(
+        self,
+        significance_level: float = 0.05,
+        min_correlation: float = 0.0,
+        workers: int = 0,
+    ) -> list[dict[str, Any]]:
         """
         Find all cointegrated pairs.
 
         Args:
             significance_level: Significance level
+            min_correlation: Minimum |correlation| of price levels to test a pair
+            workers: Processes for pairs with missing data (see scan_pairs)
 
         Returns:
             List of cointegrated pairs with test results
         """
-        cointegrated_pairs = []
-
-        n = len(self.asset_names)
-        for i in range(n):
-            for j in range(i + 1, n):
-                asset1 = self.asset_names[i]
-                asset2 = self.asset_names[j]
-
-                result = self.test_cointegration(asset1, asset2, significance_level)
+        scan = self.scan_pairs(min_correlation=min_correlation, workers=workers)
+        if scan.empty:
+            logger.info("✅ Found 0 cointegrated pairs")
+            return []
 
-                if result.get("cointegrated", False):
-                    cointegrated_pairs.append({"asset1": asset1, "asset2": asset2, **result})
-
-        # Sort by p-value (lower = stronger cointegration)
-        cointegrated_pairs.sort(key=lambda x: x.get("pvalue", 1.0))
+        significant = scan[scan["pvalue"] < significance_level].sort_values("pvalue")
+        cointegrated_pairs = []
+        for row in significant.itertuples(index=False):
+            spread = (self.prices_df[row.asset1] - self.prices_df[row.asset2]).dropna().values
+            spread_mean = np.mean(spread)
+            spread_std = np.std(spread)
+            z_score = (spread[-1] - spread_mean) / spread_std if spread_std > 0 else 0.0
+            cointegrated_pairs.append(
+                {
+                    "asset1": row.asset1,
+                    "asset2": row.asset2,
+                    "cointegrated": True,
+                    "pvalue": float(row.pvalue),
+                    "score": float(row.score),
+                    "spread_mean": float(spread_mean),
+                    "spread_std": float(spread_std),
+                    "current_zscore": float(z_score),
+                    "significance_level": significance_level,
+                    "hedge_ratio": float(row.hedge_ratio),
+                }
+            )
 
         logger.info(f"✅ Found {len(cointegrated_pairs)} cointegrated pairs")
 
@@ -6,21 +6,42 @@ Clustering-based portfolio construction, more robust than risk parity.
 Handles non-stationary correlations better than traditional methods.
 """
 
+from __future__ import annotations
+
+import hashlib
 import logging
 import os
+import sys
+import threading
 import traceback
+from collections import OrderedDict
 from pathlib import Path
+from typing import NamedTuple
 
 import numpy as np
 
-try:
-    import pandas as pd
-    from scipy.cluster.hierarchy import dendrogram, leaves_list, linkage
-    from scipy.spatial.distance import squareform
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from utils.lazy_imports import lazy_import, module_available  # noqa: E402
+
+# pandas/scipy cost ~0.5s to import; defer them until an optimization runs
+pd = lazy_import("pandas")
+scipy_hierarchy = lazy_import("scipy.cluster.hierarchy")
+scipy_distance = lazy_import("scipy.spatial.distance")
+HAS_SCIPY = module_available("pandas") and module_available("scipy")
+
+
+def linkage(condensed: np.ndarray, method: str = "single") -> np.ndarray:
+    """scipy.cluster.hierarchy.linkage, imported on first call."""
+    return scipy_hierarchy.linkage(condensed, method=method)
+
+
+def squareform(matrix: np.ndarray, checks: bool = True) -> np.ndarray:
+    """scipy.spatial.distance.squareform, imported on first call."""
+    return scipy_distance.squareform(matrix, checks=checks)
 
-    HAS_SCIPY = True
-except ImportError:
-    HAS_SCIPY = False
 
 ROOT = Path(os.path.expanduser("~/neolight"))
 STATE = ROOT / "state"
@@ -47,33 +68,223 @@ if not logger.handlers:
     logger.addHandler(console_handler)
 
 
+# Linkage trees cached by correlation fingerprint (shared across optimizer instances)
+TREE_CACHE_SIZE = 32
+# Incremental re-clustering: allowed symbol changes and correlation drift
+INCREMENTAL_MAX_CHANGE_FRACTION = 0.05
+INCREMENTAL_MAX_CORR_DRIFT = 0.05
+
+
+class ClusterTree(NamedTuple):
+    """
+    Binary cluster tree in quasi-diagonal layout.
+
+    order lists asset indices left-to-right. Every internal node covers a
+    contiguous range of that order: nodes[k] = (start, mid, end, left, right)
+    where left/right index child rows in nodes (-1 for a leaf). Rows are in
+    post-order, so the root is the last row and children precede parents.
+    """
+
+    order: np.ndarray
+    nodes: np.ndarray
+
+
+class _TreeState(NamedTuple):
+    """
+    Last clustering, kept for incremental re-clustering.
+
+    corr holds the correlations the tree was built from (for patched-in
+    symbols, those at the time they were attached), so drift accumulates
+    across patches instead of being measured call to call.
+    """
+
+    names: tuple[str, ...]
+    corr: np.ndarray
+    children: dict[int, tuple[int, int]]
+    root: int
+
+
+_TREE_CACHE: OrderedDict[str, ClusterTree] = OrderedDict()
+_LAST_TREE: dict[str, _TreeState] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def correlation_fingerprint(corr: np.ndarray, names: list[str], decimals: int = 6) -> str:
+    """Stable hash of asset names and a rounded correlation matrix."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update("\x1f".join(names).encode())
+    digest.update(np.ascontiguousarray(np.round(corr, decimals)).tobytes())
+    return digest.hexdigest()
+
+
+def _children_from_linkage(linkage_matrix: np.ndarray) -> tuple[dict[int, tuple[int, int]], int]:
+    """Convert a scipy linkage matrix to {node: (left, right)} with leaves 0..n-1."""
+    n = len(linkage_matrix) + 1
+    children = {n + i: (int(row[0]), int(row[1])) for i, row in enumerate(linkage_matrix)}
+    return children, 2 * n - 2
+
+
+def _flatten_tree(children: dict[int, tuple[int, int]], root: int, n: int) -> ClusterTree:
+    """Lay out a {node: (left, right)} tree as a ClusterTree (iterative, no recursion limit)."""
+    if n == 1:
+        return ClusterTree(order=np.array([root]), nodes=np.empty((0, 5), dtype=np.int64))
+
+    order: list[int] = []
+    rows: list[list[int]] = []
+    row_of: dict[int, int] = {}
+    start_of: dict[int, int] = {}
+    stack: list[tuple[int, bool]] = [(root, False)]
+
+    while stack:
+        node, expanded = stack.pop()
+        if node not in children:
+            order.append(node)
+            continue
+        left, right = children[node]
+        if not expanded:
+            start_of[node] = len(order)
+            stack.append((node, True))
+            stack.append((right, False))
+            stack.append((left, False))
+            continue
+        start = start_of[node]
+        mid = start_of[right] if right in children else len(order) - 1
+        rows.append([start, mid, len(order), row_of.get(left, -1), row_of.get(right, -1)])
+        row_of[node] = len(rows) - 1
+
+    return ClusterTree(
+        order=np.asarray(order, dtype=np.int64), nodes=np.asarray(rows, dtype=np.int64)
+    )
+
+
+def cluster_tree_weights(cov: np.ndarray, tree: ClusterTree) -> np.ndarray:
+    """
+    HRP weights by bisecting along the cluster tree.
+
+    Cluster variance uses inverse-variance weights inside the cluster. With
+    unnormalized weights u_i = 1/var_i, a node's quadratic form is built from
+    its children: Q = Q_left + Q_right + 2 u_left' C u_right, so each asset
+    pair is touched once (at its lowest common ancestor) - O(n^2) overall.
+
+    Args:
+        cov: Covariance matrix (original asset order)
+        tree: Cluster tree over the same assets
+
+    Returns:
+        Weights in original asset order, summing to 1
+    """
+    order = tree.order
+    n = len(order)
+    if n == 1:
+        return np.ones(1)
+
+    ordered_cov = cov[np.ix_(order, order)]
+    u = 1.0 / np.maximum(np.diag(ordered_cov), 1e-12)
+    nodes = tree.nodes
+    num_nodes = len(nodes)
+
+    # Bottom-up: memoized quadratic form Q and weight sum S per node
+    quad = np.empty(num_nodes)
+    total = np.empty(num_nodes)
+    for k in range(num_nodes):
+        start, mid, end, left, right = nodes[k]
+        q_left = quad[left] if left >= 0 else u[start]
+        q_right = quad[right] if right >= 0 else u[mid]
+        cross = u[start:mid] @ ordered_cov[start:mid, mid:end] @ u[mid:end]
+        quad[k] = q_left + q_right + 2.0 * cross
+        total[k] = (total[left] if left >= 0 else u[start]) + (
+            total[right] if right >= 0 else u[mid]
+        )
+    variance = quad / np.maximum(total * total, 1e-300)
+
+    # Top-down: split each node's weight between its children
+    node_weight = np.empty(num_nodes)
+    node_weight[-1] = 1.0
+    ordered_weights = np.empty(n)
+    for k in range(num_nodes - 1, -1, -1):
+        start, mid, end, left, right = nodes[k]
+        var_left = variance[left] if left >= 0 else 1.0 / u[start]
+        var_right = variance[right] if right >= 0 else 1.0 / u[mid]
+        denom = var_left + var_right
+        alpha = 1.0 - var_left / denom if denom > 0 else 0.5
+        for child, share, position in ((left, alpha, start), (right, 1.0 - alpha, mid)):
+            if child >= 0:
+                node_weight[child] = node_weight[k] * share
+            else:
+                ordered_weights[position] = node_weight[k] * share
+
+    weights = np.empty(n)
+    weights[order] = ordered_weights
+    return weights
+
+
 class HierarchicalRiskParity:
     """
     Hierarchical Risk Parity portfolio optimization.
     Algorithm:
     1. Build correlation matrix
-    2. Hierarchical clustering
-    3. Quasi-diagonalization
-    4. Recursive bisection
+    2. Hierarchical clustering (linkage cached by correlation fingerprint)
+    3. Quasi-diagonalization (dendrogram leaf order)
+    4. Recursive bisection along the dendrogram
     """
 
-    def __init__(self, returns_df: pd.DataFrame):
+    def __init__(
+        self,
+        returns_df: pd.DataFrame,
+        linkage_method: str = "ward",
+        incremental: bool = True,
+    ):
         """
         Initialize HRP optimizer.
 
         Args:
             returns_df: DataFrame with asset returns (columns = assets, rows = time)
+            linkage_method: scipy linkage method (ward, single, average, complete)
+            incremental: Patch the previous tree when only a few symbols changed
         """
         if not HAS_SCIPY:
             raise ImportError("scipy required for Hierarchical Risk Parity")
 
         self.returns_df = returns_df
         self.cov_matrix = returns_df.pct_change().dropna().cov() * 252  # Annualized
-        self.corr_matrix = self.cov_matrix.corr()
         self.asset_names = list(returns_df.columns)
+        self.linkage_method = linkage_method
+        self.incremental = incremental
+        self.corr_matrix = self._correlation_from_covariance()
 
         logger.info(f"✅ HierarchicalRiskParity initialized for {len(self.asset_names)} assets")
 
+    @classmethod
+    def from_covariance(
+        cls,
+        cov_matrix: pd.DataFrame,
+        linkage_method: str = "ward",
+        incremental: bool = True,
+    ) -> HierarchicalRiskParity:
+        """Build an optimizer directly from an (annualized) covariance matrix."""
+        if not HAS_SCIPY:
+            raise ImportError("scipy required for Hierarchical Risk Parity")
+
+        self = cls.__new__(cls)
+        self.returns_df = None
+        self.cov_matrix = cov_matrix
+        self.asset_names = list(cov_matrix.columns)
+        self.linkage_method = linkage_method
+        self.incremental = incremental
+        self.corr_matrix = self._correlation_from_covariance()
+        return self
+
+    def _correlation_from_covariance(self) -> pd.DataFrame:
+        """Correlation matrix implied by the covariance matrix (zero-variance safe)."""
+        cov = self.cov_matrix.values
+        std = np.sqrt(np.maximum(np.diag(cov), 0.0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = cov / np.outer(std, std)
+        corr = np.nan_to_num(corr, nan=0.0, posinf=0.0, neginf=0.0)
+        np.clip(corr, -1.0, 1.0, out=corr)
+        np.fill_diagonal(corr, 1.0)
+        return pd.DataFrame(corr, index=self.asset_names, columns=self.asset_names)
+
     def optimize(self) -> dict[str, float]:
         """
         Optimize portfolio using Hierarchical Risk Parity.
@@ -82,34 +293,10 @@ class HierarchicalRiskParity:
             Optimal weights
         """
         try:
-            # Step 1: Build distance matrix from correlation
-            # Distance = sqrt(0.5 * (1 - correlation))
-            corr_values = self.corr_matrix.values
-            distance_matrix = np.sqrt(0.5 * (1 - corr_values))
-
-            # Step 2: Hierarchical clustering
-            # Convert to condensed distance matrix
-            condensed_dist = squareform(distance_matrix, checks=False)
-            linkage_matrix = linkage(condensed_dist, method="ward")
-
-            # Step 3: Quasi-diagonalization (reorder by dendrogram)
-            leaves = leaves_list(linkage_matrix)
-            reordered_corr = corr_values[np.ix_(leaves, leaves)]
-            reordered_cov = self.cov_matrix.values[np.ix_(leaves, leaves)]
-            reordered_names = [self.asset_names[i] for i in leaves]
-
-            # Step 4: Recursive bisection
-            weights = self._recursive_bisection(reordered_cov, len(reordered_names))
-
-            # Map weights back to original asset order
-            optimal_weights = {}
-            for i, name in enumerate(reordered_names):
-                optimal_weights[name] = weights[i]
-
-            # Normalize
-            total_weight = sum(optimal_weights.values())
-            if total_weight > 0:
-                optimal_weights = {k: v / total_weight for k, v in optimal_weights.items()}
+            tree = self._cluster_tree()
+            weights = cluster_tree_weights(self.cov_matrix.values, tree)
+
+            optimal_weights = dict(zip(self.asset_names, weights.tolist(), strict=True))
 
             logger.info(f"📊 HRP weights computed for {len(optimal_weights)} assets")
 
@@ -122,52 +309,151 @@ class HierarchicalRiskParity:
             equal_weight = 1.0 / len(self.asset_names)
             return dict.fromkeys(self.asset_names, equal_weight)
 
-    def _recursive_bisection(self, cov_matrix: np.ndarray, n: int) -> np.ndarray:
-        """
-        Recursive bisection algorithm for HRP.
-        Splits portfolio into two clusters and allocates risk equally.
-        """
-        if n == 1:
-            return np.array([1.0])
+    def _quasi_diagonalization(self) -> list[str]:
+        """Asset names in dendrogram leaf order (uses the cached tree)."""
+        order = self._cluster_tree().order
+        return [self.asset_names[i] for i in order]
 
-        # Split into two clusters
-        mid = n // 2
+    def _distance_matrix(self) -> np.ndarray:
+        """Correlation distance sqrt(0.5 * (1 - rho))."""
+        distance = np.sqrt(np.clip(0.5 * (1.0 - self.corr_matrix.values), 0.0, None))
+        np.fill_diagonal(distance, 0.0)
+        return distance
 
-        # Left cluster
-        left_cov = cov_matrix[:mid, :mid]
-        left_weights = self._recursive_bisection(left_cov, mid)
-
-        # Right cluster
-        right_cov = cov_matrix[mid:, mid:]
-        right_weights = self._recursive_bisection(right_cov, n - mid)
-
-        # Calculate cluster variances
-        left_var = np.dot(left_weights, np.dot(left_cov, left_weights))
-        right_var = np.dot(right_weights, np.dot(right_cov, right_weights))
-
-        # Allocate risk equally between clusters
-        if left_var > 0 and right_var > 0:
-            # Inverse variance weighting
-            left_weight = 1.0 / left_var
-            right_weight = 1.0 / right_var
-            total_weight = left_weight + right_weight
+    def _cluster_tree(self) -> ClusterTree:
+        """
+        Return the cluster tree for the current correlation matrix.
 
-            if total_weight > 0:
-                left_weight /= total_weight
-                right_weight /= total_weight
-            else:
-                left_weight = 0.5
-                right_weight = 0.5
+        Lookup order: fingerprint cache, incremental patch of the previous
+        tree for this linkage method, then a full scipy linkage.
+        """
+        corr = self.corr_matrix.values
+        names = self.asset_names
+        n = len(names)
+        key = f"{self.linkage_method}:{correlation_fingerprint(corr, names)}"
+
+        with _CACHE_LOCK:
+            cached = _TREE_CACHE.get(key)
+            if cached is not None:
+                _TREE_CACHE.move_to_end(key)
+                logger.debug("♻️  HRP linkage cache hit")
+                return cached
+            previous = _LAST_TREE.get(self.linkage_method)
+
+        reference = corr.copy()
+        if n == 1:
+            children, root = {}, 0
         else:
-            left_weight = 0.5
-            right_weight = 0.5
+            patched = self._incremental_children(previous) if self.incremental else None
+            if patched is not None:
+                children, root, reference = patched
+                logger.info("🧩 HRP tree updated incrementally")
+            else:
+                condensed = squareform(self._distance_matrix(), checks=False)
+                children, root = _children_from_linkage(
+                    linkage(condensed, method=self.linkage_method)
+                )
+
+        tree = _flatten_tree(children, root, n)
+        with _CACHE_LOCK:
+            _TREE_CACHE[key] = tree
+            while len(_TREE_CACHE) > TREE_CACHE_SIZE:
+                _TREE_CACHE.popitem(last=False)
+            _LAST_TREE[self.linkage_method] = _TreeState(tuple(names), reference, children, root)
+        return tree
+
+    def _incremental_children(
+        self, previous: _TreeState | None
+    ) -> tuple[dict[int, tuple[int, int]], int, np.ndarray] | None:
+        """
+        Patch the previous tree when only a few symbols were added or removed.
 
-        # Combine weights
-        combined_weights = np.zeros(n)
-        combined_weights[:mid] = left_weights * left_weight
-        combined_weights[mid:] = right_weights * right_weight
+        Removed symbols are pruned (their sibling takes the parent's place);
+        added symbols are attached next to their nearest remaining asset.
+        Returns (children, root, reference correlations), or None when a full
+        re-cluster is warranted: no symbol change, too many changes, or
+        correlations drifted from those the tree was built from.
+        """
+        if previous is None:
+            return None
+
+        names = self.asset_names
+        index = {name: i for i, name in enumerate(names)}
+        prev_index = {name: i for i, name in enumerate(previous.names)}
+        common = [name for name in names if name in prev_index]
+        added = [name for name in names if name not in prev_index]
+        removed = [name for name in previous.names if name not in index]
+
+        changes = len(added) + len(removed)
+        if not changes:
+            return None  # Same symbols, new correlations: relink
+        if len(common) < 2 or changes > max(1, int(INCREMENTAL_MAX_CHANGE_FRACTION * len(names))):
+            return None
+
+        new_idx = np.array([index[name] for name in common])
+        old_idx = np.array([prev_index[name] for name in common])
+        corr = self.corr_matrix.values
+        drift = np.abs(corr[np.ix_(new_idx, new_idx)] - previous.corr[np.ix_(old_idx, old_idx)])
+        if drift.max() > INCREMENTAL_MAX_CORR_DRIFT:
+            return None
+        reference = corr.copy()
+        reference[np.ix_(new_idx, new_idx)] = previous.corr[np.ix_(old_idx, old_idx)]
+
+        # Relabel: leaves -> new asset indices, internal nodes -> ids above all leaves
+        n = len(names)
+        old_n = len(previous.names)
+        offset = n + len(previous.children)  # keeps relabelled internal ids clear of leaves
+
+        def relabel(node: int) -> int:
+            if node < old_n:
+                name = previous.names[node]
+                return index.get(name, -1 - node)  # negative marks a removed leaf
+            return node + offset
+
+        children = {
+            relabel(node): (relabel(left), relabel(right))
+            for node, (left, right) in previous.children.items()
+        }
+        root = relabel(previous.root)
+        parent = {child: node for node, pair in children.items() for child in pair}
+
+        # Prune removed leaves: splice the sibling into the grandparent
+        for name in removed:
+            leaf = -1 - prev_index[name]
+            node = parent.pop(leaf)
+            left, right = children.pop(node)
+            sibling = right if left == leaf else left
+            grand = parent.pop(node, None)
+            if grand is None:
+                root = sibling
+                parent.pop(sibling, None)
+            else:
+                g_left, g_right = children[grand]
+                children[grand] = (sibling, g_right) if g_left == node else (g_left, sibling)
+                parent[sibling] = grand
+
+        # Attach added leaves next to their nearest present asset
+        distance = self._distance_matrix()
+        present = list(new_idx)
+        next_id = max([offset + max(previous.children, default=0) + 1, n])
+        for name in added:
+            leaf = index[name]
+            nearest = present[int(np.argmin(distance[leaf, present]))]
+            node = next_id
+            next_id += 1
+            grand = parent.get(nearest)
+            children[node] = (nearest, leaf)
+            parent[nearest] = node
+            parent[leaf] = node
+            if grand is None:
+                root = node
+            else:
+                g_left, g_right = children[grand]
+                children[grand] = (node, g_right) if g_left == nearest else (g_left, node)
+                parent[node] = grand
+            present.append(leaf)
 
-        return combined_weights
+        return children, root, reference
 
 
 def main():
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+NeoLight Model Tuning Engine - Cached Features, Parallel Successive Halving
+==========================================================================
+Hyperparameter search for the ML pipeline that avoids repeated work:
+- Engineered datasets are cached per data fingerprint, so model selection,
+  tuning and ensembles share one feature-engineering pass and one split
+- Candidates are fit on a process pool that receives the data once
+- Successive halving prunes bad configurations early: every candidate is
+  scored on a small budget, and only the best 1/eta advance to the next
+  (eta times larger) budget. The budget is either a growing subset of the
+  training rows, or, for boosted models, the number of boosting rounds, in
+  which case survivors are warm-started instead of retrained
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import math
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+# Builds an unfitted estimator from a parameter dict; must be picklable
+# (a module-level function or a functools.partial of one)
+EstimatorFactory = Callable[[dict[str, Any]], Any]
+
+
+def dataset_fingerprint(df: pd.DataFrame) -> str:
+    """Content hash of a DataFrame (values, index and column names)."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(list(df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class FeatureCache:
+    """Small LRU cache of derived datasets keyed by fingerprint."""
+
+    def __init__(self, maxsize: int = 8):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        self.misses += 1
+        value = compute()
+        self._entries[key] = value
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def expand_grid(grid: dict[str, Sequence[Any]]) -> list[dict[str, Any]]:
+    """All combinations of a parameter grid, in grid order."""
+    names = list(grid)
+    return [dict(zip(names, values, strict=True)) for values in itertools.product(*grid.values())]
+
+
+# ---------------------------------------------------------------------------
+# Worker side. The pool initializer stores the data once per worker process;
+# tasks only carry parameters, a budget and (for warm starts) a fitted model.
+
+_WORKER_DATA: dict[str, Any] = {}
+
+
+def _init_worker(data: dict[str, Any]) -> None:
+    _WORKER_DATA.clear()
+    _WORKER_DATA.update(data)
+
+
+def _fit_rounds(model, X, y, rounds: int, previous: int):
+    """Fit `rounds` boosting rounds in total, reusing the first `previous`."""
+    if hasattr(model, "get_booster"):
+        # xgboost: continue training the existing booster
+        model.set_params(n_estimators=rounds - previous)
+        booster = model.get_booster() if previous else None
+        model.fit(X, y, xgb_model=booster)
+    else:
+        model.set_params(n_estimators=rounds, warm_start=True)
+        model.fit(X, y)
+    return model
+
+
+def _evaluate(task: tuple) -> tuple[dict[str, Any], Any]:
+    """
+    Fit one candidate on its budget; validation metrics and the model to warm-start.
+
+    A candidate that fails to build, fit or predict scores r2=-inf (with the
+    message under "error") so the other candidates still compete.
+    """
+    factory, params, resource, budget, state = task
+    data = _WORKER_DATA
+    start = time.perf_counter()
+    try:
+        if resource == "n_estimators":
+            model, previous = state if state is not None else (factory(params), 0)
+            model = _fit_rounds(model, data["X_train"], data["y_train"], budget, previous)
+            keep = model
+        else:
+            rows = data["order"][:budget] if budget < len(data["order"]) else slice(None)
+            model = factory(params)
+            model.fit(data["X_train"][rows], data["y_train"][rows])
+            keep = None
+        y_pred = model.predict(data["X_val"])
+    except Exception as e:
+        metrics = {
+            "r2": -np.inf,
+            "mse": np.inf,
+            "mae": np.inf,
+            "seconds": time.perf_counter() - start,
+            "error": f"{type(e).__name__}: {e}",
+        }
+        return metrics, None
+    r2 = float(r2_score(data["y_val"], y_pred))
+    metrics = {
+        "r2": r2 if np.isfinite(r2) else -np.inf,
+        "mse": float(mean_squared_error(data["y_val"], y_pred)),
+        "mae": float(mean_absolute_error(data["y_val"], y_pred)),
+        "seconds": time.perf_counter() - start,
+    }
+    return metrics, keep
+
+
+class Evaluator:
+    """
+    Runs candidate fits in-process or on a process pool sharing one dataset.
+
+    Use as a context manager; with max_workers <= 1 no pool is started.
+    """
+
+    def __init__(self, X_train, y_train, X_val, y_val, max_workers: int | None = None, seed=0):
+        X_train = np.asarray(X_train, dtype=float)
+        self.data = {
+            "X_train": X_train,
+            "y_train": np.asarray(y_train, dtype=float),
+            "X_val": np.asarray(X_val, dtype=float),
+            "y_val": np.asarray(y_val, dtype=float),
+            "order": np.random.default_rng(seed).permutation(len(X_train)),
+        }
+        self.max_workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+        self._pool: ProcessPoolExecutor | None = None
+
+    def __enter__(self) -> Evaluator:
+        if self.max_workers > 1:
+            self._pool = ProcessPoolExecutor(
+                self.max_workers, initializer=_init_worker, initargs=(self.data,)
+            )
+        else:
+            _init_worker(self.data)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    @property
+    def n_train(self) -> int:
+        return len(self.data["X_train"])
+
+    def map(self, tasks: list[tuple]) -> list[tuple[dict[str, Any], Any]]:
+        if self._pool is None or len(tasks) <= 1:
+            _init_worker(self.data)
+            return [_evaluate(task) for task in tasks]
+        return list(self._pool.map(_evaluate, tasks))
+
+
+@dataclass
+class HalvingResult:
+    """
+    Outcome of a successive-halving search.
+
+    Attributes:
+        best_params: Winning parameters (including the budget parameter for
+            n_estimators searches)
+        best_score: Validation R² of the winner
+        history: One record per evaluation (params, budget, rung, score, seconds)
+        rungs: Budget used at each rung
+        fit_seconds: Total model-fitting time across workers
+    """
+
+    best_params: dict[str, Any]
+    best_score: float
+    history: list[dict[str, Any]] = field(default_factory=list)
+    rungs: list[int] = field(default_factory=list)
+    fit_seconds: float = 0.0
+
+    @property
+    def evaluations(self) -> int:
+        return len(self.history)
+
+
+def halving_budgets(n_candidates: int, max_budget: int, min_budget: int, eta: int) -> list[int]:
+    """Geometric budgets ending at max_budget, one rung per eta-fold cut."""
+    rungs = int(math.log(max(n_candidates, 1), eta) + 1e-9) + 1
+    budgets = [max(min_budget, round(max_budget / eta**k)) for k in range(rungs)][::-1]
+    return sorted(set(budgets))
+
+
+def successive_halving(
+    factory: EstimatorFactory,
+    candidates: list[dict[str, Any]],
+    evaluator: Evaluator,
+    resource: str = "samples",
+    budgets: Sequence[int] | None = None,
+    eta: int = 3,
+    min_samples: int = 30,
+) -> HalvingResult:
+    """
+    Successive halving over a list of candidate configurations.
+
+    Args:
+        factory: Builds an unfitted estimator from parameters
+        candidates: Parameter dicts to compare
+        evaluator: Open Evaluator holding the train/validation data
+        resource: "samples" (growing training subsets) or "n_estimators"
+            (boosting rounds, survivors are warm-started between rungs)
+        budgets: Budget per rung (default: geometric in eta up to the full
+            training set, or up to the largest n_estimators candidate)
+        eta: Keep the best 1/eta of the candidates at every rung
+        min_samples: Smallest training subset for resource="samples"
+
+    Returns:
+        HalvingResult
+    """
+    if resource not in ("samples", "n_estimators"):
+        raise ValueError(f"Unknown resource: {resource}")
+    if not candidates:
+        raise ValueError("No candidates to evaluate")
+
+    if resource == "n_estimators":
+        rounds = sorted({int(c.get("n_estimators", 100)) for c in candidates})
+        # n_estimators becomes the budget: one candidate per remaining setting
+        unique: dict[tuple, dict[str, Any]] = {}
+        for params in candidates:
+            rest = {k: v for k, v in params.items() if k != "n_estimators"}
+            unique.setdefault(tuple(sorted(rest.items(), key=lambda kv: kv[0])), rest)
+        candidates = list(unique.values())
+        if budgets is None:
+            budgets = (
+                rounds if len(rounds) > 1 else halving_budgets(len(candidates), rounds[0], 1, eta)
+            )
+    elif budgets is None:
+        budgets = halving_budgets(
+            len(candidates), evaluator.n_train, min(min_samples, evaluator.n_train), eta
+        )
+    budgets = [int(b) for b in budgets]
+
+    result = HalvingResult(best_params={}, best_score=-np.inf, rungs=budgets)
+    alive = list(range(len(candidates)))
+    states: dict[int, Any] = {}
+    for rung, budget in enumerate(budgets):
+        last = rung == len(budgets) - 1
+        tasks = [
+            (
+                factory,
+                candidates[i],
+                resource,
+                budget,
+                states.get(i) if resource != "samples" else None,
+            )
+            for i in alive
+        ]
+        outcomes = evaluator.map(tasks)
+        scores = []
+        for i, (metrics, model) in zip(alive, outcomes, strict=True):
+            score = metrics["r2"]
+            params = dict(candidates[i])
+            if resource == "n_estimators":
+                params["n_estimators"] = budget
+                states[i] = (model, budget)
+            result.history.append(
+                {
+                    "params": params,
+                    "budget": budget,
+                    "rung": rung,
+                    "score": score,
+                    "seconds": metrics["seconds"],
+                }
+            )
+            result.fit_seconds += metrics["seconds"]
+            scores.append(score)
+            # Boosting rounds are real configurations at every rung; data
+            # subsets only count at the full budget
+            if (resource == "n_estimators" or last) and score > result.best_score:
+                result.best_score, result.best_params = score, params
+        if last:
+            break
+        keep = max(1, math.ceil(len(alive) / eta))
+        ranked = np.argsort(scores, kind="stable")[::-1][:keep]
+        survivors = [alive[j] for j in sorted(ranked)]
+        for i in alive:
+            if i not in survivors:
+                states.pop(i, None)
+        alive = survivors
+
+    if not result.best_params:
+        result.best_params = dict(candidates[alive[0]])
+    return result
+
+
+def fit_candidates(
+    candidates: list[tuple[EstimatorFactory, dict[str, Any]]], evaluator: Evaluator
+) -> list[dict[str, Any]]:
+    """
+    Fit (factory, params) pairs on the full training set, in parallel.
+
+    Returns:
+        Validation metrics per candidate: r2, mse, mae, seconds (plus
+        "error", with r2=-inf, for a candidate that failed)
+    """
+    tasks = [
+        (factory, params, "samples", evaluator.n_train, None) for factory, params in candidates
+    ]
+    return [metrics for metrics, _ in evaluator.map(tasks)]
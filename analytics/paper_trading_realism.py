@@ -380,6 +380,133 @@ class PaperTradingRealism:
             "timestamp": datetime.now(UTC).isoformat(),
         }
 
+    def apply_realism_batch(
+        self,
+        symbols,
+        sides,
+        quantities,
+        target_prices,
+        volatility=0.02,
+        submit_times=None,
+        seed: int | None = None,
+    ) -> dict[str, Any]:
+        """
+        Apply all realism simulations to a batch of orders at once.
+
+        Same models as apply_realism(), with every random component drawn in
+        one pass from a seeded generator. Latency is never slept: fills are
+        stamped at submit time plus simulated latency.
+
+        Args:
+            symbols: Symbol per order
+            sides: "buy"/"sell" (or +1/-1) per order
+            quantities: Order quantities
+            target_prices: Target (mid) prices
+            volatility: Volatility, scalar or per order
+            submit_times: Submit timestamps in seconds (default: all now)
+            seed: Seed for the random generator
+
+        Returns:
+            Dictionary of per-order arrays: executed, rejected, filled_quantity,
+            execution_price, target_price, slippage, market_impact, latency,
+            fill_time, bid, ask, spread_bps (plus symbols)
+        """
+        if not HAS_NUMPY:
+            raise ImportError("numpy is required for apply_realism_batch")
+
+        config = self.config
+        rng = np.random.default_rng(seed)
+        quantity = np.asarray(quantities, dtype=float)
+        price = np.asarray(target_prices, dtype=float)
+        n = quantity.size
+        sides = np.asarray(sides)
+        if sides.dtype.kind in "US":
+            sign = np.where(np.char.lower(sides.astype(str)) == "buy", 1.0, -1.0)
+        else:
+            sign = np.where(sides.astype(float) >= 0, 1.0, -1.0)
+        volatility = np.broadcast_to(np.asarray(volatility, dtype=float), (n,))
+        if submit_times is None:
+            submit_times = np.full(n, time.time())
+        submit_times = np.asarray(submit_times, dtype=float)
+
+        # Latency
+        if config.get("latency_enabled", True):
+            latency_ms = config.get("latency_ms", 50) + rng.normal(
+                0, config.get("latency_jitter_ms", 20), n
+            )
+            latency = np.clip(latency_ms, 10, 200) / 1000.0
+        else:
+            latency = np.zeros(n)
+
+        # Fill, partial fill, rejection
+        filled = quantity.copy()
+        rejected = np.zeros(n, dtype=bool)
+        if config.get("fill_simulation_enabled", True):
+            rejected = rng.random(n) > config.get("fill_probability", 0.95)
+            if config.get("partial_fill_enabled", True):
+                partial = rng.random(n) < config.get("partial_fill_probability", 0.1)
+                filled = np.where(partial, quantity * (0.5 + rng.random(n) * 0.4), quantity)
+            filled[rejected] = 0.0
+        executed = ~rejected
+
+        # Market impact, tiered by filled order value
+        if config.get("market_impact_enabled", True):
+            impact_bps = np.select(
+                [filled * price < 1000, filled * price < 10000], [0.5, 2.0], default=5.0
+            )
+            impact_bps = impact_bps + rng.normal(0, 1, n) * impact_bps * 0.3
+            market_impact = sign * price * impact_bps / 10000.0
+        else:
+            market_impact = np.zeros(n)
+        price_with_impact = price + market_impact
+
+        # Slippage
+        if config.get("slippage_enabled", True):
+            model = config.get("slippage_model", "adaptive")
+            base_slippage_bps = config.get("base_slippage_bps", 5)
+            if model == "adaptive":
+                slippage_bps = base_slippage_bps + volatility * 100 + np.minimum(10, filled * 0.001)
+            elif model == "volume_based":
+                size_multiplier = np.minimum(
+                    3.0, 1.0 + (filled * price_with_impact / 10000.0) * 0.1
+                )
+                slippage_bps = base_slippage_bps * size_multiplier
+            else:
+                slippage_bps = np.full(n, float(base_slippage_bps))
+            slippage_bps = slippage_bps + rng.normal(0, 1, n) * slippage_bps * 0.3
+            slippage_bps = np.clip(slippage_bps, 0, 50)
+        else:
+            slippage_bps = np.zeros(n)
+        execution_price = price_with_impact * (1 + sign * slippage_bps / 10000.0)
+
+        # Spread around the execution price
+        if config.get("spread_simulation_enabled", True):
+            spread_bps = config.get("base_spread_bps", 2) * 1.5
+            spread_bps = np.clip(spread_bps + rng.normal(0, spread_bps * 0.2, n), 1, 20)
+        else:
+            spread_bps = np.zeros(n)
+        half_spread = spread_bps / 20000.0
+
+        # Rejected orders keep the target price, as in apply_realism()
+        execution_price = np.where(executed, execution_price, price)
+        market_impact = np.where(executed, market_impact, 0.0)
+
+        return {
+            "symbols": np.asarray(symbols),
+            "executed": executed,
+            "rejected": rejected,
+            "filled_quantity": filled,
+            "execution_price": execution_price,
+            "target_price": price,
+            "slippage": execution_price - price,
+            "market_impact": market_impact,
+            "latency": latency,
+            "fill_time": submit_times + latency,
+            "bid": execution_price * (1 - half_spread),
+            "ask": execution_price * (1 + half_spread),
+            "spread_bps": spread_bps,
+        }
+
 
 def main():
     """Main paper trading realism loop."""
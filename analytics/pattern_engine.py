@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+NeoLight Pattern Engine - Vectorized Candlestick and Chart Patterns
+===================================================================
+Detects candlestick and chart patterns on (symbols x bars) OHLC arrays with
+whole-array comparisons instead of per-bar Python loops.
+
+- Candlesticks: hammer, doji, engulfing, harami, three soldiers/crows and
+  morning/evening star masks from shifted OHLC arrays
+- Chart patterns: swing highs/lows found by comparing each bar against
+  rolling maxima/minima on both sides; the last pivots inside each bar's
+  window are gathered with a running argmax of pivot indices, giving double
+  tops/bottoms and (inverse) head-and-shoulders. Triangles and flags come
+  from rolling extremes and volatility of the window's first and last thirds
+- Every output is a full (symbols x bars) array, so a backtest gets the
+  pattern history and a live scan reads the last column
+
+PatternEngine caches results by the last processed bar: when the same
+universe is scanned again with bars appended, only the new bars (plus one
+window of context) are evaluated.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+CHART_WINDOW = 50  # Bars of history each chart-pattern decision looks at
+DOUBLE_TOLERANCE = 0.02  # Double top/bottom: pivots within 2%
+SHOULDER_TOLERANCE = 0.05  # Head and shoulders: shoulders within 5%
+FLAT_SLOPE = 0.0002  # Trendline slope (fraction of price per bar) treated as flat
+
+# name: (direction, confidence), in reporting order
+CANDLESTICK_PATTERNS = {
+    "Hammer": ("bullish", 0.4),
+    "Doji": ("neutral", 0.2),
+    "Bullish Engulfing": ("bullish", 0.5),
+    "Bearish Engulfing": ("bearish", 0.5),
+    "Three White Soldiers": ("bullish", 0.6),
+    "Three Black Crows": ("bearish", 0.6),
+    "Morning Star": ("bullish", 0.7),
+    "Evening Star": ("bearish", 0.7),
+    "Bullish Harami": ("bullish", 0.3),
+    "Bearish Harami": ("bearish", 0.3),
+}
+
+CHART_PATTERNS = {
+    "Head and Shoulders": ("bearish", 0.6),
+    "Inverse Head and Shoulders": ("bullish", 0.6),
+    "Double Top": ("bearish", 0.5),
+    "Double Bottom": ("bullish", 0.5),
+    "Symmetrical Triangle": ("neutral", 0.4),
+    "Ascending Triangle": ("bullish", 0.5),
+    "Descending Triangle": ("bearish", 0.5),
+    "Bull Flag": ("bullish", 0.4),
+    "Bear Flag": ("bearish", 0.4),
+}
+
+TRENDS = {1: "UPTREND", -1: "DOWNTREND", 0: "SIDEWAYS"}
+
+
+def _2d(values: Any) -> np.ndarray:
+    return np.atleast_2d(np.asarray(values, dtype=float))
+
+
+def _lag(x: np.ndarray, k: int) -> np.ndarray:
+    """Value k bars earlier (NaN where there is none)."""
+    out = np.full(x.shape, np.nan)
+    if k < x.shape[-1]:
+        out[..., k:] = x[..., : x.shape[-1] - k]
+    return out
+
+
+def _lead(x: np.ndarray, k: int) -> np.ndarray:
+    """Value k bars later (NaN where there is none)."""
+    out = np.full(x.shape, np.nan)
+    if k < x.shape[-1]:
+        out[..., : x.shape[-1] - k] = x[..., k:]
+    return out
+
+
+def _rolling(x: np.ndarray, window: int, fn) -> np.ndarray:
+    """fn over bars [t - window + 1, t]; NaN until a full window exists."""
+    out = np.full(x.shape, np.nan)
+    if 0 < window <= x.shape[-1]:
+        out[..., window - 1 :] = fn(sliding_window_view(x, window, axis=-1), axis=-1)
+    return out
+
+
+def _last_index(mask: np.ndarray) -> np.ndarray:
+    """Index of the last True at or before each bar (-1 if none)."""
+    bars = np.arange(mask.shape[-1])
+    return np.maximum.accumulate(np.where(mask, bars, -1), axis=-1)
+
+
+def _previous(last: np.ndarray, index: np.ndarray) -> np.ndarray:
+    """Last marked index strictly before `index` (-1 if none)."""
+    before = np.take_along_axis(last, np.clip(index - 1, 0, None), axis=-1)
+    return np.where(index > 0, before, -1)
+
+
+def candlestick_masks(
+    open_: Any, high: Any, low: Any, close: Any, has_ohlc: bool = True
+) -> dict[str, np.ndarray]:
+    """
+    Candlestick pattern masks, one bool per (symbol, bar).
+
+    Args:
+        open_, high, low, close: Arrays shaped (symbols, bars) or (bars,)
+        has_ohlc: False when OHLC was estimated from closes; star patterns,
+            which depend on real opens, are then not reported
+
+    Returns:
+        Pattern name -> bool array (symbols, bars); a pattern needs the two
+        preceding bars, so the first two bars are always False
+    """
+    o, h, lo, c = _2d(open_), _2d(high), _2d(low), _2d(close)
+    o1, c1, o2, c2 = _lag(o, 1), _lag(c, 1), _lag(o, 2), _lag(c, 2)
+
+    body = np.abs(c - o)
+    lower_shadow = np.minimum(o, c) - lo
+    upper_shadow = h - np.maximum(o, c)
+    bullish, bearish = c > o, c < o
+    prev_bullish, prev_bearish = c1 > o1, c1 < o1
+
+    masks = {
+        "Hammer": (lower_shadow > body * 2) & (upper_shadow < body * 0.5),
+        "Doji": body < (h - lo) * 0.1,
+        "Bullish Engulfing": prev_bearish & bullish & (o < c1) & (c > o1),
+        "Bearish Engulfing": prev_bullish & bearish & (o > c1) & (c < o1),
+        "Three White Soldiers": (c2 < c1) & (c1 < c) & (o1 > c2) & (o > c1),
+        "Three Black Crows": (c2 > c1) & (c1 > c) & (o1 < c2) & (o < c1),
+        "Morning Star": (c2 < o2) & (c1 < c2) & (c > (o2 + c2) / 2),
+        "Evening Star": (c2 > o2) & (c1 > c2) & (c < (o2 + c2) / 2),
+        "Bullish Harami": prev_bearish & bullish & (o > c1) & (c < o1),
+        "Bearish Harami": prev_bullish & bearish & (o < c1) & (c > o1),
+    }
+    if not has_ohlc:
+        masks["Morning Star"] = masks["Evening Star"] = np.zeros(c.shape, dtype=bool)
+    for mask in masks.values():
+        mask[..., :2] = False
+    return masks
+
+
+def swing_points(values: Any, order: int = 1) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Swing highs and lows: bars strictly above (below) the `order` bars on
+    each side. A swing point is only known `order` bars after it forms.
+
+    Returns:
+        (highs, lows) bool arrays shaped like `values` (2-D)
+    """
+    x = _2d(values)
+    left_max = _lag(_rolling(x, order, np.max), 1)
+    left_min = _lag(_rolling(x, order, np.min), 1)
+    right_max = _lead(_rolling(x, order, np.max), order)
+    right_min = _lead(_rolling(x, order, np.min), order)
+    return (x > left_max) & (x > right_max), (x < left_min) & (x < right_min)
+
+
+def chart_masks(
+    close: Any, window: int = CHART_WINDOW, pivot_order: int = 1
+) -> dict[str, np.ndarray]:
+    """
+    Chart pattern masks and context for every (symbol, bar), each bar
+    judged on the `window` closes ending at it.
+
+    Args:
+        close: Closes shaped (symbols, bars) or (bars,)
+        window: Bars of history per decision
+        pivot_order: Bars on each side a swing point must exceed
+
+    Returns:
+        Pattern name -> bool array, plus "trend" (int8: 1 up, -1 down,
+        0 sideways), "support" and "resistance" (rolling window min/max)
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _chart_masks(_2d(close), window, pivot_order)
+
+
+def _chart_masks(x: np.ndarray, window: int, pivot_order: int) -> dict[str, np.ndarray]:
+    bars = np.arange(x.shape[-1])
+    ready = bars >= window - 1
+    start = bars - window + 1  # First bar of each window
+
+    half, third = window // 2, max(window // 3, 2)
+    first_mean = _lag(_rolling(x, half, np.mean), window - half)
+    second_mean = _rolling(x, window - half, np.mean)
+    trend = np.where(
+        second_mean > first_mean * 1.02, 1, np.where(second_mean < first_mean * 0.98, -1, 0)
+    ).astype(np.int8)
+    trend[..., ~ready] = 0
+
+    masks: dict[str, np.ndarray] = {}
+    highs, lows = swing_points(x, pivot_order)
+    for kind, pivots in (("top", highs), ("bottom", lows)):
+        last = _last_index(pivots)
+        # Pivots need `pivot_order` confirming bars inside the window
+        p1 = last[:, np.clip(bars - pivot_order, 0, None)]
+        p2 = _previous(last, p1)
+        p3 = _previous(last, p2)
+        first = start + pivot_order
+        v1, v2, v3 = (np.take_along_axis(x, np.clip(p, 0, None), axis=-1) for p in (p1, p2, p3))
+        two = ready & (p2 >= first)
+        three = ready & (p3 >= first)
+        double = two & (np.abs(v2 - v1) / v2 < DOUBLE_TOLERANCE)
+        shoulders = three & (np.abs(v3 - v1) / v3 < SHOULDER_TOLERANCE)
+        if kind == "top":
+            masks["Head and Shoulders"] = shoulders & (v2 > v1) & (v2 > v3)
+            masks["Double Top"] = double
+        else:
+            masks["Inverse Head and Shoulders"] = shoulders & (v2 < v1) & (v2 < v3)
+            masks["Double Bottom"] = double
+
+    # Triangles: volatility compresses while the thirds' highs/lows converge
+    early_std = _lag(_rolling(x, third, np.std), window - third)
+    late_std = _rolling(x, third, np.std)
+    high_slope = (_rolling(x, third, np.max) - _lag(_rolling(x, third, np.max), window - third)) / (
+        window * x
+    )
+    low_slope = (_rolling(x, third, np.min) - _lag(_rolling(x, third, np.min), window - third)) / (
+        window * x
+    )
+    compressed = ready & (late_std < early_std * 0.7)
+    flat_high, flat_low = np.abs(high_slope) < FLAT_SLOPE, np.abs(low_slope) < FLAT_SLOPE
+    falling_high, rising_low = high_slope <= -FLAT_SLOPE, low_slope >= FLAT_SLOPE
+    masks["Symmetrical Triangle"] = compressed & falling_high & rising_low
+    masks["Ascending Triangle"] = compressed & flat_high & rising_low
+    masks["Descending Triangle"] = compressed & falling_high & flat_low
+
+    # Flags: a sharp move at the window start, consolidation at its end
+    early_range = _lag(_rolling(x, 5, np.ptp), window - 5)
+    late_range = _rolling(x, 5, np.ptp)
+    consolidating = ready & (early_range > late_range * 2)
+    masks["Bull Flag"] = consolidating & (trend == 1)
+    masks["Bear Flag"] = consolidating & (trend == -1)
+
+    masks["trend"] = trend
+    masks["support"] = _rolling(x, window, np.min)
+    masks["resistance"] = _rolling(x, window, np.max)
+    return masks
+
+
+def _found(masks: Mapping[str, np.ndarray], names: Mapping, row: int, bar: int) -> list[str]:
+    return [name for name in names if masks[name][row, bar]]
+
+
+def _vote(patterns: list[str], names: Mapping[str, tuple[str, float]]) -> tuple[str, float]:
+    directions = {names[p][0] for p in patterns}
+    signal = "BUY" if "bullish" in directions else "SELL" if "bearish" in directions else "HOLD"
+    return signal, sum(names[p][1] for p in patterns)
+
+
+def candlestick_summary(masks: Mapping[str, np.ndarray], row: int = 0, bar: int = -1) -> dict:
+    """Candlestick patterns at one (symbol, bar) with their combined signal."""
+    patterns = _found(masks, CANDLESTICK_PATTERNS, row, bar)
+    signal, confidence = _vote(patterns, CANDLESTICK_PATTERNS)
+    return {
+        "pattern": patterns[0] if patterns else None,
+        "patterns": patterns,
+        "signal": signal,
+        "confidence": min(confidence, 1.0),
+        "pattern_count": len(patterns),
+    }
+
+
+def chart_summary(
+    masks: Mapping[str, np.ndarray], close: Any, row: int = 0, bar: int = -1
+) -> dict[str, Any]:
+    """Chart patterns at one (symbol, bar); without a pattern, price near
+    support in an uptrend (resistance in a downtrend) still signals."""
+    patterns = _found(masks, CHART_PATTERNS, row, bar)
+    signal, confidence = _vote(patterns, CHART_PATTERNS)
+    trend = TRENDS[int(masks["trend"][row, bar])]
+    support = float(masks["support"][row, bar])
+    resistance = float(masks["resistance"][row, bar])
+    current = float(_2d(close)[row, bar])
+    if signal == "HOLD":
+        if trend == "UPTREND" and current < support * 1.05:
+            signal, confidence = "BUY", confidence + 0.3
+        elif trend == "DOWNTREND" and current > resistance * 0.95:
+            signal, confidence = "SELL", confidence + 0.3
+    return {
+        "pattern": patterns[0] if patterns else trend,
+        "patterns": patterns + [trend] if trend != "SIDEWAYS" else patterns,
+        "signal": signal,
+        "confidence": min(confidence, 1.0),
+        "support": support,
+        "resistance": resistance,
+        "trend": trend,
+    }
+
+
+class PatternEngine:
+    """
+    Pattern scans over a universe, cached by the last processed bar.
+
+    Scanning the same symbols again after bars were appended evaluates only
+    the new bars (with one window of context); a changed universe or
+    rewritten history triggers a full scan.
+    """
+
+    def __init__(self, window: int = CHART_WINDOW, pivot_order: int = 1, has_ohlc: bool = True):
+        """
+        Initialize the engine.
+
+        Args:
+            window: Bars of history per chart-pattern decision
+            pivot_order: Bars on each side a swing point must exceed
+            has_ohlc: Whether opens/highs/lows are real (see candlestick_masks)
+        """
+        self.window = window
+        self.pivot_order = pivot_order
+        self.has_ohlc = has_ohlc
+        self.bars_evaluated = 0  # Symbol-bars computed, for monitoring
+        self._key: tuple | None = None
+        self._bars = 0
+        self._last_bar: np.ndarray | None = None
+        self._result: dict[str, np.ndarray] = {}
+
+    def _evaluate(self, o, h, lo, c) -> dict[str, np.ndarray]:
+        self.bars_evaluated += c.size
+        result = candlestick_masks(o, h, lo, c, self.has_ohlc)
+        result.update(chart_masks(c, self.window, self.pivot_order))
+        return result
+
+    def scan(
+        self,
+        open_: Any,
+        high: Any,
+        low: Any,
+        close: Any,
+        symbols: Sequence[str] | None = None,
+    ) -> dict[str, np.ndarray]:
+        """
+        Pattern masks for every (symbol, bar).
+
+        Args:
+            open_, high, low, close: Arrays shaped (symbols, bars); symbols
+                with shorter history are NaN-padded at the front
+            symbols: Symbol names identifying the universe between scans
+
+        Returns:
+            Output of candlestick_masks() merged with chart_masks()
+        """
+        arrays = [_2d(a) for a in (open_, high, low, close)]
+        n_bars = arrays[3].shape[-1]
+        key = tuple(symbols) if symbols is not None else (arrays[3].shape[0],)
+        done = self._bars
+        resume = (
+            key == self._key
+            and 0 < done <= n_bars
+            and np.array_equal(
+                np.stack([a[:, done - 1] for a in arrays]), self._last_bar, equal_nan=True
+            )
+        )
+        if resume and done == n_bars:
+            return self._result
+        if resume:
+            begin = max(0, done - max(self.window, 3) + 1)
+            tail = self._evaluate(*(a[:, begin:] for a in arrays))
+            result = {
+                name: np.concatenate([self._result[name], values[:, done - begin :]], axis=-1)
+                for name, values in tail.items()
+            }
+        else:
+            result = self._evaluate(*arrays)
+
+        self._key, self._bars, self._result = key, n_bars, result
+        self._last_bar = np.stack([a[:, -1] for a in arrays])
+        return result
+
+    def scan_frames(self, frames: Mapping[str, Any]) -> dict[str, dict[str, Any]]:
+        """
+        Latest candlestick and chart summaries per symbol.
+
+        Args:
+            frames: Symbol -> DataFrame with Open/High/Low/Close columns;
+                histories are right-aligned so each symbol's last bar is the
+                last column
+
+        Returns:
+            Symbol -> {"candlestick": ..., "chart": ...}
+        """
+        symbols = list(frames)
+        n_bars = max((len(frame) for frame in frames.values()), default=0)
+        stacked = np.full((4, len(symbols), n_bars), np.nan)
+        for row, symbol in enumerate(symbols):
+            frame = frames[symbol]
+            for i, column in enumerate(("Open", "High", "Low", "Close")):
+                values = np.asarray(frame[column], dtype=float)
+                stacked[i, row, n_bars - len(values) :] = values
+        result = self.scan(*stacked, symbols=symbols)
+        return {
+            symbol: {
+                "candlestick": candlestick_summary(result, row),
+                "chart": chart_summary(result, stacked[3], row),
+            }
+            for row, symbol in enumerate(symbols)
+        }
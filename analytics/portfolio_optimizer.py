@@ -6,6 +6,8 @@ World-class portfolio optimization using Modern Portfolio Theory:
 - Sharpe Ratio Optimization (efficient frontier)
 - Risk Parity Allocation
 - Minimum Variance Portfolio
+- Mean-CVaR (Rockafellar-Uryasev LP over return scenarios)
+- Box, group and turnover constraints with warm starts from previous weights
 - Dynamic rebalancing with Capital Governor integration
 - Normalized risk metrics (percent-of-equity based)
 """
@@ -26,6 +28,27 @@ except ImportError:
     HAS_NUMPY = False
     print("⚠️  Install numpy and pandas: pip install numpy pandas")
 
+try:
+    from analytics.portfolio_solvers import (
+        HAS_SCIPY,
+        PortfolioConstraints,
+        QPResult,
+        max_sharpe_weights,
+        mean_cvar_weights,
+        mean_variance_weights,
+    )
+
+    HAS_SOLVERS = HAS_SCIPY
+except ImportError:
+    HAS_SOLVERS = False
+
+try:
+    from utils.state_bus import get_state_bus
+
+    HAS_STATE_BUS = True
+except ImportError:
+    HAS_STATE_BUS = False
+
 # Setup paths
 ROOT = Path(os.path.expanduser("~/neolight"))
 STATE = ROOT / "state"
@@ -54,6 +77,18 @@ if not logger.handlers:
     console_handler.setFormatter(logging.Formatter("%(levelname)s - %(message)s"))
     logger.addHandler(console_handler)
 
+# Last QP solution per (problem, universe) for warm starts across optimizer instances
+_WARM_STARTS: dict[tuple, "QPResult"] = {}
+
+
+def load_previous_weights() -> dict[str, float]:
+    """Previous allocation weights from state/allocations.json (empty if none)."""
+    try:
+        data = json.loads((STATE / "allocations.json").read_text())
+        return {str(k): float(v) for k, v in data.get("weights", {}).items()}
+    except (OSError, ValueError, AttributeError, TypeError):
+        return {}
+
 
 class PortfolioOptimizer:
     """
@@ -61,13 +96,21 @@ class PortfolioOptimizer:
     All calculations use percent-of-equity normalization for scalability.
     """
 
-    def __init__(self, returns_df: pd.DataFrame, risk_free_rate: float = 0.02):
+    def __init__(
+        self,
+        returns_df: pd.DataFrame,
+        risk_free_rate: float = 0.02,
+        constraints: "PortfolioConstraints | None" = None,
+    ):
         """
         Initialize portfolio optimizer.
 
         Args:
-            returns_df: DataFrame with asset returns (columns = symbols, rows = time)
+            returns_df: DataFrame with asset prices (columns = symbols, rows = time);
+                returns are taken with pct_change
             risk_free_rate: Annual risk-free rate (default 2%)
+            constraints: Box/group/turnover constraints (default long-only, fully
+                invested, warm-started from the saved allocations)
         """
         if not HAS_NUMPY:
             raise ImportError("numpy and pandas required for portfolio optimization")
@@ -75,7 +118,12 @@ class PortfolioOptimizer:
         self.returns_df = returns_df
         self.risk_free_rate = risk_free_rate
         self.cov_matrix = self.calculate_covariance_matrix()
-        self.mean_returns = self.returns_df.mean() * 252  # Annualized
+        self.mean_returns = self.returns_df.pct_change().dropna().mean() * 252  # Annualized
+        if constraints is None and HAS_SOLVERS:
+            constraints = PortfolioConstraints.from_symbols(
+                list(returns_df.columns), previous_weights=load_previous_weights()
+            )
+        self.constraints = constraints
         logger.info(f"✅ PortfolioOptimizer initialized for {len(returns_df.columns)} assets")
 
     def calculate_covariance_matrix(self) -> pd.DataFrame:
@@ -126,7 +174,17 @@ class PortfolioOptimizer:
             # Check if all excess returns are negative (bad market conditions)
             if np.all(excess_returns <= 0):
                 logger.warning("⚠️  All excess returns negative, using minimum variance")
-                return self.optimize_min_variance()
+                return self.minimum_variance_weights()
+
+            if HAS_SOLVERS:
+                if target_return is None:
+                    weights = self._solve_qp("max_sharpe")
+                else:
+                    weights = self._solve_qp("mean_variance", target_return=target_return)
+                if weights is None:
+                    logger.warning("⚠️  Constrained Sharpe optimization failed, using risk parity")
+                    return self.risk_parity_weights()
+                return self._report_sharpe(weights, mean_returns, cov_matrix)
 
             numerator = inv_cov.dot(excess_returns)
             denominator = np.ones(n).dot(inv_cov).dot(excess_returns)
@@ -150,6 +208,18 @@ class PortfolioOptimizer:
 
             weights /= np.sum(weights)  # Normalize
 
+            return self._report_sharpe(weights, mean_returns, cov_matrix)
+
+        except Exception as e:
+            logger.error(f"❌ Error in efficient frontier optimization: {e}")
+            traceback.print_exc()
+            return self.risk_parity_weights()  # Fallback
+
+    def _report_sharpe(
+        self, weights: np.ndarray, mean_returns: np.ndarray, cov_matrix: np.ndarray
+    ) -> dict[str, float]:
+        """Log Sharpe metrics for weights and return them as a dict."""
+        try:
             # Convert to dictionary
             optimal_weights = dict(zip(self.returns_df.columns, weights))
 
@@ -165,7 +235,7 @@ class PortfolioOptimizer:
                 logger.warning(
                     f"⚠️  Negative Sharpe ({sharpe:.3f}) detected, switching to minimum variance"
                 )
-                return self.optimize_min_variance()
+                return self.minimum_variance_weights()
 
             logger.info(
                 f"📈 Optimal Sharpe: {sharpe:.3f} | Return: {portfolio_return:.2%} | Vol: {portfolio_vol:.2%}"
@@ -227,20 +297,26 @@ class PortfolioOptimizer:
             cov_matrix = self.cov_matrix.values
             n = len(cov_matrix)
 
-            # Min variance: w = (C^-1 * 1) / (1^T * C^-1 * 1)
-            inv_cov = np.linalg.pinv(cov_matrix)
-            ones = np.ones(n)
+            if HAS_SOLVERS:
+                weights = self._solve_qp("min_variance")
+                if weights is None:
+                    logger.warning("⚠️  Constrained min variance failed, using risk parity")
+                    return self.risk_parity_weights()
+            else:
+                # Min variance: w = (C^-1 * 1) / (1^T * C^-1 * 1)
+                inv_cov = np.linalg.pinv(cov_matrix)
+                ones = np.ones(n)
 
-            numerator = inv_cov.dot(ones)
-            denominator = ones.dot(inv_cov).dot(ones)
+                numerator = inv_cov.dot(ones)
+                denominator = ones.dot(inv_cov).dot(ones)
 
-            if abs(denominator) < 1e-10:
-                logger.warning("⚠️  Min variance unstable, using risk parity")
-                return self.risk_parity_weights()
+                if abs(denominator) < 1e-10:
+                    logger.warning("⚠️  Min variance unstable, using risk parity")
+                    return self.risk_parity_weights()
 
-            weights = numerator / denominator
-            weights = np.clip(weights, 0, 1)  # No short selling
-            weights /= np.sum(weights)  # Normalize
+                weights = numerator / denominator
+                weights = np.clip(weights, 0, 1)  # No short selling
+                weights /= np.sum(weights)  # Normalize
 
             optimal_weights = dict(zip(self.returns_df.columns, weights))
 
@@ -255,16 +331,67 @@ class PortfolioOptimizer:
             traceback.print_exc()
             return {}
 
+    def _solve_qp(self, kind: str, target_return: float | None = None) -> np.ndarray | None:
+        """
+        Solve a constrained mean-variance problem, warm-started from the last solve.
+
+        Args:
+            kind: "min_variance", "mean_variance" (with target_return) or "max_sharpe"
+            target_return: Annualized return floor for "mean_variance"
+
+        Returns:
+            Weights in column order, or None if the solver did not converge
+        """
+        cov_matrix = self.cov_matrix.values
+        mean_returns = self.mean_returns.values
+        key = (kind, tuple(self.returns_df.columns))
+        warm_start = _WARM_STARTS.get(key)
+
+        if kind == "max_sharpe":
+            result = max_sharpe_weights(
+                cov_matrix,
+                mean_returns,
+                self.risk_free_rate,
+                constraints=self.constraints,
+                warm_start=warm_start,
+            )
+            kappa = result.x[-1]
+            weights = result.x[: len(cov_matrix)] / kappa if kappa > 1e-12 else None
+        else:
+            result = mean_variance_weights(
+                cov_matrix,
+                mean_returns,
+                target_return=target_return,
+                constraints=self.constraints,
+                warm_start=warm_start,
+            )
+            weights = result.x[: len(cov_matrix)]
+
+        if not result.converged or weights is None or not np.all(np.isfinite(weights)):
+            logger.warning(f"⚠️  {kind} QP did not converge ({result.iterations} iterations)")
+            return None
+
+        _WARM_STARTS[key] = result
+        logger.debug(f"🔧 {kind} QP converged in {result.iterations} iterations")
+        weights = np.clip(weights, 0, None)
+        return weights / weights.sum()
+
     def optimize_mean_cvar(
-        self, confidence_level: float = 0.95, target_return: float | None = None
+        self,
+        confidence_level: float = 0.95,
+        target_return: float | None = None,
+        scenarios: np.ndarray | None = None,
     ) -> dict[str, float]:
         """
         Optimize portfolio for Mean-CVaR (Conditional Value at Risk).
-        Focuses on tail risk instead of variance.
+        Minimizes the expected loss beyond VaR with the Rockafellar-Uryasev
+        linear program over historical (or supplied simulated) return scenarios.
 
         Args:
             confidence_level: CVaR confidence level (0.95 = 95%)
-            target_return: Optional target return constraint
+            target_return: Optional annualized target return constraint
+            scenarios: Optional simulated per-period returns (S x assets);
+                defaults to historical returns
 
         Returns:
             Optimal weights
@@ -273,67 +400,29 @@ class PortfolioOptimizer:
             logger.warning("⚠️  Cannot compute Mean-CVaR: no covariance data")
             return {}
 
-        try:
-            from ai.risk_enhancements import AdvancedRiskManager
-
-            # Get returns
-            returns = self.returns_df.pct_change().dropna()
-            if len(returns) < 30:
-                logger.warning("⚠️  Insufficient data for Mean-CVaR, using Sharpe optimization")
-                return self.optimize_efficient_frontier()
+        if not HAS_SOLVERS:
+            logger.warning("⚠️  scipy not available for Mean-CVaR, using Sharpe optimization")
+            return self.optimize_efficient_frontier()
 
-            # Calculate portfolio returns for different weights
-            # Simplified: use variance as proxy for CVaR (full CVaR optimization requires more computation)
-            mean_returns = self.mean_returns.values
-            cov_matrix = self.cov_matrix.values
-            n = len(mean_returns)
-
-            # For Mean-CVaR, we want to minimize CVaR subject to return constraint
-            # Simplified approach: use inverse volatility weighting with return constraint
-
-            if target_return is not None:
-                # Optimize for target return with minimum CVaR
-                # Use Sharpe-like optimization but with CVaR penalty
-                inv_cov = np.linalg.pinv(cov_matrix)
-                excess_returns = mean_returns - self.risk_free_rate
-
-                # Add CVaR penalty (simplified: use volatility as proxy)
-                numerator = inv_cov.dot(excess_returns)
-                denominator = np.ones(n).dot(inv_cov).dot(excess_returns)
-
-                if abs(denominator) > 1e-10:
-                    weights = numerator / denominator
-                    weights = np.clip(weights, 0, 1)
-                    weights /= np.sum(weights)
-
-                    # Calculate actual return
-                    actual_return = np.dot(weights, mean_returns)
-                    if actual_return < target_return:
-                        # Scale up riskier assets to meet return target
-                        risk_adjusted = excess_returns / np.sqrt(np.diag(cov_matrix))
-                        risk_adjusted = np.maximum(risk_adjusted, 0)
-                        weights = (
-                            risk_adjusted / np.sum(risk_adjusted)
-                            if np.sum(risk_adjusted) > 0
-                            else weights
-                        )
-                else:
-                    weights = np.ones(n) / n
-            else:
-                # Minimize CVaR (use inverse volatility)
-                vol = np.sqrt(np.diag(cov_matrix))
-                vol = np.maximum(vol, 1e-6)
-                inv_vol = 1.0 / vol
-                weights = inv_vol / np.sum(inv_vol)
-
-            optimal_weights = dict(zip(self.returns_df.columns, weights))
+        try:
+            if scenarios is None:
+                scenarios = self.returns_df.pct_change().dropna().values
+                if len(scenarios) < 30:
+                    logger.warning("⚠️  Insufficient data for Mean-CVaR, using Sharpe optimization")
+                    return self.optimize_efficient_frontier()
+
+            weights, cvar = mean_cvar_weights(
+                scenarios,
+                confidence_level=confidence_level,
+                target_return=None if target_return is None else target_return / 252,
+                constraints=self.constraints,
+            )
+            weights = np.clip(weights, 0, None)
+            weights /= weights.sum()
 
-            # Calculate CVaR for portfolio
-            portfolio_returns = returns.dot(weights).values
-            risk_mgr = AdvancedRiskManager(portfolio_returns)
-            cvar = risk_mgr.calculate_cvar(confidence_level)
+            optimal_weights = dict(zip(self.returns_df.columns, weights, strict=True))
 
-            portfolio_return = np.dot(weights, mean_returns)
+            portfolio_return = np.dot(weights, self.mean_returns.values)
             logger.info(
                 f"📊 Mean-CVaR Portfolio: Return {portfolio_return:.2%} | CVaR {cvar:.2%} (confidence: {confidence_level:.0%})"
             )
@@ -406,9 +495,13 @@ class PortfolioOptimizer:
             logger.info(f"💾 Saved allocations: {method} | Sharpe: {sharpe:.3f}")
 
             # Also update runtime/allocations_override.json for SmartTrader
-            runtime_allocations = RUNTIME / "allocations_override.json"
+            # (the state bus exports it; subscribers get the update directly)
             runtime_data = {"allocations": weights_dict, "timestamp": datetime.now(UTC).isoformat()}
-            runtime_allocations.write_text(json.dumps(runtime_data, indent=2))
+            if HAS_STATE_BUS:
+                get_state_bus(ROOT).publish("allocations", runtime_data)
+            else:
+                runtime_allocations = RUNTIME / "allocations_override.json"
+                runtime_allocations.write_text(json.dumps(runtime_data, indent=2))
 
             return True
 
@@ -0,0 +1,525 @@
+#!/usr/bin/env python3
+"""
+NeoLight Portfolio Solvers - Constrained Optimization Backend
+=============================================================
+Local (numpy/scipy only) solvers used by PortfolioOptimizer:
+- Mean-CVaR: Rockafellar-Uryasev linear program over return scenarios (HiGHS),
+  solved by constraint generation for large scenario sets
+- Mean-variance: ADMM quadratic program (OSQP-style splitting) with a cached
+  factorization, warm-startable from the previous day's weights
+
+Constraints supported by both: per-asset box bounds, group caps and a turnover
+limit relative to previous weights.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+
+import numpy as np
+
+try:
+    from scipy import sparse
+    from scipy.linalg import cho_factor, cho_solve
+    from scipy.optimize import linprog
+
+    HAS_SCIPY = True
+except ImportError:
+    HAS_SCIPY = False
+
+logger = logging.getLogger("portfolio_optimizer")
+
+TRADING_DAYS = 252
+
+
+@dataclass
+class PortfolioConstraints:
+    """
+    Linear constraints on long-only, fully invested portfolios.
+
+    Attributes:
+        lower: Minimum weight per asset (scalar or per-asset array)
+        upper: Maximum weight per asset (scalar or per-asset array)
+        groups: {name: (asset indices, max total weight)}
+        previous_weights: Previous day's weights (warm start and turnover anchor)
+        max_turnover: Max sum of |w - previous_weights| (None = unconstrained)
+    """
+
+    lower: float | np.ndarray = 0.0
+    upper: float | np.ndarray = 1.0
+    groups: dict[str, tuple[list[int], float]] = field(default_factory=dict)
+    previous_weights: np.ndarray | None = None
+    max_turnover: float | None = None
+
+    @classmethod
+    def from_symbols(
+        cls,
+        symbols: list[str],
+        lower: float = 0.0,
+        upper: float = 1.0,
+        groups: dict[str, tuple[list[str], float]] | None = None,
+        previous_weights: dict[str, float] | None = None,
+        max_turnover: float | None = None,
+    ) -> PortfolioConstraints:
+        """Build constraints from symbol-keyed groups and previous weights."""
+        index = {sym: i for i, sym in enumerate(symbols)}
+        group_indices = {
+            name: ([index[sym] for sym in members if sym in index], cap)
+            for name, (members, cap) in (groups or {}).items()
+        }
+        previous = None
+        if previous_weights:
+            previous = np.array([previous_weights.get(sym, 0.0) for sym in symbols])
+            total = previous.sum()
+            previous = previous / total if total > 0 else None
+        return cls(
+            lower=lower,
+            upper=upper,
+            groups=group_indices,
+            previous_weights=previous,
+            max_turnover=max_turnover,
+        )
+
+    def bounds(self, n: int) -> tuple[np.ndarray, np.ndarray]:
+        """Per-asset (lower, upper) arrays of length n."""
+        lower = np.broadcast_to(np.asarray(self.lower, dtype=float), (n,)).copy()
+        upper = np.broadcast_to(np.asarray(self.upper, dtype=float), (n,)).copy()
+        return lower, upper
+
+    def uses_turnover(self) -> bool:
+        return self.max_turnover is not None and self.previous_weights is not None
+
+
+@dataclass
+class QPResult:
+    """ADMM solution with duals kept for warm starting the next solve."""
+
+    x: np.ndarray
+    y: np.ndarray
+    iterations: int
+    converged: bool
+
+
+def solve_qp_admm(
+    P: np.ndarray,
+    q: np.ndarray,
+    A: np.ndarray,
+    lower: np.ndarray,
+    upper: np.ndarray,
+    x0: np.ndarray | None = None,
+    y0: np.ndarray | None = None,
+    rho: float = 0.1,
+    sigma: float = 1e-6,
+    alpha: float = 1.6,
+    eps_abs: float = 1e-7,
+    eps_rel: float = 1e-7,
+    max_iter: int = 10000,
+) -> QPResult:
+    """
+    Solve min 0.5 x'Px + q'x  s.t.  lower <= Ax <= upper  by ADMM.
+
+    Equality rows (lower == upper) get a 1000x penalty, as in OSQP. The KKT
+    matrix P + sigma I + A' diag(rho) A is factorized once, so each iteration
+    costs two triangular solves and a matrix-vector product.
+
+    Args:
+        P: Positive semidefinite quadratic term (n x n)
+        q: Linear term (n,)
+        A: Constraint matrix (m x n)
+        lower: Row lower bounds (-inf allowed)
+        upper: Row upper bounds (+inf allowed)
+        x0: Optional primal warm start
+        y0: Optional dual warm start
+
+    Returns:
+        QPResult with primal x and dual y
+    """
+    n = len(q)
+    rho_vec = np.where(lower == upper, 1e3 * rho, rho)
+    rho_vec = np.where(np.isinf(lower) & np.isinf(upper), 1e-6, rho_vec)
+    kkt = cho_factor(P + sigma * np.eye(n) + A.T @ (rho_vec[:, None] * A))
+
+    x = np.zeros(n) if x0 is None else np.asarray(x0, dtype=float).copy()
+    z = np.clip(A @ x, lower, upper)
+    y = np.zeros(len(lower)) if y0 is None else np.asarray(y0, dtype=float).copy()
+
+    converged = False
+    iteration = 0
+    for iteration in range(1, max_iter + 1):
+        x_tilde = cho_solve(kkt, sigma * x - q + A.T @ (rho_vec * z - y))
+        z_tilde = A @ x_tilde
+        x = alpha * x_tilde + (1 - alpha) * x
+        z_relaxed = alpha * z_tilde + (1 - alpha) * z
+        z_new = np.clip(z_relaxed + y / rho_vec, lower, upper)
+        y = y + rho_vec * (z_relaxed - z_new)
+        z = z_new
+
+        if iteration % 10 == 0:
+            Ax = A @ x
+            Px = P @ x
+            Aty = A.T @ y
+            primal = np.max(np.abs(Ax - z))
+            dual = np.max(np.abs(Px + q + Aty))
+            eps_primal = eps_abs + eps_rel * max(np.max(np.abs(Ax)), np.max(np.abs(z)))
+            eps_dual = eps_abs + eps_rel * max(
+                np.max(np.abs(Px)), np.max(np.abs(Aty)), np.max(np.abs(q))
+            )
+            if primal <= eps_primal and dual <= eps_dual:
+                converged = True
+                break
+
+    return QPResult(x=x, y=y, iterations=iteration, converged=converged)
+
+
+def _portfolio_rows(
+    n: int, constraints: PortfolioConstraints, extra: int, budget: bool = True
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Constraint rows over x = [w (n), t (n, turnover only), extra columns].
+
+    Returns (A, lower, upper) covering budget, box, groups and turnover.
+    """
+    turnover = constraints.uses_turnover()
+    width = n + (n if turnover else 0) + extra
+    lo_w, hi_w = constraints.bounds(n)
+    rows, lows, highs = [], [], []
+
+    if budget:
+        row = np.zeros(width)
+        row[:n] = 1.0
+        rows.append(row[None, :])
+        lows.append([1.0])
+        highs.append([1.0])
+
+    box = np.zeros((n, width))
+    box[:, :n] = np.eye(n)
+    rows.append(box)
+    lows.append(lo_w)
+    highs.append(hi_w)
+
+    for indices, cap in constraints.groups.values():
+        row = np.zeros(width)
+        row[list(indices)] = 1.0
+        rows.append(row[None, :])
+        lows.append([-np.inf])
+        highs.append([cap])
+
+    if turnover:
+        previous = np.asarray(constraints.previous_weights, dtype=float)
+        # w - t <= w_prev and w + t >= w_prev, i.e. t >= |w - w_prev|
+        minus = np.zeros((n, width))
+        minus[:, :n] = np.eye(n)
+        minus[:, n : 2 * n] = -np.eye(n)
+        plus = np.zeros((n, width))
+        plus[:, :n] = np.eye(n)
+        plus[:, n : 2 * n] = np.eye(n)
+        total = np.zeros(width)
+        total[n : 2 * n] = 1.0
+        rows += [minus, plus, total[None, :]]
+        lows += [np.full(n, -np.inf), previous, [-np.inf]]
+        highs += [previous, np.full(n, np.inf), [constraints.max_turnover]]
+
+    return np.vstack(rows), np.concatenate(lows), np.concatenate(highs)
+
+
+def mean_variance_weights(
+    cov: np.ndarray,
+    mean: np.ndarray | None = None,
+    risk_aversion: float | None = None,
+    target_return: float | None = None,
+    constraints: PortfolioConstraints | None = None,
+    warm_start: QPResult | None = None,
+) -> QPResult:
+    """
+    Constrained mean-variance portfolio.
+
+    Minimizes w'Cw (minus mean'w / risk_aversion when risk_aversion is set),
+    optionally with mean'w >= target_return.
+
+    Args:
+        cov: Covariance matrix (n x n)
+        mean: Expected returns (n,), required for risk_aversion/target_return
+        risk_aversion: Trade-off for the mean term (None = pure minimum variance)
+        target_return: Minimum expected return
+        constraints: Box, group and turnover constraints
+        warm_start: Previous QPResult, or None to start from previous weights
+
+    Returns:
+        QPResult; weights are x[:n]
+    """
+    constraints = constraints or PortfolioConstraints()
+    n = len(cov)
+    A, lower, upper = _portfolio_rows(n, constraints, extra=0)
+    width = A.shape[1]
+
+    P = np.zeros((width, width))
+    P[:n, :n] = 2.0 * cov
+    q = np.zeros(width)
+    if risk_aversion is not None and mean is not None:
+        q[:n] = -np.asarray(mean) / risk_aversion
+    if target_return is not None and mean is not None:
+        row = np.zeros(width)
+        row[:n] = mean
+        A = np.vstack([A, row])
+        lower = np.append(lower, target_return)
+        upper = np.append(upper, np.inf)
+
+    x0, y0 = _warm_start(warm_start, constraints, width, len(lower))
+    return solve_qp_admm(P, q, A, lower, upper, x0=x0, y0=y0)
+
+
+def max_sharpe_weights(
+    cov: np.ndarray,
+    mean: np.ndarray,
+    risk_free_rate: float = 0.0,
+    constraints: PortfolioConstraints | None = None,
+    warm_start: QPResult | None = None,
+) -> QPResult:
+    """
+    Constrained maximum-Sharpe portfolio.
+
+    Uses the homogenized form: with y = kappa * w, minimize y'Cy subject to
+    (mean - rf)'y = 1 and every constraint scaled by kappa >= 0, then
+    w = y / kappa. Requires at least one asset with positive excess return.
+
+    Returns:
+        QPResult; weights are x[:n] / x[-1]
+    """
+    constraints = constraints or PortfolioConstraints()
+    n = len(cov)
+    turnover = constraints.uses_turnover()
+    width = n + (n if turnover else 0) + 1
+    kappa = width - 1
+    lo_w, hi_w = constraints.bounds(n)
+
+    rows, lows, highs = [], [], []
+
+    def add(row, low, high):
+        rows.append(row)
+        lows.append(low)
+        highs.append(high)
+
+    excess = np.zeros(width)
+    excess[:n] = np.asarray(mean) - risk_free_rate
+    add(excess, 1.0, 1.0)
+    budget = np.zeros(width)
+    budget[:n] = 1.0
+    budget[kappa] = -1.0
+    add(budget, 0.0, 0.0)
+    for i in range(n):
+        upper_row = np.zeros(width)
+        upper_row[i] = 1.0
+        upper_row[kappa] = -hi_w[i]
+        add(upper_row, -np.inf, 0.0)
+        lower_row = np.zeros(width)
+        lower_row[i] = 1.0
+        lower_row[kappa] = -lo_w[i]
+        add(lower_row, 0.0, np.inf)
+    for indices, cap in constraints.groups.values():
+        row = np.zeros(width)
+        row[list(indices)] = 1.0
+        row[kappa] = -cap
+        add(row, -np.inf, 0.0)
+    if turnover:
+        previous = np.asarray(constraints.previous_weights, dtype=float)
+        for i in range(n):
+            minus = np.zeros(width)
+            minus[i], minus[n + i], minus[kappa] = 1.0, -1.0, -previous[i]
+            add(minus, -np.inf, 0.0)
+            plus = np.zeros(width)
+            plus[i], plus[n + i], plus[kappa] = 1.0, 1.0, -previous[i]
+            add(plus, 0.0, np.inf)
+        total = np.zeros(width)
+        total[n : 2 * n] = 1.0
+        total[kappa] = -constraints.max_turnover
+        add(total, -np.inf, 0.0)
+    kappa_row = np.zeros(width)
+    kappa_row[kappa] = 1.0
+    add(kappa_row, 0.0, np.inf)
+
+    A = np.vstack(rows)
+    lower = np.asarray(lows, dtype=float)
+    upper = np.asarray(highs, dtype=float)
+    P = np.zeros((width, width))
+    P[:n, :n] = 2.0 * cov
+
+    x0 = y0 = None
+    if warm_start is not None and warm_start.x.shape == (width,):
+        x0, y0 = warm_start.x, (warm_start.y if warm_start.y.shape == lower.shape else None)
+    elif constraints.previous_weights is not None:
+        w = np.asarray(constraints.previous_weights, dtype=float)
+        scale = w @ excess[:n]
+        if scale > 0:
+            x0 = np.zeros(width)
+            x0[:n] = w / scale
+            x0[kappa] = 1.0 / scale
+    return solve_qp_admm(P, np.zeros(width), A, lower, upper, x0=x0, y0=y0)
+
+
+def _warm_start(
+    warm_start: QPResult | None, constraints: PortfolioConstraints, width: int, rows: int
+) -> tuple[np.ndarray | None, np.ndarray | None]:
+    """Initial (x, y) from a previous solve, else from the previous weights."""
+    if warm_start is not None and warm_start.x.shape == (width,):
+        y0 = warm_start.y if warm_start.y.shape == (rows,) else None
+        return warm_start.x, y0
+    if constraints.previous_weights is not None:
+        x0 = np.zeros(width)
+        n = len(constraints.previous_weights)
+        x0[:n] = constraints.previous_weights
+        return x0, None
+    return None, None
+
+
+def mean_cvar_weights(
+    scenarios: np.ndarray,
+    confidence_level: float = 0.95,
+    target_return: float | None = None,
+    constraints: PortfolioConstraints | None = None,
+    method: str = "auto",
+    max_rounds: int = 50,
+) -> tuple[np.ndarray, float]:
+    """
+    Minimum-CVaR portfolio via the Rockafellar-Uryasev linear program.
+
+    Variables [w (n), t (n, turnover only), VaR alpha, shortfall u (S)]:
+        min alpha + sum(u) / ((1 - beta) S)
+        s.t. u_s >= -r_s'w - alpha, u >= 0, mean'w >= target, portfolio constraints
+
+    method="lp" builds every shortfall row at once. method="active" solves
+    the same LP by constraint generation: only scenarios that are (or were)
+    in the loss tail get a shortfall row, violated scenarios are added and the
+    LP is re-solved until none remain. The result is the exact LP optimum, but
+    each solve only sees a few multiples of the tail size. "auto" picks
+    active for large scenario sets.
+
+    Args:
+        scenarios: Per-period return scenarios (S x n), historical or simulated
+        confidence_level: CVaR confidence level beta
+        target_return: Minimum mean per-period scenario return
+        constraints: Box, group and turnover constraints
+        method: "lp", "active" or "auto"
+        max_rounds: Constraint-generation round limit
+
+    Returns:
+        (weights, CVaR of the loss at confidence_level)
+    """
+    constraints = constraints or PortfolioConstraints()
+    scenarios = np.asarray(scenarios, dtype=float)
+    num_scenarios, n = scenarios.shape
+    if method == "auto":
+        method = "active" if num_scenarios * n > 250_000 else "lp"
+
+    mean = scenarios.mean(axis=0)
+    tail_scale = 1.0 / ((1.0 - confidence_level) * num_scenarios)
+    if method == "lp":
+        weights, _, objective = _cvar_lp(scenarios, mean, tail_scale, target_return, constraints)
+        return weights, objective
+
+    # Start from the tail of the previous (or equal-weight) portfolio
+    start = constraints.previous_weights
+    start = np.full(n, 1.0 / n) if start is None else np.asarray(start, dtype=float)
+    tail_size = int(np.ceil((1.0 - confidence_level) * num_scenarios))
+    active = np.argsort(scenarios @ start)[: min(num_scenarios, 3 * tail_size)]
+
+    for _ in range(max_rounds):
+        weights, alpha, objective = _cvar_lp(
+            scenarios[active], mean, tail_scale, target_return, constraints
+        )
+        shortfall = -(scenarios @ weights) - alpha
+        violated = np.flatnonzero(shortfall > 1e-12)
+        violated = np.setdiff1d(violated, active, assume_unique=True)
+        if len(violated) == 0:
+            return weights, objective
+        active = np.concatenate([active, violated])
+
+    logger.warning(f"⚠️  Mean-CVaR constraint generation stopped after {max_rounds} rounds")
+    return weights, scenario_cvar(scenarios @ weights, confidence_level)
+
+
+def _cvar_lp(
+    scenarios: np.ndarray,
+    mean: np.ndarray,
+    tail_scale: float,
+    target_return: float | None,
+    constraints: PortfolioConstraints,
+) -> tuple[np.ndarray, float, float]:
+    """Rockafellar-Uryasev LP over the given scenario rows; returns (w, alpha, objective)."""
+    num_scenarios, n = scenarios.shape
+    t_size = n if constraints.uses_turnover() else 0
+    alpha_col = n + t_size
+    width = alpha_col + 1 + num_scenarios
+
+    cost = np.zeros(width)
+    cost[alpha_col] = 1.0
+    cost[alpha_col + 1 :] = tail_scale
+
+    # -r_s'w - alpha - u_s <= 0
+    blocks = [
+        sparse.hstack(
+            [
+                sparse.csr_matrix(-scenarios),
+                sparse.csr_matrix((num_scenarios, t_size)),
+                sparse.csr_matrix(-np.ones((num_scenarios, 1))),
+                -sparse.identity(num_scenarios, format="csr"),
+            ],
+            format="csr",
+        )
+    ]
+    rhs = [np.zeros(num_scenarios)]
+    if target_return is not None:
+        row = np.zeros(width)
+        row[:n] = -mean
+        blocks.append(sparse.csr_matrix(row))
+        rhs.append([-target_return])
+
+    A_port, lo_port, hi_port = _portfolio_rows(
+        n, constraints, extra=1 + num_scenarios, budget=False
+    )
+    A_port, lo_port, hi_port = A_port[n:], lo_port[n:], hi_port[n:]  # box -> bounds
+    finite_hi, finite_lo = np.isfinite(hi_port), np.isfinite(lo_port)
+    if finite_hi.any():
+        blocks.append(sparse.csr_matrix(A_port[finite_hi]))
+        rhs.append(hi_port[finite_hi])
+    if finite_lo.any():
+        blocks.append(sparse.csr_matrix(-A_port[finite_lo]))
+        rhs.append(-lo_port[finite_lo])
+
+    budget = np.zeros((1, width))
+    budget[0, :n] = 1.0
+    lo_w, hi_w = constraints.bounds(n)
+    bounds = np.empty((width, 2))
+    bounds[:n] = np.column_stack([lo_w, hi_w])
+    bounds[n:alpha_col] = (0.0, np.inf)
+    bounds[alpha_col] = (-np.inf, np.inf)
+    bounds[alpha_col + 1 :] = (0.0, np.inf)
+
+    result = linprog(
+        cost,
+        A_ub=sparse.vstack(blocks, format="csr"),
+        b_ub=np.concatenate([np.asarray(b, dtype=float) for b in rhs]),
+        A_eq=budget,
+        b_eq=[1.0],
+        bounds=bounds,
+        method="highs",
+    )
+    if not result.success:
+        raise ValueError(f"Mean-CVaR LP failed: {result.message}")
+    return result.x[:n], float(result.x[alpha_col]), float(result.fun)
+
+
+def scenario_cvar(portfolio_returns: np.ndarray, confidence_level: float = 0.95) -> float:
+    """Rockafellar-Uryasev CVaR of losses for a vector of portfolio returns."""
+    losses = -np.asarray(portfolio_returns, dtype=float)
+    # The minimizing alpha is one of the order statistics around the quantile
+    candidates = (
+        np.quantile(losses, confidence_level, method="lower"),
+        np.quantile(losses, confidence_level, method="higher"),
+    )
+    return float(
+        min(
+            var + np.maximum(losses - var, 0.0).mean() / (1.0 - confidence_level)
+            for var in candidates
+        )
+    )
@@ -13,6 +13,7 @@ Enhanced market data infrastructure for paper trading:
 import json
 import logging
 import os
+import sys
 import time
 import traceback
 from collections import deque
@@ -20,20 +21,19 @@ from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
-try:
-    import numpy as np
-    import pandas as pd
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
 
-    HAS_NUMPY = True
-except ImportError:
-    HAS_NUMPY = False
+from utils.lazy_imports import lazy_import, module_available  # noqa: E402
 
-try:
-    import yfinance as yf
+# Imported on first use: the dashboard only needs this module's symbol lists
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+HAS_NUMPY = module_available("numpy") and module_available("pandas")
 
-    HAS_YFINANCE = True
-except ImportError:
-    HAS_YFINANCE = False
+yf = lazy_import("yfinance")
+HAS_YFINANCE = module_available("yfinance")
 
 ROOT = Path(os.path.expanduser("~/neolight"))
 STATE = ROOT / "state"
@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+NeoLight Regime Engine - Gaussian HMM Market Regimes
+====================================================
+Fits a Gaussian hidden Markov model to each symbol's log returns offline
+(Baum-Welch, batched over symbols) and runs the forward filter online: each
+new bar updates every symbol's posterior regime probabilities with one
+(K x K) transition step, so a tick for a whole universe costs a handful of
+array operations.
+
+States are ordered canonically after fitting so column k means the same
+regime for every symbol:
+- 2 states: BEAR, BULL (by mean return)
+- 3 states: BEAR, SIDEWAYS, BULL
+- 4 states: the highest-variance state is HIGH_VOL, the rest by mean
+
+Fitted parameters are cached to disk with their symbol list and fit time and
+reused until they are older than the refit interval.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+ROOT = Path(os.path.expanduser("~/neolight"))
+RUNTIME = ROOT / "runtime"
+
+PARAMS_CACHE = RUNTIME / "regime_hmm_params.npz"
+REFIT_INTERVAL = float(os.getenv("NEOLIGHT_REGIME_REFIT_INTERVAL", str(7 * 86400)))
+MIN_FIT_BARS = 120
+
+STATE_LABELS = {
+    2: ("BEAR", "BULL"),
+    3: ("BEAR", "SIDEWAYS", "BULL"),
+    4: ("BEAR", "SIDEWAYS", "BULL", "HIGH_VOL"),
+}
+
+_LOG_2PI = np.log(2 * np.pi)
+
+
+@dataclass(slots=True)
+class HMMParams:
+    """Per-symbol Gaussian HMM parameters, states in canonical order."""
+
+    symbols: tuple[str, ...]
+    startprob: np.ndarray  # (S, K)
+    transmat: np.ndarray  # (S, K, K), rows sum to 1
+    means: np.ndarray  # (S, K)
+    variances: np.ndarray  # (S, K)
+    fitted_at: float
+
+    @property
+    def labels(self) -> tuple[str, ...]:
+        return STATE_LABELS[self.means.shape[1]]
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp.npz")
+        np.savez(
+            tmp,
+            symbols=np.array(self.symbols, dtype=str),
+            startprob=self.startprob,
+            transmat=self.transmat,
+            means=self.means,
+            variances=self.variances,
+            fitted_at=self.fitted_at,
+        )
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> HMMParams | None:
+        try:
+            with np.load(path) as data:
+                return cls(
+                    symbols=tuple(str(s) for s in data["symbols"]),
+                    startprob=data["startprob"],
+                    transmat=data["transmat"],
+                    means=data["means"],
+                    variances=data["variances"],
+                    fitted_at=float(data["fitted_at"]),
+                )
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+def log_returns(prices: np.ndarray) -> np.ndarray:
+    """Log returns along the last axis; gaps and non-positive prices give NaN."""
+    prices = np.asarray(prices, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        logp = np.log(np.where(prices > 0, prices, np.nan))
+    return np.diff(logp, axis=-1)
+
+
+def emission_likelihood(
+    x: np.ndarray, means: np.ndarray, variances: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Gaussian likelihoods for observations x of shape (S,) or (T, S).
+
+    Returns:
+        (b, log_scale): b has shape (K, S) or (T, K, S) and is the likelihood
+        per state divided by its maximum over states, so it never underflows;
+        log_scale is that maximum's log. Missing observations have b = 1 and
+        log_scale = 0.
+    """
+    observed = np.isfinite(x)
+    logb = np.where(observed, x, 0.0)[..., None, :] - means.T
+    logb *= logb
+    logb *= -0.5 / variances.T
+    logb -= 0.5 * (_LOG_2PI + np.log(variances.T))
+    if not observed.all():
+        logb *= observed[..., None, :]
+    log_scale = logb.max(axis=-2)
+    logb -= log_scale[..., None, :]
+    return np.exp(logb, out=logb), log_scale
+
+
+def _forward(params: HMMParams, b: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Scaled forward pass over (T, K, S) likelihoods: filtered posteriors and scales."""
+    transmat = np.ascontiguousarray(params.transmat.transpose(1, 2, 0))  # (K, K, S)
+    alpha = np.empty_like(b)
+    scale = np.empty((b.shape[0], b.shape[2]))
+    a = params.startprob.T * b[0]
+    for t in range(len(b)):
+        if t:
+            a = np.einsum("ks,kjs->js", alpha[t - 1], transmat) * b[t]
+        scale[t] = a.sum(axis=0)
+        alpha[t] = a / scale[t]
+    return alpha, scale
+
+
+def _backward(params: HMMParams, b: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    transmat = np.ascontiguousarray(params.transmat.transpose(1, 2, 0))
+    beta = np.empty_like(b)
+    beta[-1] = 1.0
+    for t in range(len(b) - 2, -1, -1):
+        beta[t] = np.einsum("kjs,js->ks", transmat, b[t + 1] * beta[t + 1] / scale[t + 1])
+    return beta
+
+
+def _canonical(params: HMMParams) -> HMMParams:
+    """Reorder each symbol's states into the STATE_LABELS order."""
+    K = params.means.shape[1]
+    order = np.argsort(params.means, axis=1)
+    if K == 4:
+        high_vol = np.argmax(params.variances, axis=1)
+        rest = np.argsort(np.where(np.eye(K, dtype=bool)[high_vol], np.inf, params.means), axis=1)
+        order = np.concatenate([rest[:, :3], high_vol[:, None]], axis=1)
+    rows = np.arange(len(order))[:, None]
+    return HMMParams(
+        symbols=params.symbols,
+        startprob=params.startprob[rows, order],
+        transmat=params.transmat[rows[:, :, None], order[:, :, None], order[:, None, :]],
+        means=params.means[rows, order],
+        variances=params.variances[rows, order],
+        fitted_at=params.fitted_at,
+    )
+
+
+def _initial_params(x: np.ndarray, symbols: tuple[str, ...], n_states: int) -> HMMParams:
+    S = x.shape[0]
+    mean = np.nan_to_num(np.nanmean(x, axis=1))
+    var = np.nan_to_num(np.nanvar(x, axis=1), nan=1e-4) + 1e-12
+    trending = n_states - 1 if n_states == 4 else n_states
+    quantiles = (np.arange(trending) + 0.5) / trending
+    means = np.nan_to_num(np.nanquantile(x, quantiles, axis=1).T)
+    variances = np.repeat(var[:, None], trending, axis=1)
+    if n_states == 4:
+        means = np.concatenate([means, mean[:, None]], axis=1)
+        variances = np.concatenate([0.5 * variances, 4 * var[:, None]], axis=1)
+    stay = 0.95
+    transmat = np.full((n_states, n_states), (1 - stay) / (n_states - 1))
+    np.fill_diagonal(transmat, stay)
+    return HMMParams(
+        symbols=symbols,
+        startprob=np.full((S, n_states), 1.0 / n_states),
+        transmat=np.repeat(transmat[None], S, axis=0),
+        means=means,
+        variances=variances,
+        fitted_at=time.time(),
+    )
+
+
+def fit_hmm(
+    returns: np.ndarray,
+    symbols: tuple[str, ...] | list[str],
+    n_states: int = 4,
+    n_iter: int = 50,
+    tol: float = 1e-5,
+) -> tuple[HMMParams, np.ndarray]:
+    """
+    Fit one Gaussian HMM per row of returns with batched Baum-Welch.
+
+    Args:
+        returns: (S, T) log returns; NaN marks missing bars (e.g. before listing)
+        symbols: Row names
+        n_states: 2, 3 or 4 regimes
+        n_iter: Maximum EM iterations
+        tol: Stop once no symbol's mean log-likelihood per bar improves by more
+
+    Returns:
+        (params in canonical state order, log-likelihood per symbol)
+    """
+    if n_states not in STATE_LABELS:
+        raise ValueError(f"n_states must be one of {sorted(STATE_LABELS)}")
+    x = np.atleast_2d(np.asarray(returns, dtype=float))
+    params = _initial_params(x, tuple(symbols), n_states)
+    var_floor = 1e-4 * np.nan_to_num(np.nanvar(x, axis=1), nan=1e-4) + 1e-12
+    x = np.ascontiguousarray(x.T)  # (T, S): one contiguous row per bar
+    observed = np.isfinite(x)
+    counts = np.maximum(observed.sum(axis=0), 1)
+    x0 = np.where(observed, x, 0.0)
+
+    previous = np.full(x.shape[1], -np.inf)
+    loglik = previous
+    for _ in range(n_iter):
+        b, log_scale = emission_likelihood(x, params.means, params.variances)
+        alpha, scale = _forward(params, b)
+        beta = _backward(params, b, scale)
+        loglik = np.log(scale).sum(axis=0) + log_scale.sum(axis=0)
+
+        # With per-bar scaling, alpha * beta is already normalized over states
+        gamma = alpha * beta
+        weighted = b[1:] * beta[1:]
+        weighted /= scale[1:, None]
+        xi = params.transmat * np.einsum("tis,tjs->sij", alpha[:-1], weighted) + 1e-12
+        mass = np.einsum("tks,ts->ks", gamma, observed.astype(float))
+        has_mass = mass > 1e-9
+        safe_mass = np.where(has_mass, mass, 1.0)
+        means = np.einsum("tks,ts->ks", gamma, x0) / safe_mass
+        variances = np.einsum("tks,ts->ks", gamma, x0 * x0) / safe_mass - means**2
+        params = HMMParams(
+            symbols=params.symbols,
+            startprob=gamma[0].T,
+            transmat=xi / xi.sum(axis=2, keepdims=True),
+            means=np.where(has_mass, means, params.means.T).T,
+            variances=np.where(has_mass, np.maximum(variances, var_floor), params.variances.T).T,
+            fitted_at=params.fitted_at,
+        )
+        if np.all((loglik - previous) / counts < tol):
+            break
+        previous = loglik
+    return _canonical(params), loglik
+
+
+def filter_history(params: HMMParams, returns: np.ndarray) -> np.ndarray:
+    """Filtered regime posteriors P(state_t | returns up to t), shape (S, T, K)."""
+    returns = np.ascontiguousarray(np.atleast_2d(returns).T)
+    b, _ = emission_likelihood(returns, params.means, params.variances)
+    return _forward(params, b)[0].transpose(2, 0, 1)
+
+
+class RegimeEngine:
+    """
+    Online regime filter for a universe of symbols.
+
+    sync() brings the filter up to date with a price history: it fits (or
+    loads cached) parameters when needed, and when the history only gained
+    bars since the last call it feeds just the new bars through update().
+    update() advances every symbol by one bar in O(K^2) per symbol.
+    """
+
+    def __init__(
+        self,
+        n_states: int = 4,
+        cache_path: Path | None = None,
+        refit_interval: float = REFIT_INTERVAL,
+        min_bars: int = MIN_FIT_BARS,
+    ):
+        self.n_states = n_states
+        self.cache_path = cache_path
+        self.refit_interval = refit_interval
+        self.min_bars = min_bars
+        self.params: HMMParams | None = None
+        self.bars = 0
+        self.fits = 0
+        self._alpha: np.ndarray | None = None  # (K, S) filtered posteriors
+        self._last_price: np.ndarray | None = None
+
+    @property
+    def symbols(self) -> tuple[str, ...]:
+        return self.params.symbols if self.params is not None else ()
+
+    @property
+    def labels(self) -> tuple[str, ...]:
+        return STATE_LABELS[self.n_states]
+
+    @property
+    def posterior(self) -> np.ndarray | None:
+        """(S, K) regime probabilities after the latest bar."""
+        return self._alpha.T if self._alpha is not None else None
+
+    def _stale(self, params: HMMParams | None, symbols: tuple[str, ...]) -> bool:
+        return (
+            params is None
+            or params.symbols != symbols
+            or params.means.shape[1] != self.n_states
+            or time.time() - params.fitted_at > self.refit_interval
+        )
+
+    def _use(self, params: HMMParams) -> None:
+        """Adopt params and precompute the per-bar filter terms in (K, S) layout."""
+        self.params = params
+        self._transmat = np.ascontiguousarray(params.transmat.transpose(1, 2, 0))
+        self._means = np.ascontiguousarray(params.means.T)
+        self._half_precision = 0.5 / params.variances.T
+        self._log_norm = -0.5 * (_LOG_2PI + np.log(params.variances.T))
+
+    def fit(self, prices: np.ndarray, symbols: list[str] | tuple[str, ...]) -> np.ndarray:
+        """Fit parameters on a (S, T) price history and filter it; returns posteriors."""
+        prices = np.atleast_2d(np.asarray(prices, dtype=float))
+        params, _ = fit_hmm(log_returns(prices), tuple(symbols), self.n_states)
+        self._use(params)
+        self.fits += 1
+        if self.cache_path is not None:
+            params.save(self.cache_path)
+        return self._filter(prices)
+
+    def _filter(self, prices: np.ndarray) -> np.ndarray:
+        posteriors = filter_history(self.params, log_returns(prices))
+        self._alpha = np.ascontiguousarray(posteriors[:, -1].T)
+        self.bars = prices.shape[1]
+        self._last_price = _last_valid(prices)
+        return self.posterior
+
+    def sync(self, prices: np.ndarray, symbols: list[str] | tuple[str, ...]) -> np.ndarray | None:
+        """
+        Bring the filter up to date with a (S, T) price history.
+
+        Returns:
+            (S, K) posteriors for the latest bar, or None if the history is too
+            short to fit.
+        """
+        prices = np.atleast_2d(np.asarray(prices, dtype=float))
+        symbols = tuple(symbols)
+        if self._stale(self.params, symbols):
+            cached = HMMParams.load(self.cache_path) if self.cache_path is not None else None
+            if self._stale(cached, symbols):
+                if prices.shape[1] <= self.min_bars:
+                    return None
+                return self.fit(prices, symbols)
+            self._use(cached)
+            return self._filter(prices)
+
+        seen = self.bars
+        continues = (
+            self._alpha is not None
+            and seen <= prices.shape[1]
+            and np.array_equal(_last_valid(prices[:, :seen]), self._last_price, equal_nan=True)
+        )
+        if not continues:
+            return self._filter(prices)
+        for t in range(seen, prices.shape[1]):
+            self.update(prices[:, t])
+        return self.posterior
+
+    def update(self, prices: np.ndarray) -> np.ndarray:
+        """Advance every symbol by one bar of (S,) prices; NaN means no new price."""
+        prices = np.asarray(prices, dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = np.log(prices / self._last_price)
+        self._last_price = np.where(prices > 0, prices, self._last_price)
+        self.bars += 1
+        return self.update_returns(returns)
+
+    def update_returns(self, returns: np.ndarray) -> np.ndarray:
+        """Forward-filter step for (S,) log returns; returns (S, K) posteriors."""
+        z = returns - self._means
+        logb = self._log_norm - z * z * self._half_precision
+        observed = np.isfinite(returns)
+        if not observed.all():
+            np.copyto(logb, 0.0, where=~observed)
+        a = np.einsum("ks,kjs->js", self._alpha, self._transmat)
+        a *= np.exp(logb - logb.max(axis=0))
+        a /= a.sum(axis=0)
+        self._alpha = a
+        return self.posterior
+
+    def regimes(self) -> dict[str, dict[str, Any]]:
+        """Latest regime, confidence and probabilities per symbol."""
+        if self._alpha is None:
+            return {}
+        labels = self.labels
+        best = self.posterior.argmax(axis=1)
+        return {
+            symbol: {
+                "regime": labels[best[i]],
+                "confidence": float(self.posterior[i, best[i]]),
+                "probabilities": {
+                    label: round(float(p), 6)
+                    for label, p in zip(labels, self.posterior[i], strict=True)
+                },
+            }
+            for i, symbol in enumerate(self.symbols)
+        }
+
+    def publish(self, path: Path) -> dict[str, Any]:
+        """Write the latest regimes to a JSON file (atomically) and return them."""
+        payload = {
+            "timestamp": datetime.now(UTC).isoformat(),
+            "n_states": self.n_states,
+            "fitted_at": (
+                datetime.fromtimestamp(self.params.fitted_at, UTC).isoformat()
+                if self.params is not None
+                else None
+            ),
+            "symbols": self.regimes(),
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(payload, indent=2))
+        tmp.replace(path)
+        return payload
+
+
+def _last_valid(prices: np.ndarray) -> np.ndarray:
+    """Most recent finite positive price per row (NaN if none)."""
+    valid = np.isfinite(prices) & (prices > 0)
+    last = prices.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+    return np.where(valid.any(axis=1), prices[np.arange(len(prices)), last], np.nan)
@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+NeoLight Risk Engine - Vectorized VaR/CVaR and Stress Testing
+=============================================================
+Builds the position vector and scenario P&L once and answers every risk
+question from it:
+- Historical, parametric, filtered-historical (EWMA-vol-scaled) and Monte
+  Carlo VaR/CVaR for many confidence levels and horizons in one sort
+- Factor-shock stress scenarios (thousands per call)
+- Component and marginal VaR/CVaR per position (Euler allocation)
+- Full revaluation through a pluggable vectorized pricer
+
+Scenario returns are kept factored (R = mean + factors @ loadings), so for
+linear positions portfolio P&L is factors @ (loadings @ exposures) and the
+scenario x position matrix is only materialized for tail scenarios.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from statistics import NormalDist
+
+import numpy as np
+
+METHODS = ("historical", "parametric", "filtered_historical", "monte_carlo")
+EWMA_LAMBDA = 0.94  # RiskMetrics daily decay
+REVALUATION_CHUNK = 2048  # scenario rows per pricer call
+
+# Maps (S x N) scenario asset returns to (S x N) position P&L
+Pricer = Callable[[np.ndarray], np.ndarray]
+
+
+@dataclass(frozen=True)
+class StressScenario:
+    """
+    User-defined shock scenario.
+
+    Attributes:
+        name: Scenario name
+        shocks: {factor or symbol: return shock}; symbol shocks add to the
+            factor-implied move of that position
+        description: Free text
+    """
+
+    name: str
+    shocks: dict[str, float]
+    description: str = ""
+
+
+@dataclass
+class ScenarioSet:
+    """
+    Scenario asset returns kept in factored form.
+
+    Row s of the scenario return matrix is
+    ``scale * factors[s] @ loadings + drift``, with loadings=None meaning
+    the factors already are asset returns.
+    """
+
+    factors: np.ndarray
+    loadings: np.ndarray | None = None
+    drift: np.ndarray | None = None
+    scale: float = 1.0
+
+    def __len__(self) -> int:
+        return len(self.factors)
+
+    def returns(self, rows: np.ndarray | slice = slice(None)) -> np.ndarray:
+        """Materialize asset returns for the selected scenario rows."""
+        block = self.factors[rows]
+        if self.loadings is not None:
+            block = block @ self.loadings
+        block = block * self.scale if self.scale != 1.0 else block.copy()
+        if self.drift is not None:
+            block += self.drift
+        return block
+
+    def linear_pnl(self, exposures: np.ndarray) -> np.ndarray:
+        """Portfolio P&L of linear positions without forming the S x N matrix."""
+        direction = exposures if self.loadings is None else self.loadings @ exposures
+        pnl = self.factors @ direction
+        if self.scale != 1.0:
+            pnl *= self.scale
+        if self.drift is not None:
+            pnl += float(self.drift @ exposures)
+        return pnl
+
+
+@dataclass
+class TailStats:
+    """VaR/CVaR (positive = loss) per horizon x confidence from one sort."""
+
+    horizons: tuple[int, ...]
+    confidences: tuple[float, ...]
+    var: np.ndarray
+    cvar: np.ndarray
+
+    def as_dict(self) -> dict[str, dict[str, float]]:
+        return {
+            f"{h}d_{round(c * 100)}": {
+                "var": float(self.var[i, j]),
+                "cvar": float(self.cvar[i, j]),
+            }
+            for i, h in enumerate(self.horizons)
+            for j, c in enumerate(self.confidences)
+        }
+
+
+def tail_count(n_scenarios: int, confidence: float) -> int:
+    """Scenarios in the tail: VaR is the k-th worst P&L, CVaR their mean."""
+    return min(max(int(n_scenarios * (1 - confidence)) + 1, 1), n_scenarios)
+
+
+def tail_stats(
+    pnl: np.ndarray,
+    confidences: Sequence[float],
+    horizons: Sequence[int] = (1,),
+) -> TailStats:
+    """
+    VaR and CVaR for every row of an (H x S) P&L matrix in one sort.
+
+    Args:
+        pnl: Scenario P&L, shape (S,) or (H, S) with one row per horizon
+        confidences: Confidence levels
+        horizons: Horizon label per row
+
+    Returns:
+        TailStats with (H x C) var/cvar arrays
+    """
+    pnl = np.atleast_2d(pnl)
+    order = np.argsort(pnl, axis=1)
+    ordered = np.take_along_axis(pnl, order, axis=1)
+    cumulative = np.cumsum(ordered, axis=1)
+    ks = np.array([tail_count(pnl.shape[1], c) for c in confidences])
+    var = -ordered[:, ks - 1]
+    cvar = -cumulative[:, ks - 1] / ks
+    return TailStats(tuple(horizons), tuple(confidences), var, cvar)
+
+
+def ewma_volatility(returns: np.ndarray, decay: float = EWMA_LAMBDA) -> np.ndarray:
+    """
+    EWMA volatility per date and asset, one step ahead.
+
+    Returns:
+        (T + 1) x N array: row t is the forecast for date t made with data up
+        to t - 1; the last row is the forecast for the next (unseen) date
+    """
+    t_obs, n_assets = returns.shape
+    variance = np.empty((t_obs + 1, n_assets))
+    seed_rows = returns[: min(t_obs, 20)]
+    variance[0] = np.mean(seed_rows**2, axis=0)
+    squared = returns**2
+    for t in range(t_obs):
+        variance[t + 1] = decay * variance[t] + (1 - decay) * squared[t]
+    return np.sqrt(np.maximum(variance, 1e-16))
+
+
+def covariance_loadings(returns: np.ndarray) -> np.ndarray:
+    """
+    K x N matrix L with L.T @ L equal to the sample covariance.
+
+    With fewer observations than assets the demeaned history itself is the
+    (rank-deficient) square root; otherwise a Cholesky factor, falling back
+    to an eigen decomposition for non-positive-definite estimates.
+    """
+    t_obs, n_assets = returns.shape
+    centered = returns - returns.mean(axis=0)
+    if t_obs <= n_assets:
+        return centered / np.sqrt(max(t_obs - 1, 1))
+    cov = centered.T @ centered / (t_obs - 1)
+    try:
+        return np.linalg.cholesky(cov).T
+    except np.linalg.LinAlgError:
+        values, vectors = np.linalg.eigh(cov)
+        return (vectors * np.sqrt(np.clip(values, 0.0, None))).T
+
+
+def estimate_factor_betas(returns: np.ndarray, factor_returns: np.ndarray) -> np.ndarray:
+    """OLS betas (N x K) of asset returns on factor returns (with intercept)."""
+    design = np.column_stack([np.ones(len(factor_returns)), factor_returns])
+    coef, *_ = np.linalg.lstsq(design, returns, rcond=None)
+    return coef[1:].T
+
+
+class RiskEngine:
+    """
+    Portfolio risk from one position vector and cached scenario sets.
+
+    All P&L figures are in the units of `exposures` (currency, or weights
+    for returns as fractions of equity).
+    """
+
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        exposures: Iterable[float],
+        returns: np.ndarray,
+        factor_betas: np.ndarray | None = None,
+        factor_names: Sequence[str] = (),
+        pricer: Pricer | None = None,
+        ewma_lambda: float = EWMA_LAMBDA,
+        seed: int | None = None,
+    ):
+        """
+        Initialize engine.
+
+        Args:
+            symbols: Position symbols (N)
+            exposures: Signed market value per position
+            returns: Historical daily returns, T x N, oldest first
+            factor_betas: N x K factor loadings used by stress scenarios
+            factor_names: K factor names
+            pricer: Vectorized full revaluation (S x N returns -> S x N P&L);
+                None means linear positions (exposure * return)
+            ewma_lambda: Decay for filtered historical simulation
+            seed: Monte Carlo RNG seed
+        """
+        self.symbols = list(symbols)
+        self.index = {sym: i for i, sym in enumerate(self.symbols)}
+        self.exposures = np.asarray(list(exposures), dtype=float)
+        self.returns = np.asarray(returns, dtype=float)
+        if self.returns.ndim != 2 or self.returns.shape[1] != len(self.symbols):
+            raise ValueError(f"returns must be T x {len(self.symbols)}, got {self.returns.shape}")
+        if len(self.exposures) != len(self.symbols):
+            raise ValueError("exposures and symbols differ in length")
+        self.factor_names = list(factor_names)
+        self.factor_betas = (
+            np.asarray(factor_betas, dtype=float).reshape(len(self.symbols), -1)
+            if factor_betas is not None
+            else np.zeros((len(self.symbols), 0))
+        )
+        if self.factor_betas.shape[1] != len(self.factor_names):
+            raise ValueError("factor_betas columns and factor_names differ in length")
+        self.pricer = pricer
+        self.ewma_lambda = ewma_lambda
+        self.rng = np.random.default_rng(seed)
+        self._scenarios: dict[tuple, ScenarioSet] = {}
+
+    @classmethod
+    def from_positions(
+        cls, quantities: dict[str, float], prices, min_history: int = 20, **kwargs
+    ) -> RiskEngine:
+        """
+        Build from {symbol: quantity} and a price DataFrame (dates x symbols).
+
+        Symbols without enough price history are left out.
+        """
+        prices = prices[[sym for sym in quantities if sym in prices.columns]].dropna()
+        if len(prices) <= min_history:
+            raise ValueError(f"need more than {min_history} price rows, got {len(prices)}")
+        values = prices.to_numpy(dtype=float)
+        returns = values[1:] / values[:-1] - 1.0
+        exposures = [quantities[sym] * values[-1, i] for i, sym in enumerate(prices.columns)]
+        return cls(list(prices.columns), exposures, returns, **kwargs)
+
+    @property
+    def value(self) -> float:
+        return float(self.exposures.sum())
+
+    # ------------------------------------------------------------- scenarios
+
+    def scenarios(self, method: str, n_sims: int = 10_000) -> ScenarioSet:
+        """One-day scenario set for a simulation method (cached)."""
+        key = (method, n_sims if method == "monte_carlo" else None)
+        cached = self._scenarios.get(key)
+        if cached is not None:
+            return cached
+        if method == "historical":
+            scenario_set = ScenarioSet(self.returns)
+        elif method == "filtered_historical":
+            vol = ewma_volatility(self.returns, self.ewma_lambda)
+            scenario_set = ScenarioSet(self.returns / vol[:-1] * vol[-1])
+        elif method == "monte_carlo":
+            loadings = covariance_loadings(self.returns)
+            draws = self.rng.standard_normal((n_sims, loadings.shape[0]))
+            scenario_set = ScenarioSet(draws, loadings, self.returns.mean(axis=0))
+        else:
+            raise ValueError(f"unknown simulation method '{method}'")
+        self._scenarios[key] = scenario_set
+        return scenario_set
+
+    def stress_scenarios(self, scenarios: Sequence[StressScenario]) -> ScenarioSet:
+        """Scenario set whose factors are the shocks (S x K') of each scenario."""
+        columns: dict[str, int] = {}
+        for scenario in scenarios:
+            for name in scenario.shocks:
+                if name not in columns:
+                    if name not in self.factor_names and name not in self.index:
+                        raise ValueError(f"{scenario.name}: unknown factor or symbol '{name}'")
+                    columns[name] = len(columns)
+        shocks = np.zeros((len(scenarios), len(columns)))
+        for row, scenario in enumerate(scenarios):
+            for name, shock in scenario.shocks.items():
+                shocks[row, columns[name]] = shock
+        loadings = np.zeros((len(columns), len(self.symbols)))
+        for name, col in columns.items():
+            if name in self.factor_names:
+                loadings[col] = self.factor_betas[:, self.factor_names.index(name)]
+            else:
+                loadings[col, self.index[name]] = 1.0
+        return ScenarioSet(shocks, loadings)
+
+    def position_pnl(
+        self, scenario_set: ScenarioSet, rows: np.ndarray | slice = slice(None)
+    ) -> np.ndarray:
+        """Full revaluation: P&L per scenario row and position."""
+        returns = scenario_set.returns(rows)
+        if self.pricer is None:
+            return returns * self.exposures
+        return np.asarray(self.pricer(returns), dtype=float)
+
+    def portfolio_pnl(self, scenario_set: ScenarioSet) -> np.ndarray:
+        """Portfolio P&L per scenario (chunked revaluation for custom pricers)."""
+        if self.pricer is None:
+            return scenario_set.linear_pnl(self.exposures)
+        pnl = np.empty(len(scenario_set))
+        for start in range(0, len(scenario_set), REVALUATION_CHUNK):
+            rows = slice(start, start + REVALUATION_CHUNK)
+            pnl[rows] = self.position_pnl(scenario_set, rows).sum(axis=1)
+        return pnl
+
+    def _horizon_pnl(self, method: str, horizons: Sequence[int], n_sims: int) -> np.ndarray:
+        """(H x S) portfolio P&L, scaling one-day scenarios by sqrt(horizon)."""
+        base = self.scenarios(method, n_sims)
+        if self.pricer is None:
+            # Linear: P&L scales with the shock, so one pass serves every horizon
+            shock = ScenarioSet(base.factors, base.loadings).linear_pnl(self.exposures)
+            drift = float(base.drift @ self.exposures) if base.drift is not None else 0.0
+            roots = np.sqrt(np.asarray(horizons, dtype=float))[:, None]
+            return roots * shock + np.asarray(horizons, dtype=float)[:, None] * drift
+        rows = []
+        for h in horizons:
+            scaled = ScenarioSet(base.factors, base.loadings, scale=float(np.sqrt(h)))
+            if base.drift is not None:
+                scaled.drift = base.drift * h
+            rows.append(self.portfolio_pnl(scaled))
+        return np.vstack(rows)
+
+    # ------------------------------------------------------------------ risk
+
+    def parametric(self, confidences: Sequence[float], horizons: Sequence[int] = (1,)) -> TailStats:
+        """Delta-normal VaR/CVaR from the sample mean and covariance."""
+        mean = float(self.returns.mean(axis=0) @ self.exposures)
+        sigma = float(np.linalg.norm(covariance_loadings(self.returns) @ self.exposures))
+        h = np.asarray(horizons, dtype=float)[:, None]
+        z = np.array([NormalDist().inv_cdf(c) for c in confidences])
+        density = np.array([NormalDist().pdf(v) for v in z])
+        var = z * sigma * np.sqrt(h) - mean * h
+        cvar = density / (1 - np.asarray(confidences)) * sigma * np.sqrt(h) - mean * h
+        return TailStats(tuple(horizons), tuple(confidences), var, cvar)
+
+    def var_cvar(
+        self,
+        methods: Sequence[str] = METHODS,
+        confidences: Sequence[float] = (0.95, 0.99),
+        horizons: Sequence[int] = (1, 5),
+        n_sims: int = 10_000,
+    ) -> dict[str, dict[str, dict[str, float]]]:
+        """
+        VaR/CVaR for every method, confidence and horizon.
+
+        Returns:
+            {method: {"<h>d_<pct>": {"var": loss, "cvar": loss}}}
+        """
+        report = {}
+        for method in methods:
+            if method == "parametric":
+                stats = self.parametric(confidences, horizons)
+            else:
+                stats = tail_stats(
+                    self._horizon_pnl(method, horizons, n_sims), confidences, horizons
+                )
+            report[method] = stats.as_dict()
+        return report
+
+    def contributions(
+        self,
+        method: str = "historical",
+        confidence: float = 0.95,
+        horizon: int = 1,
+        n_sims: int = 10_000,
+        bandwidth: float = 0.01,
+    ) -> dict[str, dict[str, float]]:
+        """
+        Component and marginal VaR/CVaR per position (Euler allocation).
+
+        Components sum to the portfolio figure. Simulation methods average
+        position P&L over the tail (CVaR) and over scenarios around the VaR
+        quantile (VaR, kernel width `bandwidth` of the scenario count).
+
+        Returns:
+            {symbol: {"exposure", "component_var", "marginal_var",
+            "component_cvar", "pct_of_var"}}
+        """
+        if method == "parametric":
+            loadings = covariance_loadings(self.returns)
+            cov_exposure = loadings.T @ (loadings @ self.exposures)
+            sigma = float(np.sqrt(self.exposures @ cov_exposure))
+            z = NormalDist().inv_cdf(confidence)
+            density = NormalDist().pdf(z) / (1 - confidence)
+            mean = self.returns.mean(axis=0) * horizon
+            beta = cov_exposure / sigma if sigma > 0 else np.zeros_like(cov_exposure)
+            marginal_var = z * np.sqrt(horizon) * beta - mean
+            marginal_cvar = density * np.sqrt(horizon) * beta - mean
+            component_var = marginal_var * self.exposures
+            component_cvar = marginal_cvar * self.exposures
+        else:
+            base = self.scenarios(method, n_sims)
+            scaled = ScenarioSet(base.factors, base.loadings, scale=float(np.sqrt(horizon)))
+            if base.drift is not None:
+                scaled.drift = base.drift * horizon
+            pnl = self.portfolio_pnl(scaled)
+            order = np.argsort(pnl)
+            k = tail_count(len(pnl), confidence)
+            half = max(1, int(len(pnl) * bandwidth / 2))
+            window = order[max(0, k - 1 - half) : k + half]
+            component_var = -self.position_pnl(scaled, window).mean(axis=0)
+            component_cvar = -self.position_pnl(scaled, order[:k]).mean(axis=0)
+            # Rescale the kernel estimate so components add up to VaR exactly
+            total = component_var.sum()
+            if total != 0:
+                component_var *= -pnl[order[k - 1]] / total
+            with np.errstate(divide="ignore", invalid="ignore"):
+                marginal_var = np.where(self.exposures != 0, component_var / self.exposures, 0.0)
+        portfolio_var = component_var.sum()
+        return {
+            sym: {
+                "exposure": float(self.exposures[i]),
+                "component_var": float(component_var[i]),
+                "marginal_var": float(marginal_var[i]),
+                "component_cvar": float(component_cvar[i]),
+                "pct_of_var": float(component_var[i] / portfolio_var) if portfolio_var else 0.0,
+            }
+            for i, sym in enumerate(self.symbols)
+        }
+
+    def stress(self, scenarios: Sequence[StressScenario]) -> dict[str, float]:
+        """Portfolio P&L of each stress scenario (full revaluation)."""
+        if not scenarios:
+            return {}
+        pnl = self.portfolio_pnl(self.stress_scenarios(scenarios))
+        return {scenario.name: float(value) for scenario, value in zip(scenarios, pnl, strict=True)}
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+NeoLight Sentiment Engine - Concurrent, Cached Source Collection
+================================================================
+Collects sentiment from many sources for many symbols at once:
+- every (source, symbol) call runs on a shared thread pool, capped per
+  source by a concurrency limit and a token-bucket rate limit
+- results are cached per source and symbol with the source's TTL (empty
+  results with a shorter one) and persisted, so restarts and overlapping
+  refreshes reuse them
+- "batch" sources answer a chunk of symbols per request
+- "global" sources (macro data, channel feeds) are fetched once per refresh
+  and shared by every symbol
+
+A refresh therefore takes about as long as its slowest source needs for its
+calls at its own limits, rather than the sum of all calls.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+GLOBAL = "*"  # Cache key for symbol-independent sources
+NEGATIVE_TTL = 60.0  # Seconds an empty result is trusted
+
+
+@dataclass
+class SentimentSource:
+    """
+    One sentiment provider.
+
+    Attributes:
+        name: Key in collected results
+        fetch: fetch(symbol) for "symbol" scope, fetch(symbols) -> {symbol: result}
+            for "batch", fetch() for "global"; returns None when it has nothing
+        scope: "symbol", "batch" or "global"
+        ttl: Seconds a non-empty result stays fresh
+        rate: Max requests per second (None for unlimited)
+        burst: Token-bucket size (defaults to one second's worth)
+        concurrency: Max requests in flight to this source
+        batch_size: Symbols per request for "batch" sources
+    """
+
+    name: str
+    fetch: Callable[..., Any]
+    scope: str = "symbol"
+    ttl: float = 900.0
+    rate: float | None = None
+    burst: int | None = None
+    concurrency: int = 4
+    batch_size: int = 10
+
+
+class RateLimiter:
+    """Thread-safe token bucket allowing `rate` requests per second in bursts of `burst`."""
+
+    def __init__(self, rate: float, burst: int | None = None):
+        self.rate = rate
+        self.capacity = float(burst or max(1, int(rate)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        # Reserve a token (possibly going negative) and sleep outside the lock
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1.0
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if delay:
+            time.sleep(delay)
+
+
+class SentimentEngine:
+    """Fans sentiment calls out across sources and symbols with caching."""
+
+    def __init__(
+        self,
+        sources: list[SentimentSource],
+        cache_path: Path | None = None,
+        max_workers: int | None = None,
+        negative_ttl: float = NEGATIVE_TTL,
+    ):
+        """
+        Initialize engine.
+
+        Args:
+            sources: Providers to collect from
+            cache_path: JSON file persisting cached results (None keeps them in memory)
+            max_workers: Thread pool size (defaults to the sum of source concurrencies)
+            negative_ttl: Freshness of None results, so outages are retried soon
+        """
+        self.sources = {source.name: source for source in sources}
+        self.cache_path = cache_path
+        self.negative_ttl = negative_ttl
+        self._limiters = {
+            s.name: RateLimiter(s.rate, s.burst) for s in sources if s.rate is not None
+        }
+        self._slots = {s.name: threading.BoundedSemaphore(s.concurrency) for s in sources}
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers or sum(s.concurrency for s in sources) or 1,
+            thread_name_prefix="sentiment",
+        )
+        self._lock = threading.Lock()
+        self._cache: dict[str, dict[str, tuple[float, Any]]] = self._load()
+        self.last_run: dict[str, dict[str, Any]] = {}
+        self._started = time.perf_counter()
+
+    def _load(self) -> dict[str, dict[str, tuple[float, Any]]]:
+        if self.cache_path is None or not self.cache_path.exists():
+            return {}
+        try:
+            data = json.loads(self.cache_path.read_text())
+            return {
+                name: {key: (float(ts), value) for key, (ts, value) in entries.items()}
+                for name, entries in data.items()
+            }
+        except (OSError, ValueError, TypeError):
+            return {}
+
+    def _save(self) -> None:
+        if self.cache_path is None:
+            return
+        with self._lock:
+            data = {name: dict(entries) for name, entries in self._cache.items()}
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data))
+        tmp.replace(self.cache_path)
+
+    def _fresh(self, source: SentimentSource, key: str, now: float) -> bool:
+        entry = self._cache.get(source.name, {}).get(key)
+        if entry is None:
+            return False
+        ttl = source.ttl if entry[1] is not None else min(source.ttl, self.negative_ttl)
+        return now - entry[0] < ttl
+
+    def _call(self, source: SentimentSource, *args: Any) -> Any:
+        with self._slots[source.name]:
+            limiter = self._limiters.get(source.name)
+            if limiter is not None:
+                limiter.acquire()
+            return source.fetch(*args)
+
+    def _drain(self, source: SentimentSource, chunks: deque[list[str]]) -> None:
+        while chunks:
+            try:
+                keys = chunks.popleft()
+            except IndexError:
+                return
+            self._run(source, keys)
+
+    def _run(self, source: SentimentSource, keys: list[str]) -> None:
+        """Fetch and cache one request's worth of keys."""
+        try:
+            if source.scope == "global":
+                results = {GLOBAL: self._call(source)}
+            elif source.scope == "batch":
+                found = self._call(source, keys) or {}
+                results = {key: found.get(key) for key in keys}
+            else:
+                results = {keys[0]: self._call(source, keys[0])}
+        except Exception as e:
+            results = None
+            error = str(e)
+        now = time.time()
+        with self._lock:
+            stats = self.last_run[source.name]
+            stats["seconds"] = round(max(stats["seconds"], time.perf_counter() - self._started), 3)
+            if results is None:
+                stats["errors"] += 1
+                stats["error"] = error
+                return
+            self._cache.setdefault(source.name, {}).update(
+                (key, (now, value)) for key, value in results.items()
+            )
+            stats["requests"] += 1
+
+    def collect(self, symbols: list[str]) -> dict[str, dict[str, Any]]:
+        """
+        Results for every source and symbol, fetching only what is stale.
+
+        Returns:
+            {source: {symbol: result}}; global sources are keyed by GLOBAL
+        """
+        now = time.time()
+        self._started = time.perf_counter()
+        symbols = list(dict.fromkeys(symbols))
+        futures = []
+        self.last_run = {}
+        for source in self.sources.values():
+            keys = [GLOBAL] if source.scope == "global" else symbols
+            stale = [key for key in keys if not self._fresh(source, key, now)]
+            self.last_run[source.name] = {
+                "cached": len(keys) - len(stale),
+                "fetched": len(stale),
+                "requests": 0,
+                "errors": 0,
+                "seconds": 0.0,
+            }
+            step = source.batch_size if source.scope == "batch" else 1
+            chunks = deque(stale[i : i + step] for i in range(0, len(stale), step))
+            # One drain per concurrency slot, so a busy source never holds up the others
+            for _ in range(min(source.concurrency, len(chunks))):
+                futures.append(self._pool.submit(self._drain, source, chunks))
+        wait(futures)
+        if futures:
+            self._save()
+
+        results = {}
+        for source in self.sources.values():
+            entries = self._cache.get(source.name, {})
+            keys = [GLOBAL] if source.scope == "global" else symbols
+            results[source.name] = {
+                key: entries[key][1] if key in entries else None for key in keys
+            }
+        return results
+
+    def invalidate(self, source: str | None = None) -> None:
+        """Drop cached results for one source (or all)."""
+        with self._lock:
+            if source is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(source, None)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
@@ -3,6 +3,14 @@
 from __future__ import annotations
 
 import os
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from utils.notification_dispatcher import get_dispatcher  # noqa: E402
 
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
@@ -10,31 +18,21 @@ TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 
 def send_alert(message: str, parse_mode: str = "Markdown") -> bool:
     """
-    Send a Telegram alert message.
+    Queue a Telegram alert message.
+
+    Delivery happens on the shared notification dispatcher's background
+    thread, where bursts of alerts are coalesced into digests.
 
     Args:
         message: The message text to send
         parse_mode: Telegram parse mode (Markdown or HTML)
 
     Returns:
-        True if message sent successfully, False otherwise
+        True if the message was queued, False if Telegram is not configured
     """
     if not (TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID):
         return False
-
-    try:
-        import requests
-
-        url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-        payload = {
-            "chat_id": TELEGRAM_CHAT_ID,
-            "text": message,
-            "parse_mode": parse_mode,
-        }
-        response = requests.post(url, json=payload, timeout=10)
-        return response.status_code == 200
-    except Exception:
-        return False
+    return get_dispatcher().notify(message, chat_id=TELEGRAM_CHAT_ID, parse_mode=parse_mode)
 
 
 def alert_stale_data(sport: str, data_type: str, hours_old: int, threshold_hours: int) -> None:
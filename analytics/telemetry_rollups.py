@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+NeoLight Telemetry Rollups - Materialized Time-Bucketed Decision Metrics
+========================================================================
+Incrementally folds agent decisions into per-agent and per-strategy
+minute/hour/day buckets so hive telemetry can read P&L windows, Sharpe,
+win rate and drawdown without rescanning decision history.
+
+Each bucket keeps decision count, P&L count, sum, sum of squares, min/max,
+wins and the running high-water mark, trough and max drawdown of cumulative
+P&L inside the bucket. Buckets combine associatively, so any window is the
+merge of the buckets covering it:
+- minute buckets (kept 25 hours) give the edge of 1d windows
+- hour buckets (kept 31 days) give the edge of 7d/30d windows
+- day buckets (kept 400 days) cover whole days
+
+Decisions are keyed so that re-ingesting the attribution file only touches
+new decisions and decisions whose P&L has just been attributed.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import math
+import threading
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+# Bucket width and retention per resolution, finest first
+RESOLUTIONS = {"minute": 60, "hour": 3600, "day": 86400}
+RETENTION = {"minute": 25 * 3600, "hour": 31 * 86400, "day": 400 * 86400}
+
+WINDOWS = {"1d": 86400, "7d": 7 * 86400, "30d": 30 * 86400}
+
+
+@dataclass(slots=True)
+class Bucket:
+    """
+    Summary of the decisions in a time range.
+
+    peak, trough and max_dd describe cumulative P&L measured from the start
+    of the range, in arrival order.
+    """
+
+    count: int = 0
+    n: int = 0
+    total: float = 0.0
+    sumsq: float = 0.0
+    low: float = 0.0
+    high: float = 0.0
+    wins: int = 0
+    peak: float = 0.0
+    trough: float = 0.0
+    max_dd: float = 0.0
+
+    def add_pnl(self, pnl: float) -> None:
+        self.low = pnl if self.n == 0 else min(self.low, pnl)
+        self.high = pnl if self.n == 0 else max(self.high, pnl)
+        self.n += 1
+        self.wins += pnl > 0
+        self.sumsq += pnl * pnl
+        self.total += pnl
+        self.max_dd = max(self.max_dd, self.peak - self.total)
+        self.peak = max(self.peak, self.total)
+        self.trough = min(self.trough, self.total)
+
+    def merge(self, later: Bucket) -> None:
+        """Append a later range to this one."""
+        if later.n:
+            self.low = later.low if self.n == 0 else min(self.low, later.low)
+            self.high = later.high if self.n == 0 else max(self.high, later.high)
+        self.max_dd = max(self.max_dd, later.max_dd, self.peak - (self.total + later.trough))
+        self.peak = max(self.peak, self.total + later.peak)
+        self.trough = min(self.trough, self.total + later.trough)
+        self.count += later.count
+        self.n += later.n
+        self.wins += later.wins
+        self.total += later.total
+        self.sumsq += later.sumsq
+
+    def row(self) -> list:
+        """Fields in declaration order, for compact persistence."""
+        return [
+            self.count,
+            self.n,
+            self.total,
+            self.sumsq,
+            self.low,
+            self.high,
+            self.wins,
+            self.peak,
+            self.trough,
+            self.max_dd,
+        ]
+
+    @property
+    def sharpe(self) -> float:
+        """Mean / sample std of per-decision P&L."""
+        if self.n < 2:
+            return 0.0
+        variance = max(self.sumsq - self.total * self.total / self.n, 0.0) / (self.n - 1)
+        std = variance**0.5
+        return (self.total / self.n) / std if std > 0 else 0.0
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.n if self.n else 0.0
+
+
+def parse_timestamp(value: Any) -> float | None:
+    """Epoch seconds from an ISO timestamp (naive timestamps are taken as UTC)."""
+    if not value:
+        return None
+    try:
+        ts = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=UTC)
+    return ts.timestamp()
+
+
+def decision_keys(decisions: list[dict[str, Any]]) -> list[str]:
+    """Stable identity per decision; repeats of the same decision get a counter."""
+    keys, seen = [], {}
+    for decision in decisions:
+        base = decision.get("id") or (
+            f"{decision.get('agent', 'unknown')}|{decision.get('timestamp')}|"
+            f"{decision.get('decision')}|{decision.get('strategy')}"
+        )
+        seen[base] = seen.get(base, 0) + 1
+        keys.append(f"{base}#{seen[base]}")
+    return keys
+
+
+class RollupStore:
+    """
+    Per-entity time buckets built incrementally from decisions.
+
+    Entities are (dimension, name) pairs: every decision counts towards its
+    agent and, when it carries one, its strategy.
+    """
+
+    def __init__(self, path: Path | None = None, save_interval: float = 60.0):
+        self.path = path
+        self.save_interval = save_interval
+        # (dimension, name) -> resolution -> bucket start -> Bucket
+        self.series: dict[tuple[str, str], dict[str, dict[int, Bucket]]] = {}
+        # (dimension, name, resolution) -> sorted bucket starts, built on demand
+        self._starts: dict[tuple[str, str, str], list[int]] = {}
+        # (dimension, name) -> all-time Bucket (high-water mark, lifetime drawdown)
+        self.totals: dict[tuple[str, str], Bucket] = {}
+        # decision key -> whether its P&L has been counted
+        self.ingested: dict[str, bool] = {}
+        self.source_mtime: int | None = None
+        self._lock = threading.Lock()
+        self._saved_at = -math.inf
+        self._pruned_at = -math.inf
+        if path is not None:
+            self.load()
+
+    # ------------------------------------------------------------------ ingest
+
+    @staticmethod
+    def _entities(decision: dict[str, Any]) -> list[tuple[str, str]]:
+        entities = [("agent", str(decision.get("agent", "unknown")))]
+        if decision.get("strategy"):
+            entities.append(("strategy", str(decision["strategy"])))
+        return entities
+
+    def _touch(self, entity: tuple[str, str], ts: float | None) -> list[Bucket]:
+        buckets = [self.totals.setdefault(entity, Bucket())]
+        if ts is not None:
+            series = self.series.setdefault(entity, {r: {} for r in RESOLUTIONS})
+            for resolution, width in RESOLUTIONS.items():
+                start = int(ts // width * width)
+                bucket = series[resolution].get(start)
+                if bucket is None:
+                    bucket = series[resolution][start] = Bucket()
+                    starts = self._starts.get((*entity, resolution))
+                    if starts is not None:
+                        bisect.insort(starts, start)
+                buckets.append(bucket)
+        return buckets
+
+    def ingest(
+        self, decisions: list[dict[str, Any]], complete: bool = False, now: float | None = None
+    ) -> int:
+        """
+        Fold new decisions and newly attributed P&L into the buckets.
+
+        Args:
+            decisions: Decision dicts (agent, timestamp, pnl, optional strategy)
+            complete: decisions is the whole source, so keys no longer in it
+                can be forgotten
+            now: Reference time for pruning old buckets (default: now)
+
+        Returns:
+            Number of decisions that changed the rollups
+        """
+        changed = 0
+        keys = decision_keys(decisions)
+        with self._lock:
+            for key, decision in zip(keys, decisions, strict=True):
+                counted = self.ingested.get(key)
+                if counted:
+                    continue
+                pnl = decision.get("pnl")
+                if counted is not None and pnl is None:
+                    continue
+                ts = parse_timestamp(decision.get("timestamp"))
+                for entity in self._entities(decision):
+                    buckets = self._touch(entity, ts)
+                    for bucket in buckets:
+                        if counted is None:
+                            bucket.count += 1
+                        if pnl is not None:
+                            bucket.add_pnl(float(pnl))
+                self.ingested[key] = pnl is not None
+                changed += 1
+            if complete:
+                current = set(keys)
+                self.ingested = {k: v for k, v in self.ingested.items() if k in current}
+            now = time.time() if now is None else now
+            if changed and abs(now - self._pruned_at) >= 60:
+                self._prune(now)
+                self._pruned_at = now
+        return changed
+
+    def ingest_file(self, path: Path, now: float | None = None) -> int:
+        """Ingest an attribution file ({"decisions": [...]}) if it changed since last time."""
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return 0
+        if mtime == self.source_mtime:
+            return 0
+        try:
+            decisions = json.loads(path.read_text()).get("decisions", [])
+        except (OSError, ValueError, AttributeError):
+            return 0
+        changed = self.ingest(decisions, complete=True, now=now)
+        self.source_mtime = mtime
+        # Snapshots are self-consistent (buckets and ingested keys together),
+        # so after a restart anything newer than the last one is re-ingested
+        if time.monotonic() - self._saved_at >= self.save_interval:
+            self.save()
+        return changed
+
+    def _prune(self, now: float) -> None:
+        for series in self.series.values():
+            for resolution, buckets in series.items():
+                cutoff = now - RETENTION[resolution] - RESOLUTIONS[resolution]
+                for start in [s for s in buckets if s < cutoff]:
+                    del buckets[start]
+        self._starts.clear()
+
+    # ------------------------------------------------------------------- query
+
+    def names(self, dimension: str) -> list[str]:
+        return [name for dim, name in self.totals if dim == dimension]
+
+    def total(self, dimension: str, name: str) -> Bucket:
+        return self.totals.get((dimension, name), Bucket())
+
+    def window(self, dimension: str, name: str, seconds: float, now: float | None = None) -> Bucket:
+        """
+        Merge of the buckets covering the last `seconds`.
+
+        The window start is resolved to the finest resolution still retained
+        at that age: to the minute for windows up to 25 hours, to the hour up
+        to 31 days, and to the day beyond that.
+        """
+        now = time.time() if now is None else now
+        result = Bucket()
+        with self._lock:
+            series = self.series.get((dimension, name))
+            if series is None:
+                return result
+            start = now - seconds
+            resolutions = list(RESOLUTIONS.items())
+            for i, (resolution, width) in enumerate(resolutions):
+                coarser = resolutions[i + 1][1] if i + 1 < len(resolutions) else None
+                start = start // width * width
+                if coarser is not None and start < now - RETENTION[resolution]:
+                    continue
+                end = math.ceil(start / coarser) * coarser if coarser is not None else math.inf
+                buckets = series[resolution]
+                starts = self._starts.get((dimension, name, resolution))
+                if starts is None:
+                    starts = self._starts[(dimension, name, resolution)] = sorted(buckets)
+                lo = bisect.bisect_left(starts, start)
+                hi = bisect.bisect_left(starts, end)
+                for key in starts[lo:hi]:
+                    result.merge(buckets[key])
+                start = end
+        return result
+
+    def metrics(self, dimension: str, name: str, now: float | None = None) -> dict[str, Any]:
+        """Window P&L, Sharpe, win rate and drawdown for one entity."""
+        now = time.time() if now is None else now
+        windows = {label: self.window(dimension, name, s, now) for label, s in WINDOWS.items()}
+        month, total = windows["30d"], self.total(dimension, name)
+        return {
+            "pnl_1d": windows["1d"].total,
+            "pnl_7d": windows["7d"].total,
+            "pnl_30d": month.total,
+            "sharpe_30d": month.sharpe,
+            "winrate_30d": month.win_rate,
+            "max_dd_30d": month.max_dd,
+            "trade_count": month.n,
+            "total_decisions": total.count,
+            "high_water_mark": total.peak,
+            "drawdown_from_hwm": total.peak - total.total,
+        }
+
+    # ------------------------------------------------------------- persistence
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "version": 1,
+                "source_mtime": self.source_mtime,
+                "ingested": self.ingested,
+                "totals": {f"{d}:{n}": b.row() for (d, n), b in self.totals.items()},
+                "series": {
+                    f"{d}:{n}": {
+                        resolution: {str(start): b.row() for start, b in buckets.items()}
+                        for resolution, buckets in series.items()
+                    }
+                    for (d, n), series in self.series.items()
+                },
+            }
+
+    def load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+        if data.get("version") != 1:
+            return
+
+        def entity(key: str) -> tuple[str, str]:
+            dimension, _, name = key.partition(":")
+            return dimension, name
+
+        self.source_mtime = data.get("source_mtime")
+        self.ingested = dict(data.get("ingested", {}))
+        self.totals = {entity(k): Bucket(*row) for k, row in data.get("totals", {}).items()}
+        self._starts.clear()
+        self.series = {
+            entity(k): {
+                resolution: {int(start): Bucket(*row) for start, row in buckets.items()}
+                for resolution, buckets in series.items()
+            }
+            for k, series in data.get("series", {}).items()
+        }
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.to_dict()))
+        tmp.replace(self.path)
+        self._saved_at = time.monotonic()
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Async Order Routing
+-------------------
+Non-blocking, concurrent submission of parent orders and their slices.
+
+- Independent orders are submitted concurrently, bounded by a token-bucket
+  rate limit and a cap on requests in flight
+- Slices are released by event-loop timers (loop.call_later) instead of
+  sleeping the calling thread
+- Acknowledgements, fills and rejects are reported through callbacks and
+  collected on one OrderHandle per parent order
+- Brokers implement `async submit(child, on_fill) -> ack`: MockBroker
+  injects latency for tests and benchmarks, LiveBroker runs
+  LiveExecutionEngine.execute_order on a worker pool
+
+Usage:
+    router = AsyncOrderRouter(MockBroker(latency=0.05), rate_limit=50)
+    handles = asyncio.run(router.route([OrderRequest("AAPL", "buy", 10, slices=5, interval=1)]))
+"""
+
+import asyncio
+import itertools
+import logging
+import random
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any, Protocol
+
+logger = logging.getLogger(__name__)
+
+FillCallback = Callable[[dict[str, Any]], None]
+REJECTED = ("rejected", "error", "halted")
+
+_parent_ids = itertools.count(1)
+
+
+@dataclass
+class OrderRequest:
+    """
+    Parent order to route.
+
+    Attributes:
+        symbol: Trading symbol
+        side: "buy" or "sell"
+        qty: Total quantity
+        order_type: Broker order type for every slice
+        limit_price: Optional limit price
+        slices: Number of equal child orders
+        interval: Seconds between slice releases
+        client_id: Caller's id (generated when empty)
+    """
+
+    symbol: str
+    side: str
+    qty: float
+    order_type: str = "market"
+    limit_price: float | None = None
+    slices: int = 1
+    interval: float = 0.0
+    client_id: str = ""
+
+    def __post_init__(self):
+        if self.slices < 1:
+            raise ValueError("slices must be at least 1")
+        if not self.client_id:
+            self.client_id = f"P{next(_parent_ids):06d}"
+
+
+@dataclass
+class ChildOrder:
+    """One slice of a parent order."""
+
+    parent: OrderRequest
+    index: int
+    qty: float
+
+    @property
+    def client_id(self) -> str:
+        return f"{self.parent.client_id}-{self.index + 1}"
+
+    @property
+    def symbol(self) -> str:
+        return self.parent.symbol
+
+    @property
+    def side(self) -> str:
+        return self.parent.side
+
+
+@dataclass
+class OrderHandle:
+    """Progress of one parent order; `done` resolves when every slice has settled."""
+
+    request: OrderRequest
+    done: asyncio.Future
+    acks: list[dict[str, Any]] = field(default_factory=list)
+    fills: list[dict[str, Any]] = field(default_factory=list)
+    rejects: list[dict[str, Any]] = field(default_factory=list)
+    submitted_at: float = field(default_factory=time.monotonic)
+    finished_at: float | None = None
+    _open: dict[int, float] = field(default_factory=dict)
+
+    @property
+    def filled_qty(self) -> float:
+        return sum(f["qty"] for f in self.fills)
+
+    @property
+    def avg_price(self) -> float:
+        filled = self.filled_qty
+        return sum(f["qty"] * f["price"] for f in self.fills) / filled if filled > 0 else 0.0
+
+    @property
+    def status(self) -> str:
+        if not self.done.done():
+            return "working"
+        if not self.rejects:
+            return "filled" if self.fills or not self.acks else "accepted"
+        return "partial" if self.acks else "rejected"
+
+    def _settle(self, index: int, qty: float | None = None) -> None:
+        # qty None settles the slice outright (reject, or ack from a broker without fills)
+        if index not in self._open:
+            return
+        remaining = 0.0 if qty is None else self._open[index] - qty
+        if remaining > 1e-12 * max(1.0, self.request.qty):
+            self._open[index] = remaining
+            return
+        del self._open[index]
+        if not self._open and not self.done.done():
+            self.finished_at = time.monotonic()
+            self.done.set_result(self)
+
+
+class Broker(Protocol):
+    """Order gateway used by AsyncOrderRouter."""
+
+    reports_fills: bool
+
+    async def submit(self, child: ChildOrder, on_fill: FillCallback) -> dict[str, Any]:
+        """Send one child order; return its ack and report fills through `on_fill`."""
+        ...
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` requests per second in bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: int | None = None):
+        self.rate = rate
+        self.capacity = float(burst or max(1, int(rate)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+
+class AsyncOrderRouter:
+    """Routes parent orders concurrently within broker rate limits."""
+
+    def __init__(
+        self,
+        broker: Broker,
+        rate_limit: float | None = 200.0,
+        burst: int | None = None,
+        max_in_flight: int = 32,
+        halt_check: Callable[[], tuple[bool, str]] | None = None,
+        on_ack: Callable[[OrderHandle, dict[str, Any]], None] | None = None,
+        on_fill: Callable[[OrderHandle, dict[str, Any]], None] | None = None,
+        on_reject: Callable[[OrderHandle, dict[str, Any]], None] | None = None,
+    ):
+        """
+        Initialize router.
+
+        Args:
+            broker: Order gateway
+            rate_limit: Max submissions per second (None for unlimited)
+            burst: Token-bucket size (defaults to one second's worth)
+            max_in_flight: Max submissions awaiting an ack at once
+            halt_check: Called before each submission; (True, reason) rejects it
+            on_ack: Called with (handle, ack) per accepted slice
+            on_fill: Called with (handle, fill) per (partial) fill
+            on_reject: Called with (handle, reject) per rejected slice
+        """
+        self.broker = broker
+        self.limiter = RateLimiter(rate_limit, burst) if rate_limit else None
+        self.in_flight = asyncio.Semaphore(max_in_flight)
+        self.halt_check = halt_check
+        self.callbacks = {"ack": on_ack, "fill": on_fill, "reject": on_reject}
+        self._timers: set[asyncio.TimerHandle] = set()
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, request: OrderRequest) -> OrderHandle:
+        """Schedule every slice of `request` and return at once."""
+        loop = asyncio.get_running_loop()
+        handle = OrderHandle(request, loop.create_future())
+        slice_qty = request.qty / request.slices
+        for index in range(request.slices):
+            child = ChildOrder(request, index, slice_qty)
+            handle._open[index] = slice_qty
+            if index == 0 or request.interval <= 0:
+                self._launch(handle, child)
+            else:
+                timer = loop.call_later(index * request.interval, self._launch, handle, child)
+                self._timers.add(timer)
+        return handle
+
+    async def route(
+        self, requests: list[OrderRequest], timeout: float | None = None
+    ) -> list[OrderHandle]:
+        """
+        Submit a batch (e.g. a rebalance) and wait for every order to settle.
+
+        Args:
+            requests: Parent orders
+            timeout: Give up waiting after this many seconds; unsettled
+                handles keep status "working"
+
+        Returns:
+            One handle per request, in order
+        """
+        handles = [await self.submit(request) for request in requests]
+        if handles:
+            await asyncio.wait([handle.done for handle in handles], timeout=timeout)
+        return handles
+
+    def close(self) -> None:
+        """Cancel slices not yet released and submissions still running."""
+        for timer in self._timers:
+            timer.cancel()
+        for task in self._tasks:
+            task.cancel()
+        self._timers.clear()
+        self._tasks.clear()
+
+    def _launch(self, handle: OrderHandle, child: ChildOrder) -> None:
+        self._timers = {timer for timer in self._timers if not timer.cancelled()}
+        task = asyncio.ensure_future(self._send(handle, child))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, handle: OrderHandle, child: ChildOrder) -> None:
+        if self.halt_check is not None:
+            halted, reason = self.halt_check()
+            if halted:
+                self._reject(handle, child, reason)
+                return
+        async with self.in_flight:
+            if self.limiter is not None:
+                await self.limiter.acquire()
+            try:
+                ack = await self.broker.submit(
+                    child, lambda fill: self._on_fill(handle, child, fill)
+                )
+            except Exception as e:
+                self._reject(handle, child, f"{type(e).__name__}: {e}")
+                return
+        if ack.get("status") in REJECTED:
+            self._reject(handle, child, ack.get("reason") or ack.get("message", "rejected"))
+            return
+        ack = {**ack, "client_id": child.client_id, "slice": child.index + 1}
+        handle.acks.append(ack)
+        self._notify("ack", handle, ack)
+        if not self.broker.reports_fills:
+            handle._settle(child.index)
+
+    def _on_fill(self, handle: OrderHandle, child: ChildOrder, fill: dict[str, Any]) -> None:
+        fill = {**fill, "client_id": child.client_id, "slice": child.index + 1}
+        handle.fills.append(fill)
+        self._notify("fill", handle, fill)
+        handle._settle(child.index, fill["qty"])
+
+    def _reject(self, handle: OrderHandle, child: ChildOrder, reason: str) -> None:
+        reject = {"client_id": child.client_id, "slice": child.index + 1, "reason": reason}
+        handle.rejects.append(reject)
+        logger.warning(f"⚠️ Slice {child.client_id} rejected: {reason}")
+        self._notify("reject", handle, reject)
+        handle._settle(child.index)
+
+    def _notify(self, kind: str, handle: OrderHandle, event: dict[str, Any]) -> None:
+        callback = self.callbacks[kind]
+        if callback is not None:
+            try:
+                callback(handle, event)
+            except Exception as e:
+                logger.error(f"❌ {kind} callback failed: {e}")
+
+
+class MockBroker:
+    """
+    In-process broker that acks after an injected latency and then fills.
+
+    Attributes:
+        submitted: (client_id, monotonic time) per submission
+        max_concurrent: Most submissions awaiting an ack at once
+    """
+
+    reports_fills = True
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        fill_latency: float = 0.0,
+        partial_fills: int = 1,
+        reject_rate: float = 0.0,
+        price: float | Callable[[str], float] = 100.0,
+        seed: int | None = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.fill_latency = fill_latency
+        self.partial_fills = max(1, partial_fills)
+        self.reject_rate = reject_rate
+        self.price = price
+        self.rng = random.Random(seed)
+        self.submitted: list[tuple[str, float]] = []
+        self.max_concurrent = 0
+        self._active = 0
+        self._order_ids = itertools.count(1)
+
+    async def submit(self, child: ChildOrder, on_fill: FillCallback) -> dict[str, Any]:
+        self.submitted.append((child.client_id, time.monotonic()))
+        self._active += 1
+        self.max_concurrent = max(self.max_concurrent, self._active)
+        try:
+            await asyncio.sleep(self.latency + self.rng.uniform(0.0, self.jitter))
+        finally:
+            self._active -= 1
+        if self.rng.random() < self.reject_rate:
+            return {"status": "rejected", "reason": "mock reject"}
+
+        order_id = f"M{next(self._order_ids):07d}"
+        price = child.parent.limit_price or (
+            self.price(child.symbol) if callable(self.price) else self.price
+        )
+        loop = asyncio.get_running_loop()
+        part = child.qty / self.partial_fills
+        for k in range(self.partial_fills):
+            fill = {"order_id": order_id, "symbol": child.symbol, "side": child.side}
+            fill.update(qty=part, price=price, timestamp=datetime.now(UTC).isoformat())
+            loop.call_later(self.fill_latency * (k + 1), on_fill, fill)
+        return {"status": "accepted", "order_id": order_id}
+
+
+class LiveBroker:
+    """
+    LiveExecutionEngine behind the async interface.
+
+    execute_order blocks on HTTP, so submissions run on a dedicated thread
+    pool sized for the router's in-flight cap. Fills are reported when the
+    broker's response already shows them; otherwise the slice settles on ack.
+    """
+
+    reports_fills = False
+
+    def __init__(self, engine, max_workers: int = 16):
+        self.engine = engine
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="broker")
+
+    async def submit(self, child: ChildOrder, on_fill: FillCallback) -> dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            self.executor,
+            lambda: self.engine.execute_order(
+                child.symbol, child.qty, child.side, child.parent.order_type
+            ),
+        )
+        if result.get("status") != "success":
+            return {"status": "rejected", "reason": result.get("reason") or result.get("message")}
+        order = result.get("result") or {}
+        filled = float(order.get("filled_qty") or 0.0)
+        if filled > 0:
+            on_fill(
+                {
+                    "order_id": result.get("order_id"),
+                    "symbol": child.symbol,
+                    "side": child.side,
+                    "qty": filled,
+                    "price": float(order.get("filled_avg_price") or 0.0),
+                    "timestamp": datetime.now(UTC).isoformat(),
+                }
+            )
+        return {"status": "accepted", "order_id": result.get("order_id")}
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False)
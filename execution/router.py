@@ -2,20 +2,76 @@
 Smart Routing (TWAP/VWAP Fusion)
 Chooses best execution method based on market conditions
 World-class: Strategy selection, error handling, Guardian integration
+
+Pre-trade risk checks run locally against RiskExtensions' exposure tracker
+(constant time per order); the remote risk engine is only consulted when
+ROUTER_REMOTE_RISK=true or the tracker is unavailable.
+
+Slices are submitted through execution.async_router: a batch of orders (a
+rebalance) is routed concurrently and slices are released by timers, so
+wall time is roughly one order's schedule rather than the sum of all.
 """
 
+import asyncio
 import os
-import time
-from datetime import datetime
+import sys
+from pathlib import Path
 from typing import Any
 
 import requests
 
+# Package imports when run as a script
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from execution.async_router import (  # noqa: E402
+    AsyncOrderRouter,
+    LiveBroker,
+    MockBroker,
+    OrderRequest,
+)
+
+try:
+    from phases.phase_281_300_risk_extensions import RiskExtensions  # noqa: E402
+
+    HAS_EXPOSURE_TRACKER = True
+except ImportError:
+    HAS_EXPOSURE_TRACKER = False
+
+try:
+    from trader.quote_service import get_quote_service  # noqa: E402
+
+    HAS_QUOTE_SERVICE = True
+except ImportError:
+    HAS_QUOTE_SERVICE = False
+
 # Detect Render environment - use environment variables or skip localhost connections
 RENDER_MODE = os.getenv("RENDER_MODE", "false").lower() == "true"
 RISK_ENGINE_URL = os.getenv("RISK_ENGINE_URL", "http://localhost:8300")
 DASHBOARD_URL = os.getenv("DASHBOARD_URL", "http://localhost:8100")
 GUARDIAN_PAUSE_CHECK = True  # Check Guardian before routing
+REMOTE_RISK_CHECK = os.getenv("ROUTER_REMOTE_RISK", "false").lower() == "true"
+ROUTER_BROKER = os.getenv("ROUTER_BROKER", "mock").lower()  # "mock" or "alpaca"
+SLICE_INTERVAL = float(os.getenv("ROUTER_SLICE_INTERVAL", "0.1"))  # Seconds between slices
+LIVE_RATE_LIMIT = float(os.getenv("ROUTER_RATE_LIMIT", "3.0"))  # Alpaca: 200 requests/minute
+MAX_IN_FLIGHT = int(os.getenv("ROUTER_MAX_IN_FLIGHT", "16"))
+MOCK_FILL_PRICE = 107000.0
+
+_risk_extensions = None
+
+
+def get_risk_extensions():
+    """Shared RiskExtensions seeded from the portfolio snapshot (None if unavailable)."""
+    global _risk_extensions
+    if _risk_extensions is None and HAS_EXPOSURE_TRACKER:
+        try:
+            _risk_extensions = RiskExtensions()
+            _risk_extensions.sync_portfolio()
+        except Exception as e:
+            print(f"[router] Exposure tracker unavailable: {e}", flush=True)
+            _risk_extensions = None
+    return _risk_extensions
 
 
 def check_guardian_pause() -> bool:
@@ -38,7 +94,12 @@ def check_guardian_pause() -> bool:
 def validate_trade_with_risk(
     symbol: str, side: str, quantity: float, price: float, portfolio_value: float
 ) -> tuple[bool, str]:
-    """Validate trade with risk engine."""
+    """Validate trade against local exposure limits, then optionally the risk engine."""
+    risk = get_risk_extensions()
+    if risk is not None:
+        check = risk.check_order(symbol, side, quantity, price)
+        if not check["approved"] or RENDER_MODE or not REMOTE_RISK_CHECK:
+            return check["approved"], check["reason"]
     if RENDER_MODE:
         # On Render, skip risk engine validation (would use file-based state)
         # Return approved with warning
@@ -69,7 +130,30 @@ def validate_trade_with_risk(
     return False, "Risk validation failed"
 
 
-def route_order(
+def reference_price(symbol: str, limit_price: float | None = None) -> float:
+    """
+    Price used for pre-trade checks: the limit, else the tracker's mark, else a quote.
+
+    Returns 0.0 when nothing is known; the exposure check then skips its
+    notional limits rather than rejecting the order.
+    """
+    if limit_price:
+        return limit_price
+    risk = get_risk_extensions()
+    position = risk.exposure.positions.get(symbol) if risk is not None else None
+    if position is not None and position.price > 0:
+        return position.price
+    if HAS_QUOTE_SERVICE:
+        try:
+            quote = get_quote_service().get_quote(symbol)
+            if quote is not None:
+                return quote.mid_price
+        except Exception as e:
+            print(f"[router] Quote lookup failed for {symbol}: {e}", flush=True)
+    return 0.0
+
+
+def plan_order(
     symbol: str,
     side: str,
     qty: float,
@@ -77,26 +161,17 @@ def route_order(
     hints: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
     """
-    Route order using optimal execution strategy.
-
-    Args:
-        symbol: Trading symbol
-        side: "buy" or "sell"
-        qty: Quantity to trade
-        limit_price: Optional limit price
-        hints: Optional hints (max_slice, time_horizon_sec)
+    Risk-check an order and choose its execution strategy.
 
     Returns:
-        Routing result with strategy, slices, fills
+        {"status": "planned", "strategy", "slices", "request": OrderRequest},
+        or a rejection
     """
-    # Check Guardian pause
-    if GUARDIAN_PAUSE_CHECK and check_guardian_pause():
-        return {"status": "rejected", "reason": "Guardian pause active", "strategy": None}
-
     # Validate with risk engine
-    portfolio_value = 100000.0  # Would come from actual portfolio
+    risk = get_risk_extensions()
+    portfolio_value = risk.exposure.equity if risk is not None else 100000.0
     approved, reason = validate_trade_with_risk(
-        symbol, side, qty, limit_price or 0.0, portfolio_value
+        symbol, side, qty, reference_price(symbol, limit_price), portfolio_value
     )
     if not approved:
         return {"status": "rejected", "reason": reason, "strategy": None}
@@ -112,36 +187,130 @@ def route_order(
     # High vol or thin book → TWAP
     if liquidity["spread_bps"] < 10 and liquidity["depth_1pct"] > 20000:
         strategy = "VWAP"
-        slices = min(max_slice, int(time_horizon / 60))  # 1 slice per minute
+        slices = max(1, min(max_slice, int(time_horizon / 60)))  # 1 slice per minute
     else:
         strategy = "TWAP"
         slices = max_slice
 
-    # Execute (mock - would use actual broker)
     print(f"[router] Routing {side} {qty} {symbol} using {strategy} ({slices} slices)", flush=True)
+    request = OrderRequest(
+        symbol, side, qty, limit_price=limit_price, slices=slices, interval=SLICE_INTERVAL
+    )
+    return {"status": "planned", "strategy": strategy, "slices": slices, "request": request}
+
+
+def make_broker():
+    """Broker selected by ROUTER_BROKER (the mock fills at the limit or a mock price)."""
+    if ROUTER_BROKER == "alpaca":
+        from trader.live_execution import LiveExecutionEngine
+
+        use_paper = os.getenv("ROUTER_ALPACA_PAPER", "true").lower() == "true"
+        return LiveBroker(LiveExecutionEngine(use_paper=use_paper), max_workers=MAX_IN_FLIGHT)
+    return MockBroker(latency=0.0, price=MOCK_FILL_PRICE)
+
+
+async def route_orders_async(
+    orders: list[dict[str, Any]], broker=None, timeout: float | None = None
+) -> list[dict[str, Any]]:
+    """
+    Route a batch of orders concurrently.
 
-    # Simulate execution
-    fills = []
-    slice_qty = qty / slices
-    for i in range(slices):
-        time.sleep(0.1)  # Simulate slice delay
-        fills.append(
-            {
-                "slice": i + 1,
-                "quantity": slice_qty,
-                "price": limit_price or 107000.0,  # Mock price
-                "timestamp": datetime.now().isoformat(),
-            }
+    Args:
+        orders: route_order keyword arguments, one dict per order
+        broker: Order gateway (defaults to make_broker(), closed afterwards)
+        timeout: Stop waiting for unsettled slices after this many seconds
+
+    Returns:
+        One routing result per order, in order
+    """
+    # Check Guardian pause
+    if GUARDIAN_PAUSE_CHECK and check_guardian_pause():
+        return [
+            {"status": "rejected", "reason": "Guardian pause active", "strategy": None}
+            for _ in orders
+        ]
+
+    plans = [plan_order(**order) for order in orders]
+    planned = [plan for plan in plans if plan["status"] == "planned"]
+    if not planned:
+        return plans
+
+    owned = broker is None
+    broker = broker or make_broker()
+    live = isinstance(broker, LiveBroker)
+    # Only broker-confirmed fills move the shared tracker; mock fills are simulated
+    risk = get_risk_extensions() if live else None
+
+    def book_fill(handle, fill):
+        if risk is not None:
+            risk.record_fill(handle.request.symbol, handle.request.side, fill["qty"], fill["price"])
+
+    router = AsyncOrderRouter(
+        broker,
+        rate_limit=LIVE_RATE_LIMIT if live else None,
+        max_in_flight=MAX_IN_FLIGHT,
+        on_fill=book_fill,
+    )
+    try:
+        handles = await router.route([plan["request"] for plan in planned], timeout=timeout)
+    finally:
+        router.close()
+        if live:
+            broker.engine.flush_circuit_breaker_state()
+            if owned:
+                broker.close()
+
+    for plan, handle in zip(planned, handles, strict=True):
+        plan.pop("request")
+        status = {"filled": "executed", "accepted": "submitted"}.get(handle.status, handle.status)
+        plan.update(
+            status=status,
+            fills=[
+                {
+                    "slice": fill["slice"],
+                    "quantity": fill["qty"],
+                    "price": fill["price"],
+                    "timestamp": fill["timestamp"],
+                }
+                for fill in handle.fills
+            ],
+            total_filled=handle.filled_qty,
+            avg_fill_price=handle.avg_price,
         )
+        if handle.rejects:
+            plan["reason"] = handle.rejects[0]["reason"]
+    return plans
+
+
+def route_orders(
+    orders: list[dict[str, Any]], broker=None, timeout: float | None = None
+) -> list[dict[str, Any]]:
+    """Blocking wrapper around route_orders_async (not for use inside an event loop)."""
+    return asyncio.run(route_orders_async(orders, broker, timeout))
+
+
+def route_order(
+    symbol: str,
+    side: str,
+    qty: float,
+    limit_price: float | None = None,
+    hints: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """
+    Route order using optimal execution strategy.
+
+    Args:
+        symbol: Trading symbol
+        side: "buy" or "sell"
+        qty: Quantity to trade
+        limit_price: Optional limit price
+        hints: Optional hints (max_slice, time_horizon_sec)
 
-    return {
-        "status": "executed",
-        "strategy": strategy,
-        "slices": slices,
-        "fills": fills,
-        "total_filled": qty,
-        "avg_fill_price": limit_price or 107000.0,
-    }
+    Returns:
+        Routing result with strategy, slices, fills
+    """
+    order = {"symbol": symbol, "side": side, "qty": qty, "limit_price": limit_price}
+    return route_orders([{**order, "hints": hints}])[0]
 
 
 if __name__ == "__main__":
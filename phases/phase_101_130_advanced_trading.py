@@ -4,6 +4,7 @@ Phase 101-130: Advanced Trading Features - WORLD CLASS
 ======================================================
 Einstein-level advanced trading:
 - Advanced order types (stop-loss, take-profit, trailing stops)
+- Price-indexed trigger book (only crossed orders are touched per tick)
 - Slippage modeling
 - Market impact estimation
 - Order routing optimization
@@ -12,13 +13,18 @@ Einstein-level advanced trading:
 - Paper-mode compatible
 """
 
+import heapq
 import json
 import logging
+import math
 import os
 import random
 import time
+from collections import deque
+from collections.abc import Iterable
 from datetime import UTC, datetime, timedelta
 from pathlib import Path
+from typing import Any
 
 ROOT = Path(os.path.expanduser("~/neolight"))
 STATE = ROOT / "state"
@@ -57,7 +63,10 @@ except ImportError:
     HAS_WORLD_CLASS_UTILS = False
     logger.warning("⚠️ World-class utilities not available")
 
-ADVANCED_ORDERS_FILE = RUNTIME / "advanced_orders.json"
+from utils.order_store import OrderStore  # noqa: E402
+
+ADVANCED_ORDERS_FILE = RUNTIME / "advanced_orders.json"  # legacy full dump, migrated once
+ADVANCED_ORDER_STORE_DIR = RUNTIME / "advanced_order_store"
 
 
 class AdvancedOrder:
@@ -75,6 +84,8 @@ class AdvancedOrder:
         take_profit: float | None = None,
         trailing_stop: float | None = None,
         time_in_force: str = "GTC",
+        expires_at: datetime | None = None,
+        trail_extreme: float | None = None,
     ):
         self.order_id = order_id
         self.symbol = symbol
@@ -85,53 +96,406 @@ class AdvancedOrder:
         self.stop_loss = stop_loss
         self.take_profit = take_profit
         self.trailing_stop = trailing_stop
-        self.time_in_force = time_in_force  # GTC, IOC, FOK, DAY
+        self.time_in_force = time_in_force  # GTC, IOC, FOK, DAY, GTD
         self.status = "pending"
         self.created_at = datetime.now(UTC)
-        self.expires_at = None
-        if time_in_force == "DAY":
+        self.expires_at = expires_at
+        # Best price seen since creation (high for buy, low for sell); trailing anchor
+        self.trail_extreme = trail_extreme
+        if time_in_force == "DAY" and expires_at is None:
             self.expires_at = (self.created_at + timedelta(days=1)).replace(
                 hour=16, minute=0, second=0
             )
+        elif time_in_force == "GTD" and expires_at is None:
+            raise ValueError("GTD orders need expires_at")
+
+    def trigger_levels(self) -> list[tuple[str, float, bool]]:
+        """
+        Static trigger thresholds in priority order.
+
+        Returns:
+            (trigger, level, fires_at_or_below) tuples; fires_at_or_below is True
+            when the trigger fires on price <= level and False for price >= level
+        """
+        buy = self.side == "buy"
+        levels = []
+        if self.stop_loss:
+            levels.append(("stop_loss", self.stop_loss, buy))
+        if self.take_profit:
+            levels.append(("take_profit", self.take_profit, not buy))
+        if self.price and self.order_type == "limit":
+            levels.append(("limit", self.price, buy))
+        elif self.price and self.order_type == "stop":
+            levels.append(("stop", self.price, not buy))
+        return levels
+
+    def static_trigger(self, current_price: float) -> str | None:
+        """First static threshold crossed by current_price, if any."""
+        for trigger, level, at_or_below in self.trigger_levels():
+            if current_price <= level if at_or_below else current_price >= level:
+                return trigger
+        return None
 
-    def check_triggers(self, current_price: float) -> str | None:
-        """Check if stop-loss, take-profit, or trailing stop should trigger."""
+    def check_triggers(self, current_price: float, now: datetime | None = None) -> str | None:
+        """Check if stop-loss, take-profit, entry price or trailing stop should trigger."""
         if self.status != "pending":
             return None
 
         # Check expiration
-        if self.expires_at and datetime.now(UTC) > self.expires_at:
+        if self.expires_at and (now or datetime.now(UTC)) > self.expires_at:
             return "expired"
 
-        # Check stop-loss
-        if self.stop_loss:
+        trigger = self.static_trigger(current_price)
+        if trigger:
+            return trigger
+
+        # Check trailing stop against the best price so far
+        if self.trailing_stop:
+            if self.trail_extreme is None:
+                self.trail_extreme = current_price
+            elif self.side == "buy":
+                self.trail_extreme = max(self.trail_extreme, current_price)
+            else:
+                self.trail_extreme = min(self.trail_extreme, current_price)
             if (
                 self.side == "buy"
-                and current_price <= self.stop_loss
+                and current_price <= self.trail_extreme * (1 - self.trailing_stop)
                 or self.side == "sell"
-                and current_price >= self.stop_loss
+                and current_price >= self.trail_extreme * (1 + self.trailing_stop)
             ):
-                return "stop_loss"
-
-        # Check take-profit
-        if self.take_profit:
-            if (
-                self.side == "buy"
-                and current_price >= self.take_profit
-                or self.side == "sell"
-                and current_price <= self.take_profit
-            ):
-                return "take_profit"
+                return "trailing_stop"
 
         return None
 
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "AdvancedOrder":
+        """Rebuild an order from to_dict() output."""
+        expires_at = data.get("expires_at")
+        order = cls(
+            data["order_id"],
+            data["symbol"],
+            data["side"],
+            data["quantity"],
+            data.get("order_type", "market"),
+            data.get("price"),
+            data.get("stop_loss"),
+            data.get("take_profit"),
+            data.get("trailing_stop"),
+            data.get("time_in_force", "GTC"),
+            datetime.fromisoformat(expires_at) if expires_at else None,
+            data.get("trail_extreme"),
+        )
+        order.status = data.get("status", "pending")
+        if data.get("created_at"):
+            order.created_at = datetime.fromisoformat(data["created_at"])
+        return order
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert order to dictionary."""
+        return {
+            "order_id": self.order_id,
+            "symbol": self.symbol,
+            "side": self.side,
+            "quantity": self.quantity,
+            "order_type": self.order_type,
+            "price": self.price,
+            "stop_loss": self.stop_loss,
+            "take_profit": self.take_profit,
+            "trailing_stop": self.trailing_stop,
+            "time_in_force": self.time_in_force,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "expires_at": self.expires_at.isoformat() if self.expires_at else None,
+            "trail_extreme": self.trail_extreme,
+        }
+
+
+class ExpiryWheel:
+    """
+    Bucketed expiry timer.
+
+    Expiry times are rounded up to `resolution` seconds and share a slot, so the
+    thousands of DAY orders expiring at the close cost one slot. Due slots are
+    found through a heap of slot numbers, so idle gaps cost nothing to skip.
+    """
+
+    def __init__(self, resolution: float = 1.0):
+        self.resolution = resolution
+        self._slots: dict[int, list[str]] = {}
+        self._due: list[int] = []
+
+    def add(self, order_id: str, expires_at: float) -> None:
+        """Schedule order_id to expire at (or within resolution after) a UNIX time."""
+        slot = math.ceil(expires_at / self.resolution)
+        bucket = self._slots.get(slot)
+        if bucket is None:
+            bucket = self._slots[slot] = []
+            heapq.heappush(self._due, slot)
+        bucket.append(order_id)
+
+    def pop_due(self, now: float) -> list[str]:
+        """Remove and return order ids whose slot has passed."""
+        expired: list[str] = []
+        while self._due and self._due[0] * self.resolution <= now:
+            expired.extend(self._slots.pop(heapq.heappop(self._due)))
+        return expired
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self._slots.values())
+
+
+class TrailingLadder:
+    """
+    Trailing stops of one side and offset for one symbol.
+
+    Orders are grouped by their best price so far. Groups form a deque from
+    oldest (most extreme best price, nearest trigger) to newest. A new extreme
+    merges the newest groups into one; a trigger pops the oldest groups. Each
+    order is merged O(log n) times and popped once, so ticks stay amortized
+    O(1) plus the orders they fire.
+    """
+
+    def __init__(self, side: str, offset: float):
+        self.side = side
+        self.offset = offset
+        self._groups: deque[list] = deque()  # [extreme, order_ids]
+
+    def add(self, order_id: str, anchor: float) -> None:
+        self._absorb(anchor, [order_id])
+
+    def update(self, price: float) -> list[str]:
+        """Track price and return order ids whose trailing stop it crosses."""
+        self._absorb(price, [])
+        groups, fired = self._groups, []
+        if self.side == "buy":
+            while groups and price <= groups[0][0] * (1 - self.offset):
+                fired.extend(groups.popleft()[1])
+        else:
+            while groups and price >= groups[0][0] * (1 + self.offset):
+                fired.extend(groups.popleft()[1])
+        return fired
+
+    def extremes(self) -> Iterable[tuple[str, float]]:
+        """(order_id, best price so far) for every tracked order."""
+        for extreme, order_ids in self._groups:
+            for order_id in order_ids:
+                yield order_id, extreme
+
+    def prune(self, live: dict[str, Any]) -> None:
+        """Drop order ids not in live."""
+        groups = deque()
+        for extreme, order_ids in self._groups:
+            kept = [order_id for order_id in order_ids if order_id in live]
+            if kept:
+                groups.append([extreme, kept])
+        self._groups = groups
+
+    def __len__(self) -> int:
+        return sum(len(order_ids) for _, order_ids in self._groups)
+
+    def _absorb(self, price: float, merged: list[str]) -> None:
+        groups = self._groups
+        if self.side == "buy":
+            while groups and groups[-1][0] <= price:
+                merged = _merge_ids(merged, groups.pop()[1])
+        else:
+            while groups and groups[-1][0] >= price:
+                merged = _merge_ids(merged, groups.pop()[1])
+        if merged:
+            groups.append([price, merged])
+
+
+def _merge_ids(a: list[str], b: list[str]) -> list[str]:
+    # Extend the larger list so each id is copied O(log n) times overall
+    if len(a) < len(b):
+        a, b = b, a
+    a.extend(b)
+    return a
+
+
+class _SymbolTriggers:
+    """Trigger structures for one symbol."""
+
+    def __init__(self):
+        self.at_or_below: list[tuple[float, int, str]] = []  # max-heap via -level
+        self.at_or_above: list[tuple[float, int, str]] = []  # min-heap
+        self.ladders: dict[tuple[str, float], TrailingLadder] = {}
+        self.unanchored: list[str] = []
+        self.live = 0
+        self.dead = 0
+
+
+class TriggerBook:
+    """
+    Price-indexed book of resting advanced orders.
+
+    Per symbol, static thresholds (stop-loss, take-profit, limit and stop entry
+    prices) sit in two heaps: levels that fire at or below the price and levels
+    that fire at or above it. A tick pops only the crossed levels. Trailing
+    stops live in TrailingLadder objects keyed by (side, offset), and DAY/GTD
+    expiries in an ExpiryWheel. Triggered or cancelled orders leave stale
+    entries that are skipped when popped and pruned once they outnumber live
+    ones. Results match AdvancedOrder.check_triggers tick for tick, except that
+    expiry fires on the first tick of any symbol at most `expiry_resolution`
+    seconds late.
+    """
+
+    COMPACT_MIN_DEAD = 1024
+
+    def __init__(self, expiry_resolution: float = 1.0):
+        self.orders: dict[str, AdvancedOrder] = {}
+        self.last_price: dict[str, float] = {}
+        self._symbols: dict[str, _SymbolTriggers] = {}
+        self._expiries = ExpiryWheel(expiry_resolution)
+        self._seq = 0
+
+    def add(self, order: AdvancedOrder) -> None:
+        """Index a pending order."""
+        if order.status != "pending" or order.order_id in self.orders:
+            return
+        order_id = order.order_id
+        self.orders[order_id] = order
+        book = self._symbols.get(order.symbol)
+        if book is None:
+            book = self._symbols[order.symbol] = _SymbolTriggers()
+        book.live += 1
+
+        for _, level, at_or_below in order.trigger_levels():
+            self._seq += 1
+            if at_or_below:
+                heapq.heappush(book.at_or_below, (-level, self._seq, order_id))
+            else:
+                heapq.heappush(book.at_or_above, (level, self._seq, order_id))
+
+        if order.trailing_stop:
+            anchor = order.trail_extreme
+            if anchor is None:
+                anchor = self.last_price.get(order.symbol)
+            if anchor is None:
+                book.unanchored.append(order_id)
+            else:
+                self._ladder(book, order).add(order_id, anchor)
+
+        if order.expires_at:
+            self._expiries.add(order_id, order.expires_at.timestamp())
+
+    def discard(self, order_id: str) -> AdvancedOrder | None:
+        """Stop tracking an order (cancelled or filled elsewhere)."""
+        order = self.orders.pop(order_id, None)
+        if order is not None:
+            self._retire(self._symbols[order.symbol])
+        return order
+
+    def on_tick(
+        self, symbol: str, price: float, now: datetime | None = None
+    ) -> list[tuple[str, str]]:
+        """
+        Process one price tick.
+
+        Args:
+            symbol: Ticking symbol
+            price: Trade or mid price
+            now: Tick time for expiries (default: current UTC time)
+
+        Returns:
+            (order_id, trigger) for every order that fired; fired orders leave the book
+        """
+        fired = []
+        timestamp = (now or datetime.now(UTC)).timestamp()
+        for order_id in self._expiries.pop_due(timestamp):
+            order = self.orders.pop(order_id, None)
+            if order is not None:
+                self._retire(self._symbols[order.symbol])
+                fired.append((order_id, "expired"))
+
+        self.last_price[symbol] = price
+        book = self._symbols.get(symbol)
+        if book is None:
+            return fired
+
+        crossed: dict[str, None] = {}
+        below, above = book.at_or_below, book.at_or_above
+        while below and -below[0][0] >= price:
+            crossed[heapq.heappop(below)[2]] = None
+        while above and above[0][0] <= price:
+            crossed[heapq.heappop(above)[2]] = None
+        for order_id in crossed:
+            order = self.orders.pop(order_id, None)
+            if order is not None:
+                self._retire(book)
+                fired.append((order_id, order.static_trigger(price)))
+
+        if book.unanchored:
+            for order_id in book.unanchored:
+                order = self.orders.get(order_id)
+                if order is not None:
+                    self._ladder(book, order).add(order_id, price)
+            book.unanchored = []
+        for ladder in book.ladders.values():
+            for order_id in ladder.update(price):
+                if self.orders.pop(order_id, None) is not None:
+                    self._retire(book)
+                    fired.append((order_id, "trailing_stop"))
+
+        if book.dead > max(self.COMPACT_MIN_DEAD, book.live):
+            self._compact(book)
+        return fired
+
+    def trail_extremes(self) -> dict[str, float]:
+        """Best price so far for every anchored trailing order."""
+        return {
+            order_id: extreme
+            for book in self._symbols.values()
+            for ladder in book.ladders.values()
+            for order_id, extreme in ladder.extremes()
+            if order_id in self.orders
+        }
+
+    def __len__(self) -> int:
+        return len(self.orders)
+
+    def __contains__(self, order_id: str) -> bool:
+        return order_id in self.orders
+
+    def _ladder(self, book: _SymbolTriggers, order: AdvancedOrder) -> TrailingLadder:
+        key = (order.side, order.trailing_stop)
+        ladder = book.ladders.get(key)
+        if ladder is None:
+            ladder = book.ladders[key] = TrailingLadder(order.side, order.trailing_stop)
+        return ladder
+
+    def _retire(self, book: _SymbolTriggers) -> None:
+        book.live -= 1
+        book.dead += 1
+
+    def _compact(self, book: _SymbolTriggers) -> None:
+        live = self.orders
+        book.at_or_below = [entry for entry in book.at_or_below if entry[2] in live]
+        book.at_or_above = [entry for entry in book.at_or_above if entry[2] in live]
+        heapq.heapify(book.at_or_below)
+        heapq.heapify(book.at_or_above)
+        for key, ladder in list(book.ladders.items()):
+            ladder.prune(live)
+            if not len(ladder):
+                del book.ladders[key]
+        book.dead = 0
+
 
 class AdvancedTradingEngine:
     """World-class advanced trading engine."""
 
-    def __init__(self):
-        """Initialize advanced trading engine."""
-        self.orders: dict[str, AdvancedOrder] = {}
+    def __init__(self, store_dir: Path | None = None):
+        """
+        Initialize advanced trading engine.
+
+        Args:
+            store_dir: Order store directory (default runtime/advanced_order_store)
+        """
+        self.store = OrderStore(
+            store_dir or ADVANCED_ORDER_STORE_DIR, factory=AdvancedOrder.from_dict
+        )
+        self.orders: dict[str, AdvancedOrder] = self.store.orders
+        self.book = TriggerBook()
         self.state_manager = None
         if HAS_WORLD_CLASS_UTILS:
             try:
@@ -147,57 +511,42 @@ class AdvancedTradingEngine:
         logger.info("✅ AdvancedTradingEngine initialized")
 
     def load_state(self):
-        """Load advanced orders from disk."""
-        if ADVANCED_ORDERS_FILE.exists():
+        """Recover advanced orders (store journal, plus one-time legacy import)."""
+        if not self.orders and ADVANCED_ORDERS_FILE.exists():
             try:
                 data = json.loads(ADVANCED_ORDERS_FILE.read_text())
                 for order_data in data.get("orders", []):
-                    order = AdvancedOrder(
-                        order_data["order_id"],
-                        order_data["symbol"],
-                        order_data["side"],
-                        order_data["quantity"],
-                        order_data.get("order_type", "market"),
-                        order_data.get("price"),
-                        order_data.get("stop_loss"),
-                        order_data.get("take_profit"),
-                        order_data.get("trailing_stop"),
-                        order_data.get("time_in_force", "GTC"),
-                    )
-                    order.status = order_data.get("status", "pending")
-                    self.orders[order.order_id] = order
-                logger.info(f"✅ Loaded {len(self.orders)} advanced orders")
+                    self.store.put(AdvancedOrder.from_dict(order_data))
+                self.store.compact()
+                ADVANCED_ORDERS_FILE.rename(ADVANCED_ORDERS_FILE.with_suffix(".json.migrated"))
+                logger.info(f"✅ Migrated {len(self.orders)} legacy advanced orders")
             except Exception as e:
-                logger.warning(f"⚠️ Error loading orders: {e}")
+                logger.warning(f"⚠️ Error migrating legacy orders: {e}")
+
+        for order_id in self.store.ids_by_status("pending"):
+            self.book.add(self.orders[order_id])
+        logger.info(f"✅ Loaded {len(self.orders)} advanced orders ({len(self.book)} resting)")
 
     def save_state(self):
-        """Save advanced orders to disk."""
+        """Persist trailing anchors and flush the order journal."""
         try:
-            orders_data = {
-                "timestamp": datetime.now(UTC).isoformat(),
-                "orders": [
-                    {
-                        "order_id": o.order_id,
-                        "symbol": o.symbol,
-                        "side": o.side,
-                        "quantity": o.quantity,
-                        "order_type": o.order_type,
-                        "price": o.price,
-                        "stop_loss": o.stop_loss,
-                        "take_profit": o.take_profit,
-                        "trailing_stop": o.trailing_stop,
-                        "time_in_force": o.time_in_force,
-                        "status": o.status,
-                        "created_at": o.created_at.isoformat(),
-                        "expires_at": o.expires_at.isoformat() if o.expires_at else None,
-                    }
-                    for o in self.orders.values()
-                ],
-            }
-            ADVANCED_ORDERS_FILE.write_text(json.dumps(orders_data, indent=2))
+            for order_id, extreme in self.book.trail_extremes().items():
+                order = self.orders[order_id]
+                if order.trail_extreme != extreme:
+                    order.trail_extreme = extreme
+                    self.store.put(order)
+            self.store.flush()
 
             if self.state_manager:
-                self.state_manager.save_state(orders_data)
+                self.state_manager.save(
+                    {
+                        "orders": {
+                            "timestamp": datetime.now(UTC).isoformat(),
+                            "total": len(self.store),
+                            "resting": len(self.book),
+                        }
+                    }
+                )
         except Exception as e:
             logger.error(f"❌ Error saving state: {e}")
 
@@ -228,9 +577,12 @@ class AdvancedTradingEngine:
         take_profit: float | None = None,
         trailing_stop: float | None = None,
         time_in_force: str = "GTC",
+        expires_at: datetime | None = None,
     ) -> str:
         """Create an advanced order."""
         order_id = f"ADV_{int(time.time())}_{random.randint(1000, 9999)}"
+        while order_id in self.orders:
+            order_id = f"ADV_{int(time.time())}_{random.randint(1000, 9999)}"
 
         order = AdvancedOrder(
             order_id,
@@ -243,8 +595,12 @@ class AdvancedTradingEngine:
             take_profit,
             trailing_stop,
             time_in_force,
+            expires_at,
         )
-        self.orders[order_id] = order
+        if trailing_stop:
+            order.trail_extreme = self.book.last_price.get(symbol)
+        self.store.put(order)
+        self.book.add(order)
 
         logger.info(f"📝 Created advanced {side.upper()} order: {order_id} for {quantity} {symbol}")
         if stop_loss:
@@ -254,20 +610,49 @@ class AdvancedTradingEngine:
         if trailing_stop:
             logger.info(f"   Trailing stop: {trailing_stop:.2%}")
 
-        self.save_state()
         return order_id
 
-    def check_order_triggers(self, symbol: str, current_price: float):
-        """Check all orders for trigger conditions."""
-        for order in self.orders.values():
-            if order.symbol != symbol or order.status != "pending":
-                continue
-
-            trigger = order.check_triggers(current_price)
-            if trigger:
-                logger.info(f"🎯 Order {order.order_id} triggered: {trigger}")
-                order.status = trigger
-                self.save_state()
+    def cancel_order(self, order_id: str) -> bool:
+        """Cancel a pending advanced order."""
+        order = self.orders.get(order_id)
+        if order is None or order.status != "pending":
+            return False
+        order.status = "cancelled"
+        self.book.discard(order_id)
+        self.store.put(order)
+        logger.info(f"❌ Cancelled advanced order: {order_id}")
+        return True
+
+    def check_order_triggers(
+        self, symbol: str, current_price: float, now: datetime | None = None
+    ) -> list[tuple[str, str]]:
+        """
+        Apply a price tick; only orders whose thresholds it crosses are touched.
+
+        Args:
+            symbol: Ticking symbol
+            current_price: Latest price
+            now: Tick time for DAY/GTD expiry (default: current UTC time)
+
+        Returns:
+            (order_id, trigger) pairs for orders that fired on this tick
+        """
+        fired = self.book.on_tick(symbol, current_price, now)
+        for order_id, trigger in fired:
+            order = self.orders[order_id]
+            order.status = trigger
+            self.store.put(order)
+            logger.info(f"🎯 Order {order_id} triggered: {trigger}")
+        return fired
+
+    def process_ticks(
+        self, ticks: Iterable[tuple[str, float]], now: datetime | None = None
+    ) -> list[tuple[str, str]]:
+        """Apply a batch of (symbol, price) ticks in order."""
+        fired = []
+        for symbol, price in ticks:
+            fired.extend(self.check_order_triggers(symbol, price, now))
+        return fired
 
 
 @world_class_agent(
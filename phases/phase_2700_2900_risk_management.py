@@ -10,6 +10,10 @@ Comprehensive risk metrics with integration to risk attribution:
 - Liquidity Risk Monitoring
 - Drawdown Prediction Models
 - Integration with risk_attribution.py and portfolio analytics
+
+VaR/CVaR, stress tests and per-position risk contributions come from the
+vectorized analytics.risk_engine (historical, parametric, filtered historical
+and Monte Carlo in one pass).
 """
 import os
 import json
@@ -27,6 +31,12 @@ try:
 except ImportError:
     HAS_NUMPY = False
 
+try:
+    from analytics.risk_engine import RiskEngine, StressScenario, estimate_factor_betas, tail_stats
+    HAS_RISK_ENGINE = True
+except ImportError:
+    HAS_RISK_ENGINE = False
+
 ROOT = Path(os.path.expanduser("~/neolight"))
 RUNTIME = ROOT / "runtime"
 STATE = ROOT / "state"
@@ -60,6 +70,18 @@ BRAIN_FILE = RUNTIME / "atlas_brain.json"
 PORTFOLIO_FILE = RUNTIME / "portfolio.json"
 PERF_METRICS_FILE = STATE / "performance_metrics.csv"
 RISK_ATTRIBUTION_FILE = STATE / "risk_attribution.json"
+# Optional user scenarios: [{"name": ..., "shocks": {"market" or symbol: return}}]
+STRESS_SCENARIOS_FILE = STATE / "stress_scenarios.json"
+
+# Fixed shocks to the market factor (portfolio return of a beta-1 book)
+MARKET_SHOCKS = {
+    "market_crash": -0.20,  # 2008-style crash
+    "flash_crash": -0.10,  # 2010-style flash crash
+    "liquidity_crisis": -0.15,  # forced selling
+    "inflation_shock": -0.08,  # real returns negative
+}
+VAR_METHODS = ("historical", "parametric", "filtered_historical", "monte_carlo")
+MONTE_CARLO_SIMS = int(os.getenv("NEOLIGHT_RISK_MC_SIMS", "10000"))
 
 class AdvancedRiskManager:
     """Advanced risk management with comprehensive metrics."""
@@ -128,20 +150,14 @@ class AdvancedRiskManager:
             return 0.0
         
         try:
-            # Historical simulation method
+            # Historical simulation, square root of time for the horizon
+            if HAS_RISK_ENGINE:
+                stats = tail_stats(np.sqrt(days) * np.asarray(returns, dtype=float), [confidence])
+                return max(0.0, float(stats.var[0, 0]))
+
             sorted_returns = np.sort(returns)
-            percentile = (1 - confidence) * 100
-            index = int(len(sorted_returns) * (1 - confidence))
-            
-            if index >= len(sorted_returns):
-                index = len(sorted_returns) - 1
-            elif index < 0:
-                index = 0
-            
-            var = -sorted_returns[index]  # Negative because VaR is loss
-            
-            # Scale for time horizon (square root of time rule)
-            var *= np.sqrt(days)
+            index = min(max(int(len(sorted_returns) * (1 - confidence)), 0), len(sorted_returns) - 1)
+            var = -sorted_returns[index] * np.sqrt(days)  # Negative because VaR is loss
             
             # Ensure non-negative
             return max(0.0, float(var))
@@ -166,6 +182,11 @@ class AdvancedRiskManager:
             return 0.0
         
         try:
+            if HAS_RISK_ENGINE:
+                # Mean of the tail scenarios (the VaR scenario and all worse)
+                stats = tail_stats(np.sqrt(days) * np.asarray(returns, dtype=float), [confidence])
+                return min(max(0.0, float(stats.cvar[0, 0])), 0.50)
+
             var = self.calculate_var(returns, confidence, days)
             
             # CVaR is mean of losses beyond VaR
@@ -187,57 +208,99 @@ class AdvancedRiskManager:
             logger.error(f"❌ Error calculating CVaR: {e}")
             return 0.0
 
-    def stress_test(self, price_df: pd.DataFrame, returns_df: pd.DataFrame, scenarios: List[str]) -> Dict[str, float]:
+    def build_risk_engine(self, returns_df: pd.DataFrame,
+                          exposures: Optional[Dict[str, float]] = None) -> Optional["RiskEngine"]:
+        """
+        Build a risk engine over the return history with a "market" factor.
+
+        Args:
+            returns_df: DataFrame of daily returns (dates x symbols)
+            exposures: {symbol: exposure}; default equal weights (the legacy
+                portfolio of averaged returns)
+
+        Returns:
+            RiskEngine, or None without numpy/return history
+        """
+        if returns_df is None or returns_df.empty or not HAS_NUMPY or not HAS_RISK_ENGINE:
+            return None
+
+        symbols = list(returns_df.columns)
+        returns = returns_df.to_numpy(dtype=float)
+        if exposures:
+            weights = [float(exposures.get(sym, 0.0)) for sym in symbols]
+        else:
+            weights = [1.0 / len(symbols)] * len(symbols)
+
+        # Market factor = equal-weight average, so the legacy book has beta 1
+        market = returns.mean(axis=1)
+        betas = estimate_factor_betas(returns, market[:, None])
+        return RiskEngine(symbols, weights, returns, factor_betas=betas, factor_names=["market"])
+
+    def load_stress_scenarios(self) -> List["StressScenario"]:
+        """Load user-defined factor/symbol shock scenarios from STRESS_SCENARIOS_FILE."""
+        if not HAS_RISK_ENGINE or not STRESS_SCENARIOS_FILE.exists():
+            return []
+        try:
+            data = json.loads(STRESS_SCENARIOS_FILE.read_text())
+            return [
+                StressScenario(item["name"], {k: float(v) for k, v in item["shocks"].items()},
+                               item.get("description", ""))
+                for item in data
+            ]
+        except Exception as e:
+            logger.warning(f"⚠️  Could not load stress scenarios: {e}")
+            return []
+
+    def stress_test(self, price_df: pd.DataFrame, returns_df: pd.DataFrame, scenarios: List[Any],
+                    engine: Optional["RiskEngine"] = None) -> Dict[str, float]:
         """
         Run stress tests for different market scenarios.
         
+        Named scenarios become shocks to the market factor (or, for
+        correlation_breakdown, to every symbol at once) and are revalued
+        together with any StressScenario objects in one pass.
+        
         Args:
             price_df: DataFrame with price history
             returns_df: DataFrame with returns
-            scenarios: List of scenario names
+            scenarios: Scenario names and/or StressScenario objects
+            engine: Engine to revalue (default equal-weight book over returns_df)
         
         Returns:
-            Dictionary of {scenario: expected_loss}
+            Dictionary of {scenario: portfolio return (or P&L in engine units)}
         """
         if price_df is None or price_df.empty or not HAS_NUMPY:
             return {}
         
-        results = {}
-        
         try:
-            portfolio_returns = returns_df.mean(axis=1).values if not returns_df.empty else np.array([])
+            engine = engine or self.build_risk_engine(returns_df)
+            if engine is None:
+                return {}
+            
+            portfolio_returns = returns_df.mean(axis=1).values
             current_vol = np.std(portfolio_returns) if len(portfolio_returns) > 0 else 0.15
-            current_corr = returns_df.corr().mean().mean() if not returns_df.empty else 0.5
+            worst_day = float(returns_df.min().min())
             
+            shocks = []
             for scenario in scenarios:
-                if scenario == "market_crash":
-                    # Simulate -20% market crash (2008-style)
-                    results[scenario] = -0.20
-                elif scenario == "flash_crash":
-                    # Simulate -10% flash crash (2010-style)
-                    results[scenario] = -0.10
+                if isinstance(scenario, StressScenario):
+                    shocks.append(scenario)
+                elif scenario in MARKET_SHOCKS:
+                    shocks.append(StressScenario(scenario, {"market": MARKET_SHOCKS[scenario]}))
                 elif scenario == "volatility_spike":
-                    # Simulate 3x volatility (VIX spike)
-                    spike_vol = current_vol * 3
-                    # Rough estimate: loss = -2 * volatility (2-sigma event)
-                    results[scenario] = -spike_vol * 2
+                    # 3x volatility (VIX spike), 2-sigma move
+                    shocks.append(StressScenario(scenario, {"market": -current_vol * 3 * 2}))
                 elif scenario == "correlation_breakdown":
-                    # All assets move together (diversification fails)
-                    worst_day = returns_df.min().min() if not returns_df.empty else -0.05
-                    results[scenario] = float(worst_day)
-                elif scenario == "liquidity_crisis":
-                    # Liquidity dries up, forced selling at -15%
-                    results[scenario] = -0.15
-                elif scenario == "inflation_shock":
-                    # Inflation spike, real returns negative
-                    results[scenario] = -0.08
+                    # All assets hit the worst day together (diversification fails)
+                    shocks.append(StressScenario(scenario, dict.fromkeys(engine.symbols, worst_day)))
             
+            results = engine.stress(shocks)
             logger.info(f"📊 Stress tests completed: {len(results)} scenarios")
+            return results
         except Exception as e:
             logger.error(f"❌ Error in stress testing: {e}")
             traceback.print_exc()
-        
-        return results
+            return {}
 
     def calculate_drawdown(self, equity_series: List[float]) -> Dict[str, Any]:
         """
@@ -361,8 +424,9 @@ class AdvancedRiskManager:
         
         try:
             # Simplified liquidity risk: assume larger positions = higher risk
-            total_position_value = sum(abs(qty) * price_df[sym].iloc[-1] if sym in price_df.columns else 0 
-                                      for sym, qty in positions.items())
+            quantities = pd.Series(positions, dtype=float)
+            last_prices = price_df.iloc[-1].reindex(quantities.index).fillna(0.0)
+            total_position_value = float((quantities.abs() * last_prices).sum())
             
             # Normalize by portfolio equity
             equity = self.load_current_equity()
@@ -453,6 +517,17 @@ class AdvancedRiskManager:
                 if not returns_df.empty:
                     portfolio_returns = returns_df.mean(axis=1).values
             
+            # Position exposures as fractions of equity (equal weights if nothing held)
+            positions = self.load_portfolio_positions()
+            engine = None
+            if returns_df is not None and not returns_df.empty:
+                held = [sym for sym in positions if sym in returns_df.columns]
+                exposures = None
+                if held and current_equity > 0:
+                    last_prices = price_df.iloc[-1]
+                    exposures = {sym: positions[sym] * float(last_prices[sym]) / current_equity for sym in held}
+                engine = self.build_risk_engine(returns_df, exposures)
+            
             # Initialize risk metrics
             risk_metrics = {
                 "timestamp": datetime.now(timezone.utc).isoformat(),
@@ -465,8 +540,17 @@ class AdvancedRiskManager:
                 "drawdown_prediction": {}
             }
             
-            # Calculate VaR and CVaR
-            if len(portfolio_returns) > 0:
+            # Calculate VaR and CVaR (every method, confidence and horizon in one pass)
+            if engine is not None:
+                by_method = engine.var_cvar(VAR_METHODS, confidences=(0.95, 0.99), horizons=(1, 5),
+                                            n_sims=MONTE_CARLO_SIMS)
+                for label, values in by_method["historical"].items():
+                    risk_metrics["var"][f"var_{label}"] = max(0.0, values["var"])
+                    risk_metrics["cvar"][f"var_{label}"] = min(max(0.0, values["cvar"]), 0.50)
+                risk_metrics["var_methods"] = by_method
+                risk_metrics["var_contributions"] = engine.contributions("historical", 0.95, 1)
+                logger.info(f"✅ VaR calculated: 1d 95% = {risk_metrics['var'].get('var_1d_95', 0):.2%}")
+            elif len(portfolio_returns) > 0:
                 for days in [1, 5]:
                     for confidence in [0.95, 0.99]:
                         key = f"var_{days}d_{int(confidence*100)}"
@@ -478,7 +562,8 @@ class AdvancedRiskManager:
             # Stress tests
             if price_df is not None and returns_df is not None:
                 scenarios = ["market_crash", "flash_crash", "volatility_spike", "correlation_breakdown", "liquidity_crisis"]
-                risk_metrics["stress_tests"] = self.stress_test(price_df, returns_df, scenarios)
+                scenarios += self.load_stress_scenarios()
+                risk_metrics["stress_tests"] = self.stress_test(price_df, returns_df, scenarios, engine=engine)
             
             # Calculate drawdown from equity history
             equity_history = []
@@ -501,7 +586,6 @@ class AdvancedRiskManager:
                 risk_metrics["drawdown_prediction"] = self.predict_drawdown(portfolio_returns, current_dd)
             
             # Liquidity risk
-            positions = self.load_portfolio_positions()
             risk_metrics["liquidity_risk"] = self.calculate_liquidity_risk(positions, price_df)
             
             # Integrate with risk attribution if available
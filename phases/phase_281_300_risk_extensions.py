@@ -9,12 +9,17 @@ Einstein-level risk extensions:
 - Leverage limits
 - Sector limits
 - Paper-mode compatible
+
+ExposureTracker keeps the exposure aggregates up to date fill by fill, so
+pre-trade checks are lookups rather than passes over every position.
 """
 
+import heapq
 import json
 import logging
 import os
 import time
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
@@ -59,12 +64,259 @@ RISK_LIMITS_FILE = RUNTIME / "risk_limits.json"
 PORTFOLIO_FILE = RUNTIME / "portfolio.json"
 
 
+@dataclass
+class _Exposure:
+    quantity: float = 0.0
+    price: float = 0.0
+    sector: str = "UNKNOWN"
+    version: int = 0
+
+    @property
+    def value(self) -> float:
+        return self.quantity * self.price
+
+
+class ExposureTracker:
+    """
+    Running exposure aggregates for constant-time pre-trade checks.
+
+    Keeps per-symbol and per-sector gross exposure, portfolio gross and net
+    exposure, the sum of squared exposures (for the HHI), the number of
+    active positions, cash and the equity high-water mark. A fill or a mark
+    moves one symbol, so every aggregate is patched with that symbol's old
+    and new value. The largest positions (for top-3 concentration) sit in a
+    heap with lazy invalidation: superseded entries are skipped when popped
+    and pruned once they outnumber live ones.
+    """
+
+    ACTIVE_EPSILON = 1e-6
+    COMPACT_MIN_DEAD = 1024
+    TOP_N = 3
+
+    def __init__(
+        self,
+        limits: dict[str, Any],
+        sectors: dict[str, str] | None = None,
+        cash: float = 100000.0,
+    ):
+        self.limits = limits
+        self.sectors = dict(sectors or {})
+        self.cash = cash
+        self.positions: dict[str, _Exposure] = {}
+        self.sector_gross: dict[str, float] = {}
+        self.gross = 0.0
+        self.net = 0.0
+        self.sum_squares = 0.0
+        self.active = 0
+        self.peak_equity = cash
+        self.day_start_equity = cash
+        self._largest: list[tuple[float, int, str]] = []  # max-heap via -|value|
+        self._version = 0
+
+    @classmethod
+    def from_positions(
+        cls,
+        positions: dict[str, dict[str, Any]],
+        limits: dict[str, Any],
+        equity: float = 100000.0,
+        sectors: dict[str, str] | None = None,
+    ) -> "ExposureTracker":
+        """
+        Build a tracker from a positions snapshot.
+
+        Args:
+            positions: {symbol: {"quantity": float, "price": float}}
+            limits: Risk limits (see RiskExtensions.load_limits)
+            equity: Total equity; cash is whatever the positions don't account for
+            sectors: Optional symbol -> sector map
+
+        Returns:
+            Tracker whose high-water mark and day start are the current equity
+        """
+        tracker = cls(limits, sectors, cash=0.0)
+        for symbol, pos in positions.items():
+            tracker._set(symbol, float(pos.get("quantity", 0.0)), float(pos.get("price", 0.0)))
+        tracker.cash = equity - tracker.net
+        tracker.peak_equity = tracker.day_start_equity = equity
+        return tracker
+
+    @property
+    def equity(self) -> float:
+        return self.cash + self.net
+
+    @property
+    def drawdown(self) -> float:
+        """Fractional drawdown from the equity high-water mark."""
+        if self.peak_equity <= 0:
+            return 0.0
+        return max(0.0, 1.0 - self.equity / self.peak_equity)
+
+    @property
+    def daily_pnl_pct(self) -> float:
+        if self.day_start_equity <= 0:
+            return 0.0
+        return self.equity / self.day_start_equity - 1.0
+
+    @property
+    def hhi(self) -> float:
+        """Herfindahl-Hirschman index of gross position weights."""
+        return self.sum_squares / (self.gross * self.gross) if self.gross > 0 else 0.0
+
+    def start_day(self) -> None:
+        """Reset the daily-loss reference to the current equity."""
+        self.day_start_equity = self.equity
+
+    def apply_fill(
+        self, symbol: str, side: str, quantity: float, price: float, fee: float = 0.0
+    ) -> None:
+        """Book a fill: move cash and the position, mark it at the fill price."""
+        signed = quantity if side.lower() == "buy" else -quantity
+        pos = self.positions.get(symbol)
+        held = pos.quantity if pos is not None else 0.0
+        self.cash -= signed * price + fee
+        self._set(symbol, held + signed, price)
+        self.peak_equity = max(self.peak_equity, self.equity)
+
+    def mark(self, symbol: str, price: float) -> None:
+        """Revalue one position at a new price."""
+        pos = self.positions.get(symbol)
+        if pos is not None and price > 0:
+            self._set(symbol, pos.quantity, price)
+            self.peak_equity = max(self.peak_equity, self.equity)
+
+    def _set(self, symbol: str, quantity: float, price: float) -> None:
+        pos = self.positions.get(symbol)
+        if pos is None:
+            pos = self.positions[symbol] = _Exposure(sector=self.sectors.get(symbol, "UNKNOWN"))
+        old, new = pos.value, quantity * price
+        self.gross += abs(new) - abs(old)
+        self.net += new - old
+        self.sum_squares += new * new - old * old
+        self.sector_gross[pos.sector] = self.sector_gross.get(pos.sector, 0.0) + abs(new) - abs(old)
+        self.active += (abs(quantity) > self.ACTIVE_EPSILON) - (
+            abs(pos.quantity) > self.ACTIVE_EPSILON
+        )
+        self._version += 1
+        pos.quantity, pos.price, pos.version = quantity, price, self._version
+        if quantity == 0.0:
+            del self.positions[symbol]
+        if not self.positions:
+            # Nothing held: drop accumulated rounding instead of carrying it
+            self.gross = self.net = self.sum_squares = 0.0
+            self.sector_gross.clear()
+        elif new != 0.0:
+            heapq.heappush(self._largest, (-abs(new), self._version, symbol))
+        if len(self._largest) > max(self.COMPACT_MIN_DEAD, 2 * len(self.positions)):
+            self._compact()
+
+    def _live(self, entry: tuple[float, int, str]) -> bool:
+        pos = self.positions.get(entry[2])
+        return pos is not None and pos.version == entry[1]
+
+    def _compact(self) -> None:
+        self._largest = [entry for entry in self._largest if self._live(entry)]
+        heapq.heapify(self._largest)
+
+    def top_positions(self, n: int = TOP_N) -> list[tuple[str, float]]:
+        """Largest positions by absolute value, as (symbol, value) pairs."""
+        top: list[tuple[float, int, str]] = []
+        while self._largest and len(top) < n:
+            entry = heapq.heappop(self._largest)
+            if self._live(entry):
+                top.append(entry)
+        for entry in top:
+            heapq.heappush(self._largest, entry)
+        return [(symbol, -neg_value) for neg_value, _, symbol in top]
+
+    def sector_exposure(self) -> dict[str, float]:
+        """Sector share of gross exposure."""
+        if self.gross <= 0:
+            return {}
+        return {sector: value / self.gross for sector, value in self.sector_gross.items()}
+
+    def check_order(self, symbol: str, side: str, quantity: float, price: float) -> dict[str, Any]:
+        """
+        Pre-trade check of one order against the limits.
+
+        Orders that shrink the position are always approved. Orders that grow
+        it are rejected when the book is past its daily-loss or drawdown limit,
+        or when the post-trade position, sector, leverage or top-3
+        concentration would exceed its limit (concentration only if the
+        order makes it worse). Without any price (a market order for a
+        symbol not held and not quoted) only the daily-loss and drawdown
+        limits apply.
+
+        Args:
+            symbol: Trading symbol
+            side: "buy" or "sell"
+            quantity: Order quantity
+            price: Expected fill price (falls back to the last mark if <= 0)
+
+        Returns:
+            {"approved": bool, "reason": str, "violations": {check: {value, limit}}}
+        """
+        pos = self.positions.get(symbol)
+        held = pos.quantity if pos is not None else 0.0
+        if price <= 0:
+            price = pos.price if pos is not None else 0.0
+
+        signed = quantity if side.lower() == "buy" else -quantity
+        if abs(held + signed) <= abs(held):
+            return {"approved": True, "reason": "Reduces exposure", "violations": {}}
+
+        limits = self.limits
+        checks = {
+            "daily_loss": (-self.daily_pnl_pct, limits.get("max_daily_loss_pct")),
+            "drawdown": (self.drawdown, limits.get("max_drawdown_pct")),
+        }
+        if price > 0:
+            old_value = abs(pos.value) if pos is not None else 0.0
+            new_value = abs((held + signed) * price)
+            equity = self.equity + (held * (price - pos.price) if pos is not None else 0.0)
+            if equity <= 0:
+                return {"approved": False, "reason": "Non-positive equity", "violations": {}}
+            sector = pos.sector if pos is not None else self.sectors.get(symbol, "UNKNOWN")
+            checks["position_size"] = (new_value / equity, limits.get("max_position_size_pct"))
+            checks["sector_exposure"] = (
+                (self.sector_gross.get(sector, 0.0) - old_value + new_value) / equity,
+                limits.get("max_sector_exposure_pct"),
+            )
+            checks["leverage"] = (
+                (self.gross - old_value + new_value) / equity,
+                limits.get("max_leverage"),
+            )
+        violations = {
+            name: {"value": value, "limit": limit}
+            for name, (value, limit) in checks.items()
+            if limit is not None and value > limit
+        }
+
+        limit = limits.get("max_concentration_pct")
+        if limit is not None and price > 0:
+            top = dict(self.top_positions(self.TOP_N + 1))
+            before = sum(sorted(top.values(), reverse=True)[: self.TOP_N])
+            top[symbol] = new_value
+            after = sum(sorted(top.values(), reverse=True)[: self.TOP_N])
+            if after / equity > limit and after > before:
+                violations["concentration"] = {"value": after / equity, "limit": limit}
+
+        if not violations:
+            if price <= 0:
+                reason = f"Approved (no price for {symbol}; notional limits skipped)"
+                return {"approved": True, "reason": reason, "violations": {}}
+            return {"approved": True, "reason": "Approved", "violations": {}}
+        name, detail = next(iter(violations.items()))
+        reason = f"{name} {detail['value']:.1%} exceeds limit {detail['limit']:.1%}"
+        return {"approved": False, "reason": reason, "violations": violations}
+
+
 class RiskExtensions:
     """World-class risk extensions engine."""
 
     def __init__(self):
         """Initialize risk extensions."""
         self.limits = self.load_limits()
+        self.exposure = ExposureTracker(self.limits)
         self.state_manager = None
         if HAS_WORLD_CLASS_UTILS:
             try:
@@ -86,6 +338,7 @@ class RiskExtensions:
             "max_leverage": 1.0,  # No leverage in paper mode
             "max_concentration_pct": 0.30,  # 30% max concentration
             "max_daily_loss_pct": 0.05,  # 5% max daily loss
+            "max_drawdown_pct": 0.08,  # 8% max drawdown from peak equity
             "min_diversification": 5,  # Minimum 5 positions
         }
 
@@ -98,6 +351,57 @@ class RiskExtensions:
 
         return default_limits
 
+    def sync_portfolio(
+        self, portfolio: dict[str, Any] | None = None, sectors: dict[str, str] | None = None
+    ) -> ExposureTracker:
+        """
+        Rebuild the exposure tracker from a portfolio snapshot.
+
+        Args:
+            portfolio: {"positions": {...}, "equity": float}; read from
+                PORTFOLIO_FILE when omitted
+            sectors: Optional symbol -> sector map (defaults to the current one)
+
+        Returns:
+            The rebuilt tracker
+        """
+        if portfolio is None:
+            portfolio = {}
+            if PORTFOLIO_FILE.exists():
+                try:
+                    portfolio = json.loads(PORTFOLIO_FILE.read_text())
+                except Exception as e:
+                    logger.warning(f"⚠️ Error loading portfolio: {e}")
+        self.exposure = ExposureTracker.from_positions(
+            portfolio.get("positions", {}),
+            self.limits,
+            equity=portfolio.get("equity", 100000.0),
+            sectors=self.exposure.sectors if sectors is None else sectors,
+        )
+        return self.exposure
+
+    def record_fill(
+        self, symbol: str, side: str, quantity: float, price: float, fee: float = 0.0
+    ) -> None:
+        """Update the exposure aggregates with one fill."""
+        self.exposure.apply_fill(symbol, side, quantity, price, fee)
+
+    def check_order(self, symbol: str, side: str, quantity: float, price: float) -> dict[str, Any]:
+        """Constant-time pre-trade check against the tracked exposure."""
+        return self.exposure.check_order(symbol, side, quantity, price)
+
+    def _tracker(
+        self,
+        positions: dict[str, dict[str, Any]] | None,
+        total_equity: float | None = None,
+        sectors: dict[str, str] | None = None,
+    ) -> ExposureTracker:
+        # Explicit positions get a one-off tracker; otherwise use the live one
+        if positions is None:
+            return self.exposure
+        equity = 100000.0 if total_equity is None else total_equity
+        return ExposureTracker.from_positions(positions, self.limits, equity, sectors)
+
     def check_position_limit(
         self, symbol: str, quantity: float, price: float, total_equity: float
     ) -> dict[str, Any]:
@@ -118,22 +422,20 @@ class RiskExtensions:
         }
 
     def check_concentration_risk(
-        self, positions: dict[str, dict[str, float]], total_equity: float
+        self,
+        positions: dict[str, dict[str, float]] | None = None,
+        total_equity: float | None = None,
     ) -> dict[str, Any]:
-        """Check concentration risk."""
-        if not positions:
+        """Check concentration risk (of the tracked book if no positions are given)."""
+        tracker = self._tracker(positions, total_equity)
+        if not tracker.positions:
             return {"concentration_pct": 0.0, "violation": False}
+        if total_equity is None:
+            total_equity = tracker.equity
 
-        # Calculate top 3 positions
-        position_values = []
-        for symbol, pos in positions.items():
-            qty = pos.get("quantity", 0.0)
-            price = pos.get("price", 0.0)
-            value = abs(qty * price)
-            position_values.append((symbol, value))
-
-        position_values.sort(key=lambda x: x[1], reverse=True)
-        top3_value = sum([v for _, v in position_values[:3]])
+        # Top 3 positions
+        top_positions = tracker.top_positions(3)
+        top3_value = sum(v for _, v in top_positions)
         concentration_pct = top3_value / total_equity if total_equity > 0 else 0.0
 
         max_concentration = self.limits["max_concentration_pct"]
@@ -143,26 +445,18 @@ class RiskExtensions:
             "concentration_pct": concentration_pct,
             "max_concentration_pct": max_concentration,
             "violation": violation,
-            "top_positions": position_values[:3],
+            "top_positions": top_positions,
         }
 
     def check_sector_exposure(
-        self, positions: dict[str, dict[str, Any]], sectors: dict[str, str]
+        self,
+        positions: dict[str, dict[str, Any]] | None = None,
+        sectors: dict[str, str] | None = None,
     ) -> dict[str, Any]:
-        """Check sector exposure limits."""
-        sector_exposure = {}
-        total_value = 0.0
-
-        for symbol, pos in positions.items():
-            sector = sectors.get(symbol, "UNKNOWN")
-            qty = pos.get("quantity", 0.0)
-            price = pos.get("price", 0.0)
-            value = abs(qty * price)
-
-            if sector not in sector_exposure:
-                sector_exposure[sector] = 0.0
-            sector_exposure[sector] += value
-            total_value += value
+        """Check sector exposure limits (of the tracked book if no positions are given)."""
+        tracker = self._tracker(positions, sectors=sectors)
+        sector_exposure = tracker.sector_gross
+        total_value = tracker.gross
 
         violations = {}
         max_sector_pct = self.limits["max_sector_exposure_pct"]
@@ -183,11 +477,9 @@ class RiskExtensions:
             "violations": violations,
         }
 
-    def check_diversification(self, positions: dict[str, Any]) -> dict[str, Any]:
-        """Check diversification requirements."""
-        active_positions = len(
-            [p for p in positions.values() if abs(p.get("quantity", 0.0)) > 1e-6]
-        )
+    def check_diversification(self, positions: dict[str, Any] | None = None) -> dict[str, Any]:
+        """Check diversification requirements (of the tracked book if no positions are given)."""
+        active_positions = self._tracker(positions).active
         min_diversification = self.limits["min_diversification"]
 
         violation = active_positions < min_diversification
@@ -219,6 +511,7 @@ def main():
                     portfolio = json.loads(PORTFOLIO_FILE.read_text())
                     positions = portfolio.get("positions", {})
                     equity = portfolio.get("equity", 100000.0)
+                    risk_ext.sync_portfolio(portfolio)
 
                     # Check all risk limits
                     for symbol, pos in positions.items():
@@ -231,14 +524,14 @@ def main():
                             )
 
                     # Check concentration
-                    concentration = risk_ext.check_concentration_risk(positions, equity)
+                    concentration = risk_ext.check_concentration_risk()
                     if concentration["violation"]:
                         logger.warning(
                             f"⚠️ Concentration risk: {concentration['concentration_pct']:.1%} (limit: {concentration['max_concentration_pct']:.1%})"
                         )
 
                     # Check diversification
-                    diversification = risk_ext.check_diversification(positions)
+                    diversification = risk_ext.check_diversification()
                     if diversification["violation"]:
                         logger.warning(
                             f"⚠️ Diversification: {diversification['active_positions']} positions (min: {diversification['min_required']})"
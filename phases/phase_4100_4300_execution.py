@@ -8,9 +8,13 @@ Sophisticated execution algorithms for optimal trade execution:
 - Smart order routing
 - Slippage modeling and estimation
 - Market impact minimization
+- Event-driven simulation of the schedules (analytics.execution_simulator)
+  with nightly parameter sweeps
 - Integration with SmartTrader execution engine
 """
 
+from __future__ import annotations
+
 import json
 import logging
 import os
@@ -28,6 +32,20 @@ try:
 except ImportError:
     HAS_NUMPY = False
 
+try:
+    from analytics.execution_simulator import (
+        ALGORITHMS,
+        ExecutionConfig,
+        MarketReplay,
+        ParentOrders,
+        simulate,
+        sweep,
+    )
+
+    HAS_EXECUTION_SIMULATOR = True
+except ImportError:
+    HAS_EXECUTION_SIMULATOR = False
+
 ROOT = Path(os.path.expanduser("~/neolight"))
 RUNTIME = ROOT / "runtime"
 STATE = ROOT / "state"
@@ -56,6 +74,16 @@ if not logger.handlers:
     logger.addHandler(console_handler)
 
 EXECUTION_FILE = STATE / "execution_algorithms.json"
+EXECUTION_SWEEP_FILE = STATE / "execution_sweep.json"
+# Optional intraday OHLCV CSV to replay; synthetic ticks are used otherwise
+EXECUTION_BARS_FILE = os.getenv("NEOLIGHT_EXECUTION_BARS")
+SIMULATED_METHODS = {"twap": "twap", "vwap": "vwap", "is": "is", "implementation_shortfall": "is"}
+SWEEP_GRID = {
+    "algorithm": ["twap", "vwap", "is"],
+    "horizon": [15, 30, 60],
+    "participation_cap": [0.05, 0.1, 0.2],
+    "catch_up": [0.5, 1.0, 2.0],
+}
 PNL_HISTORY_FILE = STATE / "pnl_history.csv"
 
 
@@ -374,6 +402,118 @@ class ExecutionAlgorithm:
 
         return routing_decision
 
+    def load_replay(self, price_history: pd.DataFrame | None = None) -> MarketReplay:
+        """
+        Market events to simulate against.
+
+        Args:
+            price_history: OHLCV bars (Close/Volume); defaults to the CSV in
+                NEOLIGHT_EXECUTION_BARS, then to synthetic one-minute ticks
+
+        Returns:
+            MarketReplay
+        """
+        if price_history is None and EXECUTION_BARS_FILE and Path(EXECUTION_BARS_FILE).exists():
+            try:
+                price_history = pd.read_csv(EXECUTION_BARS_FILE)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not read {EXECUTION_BARS_FILE}: {e}")
+        if price_history is not None and not price_history.empty:
+            return MarketReplay.from_bars(price_history)
+        return MarketReplay.synthetic(seed=0)
+
+    def simulate_execution(
+        self,
+        execution_method: str = "twap",
+        price_history: pd.DataFrame | None = None,
+        n_orders: int = 1000,
+        horizon: int = 30,
+        participation: float = 0.05,
+        seed: int | None = None,
+        **params: Any,
+    ) -> dict[str, Any]:
+        """
+        Simulate a schedule over many parent orders and summarize the shortfall.
+
+        Args:
+            execution_method: "twap", "vwap" or "implementation_shortfall"
+            price_history: OHLCV bars to replay (see load_replay)
+            n_orders: Parent orders to simulate
+            horizon: Events (bars or ticks) each order is worked over
+            participation: Parent size as a fraction of expected volume
+            seed: RNG seed for the parent orders
+            **params: Further ExecutionConfig fields (participation_cap, ...)
+
+        Returns:
+            Shortfall distribution in bps with fill statistics, or {} when
+            the simulator is unavailable
+        """
+        if not HAS_EXECUTION_SIMULATOR or not HAS_NUMPY:
+            return {}
+        algorithm = SIMULATED_METHODS.get(execution_method)
+        if algorithm is None:
+            raise ValueError(f"Cannot simulate execution method {execution_method!r}")
+
+        replay = self.load_replay(price_history)
+        orders = ParentOrders.random(replay, n_orders, horizon, participation, seed)
+        config = ExecutionConfig(algorithm=algorithm, horizon=horizon, **params)
+        summary = simulate(replay, orders, config).summary()
+        logger.info(
+            f"🧪 Simulated {execution_method}: {n_orders} orders, shortfall mean "
+            f"{summary['mean_bps']:.1f} bps, p95 {summary['p95_bps']:.1f} bps"
+        )
+        return {"execution_method": execution_method, "horizon": horizon, **summary}
+
+    def sweep_execution_parameters(
+        self,
+        price_history: pd.DataFrame | None = None,
+        n_orders: int = 1000,
+        grid: dict[str, list[Any]] | None = None,
+        seed: int | None = 0,
+    ) -> dict[str, Any]:
+        """
+        Simulate every parameter combination and pick the best per algorithm.
+
+        The best configuration has the lowest mean shortfall among those
+        that complete at least 99% of the quantity on average.
+
+        Args:
+            price_history: OHLCV bars to replay (see load_replay)
+            n_orders: Parent orders, shared by every combination
+            grid: ExecutionConfig field -> values (defaults to SWEEP_GRID)
+            seed: RNG seed for the parent orders
+
+        Returns:
+            {"timestamp", "orders", "results": [...], "best": {algorithm: row}}
+        """
+        if not HAS_EXECUTION_SIMULATOR or not HAS_NUMPY:
+            return {}
+        grid = grid or SWEEP_GRID
+        replay = self.load_replay(price_history)
+        horizon = max(grid.get("horizon", [ExecutionConfig.horizon]))
+        orders = ParentOrders.random(replay, n_orders, horizon, seed=seed)
+
+        results = sweep(replay, orders, **grid)
+        best = {}
+        for algorithm in ALGORITHMS:
+            rows = [r for r in results if r["algorithm"] == algorithm]
+            complete = [r for r in rows if r["fill_rate"] >= 0.99] or rows
+            if complete:
+                best[algorithm] = min(complete, key=lambda r: r["mean_bps"])
+
+        for algorithm, row in best.items():
+            logger.info(
+                f"🏁 Best {algorithm}: horizon={row['horizon']} cap={row['participation_cap']} "
+                f"catch_up={row['catch_up']} → {row['mean_bps']:.1f} bps "
+                f"(p95 {row['p95_bps']:.1f})"
+            )
+        return {
+            "timestamp": datetime.now(UTC).isoformat(),
+            "orders": n_orders,
+            "results": results,
+            "best": best,
+        }
+
 
 def main():
     """Main execution algorithms loop."""
@@ -405,6 +545,16 @@ def main():
                 },
             }
 
+            # Re-tune schedule parameters against the replay
+            if os.getenv("NEOLIGHT_EXECUTION_SWEEP", "true").lower() == "true":
+                try:
+                    sweep_result = execution_engine.sweep_execution_parameters()
+                    if sweep_result:
+                        EXECUTION_SWEEP_FILE.write_text(json.dumps(sweep_result, indent=2))
+                        execution_config["simulated_best"] = sweep_result["best"]
+                except Exception as e:
+                    logger.warning(f"⚠️ Execution sweep failed: {e}")
+
             # Save execution configuration
             EXECUTION_FILE.write_text(json.dumps(execution_config, indent=2))
 
@@ -4,6 +4,7 @@ Phase 51-90: Core Trading Engine - WORLD CLASS
 ==============================================
 Einstein-level core trading functionality:
 - Order management (create, cancel, track)
+- Journaled order store with status/symbol/time indexes
 - Position tracking
 - Trade execution simulation
 - Order book management
@@ -57,8 +58,11 @@ except ImportError:
     HAS_WORLD_CLASS_UTILS = False
     logger.warning("⚠️ World-class utilities not available")
 
-ORDERS_FILE = RUNTIME / "orders.json"
+from utils.order_store import OrderStore  # noqa: E402
+
+ORDERS_FILE = RUNTIME / "orders.json"  # legacy full dump, migrated into the store once
 POSITIONS_FILE = RUNTIME / "positions.json"
+ORDER_STORE_DIR = RUNTIME / "order_store"
 
 
 class Order:
@@ -85,6 +89,24 @@ class Order:
         self.created_at = datetime.now(UTC).isoformat()
         self.updated_at = self.created_at
 
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Order":
+        """Rebuild an order from to_dict() output."""
+        order = cls(
+            data["order_id"],
+            data["symbol"],
+            data["side"],
+            data["quantity"],
+            data.get("order_type", "market"),
+            data.get("price"),
+        )
+        order.status = data.get("status", "pending")
+        order.filled_quantity = data.get("filled_quantity", 0.0)
+        order.avg_fill_price = data.get("avg_fill_price", 0.0)
+        order.created_at = data.get("created_at", order.created_at)
+        order.updated_at = data.get("updated_at", order.created_at)
+        return order
+
     def to_dict(self) -> dict[str, Any]:
         """Convert order to dictionary."""
         return {
@@ -105,10 +127,16 @@ class Order:
 class CoreTradingEngine:
     """World-class core trading engine."""
 
-    def __init__(self):
-        """Initialize trading engine."""
-        self.orders: dict[str, Order] = {}
-        self.positions: dict[str, dict[str, Any]] = {}
+    def __init__(self, store_dir: Path | None = None):
+        """
+        Initialize trading engine.
+
+        Args:
+            store_dir: Order store directory (default runtime/order_store)
+        """
+        self.store = OrderStore(store_dir or ORDER_STORE_DIR, factory=Order.from_dict)
+        self.orders: dict[str, Order] = self.store.orders
+        self.positions: dict[str, dict[str, Any]] = self.store.positions
         self.order_counter = 0
         self.state_manager = None
         if HAS_WORLD_CLASS_UTILS:
@@ -125,48 +153,38 @@ class CoreTradingEngine:
         logger.info("✅ CoreTradingEngine initialized")
 
     def load_state(self):
-        """Load orders and positions from disk."""
-        # Load orders
-        if ORDERS_FILE.exists():
+        """Recover orders and positions (store journal, plus one-time legacy import)."""
+        if not self.orders and ORDERS_FILE.exists():
             try:
                 data = json.loads(ORDERS_FILE.read_text())
                 for order_data in data.get("orders", []):
-                    order = Order(
-                        order_data["order_id"],
-                        order_data["symbol"],
-                        order_data["side"],
-                        order_data["quantity"],
-                        order_data.get("order_type", "market"),
-                        order_data.get("price"),
-                    )
-                    order.status = order_data.get("status", "pending")
-                    order.filled_quantity = order_data.get("filled_quantity", 0.0)
-                    order.avg_fill_price = order_data.get("avg_fill_price", 0.0)
-                    self.orders[order.order_id] = order
-                logger.info(f"✅ Loaded {len(self.orders)} orders")
+                    self.store.put(Order.from_dict(order_data))
+                self.store.compact()
+                ORDERS_FILE.rename(ORDERS_FILE.with_suffix(".json.migrated"))
+                logger.info(f"✅ Migrated {len(self.orders)} legacy orders into order store")
             except Exception as e:
-                logger.warning(f"⚠️ Error loading orders: {e}")
+                logger.warning(f"⚠️ Error migrating legacy orders: {e}")
 
-        # Load positions
-        if POSITIONS_FILE.exists():
+        # Independent of orders.json: save_state would otherwise overwrite it with {}
+        if not self.positions and POSITIONS_FILE.exists():
             try:
-                data = json.loads(POSITIONS_FILE.read_text())
-                self.positions = data.get("positions", {})
-                logger.info(f"✅ Loaded {len(self.positions)} positions")
+                positions = json.loads(POSITIONS_FILE.read_text()).get("positions", {})
+                for symbol, position in positions.items():
+                    self.store.set_position(symbol, position)
+                if positions:
+                    self.store.compact()
+                    logger.info(f"✅ Imported {len(positions)} positions into order store")
             except Exception as e:
-                logger.warning(f"⚠️ Error loading positions: {e}")
+                logger.warning(f"⚠️ Error importing positions: {e}")
+
+        self.order_counter = len(self.orders)
+        logger.info(f"✅ Loaded {len(self.orders)} orders, {len(self.positions)} positions")
 
     def save_state(self):
-        """Save orders and positions to disk."""
+        """Flush the order journal and publish positions (O(positions), not O(orders))."""
         try:
-            # Save orders
-            orders_data = {
-                "timestamp": datetime.now(UTC).isoformat(),
-                "orders": [order.to_dict() for order in self.orders.values()],
-            }
-            ORDERS_FILE.write_text(json.dumps(orders_data, indent=2))
+            self.store.flush()
 
-            # Save positions
             positions_data = {
                 "timestamp": datetime.now(UTC).isoformat(),
                 "positions": self.positions,
@@ -174,7 +192,15 @@ class CoreTradingEngine:
             POSITIONS_FILE.write_text(json.dumps(positions_data, indent=2))
 
             if self.state_manager:
-                self.state_manager.save_state({"orders": orders_data, "positions": positions_data})
+                summary = {
+                    "timestamp": positions_data["timestamp"],
+                    "total": len(self.store),
+                    "by_status": {
+                        status: self.store.count(status)
+                        for status in ("pending", "filled", "cancelled", "rejected")
+                    },
+                }
+                self.state_manager.save({"orders": summary, "positions": positions_data})
         except Exception as e:
             logger.error(f"❌ Error saving state: {e}")
 
@@ -191,12 +217,11 @@ class CoreTradingEngine:
         order_id = f"ORD_{self.order_counter:06d}_{int(time.time())}"
 
         order = Order(order_id, symbol, side, quantity, order_type, price)
-        self.orders[order_id] = order
+        self.store.put(order)
 
         logger.info(
             f"📝 Created {side.upper()} order: {order_id} for {quantity} {symbol} @ {price or 'MARKET'}"
         )
-        self.save_state()
 
         return order_id
 
@@ -213,9 +238,9 @@ class CoreTradingEngine:
 
         order.status = "cancelled"
         order.updated_at = datetime.now(UTC).isoformat()
+        self.store.put(order)
 
         logger.info(f"❌ Cancelled order: {order_id}")
-        self.save_state()
 
         return True
 
@@ -238,11 +263,10 @@ class CoreTradingEngine:
         order.status = "filled"
         order.updated_at = datetime.now(UTC).isoformat()
 
-        # Update position
-        if order.symbol not in self.positions:
-            self.positions[order.symbol] = {"quantity": 0.0, "avg_price": 0.0, "total_cost": 0.0}
+        self.store.put(order)
 
-        pos = self.positions[order.symbol]
+        # Update position
+        pos = dict(self.get_position(order.symbol))
         if order.side == "buy":
             new_qty = pos["quantity"] + fill_quantity
             new_cost = pos["total_cost"] + (fill_quantity * fill_price)
@@ -255,11 +279,11 @@ class CoreTradingEngine:
                 pos["quantity"] = 0.0
                 pos["avg_price"] = 0.0
                 pos["total_cost"] = 0.0
+        self.store.set_position(order.symbol, pos)
 
         logger.info(
             f"✅ Filled {order.side.upper()} order: {order_id} for {fill_quantity} {order.symbol} @ ${fill_price:.2f}"
         )
-        self.save_state()
 
         return True
 
@@ -267,12 +291,40 @@ class CoreTradingEngine:
         """Get current position for a symbol."""
         return self.positions.get(symbol, {"quantity": 0.0, "avg_price": 0.0, "total_cost": 0.0})
 
-    def get_orders(self, status: str | None = None) -> list[dict[str, Any]]:
-        """Get all orders, optionally filtered by status."""
-        orders = [order.to_dict() for order in self.orders.values()]
+    def get_orders(
+        self,
+        status: str | None = None,
+        symbol: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Get orders, optionally filtered by status, symbol and creation time.
+
+        Uses the store's indexes, so cost scales with the matching orders.
+
+        Args:
+            status: Order status ("pending", "filled", ...)
+            symbol: Symbol
+            since: Inclusive ISO-8601 creation-time lower bound
+            until: Exclusive ISO-8601 creation-time upper bound
+        """
+        candidates: list[list[str]] = []
         if status:
-            orders = [o for o in orders if o["status"] == status]
-        return orders
+            candidates.append(self.store.ids_by_status(status))
+        if symbol:
+            candidates.append(self.store.ids_by_symbol(symbol))
+        if since or until:
+            candidates.append(self.store.ids_between(since, until))
+        if not candidates:
+            return [order.to_dict() for order in self.store]
+
+        candidates.sort(key=len)
+        order_ids = candidates[0]
+        for other in candidates[1:]:
+            allowed = set(other)
+            order_ids = [order_id for order_id in order_ids if order_id in allowed]
+        return [self.orders[order_id].to_dict() for order_id in order_ids]
 
 
 @world_class_agent(
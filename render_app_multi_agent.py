@@ -1,13 +1,15 @@
 #!/usr/bin/env python3
 """
 Render Web Service - Multi-Agent Orchestration
-Provides HTTP health endpoint while running multiple NeoLight agents in background
+Provides HTTP health endpoint while running multiple NeoLight agents in background.
+Agents run under utils.agent_supervisor: forked from a warm forkserver, with
+async log draining, exponential back-off restarts and RSS/CPU budgets.
+Agents exchange brain/allocation state over utils.state_bus (a Unix-socket
+broker started here) instead of polling JSON files.
 """
+import asyncio
 import json
 import os
-import subprocess
-import sys
-import threading
 import time
 from pathlib import Path
 
@@ -15,6 +17,9 @@ from fastapi import FastAPI
 from fastapi.responses import FileResponse, HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 
+from utils.agent_supervisor import AgentSpec, AgentSupervisor, RestartPolicy
+from utils.state_bus import StateBusBroker
+
 # Configuration
 # In Render cloud environment, use Render paths only (no local fallback)
 RENDER_MODE = os.getenv("RENDER_MODE", "false").lower() == "true"
@@ -39,6 +44,7 @@ AGENTS = {
         "script": ROOT / "agents" / "intelligence_orchestrator.py",
         "priority": 1,  # Must start first
         "required": True,
+        "ready_after": 3.0,  # dependants start once it has been up this long
         "description": "Intelligence Orchestrator (generates risk_scaler and confidence)",
     },
     "ml_pipeline": {
@@ -63,6 +69,7 @@ AGENTS = {
         "script": ROOT / "trader" / "smart_trader.py",
         "priority": 5,  # Must start after intelligence_orchestrator
         "required": True,
+        "depends_on": ("intelligence_orchestrator",),
         "description": "SmartTrader (main trading loop)",
     },
     "sports_analytics": {
@@ -75,6 +82,7 @@ AGENTS = {
         "script": ROOT / "agents" / "sports_betting_agent.py",
         "priority": 6,  # Runs after sports_analytics
         "required": False,
+        "depends_on": ("sports_analytics",),
         "description": "Sports Betting Agent (paper trading, manual BetMGM workflow)",
     },
     "dropship_agent": {
@@ -257,11 +265,16 @@ async def get_sports_history():
 
 
 # Global state
-agent_processes: dict[str, subprocess.Popen | None] = {}
-agent_threads: dict[str, threading.Thread | None] = {}
 start_time = time.time()
+supervisor: AgentSupervisor | None = None
+state_bus: StateBusBroker | None = None
+STATE_BUS_SOCKET = RUNTIME_DIR / "state_bus.sock"
 agent_status: dict[str, dict] = {}
 
+# Per-agent resource budgets (0 disables); exceeding one restarts the agent
+AGENT_MAX_RSS_MB = float(os.getenv("NEOLIGHT_AGENT_MAX_RSS_MB", "0")) or None
+AGENT_MAX_CPU_PERCENT = float(os.getenv("NEOLIGHT_AGENT_MAX_CPU_PERCENT", "0")) or None
+
 
 def get_agent_env() -> dict[str, str]:
     """Get environment variables for agents"""
@@ -269,6 +282,8 @@ def get_agent_env() -> dict[str, str]:
     env["PYTHONPATH"] = str(ROOT)
     env["TRADING_MODE"] = "PAPER_TRADING_MODE"
     env["RENDER_MODE"] = "true"
+    env["NEOLIGHT_ROOT"] = str(ROOT)
+    env["NEOLIGHT_BUS_SOCKET"] = str(STATE_BUS_SOCKET)
     # Enable agents by default
     env.setdefault("NEOLIGHT_ENABLE_ML_PIPELINE", "true")
     env.setdefault("NEOLIGHT_ENABLE_STRATEGY_RESEARCH", "true")
@@ -276,84 +291,30 @@ def get_agent_env() -> dict[str, str]:
     return env
 
 
-def run_agent(agent_name: str, agent_config: dict) -> None:
-    """Run a single agent in background with auto-restart"""
-    global agent_processes, agent_status
-
-    script_path = agent_config["script"]
-    if not script_path.exists():
-        print(f"⚠️ {agent_name}: Script not found: {script_path}", file=sys.stderr)
-        agent_status[agent_name] = {
-            "status": "error",
-            "message": f"Script not found: {script_path}",
-            "pid": None,
-        }
-        return
-
-    env = get_agent_env()
-    restart_delay = 10
-
-    while True:
-        try:
-            # Start agent process
-            process = subprocess.Popen(
-                [sys.executable, str(script_path)],
-                cwd=str(ROOT),
-                env=env,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
+def build_agent_specs() -> list[AgentSpec]:
+    """Supervisor specs for AGENTS (required agents get more, faster restarts)"""
+    specs = []
+    for name, config in AGENTS.items():
+        required = config.get("required", False)
+        specs.append(
+            AgentSpec(
+                name=name,
+                script=config["script"],
+                priority=config["priority"],
+                required=required,
+                description=config["description"],
+                depends_on=config.get("depends_on", ()),
+                ready_after=config.get("ready_after", 0.0),
+                restart=(
+                    RestartPolicy(max_restarts=10, backoff_base=10.0)
+                    if required
+                    else RestartPolicy(max_restarts=5, backoff_base=20.0)
+                ),
+                max_rss_mb=AGENT_MAX_RSS_MB,
+                max_cpu_percent=AGENT_MAX_CPU_PERCENT,
             )
-
-            agent_processes[agent_name] = process
-            agent_status[agent_name] = {
-                "status": "running",
-                "pid": process.pid,
-                "started_at": time.time(),
-                "restarts": agent_status.get(agent_name, {}).get("restarts", 0),
-            }
-
-            print(f"✅ {agent_name} started (PID: {process.pid})")
-
-            # Monitor process
-            while True:
-                if process.poll() is not None:
-                    exit_code = process.returncode
-                    restarts = agent_status[agent_name].get("restarts", 0) + 1
-                    agent_status[agent_name] = {
-                        "status": "stopped",
-                        "pid": None,
-                        "exit_code": exit_code,
-                        "restarts": restarts,
-                        "last_restart": time.time(),
-                    }
-                    print(f"⚠️ {agent_name} exited with code {exit_code} (restart #{restarts})")
-
-                    if agent_config.get("required", False) and restarts < 10:
-                        # Required agents get restarted
-                        time.sleep(restart_delay)
-                        break  # Restart loop
-                    elif not agent_config.get("required", False) and restarts < 5:
-                        # Optional agents get fewer retries
-                        time.sleep(restart_delay * 2)
-                        break  # Restart loop
-                    else:
-                        # Too many restarts, give up
-                        print(f"❌ {agent_name}: Too many restarts ({restarts}), stopping")
-                        agent_status[agent_name]["status"] = "failed"
-                        agent_processes[agent_name] = None
-                        return
-
-                time.sleep(5)
-
-        except Exception as e:
-            print(f"❌ Error running {agent_name}: {e}", file=sys.stderr)
-            agent_status[agent_name] = {
-                "status": "error",
-                "message": str(e),
-                "pid": None,
-            }
-            time.sleep(restart_delay)
+        )
+    return specs
 
 
 def sync_state_from_cloud():
@@ -407,61 +368,43 @@ def sync_state_from_cloud():
 
 @app.on_event("startup")
 async def startup_event():
-    """Start all agents in background threads"""
-    global agent_threads
+    """Start all agents under the supervisor"""
+    global supervisor, agent_status, state_bus
 
     print("🚀 Starting NeoLight Multi-Agent Render Service...")
     print(f"📁 Root: {ROOT}")
     print(f"🌐 Port: {PORT}")
 
     # Sync state from cloud on startup (if available)
-    sync_state_from_cloud()
-
-    # Sort agents by priority
-    sorted_agents = sorted(AGENTS.items(), key=lambda x: x[1]["priority"])
-
-    # Start agents in order
-    for agent_name, agent_config in sorted_agents:
+    await asyncio.to_thread(sync_state_from_cloud)
+
+    # Broker runs on its own loop so agent traffic never waits on HTTP handlers
+    state_bus = StateBusBroker(socket_path=STATE_BUS_SOCKET, root=ROOT)
+    state_bus.start_in_thread()
+
+    # Ordering comes from depends_on/ready_after, not sleeps between starts
+    supervisor = AgentSupervisor(
+        build_agent_specs(),
+        cwd=ROOT,
+        base_env=get_agent_env(),
+        start_method=os.getenv("NEOLIGHT_AGENT_START_METHOD") or None,
+    )
+    agent_status = supervisor.status
+    for agent_name, agent_config in sorted(AGENTS.items(), key=lambda x: x[1]["priority"]):
         print(f"📋 Starting {agent_name}: {agent_config['description']}")
+    await supervisor.start()
 
-        # Initialize status
-        agent_status[agent_name] = {
-            "status": "starting",
-            "pid": None,
-        }
-
-        # Start agent in background thread
-        thread = threading.Thread(target=run_agent, args=(agent_name, agent_config), daemon=True)
-        thread.start()
-        agent_threads[agent_name] = thread
-
-        # Small delay between starts (especially important for intelligence_orchestrator -> smart_trader)
-        if agent_config["priority"] == 1:
-            time.sleep(3)  # Give intelligence_orchestrator time to start
-        else:
-            time.sleep(1)
-
-    print("✅ All agent threads started")
+    print(f"✅ All agents scheduled ({supervisor.start_method})")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
-    global agent_processes
-
     print("🛑 Stopping all agents...")
-
-    for agent_name, process in agent_processes.items():
-        if process and process.poll() is None:
-            print(f"🛑 Stopping {agent_name}...")
-            process.terminate()
-            try:
-                process.wait(timeout=10)
-                print(f"✅ {agent_name} stopped")
-            except subprocess.TimeoutExpired:
-                process.kill()
-                print(f"✅ {agent_name} killed")
-
+    if supervisor:
+        await supervisor.stop(timeout=10)
+    if state_bus:
+        await asyncio.to_thread(state_bus.stop_thread)
     print("✅ All agents stopped")
 
 
@@ -542,7 +485,7 @@ async def agent_detail(agent_name: str):
 
     status = agent_status.get(agent_name, {})
     config = AGENTS[agent_name]
-    process = agent_processes.get(agent_name)
+    process = supervisor.process(agent_name) if supervisor else None
 
     return {
         "name": agent_name,
@@ -552,11 +495,19 @@ async def agent_detail(agent_name: str):
         "status": status,
         "process": {
             "pid": process.pid if process else None,
-            "running": process.poll() is None if process else False,
+            "running": process.is_alive() if process else False,
         },
     }
 
 
+@app.get("/agents/{agent_name}/logs")
+async def agent_logs(agent_name: str, lines: int = 100):
+    """Recent stdout/stderr lines of an agent"""
+    if agent_name not in AGENTS:
+        return JSONResponse(status_code=404, content={"error": f"Agent '{agent_name}' not found"})
+    return {"name": agent_name, "lines": supervisor.logs(agent_name, lines) if supervisor else []}
+
+
 # Observability endpoints
 try:
     from dashboard.observability import (
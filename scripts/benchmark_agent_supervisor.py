@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Agent Fleet Startup Benchmark
+=============================
+Starts a fleet of dummy agents that import the usual heavy stack and print
+"ready", once as one interpreter per agent (the old subprocess.Popen path) and
+once under AgentSupervisor (forkserver with preloaded imports). Reports the
+time until every agent is ready and the fleet's proportional memory (PSS,
+which splits shared copy-on-write pages fairly between processes).
+
+Usage:
+    python scripts/benchmark_agent_supervisor.py
+    python scripts/benchmark_agent_supervisor.py --agents 8 --modules numpy pandas sklearn torch
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.util
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from utils.agent_supervisor import AgentSpec, AgentSupervisor  # noqa: E402
+
+AGENT_SOURCE = """
+import time
+{imports}
+print("ready", flush=True)
+time.sleep(600)
+"""
+
+
+def pss_mb(pid: int) -> float:
+    """Proportional set size of a process in MB (0 when unavailable)."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def parent_pid(pid: int) -> int | None:
+    try:
+        with open(f"/proc/{pid}/stat", encoding="ascii") as f:
+            return int(f.read().rsplit(")", 1)[1].split()[1])
+    except (OSError, ValueError):
+        return None
+
+
+def run_subprocesses(script: Path, count: int) -> tuple[float, float]:
+    start = time.perf_counter()
+    processes = [
+        subprocess.Popen([sys.executable, str(script)], stdout=subprocess.PIPE, text=True)
+        for _ in range(count)
+    ]
+    for process in processes:
+        process.stdout.readline()
+    elapsed = time.perf_counter() - start
+    memory = sum(pss_mb(p.pid) for p in processes)
+    for process in processes:
+        process.kill()
+        process.wait()
+    return elapsed, memory
+
+
+async def run_supervisor(script: Path, count: int, modules: list[str]) -> tuple[float, float]:
+    specs = [AgentSpec(f"agent{i}", script=script, ready_line="ready") for i in range(count)]
+    supervisor = AgentSupervisor(specs, cwd=ROOT, preload=tuple(modules))
+    start = time.perf_counter()
+    await supervisor.start()
+    await supervisor.wait_ready(timeout=600)
+    elapsed = time.perf_counter() - start
+
+    pids = [supervisor.process(spec.name).pid for spec in specs]
+    servers = {parent_pid(pid) for pid in pids} - {None}
+    memory = sum(pss_mb(pid) for pid in pids) + sum(pss_mb(pid) for pid in servers)
+    await supervisor.stop()
+    return elapsed, memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agent fleet startup benchmark")
+    parser.add_argument("--agents", type=int, default=8)
+    parser.add_argument("--modules", nargs="+", default=["numpy", "pandas", "scipy", "sklearn"])
+    args = parser.parse_args()
+
+    modules = [m for m in args.modules if importlib.util.find_spec(m) is not None]
+    with tempfile.TemporaryDirectory() as tmp:
+        script = Path(tmp) / "dummy_agent.py"
+        script.write_text(AGENT_SOURCE.format(imports="\n".join(f"import {m}" for m in modules)))
+
+        print(f"agents={args.agents} modules={','.join(modules)}")
+        elapsed, memory = run_subprocesses(script, args.agents)
+        print(f"subprocess per agent: ready in {elapsed:6.2f}s  fleet PSS {memory:8.1f} MB")
+        elapsed, memory = asyncio.run(run_supervisor(script, args.agents, modules))
+        print(f"forkserver supervisor: ready in {elapsed:6.2f}s  fleet PSS {memory:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
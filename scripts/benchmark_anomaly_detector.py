@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Anomaly Detector Benchmark
+==========================
+Times one fleet scan (every agent scored once) with the previous per-agent
+loop (one model call and one normal-behavior update per agent) and with the
+batched detector (one model call, vectorized baseline updates), and tracks
+the size of the persisted normal-behavior state as scans accumulate.
+
+Usage:
+    python scripts/benchmark_anomaly_detector.py
+    python scripts/benchmark_anomaly_detector.py --agents 1000 --scans 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from agents import anomaly_detector  # noqa: E402
+from agents.anomaly_detector import METRIC_FIELDS, AnomalyDetector  # noqa: E402
+
+
+def fleet(rng: np.random.Generator, n_agents: int) -> dict[str, dict[str, float]]:
+    values = rng.normal(50, 5, size=(n_agents, len(METRIC_FIELDS)))
+    return {
+        f"agent_{i}": dict(zip(METRIC_FIELDS, row.tolist(), strict=True))
+        for i, row in enumerate(values)
+    }
+
+
+def legacy_scan(detector: AnomalyDetector, agents: dict, history: dict) -> None:
+    """Per-agent scoring with raw sample history, as before."""
+    for name, data in agents.items():
+        X = detector.scaler.transform(detector.extract_metrics(data))
+        if detector.model.predict(X)[0] == -1:
+            continue
+        detector.model.score_samples(X)
+        samples = history.setdefault(name, {"samples": []})["samples"]
+        samples.append({m: data[m] for m in anomaly_detector.STATISTICAL_METRICS})
+        del samples[:-1000]
+        if len(samples) >= 1000:
+            for metric in anomaly_detector.STATISTICAL_METRICS:
+                values = [s[metric] for s in samples]
+                history[name][f"{metric}_mean"] = float(np.mean(values))
+                history[name][f"{metric}_std"] = float(np.std(values))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Anomaly detector benchmark")
+    parser.add_argument("--agents", type=int, default=500)
+    parser.add_argument("--scans", type=int, default=200)
+    parser.add_argument("--legacy-scans", type=int, default=3, help="The per-agent loop is slow")
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="anomaly_"))
+    anomaly_detector.ANOMALY_MODEL_FILE = tmp / "model.pkl"
+    anomaly_detector.NORMAL_BEHAVIOR_FILE = tmp / "normal.json"
+    rng = np.random.default_rng(0)
+    detector = AnomalyDetector()
+    detector.train_model([d for _ in range(4) for d in fleet(rng, 500).values()])
+    print(f"{args.agents} agents, {args.scans} scans ({args.legacy_scans} per-agent)")
+
+    history: dict = {}
+    legacy, batched = [], []
+    for scan in range(args.scans):
+        agents = fleet(rng, args.agents)
+        if scan < args.legacy_scans:
+            start = time.perf_counter()
+            legacy_scan(detector, agents, history)
+            legacy.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        detector.detect_batch(agents)
+        batched.append(time.perf_counter() - start)
+
+    legacy_ms, batched_ms = statistics.median(legacy) * 1e3, statistics.median(batched) * 1e3
+    print(
+        f"Scan: per-agent {legacy_ms:.1f} ms, batched {batched_ms:.2f} ms "
+        f"({legacy_ms / batched_ms:.0f}x)"
+    )
+
+    detector.save_normal_behavior()
+    # Raw history keeps up to 1000 samples per agent; extrapolate from what was collected
+    samples = sum(len(h["samples"]) for h in history.values())
+    per_sample = len(json.dumps(history)) / max(samples, 1)
+    legacy_mb = per_sample * min(args.scans, 1000) * args.agents / 2**20
+    state_kb = anomaly_detector.NORMAL_BEHAVIOR_FILE.stat().st_size / 1024
+    print(
+        f"Normal-behavior state after {args.scans} scans: raw history ~{legacy_mb:.1f} MB "
+        f"(grows to 1000 samples/agent), running stats {state_kb:.0f} KB (fixed)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Async Order Router Benchmark
+============================
+Routes a simulated portfolio rebalance of sliced orders through the
+concurrent router and through a sequential loop that submits one slice at a
+time and sleeps between slices, both against the same latency-injecting
+mock broker.
+
+Usage:
+    python scripts/benchmark_async_router.py
+    python scripts/benchmark_async_router.py --orders 100 --slices 5 --latency 0.08
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from execution.async_router import (  # noqa: E402
+    AsyncOrderRouter,
+    ChildOrder,
+    MockBroker,
+    OrderRequest,
+)
+
+
+def rebalance(args) -> list[OrderRequest]:
+    return [
+        OrderRequest(
+            f"SYM{i}", "buy" if i % 2 else "sell", 10.0, slices=args.slices, interval=args.interval
+        )
+        for i in range(args.orders)
+    ]
+
+
+async def route_sequential(broker: MockBroker, requests: list[OrderRequest]) -> int:
+    """The blocking router's pacing: await each slice, sleep between slices."""
+    acks = 0
+    for request in requests:
+        qty = request.qty / request.slices
+        for index in range(1, request.slices + 1):
+            ack = await broker.submit(ChildOrder(request, index, qty), lambda _: None)
+            acks += ack["status"] == "accepted"
+            if index < request.slices:
+                await asyncio.sleep(request.interval)
+    return acks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Async order router benchmark")
+    parser.add_argument("--orders", type=int, default=40)
+    parser.add_argument("--slices", type=int, default=5)
+    parser.add_argument("--interval", type=float, default=0.02, help="Seconds between slices")
+    parser.add_argument("--latency", type=float, default=0.05, help="Broker ack latency")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--rate-limit", type=float, default=None, help="Submissions per second")
+    parser.add_argument("--max-in-flight", type=int, default=64)
+    args = parser.parse_args()
+
+    children = args.orders * args.slices
+    print(
+        f"{args.orders} orders x {args.slices} slices, interval {args.interval * 1000:.0f} ms, "
+        f"latency {args.latency * 1000:.0f}+{args.jitter * 1000:.0f} ms"
+    )
+
+    broker = MockBroker(latency=args.latency, jitter=args.jitter, seed=0)
+    start = time.perf_counter()
+    acks = asyncio.run(route_sequential(broker, rebalance(args)))
+    sequential = time.perf_counter() - start
+    print(
+        f"  sequential  {sequential:7.2f} s  {children / sequential:9,.0f} children/s  acks {acks}"
+    )
+
+    broker = MockBroker(latency=args.latency, jitter=args.jitter, seed=0)
+    router = AsyncOrderRouter(broker, rate_limit=args.rate_limit, max_in_flight=args.max_in_flight)
+    start = time.perf_counter()
+    handles = asyncio.run(router.route(rebalance(args)))
+    concurrent = time.perf_counter() - start
+    filled = sum(h.status == "filled" for h in handles)
+    print(
+        f"  concurrent  {concurrent:7.2f} s  {children / concurrent:9,.0f} children/s  "
+        f"filled {filled}/{len(handles)}  max in flight {broker.max_concurrent}"
+    )
+    print(f"Speedup: {sequential / concurrent:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
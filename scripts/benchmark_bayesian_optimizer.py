@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Bayesian Optimizer Benchmark
+============================
+Wall-clock time to reach a target on standard test functions (Branin,
+Hartmann-6) for serial random search, serial GP-EI, and q-batch GP-EI with q
+parallel workers. Each evaluation stands in for an expensive objective such
+as a strategy backtest: the clock advances by the measured optimizer time
+plus --eval-seconds per round of (parallel) evaluations.
+
+Usage:
+    python scripts/benchmark_bayesian_optimizer.py
+    python scripts/benchmark_bayesian_optimizer.py --eval-seconds 300 --evaluations 120 --seeds 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from ai.bayesian_optimizer import BayesianOptimizer  # noqa: E402
+
+HARTMANN_ALPHA = np.array([1.0, 1.2, 3.0, 3.2])
+HARTMANN_A = np.array(
+    [
+        [10, 3, 17, 3.5, 1.7, 8],
+        [0.05, 10, 17, 0.1, 8, 14],
+        [3, 3.5, 1.7, 10, 17, 8],
+        [17, 8, 0.05, 10, 0.1, 14],
+    ]
+)
+HARTMANN_P = 1e-4 * np.array(
+    [
+        [1312, 1696, 5569, 124, 8283, 5886],
+        [2329, 4135, 8307, 3736, 1004, 9991],
+        [2348, 1451, 3522, 2883, 3047, 6650],
+        [4047, 8828, 8732, 5743, 1091, 381],
+    ]
+)
+
+
+def branin(params: dict[str, float]) -> float:
+    x, y = params["x0"], params["x1"]
+    b, c, t = 5.1 / (4 * math.pi**2), 5 / math.pi, 1 / (8 * math.pi)
+    return -((y - b * x * x + c * x - 6) ** 2 + 10 * (1 - t) * math.cos(x) + 10)
+
+
+def hartmann6(params: dict[str, float]) -> float:
+    x = np.array([params[f"x{i}"] for i in range(6)])
+    inner = (HARTMANN_A * (x - HARTMANN_P) ** 2).sum(1)
+    return float((HARTMANN_ALPHA * np.exp(-inner)).sum())
+
+
+# name: (objective to maximize, bounds, optimum, target regret)
+PROBLEMS = {
+    "branin": (branin, {"x0": (-5.0, 10.0), "x1": (0.0, 15.0)}, -0.397887, 0.05),
+    "hartmann6": (hartmann6, {f"x{i}": (0.0, 1.0) for i in range(6)}, 3.32237, 0.3),
+}
+
+
+def time_to(trace: list[tuple[float, float]], target: float) -> float | None:
+    best = -math.inf
+    for elapsed, value in trace:
+        best = max(best, value)
+        if best >= target:
+            return elapsed
+    return None
+
+
+def run(method: str, problem: str, args, seed: int) -> tuple[float | None, float, float]:
+    """One optimization run; returns (seconds to target, final regret, optimizer seconds)."""
+    objective, bounds, optimum, regret = PROBLEMS[problem]
+    trace, clock, overhead = [], 0.0, 0.0
+    if method == "random":
+        rng = np.random.default_rng(seed)
+        for _ in range(args.evaluations):
+            clock += args.eval_seconds
+            trace.append(
+                (clock, objective({n: rng.uniform(lo, hi) for n, (lo, hi) in bounds.items()}))
+            )
+    else:
+        # The optimize() loop, with evaluation time simulated per round
+        batch_size = 1 if method == "gp-ei" else args.batch_size
+        optimizer = BayesianOptimizer(bounds, n_initial=2 * len(bounds) + 2, seed=seed)
+        while len(trace) < args.evaluations:
+            q = min(batch_size, args.evaluations - len(trace))
+            start = time.perf_counter()
+            batch = optimizer.suggest_batch(q)
+            values = [objective(params) for params in batch]
+            for params, value in zip(batch, values, strict=True):
+                optimizer.update(params, value)
+            spent = time.perf_counter() - start
+            overhead += spent
+            clock += spent + args.eval_seconds
+            trace.extend((clock, value) for value in values)
+    best = max(value for _, value in trace)
+    return time_to(trace, optimum - regret), optimum - best, overhead
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bayesian optimizer benchmark")
+    parser.add_argument("--evaluations", type=int, default=80)
+    parser.add_argument("--eval-seconds", type=float, default=60.0, help="Cost of one evaluation")
+    parser.add_argument("--batch-size", type=int, default=4, help="Parallel workers for q-batch")
+    parser.add_argument("--seeds", type=int, default=3)
+    parser.add_argument("--problems", nargs="+", default=list(PROBLEMS))
+    args = parser.parse_args()
+
+    methods = ["random", "gp-ei", f"gp-q{args.batch_size}"]
+    print(
+        f"{args.evaluations} evaluations x {args.eval_seconds:.0f} s, "
+        f"{args.seeds} seeds, median over seeds"
+    )
+    for problem in args.problems:
+        print(f"\n{problem} (target regret {PROBLEMS[problem][3]})")
+        for method in methods:
+            results = [run(method, problem, args, seed) for seed in range(args.seeds)]
+            hits = [t for t, _, _ in results if t is not None]
+            to_target = f"{statistics.median(hits) / 60:6.1f} min" if hits else "       -  "
+            print(
+                f"  {method:<8} time to target {to_target} ({len(hits)}/{args.seeds} reached)  "
+                f"final regret {statistics.median(r for _, r, _ in results):.4f}  "
+                f"optimizer {statistics.median(o for _, _, o in results):5.1f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Execution Simulator Benchmark
+=============================
+Measures parent-order throughput of the vectorized execution simulator and
+the time for a nightly parameter sweep, and checks it against a scalar
+event loop that works one parent order at a time.
+
+Usage:
+    python scripts/benchmark_execution_simulator.py
+    python scripts/benchmark_execution_simulator.py --orders 50000 --horizon 120 --loop-sample 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from analytics.execution_simulator import (  # noqa: E402
+    ALGORITHMS,
+    ExecutionConfig,
+    MarketReplay,
+    ParentOrders,
+    schedule_fractions,
+    simulate,
+    sweep,
+)
+
+SWEEP_GRID = {
+    "algorithm": list(ALGORITHMS),
+    "horizon": [15, 30, 60],
+    "participation_cap": [0.05, 0.1, 0.2],
+    "catch_up": [0.5, 1.0, 2.0],
+}
+
+
+def simulate_loop(replay: MarketReplay, orders: ParentOrders, config: ExecutionConfig) -> list:
+    """Same model, one parent order and one event at a time."""
+    fractions = schedule_fractions(replay, orders.starts, config)
+    sigma, mean_volume = replay.event_volatility, replay.mean_volume
+    shortfalls = []
+    for i in range(len(orders)):
+        start, side, quantity = int(orders.starts[i]), orders.sides[i], orders.quantities[i]
+        tolerance = config.catch_up * quantity / config.horizon
+        filled = notional = 0.0
+        resting = fractions[i, 0] * quantity
+        queue_ahead = config.queue_depth * replay.volumes[start]
+        for step in range(config.horizon):
+            event = start + step
+            volume = replay.volumes[event]
+            half_spread = replay.spread_bps[event] * 0.5e-4
+            mid = replay.prices[event] * (
+                1 + side * config.permanent_impact * sigma * filled / mean_volume
+            )
+            capacity = config.participation_cap * volume
+            flow = config.touch_share * volume
+            ahead = min(queue_ahead, flow)
+            queue_ahead -= ahead
+            fill = min(resting, flow - ahead, capacity)
+            resting -= fill
+            capacity -= fill
+            filled += fill
+            notional += fill * mid * (1 - side * half_spread)
+            last = step == config.horizon - 1 and config.complete
+            due = quantity if last else fractions[i, step] * quantity - tolerance
+            cross = min(max(due - filled, 0.0), capacity)
+            impact = config.temporary_impact * sigma * (cross / volume) ** config.impact_exponent
+            notional += cross * mid * (1 + side * (half_spread + impact))
+            filled += cross
+            if step < config.horizon - 1:
+                wanted = max(fractions[i, step + 1] * quantity - filled, 0.0)
+                if wanted > resting + 1e-12:
+                    queue_ahead, resting = config.queue_depth * volume, wanted
+                else:
+                    resting = min(resting, wanted)
+        arrival = replay.prices[start]
+        final = replay.prices[start + config.horizon - 1]
+        cost = side * (notional + (quantity - filled) * final - quantity * arrival)
+        shortfalls.append(cost / (quantity * arrival) * 1e4)
+    return shortfalls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Execution simulator benchmark")
+    parser.add_argument("--orders", type=int, default=10_000)
+    parser.add_argument("--horizon", type=int, default=60)
+    parser.add_argument("--events", type=int, default=390 * 20, help="Synthetic ticks to replay")
+    parser.add_argument("--sweep-orders", type=int, default=1000)
+    parser.add_argument("--loop-sample", type=int, default=200)
+    args = parser.parse_args()
+
+    replay = MarketReplay.synthetic(n_events=args.events, seed=0)
+    orders = ParentOrders.random(replay, args.orders, args.horizon, seed=1)
+    print(f"{args.events} events, {args.orders} parent orders, horizon {args.horizon}")
+
+    for algorithm in ALGORITHMS:
+        config = ExecutionConfig(algorithm=algorithm, horizon=args.horizon)
+        start = time.perf_counter()
+        summary = simulate(replay, orders, config).summary()
+        elapsed = time.perf_counter() - start
+        print(
+            f"  {algorithm:<5} {elapsed * 1000:8.1f} ms  {args.orders / elapsed:11,.0f} orders/s  "
+            f"{args.orders * args.horizon / elapsed:13,.0f} order-events/s  "
+            f"mean {summary['mean_bps']:6.2f} bps  p95 {summary['p95_bps']:6.2f} bps"
+        )
+
+    sweep_orders = ParentOrders.random(replay, args.sweep_orders, 60, seed=2)
+    combos = math.prod(len(values) for values in SWEEP_GRID.values())
+    start = time.perf_counter()
+    sweep(replay, sweep_orders, **SWEEP_GRID)
+    print(
+        f"\nSweep: {combos} configs x {args.sweep_orders} orders in "
+        f"{time.perf_counter() - start:.2f}s"
+    )
+
+    config = ExecutionConfig(algorithm="vwap", horizon=args.horizon)
+    sample = ParentOrders(
+        orders.starts[: args.loop_sample],
+        orders.sides[: args.loop_sample],
+        orders.quantities[: args.loop_sample],
+    )
+    start = time.perf_counter()
+    looped = simulate_loop(replay, sample, config)
+    loop_elapsed = time.perf_counter() - start
+    vectorized = simulate(replay, sample, config).shortfall_bps
+    print(
+        f"Scalar loop: {len(sample) / loop_elapsed:,.0f} orders/s on {len(sample)} orders, "
+        f"max |vectorized - loop| = {np.max(np.abs(vectorized - looped)):.2e} bps"
+    )
+
+
+if __name__ == "__main__":
+    main()
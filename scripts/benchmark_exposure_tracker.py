@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Exposure Tracker Benchmark
+==========================
+Replays mixed fill and pre-trade check traffic against the ExposureTracker,
+and against a full recomputation of position, sector, leverage and top-3
+concentration exposure from the positions dict for every check (the way
+RiskExtensions' checks used to work).
+
+Usage:
+    python scripts/benchmark_exposure_tracker.py
+    python scripts/benchmark_exposure_tracker.py --symbols 5000 --ops 500000 --fill-ratio 0.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from phases.phase_281_300_risk_extensions import ExposureTracker  # noqa: E402
+
+LIMITS = {
+    "max_position_size_pct": 0.20,
+    "max_sector_exposure_pct": 0.40,
+    "max_leverage": 1.0,
+    "max_concentration_pct": 0.30,
+    "max_daily_loss_pct": 0.05,
+    "max_drawdown_pct": 0.08,
+}
+
+
+def make_traffic(
+    symbols: list[str], count: int, fill_ratio: float, seed: int = 0
+) -> list[tuple[str, str, str, float, float]]:
+    rng = random.Random(seed)
+    return [
+        (
+            "fill" if rng.random() < fill_ratio else "check",
+            rng.choice(symbols),
+            rng.choice(["buy", "sell"]),
+            float(rng.randint(1, 10)),
+            rng.uniform(90, 110),
+        )
+        for _ in range(count)
+    ]
+
+
+def replay_tracker(tracker: ExposureTracker, traffic) -> tuple[float, int]:
+    approved = 0
+    start = time.perf_counter()
+    for kind, symbol, side, qty, price in traffic:
+        if kind == "fill":
+            tracker.apply_fill(symbol, side, qty, price)
+        else:
+            approved += tracker.check_order(symbol, side, qty, price)["approved"]
+    return time.perf_counter() - start, approved
+
+
+def full_check(positions, sectors, cash, symbol, side, qty, price) -> bool:
+    """Recompute every aggregate from the positions dict for one order."""
+    signed = qty if side == "buy" else -qty
+    held = positions.get(symbol, (0.0, price))[0]
+    if abs(held + signed) <= abs(held):
+        return True
+    values = {s: q * p for s, (q, p) in positions.items()}
+    values[symbol] = (held + signed) * price
+    equity = cash + sum(q * p for q, p in positions.values())
+    sector_values: dict[str, float] = {}
+    for s, v in values.items():
+        sector_values[sectors[s]] = sector_values.get(sectors[s], 0.0) + abs(v)
+    top3 = sum(sorted((abs(v) for v in values.values()), reverse=True)[:3])
+    return (
+        abs(values[symbol]) / equity <= LIMITS["max_position_size_pct"]
+        and sector_values[sectors[symbol]] / equity <= LIMITS["max_sector_exposure_pct"]
+        and sum(abs(v) for v in values.values()) / equity <= LIMITS["max_leverage"]
+        and top3 / equity <= LIMITS["max_concentration_pct"]
+    )
+
+
+def replay_full(positions, sectors, cash, traffic) -> float:
+    start = time.perf_counter()
+    for kind, symbol, side, qty, price in traffic:
+        if kind == "fill":
+            signed = qty if side == "buy" else -qty
+            positions[symbol] = (positions.get(symbol, (0.0, price))[0] + signed, price)
+            cash -= signed * price
+        else:
+            full_check(positions, sectors, cash, symbol, side, qty, price)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exposure tracker benchmark")
+    parser.add_argument("--symbols", type=int, default=2000)
+    parser.add_argument("--ops", type=int, default=200_000)
+    parser.add_argument("--fill-ratio", type=float, default=0.2)
+    parser.add_argument("--full-sample", type=int, default=2000, help="Ops for the full recompute")
+    args = parser.parse_args()
+
+    symbols = [f"S{i:05d}" for i in range(args.symbols)]
+    sectors = {s: f"SECTOR_{i % 11}" for i, s in enumerate(symbols)}
+    rng = random.Random(1)
+    positions = {s: (float(rng.randint(1, 5)), 100.0) for s in symbols}
+    cash = 10_000_000.0
+    tracker = ExposureTracker.from_positions(
+        {s: {"quantity": q, "price": p} for s, (q, p) in positions.items()},
+        LIMITS,
+        equity=cash + sum(q * p for q, p in positions.values()),
+        sectors=sectors,
+    )
+    traffic = make_traffic(symbols, args.ops, args.fill_ratio)
+    print(f"{args.symbols} positions, {args.ops} ops, {args.fill_ratio:.0%} fills")
+
+    elapsed, approved = replay_tracker(tracker, traffic)
+    checks = sum(kind == "check" for kind, *_ in traffic)
+    print(
+        f"  tracker:        {elapsed:8.3f}s  {args.ops / elapsed:12,.0f} ops/s  "
+        f"({approved}/{checks} checks approved)"
+    )
+
+    sample = traffic[: args.full_sample]
+    full_elapsed = replay_full(dict(positions), sectors, cash, sample)
+    per_op = full_elapsed / len(sample)
+    print(
+        f"  full recompute: {full_elapsed:8.3f}s  {1 / per_op:12,.0f} ops/s  "
+        f"({len(sample)}-op sample, {per_op * args.ops / elapsed:.0f}x slower)"
+    )
+
+
+if __name__ == "__main__":
+    main()
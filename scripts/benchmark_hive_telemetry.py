@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Hive Telemetry Benchmark
+========================
+Times one meta-metrics build as decision history grows, with the previous
+full scan (every decision re-parsed for each window, Sharpe and drawdown
+recomputed) and with the materialized rollups. In steady state the
+attribution file holds the latest 1000 decisions and each cycle appends a
+few new ones; the rollups carry the rest of the history.
+
+Usage:
+    python scripts/benchmark_hive_telemetry.py
+    python scripts/benchmark_hive_telemetry.py --history 1000 100000 --agents 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from agents import phase_5600_hive_telemetry as hive  # noqa: E402
+
+
+def make_decisions(n: int, agents: int, end: float, rng: np.random.Generator) -> list[dict]:
+    # About 100 decisions a day across the fleet
+    times = np.sort(end - rng.uniform(0, n / 100 * 86400, n))
+    pnl = rng.normal(1, 20, n).round(2)
+    return [
+        {
+            "agent": f"agent_{i % agents}",
+            "strategy": f"strategy_{i % 5}",
+            "decision": "buy",
+            "timestamp": datetime.fromtimestamp(ts, UTC).isoformat(),
+            "pnl": float(pnl[i]),
+            "pnl_attributed": True,
+        }
+        for i, ts in enumerate(times)
+    ]
+
+
+def legacy_per_agent(decisions: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    """The previous aggregate_per_agent_metrics body."""
+    agent_decisions: dict[str, list] = {}
+    for decision in decisions:
+        agent_decisions.setdefault(decision.get("agent", "unknown"), []).append(decision)
+    per_agent = {}
+    for agent_name, agent_decs in agent_decisions.items():
+        returns = [d.get("pnl", 0) for d in agent_decs if d.get("pnl") is not None]
+        per_agent[agent_name] = {
+            "pnl_1d": hive.calculate_pnl_1d(agent_decs),
+            "pnl_7d": hive.calculate_pnl_7d(agent_decs),
+            "sharpe_30d": hive.calculate_sharpe(returns[-30:]),
+            "winrate_30d": hive.calculate_win_rate(agent_decs),
+            "max_dd_30d": abs(min(returns or [0])),
+            "total_decisions": len(agent_decs),
+        }
+    return per_agent
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hive telemetry benchmark")
+    parser.add_argument("--history", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--agents", type=int, default=10)
+    parser.add_argument("--cycles", type=int, default=20)
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="hive_"))
+    hive.STATE = hive.RUNTIME = tmp
+    hive.ATTRIBUTION_FILE = tmp / "performance_attribution.json"
+    print(f"{args.agents} agents, median of {args.cycles} cycles")
+    print(f"{'decisions':>10}{'full scan':>14}{'rollups':>12}{'unchanged':>12}")
+
+    for n in args.history:
+        rng = np.random.default_rng(0)
+        now = time.time()
+        decisions = make_decisions(n, args.agents, now, rng)
+        legacy_ms = timed(lambda decisions=decisions: legacy_per_agent(decisions), 3)
+
+        # Rollups hold the full history; the file keeps the latest 1000
+        hive.ROLLUP_FILE = tmp / f"rollups_{n}.json"
+        hive._rollups = None
+        hive.ATTRIBUTION_FILE.write_text(json.dumps({"decisions": decisions[-1000:]}))
+        hive.get_rollups().ingest(decisions)
+
+        recent, cycles = decisions[-1000:], []
+        for _ in range(args.cycles):
+            recent = recent[5:] + make_decisions(5, args.agents, time.time(), rng)
+            hive.ATTRIBUTION_FILE.write_text(json.dumps({"decisions": recent}))
+            start = time.perf_counter()
+            hive.build_meta_metrics()
+            cycles.append(time.perf_counter() - start)
+        rollup_ms = statistics.median(cycles) * 1e3
+        unchanged_ms = timed(hive.build_meta_metrics, args.cycles)
+        print(f"{n:>10}{legacy_ms:>11.1f} ms{rollup_ms:>9.1f} ms{unchanged_ms:>9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
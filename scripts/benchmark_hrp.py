@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Hierarchical Risk Parity Benchmark
+==================================
+Times HRP for growing universes: cold (full linkage), cached (same correlation)
+and incremental (one symbol swapped) runs.
+
+Usage:
+    python scripts/benchmark_hrp.py
+    python scripts/benchmark_hrp.py --sizes 100 500 1000 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+import analytics.hierarchical_risk_parity as hrp_module  # noqa: E402
+from analytics.hierarchical_risk_parity import HierarchicalRiskParity  # noqa: E402
+
+
+def make_prices(num_assets: int, num_days: int = 500, seed: int = 0) -> pd.DataFrame:
+    """Block-correlated synthetic prices."""
+    rng = np.random.default_rng(seed)
+    blocks = max(2, num_assets // 50)
+    factors = rng.normal(0, 0.01, (num_days, blocks))
+    returns = factors[:, np.arange(num_assets) % blocks] + rng.normal(
+        0, 0.01, (num_days, num_assets)
+    )
+    names = [f"S{i:05d}" for i in range(num_assets)]
+    return pd.DataFrame(100 * np.cumprod(1 + returns, axis=0), columns=names)
+
+
+def timed(prices: pd.DataFrame) -> float:
+    hrp = HierarchicalRiskParity(prices)
+    start = time.perf_counter()
+    hrp.optimize()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HRP benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 1000])
+    args = parser.parse_args()
+
+    print(f"{'assets':>7} {'cold ms':>10} {'cached ms':>10} {'incremental ms':>15}")
+    for size in args.sizes:
+        hrp_module._TREE_CACHE.clear()
+        hrp_module._LAST_TREE.clear()
+        prices = make_prices(size + 1)
+        base = prices.iloc[:, :size]
+        swapped = prices.drop(columns=[prices.columns[0]])
+
+        cold = timed(base)
+        cached = timed(base)
+        incremental = timed(swapped)
+        print(f"{size:>7} {cold * 1e3:>10.1f} {cached * 1e3:>10.1f} {incremental * 1e3:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
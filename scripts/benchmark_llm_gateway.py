@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+LLM Gateway Benchmark
+=====================
+Agent LLM calls against a local stub model server with a fixed inference
+delay: the previous direct requests.post per query (new connection, quota
+file read and rewritten per call) versus the gateway's pooled session,
+response cache, in-flight deduplication and in-memory quota counter.
+
+Usage:
+    python scripts/benchmark_llm_gateway.py
+    python scripts/benchmark_llm_gateway.py --delay 0.2 --concurrent 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from utils import agent_ai_client, llm_gateway  # noqa: E402
+from utils.llm_gateway import LLMGateway, QuotaCounter  # noqa: E402
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # Headers and body go out in separate writes
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.calls += 1
+        time.sleep(self.server.delay)
+        data = json.dumps({"response": f"HOLD {len(body['prompt'])}"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def rca_prompt(i: int) -> str:
+    """A repeat of one failure, differing only in timestamp and address."""
+    return (
+        f"Analyze failure at 2026-03-01T12:{i % 60:02d}:00Z\n"
+        f"ConnectionError: broker session 0x{i * 7919:x} reset by peer"
+    )
+
+
+def legacy_query(url: str, prompt: str, usage_file: Path) -> str:
+    """The previous query path: fresh connection, quota file per call."""
+    try:
+        usage = json.loads(usage_file.read_text())
+    except (OSError, ValueError):
+        usage = {"count": 0}  # As before: a torn concurrent write resets the count
+    response = requests.post(f"{url}/api/generate", json={"prompt": prompt}, timeout=30)
+    usage["count"] += 1
+    usage_file.write_text(json.dumps(usage, indent=2))
+    return response.json()["response"]
+
+
+def timed_ms(fn, repeat: int) -> float:
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM gateway benchmark")
+    parser.add_argument("--delay", type=float, default=0.05, help="Stub inference seconds")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--concurrent", type=int, default=16)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.delay, server.calls = args.delay, 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    tmp = Path(tempfile.mkdtemp(prefix="llm_gateway_"))
+    gateway = LLMGateway(
+        tmp / "llm_cache.jsonl",
+        quotas={"rapidapi": QuotaCounter(tmp / "usage.json", limit=10**9)},
+    )
+    llm_gateway._gateway = gateway
+    agent_ai_client.OLLAMA_BASE_URL = url
+    print(f"stub model server: {args.delay * 1e3:.0f} ms per generation")
+
+    legacy = timed_ms(lambda i: legacy_query(url, rca_prompt(i), tmp / "legacy.json"), 10)
+    cold = timed_ms(lambda i: agent_ai_client.query_ollama(f"cold prompt {i}"), 10)
+    exact = timed_ms(lambda _: agent_ai_client.query_ollama(rca_prompt(0)), args.repeat)
+    near = timed_ms(lambda i: agent_ai_client.query_ollama(rca_prompt(i)), args.repeat)
+    print(f"\n{'repeated analysis':<28}{'latency':>12}")
+    print(f"{'direct request (before)':<28}{legacy:>9.2f} ms")
+    print(f"{'gateway, cache miss':<28}{cold:>9.2f} ms")
+    print(f"{'gateway, exact repeat':<28}{exact * 1e3:>9.1f} us")
+    print(f"{'gateway, normalized repeat':<28}{near * 1e3:>9.1f} us")
+
+    prompts = [f"burst prompt {i // args.concurrent}" for i in range(args.concurrent * 4)]
+    with ThreadPoolExecutor(args.concurrent) as pool:
+        server.calls = 0
+        start = time.perf_counter()
+        list(pool.map(lambda p: legacy_query(url, p, tmp / "legacy.json"), prompts))
+        direct, direct_calls = time.perf_counter() - start, server.calls
+        server.calls = 0
+        start = time.perf_counter()
+        list(pool.map(lambda p: agent_ai_client.query_ollama(p, use_cache=False), prompts))
+        dedup, dedup_calls = time.perf_counter() - start, server.calls
+    print(
+        f"\n{len(prompts)} queries in bursts of {args.concurrent} identical prompts:\n"
+        f"  direct  {direct * 1e3:7.0f} ms, {direct_calls} model calls\n"
+        f"  gateway {dedup * 1e3:7.0f} ms, {dedup_calls} model calls (cache off, dedup only)"
+    )
+
+    quota = gateway.quotas["rapidapi"]
+    usage_file = tmp / "legacy_quota.json"
+    usage_file.write_text(json.dumps({"count": 0}))
+
+    def file_increment(_):
+        usage = json.loads(usage_file.read_text())
+        usage["count"] += 1
+        usage_file.write_text(json.dumps(usage, indent=2))
+
+    per_file = timed_ms(file_increment, 1000)
+    per_memory = timed_ms(lambda _: quota.increment(), 1000)
+    print(
+        f"\nquota increment: file read/write {per_file * 1e3:.1f} us, "
+        f"in-memory {per_memory * 1e3:.2f} us"
+    )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Model Tuning Benchmark
+======================
+Times a nightly model-selection cycle (auto model selection, tuning of the
+forest and boosted models, voting ensemble) on synthetic equity history,
+with the previous serial implementation and with the cached, parallel
+successive-halving engine, and compares held-out scores.
+
+Usage:
+    python scripts/benchmark_model_tuning.py
+    python scripts/benchmark_model_tuning.py --rows 5000 --workers 8 --exhaustive
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from sklearn.ensemble import (  # noqa: E402
+    GradientBoostingRegressor,
+    RandomForestRegressor,
+    VotingRegressor,
+)
+from sklearn.linear_model import Ridge  # noqa: E402
+from sklearn.metrics import r2_score  # noqa: E402
+from sklearn.model_selection import (  # noqa: E402
+    GridSearchCV,
+    RandomizedSearchCV,
+    train_test_split,
+)
+
+from agents import ml_pipeline  # noqa: E402
+
+TUNED = ["random_forest", "gradient_boosting"]
+
+
+def synthetic_history(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    equity = 100_000 + np.cumsum(rng.normal(5, 200, rows))
+    return pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2024-01-01", periods=rows, freq="h").astype(str),
+            "equity": equity,
+            "pnl_pct": rng.normal(0, 1, rows),
+            "trades": rng.integers(0, 20, rows),
+            "win_rate": rng.random(rows),
+        }
+    )
+
+
+def legacy_split(df: pd.DataFrame):
+    """Feature engineering and split, redone on every call as before."""
+    df_eng = ml_pipeline.engineer_features(df.copy())
+    cols = [c for c in df_eng.columns if c not in ml_pipeline.NON_FEATURE_COLUMNS]
+    X = df_eng[cols].select_dtypes(include=[np.number]).fillna(0)
+    return train_test_split(X, df_eng["equity"], test_size=0.2, random_state=42)
+
+
+def legacy_cycle(df: pd.DataFrame, exhaustive: bool) -> dict[str, float]:
+    scores = {}
+    for model_type in ["random_forest", "gradient_boosting", "ridge", "linear_regression"]:
+        X_train, X_test, y_train, y_test = legacy_split(df)
+        model = ml_pipeline.build_model(model_type).fit(X_train, y_train)
+        scores[f"select/{model_type}"] = r2_score(y_test, model.predict(X_test))
+
+    for model_type in TUNED:
+        X_train, X_test, y_train, y_test = legacy_split(df)
+        base = ml_pipeline.build_model(model_type, {})
+        grid = ml_pipeline.PARAM_GRIDS[model_type]
+        if exhaustive:
+            search = GridSearchCV(base, grid, cv=3, scoring="r2", n_jobs=1)
+        else:
+            search = RandomizedSearchCV(
+                base, grid, n_iter=10, cv=3, scoring="r2", n_jobs=1, random_state=42
+            )
+        search.fit(X_train, y_train)
+        scores[f"tune/{model_type}"] = r2_score(y_test, search.best_estimator_.predict(X_test))
+
+    X_train, X_test, y_train, y_test = legacy_split(df)
+    ensemble = VotingRegressor(
+        [
+            ("rf", RandomForestRegressor(n_estimators=50, random_state=42)),
+            ("gb", GradientBoostingRegressor(n_estimators=50, random_state=42)),
+            ("ridge", Ridge(alpha=1.0)),
+        ]
+    ).fit(X_train, y_train)
+    scores["ensemble"] = r2_score(y_test, ensemble.predict(X_test))
+    return scores
+
+
+def engine_cycle(df: pd.DataFrame) -> dict[str, float]:
+    scores = {}
+    selection = ml_pipeline.auto_model_selection(df)
+    for row in selection["all_results"]:
+        scores[f"select/{row['model_type']}"] = row["r2_score"]
+    for model_type in TUNED:
+        scores[f"tune/{model_type}"] = ml_pipeline.hyperparameter_tuning(model_type, df)["test_r2"]
+    scores["ensemble"] = ml_pipeline.train_ensemble_model(df, "voting")["r2_score"]
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model tuning benchmark")
+    parser.add_argument("--rows", type=int, default=3000)
+    parser.add_argument("--workers", type=int, default=None, help="Default: CPU count")
+    parser.add_argument(
+        "--exhaustive", action="store_true", help="Legacy baseline uses the full grid"
+    )
+    args = parser.parse_args()
+
+    if args.workers:
+        ml_pipeline.ML_WORKERS = args.workers
+    ml_pipeline.MODELS_DIR = Path(tempfile.mkdtemp(prefix="ml_models_"))
+    df = synthetic_history(args.rows)
+    baseline = "exhaustive grid" if args.exhaustive else "randomized search"
+    print(f"{args.rows} rows, {ml_pipeline.ML_WORKERS} workers, legacy tuning: {baseline}")
+
+    start = time.perf_counter()
+    legacy = legacy_cycle(df, args.exhaustive)
+    legacy_seconds = time.perf_counter() - start
+
+    ml_pipeline._dataset_cache.clear()
+    start = time.perf_counter()
+    engine = engine_cycle(df)
+    engine_seconds = time.perf_counter() - start
+
+    print(f"\n{'step':<28}{'legacy R2':>12}{'engine R2':>12}")
+    for key in legacy:
+        print(f"{key:<28}{legacy[key]:12.5f}{engine[key]:12.5f}")
+    print(
+        f"\nCycle: legacy {legacy_seconds:.1f} s, engine {engine_seconds:.1f} s "
+        f"({legacy_seconds / engine_seconds:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
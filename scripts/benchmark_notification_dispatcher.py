@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Notification Dispatcher Benchmark
+=================================
+An alert storm against a local fake Telegram Bot API with a fixed response
+delay: the previous inline requests.post per alert versus queueing on the
+notification dispatcher, which coalesces the storm into digests sent from
+a background thread.
+
+Usage:
+    python scripts/benchmark_notification_dispatcher.py
+    python scripts/benchmark_notification_dispatcher.py --alerts 2000 --delay 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from utils.notification_dispatcher import NotificationDispatcher  # noqa: E402
+
+
+class FakeTelegramHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.calls += 1
+        time.sleep(self.server.delay)
+        data = json.dumps({"ok": True}).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def report(label: str, timings: list[float]) -> None:
+    timings = sorted(timings)
+    print(
+        f"{label:<22} median {statistics.median(timings) * 1e6:10.1f} us   "
+        f"p99 {timings[int(len(timings) * 0.99)] * 1e6:10.1f} us   "
+        f"total {sum(timings):7.3f} s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Notification dispatcher benchmark")
+    parser.add_argument("--alerts", type=int, default=1000)
+    parser.add_argument("--legacy-alerts", type=int, default=20, help="Blocking posts timed")
+    parser.add_argument("--delay", type=float, default=0.1, help="Fake API response seconds")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeTelegramHandler)
+    server.daemon_threads = True
+    server.delay, server.calls = args.delay, 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    alerts = [f"⚠️ Anomaly in agent_{i % 50}: error_rate z={i % 7}" for i in range(args.alerts)]
+    print(f"{args.alerts} alerts, fake Telegram answers in {args.delay * 1e3:.0f} ms")
+
+    # Previous path: one blocking post per alert on the caller's thread
+    timings = []
+    for text in alerts[: args.legacy_alerts]:
+        start = time.perf_counter()
+        requests.post(
+            f"{url}/botTOKEN/sendMessage", json={"chat_id": "1", "text": text}, timeout=10
+        )
+        timings.append(time.perf_counter() - start)
+    print()
+    report("inline requests.post", timings)
+    print(f"  -> {statistics.mean(timings) * args.alerts:.1f} s of caller time for the storm")
+
+    server.calls = 0
+    dispatcher = NotificationDispatcher(
+        "TOKEN", chat_id="1", api_url=url, spill_path=Path(tempfile.mkdtemp()) / "spill.jsonl"
+    )
+    timings = []
+    for text in alerts:
+        start = time.perf_counter()
+        dispatcher.notify(text)
+        timings.append(time.perf_counter() - start)
+    report("dispatcher.notify", timings)
+    start = time.perf_counter()
+    dispatcher.flush(timeout=60)
+    print(f"  -> delivered in {time.perf_counter() - start:.2f} s as {server.calls} messages")
+    print("  ", dispatcher.stats)
+    dispatcher.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
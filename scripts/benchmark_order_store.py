@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Order Store Benchmark
+=====================
+Measures CoreTradingEngine create/cancel latency as order history grows, and
+compares it with the legacy full JSON rewrite per operation.
+
+Usage:
+    python scripts/benchmark_order_store.py
+    python scripts/benchmark_order_store.py --history 1000000 --samples 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import phases.phase_51_90_core_trading as core_trading  # noqa: E402
+from phases.phase_51_90_core_trading import CoreTradingEngine, Order  # noqa: E402
+
+
+def seed_history(engine: CoreTradingEngine, count: int) -> None:
+    """Append historical (filled) orders through the store."""
+    for i in range(count):
+        order = Order(f"HIST_{i:08d}", f"SYM{i % 500}", "buy", 1.0)
+        order.status = "filled"
+        engine.store.put(order)
+    engine.store.compact()
+
+
+def time_operations(engine: CoreTradingEngine, samples: int) -> tuple[float, float, float]:
+    """Mean microseconds per create, cancel and pending-orders query."""
+    start = time.perf_counter()
+    order_ids = [engine.create_order("SPY", "buy", 1.0, "limit", 100.0) for _ in range(samples)]
+    create = (time.perf_counter() - start) / samples
+    start = time.perf_counter()
+    for order_id in order_ids:
+        engine.cancel_order(order_id)
+    cancel = (time.perf_counter() - start) / samples
+    start = time.perf_counter()
+    engine.get_orders(status="pending")
+    query = time.perf_counter() - start
+    return create * 1e6, cancel * 1e6, query * 1e6
+
+
+def legacy_save_seconds(count: int) -> float:
+    """One legacy save_state: json.dumps(indent=2) of every order."""
+    orders = [Order(f"HIST_{i:08d}", "SPY", "buy", 1.0).to_dict() for i in range(count)]
+    start = time.perf_counter()
+    json.dumps({"orders": orders}, indent=2)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Order store benchmark")
+    parser.add_argument("--history", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--samples", type=int, default=1000)
+    args = parser.parse_args()
+    core_trading.logger.setLevel(logging.WARNING)
+    logging.getLogger("utils.order_store").setLevel(logging.WARNING)
+
+    print(
+        f"{'history':>10} {'create us':>10} {'cancel us':>10} {'pending q us':>13} {'legacy ms':>10}"
+    )
+    for history in args.history:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = CoreTradingEngine(store_dir=Path(tmp))
+            seed_history(engine, history)
+            create, cancel, query = time_operations(engine, args.samples)
+            engine.store.close()
+        legacy = legacy_save_seconds(history) * 1e3
+        print(f"{history:>10,} {create:>10.1f} {cancel:>10.1f} {query:>13.1f} {legacy:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Pattern Engine Benchmark
+========================
+Candlestick and chart patterns across a universe: one EnhancedSignalGenerator
+per symbol (latest bar only) versus the vectorized engine over every bar of
+every symbol, and the incremental scan after one new bar.
+
+Usage:
+    python scripts/benchmark_pattern_engine.py
+    python scripts/benchmark_pattern_engine.py --symbols 2000 --years 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from agents.enhanced_signals import EnhancedSignalGenerator  # noqa: E402
+from analytics.pattern_engine import (  # noqa: E402
+    CANDLESTICK_PATTERNS,
+    CHART_PATTERNS,
+    PatternEngine,
+)
+
+
+def make_ohlc(symbols: int, bars: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (symbols, bars)), axis=1))
+    open_ = close * np.exp(rng.normal(0, 0.01, close.shape))
+    high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 0.01, close.shape)))
+    low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 0.01, close.shape)))
+    return np.stack([open_, high, low, close])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pattern engine benchmark")
+    parser.add_argument("--symbols", type=int, default=1000)
+    parser.add_argument("--years", type=float, default=5)
+    parser.add_argument("--sample", type=int, default=50, help="Symbols timed per generator")
+    args = parser.parse_args()
+    logging.getLogger("enhanced_signals").setLevel(logging.WARNING)
+
+    bars = int(args.years * 252)
+    ohlc = make_ohlc(args.symbols, bars)
+    print(f"{args.symbols} symbols x {bars} bars")
+
+    # Previous path: a generator per symbol, patterns for its latest bar
+    start = time.perf_counter()
+    for row in range(args.sample):
+        frame = pd.DataFrame(dict(zip(["Open", "High", "Low", "Close"], ohlc[:, row], strict=True)))
+        generator = EnhancedSignalGenerator(frame)
+        generator.detect_candlestick_patterns()
+        generator.detect_chart_patterns()
+    per_symbol = (time.perf_counter() - start) / args.sample
+    print(
+        f"\ngenerator per symbol, latest bar: {per_symbol * 1e3:.1f} ms/symbol, "
+        f"{per_symbol * args.symbols:.1f} s for the universe"
+    )
+    print(f"  (every bar of history that way: ~{per_symbol * args.symbols * bars / 3600:.0f} h)")
+
+    engine = PatternEngine()
+    symbols = [f"SYM{i}" for i in range(args.symbols)]
+    start = time.perf_counter()
+    result = engine.scan(*ohlc[:, :, :-1], symbols=symbols)
+    full = time.perf_counter() - start
+    print(f"engine, every bar of every symbol: {full:.2f} s")
+
+    start = time.perf_counter()
+    engine.scan(*ohlc, symbols=symbols)
+    print(f"engine, one new bar appended: {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    hits = {name: int(result[name].sum()) for name in {**CANDLESTICK_PATTERNS, **CHART_PATTERNS}}
+    print("\npattern occurrences:")
+    for name, count in sorted(hits.items(), key=lambda item: -item[1]):
+        print(f"  {name:<28}{count:>10}")
+
+
+if __name__ == "__main__":
+    main()
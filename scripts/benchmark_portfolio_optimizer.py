@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Portfolio Optimizer Benchmark
+=============================
+Times the constrained solvers behind PortfolioOptimizer: the mean-CVaR
+Rockafellar-Uryasev LP (full and constraint-generation) and the ADMM
+mean-variance QP (cold and warm-started).
+
+Usage:
+    python scripts/benchmark_portfolio_optimizer.py
+    python scripts/benchmark_portfolio_optimizer.py --assets 500 --scenarios 5000 --full-lp
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+
+from analytics.portfolio_solvers import (  # noqa: E402
+    PortfolioConstraints,
+    max_sharpe_weights,
+    mean_cvar_weights,
+    mean_variance_weights,
+)
+
+
+def make_returns(num_assets: int, num_days: int, seed: int = 0) -> np.ndarray:
+    """Daily returns with a market factor, sector factors and fat tails."""
+    rng = np.random.default_rng(seed)
+    factors = rng.standard_t(4, (num_days, 6)) * 0.008
+    loadings = np.column_stack(
+        [rng.normal(1, 0.3, num_assets), rng.normal(0, 0.5, (num_assets, 5))]
+    )
+    idio = rng.standard_t(4, (num_days, num_assets)) * 0.012
+    return factors @ loadings.T + idio + rng.normal(0.0004, 0.0003, num_assets)
+
+
+def timed(label: str, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<34} {time.perf_counter() - start:>8.2f} s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Portfolio optimizer benchmark")
+    parser.add_argument("--assets", type=int, default=500)
+    parser.add_argument("--scenarios", type=int, default=5000)
+    parser.add_argument("--max-weight", type=float, default=0.05)
+    parser.add_argument("--full-lp", action="store_true", help="Also time the full LP")
+    args = parser.parse_args()
+
+    returns = make_returns(args.assets, args.scenarios)
+    cov = np.cov(returns.T) * 252
+    mean = returns.mean(axis=0) * 252
+    constraints = PortfolioConstraints(upper=args.max_weight)
+    print(f"{args.assets} assets x {args.scenarios} scenarios, max weight {args.max_weight:.0%}")
+
+    timed(
+        "mean-CVaR (constraint generation)",
+        lambda: mean_cvar_weights(returns, 0.95, constraints=constraints, method="active"),
+    )
+    if args.full_lp:
+        timed(
+            "mean-CVaR (full LP)",
+            lambda: mean_cvar_weights(returns, 0.95, constraints=constraints, method="lp"),
+        )
+
+    cold = timed(
+        "min variance QP (cold)", lambda: mean_variance_weights(cov, constraints=constraints)
+    )
+    timed(
+        "min variance QP (warm, next day)",
+        lambda: mean_variance_weights(cov * 1.01, constraints=constraints, warm_start=cold),
+    )
+    sharpe = timed("max Sharpe QP (cold)", lambda: max_sharpe_weights(cov, mean, 0.02, constraints))
+    timed(
+        "max Sharpe QP (warm, next day)",
+        lambda: max_sharpe_weights(cov * 1.01, mean, 0.02, constraints, warm_start=sharpe),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+RCA Engine Benchmark
+====================
+Similar-incident lookup and incident recording against a large incident
+history: the previous linear keyword scan and full knowledge-base rewrite
+versus the fingerprint/MinHash-LSH index and append-only store.
+
+Usage:
+    python scripts/benchmark_rca_engine.py
+    python scripts/benchmark_rca_engine.py --incidents 200000 --kinds 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from agents.rca_engine import IncidentIndex  # noqa: E402
+
+EXCEPTIONS = ["ConnectionError", "KeyError", "ValueError", "TimeoutError", "RuntimeError"]
+FUNCTIONS = [f"step_{i}" for i in range(40)]
+
+
+def trace(kind: int, variant: int) -> str:
+    rng = random.Random(kind)
+    lines = ["Traceback (most recent call last):"]
+    for depth, func in enumerate(rng.sample(FUNCTIONS, 4)):
+        lines.append(
+            f'  File "/srv/r{variant}/agents/mod{kind}_{depth}.py", line {variant}, in {func}'
+        )
+        lines.append(f"    value = {func}(batch, attempt={variant})")
+    lines.append(f"{rng.choice(EXCEPTIONS)}: job {variant} failed at 0x{variant * 7919:08x}")
+    return "\n".join(lines)
+
+
+def legacy_find(incidents: list[dict], agent_name: str, error_log: str) -> list[dict]:
+    """The previous _find_similar_incidents."""
+    error_keywords = set(re.findall(r"\w+Error|\w+Exception", error_log))
+    similar = []
+    for incident in incidents:
+        if incident.get("agent") == agent_name and error_keywords & set(
+            incident.get("error_keywords", [])
+        ):
+            similar.append(incident)
+    return similar[:5]
+
+
+def timed_ms(fn, args_list) -> float:
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RCA engine benchmark")
+    parser.add_argument("--incidents", type=int, default=100_000)
+    parser.add_argument("--kinds", type=int, default=2000, help="Distinct failures")
+    parser.add_argument("--agents", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    tmp = Path(tempfile.mkdtemp(prefix="rca_"))
+    index = IncidentIndex(tmp / "incidents.jsonl", max_incidents=args.incidents)
+    legacy: list[dict] = []
+    kinds = {}
+    start = time.perf_counter()
+    for i in range(args.incidents):
+        kind = rng.randrange(args.kinds)
+        agent = f"agent_{kind % args.agents}"
+        kinds[kind] = agent
+        incident = {
+            "agent": agent,
+            "root_cause": f"cause_{kind}",
+            "solution": "fix",
+            "success": True,
+        }
+        index.add(incident, trace(kind, i))
+        legacy.append(index.incidents[-1])
+    build = time.perf_counter() - start
+    print(
+        f"{args.incidents} incidents, {args.kinds} distinct failures, {args.agents} agents "
+        f"(indexed in {build:.1f} s, {build / args.incidents * 1e6:.0f} us per incident)"
+    )
+
+    known = rng.sample(sorted(kinds), args.queries)
+    repeat = [(kinds[k], trace(k, rng.randrange(10**6))) for k in known]
+    near = [(agent, log + "\nduring shutdown of worker pool") for agent, log in repeat]
+    unseen = [(f"agent_{k % args.agents}", trace(args.kinds + k, 1)) for k in range(args.queries)]
+
+    print(f"\n{'lookup':<22}{'linear scan':>14}{'index':>12}")
+    for label, queries in [
+        ("repeat failure", repeat),
+        ("near duplicate", near),
+        ("new failure", unseen),
+    ]:
+        scan = timed_ms(lambda a, log: legacy_find(legacy, a, log), queries[:20])
+        fast = timed_ms(index.query, queries)
+        print(f"{label:<22}{scan:>11.1f} ms{fast:>9.3f} ms")
+
+    hits = sum(
+        index.query(a, log)[0][1]["root_cause"] == f"cause_{k}"
+        for (a, log), k in zip(near, known, strict=True)
+    )
+    print(f"near-duplicate top hit correct: {hits}/{len(near)}")
+
+    kb = tmp / "kb.json"
+    rewrite = timed_ms(lambda: kb.write_text(json.dumps({"incidents": legacy}, indent=2)), [()] * 3)
+    append = timed_ms(
+        lambda: index.add({"agent": "agent_0", "root_cause": "x"}, trace(1, 1)), [()] * 50
+    )
+    print(f"\nrecord_incident: rewrite knowledge base {rewrite:.0f} ms, append {append:.2f} ms")
+
+    start = time.perf_counter()
+    IncidentIndex(tmp / "incidents.jsonl", max_incidents=args.incidents)
+    print(f"index reload at startup: {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
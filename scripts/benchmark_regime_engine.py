@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Regime Engine Benchmark
+=======================
+Regime classification for a universe on every new bar: the previous
+threshold detector rerun on each symbol's full DataFrame versus one online
+HMM forward-filter step for all symbols, plus the offline Baum-Welch fit.
+
+Usage:
+    python scripts/benchmark_regime_engine.py
+    python scripts/benchmark_regime_engine.py --symbols 2000 --years 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from agents import regime_detector  # noqa: E402
+from analytics.regime_engine import RegimeEngine  # noqa: E402
+
+
+def make_prices(symbols: int, bars: int, seed: int = 0) -> np.ndarray:
+    """Random walks whose drift and volatility switch every few weeks."""
+    rng = np.random.default_rng(seed)
+    regime = rng.integers(0, 4, (symbols, bars // 20 + 1)).repeat(20, axis=1)[:, :bars]
+    drift = np.array([-0.002, 0.0, 0.002, 0.0])[regime]
+    vol = np.array([0.01, 0.005, 0.01, 0.03])[regime]
+    return 100 * np.exp(np.cumsum(drift + vol * rng.standard_normal((symbols, bars)), axis=1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regime engine benchmark")
+    parser.add_argument("--symbols", type=int, default=1000)
+    parser.add_argument("--years", type=float, default=5)
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--sample", type=int, default=100, help="Symbols timed per detector")
+    args = parser.parse_args()
+
+    bars = int(args.years * 252)
+    prices = make_prices(args.symbols, bars + args.ticks)
+    symbols = [f"SYM{i}" for i in range(args.symbols)]
+    print(f"{args.symbols} symbols x {bars} bars, then {args.ticks} live bars")
+
+    # Previous path: thresholds recomputed from each symbol's whole DataFrame
+    regime_detector.HAS_REGIME_ENGINE = False
+    frames = [pd.DataFrame({"equity": prices[i, :bars]}) for i in range(args.sample)]
+    start = time.perf_counter()
+    for frame in frames:
+        regime_detector.detect_regime(frame)
+    legacy = (time.perf_counter() - start) / args.sample
+    print(
+        f"\nthreshold detector per symbol: {legacy * 1e6:.0f} us/symbol, "
+        f"{legacy * args.symbols * 1e3:.0f} ms per universe bar"
+    )
+
+    engine = RegimeEngine()
+    start = time.perf_counter()
+    engine.fit(prices[:, :bars], symbols)
+    print(f"HMM fit (batched Baum-Welch, offline): {time.perf_counter() - start:.1f} s")
+
+    start = time.perf_counter()
+    for t in range(bars, bars + args.ticks):
+        engine.update(prices[:, t])
+    tick = (time.perf_counter() - start) / args.ticks
+    print(
+        f"HMM online update: {tick * 1e6:.0f} us per universe bar, "
+        f"{tick / args.symbols * 1e9:.0f} ns/symbol ({legacy / tick * args.symbols:.0f}x)"
+    )
+
+    counts = pd.Series(engine.posterior.argmax(axis=1)).map(dict(enumerate(engine.labels)))
+    print("\nlatest regimes:", counts.value_counts().to_dict())
+
+
+if __name__ == "__main__":
+    main()
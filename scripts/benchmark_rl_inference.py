@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+RL Policy Inference Latency Benchmark
+=====================================
+Measures RLPolicyService latency for a batched universe: the single forward
+pass (predict_batch) and the full decide() call including state building,
+against the legacy per-symbol RLInferenceEngine.generate_weights loop.
+
+Usage:
+    python scripts/benchmark_rl_inference.py
+    python scripts/benchmark_rl_inference.py --symbols 500 --numpy
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+
+from ai.rl_environment import generate_synthetic_prices  # noqa: E402
+from ai.rl_inference import RLInferenceEngine, RLPolicyService  # noqa: E402
+
+
+def timed_ms(fn, repeats: int) -> float:
+    """Median wall time of fn() in milliseconds."""
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return float(np.median(samples))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RL inference latency benchmark")
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--legacy-symbols", type=int, default=20)
+    parser.add_argument("--numpy", action="store_true", help="Force the NumPy fallback policy")
+    args = parser.parse_args()
+
+    service = RLPolicyService(use_torch=not args.numpy)
+    prices = generate_synthetic_prices(num_series=args.symbols, length=200, seed=3)
+    histories = {f"SYM{i}": deque(prices[i], maxlen=200) for i in range(args.symbols)}
+    _, states = service.build_states(histories)
+
+    forward_ms = timed_ms(lambda: service.predict_batch(states), args.repeats)
+    decide_ms = timed_ms(lambda: service.decide(histories), max(args.repeats // 5, 3))
+
+    engine = RLInferenceEngine()
+    legacy_ms = timed_ms(lambda: [engine.generate_weights() for _ in range(args.legacy_symbols)], 3)
+    legacy_universe_ms = legacy_ms / args.legacy_symbols * args.symbols
+
+    print(f"Universe size:                 {args.symbols}")
+    print(f"Batched forward pass:          {forward_ms:8.2f} ms")
+    print(f"Batched decide (incl. states): {decide_ms:8.2f} ms")
+    print(f"Legacy per-symbol (projected): {legacy_universe_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
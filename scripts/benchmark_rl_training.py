@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+RL Training Throughput Benchmark
+================================
+Compares environment steps per second of the legacy single-environment loop
+(TradingEnvironment.step + PPOAgent.select_action per step) against the
+vectorized trainer (VectorizedTradingEnvironment + RolloutBuffer + minibatch PPO).
+
+Usage:
+    python scripts/benchmark_rl_training.py
+    python scripts/benchmark_rl_training.py --num-envs 64 --steps 500000 --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from ai.rl_agent import PPOAgent  # noqa: E402
+from ai.rl_environment import TradingEnvironment, generate_synthetic_prices  # noqa: E402
+from ai.rl_trainer import RLTrainer  # noqa: E402
+
+
+def seed_legacy_state(env: TradingEnvironment, directory: Path, rows: int = 2000):
+    """Point the legacy environment at realistic P&L / equity CSVs in a temp dir."""
+    rng = np.random.default_rng(0)
+    ts = pd.date_range(end=pd.Timestamp.now(), periods=rows, freq="15min")
+    equity = 100000 * np.cumprod(1 + rng.normal(0.0002, 0.004, rows))
+    pd.DataFrame({"ts": ts, "symbol": "SPY", "pnl": rng.normal(5, 50, rows)}).to_csv(
+        directory / "pnl_history.csv", index=False
+    )
+    pd.DataFrame(
+        {
+            "ts": ts,
+            "equity": equity,
+            "mdd_pct": rng.uniform(0, 10, rows),
+            "rolling_sharpe": rng.normal(1, 0.3, rows),
+        }
+    ).to_csv(directory / "performance_metrics.csv", index=False)
+    env.pnl_csv = directory / "pnl_history.csv"
+    env.perf_csv = directory / "performance_metrics.csv"
+
+
+def bench_legacy(steps: int, use_torch: bool) -> float:
+    """Steps per second of the one-env, one-step-at-a-time loop."""
+    env = TradingEnvironment()
+    tmp = tempfile.TemporaryDirectory()
+    seed_legacy_state(env, Path(tmp.name))
+    agent = PPOAgent(use_torch=use_torch)
+    state = env.get_state_vector(env.get_state())
+    previous_state = None
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        action, log_prob, value = agent.select_action(state)
+        new_state, reward, done, _ = env.step(action, previous_state)
+        agent.store_transition(state, action, reward, log_prob, value, done)
+        previous_state = new_state
+        state = env.get_state_vector(new_state)
+    agent.train(epochs=5, batch_size=32)
+    elapsed = time.perf_counter() - start
+    tmp.cleanup()
+    return steps / elapsed
+
+
+def bench_vectorized(steps: int, num_envs: int, workers: int, use_torch: bool) -> float:
+    """Steps per second of the vectorized trainer (collection + PPO updates)."""
+    trainer = RLTrainer()
+    trainer.agent = PPOAgent(use_torch=use_torch)
+    prices = generate_synthetic_prices(num_series=32, length=2520, seed=7)
+    summary = trainer.train_vectorized(
+        total_steps=steps,
+        num_envs=num_envs,
+        num_workers=workers,
+        prices=prices,
+        seed=7,
+        save=False,
+    )
+    return summary["steps_per_second"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RL training throughput benchmark")
+    parser.add_argument("--legacy-steps", type=int, default=200)
+    parser.add_argument("--steps", type=int, default=200_000)
+    parser.add_argument("--num-envs", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--numpy", action="store_true", help="Force the NumPy fallback policy")
+    args = parser.parse_args()
+
+    use_torch = not args.numpy
+    np.random.seed(0)
+
+    legacy = bench_legacy(args.legacy_steps, use_torch)
+    vectorized = bench_vectorized(args.steps, args.num_envs, args.workers, use_torch)
+
+    print(f"Legacy loop:      {legacy:>12,.0f} steps/s")
+    print(f"Vectorized ({args.num_envs:>3}): {vectorized:>12,.0f} steps/s")
+    print(f"Speedup:          {vectorized / max(legacy, 1e-9):>12,.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Sentiment Engine Benchmark
+==========================
+A market-intelligence refresh against local stub Reddit/Twitter/NewsAPI/FRED
+endpoints with a fixed response delay: the previous serial per-symbol calls
+(new Reddit token per symbol, two searches, one Twitter and one news query)
+versus the sentiment engine's concurrent, batched and cached collection.
+
+Source rate limits are multiplied by --rate-scale so the stub run finishes
+quickly; with real limits each source is bound by its own quota instead.
+
+Usage:
+    python scripts/benchmark_sentiment_engine.py
+    python scripts/benchmark_sentiment_engine.py --symbols 500 --delay 0.1
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from agents import market_intelligence as mi  # noqa: E402
+from analytics.sentiment_engine import SentimentEngine  # noqa: E402
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.calls["reddit_auth"] += 1
+        time.sleep(self.server.delay)
+        self._reply({"access_token": "token", "expires_in": 3600})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = " ".join(v[0] for v in parse_qs(url.query).values())
+        source = url.path.split("/")[1]
+        self.server.calls[source] += 1
+        time.sleep(self.server.delay)
+        posts = [{"data": {"ups": 12}}] * 5
+        tweets = [{"text": f"{word} to the moon"} for word in query.split()]
+        articles = [{"title": f"{word} shares rise"} for word in query.split()]
+        observations = [{"value": "4.5", "date": "2026-09-01"}]
+        self._reply(
+            {
+                "data": {"children": posts} if source == "reddit" else tweets,
+                "articles": articles,
+                "observations": observations,
+            }
+        )
+
+
+def legacy_refresh(url: str, symbols: list[str]) -> None:
+    """The previous request pattern, one symbol after another."""
+    requests.get(f"{url}/fred/series/observations", timeout=10)
+    for symbol in symbols:
+        requests.post(f"{url}/reddit/auth", data={"grant_type": "client_credentials"}, timeout=10)
+        for sub in ("wallstreetbets", "investing"):
+            requests.get(f"{url}/reddit/r/{sub}/search.json?q={symbol}&limit=5", timeout=10)
+        requests.get(f"{url}/twitter/tweets/search/recent?query={symbol}", timeout=10)
+        requests.get(f"{url}/news/everything?q={symbol}", timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentiment engine benchmark")
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--delay", type=float, default=0.02, help="Stub response seconds")
+    parser.add_argument("--rate-scale", type=float, default=100.0)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.delay, server.calls = args.delay, Counter()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    mi.REDDIT_CLIENT_ID = mi.REDDIT_SECRET = mi.TWITTER_BEARER = "stub"
+    mi.NEWS_API_KEY = mi.FRED_API_KEY = "stub"
+    mi.REDDIT_AUTH_URL, mi.REDDIT_API_URL = f"{url}/reddit/auth", f"{url}/reddit"
+    mi.TWITTER_API_URL, mi.NEWS_API_URL = f"{url}/twitter", f"{url}/news"
+    mi.FRED_API_URL = f"{url}/fred"
+
+    symbols = [f"SYM{i}" for i in range(args.symbols)]
+    print(f"{args.symbols} symbols, stub APIs answer in {args.delay * 1e3:.0f} ms")
+
+    start = time.perf_counter()
+    legacy_refresh(url, symbols)
+    legacy = time.perf_counter() - start
+    print(f"\nserial refresh (before): {legacy:6.2f} s, {sum(server.calls.values())} requests")
+
+    sources = mi.default_sources()
+    for source in sources:
+        if source.rate:
+            source.rate *= args.rate_scale
+    engine = SentimentEngine(sources, cache_path=Path(tempfile.mkdtemp()) / "cache.json")
+    server.calls.clear()
+    start = time.perf_counter()
+    mi.aggregate_intelligence(symbols, engine=engine)
+    cold = time.perf_counter() - start
+    print(f"engine, cold cache:      {cold:6.2f} s, {sum(server.calls.values())} requests")
+    for name, stats in engine.last_run.items():
+        print(f"  {name:<10}{stats['requests']:>5} requests  done after {stats['seconds']:.2f} s")
+
+    server.calls.clear()
+    start = time.perf_counter()
+    mi.aggregate_intelligence(symbols, engine=engine)
+    warm = time.perf_counter() - start
+    print(f"engine, within TTLs:     {warm * 1e3:6.1f} ms, {sum(server.calls.values())} requests")
+    engine.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+State Bus Benchmark
+===================
+Measures publish-to-callback latency of the Unix-socket state bus against the
+legacy pattern of one agent rewriting a JSON file and another polling it.
+
+Usage:
+    python scripts/benchmark_state_bus.py
+    python scripts/benchmark_state_bus.py --messages 5000 --poll-interval 0.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from utils.state_bus import StateBus, StateBusBroker  # noqa: E402
+
+
+def percentiles(samples: list[float]) -> str:
+    samples = sorted(samples)
+    p50 = statistics.median(samples)
+    p99 = samples[int(0.99 * (len(samples) - 1))]
+    return f"p50={p50 * 1e6:10.1f} us  p99={p99 * 1e6:10.1f} us"
+
+
+def bench_bus(directory: Path, messages: int) -> list[float]:
+    broker = StateBusBroker(socket_path=directory / "bus.sock", root=directory)
+    broker.start_in_thread()
+    publisher = StateBus(socket_path=broker.socket_path, root=directory)
+    subscriber = StateBus(socket_path=broker.socket_path, root=directory)
+    latencies, arrived = [], threading.Event()
+
+    def on_message(_topic, data, _seq):
+        latencies.append(time.perf_counter() - data["sent"])
+        arrived.set()
+
+    subscriber.subscribe(["events"], on_message)
+    for i in range(messages):
+        arrived.clear()
+        publisher.publish("events", {"type": "tick", "n": i, "sent": time.perf_counter()})
+        arrived.wait(5.0)
+    publisher.close()
+    subscriber.close()
+    broker.stop_thread()
+    return latencies
+
+
+def bench_file_polling(directory: Path, messages: int, interval: float) -> list[float]:
+    """Writer rewrites the file at random phase; reader polls every `interval`."""
+    path = directory / "poll.json"
+    latencies, stop = [], threading.Event()
+    seen = -1
+
+    def poll():
+        nonlocal seen
+        while not stop.is_set():
+            try:
+                data = json.loads(path.read_text())
+            except (OSError, ValueError):
+                data = None
+            if data and data["n"] != seen:
+                seen = data["n"]
+                latencies.append(time.perf_counter() - data["sent"])
+            time.sleep(interval)
+
+    reader = threading.Thread(target=poll, daemon=True)
+    reader.start()
+    for i in range(messages):
+        path.write_text(json.dumps({"n": i, "sent": time.perf_counter()}))
+        while seen != i:
+            time.sleep(interval / 20)
+        time.sleep(interval * (i % 7) / 7)  # spread writes across the poll phase
+    stop.set()
+    reader.join()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="State bus benchmark")
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--poll-messages", type=int, default=50)
+    parser.add_argument("--poll-interval", type=float, default=0.1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bus") as directory:
+        directory = Path(directory)
+        print(f"state bus:    {percentiles(bench_bus(directory, args.messages))}")
+        polled = bench_file_polling(directory, args.poll_messages, args.poll_interval)
+        print(f"file polling: {percentiles(polled)}  (poll every {args.poll_interval}s)")
+
+
+if __name__ == "__main__":
+    main()
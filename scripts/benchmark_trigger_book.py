@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Trigger Book Benchmark
+======================
+Replays random-walk ticks against resting stop, take-profit, entry and trailing
+orders, comparing the TriggerBook with the legacy scan of every order per tick.
+
+Usage:
+    python scripts/benchmark_trigger_book.py
+    python scripts/benchmark_trigger_book.py --orders 100000 --symbols 1000 --ticks 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from phases.phase_101_130_advanced_trading import AdvancedOrder, TriggerBook  # noqa: E402
+
+NOW = datetime(2026, 3, 2, 15, 0, 0, tzinfo=UTC)
+
+
+def make_orders(count: int, symbols: list[str], seed: int = 0) -> list[AdvancedOrder]:
+    """Brackets, entries and trailing stops a few percent away from 100."""
+    rng = random.Random(seed)
+    orders = []
+    for i in range(count):
+        side = rng.choice(["buy", "sell"])
+        below, above = 100 * rng.uniform(0.8, 0.99), 100 * rng.uniform(1.01, 1.2)
+        order = AdvancedOrder(f"O{i:07d}", rng.choice(symbols), side, 1.0)
+        kind = i % 4
+        if kind == 0:
+            order.stop_loss, order.take_profit = (below, above) if side == "buy" else (above, below)
+        elif kind == 1:
+            order.order_type, order.price = "limit", below if side == "buy" else above
+        elif kind == 2:
+            order.order_type, order.price = "stop", above if side == "buy" else below
+        else:
+            order.trailing_stop = rng.choice([0.02, 0.05, 0.1])
+            order.trail_extreme = 100.0
+        orders.append(order)
+    return orders
+
+
+def make_ticks(count: int, symbols: list[str], seed: int = 1) -> list[tuple[str, float]]:
+    rng = random.Random(seed)
+    prices = dict.fromkeys(symbols, 100.0)
+    ticks = []
+    for _ in range(count):
+        symbol = rng.choice(symbols)
+        prices[symbol] *= 1 + rng.gauss(0, 0.002)
+        ticks.append((symbol, prices[symbol]))
+    return ticks
+
+
+def replay_book(orders: list[AdvancedOrder], ticks: list[tuple[str, float]]) -> tuple[float, int]:
+    book = TriggerBook()
+    for order in orders:
+        book.add(order)
+    fired = 0
+    start = time.perf_counter()
+    for symbol, price in ticks:
+        fired += len(book.on_tick(symbol, price, NOW))
+    return time.perf_counter() - start, fired
+
+
+def replay_scan(orders: list[AdvancedOrder], ticks: list[tuple[str, float]]) -> float:
+    """Legacy AdvancedTradingEngine.check_order_triggers loop (without saves)."""
+    start = time.perf_counter()
+    for symbol, price in ticks:
+        for order in orders:
+            if order.symbol != symbol or order.status != "pending":
+                continue
+            trigger = order.check_triggers(price, NOW)
+            if trigger:
+                order.status = trigger
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trigger book benchmark")
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--symbols", type=int, default=1000)
+    parser.add_argument("--ticks", type=int, default=200_000)
+    parser.add_argument("--scan-ticks", type=int, default=200)
+    args = parser.parse_args()
+
+    symbols = [f"SYM{i:04d}" for i in range(args.symbols)]
+    ticks = make_ticks(args.ticks, symbols)
+
+    elapsed, fired = replay_book(make_orders(args.orders, symbols), ticks)
+    print(f"orders={args.orders} symbols={args.symbols} ticks={args.ticks} fired={fired}")
+    print(
+        f"trigger book: {elapsed / len(ticks) * 1e6:9.2f} us/tick  {len(ticks) / elapsed:12,.0f} ticks/s"
+    )
+
+    scan_ticks = ticks[: args.scan_ticks]
+    elapsed = replay_scan(make_orders(args.orders, symbols), scan_ticks)
+    print(
+        f"legacy scan:  {elapsed / len(scan_ticks) * 1e6:9.2f} us/tick  "
+        f"{len(scan_ticks) / elapsed:12,.0f} ticks/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
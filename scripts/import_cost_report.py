@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Import Cost Report
+==================
+Ranks what each entry point pays at import time. Every entry point is
+imported in a fresh interpreter under `python -X importtime`; the report
+shows total import time, peak RSS, the costliest top-level packages and
+which heavy optional dependencies were pulled in eagerly.
+
+Usage:
+    python scripts/import_cost_report.py
+    python scripts/import_cost_report.py trader.smart_trader dashboard.app --top 15
+    python scripts/import_cost_report.py --repeat 3 --budget 1.0   # exit 1 if over budget
+    python scripts/import_cost_report.py --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+ENTRY_POINTS = [
+    "trader.smart_trader",
+    "agents.sports_analytics_agent",
+    "dashboard.app",
+    "render_app_multi_agent",
+]
+
+# Optional dependencies entry points should only import on first use
+HEAVY_PACKAGES = {
+    "keras",
+    "lightgbm",
+    "numpy",
+    "optuna",
+    "pandas",
+    "scipy",
+    "sklearn",
+    "statsmodels",
+    "tensorflow",
+    "torch",
+    "xgboost",
+    "yfinance",
+}
+
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+# Child program: import the entry point, then report peak RSS (KB on Linux)
+PROBE = "import importlib, resource, sys; importlib.import_module(sys.argv[1]); " + (
+    "print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+)
+
+
+@dataclass
+class ImportCost:
+    entry: str
+    seconds: float = 0.0
+    entry_seconds: float = 0.0
+    rss_mb: float | None = None
+    packages: dict[str, float] = field(default_factory=dict)
+    heavy: list[str] = field(default_factory=list)
+    error: str | None = None
+
+
+def parse_importtime(stderr: str) -> tuple[float, dict[str, float], dict[str, float]]:
+    """
+    Parse `-X importtime` output.
+
+    Returns:
+        (total seconds, cumulative seconds per module, self seconds per
+        top-level package)
+    """
+    total = 0.0
+    cumulative: dict[str, float] = {}
+    packages: dict[str, float] = defaultdict(float)
+    for line in stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        cumulative[name] = int(cumulative_us) / 1e6
+        packages[name.partition(".")[0]] += int(self_us) / 1e6
+        if not indent:
+            total += int(cumulative_us) / 1e6
+    return total, cumulative, dict(packages)
+
+
+def measure(entry: str, repeat: int = 1) -> ImportCost:
+    """Import `entry` in fresh interpreters and keep the fastest run."""
+    env = dict(
+        os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.getenv("PYTHONPATH")]))
+    )
+    best: ImportCost | None = None
+    for _ in range(max(1, repeat)):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", PROBE, entry],
+            cwd=ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        total, cumulative, packages = parse_importtime(proc.stderr)
+        cost = ImportCost(
+            entry=entry,
+            seconds=total,
+            entry_seconds=cumulative.get(entry, 0.0),
+            packages=packages,
+            heavy=sorted(HEAVY_PACKAGES & packages.keys()),
+        )
+        if proc.returncode != 0:
+            errors = [line for line in proc.stderr.splitlines() if not LINE.match(line)]
+            cost.error = errors[-1] if errors else f"exit code {proc.returncode}"
+        else:
+            lines = proc.stdout.strip().splitlines()
+            if lines and lines[-1].isdigit():
+                cost.rss_mb = int(lines[-1]) / 1024
+        if best is None or cost.seconds < best.seconds:
+            best = cost
+    return best
+
+
+def print_report(costs: list[ImportCost], top: int) -> None:
+    for cost in sorted(costs, key=lambda c: c.seconds, reverse=True):
+        rss = f"{cost.rss_mb:7.1f} MB" if cost.rss_mb is not None else "      n/a"
+        print(f"\n{cost.entry}: {cost.seconds:6.3f}s total  {rss} peak RSS")
+        if cost.error:
+            print(f"  ❌ import failed: {cost.error}")
+        if cost.heavy:
+            print(f"  ⚠️  heavy packages imported: {', '.join(cost.heavy)}")
+        ranked = sorted(cost.packages.items(), key=lambda item: item[1], reverse=True)
+        for name, seconds in ranked[:top]:
+            share = seconds / cost.seconds * 100 if cost.seconds else 0.0
+            print(f"  {seconds * 1000:9.1f} ms  {share:5.1f}%  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import cost report")
+    parser.add_argument("entries", nargs="*", default=ENTRY_POINTS, help="Modules to import")
+    parser.add_argument("--top", type=int, default=10, help="Packages listed per entry point")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per entry (fastest kept)")
+    parser.add_argument("--budget", type=float, help="Fail if any entry exceeds this many seconds")
+    parser.add_argument("--json", action="store_true", help="Emit JSON instead of a table")
+    args = parser.parse_args()
+
+    costs = [measure(entry, args.repeat) for entry in args.entries]
+    if args.json:
+        print(json.dumps([asdict(cost) for cost in costs], indent=2))
+    else:
+        print_report(costs, args.top)
+
+    if args.budget is not None:
+        over = [c.entry for c in costs if c.error is None and c.seconds > args.budget]
+        if over:
+            print(f"\n❌ Over {args.budget:.2f}s import budget: {', '.join(over)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Tests for the agent supervisor: worker output, restart back-off, budgets and
+cooperative scheduling.
+"""
+
+import asyncio
+import sys
+import textwrap
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.agent_supervisor import AgentSpec, AgentSupervisor, RestartPolicy  # noqa: E402
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="POSIX process supervision")
+
+
+def write_script(directory: Path, name: str, body: str) -> Path:
+    path = directory / f"{name}.py"
+    path.write_text(textwrap.dedent(body))
+    return path
+
+
+def run(supervisor: AgentSupervisor, until, timeout: float = 20.0) -> None:
+    """Start the supervisor, wait until `until()` holds, then stop it."""
+
+    async def main():
+        await supervisor.start()
+        deadline = time.monotonic() + timeout
+        while not until() and time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+        await supervisor.stop(timeout=5)
+
+    asyncio.run(main())
+
+
+def make_supervisor(specs, tmp_path, **kwargs) -> AgentSupervisor:
+    return AgentSupervisor(specs, cwd=tmp_path, preload=(), sample_interval=0.05, **kwargs)
+
+
+def test_restart_policy_backs_off_exponentially():
+    policy = RestartPolicy(backoff_base=2.0, backoff_max=30.0)
+    assert [policy.delay(n) for n in range(1, 7)] == [2.0, 4.0, 8.0, 16.0, 30.0, 30.0]
+
+
+def test_spec_needs_script_or_target():
+    with pytest.raises(ValueError):
+        AgentSpec("bad")
+
+
+def test_worker_output_and_restart_limit(tmp_path):
+    script = write_script(
+        tmp_path,
+        "crashy",
+        """
+        import os, sys
+        print("value", os.environ["AGENT_VALUE"])
+        sys.stderr.write("failing\\n")
+        sys.exit(3)
+        """,
+    )
+    spec = AgentSpec(
+        "crashy",
+        script=script,
+        env={"AGENT_VALUE": "42"},
+        restart=RestartPolicy(max_restarts=2, backoff_base=0.01),
+    )
+    supervisor = make_supervisor([spec], tmp_path)
+    run(supervisor, lambda: supervisor.status["crashy"]["status"] == "failed")
+
+    status = supervisor.status["crashy"]
+    assert status["status"] == "failed"
+    assert status["exit_code"] == 3
+    assert status["restarts"] == 3
+    assert supervisor.logs("crashy") == ["value 42", "failing"] * 3
+
+
+def test_rss_budget_terminates_worker(tmp_path):
+    script = write_script(
+        tmp_path,
+        "hungry",
+        """
+        import time
+        block = bytearray(200 * 2**20)
+        block[:: 4096] = b"x" * len(block[:: 4096])
+        time.sleep(60)
+        """,
+    )
+    spec = AgentSpec("hungry", script=script, max_rss_mb=100, restart=RestartPolicy(max_restarts=0))
+    supervisor = make_supervisor([spec], tmp_path)
+    run(supervisor, lambda: supervisor.status["hungry"]["status"] == "failed")
+
+    assert supervisor.status["hungry"]["reason"].startswith("rss budget exceeded")
+
+
+def test_dependants_wait_for_ready_line(tmp_path):
+    script = write_script(
+        tmp_path,
+        "leader",
+        """
+        import time
+        time.sleep(0.3)
+        print("leader ready", flush=True)
+        time.sleep(60)
+        """,
+    )
+    calls = []
+    specs = [
+        AgentSpec("leader", script=script, priority=1, ready_line="leader ready"),
+        AgentSpec(
+            "follower",
+            target=lambda: calls.append(time.monotonic()),
+            cadence=0.05,
+            depends_on=("leader",),
+        ),
+    ]
+    supervisor = make_supervisor(specs, tmp_path)
+    started = time.monotonic()
+    run(supervisor, lambda: len(calls) >= 3)
+
+    assert len(calls) >= 3
+    assert calls[0] - started >= 0.3
+    assert supervisor.logs("leader") == ["leader ready"]
+    assert supervisor.status["leader"]["status"] == "stopped"
+
+
+def test_cooperative_agent_failures_back_off(tmp_path):
+    outcomes = iter([RuntimeError("flaky"), RuntimeError("flaky"), None, None])
+    calls = []
+
+    def flaky():
+        calls.append(time.monotonic())
+        error = next(outcomes, None)
+        if error:
+            raise error
+
+    spec = AgentSpec(
+        "flaky",
+        target=flaky,
+        cadence=0.01,
+        restart=RestartPolicy(max_restarts=3, backoff_base=0.2),
+    )
+    supervisor = make_supervisor([spec], tmp_path)
+    run(supervisor, lambda: supervisor.status["flaky"].get("runs", 0) >= 4)
+
+    assert calls[1] - calls[0] >= 0.2
+    assert calls[2] - calls[1] >= 0.4
+    assert supervisor.status["flaky"]["restarts"] == 2
+    assert supervisor.status["flaky"]["runs"] >= 4
@@ -0,0 +1,135 @@
+"""
+Tests for streaming, batched anomaly detection.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from agents import anomaly_detector  # noqa: E402
+from agents.anomaly_detector import (  # noqa: E402
+    METRIC_FIELDS,
+    AnomalyDetector,
+    BaselineBank,
+    Reservoir,
+    metrics_matrix,
+)
+
+
+@pytest.fixture
+def detector(monkeypatch, tmp_path):
+    monkeypatch.setattr(anomaly_detector, "ANOMALY_MODEL_FILE", tmp_path / "model.pkl")
+    monkeypatch.setattr(anomaly_detector, "NORMAL_BEHAVIOR_FILE", tmp_path / "normal.json")
+    monkeypatch.setattr(anomaly_detector, "ANOMALY_STATE_FILE", tmp_path / "detections.json")
+    return AnomalyDetector(refit_interval=1e9, reservoir_size=500)
+
+
+def fleet(rng, n_agents, spike=None):
+    agents = {}
+    for i in range(n_agents):
+        agents[f"agent_{i}"] = {field: float(rng.normal(50 + i % 7, 2)) for field in METRIC_FIELDS}
+    if spike is not None:
+        agents[spike].update(cpu_usage=500.0, error_rate=400.0, response_time_ms=900.0)
+    return agents
+
+
+def test_baselines_match_batch_statistics():
+    rng = np.random.default_rng(0)
+    X = rng.normal(10, 3, size=(400, 3, len(METRIC_FIELDS)))
+    bank = BaselineBank(capacity=1)  # forces growth
+    rows = bank.rows(["a", "b", "c"])
+    for step in X:
+        bank.update(rows, step)
+
+    assert len(bank) == 3
+    np.testing.assert_allclose(bank.mean[rows], X.mean(axis=0))
+    np.testing.assert_allclose(bank.std(rows), X.std(axis=0))
+    alpha, ewma = bank.alpha, X[0].copy()
+    for step in X[1:]:
+        ewma += alpha * (step - ewma)
+    np.testing.assert_allclose(bank.ewma[rows], ewma)
+
+    restored = BaselineBank.from_dict(json.loads(json.dumps(bank.to_dict())))
+    np.testing.assert_allclose(restored.ewvar[rows], bank.ewvar[rows])
+
+
+def test_reservoir_is_bounded_and_uniform():
+    reservoir = Reservoir(capacity=1000, n_metrics=1, seed=0)
+    for chunk in np.array_split(np.arange(100_000, dtype=float), 97):
+        reservoir.add(chunk[:, None])
+
+    assert len(reservoir) == 1000 and reservoir.seen == 100_000
+    sample = reservoir.sample()[:, 0]
+    # A uniform sample of 0..99999 has mean ~50000 with standard error ~900
+    assert abs(sample.mean() - 50_000) < 4_000
+    assert len(np.unique(sample)) == 1000
+
+
+def test_statistical_batch_flags_spike_and_skips_baseline(detector, monkeypatch):
+    monkeypatch.setattr(anomaly_detector, "HAS_SKLEARN", False)
+    rng = np.random.default_rng(1)
+    first = detector.detect_batch(fleet(rng, 20))
+    assert all(r["reason"] == "first_observation" for r in first.values())
+    for _ in range(30):
+        detector.detect_batch(fleet(rng, 20))
+
+    rows = detector.baselines.rows(["agent_3"])
+    before = detector.baselines.mean[rows].copy()
+    results = detector.detect_batch(fleet(rng, 20, spike="agent_3"))
+    assert results["agent_3"]["is_anomaly"]
+    assert results["agent_3"]["anomalies"][0].startswith("cpu_usage")
+    assert sum(r["is_anomaly"] for r in results.values()) <= 2
+    np.testing.assert_array_equal(detector.baselines.mean[rows], before)
+
+
+def test_model_batch_matches_single_scoring_and_refits_in_background(detector):
+    pytest.importorskip("sklearn")
+    rng = np.random.default_rng(2)
+    for _ in range(9):
+        detector.detect_batch(fleet(rng, 30))
+    # The first fit starts in the background once the reservoir has enough rows
+    detector.wait_for_refit(30)
+    assert detector.model is not None
+    assert anomaly_detector.ANOMALY_MODEL_FILE.exists()
+    first = detector.model
+
+    for _ in range(30):
+        detector.detect_batch(fleet(rng, 30))
+    assert len(detector.reservoir) == 500  # bounded at reservoir_size
+    assert detector.model is first  # next refit not due yet
+    detector.refit_interval = 0
+    assert detector.maybe_refit()
+    detector.wait_for_refit(30)
+    assert detector.model is not first
+
+    agents = fleet(rng, 30, spike="agent_5")
+    batch = detector.detect_batch(agents)
+    single = detector.detect_anomaly("agent_5", agents["agent_5"])
+    assert batch["agent_5"]["is_anomaly"] and single["is_anomaly"]
+    assert batch["agent_5"]["anomaly_score"] == pytest.approx(single["anomaly_score"])
+    expected = detector.model.predict(
+        detector.scaler.transform(metrics_matrix([agents["agent_5"]]))
+    )
+    assert expected[0] == -1
+
+
+def test_legacy_normal_behavior_is_migrated(detector):
+    samples = [{"cpu_usage": 10.0 + i, "memory_usage": 20.0, "error_rate": 0.0} for i in range(5)]
+    anomaly_detector.NORMAL_BEHAVIOR_FILE.write_text(
+        json.dumps({"legacy_agent": {"samples": samples, "cpu_usage_mean": 12.0}})
+    )
+    detector.load_normal_behavior()
+    rows = detector.baselines.rows(["legacy_agent"])
+    assert detector.baselines.count[rows[0]] == 5
+    assert detector.baselines.mean[rows[0], 0] == pytest.approx(12.0)
+
+    detector.save_normal_behavior()
+    saved = json.loads(anomaly_detector.NORMAL_BEHAVIOR_FILE.read_text())
+    assert saved["version"] == 2
+    assert "samples" not in saved["agents"]["legacy_agent"]
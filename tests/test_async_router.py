@@ -0,0 +1,235 @@
+"""
+Tests for concurrent order routing against a latency-injecting mock broker.
+"""
+
+import asyncio
+import gc
+import json
+import sys
+import threading
+import time
+import weakref
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from execution.async_router import (  # noqa: E402
+    AsyncOrderRouter,
+    LiveBroker,
+    MockBroker,
+    OrderRequest,
+)
+
+
+def rebalance(count: int, slices: int = 5, interval: float = 0.02) -> list[OrderRequest]:
+    return [
+        OrderRequest(f"SYM{i}", "buy" if i % 2 else "sell", 10.0, slices=slices, interval=interval)
+        for i in range(count)
+    ]
+
+
+def test_rebalance_runs_concurrently():
+    broker = MockBroker(latency=0.05, jitter=0.01, seed=1)
+    router = AsyncOrderRouter(broker, rate_limit=None, max_in_flight=64)
+
+    start = time.perf_counter()
+    handles = asyncio.run(router.route(rebalance(40)))
+    elapsed = time.perf_counter() - start
+
+    # Sequentially: 40 orders x (5 x 50ms latency + 4 x 20ms spacing) ~ 13s
+    assert elapsed < 1.0
+    assert all(h.status == "filled" for h in handles)
+    assert all(h.filled_qty == pytest.approx(10.0) for h in handles)
+    assert broker.max_concurrent > 30
+    # Slices of one order are released by timers, at least interval apart
+    first = [t for cid, t in broker.submitted if cid.startswith(handles[0].request.client_id)]
+    assert len(first) == 5
+    assert 4 * 0.02 - 0.005 <= first[-1] - first[0] < 0.5
+
+
+def test_rate_limit_and_in_flight_cap():
+    broker = MockBroker(latency=0.01)
+    router = AsyncOrderRouter(broker, rate_limit=100, burst=5, max_in_flight=3)
+
+    asyncio.run(router.route(rebalance(25, slices=1)))
+
+    times = sorted(t for _, t in broker.submitted)
+    # 5 burst tokens, then 20 more at 100/s
+    assert times[-1] - times[0] >= 0.18
+    assert broker.max_concurrent <= 3
+
+
+def test_callbacks_partial_fills_and_rejects():
+    events = []
+    router = AsyncOrderRouter(
+        MockBroker(latency=0.0, fill_latency=0.005, partial_fills=4, price=50.0),
+        rate_limit=None,
+        on_ack=lambda h, ack: events.append(("ack", ack["slice"])),
+        on_fill=lambda h, fill: events.append(("fill", fill["qty"])),
+    )
+    (handle,) = asyncio.run(router.route([OrderRequest("AAPL", "buy", 8.0, slices=2)]))
+    assert handle.status == "filled"
+    assert handle.avg_price == 50.0
+    assert events.count(("fill", 1.0)) == 8
+    assert {e for e in events if e[0] == "ack"} == {("ack", 1), ("ack", 2)}
+
+    rejecting = AsyncOrderRouter(MockBroker(latency=0.0, reject_rate=1.0), rate_limit=None)
+    (handle,) = asyncio.run(rejecting.route([OrderRequest("AAPL", "buy", 1.0, slices=3)]))
+    assert handle.status == "rejected"
+    assert len(handle.rejects) == 3
+
+    halted = AsyncOrderRouter(
+        MockBroker(latency=0.0), rate_limit=None, halt_check=lambda: (True, "halt")
+    )
+    (handle,) = asyncio.run(halted.route([OrderRequest("AAPL", "buy", 1.0)]))
+    assert handle.rejects[0]["reason"] == "halt"
+
+
+class FakeEngine:
+    """Blocking stand-in for LiveExecutionEngine.execute_order."""
+
+    def execute_order(self, symbol, qty, side, order_type="market"):
+        time.sleep(0.05)
+        fill = {"filled_qty": str(qty), "filled_avg_price": "10.0"}
+        return {"status": "success", "order_id": f"{symbol}-{side}", "result": fill}
+
+    def flush_circuit_breaker_state(self):
+        pass
+
+
+def test_live_broker_submits_on_worker_pool():
+    broker = LiveBroker(FakeEngine(), max_workers=16)
+    router = AsyncOrderRouter(broker, rate_limit=None, max_in_flight=16)
+    start = time.perf_counter()
+    handles = asyncio.run(router.route(rebalance(16, slices=1)))
+    broker.close()
+    assert time.perf_counter() - start < 0.5
+    assert all(h.status == "filled" and h.avg_price == 10.0 for h in handles)
+
+
+def test_circuit_breaker_state_is_persisted_periodically(tmp_path):
+    from trader.live_execution import LiveExecutionEngine
+
+    engine = LiveExecutionEngine(use_paper=True)
+    engine.circuit_breaker_file = tmp_path / "circuit_breaker.json"
+    engine.persist_interval = 60.0
+    engine.daily_trade_count = 0
+
+    assert engine._reserve_trade()
+    engine._save_circuit_breaker_state(force=True)
+    for _ in range(9):
+        assert engine._reserve_trade()
+    assert json.loads(engine.circuit_breaker_file.read_text())["daily_trade_count"] == 1
+
+    engine.flush_circuit_breaker_state()
+    assert json.loads(engine.circuit_breaker_file.read_text())["daily_trade_count"] == 10
+
+
+def test_engines_flushed_at_exit_without_being_kept_alive(tmp_path):
+    from trader import live_execution
+
+    engine = live_execution.LiveExecutionEngine(use_paper=True)
+    engine.circuit_breaker_file = tmp_path / "circuit_breaker.json"
+    engine.persist_interval = 60.0
+    engine.daily_trade_count = 0
+    engine._save_circuit_breaker_state(force=True)
+    assert engine._reserve_trade()
+
+    live_execution._flush_engines()
+    assert json.loads(engine.circuit_breaker_file.read_text())["daily_trade_count"] == 1
+
+    # Only the module-level hook is registered; dropped engines can be collected
+    ref = weakref.ref(engine)
+    del engine
+    gc.collect()
+    assert ref() is None
+
+
+def test_daily_trade_limit_holds_under_concurrent_orders(tmp_path, monkeypatch):
+    from trader import live_execution
+
+    engine = live_execution.LiveExecutionEngine(use_paper=True)
+    engine.api_key = engine.secret_key = "key"
+    engine.circuit_breaker_file = tmp_path / "circuit_breaker.json"
+    engine.max_daily_trades = 5
+    engine.daily_trade_count = 0
+    monkeypatch.setattr(engine, "_check_circuit_breaker", lambda: (False, ""))
+
+    class Response:
+        def __init__(self, status_code):
+            self.status_code = status_code
+            self.text = "rejected"
+
+        def json(self):
+            return {"id": "order"}
+
+    statuses = iter([500] + [200] * 32)
+    lock = threading.Lock()
+
+    def post(*args, **kwargs):
+        time.sleep(0.05)  # Every order is in flight before any completes
+        with lock:
+            return Response(next(statuses))
+
+    monkeypatch.setattr(live_execution.requests, "post", post)
+    broker = LiveBroker(engine, max_workers=16)
+    router = AsyncOrderRouter(broker, rate_limit=None, max_in_flight=16)
+    handles = asyncio.run(router.route(rebalance(16, slices=1)))
+    broker.close()
+
+    # The failed submission gave its slot back; never more than the limit got through
+    assert sum(h.status != "rejected" for h in handles) == 4
+    assert engine.daily_trade_count == 4
+    engine.max_daily_trades = 6
+    assert engine.execute_order("AAPL", 1, "buy")["status"] == "success"
+    assert engine.execute_order("AAPL", 1, "buy")["status"] == "success"
+    assert engine.execute_order("AAPL", 1, "buy")["status"] == "halted"
+
+
+def test_route_orders_batch(monkeypatch):
+    from execution import router
+
+    monkeypatch.setattr(router, "check_guardian_pause", lambda: False)
+    monkeypatch.setattr(router, "get_risk_extensions", lambda: None)
+    monkeypatch.setattr(router, "validate_trade_with_risk", lambda *args: (True, "ok"))
+    monkeypatch.setattr(router, "SLICE_INTERVAL", 0.02)
+
+    orders = [
+        {"symbol": f"SYM{i}", "side": "buy", "qty": 4.0, "limit_price": 25.0} for i in range(20)
+    ]
+    start = time.perf_counter()
+    results = router.route_orders(orders, broker=MockBroker(latency=0.05))
+    assert time.perf_counter() - start < 1.0
+    assert [r["status"] for r in results] == ["executed"] * 20
+    assert results[0]["slices"] == 5
+    assert results[0]["total_filled"] == pytest.approx(4.0)
+    assert results[0]["avg_fill_price"] == 25.0
+
+
+def test_route_orders_closes_the_broker_it_creates(monkeypatch):
+    from execution import router
+
+    monkeypatch.setattr(router, "check_guardian_pause", lambda: False)
+    monkeypatch.setattr(router, "get_risk_extensions", lambda: None)
+    monkeypatch.setattr(router, "validate_trade_with_risk", lambda *args: (True, "ok"))
+    monkeypatch.setattr(router, "SLICE_INTERVAL", 0.0)
+    created = []
+
+    def make_broker():
+        created.append(LiveBroker(FakeEngine(), max_workers=2))
+        return created[-1]
+
+    monkeypatch.setattr(router, "make_broker", make_broker)
+    for _ in range(3):
+        assert router.route_order("AAPL", "buy", 1)["status"] == "executed"
+    assert len(created) == 3
+    assert all(broker.executor._shutdown for broker in created)
+
+    # A caller's broker stays open for reuse
+    shared = LiveBroker(FakeEngine(), max_workers=2)
+    router.route_orders([{"symbol": "AAPL", "side": "buy", "qty": 1}], broker=shared)
+    assert not shared.executor._shutdown
+    shared.close()
@@ -0,0 +1,127 @@
+"""
+Tests for the Gaussian-process Bayesian optimizer.
+"""
+
+import math
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+pytest.importorskip("scipy")
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from ai.bayesian_optimizer import (  # noqa: E402
+    BayesianOptimizer,
+    GaussianProcess,
+    expected_improvement,
+    matern52,
+)
+
+
+def branin(params):
+    """Negated Branin (maximum -0.397887) on [-5, 10] x [0, 15]."""
+    x, y = params["x"], params["y"]
+    b, c, t = 5.1 / (4 * math.pi**2), 5 / math.pi, 1 / (8 * math.pi)
+    return -((y - b * x * x + c * x - 6) ** 2 + 10 * (1 - t) * math.cos(x) + 10)
+
+
+BRANIN_BOUNDS = {"x": (-5.0, 10.0), "y": (0.0, 15.0)}
+
+
+def test_incremental_cholesky_matches_full_factorization():
+    rng = np.random.default_rng(0)
+    X, y = rng.random((30, 3)), rng.normal(size=30)
+    gp = GaussianProcess(3, lengthscale=0.4)
+    for x, target in zip(X, y, strict=True):
+        gp.add_observation(x, target)
+
+    K = matern52(X, X, gp.lengthscales, gp.signal_variance)
+    K[np.diag_indices_from(K)] += gp.noise + 1e-8
+    factor = gp.L
+    assert factor == pytest.approx(np.linalg.cholesky(K), abs=1e-9)
+
+    full = GaussianProcess(3, lengthscale=0.4).fit(X, y, optimize=False)
+    Xq = rng.random((50, 3))
+    for a, b in zip(gp.predict(Xq), full.predict(Xq), strict=True):
+        assert a == pytest.approx(b, abs=1e-9)
+
+
+def test_gp_fit_interpolates_and_ei_prefers_promise():
+    rng = np.random.default_rng(1)
+    X = rng.random((25, 1))
+    y = np.sin(6 * X[:, 0])
+    gp = GaussianProcess(1, seed=1).fit(X, y)
+
+    mean, std = gp.predict(X)
+    assert mean == pytest.approx(y, abs=0.05)
+    grid = np.linspace(0, 1, 200)[:, None]
+    assert gp.predict(grid)[0] == pytest.approx(np.sin(6 * grid[:, 0]), abs=0.1)
+    assert gp.negative_log_marginal_likelihood(gp._theta()) < gp.negative_log_marginal_likelihood(
+        np.log([5.0, 1.0, 0.1])
+    )
+
+    ei = expected_improvement(np.array([0.0, 1.0, 1.0]), np.array([0.5, 0.5, 0.0]), best=0.5)
+    assert ei[1] > ei[0] > 0
+    assert ei[2] == pytest.approx(0.5)
+
+
+def test_suggest_batch_spreads_points():
+    optimizer = BayesianOptimizer(BRANIN_BOUNDS, n_initial=5, seed=2)
+    for _ in range(8):
+        params = optimizer._random_sample()
+        optimizer.update(params, branin(params))
+
+    for strategy in ("kriging_believer", "constant_liar"):
+        batch = optimizer.suggest_batch(4, strategy)
+        points = np.array([[p["x"], p["y"]] for p in batch])
+        assert len(batch) == 4
+        assert np.all((points[:, 0] >= -5) & (points[:, 0] <= 10))
+        assert np.all((points[:, 1] >= 0) & (points[:, 1] <= 15))
+        gaps = np.linalg.norm(points[:, None] - points[None], axis=-1)[np.triu_indices(4, 1)]
+        assert gaps.min() > 1e-3
+    # Fantasies stay on the copy
+    assert optimizer.gp.n == 8
+    with pytest.raises(ValueError):
+        optimizer.suggest_batch(2, "thompson")
+
+
+def test_failed_evaluations_do_not_break_the_surrogate():
+    optimizer = BayesianOptimizer({"x": (0.0, 1.0)}, n_initial=3, seed=3)
+    for x in (0.1, 0.5, 0.9):
+        optimizer.update({"x": x}, -((x - 0.3) ** 2))
+    optimizer.update({"x": 0.7}, -np.inf)
+    assert np.all(np.isfinite(optimizer.gp.y))
+    assert 0.0 <= optimizer.suggest()["x"] <= 1.0
+
+
+def test_parallel_batches_beat_random_search():
+    active, peak = 0, 0
+    lock = threading.Lock()
+
+    def expensive(params):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.01)
+        with lock:
+            active -= 1
+        return branin(params)
+
+    optimizer = BayesianOptimizer(BRANIN_BOUNDS, n_initial=8, seed=4)
+    best_params, best_value = optimizer.optimize(expensive, n_iterations=40, batch_size=4)
+    assert peak == 4
+    assert len(optimizer.y) == 40
+    assert best_value > -0.6
+
+    rng = np.random.default_rng(4)
+    random_best = max(
+        branin({"x": rng.uniform(-5, 10), "y": rng.uniform(0, 15)}) for _ in range(40)
+    )
+    assert best_value > random_best
@@ -0,0 +1,140 @@
+"""
+Tests for the vectorized cointegration scanner.
+Batched Engle-Granger results must match statsmodels coint pair by pair.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("statsmodels")
+
+from statsmodels.tsa.adfvalues import mackinnonp  # noqa: E402
+from statsmodels.tsa.stattools import coint  # noqa: E402
+
+import analytics.cointegration_analyzer as analyzer_module  # noqa: E402
+from analytics.cointegration_analyzer import (  # noqa: E402
+    CointegrationAnalyzer,
+    mackinnon_pvalues,
+)
+
+
+def make_prices(num_assets: int = 12, length: int = 252, seed: int = 0) -> pd.DataFrame:
+    """Three common trends; the first half of assets is cointegrated within each trend."""
+    rng = np.random.default_rng(seed)
+    trends = np.cumsum(rng.normal(0, 1, (length, 3)), axis=0)
+    own_walk = np.cumsum(rng.normal(0, 0.3, (length, num_assets)), axis=0)
+    own_walk[:, : num_assets // 2] = 0
+    prices = (
+        100
+        + trends[:, np.arange(num_assets) % 3] * rng.uniform(0.5, 1.5, num_assets)
+        + own_walk
+        + rng.normal(0, 0.5, (length, num_assets))
+    )
+    return pd.DataFrame(prices, columns=[f"S{i:02d}" for i in range(num_assets)])
+
+
+@pytest.fixture(autouse=True)
+def clear_pair_cache():
+    analyzer_module._PAIR_CACHE.clear()
+    yield
+    analyzer_module._PAIR_CACHE.clear()
+
+
+def test_mackinnon_pvalues_match_statsmodels():
+    stats = np.array([-30.0, -5.0, -3.2, -2.9, -1.0, 0.5, 3.0, -np.inf])
+    expected = [mackinnonp(stat, regression="c", N=2) for stat in stats]
+    np.testing.assert_allclose(mackinnon_pvalues(stats, "c", 2), expected)
+
+
+def test_scan_matches_statsmodels_coint():
+    prices = make_prices()
+    scan = CointegrationAnalyzer(prices).scan_pairs(batch_size=7)
+
+    assert len(scan) == 12 * 11 // 2
+    for row in scan.itertuples(index=False):
+        score, pvalue, _ = coint(prices[row.asset1].values, prices[row.asset2].values)
+        assert row.score == pytest.approx(score, rel=1e-9)
+        assert row.pvalue == pytest.approx(pvalue, rel=1e-9, abs=1e-12)
+
+
+def test_correlation_prefilter():
+    prices = make_prices()
+    scan = CointegrationAnalyzer(prices).scan_pairs(min_correlation=0.8)
+    correlation = prices.corr()
+    assert (scan["correlation"].abs() >= 0.8).all()
+    expected = int((np.abs(correlation.values[np.triu_indices(12, k=1)]) >= 0.8).sum())
+    assert len(scan) == expected
+
+
+def test_cache_retests_only_changed_columns(monkeypatch):
+    prices = make_prices()
+    first = CointegrationAnalyzer(prices).scan_pairs()
+
+    tested = []
+    original = analyzer_module.engle_granger_batch
+
+    def counting(y0, y1, **kwargs):
+        tested.append(len(y0))
+        return original(y0, y1, **kwargs)
+
+    monkeypatch.setattr(analyzer_module, "engle_granger_batch", counting)
+    assert CointegrationAnalyzer(prices).scan_pairs().equals(first)
+    assert tested == []
+
+    changed = prices.copy()
+    changed["S05"] += np.linspace(0, 3, len(changed))
+    CointegrationAnalyzer(changed).scan_pairs()
+    assert sum(tested) == 11
+
+
+def test_cache_is_keyed_by_maxlag():
+    prices = make_prices()
+    prices.loc[10:14, "S03"] = np.nan
+    CointegrationAnalyzer(prices).scan_pairs()
+    scan = CointegrationAnalyzer(prices).scan_pairs(maxlag=0)
+
+    assert (scan["used_lag"].dropna() == 0).all()
+    for asset1, asset2 in [("S00", "S01"), ("S00", "S03")]:
+        row = scan[(scan.asset1 == asset1) & (scan.asset2 == asset2)].iloc[0]
+        pair = prices[[asset1, asset2]].dropna()
+        score, _, _ = coint(pair[asset1].values, pair[asset2].values, maxlag=0)
+        assert row.score == pytest.approx(score, rel=1e-9)
+
+
+def test_empty_scan_has_result_columns():
+    full = CointegrationAnalyzer(make_prices()).scan_pairs()
+    empty = CointegrationAnalyzer(make_prices()[["S00"]]).scan_pairs()
+    assert empty.empty and list(empty.columns) == list(full.columns)
+
+
+def test_columns_with_gaps_fall_back_to_per_pair_test():
+    prices = make_prices()
+    prices.loc[10:14, "S03"] = np.nan
+    scan = CointegrationAnalyzer(prices).scan_pairs()
+    row = scan[(scan.asset1 == "S00") & (scan.asset2 == "S03")].iloc[0]
+
+    pair = prices[["S00", "S03"]].dropna()
+    score, pvalue, _ = coint(pair["S00"].values, pair["S03"].values)
+    assert row.score == pytest.approx(score, rel=1e-9)
+    assert row.pvalue == pytest.approx(pvalue, rel=1e-9)
+    assert len(scan) == 12 * 11 // 2
+
+
+def test_find_cointegrated_pairs_reports_spread_stats():
+    prices = make_prices()
+    pairs = CointegrationAnalyzer(prices).find_cointegrated_pairs()
+
+    assert pairs
+    assert [p["pvalue"] for p in pairs] == sorted(p["pvalue"] for p in pairs)
+    names = {(p["asset1"], p["asset2"]) for p in pairs}
+    assert ("S00", "S03") in names  # same trend, no idiosyncratic walk
+    for pair in pairs:
+        assert pair["cointegrated"] and pair["pvalue"] < 0.05
+        assert pair["spread_std"] > 0
@@ -0,0 +1,108 @@
+"""
+Tests for the event-driven execution simulator.
+"""
+
+import sys
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from analytics.execution_simulator import (  # noqa: E402
+    ExecutionConfig,
+    MarketReplay,
+    ParentOrders,
+    schedule_fractions,
+    simulate,
+    sweep,
+)
+
+FRICTIONLESS = ExecutionConfig(horizon=10, temporary_impact=0.0, permanent_impact=0.0)
+
+
+def flat_replay(n=200, volume=1000.0, spread_bps=10.0) -> MarketReplay:
+    return MarketReplay(np.full(n, 100.0), np.full(n, volume), spread_bps)
+
+
+def orders(count=4, quantity=500.0, start=5) -> ParentOrders:
+    return ParentOrders([start] * count, [1, -1] * (count // 2), [quantity] * count)
+
+
+def test_aggressive_only_pays_half_spread():
+    config = replace(FRICTIONLESS, touch_share=0.0)
+    result = simulate(flat_replay(), orders(), config)
+    assert result.shortfall_bps == pytest.approx(np.full(4, 5.0))
+    assert np.all(result.fill_ratio == pytest.approx(1.0))
+    assert np.all(result.passive_ratio == 0.0)
+
+
+def test_queue_position_decides_passive_fills():
+    front = simulate(flat_replay(), orders(), replace(FRICTIONLESS, queue_depth=0.0))
+    assert front.passive_ratio == pytest.approx(np.ones(4))
+    assert front.shortfall_bps == pytest.approx(np.full(4, -5.0))
+
+    # Behind more volume than trades over the horizon: never filled passively
+    back = simulate(flat_replay(), orders(), replace(FRICTIONLESS, queue_depth=50.0))
+    assert np.all(back.passive_ratio == 0.0)
+    assert back.shortfall_bps == pytest.approx(np.full(4, 5.0))
+
+
+def test_participation_cap_limits_fills():
+    config = replace(FRICTIONLESS, participation_cap=0.01, queue_depth=0.0)
+    result = simulate(flat_replay(), orders(quantity=500.0), config)
+    # 10 events x 1% of 1000 per event, the rest is left unfilled
+    assert result.fill_ratio == pytest.approx(np.full(4, 100.0 / 500.0))
+
+
+def test_permanent_impact_raises_shortfall():
+    replay = MarketReplay.synthetic(n_events=2000, seed=3)
+    parents = ParentOrders.random(replay, 500, 30, seed=4)
+    base = simulate(replay, parents, ExecutionConfig(permanent_impact=0.0))
+    impacted = simulate(replay, parents, ExecutionConfig(permanent_impact=2.0))
+    assert impacted.shortfall_bps.mean() > base.shortfall_bps.mean()
+    assert np.all(impacted.shortfall_bps >= base.shortfall_bps - 1e-9)
+
+
+def test_schedules():
+    replay = MarketReplay.synthetic(n_events=800, seed=5)
+    starts = np.array([0, 100, 390])
+    twap = schedule_fractions(replay, starts, ExecutionConfig(horizon=20))
+    vwap = schedule_fractions(replay, starts, ExecutionConfig(algorithm="vwap", horizon=20))
+    urgent = schedule_fractions(replay, starts, ExecutionConfig(algorithm="is", urgency=5.0))
+    for curve in (twap, vwap, urgent):
+        assert np.all(np.diff(curve, axis=1) >= 0)
+        assert curve[:, -1] == pytest.approx(np.ones(3))
+    # Session open trades heavier than mid-session; IS front-loads
+    assert vwap[2, 0] > twap[2, 0]
+    assert urgent[0, 0] > 3 * (1 / 30)
+    with pytest.raises(ValueError):
+        schedule_fractions(replay, starts, ExecutionConfig(algorithm="pov"))
+
+
+def test_sweep_and_validation():
+    replay = MarketReplay.synthetic(n_events=1000, seed=6)
+    parents = ParentOrders.random(replay, 200, 60, seed=7)
+    rows = sweep(replay, parents, algorithm=["twap", "is"], horizon=[30, 60])
+    assert [(r["algorithm"], r["horizon"]) for r in rows] == [
+        ("twap", 30),
+        ("twap", 60),
+        ("is", 30),
+        ("is", 60),
+    ]
+    assert all(r["orders"] == 200 for r in rows)
+    with pytest.raises(ValueError):
+        simulate(replay, ParentOrders([990], [1], [10.0]), ExecutionConfig(horizon=30))
+
+
+def test_phase_module_imports_without_simulator(monkeypatch):
+    import importlib
+
+    monkeypatch.setitem(sys.modules, "analytics.execution_simulator", None)
+    monkeypatch.delitem(sys.modules, "phases.phase_4100_4300_execution", raising=False)
+    module = importlib.import_module("phases.phase_4100_4300_execution")
+    assert not module.HAS_EXECUTION_SIMULATOR
+    monkeypatch.delitem(sys.modules, "phases.phase_4100_4300_execution")
@@ -0,0 +1,175 @@
+"""
+Tests for the incremental exposure tracker and the router's local pre-trade checks.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from phases.phase_281_300_risk_extensions import ExposureTracker, RiskExtensions  # noqa: E402
+
+LIMITS = {
+    "max_position_size_pct": 0.20,
+    "max_sector_exposure_pct": 0.40,
+    "max_leverage": 1.0,
+    "max_concentration_pct": 0.50,
+    "max_daily_loss_pct": 0.05,
+    "max_drawdown_pct": 0.08,
+}
+SECTORS = {"AAPL": "TECH", "MSFT": "TECH", "NVDA": "TECH", "XOM": "ENERGY", "JPM": "FIN"}
+
+
+def test_aggregates_match_full_recomputation():
+    rng = random.Random(7)
+    tracker = ExposureTracker(LIMITS, SECTORS, cash=100_000.0)
+    book: dict[str, list[float]] = {}
+    cash = 100_000.0
+    for _ in range(2000):
+        symbol = rng.choice(list(SECTORS))
+        side = rng.choice(["buy", "sell"])
+        qty, price = rng.randint(1, 20), rng.uniform(50, 150)
+        tracker.apply_fill(symbol, side, qty, price)
+        held = book.get(symbol, [0.0, 0.0])[0] + (qty if side == "buy" else -qty)
+        book[symbol] = [held, price]
+        cash -= (qty if side == "buy" else -qty) * price
+        if rng.random() < 0.3:
+            marked = rng.choice(list(book))
+            book[marked][1] *= rng.uniform(0.95, 1.05)
+            tracker.mark(marked, book[marked][1])
+
+    values = {s: q * p for s, (q, p) in book.items() if q != 0}
+    gross = sum(abs(v) for v in values.values())
+    assert tracker.gross == pytest.approx(gross)
+    assert tracker.net == pytest.approx(sum(values.values()))
+    assert tracker.equity == pytest.approx(cash + sum(values.values()))
+    assert tracker.hhi == pytest.approx(sum(v * v for v in values.values()) / gross**2)
+    assert tracker.active == len(values)
+    top = sorted(((s, abs(v)) for s, v in values.items()), key=lambda x: x[1], reverse=True)
+    assert tracker.top_positions(3) == pytest.approx(top[:3])
+    assert len(tracker._largest) <= max(tracker.COMPACT_MIN_DEAD, 2 * len(tracker.positions)) + 1
+
+
+def test_risk_extension_checks_agree_with_tracked_book():
+    positions = {
+        "AAPL": {"quantity": 100, "price": 190.0},
+        "MSFT": {"quantity": 40, "price": 410.0},
+        "XOM": {"quantity": -50, "price": 110.0},
+        "JPM": {"quantity": 0, "price": 200.0},
+    }
+    risk = RiskExtensions()
+    risk.sync_portfolio({"positions": positions, "equity": 100_000.0}, SECTORS)
+
+    snapshot = risk.check_concentration_risk(positions, 100_000.0)
+    tracked = risk.check_concentration_risk()
+    assert tracked == snapshot
+    assert snapshot["top_positions"] == [("AAPL", 19000.0), ("MSFT", 16400.0), ("XOM", 5500.0)]
+    assert risk.check_sector_exposure() == risk.check_sector_exposure(positions, SECTORS)
+    assert risk.check_sector_exposure()["sector_exposure"]["TECH"] == pytest.approx(35400 / 40900)
+    assert risk.check_diversification()["active_positions"] == 3
+
+
+def test_check_order_limits():
+    tracker = ExposureTracker(LIMITS, SECTORS, cash=100_000.0)
+    assert tracker.check_order("AAPL", "buy", 100, 100.0)["approved"]
+
+    oversized = tracker.check_order("AAPL", "buy", 300, 100.0)
+    assert not oversized["approved"]
+    assert "position_size" in oversized["violations"]
+
+    tracker.apply_fill("AAPL", "buy", 150, 100.0)
+    tracker.apply_fill("MSFT", "buy", 150, 100.0)
+    sector = tracker.check_order("NVDA", "buy", 150, 100.0)
+    assert set(sector["violations"]) == {"sector_exposure"}
+    assert tracker.check_order("MSFT", "sell", 100, 100.0)["reason"] == "Reduces exposure"
+    # No price at all (unquoted market order): notional limits are skipped
+    unpriced = tracker.check_order("NEW", "buy", 1, 0.0)
+    assert unpriced["approved"] and "notional limits skipped" in unpriced["reason"]
+
+    # A 10% mark-down breaches daily loss and drawdown: only risk-reducing orders pass
+    tracker.mark("AAPL", 40.0)
+    assert tracker.drawdown == pytest.approx(0.09)
+    blocked = tracker.check_order("XOM", "buy", 1, 100.0)
+    assert {"daily_loss", "drawdown"} <= set(blocked["violations"])
+    assert not tracker.check_order("NEW", "buy", 1, 0.0)["approved"]
+    assert tracker.check_order("AAPL", "sell", 150, 40.0)["approved"]
+    tracker.start_day()
+    assert tracker.daily_pnl_pct == 0.0
+
+
+def test_router_validates_locally(monkeypatch):
+    from execution import router
+
+    risk = RiskExtensions()
+    risk.sync_portfolio({"positions": {}, "equity": 100_000.0})
+    monkeypatch.setattr(router, "_risk_extensions", risk)
+    monkeypatch.setattr(router, "REMOTE_RISK_CHECK", False)
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("remote risk engine should not be called")
+
+    monkeypatch.setattr(router.requests, "post", no_network)
+    assert router.validate_trade_with_risk("AAPL", "buy", 10, 100.0, 100_000.0) == (
+        True,
+        "Approved",
+    )
+    approved, reason = router.validate_trade_with_risk("AAPL", "buy", 1000, 100.0, 100_000.0)
+    assert not approved and reason.startswith("position_size")
+
+
+def test_market_orders_priced_from_mark_or_quote(monkeypatch):
+    from execution import router
+
+    risk = RiskExtensions()
+    risk.sync_portfolio({"positions": {}, "equity": 100_000.0})
+    monkeypatch.setattr(router, "_risk_extensions", risk)
+    monkeypatch.setattr(router, "REMOTE_RISK_CHECK", False)
+    monkeypatch.setattr(router, "check_guardian_pause", lambda: False)
+    monkeypatch.setattr(router, "SLICE_INTERVAL", 0.0)
+
+    class Quotes:
+        prices = {}
+
+        def get_quote(self, symbol):
+            price = self.prices.get(symbol)
+            return None if price is None else type("Quote", (), {"mid_price": price})()
+
+    monkeypatch.setattr(router, "get_quote_service", Quotes)
+    monkeypatch.setattr(router, "HAS_QUOTE_SERVICE", True)
+
+    # Unquoted and not held: routed, with only the book-level limits checked
+    assert router.route_order("AAPL", "buy", 1)["status"] == "executed"
+
+    # A quote prices the order, so the position limit applies
+    Quotes.prices["MSFT"] = 400.0
+    assert router.reference_price("MSFT") == 400.0
+    oversized = router.route_order("MSFT", "buy", 1000)
+    assert oversized["status"] == "rejected" and oversized["reason"].startswith("position_size")
+
+    # A held symbol uses the tracker's mark before any quote
+    risk.exposure.apply_fill("XOM", "buy", 10, 110.0)
+    Quotes.prices["XOM"] = 999.0
+    assert router.reference_price("XOM") == 110.0
+    assert router.reference_price("XOM", limit_price=105.0) == 105.0
+
+
+def test_mock_fills_are_not_booked_into_the_shared_tracker(monkeypatch):
+    from execution import router
+
+    risk = RiskExtensions()
+    risk.sync_portfolio({"positions": {}, "equity": 100_000.0})
+    monkeypatch.setattr(router, "_risk_extensions", risk)
+    monkeypatch.setattr(router, "REMOTE_RISK_CHECK", False)
+    monkeypatch.setattr(router, "HAS_QUOTE_SERVICE", False)
+    monkeypatch.setattr(router, "ROUTER_BROKER", "mock")
+    monkeypatch.setattr(router, "check_guardian_pause", lambda: False)
+    monkeypatch.setattr(router, "SLICE_INTERVAL", 0.0)
+
+    # Mock fills at MOCK_FILL_PRICE would otherwise leave a phantom position
+    assert router.route_order("AAPL", "buy", 1)["status"] == "executed"
+    assert router.route_order("AAPL", "buy", 1)["status"] == "executed"
+    assert "AAPL" not in risk.exposure.positions
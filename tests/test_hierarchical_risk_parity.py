@@ -0,0 +1,188 @@
+"""
+Tests for Hierarchical Risk Parity.
+Checks cluster-tree bisection against a naive recursive reference, the linkage
+cache, and incremental re-clustering when the universe changes.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("scipy")
+
+from scipy.cluster.hierarchy import linkage, to_tree  # noqa: E402
+from scipy.spatial.distance import squareform  # noqa: E402
+
+import analytics.hierarchical_risk_parity as hrp_module  # noqa: E402
+from analytics.hierarchical_risk_parity import HierarchicalRiskParity  # noqa: E402
+
+
+def make_prices(num_assets: int, num_days: int = 300, blocks: int = 4, seed: int = 0):
+    """Prices with block-correlated returns (a few sector factors)."""
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(0, 0.01, (num_days, blocks))
+    loadings = np.zeros((num_assets, blocks))
+    loadings[np.arange(num_assets), np.arange(num_assets) % blocks] = rng.uniform(
+        0.5, 1.5, num_assets
+    )
+    vols = rng.uniform(0.005, 0.02, num_assets)
+    returns = factors @ loadings.T + rng.normal(0, 1, (num_days, num_assets)) * vols
+    names = [f"A{i:04d}" for i in range(num_assets)]
+    return pd.DataFrame(100 * np.cumprod(1 + returns, axis=0), columns=names)
+
+
+def reference_weights(cov: np.ndarray, corr: np.ndarray, method: str = "ward") -> np.ndarray:
+    """Naive recursive HRP: bisect the scipy tree with explicit submatrix variances."""
+    distance = np.sqrt(np.clip(0.5 * (1 - corr), 0, None))
+    np.fill_diagonal(distance, 0)
+    root = to_tree(linkage(squareform(distance, checks=False), method=method))
+    weights = np.zeros(len(cov))
+
+    def cluster_var(items):
+        sub = cov[np.ix_(items, items)]
+        ivp = 1 / np.diag(sub)
+        ivp /= ivp.sum()
+        return ivp @ sub @ ivp
+
+    def bisect(node, weight):
+        if node.is_leaf():
+            weights[node.id] = weight
+            return
+        left, right = node.get_left().pre_order(), node.get_right().pre_order()
+        var_left, var_right = cluster_var(left), cluster_var(right)
+        alpha = 1 - var_left / (var_left + var_right)
+        bisect(node.get_left(), weight * alpha)
+        bisect(node.get_right(), weight * (1 - alpha))
+
+    bisect(root, 1.0)
+    return weights
+
+
+@pytest.fixture(autouse=True)
+def clear_tree_cache():
+    hrp_module._TREE_CACHE.clear()
+    hrp_module._LAST_TREE.clear()
+    yield
+    hrp_module._TREE_CACHE.clear()
+    hrp_module._LAST_TREE.clear()
+
+
+class TestHierarchicalRiskParity:
+    """HRP weights and clustering."""
+
+    @pytest.mark.parametrize("method", ["ward", "single", "average"])
+    def test_matches_recursive_reference(self, method):
+        prices = make_prices(40, seed=1)
+        hrp = HierarchicalRiskParity(prices, linkage_method=method, incremental=False)
+        weights = np.array([hrp.optimize()[name] for name in hrp.asset_names])
+
+        expected = reference_weights(hrp.cov_matrix.values, hrp.corr_matrix.values, method)
+        np.testing.assert_allclose(weights, expected, rtol=1e-9, atol=1e-12)
+        assert weights.sum() == pytest.approx(1.0)
+        assert (weights > 0).all()
+
+    def test_correlation_uses_covariance_scaling(self):
+        prices = make_prices(10, seed=2)
+        hrp = HierarchicalRiskParity(prices)
+        expected = prices.pct_change().dropna().corr().values
+        np.testing.assert_allclose(hrp.corr_matrix.values, expected, atol=1e-10)
+
+    def test_quasi_diagonalization_groups_blocks(self):
+        prices = make_prices(16, blocks=4, seed=3)
+        hrp = HierarchicalRiskParity(prices)
+        order = hrp._quasi_diagonalization()
+        blocks = [int(name[1:]) % 4 for name in order]
+        # Each sector forms one contiguous run in leaf order
+        runs = sum(1 for i in range(1, len(blocks)) if blocks[i] != blocks[i - 1]) + 1
+        assert sorted(order) == sorted(hrp.asset_names)
+        assert runs == 4
+
+    def test_linkage_cache_hit(self, monkeypatch):
+        prices = make_prices(30, seed=4)
+        first = HierarchicalRiskParity(prices).optimize()
+
+        def fail(*args, **kwargs):
+            raise AssertionError("linkage recomputed")
+
+        monkeypatch.setattr(hrp_module, "linkage", fail)
+        second = HierarchicalRiskParity(prices).optimize()
+        assert second == first
+
+    def test_incremental_add_and_remove(self, monkeypatch):
+        prices = make_prices(60, seed=5)
+        HierarchicalRiskParity(prices).optimize()
+
+        calls = []
+        original = hrp_module.linkage
+        monkeypatch.setattr(
+            hrp_module, "linkage", lambda *a, **k: calls.append(1) or original(*a, **k)
+        )
+
+        extra = make_prices(61, seed=5).iloc[:, [60]].rename(columns={"A0060": "NEW"})
+        changed = pd.concat([prices.drop(columns=["A0007"]), extra], axis=1)
+        hrp = HierarchicalRiskParity(changed)
+        tree = hrp._cluster_tree()
+        weights = hrp.optimize()
+
+        assert calls == []
+        assert sorted(tree.order.tolist()) == list(range(len(hrp.asset_names)))
+        assert len(tree.nodes) == len(hrp.asset_names) - 1
+        assert set(weights) == set(changed.columns)
+        assert sum(weights.values()) == pytest.approx(1.0)
+        assert all(w > 0 for w in weights.values())
+
+    def test_rolling_windows_relink_and_drift_is_measured_from_linkage(self, monkeypatch):
+        prices = make_prices(30, num_days=400, seed=10)
+        calls = []
+        original = hrp_module.linkage
+        monkeypatch.setattr(
+            hrp_module, "linkage", lambda *a, **k: calls.append(1) or original(*a, **k)
+        )
+        # Same symbols, sliding window: every new correlation matrix is relinked
+        for start in range(0, 100, 10):
+            window = prices.iloc[start : start + 300]
+            weights = HierarchicalRiskParity(window).optimize()
+            fresh = HierarchicalRiskParity(window, incremental=False)
+            expected = reference_weights(fresh.cov_matrix.values, fresh.corr_matrix.values)
+            np.testing.assert_allclose(
+                [weights[name] for name in fresh.asset_names], expected, rtol=1e-9
+            )
+        assert len(calls) == 10
+
+        # A patch keeps the correlations the surviving symbols were linked with
+        linked = hrp_module._LAST_TREE["ward"]
+        HierarchicalRiskParity(prices.iloc[90:390].drop(columns=["A0003"])).optimize()
+        patched = hrp_module._LAST_TREE["ward"]
+        assert len(calls) == 10
+        keep = [i for i, name in enumerate(linked.names) if name != "A0003"]
+        np.testing.assert_array_equal(patched.corr, linked.corr[np.ix_(keep, keep)])
+
+    def test_large_universe_changes_recluster(self, monkeypatch):
+        HierarchicalRiskParity(make_prices(20, seed=6)).optimize()
+        calls = []
+        original = hrp_module.linkage
+        monkeypatch.setattr(
+            hrp_module, "linkage", lambda *a, **k: calls.append(1) or original(*a, **k)
+        )
+        HierarchicalRiskParity(make_prices(20, seed=7)).optimize()
+        assert calls == [1]
+
+    def test_single_asset(self):
+        prices = make_prices(1, seed=8)
+        assert HierarchicalRiskParity(prices).optimize() == {"A0000": 1.0}
+
+    @pytest.mark.slow
+    def test_thousand_assets_under_a_second(self):
+        prices = make_prices(1000, num_days=500, blocks=20, seed=9)
+        hrp = HierarchicalRiskParity(prices)
+        start = time.perf_counter()
+        weights = hrp.optimize()
+        assert time.perf_counter() - start < 1.0
+        assert sum(weights.values()) == pytest.approx(1.0)
@@ -0,0 +1,112 @@
+"""
+Tests for lazy optional imports and the entry points that rely on them.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.lazy_imports import is_loaded, lazy_import, module_available  # noqa: E402
+
+
+@pytest.fixture
+def probe_module(tmp_path, monkeypatch):
+    (tmp_path / "lazy_probe_mod.py").write_text("VALUE = 42\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "lazy_probe_mod"
+    sys.modules.pop("lazy_probe_mod", None)
+
+
+def test_import_deferred_until_attribute_access(probe_module):
+    hooked = []
+    module = lazy_import(probe_module, on_import=hooked.append)
+    assert probe_module not in sys.modules
+    assert not is_loaded(module)
+
+    assert module.VALUE == 42
+    assert module.VALUE == 42
+    assert is_loaded(module)
+    assert probe_module in sys.modules
+    assert hooked == [sys.modules[probe_module]]
+
+
+def test_module_available_does_not_import(probe_module):
+    assert module_available(probe_module)
+    assert probe_module not in sys.modules
+    assert not module_available("neolight_no_such_module")
+
+
+def test_missing_module_fails_at_first_use():
+    module = lazy_import("neolight_no_such_module")
+    with pytest.raises(ImportError):
+        module.anything  # noqa: B018
+
+
+@pytest.mark.parametrize(
+    "entry",
+    ["trader.smart_trader", "agents.sports_analytics_agent", "analytics.realtime_market_data"],
+)
+def test_entry_points_skip_heavy_imports(entry):
+    heavy = ["pandas", "scipy", "sklearn", "tensorflow", "torch", "xgboost", "yfinance"]
+    code = (
+        f"import json, sys, importlib; importlib.import_module({entry!r}); "
+        f"print(json.dumps([m for m in {heavy!r} if m in sys.modules]))"
+    )
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
+
+
+def test_utils_package_exports_heavy_helpers_lazily():
+    heavy = ["asyncio", "multiprocessing", "requests"]
+    code = (
+        "import json, sys, utils; "
+        f"loaded = [m for m in {heavy!r} if m in sys.modules]; "
+        "from utils import StateBus, get_dispatcher; "
+        "print(json.dumps([loaded, StateBus.__module__, get_dispatcher.__module__]))"
+    )
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == [
+        [],
+        "utils.state_bus",
+        "utils.notification_dispatcher",
+    ]
+
+
+@pytest.mark.parametrize(
+    "script",
+    [
+        "agents/sports_analytics_agent.py",
+        "agents/strategy_manager.py",
+        "analytics/black_litterman_optimizer.py",
+        "analytics/hierarchical_risk_parity.py",
+        "analytics/realtime_market_data.py",
+        "trader/quote_service.py",
+    ],
+)
+def test_modules_load_when_run_as_scripts(script, tmp_path):
+    # As with `python agents/x.py`: only the script's own directory is on sys.path
+    path = ROOT / script
+    code = (
+        f"import runpy, sys; sys.path[0] = {str(path.parent)!r}; "
+        f"runpy.run_path({str(path)!r}, run_name='script_probe')"
+    )
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONPATH"}
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=tmp_path, env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,197 @@
+"""
+Tests for the LLM gateway against a local stub model server.
+"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("requests")
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils import agent_ai_client, llm_gateway  # noqa: E402
+from utils.llm_gateway import LLMGateway, QuotaCounter, normalize_prompt  # noqa: E402
+
+
+class StubModelServer(ThreadingHTTPServer):
+    """Ollama /api/generate and a RapidAPI-style chat endpoint."""
+
+    daemon_threads = True
+
+    def __init__(self, delay: float = 0.0):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.delay = delay
+        self.status = 200
+        self.requests: list[dict] = []
+        self.url = f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # Headers and body go out in separate writes
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append(body)
+        time.sleep(self.server.delay)
+        prompt = body.get("prompt") or body["messages"][-1]["content"]
+        answer = f"answer to {prompt.split()[-1]}"
+        if body.get("stream"):
+            lines = [{"response": word + " ", "done": False} for word in answer.split()]
+            payload = "".join(json.dumps(line) + "\n" for line in lines + [{"done": True}])
+        else:
+            payload = json.dumps({"response": answer, "done": True})
+        data = payload.encode() if self.server.status == 200 else b"{}"
+        self.send_response(self.server.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def server():
+    stub = StubModelServer()
+    thread = threading.Thread(target=stub.serve_forever, daemon=True)
+    thread.start()
+    yield stub
+    stub.shutdown()
+    stub.server_close()
+
+
+@pytest.fixture
+def gateway(monkeypatch, tmp_path, server):
+    quota = QuotaCounter(tmp_path / "rapidapi_usage.json", limit=3, flush_interval=3600)
+    gw = LLMGateway(tmp_path / "llm_cache.jsonl", quotas={"rapidapi": quota})
+    monkeypatch.setattr(llm_gateway, "_gateway", gw)
+    monkeypatch.setattr(agent_ai_client, "OLLAMA_BASE_URL", server.url)
+    monkeypatch.setattr(agent_ai_client, "RAPIDAPI_LLAMA_URL", f"{server.url}/llama")
+    yield gw
+    gw.close()
+
+
+def test_repeated_and_normalized_prompts_are_cached(gateway, server, tmp_path):
+    prompt = "At 2026-03-01T12:00:00Z worker 0x7f3a crashed. Why did BTC"
+    assert agent_ai_client.query_ollama(prompt) == "answer to BTC"
+    assert agent_ai_client.query_ollama(prompt) == "answer to BTC"
+    # Same question with volatile details changed hits the normalized key
+    variant = "at 2026-03-02T08:15:00Z  worker 0x11 crashed.\nwhy did BTC"
+    assert normalize_prompt(variant) == normalize_prompt(prompt)
+    assert agent_ai_client.query_ollama(variant) == "answer to BTC"
+    assert len(server.requests) == 1
+    assert gateway.stats["hits"] == 2
+
+    # Numbers stay significant, and the cache survives a restart
+    assert agent_ai_client.query_ollama("RSI 71 for ETH") == "answer to ETH"
+    restarted = LLMGateway(tmp_path / "llm_cache.jsonl")
+    assert restarted.complete("ollama", prompt, lambda: 1 / 0, model="deepseek-r1:7b") == (
+        "answer to BTC"
+    )
+    assert len(server.requests) == 2
+
+    # Expired entries are fetched again
+    gateway.cache.ttl = 0.0
+    assert agent_ai_client.query_ollama("fresh question for SOL") == "answer to SOL"
+    assert agent_ai_client.query_ollama("fresh question for SOL") == "answer to SOL"
+    assert len(server.requests) == 4
+
+
+def test_identical_concurrent_prompts_share_one_request(gateway, server):
+    server.delay = 0.2
+    barrier = threading.Barrier(8)
+    results = []
+
+    def ask():
+        barrier.wait()
+        results.append(agent_ai_client.query_ollama("what moves XAU"))
+
+    threads = [threading.Thread(target=ask) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["answer to XAU"] * 8
+    assert len(server.requests) == 1
+    assert gateway.stats["coalesced"] + gateway.stats["hits"] == 7
+
+
+def test_streaming_delivers_tokens_and_fills_cache(gateway, server):
+    tokens = list(agent_ai_client.stream_ollama("explain the move in NVDA"))
+    assert tokens == ["answer ", "to ", "NVDA "]
+    assert server.requests[-1]["stream"] is True
+    # The streamed text answers later non-streaming calls from cache
+    assert agent_ai_client.query_ollama("explain the move in NVDA") == "answer to NVDA "
+
+    async def consume():
+        streamed = [t async for t in gateway.astream("ollama", "p", lambda: iter(["a", "b"]))]
+        cached = await gateway.acomplete("ollama", "p", lambda: 1 / 0)
+        return streamed, cached
+
+    assert asyncio.run(consume()) == (["a", "b"], "ab")
+    assert len(server.requests) == 1
+
+
+def test_quota_counted_in_memory_and_flushed(gateway, server, tmp_path):
+    usage_file = tmp_path / "rapidapi_usage.json"
+    for symbol in ("AAPL", "MSFT", "MSFT"):
+        assert agent_ai_client.query_rapidapi_llama(f"outlook for {symbol}").endswith(symbol)
+    assert agent_ai_client.get_rapidapi_status()["used"] == 2  # Cache hits are free
+    assert not usage_file.exists()  # Not written per call
+
+    # Another process counted meanwhile; the flush adds our increments to its
+    usage_file.write_text(json.dumps({"month": time.strftime("%Y-%m"), "count": 1}))
+    gateway.quotas["rapidapi"].flush()
+    assert json.loads(usage_file.read_text())["count"] == 3
+    assert agent_ai_client.check_rapidapi_quota() == (False, 0)
+    assert agent_ai_client.query_rapidapi_llama("outlook for TSLA") is None
+    assert len(server.requests) == 2
+
+    # A new month resets the count
+    gateway.quotas["rapidapi"].month = "1999-01"
+    assert agent_ai_client.check_rapidapi_quota() == (True, 3)
+
+
+def test_failures_cool_down_and_route_by_latency(gateway, server, monkeypatch):
+    monkeypatch.setattr(agent_ai_client, "OLLAMA_BASE_URL", "http://127.0.0.1:9")
+    assert agent_ai_client.query_ollama("is the feed up") is None
+    assert not gateway.latency.healthy("ollama")
+
+    # While Ollama cools down, analysis goes straight to the fallback
+    calls = []
+    monkeypatch.setattr(gateway.session, "post", lambda *a, **k: calls.append(a) or 1 / 0)
+    assert agent_ai_client.query_ollama("is the feed up") is None
+    assert calls == []
+
+    gateway.latency.record("groq", 0.4)
+    gateway.latency.record("openai", 1.5)
+    gateway.latency.record("openai", 0.5)
+    assert gateway.latency.latency("openai") == pytest.approx(1.3)
+    order = gateway.route(["ollama", "rapidapi", "openai", "groq", "mistral"])
+    assert order == ["mistral", "groq", "openai", "rapidapi", "ollama"]
+
+
+def test_unusable_answers_are_misses_and_http_errors_failures(gateway, server):
+    # A reply without a usable answer (e.g. no JSON in it) is not cached or penalized
+    calls = []
+    assert gateway.complete("anthropic", "rca", lambda: calls.append(1)) is None
+    assert gateway.complete("anthropic", "rca", lambda: calls.append(1)) is None
+    assert calls == [1, 1]
+    assert gateway.latency.healthy("anthropic")
+
+    server.status = 500
+    assert agent_ai_client.query_rapidapi_llama("outlook for AMD") is None
+    assert not gateway.latency.healthy("rapidapi")
+    assert agent_ai_client.query_ollama("is the feed up") is None
+    assert not gateway.latency.healthy("ollama")
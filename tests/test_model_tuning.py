@@ -0,0 +1,173 @@
+"""
+Tests for the cached, parallel successive-halving tuning engine.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+
+from sklearn.ensemble import GradientBoostingRegressor  # noqa: E402
+from sklearn.linear_model import Ridge  # noqa: E402
+from sklearn.metrics import r2_score  # noqa: E402
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from analytics.model_tuning import (  # noqa: E402
+    Evaluator,
+    FeatureCache,
+    dataset_fingerprint,
+    expand_grid,
+    fit_candidates,
+    successive_halving,
+)
+
+
+def ridge(params):
+    return Ridge(**params)
+
+
+def boosting(params):
+    return GradientBoostingRegressor(random_state=0, **params)
+
+
+def broken(params):
+    raise ImportError("xgboost is installed but its native library is missing")
+
+
+def regression(n=600, noise=0.5, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 5))
+    y = X @ np.array([3.0, -2.0, 1.0, 0.0, 0.5]) + np.sin(2 * X[:, 0]) + rng.normal(0, noise, n)
+    return X[:480], y[:480], X[480:], y[480:]
+
+
+def test_fingerprint_and_cache():
+    df = pd.DataFrame({"equity": [1.0, 2.0, 3.0], "ts": ["a", "b", "c"]})
+    assert dataset_fingerprint(df) == dataset_fingerprint(df.copy())
+    changed = df.copy()
+    changed.loc[2, "equity"] = 3.5
+    assert dataset_fingerprint(changed) != dataset_fingerprint(df)
+    assert dataset_fingerprint(df.rename(columns={"ts": "t"})) != dataset_fingerprint(df)
+
+    cache, calls = FeatureCache(maxsize=2), []
+    for key in ["a", "b", "a", "c", "b"]:
+        cache.get_or_compute(key, lambda key=key: calls.append(key) or key.upper())
+    # "b" was evicted by "c" (least recently used after "a" was hit)
+    assert calls == ["a", "b", "c", "b"]
+    assert (cache.hits, cache.misses) == (1, 4)
+
+
+def test_halving_on_data_subsets_prunes_and_picks_best():
+    X_train, y_train, X_val, y_val = regression()
+    candidates = expand_grid({"alpha": [0.01, 0.1, 1.0, 10.0, 100.0, 300.0, 1e3, 3e3, 1e4]})
+    with Evaluator(X_train, y_train, X_val, y_val, max_workers=1) as evaluator:
+        result = successive_halving(ridge, candidates, evaluator, eta=3, min_samples=30)
+
+    assert result.rungs == [53, 160, 480]
+    assert [sum(h["rung"] == r for h in result.history) for r in range(3)] == [9, 3, 1]
+    assert result.best_params["alpha"] <= 1.0
+    expected = r2_score(y_val, Ridge(**result.best_params).fit(X_train, y_train).predict(X_val))
+    assert result.best_score == pytest.approx(expected)
+
+
+def test_boosting_rounds_are_warm_started():
+    X_train, y_train, X_val, y_val = regression()
+    grid = {"n_estimators": [10, 20, 40], "max_depth": [1, 2, 3], "learning_rate": [0.1, 0.3]}
+    with Evaluator(X_train, y_train, X_val, y_val, max_workers=1) as evaluator:
+        result = successive_halving(
+            boosting, expand_grid(grid), evaluator, resource="n_estimators", eta=2
+        )
+
+    assert result.rungs == [10, 20, 40]
+    assert [sum(h["rung"] == r for h in result.history) for r in range(3)] == [6, 3, 2]
+    # Adding rounds to a warm model matches training from scratch
+    final = [h for h in result.history if h["rung"] == 2]
+    for record in final:
+        fresh = boosting(record["params"]).fit(X_train, y_train)
+        assert record["score"] == pytest.approx(r2_score(y_val, fresh.predict(X_val)))
+    assert result.best_score == max(h["score"] for h in result.history)
+
+
+def test_process_pool_matches_in_process():
+    X_train, y_train, X_val, y_val = regression(seed=1)
+    candidates = [(ridge, {"alpha": a}) for a in (0.1, 10.0, 1000.0)]
+    with Evaluator(X_train, y_train, X_val, y_val, max_workers=1) as evaluator:
+        serial = fit_candidates(candidates, evaluator)
+    with Evaluator(X_train, y_train, X_val, y_val, max_workers=2) as evaluator:
+        parallel = fit_candidates(candidates, evaluator)
+    for a, b in zip(serial, parallel, strict=True):
+        assert a["r2"] == pytest.approx(b["r2"])
+        assert a["mse"] == pytest.approx(b["mse"])
+
+
+def test_failing_candidate_does_not_stop_the_others():
+    X_train, y_train, X_val, y_val = regression(seed=3)
+    with Evaluator(X_train, y_train, X_val, y_val, max_workers=1) as evaluator:
+        scored = fit_candidates([(ridge, {"alpha": 1.0}), (broken, {})], evaluator)
+        assert scored[0]["r2"] > 0.5 and "error" not in scored[0]
+        assert scored[1]["r2"] == -np.inf and scored[1]["error"].startswith("ImportError")
+
+        # A configuration that fails to fit is pruned like a bad score
+        result = successive_halving(
+            ridge, [{"alpha": "bad"}, {"alpha": 1.0}], evaluator, eta=2, min_samples=60
+        )
+    assert result.best_params == {"alpha": 1.0}
+    assert result.best_score == pytest.approx(scored[0]["r2"])
+
+
+def test_ml_pipeline_engineers_features_once(monkeypatch, tmp_path):
+    from agents import ml_pipeline
+
+    rng = np.random.default_rng(2)
+    n = 300
+    df = pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2024-01-01", periods=n, freq="h").astype(str),
+            "equity": 100_000 + np.cumsum(rng.normal(5, 200, n)),
+            "pnl_pct": rng.normal(0, 1, n),
+        }
+    )
+    calls = []
+    engineer = ml_pipeline.engineer_features
+    monkeypatch.setattr(
+        ml_pipeline, "engineer_features", lambda frame: calls.append(1) or engineer(frame)
+    )
+    monkeypatch.setattr(ml_pipeline, "MODELS_DIR", tmp_path)
+    monkeypatch.setattr(ml_pipeline, "ML_WORKERS", 1)
+    ml_pipeline._dataset_cache.clear()
+
+    selection = ml_pipeline.auto_model_selection(df)
+    tuned = ml_pipeline.hyperparameter_tuning("ridge", df)
+    boosted = ml_pipeline.hyperparameter_tuning("gradient_boosting", df)
+    ensemble = ml_pipeline.train_ensemble_model(df, "voting")
+
+    assert len(calls) == 1
+    assert len(selection["all_results"]) == 4
+    assert len(list(tmp_path.glob("*.json"))) >= 1
+    assert tuned["method"] == "successive_halving"
+    assert tuned["evaluations"] == 6
+    assert boosted["best_params"]["n_estimators"] in (50, 100, 200)
+    assert boosted["evaluations"] == 9 + 5 + 3
+    assert ensemble["r2_score"] > 0.5
+
+    # One model failing to build leaves the rest of the selection intact
+    build_model = ml_pipeline.build_model
+
+    def flaky_build(model_type, params=None):
+        if model_type == "gradient_boosting":
+            raise RuntimeError("fit failed")
+        return build_model(model_type, params)
+
+    monkeypatch.setattr(ml_pipeline, "build_model", flaky_build)
+    selection = ml_pipeline.auto_model_selection(df)
+    assert [r["model_type"] for r in selection["all_results"]] == [
+        "random_forest",
+        "ridge",
+        "linear_regression",
+    ]
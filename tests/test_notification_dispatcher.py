@@ -0,0 +1,305 @@
+"""
+Tests for the notification dispatcher against a local fake Telegram Bot API.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("requests")
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils import notification_dispatcher as nd  # noqa: E402
+from utils.notification_dispatcher import MAX_MESSAGE_CHARS, NotificationDispatcher  # noqa: E402
+
+
+class FakeTelegram(ThreadingHTTPServer):
+    """
+    Records sendMessage calls; answers after `delay`, with 502 while `failures`
+    > 0 and 429 while `throttle` > 0.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, delay: float = 0.0):
+        super().__init__(("127.0.0.1", 0), FakeTelegramHandler)
+        self.delay = delay
+        self.throttle = 0
+        self.failures = 0
+        self.url = f"http://127.0.0.1:{self.server_address[1]}"
+        self.messages = []
+        self.lock = threading.Lock()
+
+
+class FakeTelegramHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.server.delay)
+        with self.server.lock:
+            if self.server.failures:
+                self.server.failures -= 1
+                status = 502
+                body = {"ok": False, "error_code": 502}
+            elif self.server.throttle:
+                self.server.throttle -= 1
+                status = 429
+                body = {"ok": False, "error_code": 429, "parameters": {"retry_after": 0.2}}
+            else:
+                status = 200
+                body = {"ok": True, "result": {"message_id": len(self.server.messages)}}
+                self.server.messages.append({"path": self.path, "at": time.monotonic(), **payload})
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def telegram():
+    server = FakeTelegram()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def spill_file(tmp_path, pid=None):
+    """The spill file a process with `pid` (default: this one) appends to."""
+    return tmp_path / f"spill.{pid or os.getpid()}.jsonl"
+
+
+def make_dispatcher(telegram, tmp_path, **kwargs):
+    options = {
+        "chat_id": "100",
+        "api_url": telegram.url,
+        "coalesce_window": 0.1,
+        "rate": 100.0,
+        "burst": 10,
+        "spill_path": tmp_path / "spill.jsonl",
+        "retry_interval": 0.1,
+    }
+    options.update(kwargs)
+    return NotificationDispatcher("TOKEN", **options)
+
+
+def test_notify_returns_in_microseconds_while_server_is_slow(telegram, tmp_path):
+    telegram.delay = 0.5  # Each sendMessage takes half a second
+    dispatcher = make_dispatcher(telegram, tmp_path)
+    timings = []
+    for i in range(500):
+        start = time.perf_counter()
+        assert dispatcher.notify(f"fill {i}")
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+
+    assert timings[len(timings) // 2] < 50e-6
+    assert sum(timings) < 0.25  # One blocking post alone would take 0.5 s
+    assert dispatcher.flush(timeout=10)
+    dispatcher.close()
+    # The burst goes out as digests filling Telegram's message limit
+    assert len(telegram.messages) == 2
+    digest = telegram.messages[0]
+    assert digest["path"] == "/botTOKEN/sendMessage" and digest["chat_id"] == "100"
+    assert digest["text"].startswith("🔔 410 alerts\n\nfill 0\n\nfill 1\n")
+    assert sum(m["text"].count("fill ") for m in telegram.messages) == 500
+
+    # Without a token or chat, notify is a no-op
+    assert not NotificationDispatcher(None, chat_id="100").notify("ignored")
+    assert not NotificationDispatcher("TOKEN").notify("no chat")
+
+
+def test_alerts_coalesced_deduped_and_split(telegram, tmp_path):
+    dispatcher = make_dispatcher(telegram, tmp_path, dedupe_window=60.0)
+    for _ in range(5):
+        dispatcher.notify("⚠️ Circuit breaker OPEN")
+        dispatcher.notify("Drawdown 4%", parse_mode="Markdown")
+    dispatcher.notify("Ops alert", chat_id="200")
+    dispatcher.flush()
+
+    by_chat = {(m["chat_id"], m.get("parse_mode")): m["text"] for m in telegram.messages}
+    assert by_chat == {
+        ("100", None): "⚠️ Circuit breaker OPEN\n(×5)",
+        ("100", "Markdown"): "Drawdown 4%\n(×5)",
+        ("200", None): "Ops alert",
+    }
+    assert dispatcher.stats["coalesced"] == 8
+
+    # A repeat inside the dedupe window is suppressed; new text still goes out
+    dispatcher.notify("⚠️ Circuit breaker OPEN")
+    dispatcher.notify("Circuit breaker CLOSED")
+    dispatcher.flush()
+    assert telegram.messages[-1]["text"] == "Circuit breaker CLOSED"
+    assert dispatcher.stats["suppressed"] == 1
+
+    # Digests stay within Telegram's message limit
+    for i in range(40):
+        dispatcher.notify(f"report {i} " + "x" * 300)
+    dispatcher.flush()
+    dispatcher.close()
+    digests = telegram.messages[4:]
+    assert len(digests) == 4
+    assert all(len(m["text"]) <= MAX_MESSAGE_CHARS for m in digests)
+    assert sum(m["text"].count("report ") for m in digests) == 40
+
+
+def test_rate_limited_per_chat_and_honours_retry_after(telegram, tmp_path):
+    dispatcher = make_dispatcher(
+        telegram, tmp_path, coalesce_window=0.0, dedupe_window=0.0, rate=10.0, burst=1
+    )
+    # Distinct digests: each flush sends whatever is queued
+    for i in range(4):
+        dispatcher.notify(f"a{i}")
+        dispatcher.notify(f"b{i}", chat_id="200")
+        dispatcher.flush()
+    dispatcher.close()
+
+    for chat in ("100", "200"):
+        stamps = [m["at"] for m in telegram.messages if m["chat_id"] == chat]
+        assert len(stamps) == 4
+        assert stamps[-1] - stamps[0] >= 3 / 10 - 0.02
+
+    telegram.throttle = 2
+    throttled = make_dispatcher(telegram, tmp_path)
+    start = time.monotonic()
+    throttled.notify("after 429")
+    throttled.flush()
+    throttled.close()
+    assert telegram.messages[-1]["text"] == "after 429"
+    assert telegram.messages[-1]["at"] - start >= 0.4  # Two retry_after waits
+
+
+def test_overflow_spills_to_disk_and_replays(telegram, tmp_path):
+    spill = tmp_path / "spill.jsonl"
+    telegram.delay = 0.3
+    dispatcher = make_dispatcher(telegram, tmp_path, max_queue=5, coalesce_window=0.2)
+    for i in range(20):
+        dispatcher.notify(f"alert {i}")
+    assert dispatcher.stats["queued"] == 5 and dispatcher.stats["spilled"] == 15
+    assert len(spill_file(tmp_path).read_text().splitlines()) == 15
+
+    deadline = time.monotonic() + 10
+    while dispatcher.stats["restored"] < 15 or dispatcher._pending:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    dispatcher.close()
+    delivered = "\n".join(m["text"] for m in telegram.messages)
+    assert all(f"alert {i}\n" in delivered + "\n" for i in range(20))
+    assert list(tmp_path.glob("spill*")) == []
+
+    # Undeliverable digests spill too, and are resent by a later dispatcher
+    down = NotificationDispatcher(
+        "TOKEN",
+        chat_id="100",
+        api_url="http://127.0.0.1:9",
+        spill_path=spill,
+        coalesce_window=0.0,
+        max_retries=0,
+        timeout=0.5,
+    )
+    down.notify("while offline")
+    down.flush()
+    down.close()
+    assert json.loads(spill_file(tmp_path).read_text())["text"] == "while offline"
+
+    later = make_dispatcher(telegram, tmp_path)
+    later.notify("back online")
+    later.flush()
+    deadline = time.monotonic() + 5
+    while "while offline" not in telegram.messages[-1]["text"]:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    later.close()
+
+
+def test_alert_spilled_during_outage_is_delivered_after_recovery(telegram, tmp_path):
+    telegram.failures = 1
+    dispatcher = make_dispatcher(
+        telegram, tmp_path, max_retries=0, retry_interval=0.2, dedupe_window=60.0
+    )
+    dispatcher.notify("Disk full on worker-3")
+    dispatcher.flush()
+    assert dispatcher.stats["spilled"] == 1 and telegram.messages == []
+
+    # Restored after retry_interval, inside the dedupe window, and not treated as a repeat
+    deadline = time.monotonic() + 5
+    while not telegram.messages:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    dispatcher.close()
+    assert telegram.messages[0]["text"] == "Disk full on worker-3"
+    assert dispatcher.stats["restored"] == 1 and dispatcher.stats["suppressed"] == 0
+
+
+def test_spill_files_are_per_process_and_adopted_after_exit(telegram, tmp_path):
+    exited = subprocess.run(
+        [sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True
+    )
+    dead_pid = int(exited.stdout)
+    live_pid = os.getppid()
+    for pid, text in [(dead_pid, "left by an exited agent"), (live_pid, "still owned")]:
+        line = {"chat_id": "100", "text": text, "parse_mode": None, "ts": time.time()}
+        spill_file(tmp_path, pid).write_text(json.dumps(line) + "\n")
+
+    first = make_dispatcher(telegram, tmp_path)
+    second = make_dispatcher(telegram, tmp_path)
+    # Both see the orphaned file; the atomic claim hands it to exactly one
+    first._restore()
+    second._restore()
+    for dispatcher in (first, second):
+        dispatcher.notify("back online")
+        dispatcher.close()
+
+    delivered = "\n".join(m["text"] for m in telegram.messages)
+    assert delivered.count("left by an exited agent") == 1
+    assert "still owned" not in delivered
+    assert first.stats["restored"] + second.stats["restored"] == 1
+    # A running process's file is left for that process to resend
+    assert list(tmp_path.glob("spill*")) == [spill_file(tmp_path, live_pid)]
+
+
+def test_callers_route_through_dispatcher(telegram, tmp_path, monkeypatch):
+    from agents import anomaly_detector, phase_5700_5900_capital_governor
+    from analytics import telegram_notifier
+
+    telegram.delay = 0.5
+    dispatcher = make_dispatcher(telegram, tmp_path)
+    monkeypatch.setattr(nd, "_dispatcher", dispatcher)
+    monkeypatch.setenv("TELEGRAM_CHAT_ID", "100")
+    monkeypatch.setattr(telegram_notifier, "TELEGRAM_BOT_TOKEN", "TOKEN")
+    monkeypatch.setattr(telegram_notifier, "TELEGRAM_CHAT_ID", "100")
+    monkeypatch.setattr(anomaly_detector, "TELEGRAM_BOT_TOKEN", "TOKEN")
+    monkeypatch.setattr(anomaly_detector, "TELEGRAM_CHAT_ID", "100")
+
+    start = time.perf_counter()
+    assert telegram_notifier.send_alert("*Stale data*")
+    anomaly_detector.send_telegram("*Anomaly* in agent X")
+    phase_5700_5900_capital_governor.send_telegram("Reallocated capital")
+    assert time.perf_counter() - start < 0.05
+
+    dispatcher.flush()
+    dispatcher.close()
+    texts = {(m.get("parse_mode"), m["text"]) for m in telegram.messages}
+    assert texts == {
+        ("Markdown", "🔔 2 alerts\n\n*Stale data*\n\n*Anomaly* in agent X"),
+        (None, "Reallocated capital"),
+    }
+
+    monkeypatch.setattr(telegram_notifier, "TELEGRAM_CHAT_ID", None)
+    assert not telegram_notifier.send_alert("unconfigured")
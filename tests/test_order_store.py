@@ -0,0 +1,117 @@
+"""
+Tests for the journaled order store and CoreTradingEngine persistence.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+import phases.phase_51_90_core_trading as core_trading  # noqa: E402
+from phases.phase_51_90_core_trading import CoreTradingEngine, Order  # noqa: E402
+from utils.order_store import OrderStore  # noqa: E402
+
+
+@pytest.fixture
+def runtime(tmp_path, monkeypatch):
+    monkeypatch.setattr(core_trading, "RUNTIME", tmp_path)
+    monkeypatch.setattr(core_trading, "ORDERS_FILE", tmp_path / "orders.json")
+    monkeypatch.setattr(core_trading, "POSITIONS_FILE", tmp_path / "positions.json")
+    monkeypatch.setattr(core_trading, "ORDER_STORE_DIR", tmp_path / "order_store")
+    return tmp_path
+
+
+def make_store(directory: Path, **kwargs) -> OrderStore:
+    return OrderStore(directory, factory=Order.from_dict, **kwargs)
+
+
+class TestOrderStore:
+    def test_indexes_follow_status_changes(self, tmp_path):
+        store = make_store(tmp_path)
+        orders = [Order(f"O{i}", "SPY" if i % 2 else "QQQ", "buy", 1.0) for i in range(6)]
+        for order in orders:
+            store.put(order)
+        orders[1].status = "cancelled"
+        store.put(orders[1])
+
+        assert store.ids_by_status("pending") == ["O0", "O2", "O3", "O4", "O5"]
+        assert store.ids_by_status("cancelled") == ["O1"]
+        assert store.ids_by_symbol("SPY") == ["O1", "O3", "O5"]
+        assert store.ids_between(orders[2].created_at, None)[0] == "O2"
+        assert store.count("pending") == 5
+
+    def test_recovery_replays_journal_tail(self, tmp_path):
+        store = make_store(tmp_path, min_compact_events=4, compact_ratio=0.0)
+        for i in range(6):
+            store.put(Order(f"O{i}", "SPY", "buy", 1.0))
+        order = store.get("O5")
+        order.status = "filled"
+        store.put(order)
+        store.set_position("SPY", {"quantity": 1.0, "avg_price": 10.0, "total_cost": 10.0})
+        store.close()
+
+        # 8 events with compaction every 4: the snapshot holds all of them
+        snapshot = json.loads((tmp_path / OrderStore.SNAPSHOT_NAME).read_text())
+        assert snapshot["seq"] == 8
+        recovered = make_store(tmp_path)
+        assert len(recovered) == 6
+        assert recovered.get("O5").status == "filled"
+        assert recovered.positions["SPY"]["quantity"] == 1.0
+        assert recovered.ids_by_status("pending") == ["O0", "O1", "O2", "O3", "O4"]
+
+    def test_stale_journal_after_interrupted_compaction(self, tmp_path):
+        store = make_store(tmp_path)
+        store.put(Order("O1", "SPY", "buy", 1.0))
+        store.flush()
+        journal = (tmp_path / OrderStore.JOURNAL_NAME).read_text()
+        store.compact()
+        store.close()
+        # Simulate a crash between the snapshot rename and journal truncation
+        (tmp_path / OrderStore.JOURNAL_NAME).write_text(journal + '{"seq": 2, "type": "ord')
+
+        recovered = make_store(tmp_path)
+        assert len(recovered) == 1
+        assert recovered.get("O1").status == "pending"
+
+
+class TestCoreTradingEngine:
+    def test_order_lifecycle_survives_restart(self, runtime):
+        engine = CoreTradingEngine()
+        buy = engine.create_order("SPY", "buy", 10)
+        cancel = engine.create_order("QQQ", "buy", 5, "limit", 400.0)
+        engine.fill_order(buy, 450.0)
+        engine.cancel_order(cancel)
+        engine.save_state()
+
+        restarted = CoreTradingEngine()
+        assert restarted.get_position("SPY")["quantity"] == 10
+        assert [o["order_id"] for o in restarted.get_orders(status="filled")] == [buy]
+        assert [o["order_id"] for o in restarted.get_orders(status="cancelled")] == [cancel]
+        assert restarted.get_orders(status="filled", symbol="QQQ") == []
+        assert restarted.order_counter == 2
+        positions = json.loads((runtime / "positions.json").read_text())
+        assert positions["positions"]["SPY"]["avg_price"] == 450.0
+
+    def test_legacy_orders_file_is_migrated(self, runtime):
+        legacy = Order("ORD_000001_1", "SPY", "buy", 3.0)
+        (runtime / "orders.json").write_text(json.dumps({"orders": [legacy.to_dict()]}))
+
+        engine = CoreTradingEngine()
+        assert engine.get_orders(status="pending")[0]["order_id"] == "ORD_000001_1"
+        assert not (runtime / "orders.json").exists()
+        assert len(CoreTradingEngine().orders) == 1
+
+    def test_positions_imported_without_legacy_orders(self, runtime):
+        position = {"quantity": 4.0, "avg_price": 180.0, "total_cost": 720.0}
+        (runtime / "positions.json").write_text(json.dumps({"positions": {"AAPL": position}}))
+
+        engine = CoreTradingEngine()
+        assert engine.get_position("AAPL") == position
+        engine.save_state()
+        saved = json.loads((runtime / "positions.json").read_text())
+        assert saved["positions"] == {"AAPL": position}
+        assert CoreTradingEngine().get_position("AAPL") == position
@@ -0,0 +1,111 @@
+"""
+Tests for batched paper-trading realism simulation.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from analytics.paper_trading_realism import PaperTradingRealism  # noqa: E402
+
+DEFAULTS = {
+    "slippage_enabled": True,
+    "slippage_model": "adaptive",
+    "base_slippage_bps": 5,
+    "latency_enabled": True,
+    "latency_ms": 50,
+    "latency_jitter_ms": 20,
+    "fill_simulation_enabled": True,
+    "fill_probability": 0.95,
+    "partial_fill_enabled": True,
+    "partial_fill_probability": 0.1,
+    "market_impact_enabled": True,
+    "spread_simulation_enabled": True,
+    "base_spread_bps": 2,
+}
+
+
+@pytest.fixture
+def realism():
+    simulator = PaperTradingRealism()
+    simulator.config.update(DEFAULTS)
+    return simulator
+
+
+def orders(n, seed=0):
+    rng = np.random.default_rng(seed)
+    symbols = rng.choice(["AAPL", "MSFT", "BTC-USD"], n)
+    sides = rng.choice(["buy", "sell"], n)
+    return symbols, sides, rng.uniform(1, 50, n), rng.uniform(20, 500, n)
+
+
+def test_batch_is_seeded_and_consistent(realism):
+    symbols, sides, quantities, prices = orders(10_000)
+    first = realism.apply_realism_batch(symbols, sides, quantities, prices, seed=7)
+    again = realism.apply_realism_batch(symbols, sides, quantities, prices, seed=7)
+    for key, values in first.items():
+        # fill_time is stamped from the wall clock when no submit times are given
+        if key != "fill_time":
+            assert np.array_equal(values, again[key]), key
+
+    executed, rejected = first["executed"], first["rejected"]
+    assert np.array_equal(executed, ~rejected)
+    assert 0.02 < rejected.mean() < 0.08
+    assert np.all(first["filled_quantity"][rejected] == 0)
+    assert np.all(first["execution_price"][rejected] == prices[rejected])
+    filled = first["filled_quantity"][executed] / quantities[executed]
+    assert np.all((filled >= 0.5) & (filled <= 1.0))
+    assert np.all((first["latency"] >= 0.01) & (first["latency"] <= 0.2))
+    assert np.all(first["bid"] < first["ask"])
+
+    # Impact and slippage always work against the order
+    buy, sell = executed & (sides == "buy"), executed & (sides == "sell")
+    assert np.all(first["slippage"][buy] >= 0)
+    assert np.all(first["slippage"][sell] <= 0)
+
+
+def test_latency_is_simulated_time(realism):
+    symbols, sides, quantities, prices = orders(100)
+    submit = 1_700_000_000.0 + np.arange(100)
+    result = realism.apply_realism_batch(
+        symbols, sides, quantities, prices, submit_times=submit, seed=1
+    )
+    assert result["fill_time"] == pytest.approx(submit + result["latency"])
+
+    realism.config.update(
+        latency_enabled=False,
+        fill_simulation_enabled=False,
+        market_impact_enabled=False,
+        spread_simulation_enabled=False,
+        slippage_model="fixed",
+        base_slippage_bps=0,
+    )
+    result = realism.apply_realism_batch(symbols, [1, -1] * 50, quantities, prices, seed=1)
+    assert np.all(result["latency"] == 0)
+    assert np.array_equal(result["filled_quantity"], quantities)
+    assert result["execution_price"] == pytest.approx(prices)
+
+
+def test_batch_matches_scalar_distribution(realism):
+    realism.config.update(fill_simulation_enabled=False)
+    n = 4000
+    symbols, sides, quantities, prices = orders(n, seed=3)
+    batch = realism.apply_realism_batch(symbols, sides, quantities, prices, seed=3)
+
+    np.random.seed(3)
+    scalar = [
+        realism.apply_realism(symbol, side, qty, price)
+        for symbol, side, qty, price in zip(symbols, sides, quantities, prices, strict=True)
+    ]
+    scalar_bps = [abs(r["slippage"]) / p * 1e4 for r, p in zip(scalar, prices, strict=True)]
+    batch_bps = np.abs(batch["slippage"]) / prices * 1e4
+    assert batch_bps.mean() == pytest.approx(np.mean(scalar_bps), rel=0.05)
+    assert batch["latency"].mean() == pytest.approx(
+        np.mean([r["latency"] for r in scalar]), rel=0.05
+    )
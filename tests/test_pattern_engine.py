@@ -0,0 +1,210 @@
+"""
+Tests for the vectorized pattern engine and its use by EnhancedSignalGenerator.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from agents.enhanced_signals import EnhancedSignalGenerator  # noqa: E402
+from analytics.pattern_engine import (  # noqa: E402
+    PatternEngine,
+    candlestick_masks,
+    chart_masks,
+)
+
+LEGACY_CANDLES = [
+    "Hammer",
+    "Doji",
+    "Bullish Engulfing",
+    "Bearish Engulfing",
+    "Three White Soldiers",
+    "Three Black Crows",
+    "Morning Star",
+    "Evening Star",
+]
+
+
+def random_ohlc(symbols=3, bars=300, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (symbols, bars)), axis=1))
+    open_ = close * np.exp(rng.normal(0, 0.01, close.shape))
+    high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 0.01, close.shape)))
+    low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 0.01, close.shape)))
+    return open_, high, low, close
+
+
+def legacy_candles(o, h, lo, c):
+    """Patterns the previous per-bar checks reported for the last of three bars."""
+    body = abs(c[2] - o[2])
+    found = []
+    if min(o[2], c[2]) - lo[2] > body * 2 and h[2] - max(o[2], c[2]) < body * 0.5:
+        found.append("Hammer")
+    if body < (h[2] - lo[2]) * 0.1:
+        found.append("Doji")
+    if c[1] < o[1] and c[2] > o[2] and o[2] < c[1] and c[2] > o[1]:
+        found.append("Bullish Engulfing")
+    elif c[1] > o[1] and c[2] < o[2] and o[2] > c[1] and c[2] < o[1]:
+        found.append("Bearish Engulfing")
+    if c[0] < c[1] < c[2] and o[1] > c[0] and o[2] > c[1]:
+        found.append("Three White Soldiers")
+    if c[0] > c[1] > c[2] and o[1] < c[0] and o[2] < c[1]:
+        found.append("Three Black Crows")
+    if c[0] < o[0] and c[1] < c[0] and c[2] > (o[0] + c[0]) / 2:
+        found.append("Morning Star")
+    if c[0] > o[0] and c[1] > c[0] and c[2] < (o[0] + c[0]) / 2:
+        found.append("Evening Star")
+    return found
+
+
+def legacy_chart(recent):
+    """Double tops/bottoms, flags, trend and levels as the previous loops found them."""
+    n = len(recent)
+    first, second = np.mean(recent[: n // 2]), np.mean(recent[n // 2 :])
+    trend = 1 if second > first * 1.02 else -1 if second < first * 0.98 else 0
+    peaks = [i for i in range(1, n - 1) if recent[i - 1] < recent[i] > recent[i + 1]]
+    troughs = [i for i in range(1, n - 1) if recent[i - 1] > recent[i] < recent[i + 1]]
+    found = set()
+    if len(peaks) >= 2 and abs(recent[peaks[-2]] - recent[peaks[-1]]) / recent[peaks[-2]] < 0.02:
+        found.add("Double Top")
+    if (
+        len(troughs) >= 2
+        and abs(recent[troughs[-2]] - recent[troughs[-1]]) / recent[troughs[-2]] < 0.02
+    ):
+        found.add("Double Bottom")
+    if np.ptp(recent[:5]) > np.ptp(recent[-5:]) * 2 and trend:
+        found.add("Bull Flag" if trend == 1 else "Bear Flag")
+    return found, trend, recent.min(), recent.max()
+
+
+def test_candlestick_masks_match_per_bar_checks():
+    o, h, lo, c = random_ohlc()
+    masks = candlestick_masks(o, h, lo, c)
+    seen = set()
+    for row in range(c.shape[0]):
+        for t in range(2, c.shape[1]):
+            bars = slice(t - 2, t + 1)
+            expected = legacy_candles(o[row, bars], h[row, bars], lo[row, bars], c[row, bars])
+            assert [n for n in LEGACY_CANDLES if masks[n][row, t]] == expected
+            seen.update(expected)
+    assert seen == set(LEGACY_CANDLES)
+    assert masks["Bullish Harami"].any() and masks["Bearish Harami"].any()
+
+    # Harami: a small body inside the previous, opposite candle
+    harami = candlestick_masks([1, 10, 8.5], [1, 10.2, 9.7], [1, 7.8, 8.4], [1, 8, 9.5])
+    assert harami["Bullish Harami"][0, 2] and not harami["Bullish Engulfing"][0, 2]
+    # Estimated OHLC never reports stars
+    assert not candlestick_masks(o, h, lo, c, has_ohlc=False)["Morning Star"].any()
+
+
+def test_chart_masks_match_window_scan():
+    _, _, _, close = random_ohlc(symbols=4, bars=260, seed=1)
+    masks = chart_masks(close)
+    counts = dict.fromkeys(["Double Top", "Double Bottom", "Bull Flag", "Bear Flag"], 0)
+    for row in range(close.shape[0]):
+        assert not masks["Double Top"][row, :49].any()
+        for t in range(49, close.shape[1]):
+            found, trend, support, resistance = legacy_chart(close[row, t - 49 : t + 1])
+            assert {n for n in counts if masks[n][row, t]} == found
+            assert masks["trend"][row, t] == trend
+            assert (masks["support"][row, t], masks["resistance"][row, t]) == (support, resistance)
+            for name in found:
+                counts[name] += 1
+    assert all(counts.values()), counts
+
+
+def test_swing_patterns_and_generator_signals():
+    def path(*points, bars=10):
+        return np.concatenate([np.linspace(a, b, bars, endpoint=False) for a, b in points])
+
+    # Shoulders at 110 and 110.5 around a 115 head; the neckline rises 100 -> 104
+    head_and_shoulders = np.concatenate(
+        [
+            path((100, 102), (102, 110), (110, 100), (100, 115), (115, 104)),
+            path((104, 110.5), (110.5, 103), bars=5),
+        ]
+    )
+    masks = chart_masks(head_and_shoulders)
+    assert masks["Head and Shoulders"][0, -1]
+    assert chart_masks(200 - head_and_shoulders)["Inverse Head and Shoulders"][0, -1]
+
+    frame = pd.DataFrame({"Close": head_and_shoulders})
+    chart = EnhancedSignalGenerator(frame).detect_chart_patterns()
+    assert chart["pattern"] == "Head and Shoulders" and chart["signal"] == "SELL"
+
+    # Swings that narrow towards a flat top: ascending triangle (bullish)
+    bars = np.arange(60)
+    amplitude = np.linspace(8, 1, 60)
+    ascending = 110 - amplitude + amplitude * np.sin(bars * np.pi / 4)
+    chart = EnhancedSignalGenerator(pd.DataFrame({"Close": ascending})).detect_chart_patterns()
+    assert "Ascending Triangle" in chart["patterns"] and chart["signal"] == "BUY"
+    symmetric = 100 + amplitude * np.sin(bars * np.pi / 4)
+    assert chart_masks(symmetric)["Symmetrical Triangle"][0, -1]
+    assert chart_masks(200 - ascending)["Descending Triangle"][0, -1]
+
+
+def test_engine_evaluates_only_new_bars():
+    o, h, lo, c = random_ohlc(symbols=5, bars=400, seed=2)
+    symbols = [f"SYM{i}" for i in range(5)]
+    full = PatternEngine().scan(o, h, lo, c, symbols)
+
+    engine = PatternEngine()
+    engine.scan(o[:, :300], h[:, :300], lo[:, :300], c[:, :300], symbols)
+    for end in (301, 302, 350, 400):
+        result = engine.scan(o[:, :end], h[:, :end], lo[:, :end], c[:, :end], symbols)
+    for name, values in full.items():
+        np.testing.assert_array_equal(result[name], values, err_msg=name)
+    # 300 bars, then each later scan: new bars plus 49 bars of context
+    assert engine.bars_evaluated == 5 * (300 + 4 * 49 + 100)
+    assert engine.scan(o, h, lo, c, symbols) is result
+
+    # Rewritten history or a different universe falls back to a full scan
+    before = engine.bars_evaluated
+    engine.scan(o, h, lo, c * 1.01, symbols)
+    engine.scan(o, h, lo, c * 1.01, symbols[::-1])
+    assert engine.bars_evaluated == before + 2 * c.size
+
+    frames = {
+        s: pd.DataFrame({"Open": o[i], "High": h[i], "Low": lo[i], "Close": c[i]})[i * 20 :]
+        for i, s in enumerate(symbols)
+    }
+    latest = PatternEngine().scan_frames(frames)
+    for symbol in symbols:
+        generator = EnhancedSignalGenerator(frames[symbol])
+        assert latest[symbol]["candlestick"] == generator.detect_candlestick_patterns()
+        assert latest[symbol]["chart"] == generator.detect_chart_patterns()
+
+
+def test_vectorized_indicators_match_loops():
+    prices = random_ohlc(symbols=1, bars=120, seed=3)[3][0]
+    gen = EnhancedSignalGenerator(pd.DataFrame({"Close": prices}))
+
+    rsi = np.full(len(prices), 50.0)
+    deltas = np.diff(prices)
+    for i in range(14, len(prices)):
+        window = deltas[i - 14 : i]
+        gains, losses = window[window > 0], -window[window < 0]
+        avg_gain = gains.mean() if len(gains) else 0
+        avg_loss = losses.mean() if len(losses) else 0
+        rsi[i] = 100.0 if avg_loss == 0 else 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    np.testing.assert_allclose(gen._calculate_rsi_manual(prices, 14), rsi)
+    assert gen._calculate_rsi_manual(np.arange(30.0), 14)[-1] == 100.0
+
+    sma = np.zeros(len(prices))
+    upper, lower = np.zeros(len(prices)), np.zeros(len(prices))
+    for i in range(19, len(prices)):
+        sma[i] = prices[i - 19 : i + 1].mean()
+        std = prices[i - 19 : i + 1].std()
+        upper[i], lower[i] = sma[i] + 2 * std, sma[i] - 2 * std
+    np.testing.assert_allclose(gen._calculate_sma_manual(prices, 20), sma)
+    np.testing.assert_allclose(gen._calculate_bollinger_manual(prices, 20, 2), (upper, sma, lower))
+
+    momentum = np.zeros(len(prices))
+    momentum[10:] = [(prices[i] - prices[i - 10]) / prices[i - 10] for i in range(10, len(prices))]
+    assert gen._calculate_momentum(prices, 10) == pytest.approx(momentum)
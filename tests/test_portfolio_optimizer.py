@@ -0,0 +1,198 @@
+"""
+Tests for the constrained portfolio optimizer.
+Checks the ADMM mean-variance QP and the Rockafellar-Uryasev CVaR LP against
+reference solutions, and constraint handling through PortfolioOptimizer.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("scipy")
+
+from scipy.optimize import minimize  # noqa: E402
+
+import analytics.portfolio_optimizer as optimizer_module  # noqa: E402
+from analytics.portfolio_optimizer import PortfolioOptimizer  # noqa: E402
+from analytics.portfolio_solvers import (  # noqa: E402
+    PortfolioConstraints,
+    max_sharpe_weights,
+    mean_cvar_weights,
+    mean_variance_weights,
+    scenario_cvar,
+)
+
+
+def make_returns(num_assets: int, num_days: int = 500, seed: int = 0) -> np.ndarray:
+    """Daily returns with a market factor, sector factors and fat tails."""
+    rng = np.random.default_rng(seed)
+    factors = rng.standard_t(4, (num_days, 4)) * 0.008
+    loadings = np.column_stack(
+        [rng.normal(1, 0.3, num_assets), rng.normal(0, 0.5, (num_assets, 3))]
+    )
+    idio = rng.standard_t(4, (num_days, num_assets)) * 0.012
+    return factors @ loadings.T + idio + rng.normal(0.0004, 0.0003, num_assets)
+
+
+def slsqp(objective, n, upper, extra=()):
+    constraints = [{"type": "eq", "fun": lambda w: w.sum() - 1}, *extra]
+    result = minimize(
+        objective,
+        np.full(n, 1 / n),
+        method="SLSQP",
+        bounds=[(0, upper)] * n,
+        constraints=constraints,
+        options={"ftol": 1e-15, "maxiter": 2000},
+    )
+    return result.x
+
+
+@pytest.fixture
+def problem():
+    returns = make_returns(12, seed=1)
+    return returns, np.cov(returns.T) * 252, returns.mean(axis=0) * 252
+
+
+class TestMeanVarianceQP:
+    def test_min_variance_matches_slsqp(self, problem):
+        _, cov, _ = problem
+        constraints = PortfolioConstraints(upper=0.25, groups={"g": ([0, 1, 2, 3], 0.2)})
+        result = mean_variance_weights(cov, constraints=constraints)
+        weights = result.x[:12]
+
+        group = {"type": "ineq", "fun": lambda w: 0.2 - w[:4].sum()}
+        expected = slsqp(lambda w: w @ cov @ w, 12, 0.25, [group])
+        assert result.converged
+        assert weights @ cov @ weights == pytest.approx(expected @ cov @ expected, rel=1e-6)
+        assert weights[:4].sum() <= 0.2 + 1e-6
+        assert weights.max() <= 0.25 + 1e-6
+
+    def test_max_sharpe_matches_slsqp(self, problem):
+        _, cov, mean = problem
+        result = max_sharpe_weights(cov, mean, 0.02, PortfolioConstraints(upper=0.3))
+        weights = result.x[:12] / result.x[-1]
+
+        def neg_sharpe(w):
+            return -(w @ mean - 0.02) / np.sqrt(w @ cov @ w)
+
+        expected = slsqp(neg_sharpe, 12, 0.3)
+        assert result.converged
+        assert neg_sharpe(weights) == pytest.approx(neg_sharpe(expected), rel=1e-6)
+        assert weights.sum() == pytest.approx(1.0)
+        assert weights.max() <= 0.3 + 1e-6
+
+    def test_turnover_limit(self, problem):
+        _, cov, mean = problem
+        previous = np.full(12, 1 / 12)
+        constraints = PortfolioConstraints(previous_weights=previous, max_turnover=0.1)
+        for result, weights in (
+            (r := mean_variance_weights(cov, constraints=constraints), r.x[:12]),
+            (s := max_sharpe_weights(cov, mean, 0.02, constraints), s.x[:12] / s.x[-1]),
+        ):
+            assert result.converged
+            assert np.abs(weights - previous).sum() <= 0.1 + 1e-6
+
+    def test_warm_start_reduces_iterations(self, problem):
+        _, cov, _ = problem
+        constraints = PortfolioConstraints(upper=0.25)
+        cold = mean_variance_weights(cov, constraints=constraints)
+        warm = mean_variance_weights(cov * 1.01, constraints=constraints, warm_start=cold)
+        assert warm.converged
+        assert warm.iterations < cold.iterations
+
+
+class TestMeanCVaRLP:
+    @pytest.mark.parametrize("method", ["lp", "active"])
+    def test_objective_is_portfolio_cvar(self, method):
+        returns = make_returns(20, seed=2)
+        weights, cvar = mean_cvar_weights(
+            returns, 0.95, constraints=PortfolioConstraints(upper=0.2), method=method
+        )
+        assert weights.sum() == pytest.approx(1.0)
+        assert weights.max() <= 0.2 + 1e-9
+        assert cvar == pytest.approx(scenario_cvar(returns @ weights, 0.95), rel=1e-8)
+        assert cvar <= scenario_cvar(returns @ np.full(20, 1 / 20), 0.95)
+
+    def test_active_set_matches_full_lp(self):
+        returns = make_returns(30, seed=3)
+        target = float(np.median(returns.mean(axis=0)))
+        constraints = PortfolioConstraints(
+            upper=0.15,
+            groups={"g": ([0, 1, 2, 3, 4], 0.1)},
+            previous_weights=np.full(30, 1 / 30),
+            max_turnover=0.5,
+        )
+        _, full = mean_cvar_weights(returns, 0.95, target, constraints, method="lp")
+        weights, active = mean_cvar_weights(returns, 0.95, target, constraints, method="active")
+        assert active == pytest.approx(full, rel=1e-8)
+        assert returns.mean(axis=0) @ weights >= target - 1e-10
+        assert weights[:5].sum() <= 0.1 + 1e-9
+
+    @pytest.mark.slow
+    def test_large_problem_solves_quickly(self):
+        returns = make_returns(500, num_days=5000, seed=4)
+        start = time.perf_counter()
+        weights, _ = mean_cvar_weights(returns, 0.95, constraints=PortfolioConstraints(upper=0.05))
+        assert time.perf_counter() - start < 10.0
+        assert weights.sum() == pytest.approx(1.0)
+
+
+class TestPortfolioOptimizer:
+    @pytest.fixture
+    def prices(self):
+        returns = make_returns(8, num_days=300, seed=5)
+        columns = [f"S{i}" for i in range(8)]
+        return pd.DataFrame(100 * np.cumprod(1 + returns, axis=0), columns=columns)
+
+    @pytest.fixture(autouse=True)
+    def isolated_state(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(optimizer_module, "STATE", tmp_path)
+        monkeypatch.setattr(optimizer_module, "RUNTIME", tmp_path)
+        optimizer_module._WARM_STARTS.clear()
+
+    def test_methods_respect_weight_cap(self, prices):
+        constraints = PortfolioConstraints.from_symbols(list(prices.columns), upper=0.2)
+        optimizer = PortfolioOptimizer(prices, constraints=constraints)
+        for weights in (
+            optimizer.optimize_efficient_frontier(),
+            optimizer.minimum_variance_weights(),
+            optimizer.optimize_mean_cvar(),
+        ):
+            assert set(weights) == set(prices.columns)
+            assert sum(weights.values()) == pytest.approx(1.0)
+            assert max(weights.values()) <= 0.2 + 1e-6
+            assert min(weights.values()) >= 0
+
+    def test_mean_returns_use_price_changes(self, prices):
+        optimizer = PortfolioOptimizer(prices)
+        expected = prices.pct_change().dropna().mean() * 252
+        pd.testing.assert_series_equal(optimizer.mean_returns, expected)
+
+    def test_group_constraint_by_symbol(self, prices):
+        constraints = PortfolioConstraints.from_symbols(
+            list(prices.columns), groups={"tech": (["S0", "S1", "S2"], 0.1)}
+        )
+        weights = PortfolioOptimizer(prices, constraints=constraints).minimum_variance_weights()
+        assert weights["S0"] + weights["S1"] + weights["S2"] <= 0.1 + 1e-6
+
+    def test_previous_allocations_anchor_turnover(self, prices):
+        optimizer = PortfolioOptimizer(prices)
+        first = optimizer.minimum_variance_weights()
+        optimizer.save_allocations_to_state(first, method="min_variance")
+
+        previous = optimizer_module.load_previous_weights()
+        assert previous == pytest.approx(first)
+        constraints = PortfolioConstraints.from_symbols(
+            list(prices.columns), previous_weights=previous, max_turnover=0.05
+        )
+        shifted = prices.iloc[::-1].reset_index(drop=True)
+        second = PortfolioOptimizer(shifted, constraints=constraints).minimum_variance_weights()
+        turnover = sum(abs(second[s] - first[s]) for s in prices.columns)
+        assert turnover <= 0.05 + 1e-6
@@ -0,0 +1,153 @@
+"""
+Tests for the indexed RCA incident knowledge base.
+"""
+
+import json
+import random
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from agents import rca_engine  # noqa: E402
+from agents.rca_engine import IncidentIndex, RCAEngine, trace_fingerprint  # noqa: E402
+
+EXCEPTIONS = ["ConnectionError", "KeyError", "ValueError", "TimeoutError", "ModuleNotFoundError"]
+FUNCTIONS = ["fetch_quotes", "place_order", "load_state", "rebalance", "score_model", "sync"]
+
+
+def trace(kind: int, variant: int = 0) -> str:
+    """A stack trace of failure `kind`; variants differ only in volatile details."""
+    rng = random.Random(kind)
+    frames = rng.sample(FUNCTIONS, 3)
+    lines = ["Traceback (most recent call last):"]
+    for depth, func in enumerate(frames):
+        lines.append(
+            f'  File "/srv/{variant}/agents/mod{kind}_{depth}.py", line {10 + variant}, in {func}'
+        )
+        lines.append(f"    result = {func}(payload, retries={variant})")
+    lines.append(
+        f"{EXCEPTIONS[kind % len(EXCEPTIONS)]}: kind {kind} failed at 0x{variant:08x} "
+        f"after {variant * 3} ms"
+    )
+    return "\n".join(lines)
+
+
+def legacy_pattern_cause(error_log: str) -> str:
+    """The previous if/elif chain."""
+    checks = [
+        (r"ImportError|ModuleNotFoundError", 0, "missing_dependency"),
+        (r"ConnectionError|Connection refused", 0, "network_issue"),
+        (r"MemoryError|Out of memory", 0, "resource_exhaustion"),
+        (r"FileNotFoundError", 0, "missing_file"),
+        (r"TimeoutError|timeout", re.IGNORECASE, "timeout"),
+        (r"localhost|127\.0\.0\.1", 0, "localhost_dependency"),
+    ]
+    for pattern, flags, cause in checks:
+        if re.search(pattern, error_log, flags):
+            return cause
+    return "unknown"
+
+
+@pytest.fixture
+def engine(monkeypatch, tmp_path):
+    monkeypatch.setattr(rca_engine, "RCA_KNOWLEDGE_BASE_FILE", tmp_path / "kb.json")
+    monkeypatch.setattr(rca_engine, "RCA_INCIDENTS_FILE", tmp_path / "incidents.jsonl")
+    monkeypatch.setattr(rca_engine, "RCA_REPORTS_FILE", tmp_path / "reports.json")
+    monkeypatch.setattr(rca_engine, "ANTHROPIC_API_KEY", "")
+    monkeypatch.setattr(rca_engine, "OPENAI_API_KEY", "")
+    return RCAEngine
+
+
+def test_fingerprint_ignores_volatile_details():
+    assert trace_fingerprint(trace(1, 0)) == trace_fingerprint(trace(1, 7))
+    assert trace_fingerprint(trace(1)) != trace_fingerprint(trace(2))
+
+
+def test_query_finds_exact_and_near_duplicates_per_agent():
+    index = IncidentIndex()
+    for kind in range(200):
+        index.add({"agent": f"agent_{kind % 2}", "root_cause": f"cause_{kind}"}, trace(kind))
+
+    exact = index.query("agent_0", trace(42, variant=5))
+    assert exact[0] == (1.0, index.incidents[42])
+
+    # Same failure with an extra line of context: a near duplicate
+    similarity, incident = index.query("agent_0", trace(42) + "\nwhile handling shutdown")[0]
+    assert incident["root_cause"] == "cause_42"
+    assert rca_engine.SIMILARITY_THRESHOLD <= similarity < 1.0
+
+    # Other agents' incidents are not returned; keyword-only matches rank last
+    assert all(i["agent"] == "agent_1" for _, i in index.query("agent_1", trace(42)))
+    assert index.query("agent_0", "KeyError: 'x'")[0][0] == 0.0
+
+
+def test_store_is_append_only_and_compacts(tmp_path):
+    path = tmp_path / "incidents.jsonl"
+    index = IncidentIndex(path, max_incidents=100)
+    for kind in range(100):
+        index.add({"agent": "a", "root_cause": f"cause_{kind}"}, trace(kind))
+    assert len(path.read_text().splitlines()) == 100
+
+    reloaded = IncidentIndex(path, max_incidents=100)
+    assert reloaded.query("a", trace(7, 3)) == index.query("a", trace(7, 3))
+
+    for kind in range(100, 111):  # past 10% slack: keep the newest 100
+        index.add({"agent": "a", "root_cause": f"cause_{kind}"}, trace(kind))
+    assert len(index) == 100 and len(path.read_text().splitlines()) == 100
+    assert index.query("a", trace(3))[0][0] < 1.0  # compacted away
+    assert index.query("a", trace(110))[0] == (1.0, index.incidents[-1])
+    assert IncidentIndex(path).query("a", trace(110)) == index.query("a", trace(110))
+
+
+def test_engine_migrates_and_reuses_recorded_incidents(engine):
+    legacy = {
+        "incidents": [
+            {
+                "agent": "a",
+                "root_cause": "network_issue",
+                "solution": "retry",
+                "success": True,
+                "error_keywords": ["ConnectionError"],
+            }
+        ],
+        "patterns": {"network_issue": {"count": 1, "successful_solutions": ["retry"]}},
+    }
+    rca_engine.RCA_KNOWLEDGE_BASE_FILE.write_text(json.dumps(legacy))
+    rca = engine()
+    assert "incidents" not in json.loads(rca_engine.RCA_KNOWLEDGE_BASE_FILE.read_text())
+    assert rca.analyze_failure("a", "ConnectionError: reset")["solution"] == "retry"
+
+    analysis = rca.analyze_failure("b", trace(3))
+    assert analysis["source"] == "pattern_analysis"
+    rca.record_incident("b", "bad_payload", "validate input", True, trace(3))
+    analysis = engine().analyze_failure("b", trace(3, variant=9))
+    assert analysis["source"] == "knowledge_base"
+    assert analysis["solution"] == "validate input"
+
+
+def test_pattern_analysis_matches_sequential_checks(engine):
+    rca = engine()
+    fragments = [
+        "ImportError",
+        "ModuleNotFoundError: x",
+        "ConnectionError",
+        "Connection refused",
+        "MemoryError",
+        "Out of memory",
+        "FileNotFoundError",
+        "TimeoutError",
+        "read TIMEOUT",
+        "http://localhost:8100",
+        "127.0.0.1",
+        "ValueError",
+        "all good",
+    ]
+    rng = random.Random(0)
+    for _ in range(300):
+        log = " | ".join(rng.sample(fragments, rng.randint(1, 4)))
+        assert rca._pattern_analyze("a", log)["root_cause"] == legacy_pattern_cause(log)
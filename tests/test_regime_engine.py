@@ -0,0 +1,182 @@
+"""
+Tests for the Gaussian HMM regime engine and its use by regime_detector.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from agents import regime_detector  # noqa: E402
+from analytics.regime_engine import (  # noqa: E402
+    HMMParams,
+    RegimeEngine,
+    filter_history,
+    fit_hmm,
+    log_returns,
+)
+
+# BEAR, SIDEWAYS, BULL, HIGH_VOL
+TRUE_MEANS = np.array([-0.003, 0.0, 0.003, 0.0])
+TRUE_STDS = np.array([0.008, 0.004, 0.008, 0.03])
+TRUE_TRANSMAT = np.array(
+    [
+        [0.97, 0.01, 0.01, 0.01],
+        [0.01, 0.97, 0.01, 0.01],
+        [0.01, 0.01, 0.97, 0.01],
+        [0.02, 0.02, 0.02, 0.94],
+    ]
+)
+
+
+def simulate(symbols=20, bars=800, seed=0):
+    """Prices driven by the 4-state chain above, and the true states per return."""
+    rng = np.random.default_rng(seed)
+    states = np.zeros((symbols, bars - 1), dtype=int)
+    states[:, 0] = rng.integers(0, 4, symbols)
+    cumulative = TRUE_TRANSMAT.cumsum(axis=1)
+    draws = rng.random(states.shape)
+    for t in range(1, bars - 1):
+        states[:, t] = (draws[:, t, None] > cumulative[states[:, t - 1]]).sum(axis=1)
+    returns = TRUE_MEANS[states] + TRUE_STDS[states] * rng.standard_normal(states.shape)
+    prices = 100 * np.exp(np.concatenate([np.zeros((symbols, 1)), returns.cumsum(axis=1)], 1))
+    return prices, states
+
+
+def test_fit_recovers_regimes_in_canonical_order():
+    prices, states = simulate()
+    symbols = [f"SYM{i}" for i in range(len(prices))]
+    params, loglik = fit_hmm(log_returns(prices), symbols)
+
+    assert params.labels == ("BEAR", "SIDEWAYS", "BULL", "HIGH_VOL")
+    np.testing.assert_allclose(np.median(params.means, axis=0), TRUE_MEANS, atol=1.5e-3)
+    np.testing.assert_allclose(np.median(np.sqrt(params.variances), axis=0), TRUE_STDS, rtol=0.2)
+    np.testing.assert_allclose(params.transmat.sum(axis=2), 1.0)
+    assert np.all(np.isfinite(loglik))
+
+    posteriors = filter_history(params, log_returns(prices))
+    assert posteriors.shape == (20, 799, 4)
+    np.testing.assert_allclose(posteriors.sum(axis=2), 1.0)
+    assert (posteriors.argmax(axis=2) == states).mean() > 0.7
+
+    # Fewer states order by mean return
+    two, _ = fit_hmm(log_returns(prices[:3]), symbols[:3], n_states=2, n_iter=10)
+    assert two.labels == ("BEAR", "BULL") and np.all(np.diff(two.means, axis=1) > 0)
+    with pytest.raises(ValueError):
+        fit_hmm(log_returns(prices), symbols, n_states=5)
+
+
+def test_online_updates_match_batch_filter():
+    prices, _ = simulate(symbols=8, bars=500, seed=1)
+    symbols = [f"SYM{i}" for i in range(8)]
+    engine = RegimeEngine()
+    engine.sync(prices[:, :400], symbols)
+    for t in range(400, 500):
+        engine.update(prices[:, t])
+    expected = filter_history(engine.params, log_returns(prices))[:, -1]
+    np.testing.assert_allclose(engine.posterior, expected, atol=1e-12)
+
+    # A missing price only propagates the chain; the next return spans the gap
+    gapped = prices.copy()
+    gapped[2, 497] = np.nan
+    engine.sync(gapped[:, :400], symbols)
+    for t in range(400, 500):
+        engine.update(gapped[:, t])
+    returns = log_returns(gapped)
+    returns[2, 497] = np.log(gapped[2, 498] / gapped[2, 496])
+    expected = filter_history(engine.params, returns)[:, -1]
+    np.testing.assert_allclose(engine.posterior, expected, atol=1e-12)
+    ungapped = filter_history(engine.params, log_returns(prices))[:, -1]
+    assert not np.allclose(engine.posterior[2], ungapped[2], atol=1e-6)
+    np.testing.assert_allclose(np.delete(engine.posterior, 2, 0), np.delete(ungapped, 2, 0))
+
+
+def test_sync_feeds_only_new_bars_and_refilters_rewrites():
+    prices, _ = simulate(symbols=5, bars=600, seed=2)
+    symbols = [f"SYM{i}" for i in range(5)]
+    engine = RegimeEngine()
+    assert RegimeEngine().sync(prices[:, :100], symbols) is None  # Too short to fit
+
+    engine.sync(prices[:, :500], symbols)
+    for end in (501, 502, 550, 600):
+        posterior = engine.sync(prices[:, :end], symbols)
+    assert engine.fits == 1 and engine.bars == 600
+    np.testing.assert_allclose(
+        posterior, filter_history(engine.params, log_returns(prices))[:, -1], atol=1e-12
+    )
+
+    # Rewritten history is filtered again from the start with the same params
+    revised = prices * 1.01
+    revised[:, -1] *= 1.05
+    posterior = engine.sync(revised, symbols)
+    assert engine.fits == 1
+    np.testing.assert_allclose(
+        posterior, filter_history(engine.params, log_returns(revised))[:, -1], atol=1e-12
+    )
+
+    # Late listings: leading NaNs carry no information
+    late = prices.copy()
+    late[1, :300] = np.nan
+    posterior = RegimeEngine().sync(late, symbols)
+    assert np.all(np.isfinite(posterior)) and np.allclose(posterior.sum(axis=1), 1.0)
+
+    regimes = engine.regimes()
+    assert set(regimes) == set(symbols)
+    assert regimes["SYM0"]["regime"] in regimes["SYM0"]["probabilities"]
+    assert sum(regimes["SYM0"]["probabilities"].values()) == pytest.approx(1.0, abs=1e-5)
+
+
+def test_fitted_params_are_cached(tmp_path):
+    prices, _ = simulate(symbols=4, bars=400, seed=3)
+    symbols = [f"SYM{i}" for i in range(4)]
+    cache = tmp_path / "regime_hmm_params.npz"
+    first = RegimeEngine(cache_path=cache)
+    expected = first.sync(prices, symbols)
+    assert first.fits == 1 and cache.exists()
+
+    loaded = HMMParams.load(cache)
+    assert loaded.symbols == tuple(symbols)
+    np.testing.assert_array_equal(loaded.transmat, first.params.transmat)
+
+    restarted = RegimeEngine(cache_path=cache)
+    np.testing.assert_allclose(restarted.sync(prices, symbols), expected)
+    assert restarted.fits == 0
+
+    # Another universe or expired parameters are refitted
+    other = RegimeEngine(cache_path=cache)
+    other.sync(prices[:3], symbols[:3])
+    assert other.fits == 1
+    expired = RegimeEngine(cache_path=cache, refit_interval=0.0)
+    expired.sync(prices[:3], symbols[:3])
+    assert expired.fits == 1
+    assert HMMParams.load(tmp_path / "missing.npz") is None
+
+
+def test_regime_detector_uses_engine(monkeypatch, tmp_path):
+    monkeypatch.setattr(regime_detector, "_engines", {})
+    monkeypatch.setattr(regime_detector, "EQUITY_PARAMS_CACHE", tmp_path / "equity.npz")
+    monkeypatch.setattr(regime_detector, "PARAMS_CACHE", tmp_path / "symbols.npz")
+    monkeypatch.setattr(regime_detector, "SYMBOL_REGIME_FILE", tmp_path / "symbol_regimes.json")
+
+    prices, _ = simulate(symbols=3, bars=400, seed=4)
+    long = regime_detector.detect_regime(pd.DataFrame({"equity": prices[0] * 1000}))
+    assert long["method"] == "hmm"
+    assert long["regime"] in regime_detector.REGIMES
+    assert set(long["probabilities"]) == set(regime_detector.REGIMES)
+    assert {"volatility", "mean_return", "trend"} <= set(long)
+
+    short = regime_detector.detect_regime(pd.DataFrame({"equity": prices[0, :60]}))
+    assert short["method"] == "threshold" and "probabilities" not in short
+
+    frame = pd.DataFrame(prices.T, columns=["SPY", "QQQ", "GLD"])
+    regimes = regime_detector.detect_symbol_regimes(frame)
+    assert set(regimes) == {"SPY", "QQQ", "GLD"}
+    published = json.loads((tmp_path / "symbol_regimes.json").read_text())
+    assert published["symbols"] == regimes and published["n_states"] == 4
@@ -0,0 +1,139 @@
+"""
+Tests for the vectorized risk engine and its use by AdvancedRiskManager.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from analytics.risk_engine import (  # noqa: E402
+    RiskEngine,
+    StressScenario,
+    ewma_volatility,
+    tail_count,
+)
+
+pd = pytest.importorskip("pandas")
+
+
+@pytest.fixture
+def engine():
+    rng = np.random.default_rng(3)
+    market = rng.standard_normal(400) * 0.01
+    betas = rng.uniform(0.5, 1.5, 20)
+    returns = market[:, None] * betas + rng.standard_normal((400, 20)) * 0.005
+    exposures = rng.uniform(-1.0, 2.0, 20) * 1000
+    return RiskEngine(
+        [f"S{i}" for i in range(20)],
+        exposures,
+        returns,
+        factor_betas=betas[:, None],
+        factor_names=["market"],
+        seed=11,
+    )
+
+
+def brute_force(pnl: np.ndarray, confidence: float) -> tuple[float, float]:
+    worst = sorted(pnl)[: tail_count(len(pnl), confidence)]
+    return -worst[-1], -sum(worst) / len(worst)
+
+
+def test_historical_matches_brute_force(engine):
+    report = engine.var_cvar(["historical"], confidences=(0.9, 0.95, 0.99), horizons=(1, 10))
+    daily = engine.returns @ engine.exposures
+    for horizon in (1, 10):
+        for confidence in (0.9, 0.95, 0.99):
+            var, cvar = brute_force(daily * np.sqrt(horizon), confidence)
+            stats = report["historical"][f"{horizon}d_{round(confidence * 100)}"]
+            assert stats["var"] == pytest.approx(var)
+            assert stats["cvar"] == pytest.approx(cvar)
+
+
+def test_methods_agree_for_gaussian_like_returns(engine):
+    report = engine.var_cvar(n_sims=20_000)
+    reference = report["parametric"]["1d_99"]["var"]
+    for method in ("historical", "filtered_historical", "monte_carlo"):
+        assert report[method]["1d_99"]["var"] == pytest.approx(reference, rel=0.25)
+    assert report["monte_carlo"]["1d_99"]["cvar"] > report["monte_carlo"]["1d_99"]["var"]
+
+
+@pytest.mark.parametrize("method", ["historical", "parametric", "monte_carlo"])
+def test_components_sum_to_portfolio_var(engine, method):
+    contributions = engine.contributions(method, confidence=0.99, horizon=5)
+    total = engine.var_cvar([method], confidences=(0.99,), horizons=(5,))[method]["5d_99"]
+    assert sum(c["component_var"] for c in contributions.values()) == pytest.approx(total["var"])
+    assert sum(c["component_cvar"] for c in contributions.values()) == pytest.approx(
+        total["cvar"], rel=1e-6 if method != "parametric" else 1e-9
+    )
+    entry = next(iter(contributions.values()))
+    assert entry["marginal_var"] * entry["exposure"] == pytest.approx(entry["component_var"])
+
+
+def test_custom_pricer_revalues_every_scenario(engine):
+    linear = RiskEngine(engine.symbols, engine.exposures, engine.returns, pricer=None)
+    priced = RiskEngine(
+        engine.symbols, engine.exposures, engine.returns, pricer=lambda r: r * engine.exposures
+    )
+    expected = linear.var_cvar(["historical"])["historical"]
+    for label, stats in priced.var_cvar(["historical"])["historical"].items():
+        assert stats == pytest.approx(expected[label])
+
+    # Long straddle-like payoff gains on any large move: no loss in any scenario
+    convex = RiskEngine(engine.symbols, np.ones(20), engine.returns, pricer=lambda r: 100 * r**2)
+    assert convex.var_cvar(["historical"])["historical"]["1d_99"]["var"] <= 0
+
+
+def test_filtered_historical_tracks_current_volatility():
+    rng = np.random.default_rng(5)
+    returns = np.concatenate([rng.standard_normal(450) * 0.005, rng.standard_normal(50) * 0.03])
+    engine = RiskEngine(["A"], [1.0], returns[:, None])
+    report = engine.var_cvar(["historical", "filtered_historical"], confidences=(0.99,))
+    assert report["filtered_historical"]["1d_99"]["var"] > 2 * report["historical"]["1d_99"]["var"]
+    assert ewma_volatility(returns[:, None])[-1, 0] > 0.02
+
+
+def test_stress_scenarios_combine_factor_and_symbol_shocks(engine):
+    scenarios = [
+        StressScenario("crash", {"market": -0.2}),
+        StressScenario("single_name", {"S3": -0.5}),
+        StressScenario("both", {"market": -0.2, "S3": -0.5}),
+    ]
+    results = engine.stress(scenarios)
+    betas = engine.factor_betas[:, 0]
+    assert results["crash"] == pytest.approx(-0.2 * betas @ engine.exposures)
+    assert results["single_name"] == pytest.approx(-0.5 * engine.exposures[3])
+    assert results["both"] == pytest.approx(results["crash"] + results["single_name"])
+
+    with pytest.raises(ValueError):
+        engine.stress([StressScenario("bad", {"rates": 0.01})])
+
+
+def test_risk_manager_keeps_legacy_stress_results():
+    from phases.phase_2700_2900_risk_management import AdvancedRiskManager
+
+    rng = np.random.default_rng(9)
+    prices = pd.DataFrame(
+        100 * np.cumprod(1 + rng.standard_normal((120, 4)) * 0.01, axis=0),
+        columns=["SPY", "QQQ", "GLD", "TLT"],
+    )
+    returns = prices.pct_change().dropna()
+    manager = AdvancedRiskManager()
+    results = manager.stress_test(
+        prices,
+        returns,
+        ["market_crash", "volatility_spike", "correlation_breakdown"]
+        + [StressScenario("gold_spike", {"GLD": 0.1})],
+    )
+
+    assert results["market_crash"] == pytest.approx(-0.20)
+    assert results["volatility_spike"] == pytest.approx(-6 * np.std(returns.mean(axis=1).values))
+    assert results["correlation_breakdown"] == pytest.approx(returns.min().min())
+    assert results["gold_spike"] == pytest.approx(0.025)
+    assert manager.calculate_var(returns["SPY"].values, 0.95) == pytest.approx(
+        -np.sort(returns["SPY"].values)[int(len(returns) * 0.05)]
+    )
@@ -0,0 +1,276 @@
+"""
+Tests for the sentiment engine and market_intelligence against local stub APIs.
+"""
+
+import json
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+pytest.importorskip("requests")
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from agents import market_intelligence as mi  # noqa: E402
+from analytics.sentiment_engine import (  # noqa: E402
+    GLOBAL,
+    RateLimiter,
+    SentimentEngine,
+    SentimentSource,
+)
+
+
+def written_forms(symbol):
+    """Cashtag, pair and bare forms posts use; crypto pairs never as "BTC-USD"."""
+    base, _, quote = symbol.partition("-")
+    if not quote:
+        return symbol, symbol, symbol
+    return f"${base}", f"{base}/{quote}", base
+
+
+def tweets_for(symbol):
+    cashtag, pair, bare = written_forms(symbol)
+    return [
+        {"text": f"{cashtag} to the moon, buy"},
+        {"text": f"{pair} looks like a crash"},
+        {"text": f"Watching {bare} today"},
+    ]
+
+
+def articles_for(symbol):
+    _, pair, bare = written_forms(symbol)
+    return [
+        {"title": f"{bare} shares surge on growth", "description": ""},
+        {"title": "Futures drift", "description": f"{pair} is flat"},
+    ]
+
+
+class StubAPIServer(ThreadingHTTPServer):
+    """Reddit, Twitter, NewsAPI and FRED endpoints with a fixed delay."""
+
+    daemon_threads = True
+
+    def __init__(self, delay: float = 0.0):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.delay = delay
+        self.url = f"http://127.0.0.1:{self.server_address[1]}"
+        self.calls = Counter()
+        self.active = Counter()
+        self.peak = Counter()
+        self.lock = threading.Lock()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _track(self, source):
+        server = self.server
+        with server.lock:
+            server.calls[source] += 1
+            server.active[source] += 1
+            server.peak[source] = max(server.peak[source], server.active[source])
+        time.sleep(server.delay)
+        with server.lock:
+            server.active[source] -= 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._track("reddit_auth")
+        self._reply({"access_token": "token", "expires_in": 3600})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.path.startswith("/reddit/"):
+            self._track("reddit")
+            posts = [{"data": {"ups": 25}}] * 4 if query["q"] != "QUIET" else []
+            self._reply({"data": {"children": posts}})
+        elif url.path.startswith("/twitter/"):
+            self._track("twitter")
+            symbols = re.findall(r'"([^"]+)"', query["query"]) or [query["query"]]
+            self._reply({"data": [t for s in symbols for t in tweets_for(s)]})
+        elif url.path.startswith("/news/"):
+            self._track("news")
+            symbols = re.findall(r'"([^"]+)"', query["q"]) or [query["q"]]
+            self._reply({"articles": [a for s in symbols for a in articles_for(s)]})
+        else:
+            self._track("fed")
+            self._reply({"observations": [{"value": "5.33", "date": "2026-09-01"}]})
+
+
+@pytest.fixture
+def server(monkeypatch):
+    stub = StubAPIServer()
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    for name, value in {
+        "REDDIT_CLIENT_ID": "id",
+        "REDDIT_SECRET": "secret",
+        "TWITTER_BEARER": "bearer",
+        "NEWS_API_KEY": "key",
+        "FRED_API_KEY": "key",
+        "REDDIT_AUTH_URL": f"{stub.url}/reddit/auth",
+        "REDDIT_API_URL": f"{stub.url}/reddit",
+        "TWITTER_API_URL": f"{stub.url}/twitter",
+        "NEWS_API_URL": f"{stub.url}/news",
+        "FRED_API_URL": f"{stub.url}/fred",
+        "_reddit_token": None,
+        "_engine": None,
+    }.items():
+        monkeypatch.setattr(mi, name, value)
+    yield stub
+    stub.shutdown()
+    stub.server_close()
+
+
+def unlimited_sources():
+    sources = mi.default_sources()
+    for source in sources:
+        source.rate = None
+    return sources
+
+
+def test_batched_queries_score_like_single_symbol_queries(server):
+    batch = mi.fetch_twitter_sentiment_batch(["AAPL", "MSFT", "BTC-USD"])
+    assert batch["MSFT"] == mi.fetch_twitter_sentiment("MSFT")
+    assert batch["AAPL"] == {"tweets": 3, "sentiment_score": 0.0, "positive": 1, "negative": 1}
+
+    news = mi.fetch_news_sentiment_batch(["AAPL", "MSFT"])
+    assert news["AAPL"] == mi.fetch_news_sentiment("AAPL")
+    assert news["AAPL"]["latest_headlines"] == ["AAPL shares surge on growth", "Futures drift"]
+    assert server.calls["twitter"] == 2 and server.calls["news"] == 2
+
+    # The Reddit token is fetched once and reused
+    assert mi.fetch_reddit_sentiment("AAPL")["sentiment_score"] == 1.0
+    assert mi.fetch_reddit_sentiment("QUIET") is None
+    assert server.calls == Counter(twitter=2, news=2, reddit_auth=1, reddit=2)
+
+
+def test_batched_crypto_matched_by_alias_and_misses_queried_alone(server):
+    batch = mi.fetch_twitter_sentiment_batch(["BTC-USD", "ETH-USD", "ON"])
+    # "$BTC", "BTC/USD" and "BTC" all count for BTC-USD, and nothing from ETH-USD
+    assert batch["BTC-USD"] == {"tweets": 3, "sentiment_score": 0.0, "positive": 1, "negative": 1}
+    assert batch["ETH-USD"] == mi.fetch_twitter_sentiment("ETH-USD")
+    # A bare "ON" is not a mention (nor is "moon"); it gets its own query
+    assert batch["ON"] == mi.fetch_twitter_sentiment("ON")
+    assert server.calls["twitter"] == 4
+
+    news = mi.fetch_news_sentiment_batch(["BTC-USD", "A"])
+    assert news["BTC-USD"]["latest_headlines"] == ["BTC shares surge on growth", "Futures drift"]
+    assert news["A"] == mi.fetch_news_sentiment("A")
+    assert server.calls["news"] == 3
+
+
+def test_refresh_is_bounded_by_slowest_source(server):
+    server.delay = 0.05
+    symbols = [f"SYM{i}" for i in range(100)]
+    engine = SentimentEngine(unlimited_sources())
+    start = time.perf_counter()
+    collected = engine.collect(symbols)
+    elapsed = time.perf_counter() - start
+    engine.close()
+
+    # Reddit: 100 searches, 4 at a time -> ~1.3 s; serially all calls would take ~25 s
+    assert server.calls == Counter(reddit=100, reddit_auth=1, twitter=10, news=10, fed=1)
+    assert server.peak["reddit"] <= 4 and server.peak["twitter"] <= 2
+    assert elapsed < 2.5
+    assert engine.last_run["twitter"]["seconds"] < engine.last_run["reddit"]["seconds"]
+    assert collected["fed"][GLOBAL]["fed_funds_rate"] == 5.33
+    assert collected["news"]["SYM42"]["articles"] == 2
+
+
+def test_results_cached_with_ttl_and_persisted(server, tmp_path):
+    cache = tmp_path / "sentiment_cache.json"
+    symbols = ["AAPL", "QUIET"]
+    engine = SentimentEngine(unlimited_sources(), cache_path=cache)
+    first = engine.collect(symbols)
+    calls = sum(server.calls.values())
+    assert engine.collect(symbols) == first
+    assert sum(server.calls.values()) == calls
+    assert engine.last_run["reddit"] == {
+        "cached": 2,
+        "fetched": 0,
+        "requests": 0,
+        "errors": 0,
+        "seconds": 0.0,
+    }
+
+    # A restarted engine reuses the persisted cache; a new symbol fetches only itself
+    restarted = SentimentEngine(unlimited_sources(), cache_path=cache)
+    assert restarted.collect(symbols) == first
+    restarted.collect([*symbols, "MSFT"])
+    assert restarted.last_run["reddit"]["fetched"] == 1
+    assert restarted.last_run["twitter"]["requests"] == 1
+
+    # Empty results expire sooner, so an outage or quiet symbol is retried
+    retry = SentimentEngine(unlimited_sources(), cache_path=cache, negative_ttl=0.0)
+    retry.collect(symbols)
+    assert retry.last_run["reddit"]["fetched"] == 1  # QUIET only
+    retry.invalidate("fed")
+    retry.collect(symbols)
+    assert retry.last_run["fed"]["fetched"] == 1
+    for e in (engine, restarted, retry):
+        e.close()
+
+
+def test_rate_limits_space_requests():
+    limiter = RateLimiter(rate=20, burst=2)
+    start = time.perf_counter()
+    threads = [threading.Thread(target=limiter.acquire) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.perf_counter() - start >= (6 - 2) / 20 - 0.01
+
+    stamps = []
+    source = SentimentSource(
+        "ticks", lambda symbol: stamps.append(time.monotonic()), rate=40, burst=1, concurrency=8
+    )
+    failing = SentimentSource("broken", lambda symbol: 1 / 0, concurrency=2)
+    engine = SentimentEngine([source, failing])
+    collected = engine.collect([f"S{i}" for i in range(9)])
+    engine.close()
+    assert stamps[-1] - stamps[0] >= 8 / 40 - 0.01
+    assert engine.last_run["broken"]["errors"] == 9
+    assert set(collected["broken"].values()) == {None}
+
+
+def test_aggregate_intelligence_shares_global_feeds(server, monkeypatch):
+    telegram_calls = []
+    monkeypatch.setattr(
+        mi, "fetch_telegram_signals", lambda: telegram_calls.append(1) or {"sentiment_score": 0.5}
+    )
+    engine = SentimentEngine(unlimited_sources())
+    intelligence = mi.aggregate_intelligence(["AAPL", "MSFT", "QUIET"], engine=engine)
+    engine.close()
+
+    assert len(telegram_calls) == 1 and server.calls["fed"] == 1
+    assert intelligence["fed_data"]["impact"] == "bearish"
+    aapl = intelligence["signals"]["AAPL"]
+    assert aapl["telegram"] == {"sentiment_score": 0.5}
+    # reddit 1.0, twitter 0.0, news 0.5, telegram 0.5
+    assert aapl["composite_sentiment"] == pytest.approx(0.5)
+    assert aapl["recommendation"] == "BUY"
+    assert intelligence["signals"]["QUIET"]["reddit"] is None
+    assert intelligence["sources"]["reddit"]["fetched"] == 3
+    json.dumps(intelligence)
@@ -0,0 +1,193 @@
+"""
+Tests for the agent state bus: latest values, replay, back-pressure and the
+file fallback agents use when no broker is running.
+"""
+
+import asyncio
+import json
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.state_bus import StateBus, StateBusBroker  # noqa: E402
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Unix domain sockets")
+
+BRAIN = {"risk_scaler": 1.1, "confidence": 0.8}
+
+
+@pytest.fixture
+def socket_path():
+    # AF_UNIX paths are limited to ~100 bytes, which pytest's tmp_path can exceed
+    with tempfile.TemporaryDirectory(prefix="bus") as directory:
+        yield Path(directory) / "bus.sock"
+
+
+@pytest.fixture
+def broker(socket_path, tmp_path):
+    broker = StateBusBroker(socket_path=socket_path, root=tmp_path, export_interval=0.05)
+    broker.start_in_thread()
+    yield broker
+    broker.stop_thread()
+
+
+@pytest.fixture
+def client(broker):
+    clients = []
+
+    def make() -> StateBus:
+        bus = StateBus(socket_path=broker.socket_path, root=broker.root, reconnect_interval=0.05)
+        clients.append(bus)
+        return bus
+
+    yield make
+    for bus in clients:
+        bus.close()
+
+
+def wait_until(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_latest_value_reaches_late_subscriber_and_export(client, broker):
+    publisher = client()
+    assert publisher.publish("brain", BRAIN)
+
+    reader = client()
+    assert wait_until(lambda: reader.latest("brain") == BRAIN)
+    export = broker.root / "runtime" / "atlas_brain.json"
+    assert wait_until(export.exists)
+    assert json.loads(export.read_text()) == BRAIN
+
+
+def test_keyed_topic_conflates_per_symbol(client):
+    reader, publisher = client(), client()
+    reader.subscribe(["quotes"])
+    for price in (100.0, 101.0, 102.0):
+        publisher.publish("quotes", {"symbol": "SPY", "price": price})
+    publisher.publish("quotes", {"symbol": "QQQ", "price": 400.0})
+
+    assert wait_until(
+        lambda: reader.latest("quotes", key="QQQ") == {"symbol": "QQQ", "price": 400.0}
+    )
+    assert reader.latest("quotes", key="SPY")["price"] == 102.0
+
+
+def test_invalid_payload_is_rejected(client):
+    with pytest.raises(ValueError):
+        client().publish("brain", {"risk_scaler": "high"})
+
+
+def test_lossless_replay_survives_broker_restart(socket_path, tmp_path):
+    broker = StateBusBroker(socket_path=socket_path, root=tmp_path)
+    broker.start_in_thread()
+    publisher = StateBus(socket_path=socket_path, root=tmp_path)
+    for i in range(5):
+        publisher.publish("fills", {"symbol": "SPY", "side": "buy", "quantity": 1, "price": i})
+    # The broker applies a connection's messages in order, so this sync marks the end
+    publisher.publish("brain", BRAIN)
+    assert wait_until(lambda: broker.topics["brain"].seq == 1)
+    publisher.close()
+    broker.stop_thread()
+
+    restarted = StateBusBroker(socket_path=socket_path, root=tmp_path)
+    restarted.start_in_thread()
+    try:
+        received = []
+        subscriber = StateBus(socket_path=socket_path, root=tmp_path)
+        subscriber.subscribe(["fills"], lambda topic, data, seq: received.append(seq), replay=True)
+        assert wait_until(lambda: len(received) == 5)
+        assert received == [1, 2, 3, 4, 5]
+        subscriber.close()
+    finally:
+        restarted.stop_thread()
+
+
+def test_full_subscriber_blocks_then_drops(socket_path, tmp_path):
+    async def scenario():
+        broker = StateBusBroker(
+            socket_path=socket_path, root=tmp_path, max_pending=2, slow_consumer_timeout=0.2
+        )
+        await broker.start()
+        try:
+            reader, writer = await asyncio.open_unix_connection(str(socket_path))
+            sub = {"op": "sub", "topics": ["events"]}
+            body = json.dumps(sub).encode()
+            writer.write(len(body).to_bytes(4, "big") + body)
+            await writer.drain()
+            await asyncio.sleep(0.05)
+            subscriber = next(iter(broker.topics["events"].subscribers))
+            subscriber.wake = asyncio.Event()  # detach the sender: nothing drains it now
+
+            started = time.monotonic()
+            for i in range(4):
+                await broker._publish("events", {"type": "tick", "n": i})
+            elapsed = time.monotonic() - started
+            writer.close()
+            return subscriber, elapsed
+        finally:
+            await broker.stop()
+
+    subscriber, elapsed = asyncio.run(scenario())
+    assert subscriber.closed
+    assert 0.2 <= elapsed < 2.0
+
+
+def test_file_fallback_without_broker(socket_path, tmp_path):
+    bus = StateBus(socket_path=socket_path, root=tmp_path)
+    assert not bus.publish("allocations", {"allocations": {"SPY": 1.0}})
+    assert bus.latest("allocations") == {"allocations": {"SPY": 1.0}}
+    assert bus.latest("quotes", default={}) == {}
+
+
+def test_direct_export_writes_are_not_shadowed_by_the_bus(socket_path, tmp_path):
+    # An agent that still writes the export file directly, before the broker starts
+    export = tmp_path / "runtime" / "allocations_override.json"
+    export.parent.mkdir(parents=True)
+    export.write_text(json.dumps({"allocations": {"SPY": 1.0}}))
+    broker = StateBusBroker(socket_path=socket_path, root=tmp_path, export_interval=0.05)
+    assert broker.topics["allocations"].latest[""]["data"] == {"allocations": {"SPY": 1.0}}
+    broker.start_in_thread()
+    bus = StateBus(socket_path=socket_path, root=tmp_path)
+    try:
+        assert bus.latest("allocations") == {"allocations": {"SPY": 1.0}}
+
+        bus.publish("allocations", {"allocations": {"QQQ": 1.0}})
+        assert wait_until(lambda: bus.latest("allocations") == {"allocations": {"QQQ": 1.0}})
+
+        # A later direct write wins over the older bus message
+        time.sleep(0.1)
+        export.write_text(json.dumps({"allocations": {"GLD": 1.0}}))
+        assert bus.latest("allocations") == {"allocations": {"GLD": 1.0}}
+    finally:
+        bus.close()
+        broker.stop_thread()
+
+    # Without any broker value, a connected client still reads the file
+    empty = StateBusBroker(socket_path=socket_path, root=tmp_path / "other")
+    empty.start_in_thread()
+    other = StateBus(socket_path=socket_path, root=tmp_path)
+    try:
+        assert other.latest("allocations") == {"allocations": {"GLD": 1.0}}
+        assert other.connected
+    finally:
+        other.close()
+        empty.stop_thread()
+
+
+def test_wait_for_update_wakes_on_publish(client):
+    reader, publisher = client(), client()
+    reader.subscribe(["brain"])
+    assert wait_until(lambda: reader.connected)
+    threading.Timer(0.05, publisher.publish, ("brain", BRAIN)).start()
+    assert reader.wait_for_update(timeout=5.0)
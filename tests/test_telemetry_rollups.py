@@ -0,0 +1,152 @@
+"""
+Tests for materialized telemetry rollups and their use in hive telemetry.
+"""
+
+import json
+import sys
+from datetime import UTC, datetime
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from agents import phase_5600_hive_telemetry as hive  # noqa: E402
+from analytics.telemetry_rollups import Bucket, RollupStore  # noqa: E402
+
+NOW = datetime(2026, 3, 15, 12, 34, 56, tzinfo=UTC).timestamp()
+
+
+def make_decisions(n=3000, days=40, seed=0):
+    rng = np.random.default_rng(seed)
+    times = np.sort(NOW - rng.uniform(0, days * 86400, n))
+    decisions = []
+    for i, ts in enumerate(times):
+        decisions.append(
+            {
+                "agent": f"agent_{i % 3}",
+                "strategy": ["momentum", "mean_reversion"][i % 2],
+                "decision": "buy",
+                "timestamp": datetime.fromtimestamp(ts, UTC).isoformat(),
+                "pnl": round(float(rng.normal(1, 20)), 2) if i % 5 else None,
+                "pnl_attributed": bool(i % 5),
+            }
+        )
+    return decisions, times
+
+
+def max_drawdown(pnls):
+    equity = np.concatenate([[0.0], np.cumsum(pnls)])
+    return float((np.maximum.accumulate(equity) - equity).max())
+
+
+def test_buckets_merge_like_one_sequence():
+    pnls = np.random.default_rng(1).normal(0, 10, 500)
+    whole, merged = Bucket(), Bucket()
+    for pnl in pnls:
+        whole.add_pnl(pnl)
+    for chunk in np.array_split(pnls, [3, 50, 51, 200, 420]):
+        part = Bucket()
+        for pnl in chunk:
+            part.add_pnl(pnl)
+        merged.merge(part)
+
+    for bucket in (whole, merged):
+        assert bucket.total == pytest.approx(pnls.sum())
+        assert bucket.sharpe == pytest.approx(hive.calculate_sharpe(list(pnls)))
+        assert bucket.max_dd == pytest.approx(max_drawdown(pnls))
+        assert bucket.peak == pytest.approx(max(0.0, np.cumsum(pnls).max()))
+        assert (bucket.low, bucket.high) == (pnls.min(), pnls.max())
+        assert bucket.win_rate == pytest.approx((pnls > 0).mean())
+
+
+def test_windows_match_full_scan():
+    decisions, times = make_decisions()
+    store = RollupStore()
+    store.ingest(decisions, now=NOW)
+    pnl = np.array([d["pnl"] if d["pnl"] is not None else np.nan for d in decisions])
+    agents = np.array([d["agent"] for d in decisions])
+
+    # 1d windows start on the minute, 7d/30d windows on the hour
+    edges = {"1d": (NOW - 86400) // 60 * 60, "7d": (NOW - 7 * 86400) // 3600 * 3600}
+    edges["30d"] = (NOW - 30 * 86400) // 3600 * 3600
+    for agent in ("agent_0", "agent_1", "agent_2"):
+        metrics = store.metrics("agent", agent, NOW)
+        mine = agents == agent
+        for label, edge in edges.items():
+            assert metrics[f"pnl_{label}"] == pytest.approx(np.nansum(pnl[mine & (times >= edge)]))
+        month = pnl[mine & (times >= edges["30d"]) & ~np.isnan(pnl)]
+        assert metrics["trade_count"] == len(month)
+        assert metrics["winrate_30d"] == pytest.approx((month > 0).mean())
+        assert metrics["sharpe_30d"] == pytest.approx(hive.calculate_sharpe(list(month)))
+        assert metrics["max_dd_30d"] == pytest.approx(max_drawdown(month))
+        assert metrics["total_decisions"] == mine.sum()
+
+
+def test_incremental_ingest_counts_each_pnl_once(tmp_path):
+    decisions, _ = make_decisions(n=200, days=3)
+    source, state = tmp_path / "attribution.json", tmp_path / "rollups.json"
+    pending = [
+        dict(d, pnl=None, pnl_attributed=False) if i >= 150 else d for i, d in enumerate(decisions)
+    ]
+    source.write_text(json.dumps({"decisions": pending[:180]}))
+
+    store = RollupStore(state)
+    assert store.ingest_file(source, now=NOW) == 180
+    assert store.ingest_file(source, now=NOW) == 0  # unchanged file is not reparsed
+
+    # P&L arrives for earlier decisions and new decisions are appended
+    source.write_text(json.dumps({"decisions": decisions}))
+    updates = 20 + sum(d["pnl"] is not None for d in decisions[150:180])
+    assert store.ingest_file(source, now=NOW) == updates
+
+    # Saves are throttled: a restart resumes from the first snapshot and
+    # re-ingests only what came after it
+    restored = RollupStore(state)
+    assert restored.ingest_file(source, now=NOW) == updates
+
+    fresh = RollupStore()
+    fresh.ingest(decisions, now=NOW)
+    for agent in fresh.names("agent"):
+        expected = fresh.metrics("agent", agent, NOW)
+        assert store.metrics("agent", agent, NOW) == pytest.approx(expected)
+        assert restored.metrics("agent", agent, NOW) == pytest.approx(expected)
+
+
+def test_meta_metrics_read_from_rollups(monkeypatch, tmp_path):
+    # Shift to the real clock, keeping decisions clear of the 1d/7d window edges
+    decisions, times = make_decisions(n=500, days=10)
+    age = NOW - times
+    shift = datetime.now(UTC).timestamp() - NOW
+    decisions = [
+        dict(d, timestamp=datetime.fromtimestamp(ts + shift, UTC).isoformat())
+        for d, ts, a in zip(decisions, times, age, strict=True)
+        if abs(a - 86400) > 7200 and abs(a - 7 * 86400) > 7200
+    ]
+    (tmp_path / "performance_attribution.json").write_text(json.dumps({"decisions": decisions}))
+    (tmp_path / "strategy_performance.json").write_text(
+        json.dumps({"ranked_strategies": [{"strategy": "momentum", "sharpe": 1.2, "score": 0.8}]})
+    )
+    monkeypatch.setattr(hive, "STATE", tmp_path)
+    monkeypatch.setattr(hive, "RUNTIME", tmp_path)
+    monkeypatch.setattr(hive, "ATTRIBUTION_FILE", tmp_path / "performance_attribution.json")
+    monkeypatch.setattr(hive, "ROLLUP_FILE", tmp_path / "rollups.json")
+
+    metrics = hive.build_meta_metrics()
+    per_agent = metrics["per_agent"]
+    assert set(per_agent) == {"agent_0", "agent_1", "agent_2"}
+    for name, agent in per_agent.items():
+        mine = [d for d in decisions if d["agent"] == name]
+        assert agent["pnl_1d"] == pytest.approx(hive.calculate_pnl_1d(mine), abs=0.02)
+        assert agent["pnl_7d"] == pytest.approx(hive.calculate_pnl_7d(mine), abs=0.02)
+        assert agent["winrate_30d"] == pytest.approx(hive.calculate_win_rate(mine), abs=1e-3)
+        assert agent["total_decisions"] == len(mine)
+
+    momentum = metrics["per_strategy"]["momentum"]
+    assert momentum["score"] == 0.8
+    assert momentum["trade_count"] == sum(
+        d["strategy"] == "momentum" and d["pnl"] is not None for d in decisions
+    )
+    assert hive.get_rollups().ingest_file(hive.ATTRIBUTION_FILE) == 0
@@ -0,0 +1,159 @@
+"""
+Tests for the price-indexed trigger book and AdvancedTradingEngine.
+The book must fire exactly what a full AdvancedOrder.check_triggers scan fires.
+"""
+
+import copy
+import json
+import random
+import sys
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+import phases.phase_101_130_advanced_trading as advanced_trading  # noqa: E402
+from phases.phase_101_130_advanced_trading import (  # noqa: E402
+    AdvancedOrder,
+    AdvancedTradingEngine,
+    ExpiryWheel,
+    TriggerBook,
+)
+
+NOW = datetime(2026, 3, 2, 15, 0, 0, tzinfo=UTC)
+
+
+@pytest.fixture
+def runtime(tmp_path, monkeypatch):
+    monkeypatch.setattr(advanced_trading, "RUNTIME", tmp_path)
+    monkeypatch.setattr(advanced_trading, "ADVANCED_ORDERS_FILE", tmp_path / "advanced.json")
+    monkeypatch.setattr(advanced_trading, "ADVANCED_ORDER_STORE_DIR", tmp_path / "store")
+    return tmp_path
+
+
+def random_order(rng: random.Random, order_id: str, symbol: str, price: float) -> AdvancedOrder:
+    side = rng.choice(["buy", "sell"])
+    below, above = price * rng.uniform(0.9, 0.99), price * rng.uniform(1.01, 1.1)
+    kind = rng.choice(["bracket", "stop_loss", "limit", "stop", "trailing", "mixed"])
+    order = AdvancedOrder(order_id, symbol, side, 1.0)
+    if kind in ("bracket", "stop_loss", "mixed"):
+        order.stop_loss = below if side == "buy" else above
+    if kind in ("bracket", "mixed"):
+        order.take_profit = above if side == "buy" else below
+    if kind in ("limit", "stop"):
+        order.order_type = kind
+        order.price = rng.choice([below, above])
+    if kind in ("trailing", "mixed"):
+        order.trailing_stop = rng.choice([0.01, 0.02, 0.05])
+    return order
+
+
+def test_book_matches_full_scan():
+    rng = random.Random(7)
+    symbols = [f"S{i}" for i in range(5)]
+    prices = dict.fromkeys(symbols, 100.0)
+    book, reference = TriggerBook(), {}
+    expected, actual = [], []
+
+    for tick in range(3000):
+        if tick % 10 == 0:
+            for i in range(5):
+                symbol = rng.choice(symbols)
+                order = random_order(rng, f"O{tick}_{i}", symbol, prices[symbol])
+                if order.trailing_stop:
+                    order.trail_extreme = book.last_price.get(symbol)
+                reference[order.order_id] = copy.copy(order)
+                book.add(order)
+
+        symbol = rng.choice(symbols)
+        prices[symbol] *= 1 + rng.gauss(0, 0.01)
+        price = prices[symbol]
+        for order in reference.values():
+            if order.symbol == symbol:
+                trigger = order.check_triggers(price, NOW)
+                if trigger:
+                    order.status = trigger
+                    expected.append((tick, order.order_id, trigger))
+        actual.extend((tick, *fired) for fired in book.on_tick(symbol, price, NOW))
+
+    assert len(expected) > 200
+    assert sorted(actual) == sorted(expected)
+    assert set(book.orders) == {o.order_id for o in reference.values() if o.status == "pending"}
+
+
+def test_trailing_stop_follows_best_price():
+    book = TriggerBook()
+    book.add(AdvancedOrder("LONG", "SPY", "buy", 1.0, trailing_stop=0.05, trail_extreme=100.0))
+    book.add(AdvancedOrder("SHORT", "SPY", "sell", 1.0, trailing_stop=0.05, trail_extreme=100.0))
+
+    assert book.on_tick("SPY", 120.0, NOW) == [("SHORT", "trailing_stop")]
+    assert book.on_tick("SPY", 114.5, NOW) == []
+    assert book.on_tick("SPY", 114.0, NOW) == [("LONG", "trailing_stop")]
+
+
+def test_cancelled_orders_are_skipped_and_compacted():
+    book = TriggerBook()
+    book.COMPACT_MIN_DEAD = 10
+    for i in range(50):
+        book.add(AdvancedOrder(f"O{i}", "SPY", "buy", 1.0, stop_loss=90.0 + i * 0.1))
+    for i in range(40):
+        book.discard(f"O{i}")
+
+    fired = book.on_tick("SPY", 50.0, NOW)
+    assert sorted(order_id for order_id, _ in fired) == sorted(f"O{i}" for i in range(40, 50))
+    assert book._symbols["SPY"].at_or_below == []
+
+
+def test_expiry_wheel_groups_slots():
+    wheel = ExpiryWheel(resolution=60.0)
+    wheel.add("A", 100.0)
+    wheel.add("B", 110.0)
+    wheel.add("C", 500.0)
+    assert wheel.pop_due(100.0) == []
+    assert sorted(wheel.pop_due(120.0)) == ["A", "B"]
+    assert len(wheel) == 1
+
+
+class TestAdvancedTradingEngine:
+    def test_triggers_persist_across_restart(self, runtime):
+        engine = AdvancedTradingEngine()
+        stop_id = engine.create_advanced_order("SPY", "buy", 10, stop_loss=95.0, take_profit=110.0)
+        trail_id = engine.create_advanced_order("QQQ", "sell", 5, trailing_stop=0.02)
+        cancel_id = engine.create_advanced_order("SPY", "buy", 1, stop_loss=96.0)
+
+        assert engine.cancel_order(cancel_id)
+        assert engine.process_ticks([("QQQ", 300.0), ("QQQ", 290.0), ("SPY", 94.0)], NOW) == [
+            (stop_id, "stop_loss")
+        ]
+        engine.save_state()
+        engine.store.close()
+
+        restarted = AdvancedTradingEngine()
+        assert restarted.orders[stop_id].status == "stop_loss"
+        assert restarted.orders[cancel_id].status == "cancelled"
+        assert restarted.orders[trail_id].trail_extreme == 290.0
+        assert restarted.check_order_triggers("QQQ", 296.0, NOW) == [(trail_id, "trailing_stop")]
+
+    def test_day_and_gtd_orders_expire(self, runtime):
+        engine = AdvancedTradingEngine()
+        gtd_id = engine.create_advanced_order(
+            "SPY", "buy", 1, stop_loss=90.0, time_in_force="GTD", expires_at=NOW
+        )
+        day_id = engine.create_advanced_order("IWM", "buy", 1, time_in_force="DAY")
+
+        assert engine.check_order_triggers("SPY", 100.0, NOW - timedelta(seconds=5)) == []
+        assert engine.check_order_triggers("QQQ", 100.0, NOW + timedelta(seconds=5)) == [
+            (gtd_id, "expired")
+        ]
+        later = engine.orders[day_id].expires_at + timedelta(seconds=5)
+        assert engine.check_order_triggers("QQQ", 100.0, later) == [(day_id, "expired")]
+
+    def test_legacy_orders_file_is_migrated(self, runtime):
+        legacy = AdvancedOrder("ADV_1", "SPY", "buy", 1.0, stop_loss=95.0)
+        (runtime / "advanced.json").write_text(json.dumps({"orders": [legacy.to_dict()]}))
+        engine = AdvancedTradingEngine()
+        assert "ADV_1" in engine.book
+        assert not (runtime / "advanced.json").exists()
@@ -4,11 +4,21 @@ NeoLight Live Trading Execution - Phase 2900–3100
 =================================================
 World-class live order execution with Alpaca API integration.
 Includes safety controls, circuit breakers, and Telegram notifications.
+
+Circuit-breaker state lives in memory and is persisted at most every
+CIRCUIT_BREAKER_PERSIST_INTERVAL seconds (and at exit), so concurrent order
+submission (execution.async_router.LiveBroker) does not rewrite the state
+file around every order.
 """
 
+import atexit
 import json
 import logging
 import os
+import sys
+import threading
+import time
+import weakref
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
@@ -21,6 +31,12 @@ except ImportError:
     HAS_REQUESTS = False
     print("⚠️  Install requests: pip install requests")
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from utils.state_manager import read_json_cached  # noqa: E402
+
 # Setup paths
 ROOT = Path(os.path.expanduser("~/neolight"))
 STATE = ROOT / "state"
@@ -49,6 +65,17 @@ if not logger.handlers:
     console_handler.setFormatter(logging.Formatter("%(levelname)s - %(message)s"))
     logger.addHandler(console_handler)
 
+CIRCUIT_BREAKER_PERSIST_INTERVAL = float(os.getenv("CIRCUIT_BREAKER_PERSIST_INTERVAL", "5.0"))
+
+# Engines whose throttled circuit breaker state is flushed at exit
+_ENGINES: weakref.WeakSet = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_engines():
+    for engine in list(_ENGINES):
+        engine.flush_circuit_breaker_state()
+
 
 class LiveExecutionEngine:
     """
@@ -89,9 +116,14 @@ class LiveExecutionEngine:
         self.max_daily_trades = int(os.getenv("MAX_DAILY_TRADES", "50"))
         self.daily_trade_count = 0
         self.last_reset_date = datetime.now().date()
+        self.persist_interval = CIRCUIT_BREAKER_PERSIST_INTERVAL
+        self._state_lock = threading.Lock()
+        self._state_dirty = False
+        self._last_persist = 0.0
 
         # Load circuit breaker state
         self._load_circuit_breaker_state()
+        _ENGINES.add(self)
 
     def _load_circuit_breaker_state(self):
         """Load circuit breaker state from file."""
@@ -105,18 +137,62 @@ class LiveExecutionEngine:
             except Exception as e:
                 logger.warning(f"⚠️  Error loading circuit breaker state: {e}")
 
-    def _save_circuit_breaker_state(self):
-        """Save circuit breaker state to file."""
-        try:
+    def _save_circuit_breaker_state(self, force: bool = False):
+        """
+        Persist circuit breaker state, at most once per persist interval.
+
+        Args:
+            force: Write now even if the interval has not elapsed
+        """
+        with self._state_lock:
+            self._state_dirty = True
+            now = time.monotonic()
+            if not force and now - self._last_persist < self.persist_interval:
+                return
             data = {
                 "daily_trade_count": self.daily_trade_count,
                 "last_reset_date": self.last_reset_date.isoformat(),
                 "timestamp": datetime.now(UTC).isoformat(),
             }
+            self._state_dirty = False
+            self._last_persist = now
+        try:
             self.circuit_breaker_file.write_text(json.dumps(data, indent=2))
         except Exception as e:
             logger.error(f"❌ Error saving circuit breaker state: {e}")
 
+    def flush_circuit_breaker_state(self):
+        """Write circuit breaker state if it changed since the last write."""
+        if self._state_dirty:
+            self._save_circuit_breaker_state(force=True)
+
+    def _reserve_trade(self) -> bool:
+        """
+        Atomically take one slot of the daily trade limit.
+
+        Concurrent execute_order calls (LiveBroker's worker pool) each
+        reserve before submitting, so the limit holds however many orders
+        are in flight. Returns False when the limit is reached.
+        """
+        today = datetime.now().date()
+        with self._state_lock:
+            new_day = today > self.last_reset_date
+            if new_day:
+                self.daily_trade_count = 0
+                self.last_reset_date = today
+            reserved = self.daily_trade_count < self.max_daily_trades
+            if reserved:
+                self.daily_trade_count += 1
+        if reserved or new_day:
+            self._save_circuit_breaker_state(force=new_day)
+        return reserved
+
+    def _release_trade(self):
+        """Return a reserved slot after a submission that did not go through."""
+        with self._state_lock:
+            self.daily_trade_count = max(0, self.daily_trade_count - 1)
+        self._save_circuit_breaker_state()
+
     def _check_circuit_breaker(self) -> tuple[bool, str]:
         """
         Check if circuit breaker should halt trading.
@@ -127,9 +203,10 @@ class LiveExecutionEngine:
         # Reset daily counters if new day
         today = datetime.now().date()
         if today > self.last_reset_date:
-            self.daily_trade_count = 0
-            self.last_reset_date = today
-            self._save_circuit_breaker_state()
+            with self._state_lock:
+                self.daily_trade_count = 0
+                self.last_reset_date = today
+            self._save_circuit_breaker_state(force=True)
 
         # Check daily trade limit
         if self.daily_trade_count >= self.max_daily_trades:
@@ -137,25 +214,21 @@ class LiveExecutionEngine:
 
         # Check daily drawdown limit
         try:
-            equity_file = STATE / "equity_curve.json"
-            if equity_file.exists():
-                data = json.loads(equity_file.read_text())
-                if "daily_pnl" in data:
-                    daily_pnl = float(data["daily_pnl"])
-                    if daily_pnl < -self.daily_loss_limit:
-                        return True, f"Daily loss limit exceeded ({daily_pnl:.2%})"
+            data = read_json_cached(STATE / "equity_curve.json")
+            if data is not None and "daily_pnl" in data:
+                daily_pnl = float(data["daily_pnl"])
+                if daily_pnl < -self.daily_loss_limit:
+                    return True, f"Daily loss limit exceeded ({daily_pnl:.2%})"
         except Exception as e:
             logger.debug(f"Could not check daily drawdown: {e}")
 
         # Check for manual halt
-        halt_file = RUNTIME / "drawdown_state.json"
-        if halt_file.exists():
-            try:
-                data = json.loads(halt_file.read_text())
-                if data.get("halt", False):
-                    return True, "Manual halt activated"
-            except:
-                pass
+        try:
+            data = read_json_cached(RUNTIME / "drawdown_state.json")
+            if data is not None and data.get("halt", False):
+                return True, "Manual halt activated"
+        except Exception:
+            pass
 
         return False, ""
 
@@ -215,8 +288,10 @@ class LiveExecutionEngine:
         if not self.api_key or not self.secret_key:
             return {"status": "error", "message": "Alpaca API keys not configured"}
 
-        # Check circuit breaker
+        # Check circuit breaker, then take a daily-limit slot (given back if submission fails)
         is_halted, reason = self._check_circuit_breaker()
+        if not is_halted and not self._reserve_trade():
+            is_halted, reason = True, f"Daily trade limit reached ({self.max_daily_trades})"
         if is_halted:
             logger.warning(f"🛑 Circuit breaker active: {reason}")
             return {"status": "halted", "reason": reason}
@@ -240,17 +315,15 @@ class LiveExecutionEngine:
         if take_profit:
             order_data["take_profit"] = str(take_profit)
 
+        submitted = False
         try:
             # Submit order
             response = requests.post(url, json=order_data, headers=self.headers, timeout=10)
 
             if response.status_code == 200:
+                submitted = True
                 order_result = response.json()
 
-                # Increment daily trade count
-                self.daily_trade_count += 1
-                self._save_circuit_breaker_state()
-
                 # Log success
                 logger.info(f"✅ LIVE {side.upper()} executed: {symbol} x {qty} @ {order_type}")
 
@@ -274,6 +347,7 @@ class LiveExecutionEngine:
                     "result": order_result,
                 }
             else:
+                self._release_trade()
                 error_msg = f"Order failed: {response.status_code} - {response.text}"
                 logger.error(f"❌ {error_msg}")
 
@@ -287,6 +361,8 @@ class LiveExecutionEngine:
                 }
 
         except Exception as e:
+            if not submitted:
+                self._release_trade()
             error_msg = f"Exception executing order: {e}"
             logger.error(f"❌ {error_msg}")
             import traceback
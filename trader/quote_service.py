@@ -16,13 +16,21 @@ World-Class Architecture:
 
 import logging
 import os
+import sys
 import threading
 import time
 from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime
+from pathlib import Path
 from typing import Any, Optional
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from utils.lazy_imports import lazy_import, module_available  # noqa: E402
+
 logger = logging.getLogger("quote_service")
 
 # Try to import requests for API calls
@@ -34,13 +42,10 @@ except ImportError:
     HAS_REQUESTS = False
     logger.warning("⚠️ requests not available - API quote fetching disabled")
 
-# Try to import yfinance as final fallback (no API keys required)
-try:
-    import yfinance as yf
-
-    HAS_YFINANCE = True
-except ImportError:
-    HAS_YFINANCE = False
+# yfinance is the final fallback (no API keys required); imported on first use
+yf = lazy_import("yfinance")
+HAS_YFINANCE = module_available("yfinance")
+if not HAS_YFINANCE:
     logger.debug("⚠️ yfinance not available - will use API sources only")
 
 
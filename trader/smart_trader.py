@@ -36,6 +36,22 @@ except ImportError as e:
     HAS_WORLD_CLASS_UTILS = False
     print(f"⚠️ World-class utilities not available: {e}", flush=True)
 
+# State bus: brain/allocations pushed by agents (falls back to their JSON files)
+try:
+    from utils.state_bus import get_state_bus
+
+    HAS_STATE_BUS = True
+except ImportError:
+    HAS_STATE_BUS = False
+
+# Notification dispatcher: Telegram alerts queued and sent in the background
+try:
+    from utils.notification_dispatcher import get_dispatcher
+
+    HAS_NOTIFICATION_DISPATCHER = True
+except ImportError:
+    HAS_NOTIFICATION_DISPATCHER = False
+
 # =============== LOGGING SETUP ==================
 # Configure logging with file and console handlers
 LOG_DIR = ROOT / "logs"
@@ -128,21 +144,18 @@ except ImportError:
         return 100000.0, 100000.0, 0.0, 0.0
 
 
-# Try yfinance for market data
-try:
-    import yfinance as yf  # type: ignore
+# yfinance/numpy are imported on first use; agents that never fetch Yahoo
+# quotes or compute risk skip that import cost entirely
+from utils.lazy_imports import lazy_import, module_available  # noqa: E402
 
-    HAS_YFINANCE = True
-except ImportError:
+yf = lazy_import("yfinance")
+HAS_YFINANCE = module_available("yfinance")
+if not HAS_YFINANCE:
     print("⚠️  Install yfinance: pip install yfinance")
-    HAS_YFINANCE = False
 
-try:
-    import numpy as np  # type: ignore
-
-    HAS_NUMPY = True
-except ImportError:
-    HAS_NUMPY = False
+np = lazy_import("numpy")
+HAS_NUMPY = module_available("numpy")
+if not HAS_NUMPY:
     print("⚠️  Install numpy: pip install numpy")
 
 # Track recent bid/ask spreads (percent) for liquidity risk
@@ -204,6 +217,10 @@ def send_telegram(
             mode_display = f"{emoji} Mode: {mode}"
             text = f"{mode_display}\n{text}"
 
+    if HAS_NOTIFICATION_DISPATCHER:
+        get_dispatcher().notify(text, chat_id=chat_id)
+        return
+
     try:
         import urllib.parse
         import urllib.request
@@ -1269,10 +1286,13 @@ def load_allocations() -> dict[str, float]:
         return valid
 
     for path, label in candidate_files:
-        if not path.exists():
-            continue
         try:
-            data = json.loads(path.read_text())
+            if label == "allocations_override" and HAS_STATE_BUS:
+                data = get_state_bus().latest("allocations")
+            elif path.exists():
+                data = json.loads(path.read_text())
+            else:
+                continue
             allocations = data.get("allocations", {}) if isinstance(data, dict) else {}
             if isinstance(allocations, dict) and allocations:
                 valid_symbols = extract_valid_symbols(allocations)
@@ -1325,7 +1345,14 @@ def load_allocations() -> dict[str, float]:
 def load_brain() -> dict[str, float]:
     """Load orchestrator brain state."""
     brain_file = ROOT / "runtime" / "atlas_brain.json"
-    if brain_file.exists():
+    if HAS_STATE_BUS:
+        brain = get_state_bus().latest("brain")
+        if isinstance(brain, dict):
+            brain = dict(brain)  # don't mutate the bus cache
+            if brain.get("confidence", 0.5) < 0.1:
+                brain["confidence"] = 0.5
+            return brain
+    elif brain_file.exists():
         try:
             brain = json.loads(brain_file.read_text())
             # Ensure confidence is reasonable (not too low)
@@ -1874,6 +1901,8 @@ def main():
     strategy_manager = None
     strategy_executor = None
     signal_generator_cache = {}  # Cache per symbol
+    rl_policy = None  # Batched RL policy service (opt-in via NEOLIGHT_RL_POLICY)
+    rl_decisions: dict[str, dict[str, Any]] = {}
     portfolio_optimization_cycle = int(
         os.getenv("PORTFOLIO_OPT_CYCLE", "100")
     )  # Rebalance every N cycles
@@ -1886,6 +1915,16 @@ def main():
     last_risk_notification_time = 0.0
     last_risk_snapshot = ""
 
+    # Phase 3700-3900: one batched policy pass per loop instead of per-symbol inference
+    if os.getenv("NEOLIGHT_RL_POLICY", "false").lower() == "true":
+        try:
+            from ai.rl_inference import RLPolicyService
+
+            rl_policy = RLPolicyService()
+            logger.info("✅ RL policy service enabled (batched, hot-reloading)")
+        except Exception as e:
+            logger.warning(f"⚠️ RL policy service unavailable: {e}")
+
     # Initialize Portfolio Core modules with graceful degradation
     try:
         import pandas as pd  # type: ignore
@@ -2357,6 +2396,20 @@ def main():
                     ),
                 )
 
+                # Score the whole universe in one forward pass (uses last loop's histories)
+                if rl_policy is not None:
+                    try:
+                        rl_decisions = rl_policy.decide(
+                            {
+                                rl_sym: state["price_history"][rl_sym]
+                                for rl_sym in symbol_priority
+                                if len(state["price_history"].get(rl_sym, ())) >= 20
+                            }
+                        )
+                    except Exception as e:
+                        logger.debug(f"⚠️ RL policy batch failed: {e}")
+                        rl_decisions = {}
+
                 for sym in symbol_priority:
                     # Circuit breaker check for quote fetching
                     if not quote_breaker.can_proceed():
@@ -2608,6 +2661,9 @@ def main():
                     )
                     if signal_meta is None:
                         signal_meta = {}
+                    if sym in rl_decisions:
+                        signal_meta["rl_strategy"] = rl_decisions[sym]["strategy"]
+                        signal_meta["rl_confidence"] = rl_decisions[sym]["confidence"]
 
                     # CRYPTO: Force BUY if RSI < 75 and no position (FINAL - override everything)
                     # Made more aggressive to match signal generation logic
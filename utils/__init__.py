@@ -2,8 +2,14 @@
 World-Class Stability Utilities
 --------------------------------
 Circuit breakers, retry logic, health checks, state management, and structured logging.
+
+The supervisor, state bus, LLM gateway, notification dispatcher and order
+store pull in asyncio, requests and multiprocessing, so they are exported
+lazily: `import utils` stays cheap until one of them is used.
 """
 
+import importlib
+
 from .circuit_breaker import CircuitBreaker, CircuitBreakerOpen, CircuitState
 from .health_check import (
     HealthCheck,
@@ -12,6 +18,7 @@ from .health_check import (
     check_file_exists,
     check_process_running,
 )
+from .lazy_imports import lazy_import, module_available
 from .retry import RetryStrategy, retry_on_api_error, retry_on_network_error, retry_with_backoff
 from .state_manager import StateManager, load_state_safe, save_state_safe
 from .structured_logging import (
@@ -21,6 +28,31 @@ from .structured_logging import (
     setup_structured_logging,
 )
 
+# Exported name -> submodule, imported on first access (see module docstring)
+_LAZY_EXPORTS = {
+    "AgentSpec": "agent_supervisor",
+    "AgentSupervisor": "agent_supervisor",
+    "RestartPolicy": "agent_supervisor",
+    "LLMGateway": "llm_gateway",
+    "get_gateway": "llm_gateway",
+    "NotificationDispatcher": "notification_dispatcher",
+    "get_dispatcher": "notification_dispatcher",
+    "OrderStore": "order_store",
+    "StateBus": "state_bus",
+    "StateBusBroker": "state_bus",
+    "get_state_bus": "state_bus",
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
 __all__ = [
     # Circuit breaker
     "CircuitBreaker",
@@ -37,10 +69,28 @@ __all__ = [
     "check_process_running",
     "check_file_exists",
     "check_api_endpoint",
+    # Agent supervision
+    "AgentSupervisor",
+    "AgentSpec",
+    "RestartPolicy",
     # State management
     "StateManager",
+    "OrderStore",
     "load_state_safe",
     "save_state_safe",
+    # State bus
+    "StateBus",
+    "StateBusBroker",
+    "get_state_bus",
+    # Lazy imports
+    "lazy_import",
+    "module_available",
+    # LLM gateway
+    "LLMGateway",
+    "get_gateway",
+    # Notifications
+    "NotificationDispatcher",
+    "get_dispatcher",
     # Logging
     "setup_structured_logging",
     "log_with_context",
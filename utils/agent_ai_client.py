@@ -6,10 +6,17 @@ Supports Ollama (unlimited) and RapidAPI (500/month) with smart routing
 import json
 import logging
 import os
-import time
+import sys
+from collections.abc import Iterator
 from pathlib import Path
 from typing import Any
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from utils.llm_gateway import RAPIDAPI_MONTHLY_LIMIT, RAPIDAPI_USAGE_FILE, get_gateway  # noqa: E402
+
 logger = logging.getLogger("agent_ai")
 
 # Try to import requests
@@ -27,63 +34,61 @@ RAPIDAPI_KEY = os.getenv("RAPIDAPI_KEY", "f89c81c096msh0e367842c4a9cedp172050jsn
 RAPIDAPI_LLAMA_URL = "https://open-ai21.p.rapidapi.com/conversationllama"
 RAPIDAPI_CLAUDE_URL = "https://claude-ai-all-models.p.rapidapi.com/chat/completions"
 
-# Track RapidAPI usage
-_rapidapi_usage_file = Path(__file__).parent.parent / "runtime" / "rapidapi_usage.json"
-RAPIDAPI_MONTHLY_LIMIT = 500
+# RapidAPI usage is counted in memory by the LLM gateway and persisted periodically
+_rapidapi_usage_file = RAPIDAPI_USAGE_FILE
+
+
+def _rapidapi_quota():
+    return get_gateway().quotas["rapidapi"]
 
 
 def load_rapidapi_usage() -> dict[str, Any]:
     """Load RapidAPI usage tracking"""
-    if _rapidapi_usage_file.exists():
-        try:
-            return json.loads(_rapidapi_usage_file.read_text())
-        except Exception:
-            pass
-    return {"month": None, "count": 0}
+    return _rapidapi_quota().usage()
 
 
 def save_rapidapi_usage(usage: dict[str, Any]) -> None:
     """Save RapidAPI usage tracking"""
-    try:
-        _rapidapi_usage_file.parent.mkdir(parents=True, exist_ok=True)
-        _rapidapi_usage_file.write_text(json.dumps(usage, indent=2))
-    except Exception as e:
-        logger.warning(f"⚠️ Could not save RapidAPI usage: {e}")
+    _rapidapi_quota().set(usage)
 
 
 def check_rapidapi_quota() -> tuple[bool, int]:
     """Check if RapidAPI quota is available"""
-    usage = load_rapidapi_usage()
-    current_month = time.strftime("%Y-%m")
-
-    # Reset if new month
-    if usage.get("month") != current_month:
-        usage = {"month": current_month, "count": 0}
-        save_rapidapi_usage(usage)
-
-    count = usage.get("count", 0)
-    available = count < RAPIDAPI_MONTHLY_LIMIT
-    remaining = max(0, RAPIDAPI_MONTHLY_LIMIT - count)
-
-    return available, remaining
+    return _rapidapi_quota().check()
 
 
 def increment_rapidapi_usage() -> None:
     """Increment RapidAPI usage counter"""
-    usage = load_rapidapi_usage()
-    usage["count"] = usage.get("count", 0) + 1
-    save_rapidapi_usage(usage)
+    _rapidapi_quota().increment()
+
 
+def _ollama_request(prompt: str, model: str, stream: bool) -> dict[str, Any]:
+    return {
+        "model": model,
+        "prompt": prompt,
+        "stream": stream,
+        "options": {
+            "temperature": 0.7,
+            "top_p": 0.9,
+        }
+    }
 
-def query_ollama(prompt: str, model: str = OLLAMA_MODEL, timeout: int = 30) -> str | None:
+
+def query_ollama(
+    prompt: str, model: str = OLLAMA_MODEL, timeout: int = 30, use_cache: bool = True
+) -> str | None:
     """
     Query Ollama for AI analysis (unlimited, local).
-    
+
+    Responses are cached by the LLM gateway, identical concurrent prompts
+    share one request, and Ollama is skipped for a cooldown after it fails.
+
     Args:
         prompt: The prompt/question
         model: Ollama model name (default: deepseek-r1:7b)
         timeout: Request timeout in seconds
-    
+        use_cache: Return a cached response for a repeated prompt
+
     Returns:
         Response text or None if failed
     """
@@ -91,28 +96,19 @@ def query_ollama(prompt: str, model: str = OLLAMA_MODEL, timeout: int = 30) -> s
         logger.warning("⚠️ requests not available - cannot query Ollama")
         return None
 
-    try:
-        response = requests.post(
+    gateway = get_gateway()
+
+    def fetch() -> str | None:
+        response = gateway.session.post(
             f"{OLLAMA_BASE_URL}/api/generate",
-            json={
-                "model": model,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.7,
-                    "top_p": 0.9,
-                }
-            },
+            json=_ollama_request(prompt, model, stream=False),
             timeout=timeout
         )
+        response.raise_for_status()  # HTTP errors count against Ollama's health
+        return response.json().get("response", "").strip()
 
-        if response.status_code == 200:
-            result = response.json()
-            return result.get("response", "").strip()
-        else:
-            logger.warning(f"⚠️ Ollama request failed: {response.status_code}")
-            return None
-
+    try:
+        return gateway.complete("ollama", prompt, fetch, model=model, use_cache=use_cache)
     except requests.exceptions.ConnectionError:
         logger.warning("⚠️ Ollama not running - start with: ollama serve")
         return None
@@ -121,54 +117,90 @@ def query_ollama(prompt: str, model: str = OLLAMA_MODEL, timeout: int = 30) -> s
         return None
 
 
+def stream_ollama(prompt: str, model: str = OLLAMA_MODEL, timeout: int = 30) -> Iterator[str]:
+    """
+    Stream an Ollama response token by token.
+
+    Args:
+        prompt: The prompt/question
+        model: Ollama model name
+        timeout: Connect/read timeout in seconds
+
+    Yields:
+        Response text chunks as they are generated (a cached response is
+        yielded whole)
+    """
+    if not HAS_REQUESTS:
+        logger.warning("⚠️ requests not available - cannot query Ollama")
+        return
+
+    gateway = get_gateway()
+
+    def chunks() -> Iterator[str]:
+        with gateway.session.post(
+            f"{OLLAMA_BASE_URL}/api/generate",
+            json=_ollama_request(prompt, model, stream=True),
+            timeout=timeout,
+            stream=True,
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                event = json.loads(line)
+                if event.get("response"):
+                    yield event["response"]
+                if event.get("done"):
+                    break
+
+    yield from gateway.stream("ollama", prompt, chunks, model=model)
+
+
+def _rapidapi_post(url: str, host: str, payload: dict[str, Any], timeout: int) -> Any:
+    response = get_gateway().session.post(
+        url,
+        headers={
+            "x-rapidapi-host": host,
+            "x-rapidapi-key": RAPIDAPI_KEY,
+            "Content-Type": "application/json"
+        },
+        json=payload,
+        timeout=timeout
+    )
+    response.raise_for_status()  # HTTP errors count against RapidAPI's health
+    return response.json()
+
+
 def query_rapidapi_llama(prompt: str, timeout: int = 30) -> str | None:
     """
     Query RapidAPI Llama 3.3 70B (500/month limit).
-    
+
+    Cached responses do not count against the quota.
+
     Args:
         prompt: The prompt/question
         timeout: Request timeout in seconds
-    
+
     Returns:
         Response text or None if failed
     """
     if not HAS_REQUESTS:
         return None
 
-    # Check quota
-    available, remaining = check_rapidapi_quota()
-    if not available:
-        logger.warning(f"⚠️ RapidAPI quota exhausted ({RAPIDAPI_MONTHLY_LIMIT}/month)")
-        return None
-
-    try:
-        response = requests.post(
+    def fetch() -> str | None:
+        result = _rapidapi_post(
             RAPIDAPI_LLAMA_URL,
-            headers={
-                "x-rapidapi-host": "open-ai21.p.rapidapi.com",
-                "x-rapidapi-key": RAPIDAPI_KEY,
-                "Content-Type": "application/json"
-            },
-            json={
-                "messages": [{"role": "user", "content": prompt}],
-                "web_access": False
-            },
-            timeout=timeout
+            "open-ai21.p.rapidapi.com",
+            {"messages": [{"role": "user", "content": prompt}], "web_access": False},
+            timeout,
         )
+        # Parse response (format may vary)
+        if isinstance(result, dict):
+            return result.get("response") or result.get("message") or str(result)
+        return str(result)
 
-        if response.status_code == 200:
-            result = response.json()
-            increment_rapidapi_usage()
-            logger.debug(f"✅ RapidAPI used ({remaining - 1} remaining this month)")
-
-            # Parse response (format may vary)
-            if isinstance(result, dict):
-                return result.get("response") or result.get("message") or str(result)
-            return str(result)
-        else:
-            logger.warning(f"⚠️ RapidAPI request failed: {response.status_code}")
-            return None
-
+    try:
+        return get_gateway().complete("rapidapi", prompt, fetch, model="llama-3.3-70b")
     except Exception as e:
         logger.warning(f"⚠️ RapidAPI query failed: {e}")
         return None
@@ -177,55 +209,36 @@ def query_rapidapi_llama(prompt: str, timeout: int = 30) -> str | None:
 def query_rapidapi_claude(prompt: str, model: str = "claude-sonnet-4", timeout: int = 30) -> str | None:
     """
     Query RapidAPI Claude (500/month limit).
-    
+
+    Cached responses do not count against the quota.
+
     Args:
         prompt: The prompt/question
         model: Claude model name (default: claude-sonnet-4)
         timeout: Request timeout in seconds
-    
+
     Returns:
         Response text or None if failed
     """
     if not HAS_REQUESTS:
         return None
 
-    # Check quota
-    available, remaining = check_rapidapi_quota()
-    if not available:
-        logger.warning(f"⚠️ RapidAPI quota exhausted ({RAPIDAPI_MONTHLY_LIMIT}/month)")
-        return None
-
-    try:
-        response = requests.post(
+    def fetch() -> str | None:
+        result = _rapidapi_post(
             RAPIDAPI_CLAUDE_URL,
-            headers={
-                "x-rapidapi-host": "claude-ai-all-models.p.rapidapi.com",
-                "x-rapidapi-key": RAPIDAPI_KEY,
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": model,
-                "messages": [{"role": "user", "content": prompt}],
-                "max_tokens": 1000
-            },
-            timeout=timeout
+            "claude-ai-all-models.p.rapidapi.com",
+            {"model": model, "messages": [{"role": "user", "content": prompt}], "max_tokens": 1000},
+            timeout,
         )
+        # Parse response
+        if isinstance(result, dict):
+            if "choices" in result and len(result["choices"]) > 0:
+                return result["choices"][0].get("message", {}).get("content", "")
+            return result.get("response") or result.get("message") or str(result)
+        return str(result)
 
-        if response.status_code == 200:
-            result = response.json()
-            increment_rapidapi_usage()
-            logger.debug(f"✅ RapidAPI Claude used ({remaining - 1} remaining this month)")
-
-            # Parse response
-            if isinstance(result, dict):
-                if "choices" in result and len(result["choices"]) > 0:
-                    return result["choices"][0].get("message", {}).get("content", "")
-                return result.get("response") or result.get("message") or str(result)
-            return str(result)
-        else:
-            logger.warning(f"⚠️ RapidAPI Claude request failed: {response.status_code}")
-            return None
-
+    try:
+        return get_gateway().complete("rapidapi", prompt, fetch, model=model)
     except Exception as e:
         logger.warning(f"⚠️ RapidAPI Claude query failed: {e}")
         return None
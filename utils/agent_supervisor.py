@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+"""
+Agent Supervisor
+----------------
+Runs the agent fleet from one asyncio supervisor instead of one cold Python
+interpreter per agent.
+
+Features:
+- Script agents fork from a forkserver that has the heavy imports (numpy,
+  pandas, sklearn, torch) preloaded, so children share those pages
+  copy-on-write and skip the import cost
+- Cooperative agents (callables run every `cadence` seconds) share one thread
+  pool and are dispatched by due time, then priority
+- Agent stdout/stderr is drained asynchronously into per-agent ring buffers
+  and the logger
+- Restart policies with exponential back-off
+- Per-agent RSS and CPU budgets
+- Dependency-ordered startup instead of fixed sleeps
+"""
+
+import asyncio
+import contextlib
+import heapq
+import importlib
+import importlib.util
+import logging
+import multiprocessing
+import os
+import runpy
+import sys
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRELOAD = ("numpy", "pandas", "scipy", "sklearn", "torch", "requests")
+LOG_LINES_KEPT = 500
+MAX_LOG_LINE = 64 * 1024
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+@dataclass
+class RestartPolicy:
+    """Exponential back-off restart policy."""
+
+    max_restarts: int = 5
+    backoff_base: float = 1.0
+    backoff_max: float = 300.0
+    reset_after: float = 600.0  # a run at least this long clears the failure streak
+
+    def delay(self, failures: int) -> float:
+        """Back-off before the restart that follows `failures` consecutive failures."""
+        return min(self.backoff_max, self.backoff_base * 2 ** max(failures - 1, 0))
+
+
+@dataclass
+class AgentSpec:
+    """
+    One supervised agent.
+
+    Exactly one of `script` (run as __main__ in a forked worker process) or
+    `target` (a callable or "module:function" run in-process every `cadence`
+    seconds) must be set.
+    """
+
+    name: str
+    script: Path | None = None
+    target: str | Callable[[], Any] | None = None
+    cadence: float = 60.0
+    priority: int = 5
+    required: bool = False
+    description: str = ""
+    depends_on: tuple[str, ...] = ()
+    ready_after: float = 0.0  # seconds after start before dependants may start
+    ready_line: str | None = None  # or: ready once a log line contains this
+    restart: RestartPolicy = field(default_factory=RestartPolicy)
+    env: dict[str, str] = field(default_factory=dict)
+    max_rss_mb: float | None = None
+    max_cpu_percent: float | None = None  # of one core, per sample interval
+
+    def __post_init__(self):
+        if (self.script is None) == (self.target is None):
+            raise ValueError(f"Agent '{self.name}' needs exactly one of script or target")
+
+
+class _AgentRuntime:
+    """Mutable supervision state for one agent."""
+
+    def __init__(self, spec: AgentSpec, status: dict[str, Any]):
+        self.spec = spec
+        self.status = status
+        self.logs: deque[str] = deque(maxlen=LOG_LINES_KEPT)
+        self.ready = asyncio.Event()
+        self.process: multiprocessing.process.BaseProcess | None = None
+        self.func: Callable[[], Any] | None = None
+        self.failures = 0
+        self.restarts = 0
+        self.runs = 0
+        self.kill_reason: str | None = None
+
+    def update(self, **fields: Any) -> None:
+        self.status.update(fields)
+
+
+def _run_script(script: str, cwd: str, env: dict[str, str], log_writer: Any) -> None:
+    """Worker entry point: route output to the supervisor pipe and run the script."""
+    fd = log_writer.fileno()
+    os.dup2(fd, 1)
+    os.dup2(fd, 2)
+    log_writer.close()
+    sys.stdout = open(1, "w", buffering=1, errors="replace", closefd=False)  # noqa: SIM115
+    sys.stderr = open(2, "w", buffering=1, errors="replace", closefd=False)  # noqa: SIM115
+
+    os.environ.update(env)
+    os.chdir(cwd)
+    for path in reversed(env.get("PYTHONPATH", "").split(os.pathsep)):
+        if path and path not in sys.path:
+            sys.path.insert(0, path)
+    sys.path.insert(0, str(Path(script).parent))
+    sys.argv = [script]
+    runpy.run_path(script, run_name="__main__")
+
+
+def _timed_call(func: Callable[[], Any]) -> float:
+    """Run func on a pool thread; returns the thread CPU seconds it used."""
+    start = time.thread_time()
+    func()
+    return time.thread_time() - start
+
+
+def _resolve_target(target: str | Callable[[], Any]) -> Callable[[], Any]:
+    if callable(target):
+        return target
+    module_name, _, attr = target.partition(":")
+    return getattr(importlib.import_module(module_name), attr or "main")
+
+
+def read_process_usage(pid: int) -> tuple[float, float] | None:
+    """
+    Resident memory and cumulative CPU time of a process from /proc.
+
+    Returns:
+        (rss_mb, cpu_seconds), or None where /proc is unavailable
+    """
+    try:
+        with open(f"/proc/{pid}/stat", encoding="ascii") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/statm", encoding="ascii") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    cpu_seconds = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / 2**20, cpu_seconds
+
+
+class _LogPipe(asyncio.Protocol):
+    """Splits a worker's output pipe into lines."""
+
+    def __init__(self, sink: Callable[[str], None], closed: asyncio.Future):
+        self._sink = sink
+        self._closed = closed
+        self._partial = b""
+
+    def data_received(self, data: bytes) -> None:
+        lines = (self._partial + data).split(b"\n")
+        self._partial = lines.pop()
+        if len(self._partial) > MAX_LOG_LINE:
+            lines.append(self._partial)
+            self._partial = b""
+        for line in lines:
+            self._sink(line.decode(errors="replace"))
+
+    def connection_lost(self, exc: Exception | None) -> None:  # noqa: ARG002
+        if self._partial:
+            self._sink(self._partial.decode(errors="replace"))
+        if not self._closed.done():
+            self._closed.set_result(None)
+
+
+class AgentSupervisor:
+    """
+    Supervises script agents (forked workers) and cooperative agents (pooled callables).
+
+    Must be started and stopped from a running asyncio event loop.
+    """
+
+    def __init__(
+        self,
+        specs: list[AgentSpec],
+        cwd: Path | None = None,
+        base_env: dict[str, str] | None = None,
+        start_method: str | None = None,
+        preload: tuple[str, ...] = DEFAULT_PRELOAD,
+        inline_workers: int = 4,
+        sample_interval: float = 5.0,
+    ):
+        """
+        Initialize supervisor.
+
+        Args:
+            specs: Agents to supervise
+            cwd: Working directory for script agents
+            base_env: Environment applied to every script agent (before spec.env)
+            start_method: multiprocessing start method (default forkserver where
+                available, else spawn)
+            preload: Modules the forkserver imports once for all workers
+                (missing ones are skipped)
+            inline_workers: Thread pool size for cooperative agents
+            sample_interval: Seconds between RSS/CPU samples of worker processes
+        """
+        self.cwd = Path(cwd or os.getcwd())
+        self.base_env = dict(base_env or {})
+        self.sample_interval = sample_interval
+        self.status: dict[str, dict[str, Any]] = {}
+        self._agents: dict[str, _AgentRuntime] = {}
+        for spec in sorted(specs, key=lambda s: s.priority):
+            self.status[spec.name] = {"status": "pending", "pid": None, "restarts": 0}
+            self._agents[spec.name] = _AgentRuntime(spec, self.status[spec.name])
+
+        methods = multiprocessing.get_all_start_methods()
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in methods else "spawn"
+        self._context = multiprocessing.get_context(start_method)
+        if start_method == "forkserver":
+            modules = [m for m in preload if importlib.util.find_spec(m) is not None]
+            self._context.set_forkserver_preload([__name__, *modules])
+        self.start_method = start_method
+
+        self.inline_workers = inline_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=inline_workers, thread_name_prefix="agent-inline"
+        )
+        self._slots: asyncio.Semaphore | None = None
+        self._queue: list[tuple[float, int, int, str]] = []
+        self._queue_seq = 0
+        self._wakeup: asyncio.Event | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._stopping = False
+
+    # ---------------------------------------------------------------- lifecycle
+
+    async def start(self) -> None:
+        """Start every agent (dependants wait for their dependencies to be ready)."""
+        self._slots = asyncio.Semaphore(self.inline_workers)
+        self._wakeup = asyncio.Event()
+        if any(agent.spec.target is not None for agent in self._agents.values()):
+            self._tasks.append(asyncio.create_task(self._inline_loop(), name="agent-scheduler"))
+        for agent in self._agents.values():
+            self._tasks.append(
+                asyncio.create_task(self._supervise(agent), name=f"agent-{agent.spec.name}")
+            )
+        logger.info(
+            f"🚀 Supervising {len(self._agents)} agents (start method: {self.start_method})"
+        )
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Terminate workers, cancel schedules and wait for in-flight callables."""
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+        processes = [a.process for a in self._agents.values() if a.process is not None]
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in processes:
+            await asyncio.to_thread(process.join, max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
+                await asyncio.to_thread(process.join, 1.0)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        await asyncio.to_thread(self._executor.shutdown, True)
+        for agent in self._agents.values():
+            if agent.status.get("status") not in ("failed", "error"):
+                agent.update(status="stopped", pid=None)
+        logger.info("🛑 Agent supervisor stopped")
+
+    # ------------------------------------------------------------------ queries
+
+    def logs(self, name: str, lines: int = 100) -> list[str]:
+        """Most recent output lines of an agent."""
+        agent = self._agents.get(name)
+        if agent is None:
+            return []
+        return list(agent.logs)[-lines:]
+
+    def process(self, name: str) -> multiprocessing.process.BaseProcess | None:
+        agent = self._agents.get(name)
+        return agent.process if agent else None
+
+    def is_ready(self, name: str) -> bool:
+        agent = self._agents.get(name)
+        return agent is not None and agent.ready.is_set()
+
+    async def wait_ready(self, names: list[str] | None = None, timeout: float | None = None):
+        """Wait until the given agents (default all) are ready."""
+        agents = [self._agents[n] for n in (names or list(self._agents))]
+        await asyncio.wait_for(asyncio.gather(*(a.ready.wait() for a in agents)), timeout)
+
+    # ------------------------------------------------------------- supervision
+
+    async def _supervise(self, agent: _AgentRuntime) -> None:
+        spec = agent.spec
+        for dependency in spec.depends_on:
+            if dependency not in self._agents:
+                logger.warning(f"⚠️ {spec.name}: unknown dependency '{dependency}' ignored")
+                continue
+            agent.update(status="waiting", waiting_for=dependency)
+            await self._agents[dependency].ready.wait()
+        agent.status.pop("waiting_for", None)
+
+        if spec.target is not None:
+            agent.update(status="running", started_at=time.time())
+            agent.ready.set()
+            self._schedule(agent, time.monotonic())
+            return
+
+        if not spec.script.exists():
+            logger.error(f"❌ {spec.name}: script not found: {spec.script}")
+            agent.update(status="error", message=f"Script not found: {spec.script}")
+            agent.ready.set()  # don't block dependants on a missing optional script
+            return
+
+        while not self._stopping:
+            started = time.monotonic()
+            try:
+                exit_code = await self._run_worker(agent)
+            except Exception as e:
+                logger.error(f"❌ Error running {spec.name}: {e}")
+                agent.update(status="error", message=str(e), pid=None)
+                exit_code = None
+            if self._stopping:
+                return
+
+            if time.monotonic() - started >= spec.restart.reset_after:
+                agent.failures = 0
+            agent.failures += 1
+            agent.restarts += 1
+            reason = agent.kill_reason or f"exit code {exit_code}"
+            agent.update(
+                status="stopped",
+                pid=None,
+                exit_code=exit_code,
+                reason=reason,
+                restarts=agent.restarts,
+                last_restart=time.time(),
+            )
+            if agent.failures > spec.restart.max_restarts:
+                logger.error(f"❌ {spec.name}: {agent.failures} failures in a row, giving up")
+                agent.update(status="failed")
+                agent.ready.set()
+                return
+            delay = spec.restart.delay(agent.failures)
+            logger.warning(
+                f"⚠️ {spec.name} stopped ({reason}); restart #{agent.restarts} in {delay:.1f}s"
+            )
+            agent.update(status="backoff", restart_in=delay)
+            await asyncio.sleep(delay)
+
+    async def _run_worker(self, agent: _AgentRuntime) -> int | None:
+        """Run one worker process to completion; returns its exit code."""
+        spec = agent.spec
+        loop = asyncio.get_running_loop()
+        env = {**self.base_env, **spec.env}
+
+        reader, writer = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_run_script,
+            args=(str(spec.script), str(self.cwd), env, writer),
+            name=f"agent-{spec.name}",
+        )
+        await asyncio.to_thread(process.start)
+        writer.close()
+        agent.process = process
+        agent.kill_reason = None
+        agent.update(status="running", pid=process.pid, started_at=time.time())
+        logger.info(f"✅ {spec.name} started (PID: {process.pid})")
+
+        def sink(line: str) -> None:
+            agent.logs.append(line)
+            logger.info(f"[{spec.name}] {line}")
+            if spec.ready_line and spec.ready_line in line:
+                agent.ready.set()
+
+        pipe_closed = loop.create_future()
+        pipe = os.fdopen(os.dup(reader.fileno()), "rb", buffering=0)
+        reader.close()
+        transport, _ = await loop.connect_read_pipe(lambda: _LogPipe(sink, pipe_closed), pipe)
+
+        exited = loop.create_future()
+        loop.add_reader(process.sentinel, lambda: exited.done() or exited.set_result(None))
+        tasks = [asyncio.create_task(self._watch_budget(agent, process))]
+        if not spec.ready_line:
+            tasks.append(asyncio.create_task(self._mark_ready_after(agent, spec.ready_after)))
+        try:
+            await exited
+        finally:
+            loop.remove_reader(process.sentinel)
+            for task in tasks:
+                task.cancel()
+            # Output written just before exit is still in the pipe
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(asyncio.shield(pipe_closed), 1.0)
+            transport.close()
+        process.join(0)
+        return process.exitcode
+
+    async def _mark_ready_after(self, agent: _AgentRuntime, delay: float) -> None:
+        await asyncio.sleep(delay)
+        agent.ready.set()
+
+    async def _watch_budget(self, agent: _AgentRuntime, process: Any) -> None:
+        """Sample RSS/CPU and terminate the worker when it exceeds its budget."""
+        spec = agent.spec
+        previous = None
+        while process.is_alive():
+            usage = read_process_usage(process.pid)
+            if usage is None:
+                return
+            rss_mb, cpu_seconds = usage
+            now = time.monotonic()
+            cpu_percent = None
+            if previous is not None:
+                cpu_percent = 100 * (cpu_seconds - previous[1]) / max(now - previous[0], 1e-9)
+            previous = (now, cpu_seconds)
+            agent.update(rss_mb=round(rss_mb, 1), cpu_percent=cpu_percent)
+
+            if spec.max_rss_mb is not None and rss_mb > spec.max_rss_mb:
+                agent.kill_reason = f"rss budget exceeded ({rss_mb:.0f} MB)"
+            elif (
+                spec.max_cpu_percent is not None
+                and cpu_percent is not None
+                and cpu_percent > spec.max_cpu_percent
+            ):
+                agent.kill_reason = f"cpu budget exceeded ({cpu_percent:.0f}%)"
+            if agent.kill_reason:
+                logger.warning(f"⚠️ {spec.name}: {agent.kill_reason}, terminating")
+                process.terminate()
+                return
+            await asyncio.sleep(self.sample_interval)
+
+    # ------------------------------------------------------- cooperative agents
+
+    def _schedule(self, agent: _AgentRuntime, due: float) -> None:
+        self._queue_seq += 1
+        heapq.heappush(self._queue, (due, agent.spec.priority, self._queue_seq, agent.spec.name))
+        agent.update(next_run_in=round(max(0.0, due - time.monotonic()), 3))
+        self._wakeup.set()
+
+    async def _inline_loop(self) -> None:
+        """Dispatch due cooperative agents, earliest first, then by priority."""
+        loop = asyncio.get_running_loop()
+        while not self._stopping:
+            await self._slots.acquire()
+            while True:
+                self._wakeup.clear()
+                if self._stopping:
+                    self._slots.release()
+                    return
+                timeout = self._queue[0][0] - time.monotonic() if self._queue else None
+                if timeout is not None and timeout <= 0:
+                    break
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+
+            agent = self._agents[heapq.heappop(self._queue)[3]]
+            started = time.monotonic()
+            try:
+                if agent.func is None:
+                    agent.func = _resolve_target(agent.spec.target)
+                future = loop.run_in_executor(self._executor, _timed_call, agent.func)
+            except Exception as e:
+                future = loop.create_future()
+                future.set_exception(e)
+            future.add_done_callback(lambda f, a=agent, s=started: self._inline_done(a, s, f))
+
+    def _inline_done(self, agent: _AgentRuntime, started: float, future: asyncio.Future) -> None:
+        self._slots.release()
+        if self._stopping or future.cancelled():
+            return
+        spec = agent.spec
+        now = time.monotonic()
+        agent.runs += 1
+        error = future.exception()
+        if error is None:
+            agent.failures = 0
+            cpu_seconds = future.result()
+            interval = spec.cadence
+            if spec.max_cpu_percent:
+                # Stretch the cadence so the agent's CPU share stays within budget
+                interval = max(interval, 100 * cpu_seconds / spec.max_cpu_percent)
+            agent.update(
+                status="running",
+                runs=agent.runs,
+                last_run=time.time(),
+                last_duration=round(now - started, 6),
+                last_cpu_seconds=round(cpu_seconds, 6),
+            )
+            self._schedule(agent, started + interval)
+            return
+
+        agent.failures += 1
+        agent.restarts += 1
+        agent.logs.append(f"{type(error).__name__}: {error}")
+        agent.update(restarts=agent.restarts, message=str(error), last_restart=time.time())
+        if agent.failures > spec.restart.max_restarts:
+            logger.error(f"❌ {spec.name}: {agent.failures} failures in a row, giving up")
+            agent.update(status="failed")
+            return
+        delay = spec.restart.delay(agent.failures)
+        logger.warning(f"⚠️ {spec.name} raised {error!r}; retry in {delay:.1f}s")
+        agent.update(status="backoff", restart_in=delay)
+        self._schedule(agent, now + delay)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Lazy Imports
+------------
+Defer heavy optional dependencies (pandas, sklearn, torch, tensorflow, ...)
+until first use so agents that never touch them start fast.
+
+Usage:
+    np = lazy_import("numpy")
+    HAS_NUMPY = module_available("numpy")
+
+`module_available` only locates the package (no import), so the `HAS_*`
+flags keep their meaning without paying for the import. The module is
+imported the first time an attribute of the proxy is read; if that import
+fails, the ImportError surfaces there, at the point of use.
+"""
+
+import importlib
+import importlib.util
+import logging
+import sys
+import threading
+import types
+from collections.abc import Callable
+from functools import cache
+
+logger = logging.getLogger(__name__)
+
+_IMPORT_LOCK = threading.RLock()
+
+
+@cache
+def module_available(name: str) -> bool:
+    """
+    Whether a module can be imported, without importing it.
+
+    Only the top-level package is located (submodule lookups would import
+    the parent); already-imported modules count as available.
+
+    Args:
+        name: Dotted module name
+
+    Returns:
+        True if the package is installed
+    """
+    top = name.partition(".")[0]
+    if top in sys.modules:
+        return sys.modules[top] is not None
+    try:
+        return importlib.util.find_spec(top) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class LazyModule(types.ModuleType):
+    """Module proxy that imports the real module on first attribute access."""
+
+    def __init__(self, name: str, on_import: Callable[[types.ModuleType], None] | None = None):
+        super().__init__(name)
+        self.__dict__["_lazy_on_import"] = on_import
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is not None:
+            return module
+        with _IMPORT_LOCK:
+            module = self.__dict__["_lazy_module"]
+            if module is None:
+                module = importlib.import_module(self.__name__)
+                on_import = self.__dict__["_lazy_on_import"]
+                if on_import is not None:
+                    try:
+                        on_import(module)
+                    except Exception as e:
+                        logger.warning(f"⚠️ Post-import hook for {self.__name__} failed: {e}")
+                # Copy the namespace so later lookups skip __getattr__
+                self.__dict__.update(module.__dict__)
+                self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(
+    name: str, on_import: Callable[[types.ModuleType], None] | None = None
+) -> types.ModuleType:
+    """
+    Proxy for `import name` that defers the import to first use.
+
+    Args:
+        name: Dotted module name
+        on_import: Optional hook run once with the real module after import
+            (e.g. to silence a library's warnings or pin it to CPU)
+
+    Returns:
+        The module itself if already imported, else a LazyModule proxy
+    """
+    module = sys.modules.get(name)
+    if module is not None and not isinstance(module, LazyModule):
+        if on_import is not None:
+            on_import(module)
+        return module
+    return LazyModule(name, on_import)
+
+
+def is_loaded(module: types.ModuleType) -> bool:
+    """Whether a (possibly lazy) module has actually been imported."""
+    if isinstance(module, LazyModule):
+        return module.__dict__["_lazy_module"] is not None
+    return True
@@ -0,0 +1,613 @@
+#!/usr/bin/env python3
+"""
+LLM Gateway
+-----------
+Shared front door for LLM calls made by agents (Ollama, RapidAPI and the
+SDK providers used by the research assistant).
+
+Features:
+- Response cache on disk with TTL, keyed by the exact prompt and by a
+  normalized prompt (case, whitespace, timestamps, ids and addresses masked)
+- In-flight deduplication: identical concurrent prompts share one request
+- Pooled HTTP session, streaming token delivery and asyncio wrappers
+- In-memory quota counters persisted periodically
+- Per-provider latency EWMA and failure cooldown used to route requests
+"""
+
+import asyncio
+import atexit
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterator
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger("llm_gateway")
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+
+ROOT = Path(__file__).resolve().parents[1]
+RUNTIME = ROOT / "runtime"
+
+CACHE_FILE = RUNTIME / "llm_cache.jsonl"
+RAPIDAPI_USAGE_FILE = RUNTIME / "rapidapi_usage.json"
+RAPIDAPI_MONTHLY_LIMIT = 500
+
+CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "3600"))  # Seconds a response stays fresh
+CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "16"))  # Keep-alive connections per host
+QUOTA_FLUSH_INTERVAL = float(os.getenv("LLM_QUOTA_FLUSH_INTERVAL", "30"))
+
+# Volatile prompt content masked for the normalized cache key
+PROMPT_NOISE = [
+    (
+        re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?"),
+        "<ts>",
+    ),
+    (
+        re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.I),
+        "<uuid>",
+    ),
+    (re.compile(r"0x[0-9a-fA-F]+"), "<addr>"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Prompt with case, whitespace, timestamps, UUIDs and addresses normalized.
+
+    Numbers are kept: prices and indicator values change the answer.
+    """
+    text = prompt
+    for pattern, replacement in PROMPT_NOISE:
+        text = pattern.sub(replacement, text)
+    return text.casefold().strip()
+
+
+def cache_keys(
+    provider: str, model: str, prompt: str, params: dict[str, Any] | None = None
+) -> tuple[str, str]:
+    """Exact and normalized cache keys for one request."""
+    head = json.dumps([provider, model, params or {}], sort_keys=True)
+    exact = hashlib.sha1(f"{head}\0{prompt}".encode()).hexdigest()
+    normal = hashlib.sha1(f"{head}\0{normalize_prompt(prompt)}".encode()).hexdigest()
+    return exact, normal
+
+
+class ResponseCache:
+    """
+    TTL cache of LLM responses, in memory with an append-only JSONL file.
+
+    Each entry is reachable by its exact key and its normalized key; exact
+    matches win. The file is compacted once it holds twice the live entries.
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        ttl: float = CACHE_TTL,
+        max_entries: int = CACHE_MAX_ENTRIES,
+    ):
+        """
+        Initialize the cache and load unexpired entries from disk.
+
+        Args:
+            path: JSONL file backing the cache (memory only when None)
+            ttl: Default seconds an entry stays fresh
+            max_entries: Entries kept; the oldest are dropped beyond this
+        """
+        self.path = Path(path) if path else None
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._exact: dict[str, dict[str, Any]] = {}
+        self._normal: dict[str, dict[str, Any]] = {}
+        self._lines = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path or not self.path.exists():
+            return
+        now = time.time()
+        try:
+            with self.path.open() as f:
+                for line in f:
+                    self._lines += 1
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Torn final line from a crash
+                    if entry.get("expires", 0) > now:
+                        self._index(entry)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not load LLM cache: {e}")
+
+    def _index(self, entry: dict[str, Any]) -> None:
+        self._exact.pop(entry["key"], None)  # Re-insert so dict order stays oldest first
+        self._exact[entry["key"]] = entry
+        self._normal[entry["norm"]] = entry
+
+    def get(self, exact: str, normal: str | None = None) -> Any | None:
+        """Fresh cached value for the exact key, else the normalized key."""
+        now = time.time()
+        entry = self._exact.get(exact)
+        if entry is None and normal is not None:
+            entry = self._normal.get(normal)
+        if entry is None or entry["expires"] <= now:
+            return None
+        return entry["value"]
+
+    def put(self, exact: str, normal: str, value: Any, ttl: float | None = None) -> None:
+        """Store a JSON-serializable value under both keys."""
+        entry = {
+            "key": exact,
+            "norm": normal,
+            "expires": time.time() + (self.ttl if ttl is None else ttl),
+            "value": value,
+        }
+        with self._lock:
+            self._index(entry)
+            while len(self._exact) > self.max_entries:
+                oldest = self._exact.pop(next(iter(self._exact)))
+                if self._normal.get(oldest["norm"]) is oldest:
+                    del self._normal[oldest["norm"]]
+            if not self.path:
+                return
+            try:
+                if self._lines >= 2 * max(len(self._exact), 100):
+                    self._compact()
+                else:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    with self.path.open("a") as f:
+                        f.write(json.dumps(entry) + "\n")
+                    self._lines += 1
+            except (OSError, TypeError, ValueError) as e:
+                logger.warning(f"⚠️ Could not persist LLM cache entry: {e}")
+
+    def _compact(self) -> None:
+        now = time.time()
+        live = [e for e in self._exact.values() if e["expires"] > now]
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text("".join(json.dumps(e) + "\n" for e in live))
+        os.replace(tmp, self.path)
+        self._lines = len(live)
+
+    def clear(self) -> None:
+        """Drop all entries, in memory and on disk."""
+        with self._lock:
+            self._exact.clear()
+            self._normal.clear()
+            self._lines = 0
+            if self.path and self.path.exists():
+                self.path.unlink()
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+
+class QuotaCounter:
+    """
+    Monthly request quota counted in memory.
+
+    Increments are written out at most every `flush_interval` seconds (and at
+    exit). A flush adds the pending increments to the count on disk, so
+    processes sharing the file do not overwrite each other's usage.
+    """
+
+    def __init__(self, path: Path | None, limit: int, flush_interval: float = QUOTA_FLUSH_INTERVAL):
+        """
+        Initialize the counter from its usage file.
+
+        Args:
+            path: JSON file holding {"month": "YYYY-MM", "count": n}
+            limit: Requests allowed per calendar month
+            flush_interval: Minimum seconds between writes
+        """
+        self.path = Path(path) if path else None
+        self.limit = limit
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self.month, self.count = self._read()
+        atexit.register(self.flush)
+
+    def _read(self) -> tuple[str | None, int]:
+        if self.path and self.path.exists():
+            try:
+                usage = json.loads(self.path.read_text())
+                return usage.get("month"), int(usage.get("count", 0))
+            except (OSError, ValueError, TypeError):
+                pass
+        return None, 0
+
+    def _roll(self) -> None:
+        current = time.strftime("%Y-%m")
+        if self.month != current:
+            self.month, self.count, self._pending = current, 0, 0
+
+    def check(self) -> tuple[bool, int]:
+        """Whether a request is allowed, and how many remain this month."""
+        with self._lock:
+            self._roll()
+            remaining = max(0, self.limit - self.count)
+            return remaining > 0, remaining
+
+    def increment(self, n: int = 1) -> None:
+        """Count `n` requests; persists once the flush interval has passed."""
+        with self._lock:
+            self._roll()
+            self.count += n
+            self._pending += n
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def usage(self) -> dict[str, Any]:
+        """Current usage as stored on disk."""
+        with self._lock:
+            self._roll()
+            return {"month": self.month, "count": self.count}
+
+    def set(self, usage: dict[str, Any]) -> None:
+        """Replace the usage (e.g. a manual reset) and persist it."""
+        with self._lock:
+            self.month, self.count = usage.get("month"), int(usage.get("count", 0))
+            self._pending = 0
+            self._write()
+
+    def flush(self) -> None:
+        """Merge pending increments into the usage file."""
+        with self._lock:
+            if self.path is None:
+                self._pending = 0
+                return
+            month, count = self._read()
+            if month == self.month:
+                # Another process may have counted since we loaded
+                self.count = max(self.count, count + self._pending)
+            self._pending = 0
+            self._write()
+
+    def _write(self) -> None:
+        self._last_flush = time.monotonic()
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"month": self.month, "count": self.count}, indent=2))
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not save quota usage: {e}")
+
+
+class LatencyTracker:
+    """
+    Per-provider response-time EWMA and failure cooldown.
+
+    After consecutive failures a provider is skipped for a cooldown that
+    doubles with each failure (capped), so a dead local server costs one
+    connection error instead of one per request.
+    """
+
+    def __init__(self, alpha: float = 0.2, cooldown: float = 15.0, max_cooldown: float = 300.0):
+        self.alpha = alpha
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._stats: dict[str, dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, provider: str) -> dict[str, float]:
+        return self._stats.setdefault(
+            provider, {"ewma": 0.0, "calls": 0, "failures": 0, "retry_at": 0.0}
+        )
+
+    def record(self, provider: str, seconds: float) -> None:
+        """Record a successful call and its latency."""
+        with self._lock:
+            stats = self._get(provider)
+            stats["ewma"] = (
+                seconds
+                if not stats["calls"]
+                else stats["ewma"] + self.alpha * (seconds - stats["ewma"])
+            )
+            stats["calls"] += 1
+            stats["failures"] = 0
+            stats["retry_at"] = 0.0
+
+    def failure(self, provider: str) -> None:
+        """Record a failed call and start (or extend) its cooldown."""
+        with self._lock:
+            stats = self._get(provider)
+            stats["failures"] += 1
+            delay = min(self.cooldown * 2 ** (stats["failures"] - 1), self.max_cooldown)
+            stats["retry_at"] = time.monotonic() + delay
+
+    def healthy(self, provider: str) -> bool:
+        """False while the provider is cooling down after failures."""
+        stats = self._stats.get(provider)
+        return stats is None or time.monotonic() >= stats["retry_at"]
+
+    def latency(self, provider: str) -> float | None:
+        """Smoothed latency in seconds, None before the first success."""
+        stats = self._stats.get(provider)
+        return stats["ewma"] if stats and stats["calls"] else None
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        """Copy of the per-provider statistics."""
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+
+class LLMGateway:
+    """
+    Cached, deduplicated, latency-aware execution of LLM requests.
+
+    Callers supply the provider-specific request as a callable returning the
+    response, or None when the reply has no usable answer; the gateway decides
+    whether it runs. Only exceptions (transport and HTTP errors) count against
+    the provider's health; None is a miss that is neither cached nor penalized.
+    """
+
+    def __init__(
+        self,
+        cache_path: Path | None = CACHE_FILE,
+        ttl: float = CACHE_TTL,
+        quotas: dict[str, QuotaCounter] | None = None,
+        pool_size: int = POOL_SIZE,
+    ):
+        """
+        Initialize the gateway.
+
+        Args:
+            cache_path: JSONL response cache (memory only when None)
+            ttl: Default response TTL in seconds
+            quotas: Quota counters by provider name
+            pool_size: Keep-alive connections per host in the shared session
+        """
+        self.cache = ResponseCache(cache_path, ttl=ttl)
+        self.quotas = quotas or {}
+        self.latency = LatencyTracker()
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0}
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.session = None
+        if HAS_REQUESTS:
+            self.session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+
+    def route(self, providers: list[str]) -> list[str]:
+        """Order providers: healthy first, quota-limited last, then by latency.
+
+        Providers without a latency sample yet keep their configured order
+        ahead of measured ones, so each gets tried.
+        """
+
+        def key(name: str) -> tuple[bool, bool, float]:
+            latency = self.latency.latency(name)
+            return (not self.latency.healthy(name), name in self.quotas, latency or 0.0)
+
+        return sorted(providers, key=key)
+
+    def _join(self, normal: str) -> tuple[Future, bool]:
+        """The in-flight future for a prompt, and whether the caller leads it."""
+        with self._lock:
+            future = self._inflight.get(normal)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                return future, False
+            future = self._inflight[normal] = Future()
+            return future, True
+
+    def _leave(self, normal: str) -> None:
+        with self._lock:
+            self._inflight.pop(normal, None)
+
+    def _allowed(self, provider: str) -> bool:
+        if not self.latency.healthy(provider):
+            logger.debug(f"⚠️ {provider} cooling down after failures - skipping")
+            return False
+        quota = self.quotas.get(provider)
+        if quota is None:
+            return True
+        available, _ = quota.check()
+        if not available:
+            logger.warning(f"⚠️ {provider} quota exhausted ({quota.limit}/month)")
+        return available
+
+    def _succeeded(self, provider: str, started: float) -> None:
+        self.latency.record(provider, time.perf_counter() - started)
+        if provider in self.quotas:
+            self.quotas[provider].increment()
+
+    def complete(
+        self,
+        provider: str,
+        prompt: str,
+        fetch: Callable[[], Any],
+        *,
+        model: str = "",
+        params: dict[str, Any] | None = None,
+        ttl: float | None = None,
+        use_cache: bool = True,
+    ) -> Any | None:
+        """
+        Return the response for a prompt, calling `fetch` only when needed.
+
+        Args:
+            provider: Provider name (latency, quota and cache namespace)
+            prompt: Full prompt text sent to the model
+            fetch: Performs the request; returns the response, or None when
+                the reply has no usable answer, and raises on request errors
+            model: Model name (part of the cache key)
+            params: Generation parameters (part of the cache key)
+            ttl: Override the cache TTL for this response
+            use_cache: Skip the response cache (in-flight dedup still applies)
+
+        Returns:
+            The cached or fetched response, None without a usable answer,
+            while the provider cools down, or with its quota exhausted.
+            Exceptions from `fetch` start the provider's cooldown and
+            propagate to every caller waiting on the same prompt.
+        """
+        exact, normal = cache_keys(provider, model, prompt, params)
+        if use_cache:
+            cached = self.cache.get(exact, normal)
+            if cached is not None:
+                self.stats["hits"] += 1
+                return cached
+
+        future, leader = self._join(normal)
+        if not leader:
+            return future.result()
+        try:
+            self.stats["misses"] += 1
+            result = None
+            if self._allowed(provider):
+                started = time.perf_counter()
+                try:
+                    result = fetch()
+                except Exception:
+                    self.latency.failure(provider)
+                    raise
+                self._succeeded(provider, started)
+                if result is not None and use_cache:
+                    self.cache.put(exact, normal, result, ttl)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._leave(normal)
+
+    def stream(
+        self,
+        provider: str,
+        prompt: str,
+        chunks: Callable[[], Iterator[str]],
+        *,
+        model: str = "",
+        params: dict[str, Any] | None = None,
+        ttl: float | None = None,
+    ) -> Iterator[str]:
+        """
+        Yield response tokens as they arrive; the joined text is cached.
+
+        A cached response, or one already in flight for the same prompt, is
+        yielded as a single chunk. Concurrent complete() calls for the prompt
+        wait on the stream instead of issuing their own request.
+        """
+        exact, normal = cache_keys(provider, model, prompt, params)
+        cached = self.cache.get(exact, normal)
+        if cached is not None:
+            self.stats["hits"] += 1
+            yield cached
+            return
+
+        future, leader = self._join(normal)
+        if not leader:
+            result = future.result()
+            if result is not None:
+                yield result
+            return
+        self.stats["misses"] += 1
+        if not self._allowed(provider):
+            future.set_result(None)
+            self._leave(normal)
+            return
+        parts: list[str] = []
+        started = time.perf_counter()
+        try:
+            for chunk in chunks():
+                parts.append(chunk)
+                yield chunk
+        except GeneratorExit:
+            future.set_result(None)  # Consumer stopped early; nothing to share
+            self._leave(normal)
+            raise
+        except BaseException as e:
+            self.latency.failure(provider)
+            future.set_exception(e)
+            self._leave(normal)
+            raise
+        text = "".join(parts)
+        self._succeeded(provider, started)
+        self.cache.put(exact, normal, text, ttl)
+        future.set_result(text)
+        self._leave(normal)
+
+    async def acomplete(
+        self, provider: str, prompt: str, fetch: Callable[[], Any], **kwargs
+    ) -> Any:
+        """complete() without blocking the event loop."""
+        return await asyncio.to_thread(self.complete, provider, prompt, fetch, **kwargs)
+
+    async def astream(
+        self, provider: str, prompt: str, chunks: Callable[[], Iterator[str]], **kwargs
+    ) -> AsyncIterator[str]:
+        """stream() for asyncio consumers; the HTTP read runs in a worker thread."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        def pump() -> None:
+            try:
+                for chunk in self.stream(provider, prompt, chunks, **kwargs):
+                    loop.call_soon_threadsafe(queue.put_nowait, chunk)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        worker = loop.run_in_executor(None, pump)
+        while (item := await queue.get()) is not done:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+        await worker
+
+    def status(self) -> dict[str, Any]:
+        """Cache, dedup, quota and latency statistics."""
+        return {
+            **self.stats,
+            "cache_entries": len(self.cache),
+            "latency": self.latency.snapshot(),
+            "quotas": {name: q.usage() for name, q in self.quotas.items()},
+        }
+
+    def close(self) -> None:
+        """Flush quota counters and release pooled connections."""
+        for quota in self.quotas.values():
+            quota.flush()
+        if self.session is not None:
+            self.session.close()
+
+
+_gateway: LLMGateway | None = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> LLMGateway:
+    """Shared gateway, so the cache, pool and counters are per process."""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway(
+                quotas={"rapidapi": QuotaCounter(RAPIDAPI_USAGE_FILE, RAPIDAPI_MONTHLY_LIMIT)}
+            )
+        return _gateway
@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+Notification Dispatcher
+-----------------------
+Non-blocking Telegram alerts shared by agents and the trader.
+
+Features:
+- notify() only appends to a bounded in-memory queue; a background thread
+  sends over one pooled HTTP session
+- Alerts arriving within a short window are coalesced into one digest per
+  chat; identical alerts collapse into one line with a repeat count, and an
+  alert already sent to a chat within the dedupe window is suppressed
+- Token-bucket rate limit per chat; 429 responses are retried after the
+  server's retry_after
+- When the queue is full, or a digest still fails after retries, alerts
+  spill to a per-process JSONL file and are resent once the queue drains;
+  files left by exited processes are claimed (by atomic rename) and resent
+
+Usage:
+    get_dispatcher().notify("⚠️ Drawdown limit hit")
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger("notification_dispatcher")
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+
+ROOT = Path(__file__).resolve().parents[1]
+RUNTIME = ROOT / "runtime"
+
+SPILL_FILE = RUNTIME / "notification_spill.jsonl"
+TELEGRAM_API_URL = "https://api.telegram.org"
+MAX_MESSAGE_CHARS = 4096  # Telegram's sendMessage limit
+
+QUEUE_SIZE = int(os.getenv("NOTIFY_QUEUE_SIZE", "1000"))
+COALESCE_WINDOW = float(os.getenv("NOTIFY_COALESCE_WINDOW", "2"))  # Seconds gathered per digest
+DEDUPE_WINDOW = float(os.getenv("NOTIFY_DEDUPE_WINDOW", "60"))  # Repeat suppression, seconds
+CHAT_RATE = float(os.getenv("NOTIFY_CHAT_RATE", "1"))  # Messages per second per chat
+CHAT_BURST = int(os.getenv("NOTIFY_CHAT_BURST", "3"))
+
+
+@dataclass(slots=True)
+class Alert:
+    chat_id: str
+    text: str
+    parse_mode: str | None
+    created: float  # time.time(), so spilled alerts keep their age
+
+
+class TokenBucket:
+    """`rate` messages per second in bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = float(max(1, burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """Take a token; returns the seconds to wait before using it."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1.0
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+
+class NotificationDispatcher:
+    """Queues alerts and delivers them from a background sender."""
+
+    def __init__(
+        self,
+        token: str | None,
+        chat_id: str | None = None,
+        api_url: str = TELEGRAM_API_URL,
+        max_queue: int = QUEUE_SIZE,
+        coalesce_window: float = COALESCE_WINDOW,
+        dedupe_window: float = DEDUPE_WINDOW,
+        rate: float = CHAT_RATE,
+        burst: int = CHAT_BURST,
+        spill_path: Path | None = SPILL_FILE,
+        timeout: float = 10.0,
+        max_retries: int = 3,
+        retry_interval: float = 30.0,
+        max_age: float = 86400.0,
+    ):
+        """
+        Initialize dispatcher.
+
+        Args:
+            token: Bot token (None disables sending; notify() returns False)
+            chat_id: Default chat for notify()
+            api_url: Telegram Bot API base URL
+            max_queue: Alerts held in memory before spilling to disk
+            coalesce_window: Seconds to gather alerts into one digest
+            dedupe_window: Seconds an identical alert to a chat is suppressed
+            rate: Messages per second per chat
+            burst: Token-bucket size per chat
+            spill_path: Base JSONL path for overflow and undeliverable alerts;
+                each process appends to its own file, suffixed with its pid
+            timeout: HTTP timeout per request
+            max_retries: Attempts per digest after the first
+            retry_interval: Seconds before spilled alerts are retried after a failure
+            max_age: Spilled alerts older than this are dropped
+        """
+        self.token = token
+        self.chat_id = chat_id
+        self.api_url = api_url.rstrip("/")
+        self.max_queue = max_queue
+        self.coalesce_window = coalesce_window
+        self.dedupe_window = dedupe_window
+        self.rate = rate
+        self.burst = burst
+        self.spill_path = spill_path
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_interval = retry_interval
+        self.max_age = max_age
+        self.stats = dict.fromkeys(
+            [
+                "queued",
+                "sent",
+                "digests",
+                "coalesced",
+                "suppressed",
+                "spilled",
+                "restored",
+                "failed",
+            ],
+            0,
+        )
+
+        self._queue: deque[Alert] = deque()
+        self._cond = threading.Condition()
+        self._spill_lock = threading.Lock()
+        self._pending = 0  # Queued or being delivered
+        self._flushing = False
+        self._closing = False
+        self._next_restore = 0.0
+        self._recent: dict[tuple[str, str], float] = {}
+        self._buckets: dict[str, TokenBucket] = {}
+        self._thread: threading.Thread | None = None
+        self.session = None
+        if HAS_REQUESTS:
+            self.session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.token and self.session is not None)
+
+    def notify(self, text: str, chat_id: str | None = None, parse_mode: str | None = None) -> bool:
+        """
+        Queue an alert; returns immediately.
+
+        Returns:
+            False if sending is disabled (no token, chat or requests), else True
+        """
+        chat = chat_id or self.chat_id
+        if not (self.enabled and chat and text) or self._closing:
+            return False
+        alert = Alert(str(chat), text, parse_mode, time.time())
+        with self._cond:
+            if len(self._queue) >= self.max_queue:
+                overflow = True
+            else:
+                overflow = False
+                self._queue.append(alert)
+                self._pending += 1
+                self.stats["queued"] += 1
+                self._cond.notify()
+        if overflow:
+            self._spill([alert])
+        if self._thread is None:
+            self._start()
+        return True
+
+    def _start(self) -> None:
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="notification-dispatcher", daemon=True
+                )
+                self._thread.start()
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Send queued alerts now, without waiting out the coalescing window."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._flushing = True
+            self._cond.notify_all()
+            try:
+                while self._pending:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+                return True
+            finally:
+                self._flushing = False
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Deliver what is queued (up to timeout) and stop the sender."""
+        self.flush(timeout)
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    # ----- sender thread -----
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closing:
+                    if self._spill_ready():
+                        break
+                    self._cond.wait(self.retry_interval if self._has_spill() else None)
+                if self._closing and not self._queue:
+                    return
+                if self._queue:
+                    deadline = time.monotonic() + self.coalesce_window
+                    while not (self._flushing or self._closing):
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                batch = list(self._queue)
+                self._queue.clear()
+            try:
+                self._deliver(batch)
+            except Exception as e:
+                logger.warning(f"Notification delivery failed: {e}")
+            with self._cond:
+                self._pending -= len(batch)
+                self._cond.notify_all()
+            if self._spill_ready():
+                self._restore()
+
+    def _deliver(self, batch: list[Alert]) -> None:
+        groups: dict[tuple[str, str | None], dict[str, list[Alert]]] = {}
+        for alert in batch:
+            groups.setdefault((alert.chat_id, alert.parse_mode), {}).setdefault(
+                alert.text, []
+            ).append(alert)
+
+        now = time.monotonic()
+        if len(self._recent) > 10_000:
+            self._recent = {k: t for k, t in self._recent.items() if now - t < self.dedupe_window}
+        for (chat, mode), by_text in groups.items():
+            lines = []
+            for text, alerts in by_text.items():
+                sent = self._recent.get((chat, text))
+                if sent is not None and now - sent < self.dedupe_window:
+                    self.stats["suppressed"] += len(alerts)
+                    continue
+                self.stats["coalesced"] += len(alerts) - 1
+                lines.append((text if len(alerts) == 1 else f"{text}\n(×{len(alerts)})", alerts))
+            for chunk, alerts in self._digests(lines):
+                if not self._send(chat, mode, chunk):
+                    self._spill(alerts)
+                    self._next_restore = time.monotonic() + self.retry_interval
+                    continue
+                # Only delivered text counts as sent, so a spilled alert is not a duplicate later
+                sent_at = time.monotonic()
+                for alert in alerts:
+                    self._recent[(chat, alert.text)] = sent_at
+                if len(alerts) > 1:
+                    self.stats["digests"] += 1
+
+    def _digests(self, lines: list[tuple[str, list[Alert]]]):
+        """Message texts of at most MAX_MESSAGE_CHARS, with the alerts each carries."""
+        if len(lines) == 1:
+            text, alerts = lines[0]
+            yield text[:MAX_MESSAGE_CHARS], alerts
+            return
+        parts: list[str] = []
+        carried: list[Alert] = []
+        size = 0
+        for text, alerts in lines:
+            text = text[: MAX_MESSAGE_CHARS - 100]
+            if parts and size + len(text) + 2 > MAX_MESSAGE_CHARS - 100:
+                yield f"🔔 {len(parts)} alerts\n\n" + "\n\n".join(parts), carried
+                parts, carried, size = [], [], 0
+            parts.append(text)
+            carried.extend(alerts)
+            size += len(text) + 2
+        if parts:
+            yield f"🔔 {len(parts)} alerts\n\n" + "\n\n".join(parts), carried
+
+    def _send(self, chat: str, mode: str | None, text: str) -> bool:
+        bucket = self._buckets.setdefault(chat, TokenBucket(self.rate, self.burst))
+        payload: dict[str, Any] = {"chat_id": chat, "text": text}
+        if mode:
+            payload["parse_mode"] = mode
+        url = f"{self.api_url}/bot{self.token}/sendMessage"
+        wait = 0.0
+        for attempt in range(self.max_retries + 1):
+            time.sleep(wait + bucket.reserve())
+            wait = min(2.0**attempt, 30.0)
+            try:
+                response = self.session.post(url, json=payload, timeout=self.timeout)
+            except Exception as e:
+                logger.debug(f"Telegram send failed: {e}")
+                continue
+            if response.status_code == 200:
+                self.stats["sent"] += 1
+                return True
+            if response.status_code == 429:
+                try:
+                    retry_after = response.json().get("parameters", {}).get("retry_after", 1)
+                except ValueError:
+                    retry_after = 1
+                wait = min(float(retry_after), 60.0)
+            elif response.status_code == 400 and "parse_mode" in payload:
+                payload.pop("parse_mode")  # Unbalanced Markdown: resend as plain text
+                wait = 0.0
+            elif response.status_code < 500:
+                self.stats["failed"] += 1
+                logger.warning(f"Telegram rejected alert ({response.status_code})")
+                return True  # Resending would be rejected again
+        return False
+
+    # ----- spill file -----
+
+    def _own_spill(self) -> Path:
+        """This process's spill file (pid read per call, so forks get their own)."""
+        path = self.spill_path
+        return path.with_name(f"{path.stem}.{os.getpid()}{path.suffix}")
+
+    def _spill_files(self) -> list[Path]:
+        """Spill files this process may restore: its own and those of exited processes."""
+        path = self.spill_path
+        if path is None or not path.parent.is_dir():
+            return []
+        files = []
+        for candidate in path.parent.glob(f"{path.stem}.*{path.suffix}"):
+            pid = candidate.name[len(path.stem) + 1 : -len(path.suffix) or None]
+            if pid.isdigit() and (int(pid) == os.getpid() or not _pid_alive(int(pid))):
+                files.append(candidate)
+        return files
+
+    def _spill(self, alerts: list[Alert]) -> None:
+        if self.spill_path is None:
+            self.stats["failed"] += len(alerts)
+            return
+        lines = "".join(
+            json.dumps(
+                {"chat_id": a.chat_id, "text": a.text, "parse_mode": a.parse_mode, "ts": a.created}
+            )
+            + "\n"
+            for a in alerts
+        )
+        with self._spill_lock:
+            try:
+                self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+                with self._own_spill().open("a", encoding="utf-8") as fh:
+                    fh.write(lines)
+                self.stats["spilled"] += len(alerts)
+            except OSError as e:
+                self.stats["failed"] += len(alerts)
+                logger.warning(f"Could not spill alerts: {e}")
+
+    def _has_spill(self) -> bool:
+        return bool(self._spill_files())
+
+    def _spill_ready(self) -> bool:
+        return (
+            self._has_spill()
+            and time.monotonic() >= self._next_restore
+            and len(self._queue) < self.max_queue // 2
+        )
+
+    def _restore(self) -> None:
+        """Move spilled alerts back into the queue as room allows."""
+        lines = []
+        with self._spill_lock:
+            claimed = self._own_spill().with_suffix(".restoring")
+            for path in self._spill_files():
+                # The rename is atomic: of several processes, only one claims a file
+                try:
+                    os.replace(path, claimed)
+                    lines += claimed.read_text(encoding="utf-8").splitlines()
+                    claimed.unlink()
+                except OSError:
+                    continue
+        if not lines:
+            return
+        cutoff = time.time() - self.max_age
+        alerts = []
+        for line in lines:
+            try:
+                item = json.loads(line)
+            except ValueError:
+                continue
+            if item.get("ts", 0) >= cutoff:
+                alerts.append(
+                    Alert(item["chat_id"], item["text"], item.get("parse_mode"), item["ts"])
+                )
+        with self._cond:
+            room = max(0, self.max_queue - len(self._queue))
+            self._queue.extend(alerts[:room])
+            self._pending += len(alerts[:room])
+            self.stats["restored"] += len(alerts[:room])
+            self._cond.notify()
+        if alerts[room:]:
+            self._spill(alerts[room:])
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Exists, owned by another user
+    return True
+
+
+_dispatcher: NotificationDispatcher | None = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> NotificationDispatcher:
+    """Process-wide dispatcher for TELEGRAM_BOT_TOKEN / TELEGRAM_CHAT_ID."""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = NotificationDispatcher(
+                os.getenv("TELEGRAM_BOT_TOKEN"), os.getenv("TELEGRAM_CHAT_ID")
+            )
+            atexit.register(_dispatcher.close)
+        return _dispatcher
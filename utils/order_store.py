@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Journaled Order Store
+---------------------
+Append-only order journal with in-memory secondary indexes and periodic
+snapshot compaction.
+
+Features:
+- O(1) writes: each lifecycle change appends one JSON line to the journal
+- Indexes by status, symbol and creation time
+- Compaction into an atomic snapshot once the journal outgrows a fraction
+  of the live store (amortized O(1) per write)
+- Recovery loads the snapshot and replays only the journal tail
+- Thread-safe operations
+"""
+
+import bisect
+import json
+import logging
+import os
+import threading
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any, Protocol
+
+logger = logging.getLogger(__name__)
+
+
+class OrderRecord(Protocol):
+    """Attributes the store indexes; records also serialize with to_dict()."""
+
+    order_id: str
+    symbol: str
+    status: str
+    created_at: str  # ISO-8601; datetime values are indexed by isoformat()
+
+    def to_dict(self) -> dict[str, Any]: ...
+
+
+class OrderStore:
+    """
+    Journaled, indexed store of order records and positions.
+
+    Records are kept as live objects (built with `factory` on recovery) so the
+    owning engine can mutate them and call put() to journal the change.
+    """
+
+    SNAPSHOT_NAME = "orders_snapshot.json"
+    JOURNAL_NAME = "orders_journal.jsonl"
+
+    def __init__(
+        self,
+        directory: Path,
+        factory: Callable[[dict[str, Any]], OrderRecord],
+        min_compact_events: int = 10_000,
+        compact_ratio: float = 0.5,
+        fsync: bool = False,
+    ):
+        """
+        Initialize order store and recover state from disk.
+
+        Args:
+            directory: Directory holding the snapshot and journal
+            factory: Builds a record from its to_dict() form
+            min_compact_events: Journal events before compaction is considered
+            compact_ratio: Compact when journal events exceed this fraction of
+                live records (keeps compaction amortized O(1) per write)
+            fsync: fsync the journal after every append (survives power loss,
+                not just process crashes, but slower)
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.snapshot_file = self.directory / self.SNAPSHOT_NAME
+        self.journal_file = self.directory / self.JOURNAL_NAME
+        self.factory = factory
+        self.min_compact_events = min_compact_events
+        self.compact_ratio = compact_ratio
+        self.fsync = fsync
+        self._lock = threading.RLock()
+
+        self.orders: dict[str, OrderRecord] = {}
+        self.positions: dict[str, dict[str, Any]] = {}
+        self._by_status: dict[str, dict[str, None]] = {}
+        self._by_symbol: dict[str, dict[str, None]] = {}
+        self._indexed: dict[str, tuple[str, str]] = {}
+        self._created_keys: list[str] = []
+        self._created_ids: list[str] = []
+        self._seq = 0
+        self._journal_events = 0
+
+        self._recover()
+        self._journal = open(self.journal_file, "a", encoding="utf-8")  # noqa: SIM115
+
+    # ------------------------------------------------------------------ writes
+
+    def put(self, record: OrderRecord) -> None:
+        """Insert or update a record and journal its current state."""
+        with self._lock:
+            self._index(record)
+            self._append({"type": "order", "order": record.to_dict()})
+
+    def set_position(self, symbol: str, position: dict[str, Any]) -> None:
+        """Replace the position for a symbol and journal it."""
+        with self._lock:
+            self.positions[symbol] = position
+            self._append({"type": "position", "symbol": symbol, "position": position})
+
+    def flush(self) -> None:
+        """Flush the journal to the OS (and disk when fsync is enabled)."""
+        with self._lock:
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+
+    def compact(self) -> None:
+        """Write a snapshot of all records and positions, then truncate the journal."""
+        with self._lock:
+            snapshot = {
+                "seq": self._seq,
+                "orders": [record.to_dict() for record in self.orders.values()],
+                "positions": self.positions,
+            }
+            temp_file = self.snapshot_file.with_suffix(".json.tmp")
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            temp_file.replace(self.snapshot_file)
+
+            # Events up to seq are in the snapshot; recovery skips them if the
+            # truncation below is interrupted.
+            self._journal.close()
+            self._journal = open(self.journal_file, "w", encoding="utf-8")  # noqa: SIM115
+            self._journal_events = 0
+            logger.info(f"🗜️ Order store compacted: {len(self.orders)} orders at seq {self._seq}")
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._journal.closed:
+                self.flush()
+                self._journal.close()
+
+    # ----------------------------------------------------------------- queries
+
+    def get(self, order_id: str) -> OrderRecord | None:
+        return self.orders.get(order_id)
+
+    def ids_by_status(self, status: str) -> list[str]:
+        """Order ids with the given status, in the order they reached it."""
+        with self._lock:
+            return list(self._by_status.get(status, ()))
+
+    def ids_by_symbol(self, symbol: str) -> list[str]:
+        """Order ids for a symbol, oldest first."""
+        with self._lock:
+            return list(self._by_symbol.get(symbol, ()))
+
+    def ids_between(self, start: str | None = None, end: str | None = None) -> list[str]:
+        """Order ids created in [start, end) (ISO-8601 UTC strings)."""
+        with self._lock:
+            lo = 0 if start is None else bisect.bisect_left(self._created_keys, start)
+            hi = (
+                len(self._created_keys)
+                if end is None
+                else bisect.bisect_left(self._created_keys, end)
+            )
+            return self._created_ids[lo:hi]
+
+    def count(self, status: str | None = None) -> int:
+        if status is None:
+            return len(self.orders)
+        return len(self._by_status.get(status, ()))
+
+    def __len__(self) -> int:
+        return len(self.orders)
+
+    def __iter__(self) -> Iterator[OrderRecord]:
+        return iter(list(self.orders.values()))
+
+    # ---------------------------------------------------------------- internal
+
+    def _append(self, event: dict[str, Any]) -> None:
+        self._seq += 1
+        event["seq"] = self._seq
+        self._journal.write(json.dumps(event, separators=(",", ":")) + "\n")
+        self._journal_events += 1
+        self.flush()
+        if self._journal_events >= max(
+            self.min_compact_events, self.compact_ratio * len(self.orders)
+        ):
+            self.compact()
+
+    def _index(self, record: OrderRecord) -> None:
+        order_id = record.order_id
+        status, symbol = record.status, record.symbol
+        previous = self._indexed.get(order_id)
+        if previous is None:
+            self.orders[order_id] = record
+            created_at = record.created_at
+            if not isinstance(created_at, str):
+                created_at = created_at.isoformat()
+            self._insert_created(created_at, order_id)
+            previous = (None, None)
+        if previous[0] != status:
+            self._by_status.get(previous[0], {}).pop(order_id, None)
+            self._by_status.setdefault(status, {})[order_id] = None
+        if previous[1] != symbol:
+            self._by_symbol.get(previous[1], {}).pop(order_id, None)
+            self._by_symbol.setdefault(symbol, {})[order_id] = None
+        self._indexed[order_id] = (status, symbol)
+
+    def _insert_created(self, created_at: str, order_id: str) -> None:
+        # Orders arrive in time order, so this is an append in practice
+        if not self._created_keys or created_at >= self._created_keys[-1]:
+            self._created_keys.append(created_at)
+            self._created_ids.append(order_id)
+        else:
+            position = bisect.bisect_right(self._created_keys, created_at)
+            self._created_keys.insert(position, created_at)
+            self._created_ids.insert(position, order_id)
+
+    def _apply(self, event: dict[str, Any]) -> None:
+        if event.get("type") == "order":
+            # Rebuild through the factory so records keep their own field types
+            record = self.factory(event["order"])
+            self.orders[record.order_id] = record
+            self._index(record)
+        elif event.get("type") == "position":
+            self.positions[event["symbol"]] = event["position"]
+
+    def _recover(self) -> None:
+        """Load the snapshot, then replay journal events newer than it."""
+        if self.snapshot_file.exists():
+            try:
+                snapshot = json.loads(self.snapshot_file.read_text(encoding="utf-8"))
+                for data in snapshot.get("orders", []):
+                    self._index(self.factory(data))
+                self.positions = snapshot.get("positions", {})
+                self._seq = int(snapshot.get("seq", 0))
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"❌ Order snapshot unreadable, replaying journal only: {e}")
+
+        replayed = 0
+        if self.journal_file.exists():
+            with open(self.journal_file, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        logger.warning("⚠️ Skipping torn order journal line")
+                        continue
+                    if event.get("seq", 0) <= self._seq:
+                        continue
+                    self._apply(event)
+                    self._seq = event["seq"]
+                    replayed += 1
+        self._journal_events = replayed
+        logger.info(
+            f"💾 Order store recovered {len(self.orders)} orders ({replayed} journal events)"
+        )
@@ -0,0 +1,692 @@
+#!/usr/bin/env python3
+"""
+Local State Bus
+---------------
+Publish/subscribe bus between agents over a Unix-domain socket broker, replacing
+"write a JSON file, poll it elsewhere".
+
+Features:
+- Typed topics (allocations, brain, quotes, fills, events, risk) with payload
+  validation
+- Latest-value cache per topic (and per key, e.g. per symbol for quotes);
+  subscribers receive it on subscribe
+- Durable topics are journaled, so late joiners (and a restarted broker) can
+  replay from a sequence number
+- Back-pressure: lossless topics block the publisher while a subscriber is
+  full (slow subscribers are eventually dropped); latest-value topics conflate
+- Throttled atomic file export of latest values for file-based readers
+- Clients fall back to plain file export/reads when no broker is running
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(os.getenv("NEOLIGHT_ROOT", os.path.expanduser("~/neolight")))
+SOCKET_PATH = Path(os.getenv("NEOLIGHT_BUS_SOCKET", str(ROOT / "runtime" / "state_bus.sock")))
+FRAME_HEADER = struct.Struct("!I")
+MAX_FRAME = 16 * 2**20
+
+
+@dataclass(frozen=True)
+class TopicSpec:
+    """
+    Topic schema and delivery semantics.
+
+    Attributes:
+        name: Topic name
+        fields: Required payload fields and their accepted types
+        key: Payload field that partitions latest values (e.g. "symbol")
+        conflate: Latest-value topic; slow subscribers only get the newest value
+        durable: Journal messages so they survive broker restarts
+        retain: Messages kept for replay
+        export: File (relative to the bus root) mirroring the latest value
+    """
+
+    name: str
+    fields: dict[str, type | tuple[type, ...]] = field(default_factory=dict)
+    key: str | None = None
+    conflate: bool = True
+    durable: bool = False
+    retain: int = 256
+    export: str | None = None
+
+    def validate(self, data: Any) -> None:
+        if not isinstance(data, dict):
+            raise ValueError(f"{self.name}: payload must be a dict")
+        for name, kind in self.fields.items():
+            if not isinstance(data.get(name), kind):
+                raise ValueError(f"{self.name}: field '{name}' missing or not {kind}")
+
+    def key_of(self, data: dict[str, Any]) -> str:
+        return str(data.get(self.key, "")) if self.key else ""
+
+
+NUMBER = (int, float)
+TOPICS: dict[str, TopicSpec] = {
+    spec.name: spec
+    for spec in (
+        TopicSpec(
+            "allocations",
+            {"allocations": dict},
+            durable=True,
+            export="runtime/allocations_override.json",
+        ),
+        TopicSpec(
+            "brain",
+            {"risk_scaler": NUMBER, "confidence": NUMBER},
+            durable=True,
+            export="runtime/atlas_brain.json",
+        ),
+        TopicSpec("quotes", {"symbol": str, "price": NUMBER}, key="symbol", retain=4096),
+        TopicSpec(
+            "fills",
+            {"symbol": str, "side": str, "quantity": NUMBER, "price": NUMBER},
+            conflate=False,
+            durable=True,
+            retain=10_000,
+        ),
+        TopicSpec("events", {"type": str}, conflate=False, durable=True, retain=1000),
+        TopicSpec("risk", {}, durable=True),
+    )
+}
+
+
+def encode_frame(message: dict[str, Any]) -> bytes:
+    body = json.dumps(message, separators=(",", ":")).encode()
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+def write_export(path: Path, data: dict[str, Any]) -> None:
+    """Atomically replace an export file with the latest value."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temp.write_text(json.dumps(data, indent=2))
+    temp.replace(path)
+
+
+# =============================================================== broker
+
+
+class _Topic:
+    def __init__(self, spec: TopicSpec, journal_dir: Path):
+        self.spec = spec
+        self.seq = 0
+        self.ring: deque[dict[str, Any]] = deque(maxlen=spec.retain)
+        self.latest: dict[str, dict[str, Any]] = {}
+        self.subscribers: set[_Subscriber] = set()
+        self.journal_path = journal_dir / f"{spec.name}.jsonl"
+        self.journal = None
+        self.journal_lines = 0
+        self.last_export = 0.0
+        self.export_pending: asyncio.TimerHandle | None = None
+
+    def record(self, message: dict[str, Any]) -> None:
+        self.seq = message["seq"]
+        self.ring.append(message)
+        self.latest[self.spec.key_of(message["data"])] = message
+
+
+class _Subscriber:
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.pending: deque[bytes] = deque()
+        self.conflated: dict[tuple[str, str], bytes] = {}
+        self.wake = asyncio.Event()
+        self.space = asyncio.Event()
+        self.space.set()
+        self.closed = False
+
+
+class StateBusBroker:
+    """
+    Unix-domain socket broker holding latest values, replay rings and journals.
+
+    Run it with start() inside an event loop or start_in_thread() from sync code.
+    """
+
+    def __init__(
+        self,
+        socket_path: Path | None = None,
+        root: Path | None = None,
+        topics: dict[str, TopicSpec] | None = None,
+        max_pending: int = 1024,
+        slow_consumer_timeout: float = 5.0,
+        export_interval: float = 1.0,
+    ):
+        """
+        Initialize broker and recover durable topics from their journals.
+
+        Args:
+            socket_path: Unix socket to listen on
+            root: Base directory for file exports and the journal (state/bus)
+            topics: Topic registry (default TOPICS)
+            max_pending: Lossless messages buffered per subscriber before the
+                publisher is blocked
+            slow_consumer_timeout: Seconds a publisher waits on a full
+                subscriber before that subscriber is disconnected
+            export_interval: Minimum seconds between export writes per topic
+        """
+        self.socket_path = Path(socket_path or SOCKET_PATH)
+        self.root = Path(root or ROOT)
+        self.journal_dir = self.root / "state" / "bus"
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        self.max_pending = max_pending
+        self.slow_consumer_timeout = slow_consumer_timeout
+        self.export_interval = export_interval
+        self.topics = {
+            name: _Topic(spec, self.journal_dir) for name, spec in (topics or TOPICS).items()
+        }
+        self._server: asyncio.AbstractServer | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._connections: dict[asyncio.Task, _Subscriber] = {}
+        for topic in self.topics.values():
+            if topic.spec.durable:
+                self._recover(topic)
+            if topic.spec.export:
+                self._seed_from_export(topic)
+
+    # ------------------------------------------------------------- lifecycle
+
+    async def start(self) -> None:
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        with contextlib.suppress(FileNotFoundError):
+            self.socket_path.unlink()
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_unix_server(
+            self._handle_client, path=str(self.socket_path), limit=MAX_FRAME
+        )
+        logger.info(f"🚌 State bus listening on {self.socket_path}")
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        # Closing the transports ends each connection handler at its next read
+        connections = dict(self._connections)
+        for subscriber in connections.values():
+            self._drop(subscriber)
+        if connections:
+            await asyncio.wait(connections, timeout=1.0)
+        for topic in self.topics.values():
+            if topic.export_pending is not None:
+                topic.export_pending.cancel()
+                self._export(topic)
+            if topic.journal is not None:
+                topic.journal.close()
+                topic.journal = None
+        with contextlib.suppress(FileNotFoundError):
+            self.socket_path.unlink()
+
+    def start_in_thread(self, timeout: float = 5.0) -> None:
+        """Run the broker on its own event loop in a daemon thread."""
+        ready = threading.Event()
+
+        def run() -> None:
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.start())
+            ready.set()
+            loop.run_forever()
+            loop.run_until_complete(self.stop())
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name="state-bus-broker", daemon=True)
+        self._thread.start()
+        if not ready.wait(timeout):
+            raise RuntimeError("State bus broker did not start")
+
+    def stop_thread(self, timeout: float = 5.0) -> None:
+        if self._thread is not None and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout)
+            self._thread = None
+
+    # ----------------------------------------------------------- connections
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        subscriber = _Subscriber(writer)
+        sender = asyncio.create_task(self._send_loop(subscriber))
+        connection = asyncio.current_task()
+        self._connections[connection] = subscriber
+        try:
+            while not subscriber.closed:
+                header = await reader.readexactly(FRAME_HEADER.size)
+                (length,) = FRAME_HEADER.unpack(header)
+                if length > MAX_FRAME:
+                    raise ValueError(f"frame of {length} bytes exceeds limit")
+                message = json.loads(await reader.readexactly(length))
+                op = message.get("op")
+                if op == "pub":
+                    try:
+                        await self._publish(message["topic"], message["data"])
+                    except ValueError as e:
+                        logger.warning(f"⚠️ Rejected state bus message: {e}")
+                elif op == "sub":
+                    self._subscribe(subscriber, message["topics"], message.get("since") or {})
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            logger.warning(f"⚠️ State bus client error: {e}")
+        finally:
+            self._drop(subscriber)
+            sender.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await sender
+            # Only now, so stop() keeps waiting for handlers that are still unwinding
+            self._connections.pop(connection, None)
+
+    async def _send_loop(self, subscriber: _Subscriber) -> None:
+        writer = subscriber.writer
+        try:
+            while True:
+                await subscriber.wake.wait()
+                subscriber.wake.clear()
+                while subscriber.pending:
+                    writer.write(subscriber.pending.popleft())
+                if subscriber.conflated:
+                    frames, subscriber.conflated = subscriber.conflated, {}
+                    writer.writelines(frames.values())
+                await writer.drain()
+                subscriber.space.set()
+        except (ConnectionError, RuntimeError):
+            self._drop(subscriber)
+
+    def _drop(self, subscriber: _Subscriber) -> None:
+        if subscriber.closed:
+            return
+        subscriber.closed = True
+        subscriber.space.set()
+        for topic in self.topics.values():
+            topic.subscribers.discard(subscriber)
+        subscriber.writer.close()
+
+    # ---------------------------------------------------------------- topics
+
+    def _subscribe(self, subscriber: _Subscriber, names: Iterable[str], since: dict) -> None:
+        for name in names:
+            topic = self.topics.get(name)
+            if topic is None:
+                continue
+            topic.subscribers.add(subscriber)
+            if name in since:
+                # Replay what the subscriber missed (as far back as retained)
+                after = int(since[name])
+                backlog = [m for m in topic.ring if m["seq"] > after]
+            else:
+                backlog = sorted(topic.latest.values(), key=lambda m: m["seq"])
+            subscriber.pending.extend(encode_frame(m) for m in backlog)
+        subscriber.wake.set()
+
+    async def _publish(self, name: str, data: dict[str, Any]) -> None:
+        topic = self.topics.get(name)
+        if topic is None:
+            raise ValueError(f"unknown topic '{name}'")
+        topic.spec.validate(data)
+        message = {"op": "msg", "topic": name, "seq": topic.seq + 1, "ts": time.time()}
+        message["data"] = data
+        topic.record(message)
+        if topic.spec.durable:
+            self._journal(topic, message)
+        if topic.spec.export:
+            self._schedule_export(topic)
+
+        frame = encode_frame(message)
+        key = (name, topic.spec.key_of(data))
+        for subscriber in list(topic.subscribers):
+            if topic.spec.conflate:
+                subscriber.conflated.pop(key, None)  # keep per-key order by re-inserting
+                subscriber.conflated[key] = frame
+            else:
+                if len(subscriber.pending) >= self.max_pending:
+                    await self._wait_for_space(subscriber)
+                    if subscriber.closed:
+                        continue
+                subscriber.pending.append(frame)
+            subscriber.wake.set()
+
+    async def _wait_for_space(self, subscriber: _Subscriber) -> None:
+        """Block the publisher until a full subscriber drains, or drop it."""
+        deadline = time.monotonic() + self.slow_consumer_timeout
+        while len(subscriber.pending) >= self.max_pending and not subscriber.closed:
+            subscriber.space.clear()
+            try:
+                await asyncio.wait_for(subscriber.space.wait(), deadline - time.monotonic())
+            except TimeoutError:
+                logger.warning("⚠️ Dropping slow state bus subscriber")
+                self._drop(subscriber)
+
+    # ------------------------------------------------------- durability/export
+
+    def _journal(self, topic: _Topic, message: dict[str, Any]) -> None:
+        if topic.journal is None:
+            topic.journal = open(topic.journal_path, "a", encoding="utf-8")  # noqa: SIM115
+        topic.journal.write(json.dumps(message, separators=(",", ":")) + "\n")
+        topic.journal.flush()
+        topic.journal_lines += 1
+        if topic.journal_lines > 2 * topic.spec.retain:
+            # Compact to the replay ring: amortized O(1) per message
+            topic.journal.close()
+            temp = topic.journal_path.with_suffix(".jsonl.tmp")
+            with open(temp, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(m, separators=(",", ":")) + "\n" for m in topic.ring)
+            temp.replace(topic.journal_path)
+            topic.journal = open(topic.journal_path, "a", encoding="utf-8")  # noqa: SIM115
+            topic.journal_lines = len(topic.ring)
+
+    def _recover(self, topic: _Topic) -> None:
+        if not topic.journal_path.exists():
+            return
+        with open(topic.journal_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    topic.record(json.loads(line))
+                    topic.journal_lines += 1
+                except (ValueError, KeyError):
+                    logger.warning(f"⚠️ Skipping torn state bus journal line ({topic.spec.name})")
+
+    def _seed_from_export(self, topic: _Topic) -> None:
+        """Adopt an export file written directly (by a non-bus writer) since the last message."""
+        path = self.root / topic.spec.export
+        try:
+            mtime = path.stat().st_mtime
+            data = json.loads(path.read_text())
+            topic.spec.validate(data)
+        except (OSError, ValueError):
+            return
+        latest = max(topic.latest.values(), key=lambda m: m["seq"], default=None)
+        if latest is not None and (latest["ts"] >= mtime or latest["data"] == data):
+            return
+        message = {"op": "msg", "topic": topic.spec.name, "seq": topic.seq + 1, "ts": mtime}
+        message["data"] = data
+        topic.record(message)
+        if topic.spec.durable:
+            self._journal(topic, message)
+
+    def _schedule_export(self, topic: _Topic) -> None:
+        if topic.export_pending is not None:
+            return
+        wait = topic.last_export + self.export_interval - time.monotonic()
+        if wait <= 0:
+            self._export(topic)
+        else:
+            topic.export_pending = self._loop.call_later(wait, self._export, topic)
+
+    def _export(self, topic: _Topic) -> None:
+        topic.export_pending = None
+        topic.last_export = time.monotonic()
+        latest = max(topic.latest.values(), key=lambda m: m["seq"], default=None)
+        if latest is None:
+            return
+        try:
+            write_export(self.root / topic.spec.export, latest["data"])
+        except OSError as e:
+            logger.warning(f"⚠️ State bus export failed for {topic.spec.name}: {e}")
+
+
+# =============================================================== client
+
+
+class StateBus:
+    """
+    Synchronous bus client for agents.
+
+    Subscribed topics are cached locally and updated by a reader thread, so
+    latest() is a dict lookup. Without a broker, publish() writes the topic's
+    export file and latest() reads it, as agents did before the bus.
+    """
+
+    def __init__(
+        self,
+        socket_path: Path | None = None,
+        root: Path | None = None,
+        topics: dict[str, TopicSpec] | None = None,
+        reconnect_interval: float = 5.0,
+    ):
+        """
+        Initialize client (connects lazily).
+
+        Args:
+            socket_path: Broker socket
+            root: Base directory for file fallback
+            topics: Topic registry (default TOPICS)
+            reconnect_interval: Seconds between reconnect attempts
+        """
+        self.socket_path = Path(socket_path or SOCKET_PATH)
+        self.root = Path(root or ROOT)
+        self.topics = topics or TOPICS
+        self.reconnect_interval = reconnect_interval
+        self._sock: socket.socket | None = None
+        self._send_lock = threading.Lock()
+        self._state = threading.Condition()
+        self._latest: dict[str, dict[str, dict[str, Any]]] = {}
+        self._exports: dict[str, tuple[int, Any]] = {}
+        self._last_seq: dict[str, int] = {}
+        self._subscribed: set[str] = set()
+        self._callbacks: list[tuple[frozenset[str], Callable[[str, dict, int], None]]] = []
+        self._version = 0
+        self._next_attempt = 0.0
+        self._reader: threading.Thread | None = None
+        self._closed = False
+
+    @property
+    def connected(self) -> bool:
+        return self._sock is not None
+
+    def publish(self, topic: str, data: dict[str, Any]) -> bool:
+        """
+        Publish a payload; blocks while the broker applies back-pressure.
+
+        Returns:
+            True if the broker took it, False if it went to the export file
+        """
+        spec = self.topics[topic]
+        spec.validate(data)
+        frame = encode_frame({"op": "pub", "topic": topic, "data": data})
+        if self._ensure_connected():
+            try:
+                with self._send_lock:
+                    self._sock.sendall(frame)
+                return True
+            except OSError:
+                self._disconnect()
+        if spec.export:
+            write_export(self.root / spec.export, data)
+        return False
+
+    def subscribe(
+        self,
+        topics: Iterable[str],
+        callback: Callable[[str, dict, int], None] | None = None,
+        replay: bool = False,
+    ) -> None:
+        """
+        Subscribe to topics (latest values arrive immediately).
+
+        Args:
+            topics: Topic names
+            callback: Called as callback(topic, data, seq) on the reader thread
+            replay: Also replay the retained history of each topic
+        """
+        names = [t for t in topics if t in self.topics]
+        if callback is not None:
+            self._callbacks.append((frozenset(names), callback))
+        new = [t for t in names if t not in self._subscribed]
+        self._subscribed.update(new)
+        if replay:
+            for name in new:
+                self._last_seq.setdefault(name, 0)
+        if new and self._ensure_connected(force=True):
+            self._send_subscribe(new)
+
+    def latest(
+        self, topic: str, default: Any = None, key: str = "", wait: float = 0.2
+    ) -> dict[str, Any] | Any:
+        """
+        Latest payload of a topic (per key for keyed topics).
+
+        The first call subscribes and waits up to `wait` seconds for the
+        broker's cached value; later calls are local lookups. A topic's
+        export file wins when it is newer than the cached message (or there
+        is none), since some agents still write those files directly.
+        """
+        if topic not in self._subscribed:
+            self.subscribe([topic])
+            if self.connected and wait > 0:
+                with self._state:
+                    self._state.wait_for(lambda: topic in self._latest, wait)
+        message = None
+        if self.connected:
+            with self._state:
+                message = self._latest.get(topic, {}).get(key)
+        else:
+            self._ensure_connected()
+        if not key and self.topics[topic].export:
+            exported = self._read_export(topic, message["ts"] if message else None)
+            if exported is not None:
+                return exported
+        return message["data"] if message else default
+
+    def _read_export(self, topic: str, newer_than: float | None) -> Any:
+        """Export file contents if it was modified after `newer_than` (parsed once per change)."""
+        path = self.root / self.topics[topic].export
+        try:
+            stat = path.stat()
+            if newer_than is not None and stat.st_mtime <= newer_than:
+                return None
+            cached = self._exports.get(topic)
+            if cached is not None and cached[0] == stat.st_mtime_ns:
+                return cached[1]
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        self._exports[topic] = (stat.st_mtime_ns, data)
+        return data
+
+    def wait_for_update(self, timeout: float | None = None) -> bool:
+        """Block until a subscribed topic changes; False on timeout."""
+        with self._state:
+            version = self._version
+            return self._state.wait_for(lambda: self._version != version, timeout)
+
+    def close(self) -> None:
+        self._closed = True
+        self._disconnect()
+
+    # -------------------------------------------------------------- internal
+
+    def _ensure_connected(self, force: bool = False) -> bool:
+        if self._sock is not None:
+            return True
+        if self._closed or (not force and time.monotonic() < self._next_attempt):
+            return False
+        self._next_attempt = time.monotonic() + self.reconnect_interval
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(str(self.socket_path))
+        except OSError:
+            sock.close()
+            return False
+        self._sock = sock
+        self._reader = threading.Thread(
+            target=self._read_loop, args=(sock,), name="state-bus-reader", daemon=True
+        )
+        self._reader.start()
+        if self._subscribed:
+            self._send_subscribe(list(self._subscribed))
+        return True
+
+    def _send_subscribe(self, names: list[str]) -> None:
+        since = {name: self._last_seq[name] for name in names if name in self._last_seq}
+        try:
+            with self._send_lock:
+                self._sock.sendall(encode_frame({"op": "sub", "topics": names, "since": since}))
+        except (OSError, AttributeError):
+            self._disconnect()
+
+    def _disconnect(self) -> None:
+        sock, self._sock = self._sock, None
+        if sock is not None:
+            with contextlib.suppress(OSError):
+                sock.shutdown(socket.SHUT_RDWR)
+            sock.close()
+        with self._state:
+            self._version += 1
+            self._state.notify_all()
+
+    def _read_loop(self, sock: socket.socket) -> None:
+        stream = sock.makefile("rb")
+        try:
+            while True:
+                header = stream.read(FRAME_HEADER.size)
+                if len(header) < FRAME_HEADER.size:
+                    break
+                (length,) = FRAME_HEADER.unpack(header)
+                message = json.loads(stream.read(length))
+                self._deliver(message)
+        except (OSError, ValueError):
+            pass
+        finally:
+            stream.close()
+            if self._sock is sock:
+                self._disconnect()
+
+    def _deliver(self, message: dict[str, Any]) -> None:
+        topic, seq, data = message["topic"], message["seq"], message["data"]
+        spec = self.topics[topic]
+        with self._state:
+            if seq <= self._last_seq.get(topic, 0) and not spec.conflate:
+                return  # already seen (replay overlap after reconnect)
+            self._last_seq[topic] = max(seq, self._last_seq.get(topic, 0))
+            self._latest.setdefault(topic, {})[spec.key_of(data)] = message
+            self._version += 1
+            self._state.notify_all()
+        for names, callback in self._callbacks:
+            if topic in names:
+                try:
+                    callback(topic, data, seq)
+                except Exception as e:
+                    logger.warning(f"⚠️ State bus callback failed for {topic}: {e}")
+
+
+_BUS: StateBus | None = None
+_BUS_LOCK = threading.Lock()
+
+
+def get_state_bus(root: Path | None = None) -> StateBus:
+    """Process-wide bus client (root sets the file fallback base on first use)."""
+    global _BUS
+    with _BUS_LOCK:
+        if _BUS is None:
+            _BUS = StateBus(root=root)
+        return _BUS
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+    broker = StateBusBroker()
+
+    async def serve() -> None:
+        await broker.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await broker.stop()
+
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(serve())
@@ -16,6 +16,9 @@ from typing import Any
 
 logger = logging.getLogger(__name__)
 
+# Parsed JSON files keyed by path: (mtime_ns, data)
+_json_cache: dict[Path, tuple[int, Any]] = {}
+
 
 class StateManager:
     """
@@ -245,3 +248,21 @@ def save_state_safe(state_file: Path, state: dict[str, Any]) -> bool:
     """Safely save state file atomically."""
     manager = StateManager(state_file)
     return manager.save(state)
+
+
+def read_json_cached(path: Path) -> Any:
+    """
+    Parse a JSON state file, re-reading it only when its mtime changes.
+
+    Returns None if the file does not exist; parse errors propagate.
+    """
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        _json_cache.pop(path, None)
+        return None
+    cached = _json_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, json.loads(path.read_text()))
+        _json_cache[path] = cached
+    return cached[1]